@@ -6,6 +6,8 @@ This module provides the Agent class that handles:
 - JSON-RPC 2.0 message handling
 - Automatic reconnection with exponential backoff
 - Background metrics and health reporting
+- Docker state cache fed by the Docker events stream
+- Streaming container log subscriptions
 """
 
 import asyncio
@@ -19,12 +21,24 @@ try:
     from .connection import close_websocket, establish_connection, run_message_loop
     from .handler_setup import setup_all_handlers
     from .rpc.handler import RPCHandler
+    from .rpc.methods.docker_api import close_async_client
+    from .rpc.methods.docker_logs import LogStreamManager, set_log_streams
+    from .rpc.methods.docker_state import DockerStateCache, set_state_cache
+    from .rpc.methods.docker_stats import ContainerStatsCollector, set_stats_collector
+    from .rpc.methods.system_exec import ExecStreamManager, set_exec_streams
+    from .rpc.methods.system_volumes import VolumePrepManager, set_volume_preps
 except ImportError:
     from collectors import HealthReporter, MetricsCollector
     from config import AgentConfig, load_config
     from connection import close_websocket, establish_connection, run_message_loop
     from handler_setup import setup_all_handlers
     from rpc.handler import RPCHandler
+    from rpc.methods.docker_api import close_async_client
+    from rpc.methods.docker_logs import LogStreamManager, set_log_streams
+    from rpc.methods.docker_state import DockerStateCache, set_state_cache
+    from rpc.methods.docker_stats import ContainerStatsCollector, set_stats_collector
+    from rpc.methods.system_exec import ExecStreamManager, set_exec_streams
+    from rpc.methods.system_volumes import VolumePrepManager, set_volume_preps
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +56,11 @@ class Agent:
         self.running = True
         self._metrics_collector: Optional[MetricsCollector] = None
         self._health_reporter: Optional[HealthReporter] = None
+        self._state_cache: Optional[DockerStateCache] = None
+        self._log_streams: Optional[LogStreamManager] = None
+        self._exec_streams: Optional[ExecStreamManager] = None
+        self._volume_preps: Optional[VolumePrepManager] = None
+        self._stats_collector: Optional[ContainerStatsCollector] = None
         self._setup_handlers()
 
     @property
@@ -115,8 +134,31 @@ class Agent:
             get_interval=lambda: self.config.health_interval,
             get_websocket=lambda: self.websocket,
         )
+        self._state_cache = DockerStateCache(
+            get_websocket=lambda: self.websocket,
+        )
+        set_state_cache(self._state_cache)
+        self._log_streams = LogStreamManager(
+            get_websocket=lambda: self.websocket,
+        )
+        set_log_streams(self._log_streams)
+        self._exec_streams = ExecStreamManager(
+            get_websocket=lambda: self.websocket,
+        )
+        set_exec_streams(self._exec_streams)
+        self._volume_preps = VolumePrepManager(
+            get_websocket=lambda: self.websocket,
+        )
+        set_volume_preps(self._volume_preps)
+        self._stats_collector = ContainerStatsCollector(
+            get_interval=lambda: self.config.stats_interval,
+            get_websocket=lambda: self.websocket,
+        )
+        set_stats_collector(self._stats_collector)
         await self._metrics_collector.start()
         await self._health_reporter.start()
+        await self._state_cache.start()
+        await self._stats_collector.start()
 
     async def _stop_collectors(self) -> None:
         """Stop background collectors."""
@@ -126,10 +168,31 @@ class Agent:
         if self._health_reporter:
             await self._health_reporter.stop()
             self._health_reporter = None
+        if self._state_cache:
+            set_state_cache(None)
+            await self._state_cache.stop()
+            self._state_cache = None
+        if self._log_streams:
+            set_log_streams(None)
+            await self._log_streams.stop()
+            self._log_streams = None
+        if self._exec_streams:
+            set_exec_streams(None)
+            await self._exec_streams.stop()
+            self._exec_streams = None
+        if self._volume_preps:
+            set_volume_preps(None)
+            await self._volume_preps.stop()
+            self._volume_preps = None
+        if self._stats_collector:
+            set_stats_collector(None)
+            await self._stats_collector.stop()
+            self._stats_collector = None
 
     async def shutdown(self) -> None:
         """Graceful shutdown of the agent with timeout."""
         logger.info("Shutting down...")
         self.running = False
         await self._stop_collectors()
+        await close_async_client()
         await close_websocket(self.websocket)
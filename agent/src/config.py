@@ -23,6 +23,7 @@ class AgentConfig(BaseModel):
     register_code: Optional[str] = None
     metrics_interval: int = Field(default=30)
     health_interval: int = Field(default=60)
+    stats_interval: int = Field(default=10)
     reconnect_timeout: int = Field(default=30)
 
 
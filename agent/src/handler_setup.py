@@ -11,22 +11,32 @@ try:
     from .rpc.methods import (
         ContainerMethods,
         ImageMethods,
+        LogMethods,
         NetworkMethods,
+        StateMethods,
+        StatsMethods,
         VolumeMethods,
     )
     from .rpc.methods.agent import create_agent_methods
     from .rpc.methods.system import SystemMethods
+    from .rpc.methods.system_exec import ExecStreamMethods
+    from .rpc.methods.system_volumes import VolumePrepMethods
 except ImportError:
     from rpc.agent_handlers import setup_agent_handlers
     from rpc.handler import RPCHandler
     from rpc.methods import (
         ContainerMethods,
         ImageMethods,
+        LogMethods,
         NetworkMethods,
+        StateMethods,
+        StatsMethods,
         VolumeMethods,
     )
     from rpc.methods.agent import create_agent_methods
     from rpc.methods.system import SystemMethods
+    from rpc.methods.system_exec import ExecStreamMethods
+    from rpc.methods.system_volumes import VolumePrepMethods
 
 
 def setup_all_handlers(
@@ -58,9 +68,14 @@ def setup_all_handlers(
     rpc_handler.register_module("docker.images", ImageMethods())
     rpc_handler.register_module("docker.volumes", VolumeMethods())
     rpc_handler.register_module("docker.networks", NetworkMethods())
+    rpc_handler.register_module("docker.state", StateMethods())
+    rpc_handler.register_module("docker.logs", LogMethods())
+    rpc_handler.register_module("docker.stats", StatsMethods())
 
     # Register System methods
     rpc_handler.register_module("system", SystemMethods())
+    rpc_handler.register_module("system", ExecStreamMethods())
+    rpc_handler.register_module("system", VolumePrepMethods())
 
     # Register Agent methods
     agent_methods = create_agent_methods(
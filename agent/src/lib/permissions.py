@@ -21,11 +21,20 @@ METHOD_PERMISSIONS: Dict[str, PermissionLevel] = {
     "system.info": PermissionLevel.READ,
     "system.get_metrics": PermissionLevel.READ,
     "system.exec": PermissionLevel.ADMIN,  # Restricted - uses allowlist
+    "system.exec_stream": PermissionLevel.ADMIN,  # Restricted - uses allowlist
+    "system.exec_cancel": PermissionLevel.ADMIN,
+    "system.exec_active": PermissionLevel.ADMIN,
+    "system.prepare_volumes": PermissionLevel.ADMIN,  # Restricted - allowed paths
     # Docker read methods
     "docker.containers.list": PermissionLevel.READ,
     "docker.containers.get": PermissionLevel.READ,
     "docker.containers.logs": PermissionLevel.READ,
     "docker.images.list": PermissionLevel.READ,
+    "docker.state.snapshot": PermissionLevel.READ,
+    "docker.logs.subscribe": PermissionLevel.READ,
+    "docker.logs.unsubscribe": PermissionLevel.READ,
+    "docker.logs.active": PermissionLevel.READ,
+    "docker.stats.latest": PermissionLevel.READ,
     # Docker execute methods
     "docker.containers.start": PermissionLevel.EXECUTE,
     "docker.containers.stop": PermissionLevel.EXECUTE,
@@ -5,10 +5,24 @@ try:
     from .docker_images import ImageMethods
     from .docker_volumes import VolumeMethods
     from .docker_networks import NetworkMethods
+    from .docker_state import StateMethods
+    from .docker_logs import LogMethods
+    from .docker_stats import StatsMethods
 except ImportError:
     from rpc.methods.docker_containers import ContainerMethods
     from rpc.methods.docker_images import ImageMethods
     from rpc.methods.docker_volumes import VolumeMethods
     from rpc.methods.docker_networks import NetworkMethods
+    from rpc.methods.docker_state import StateMethods
+    from rpc.methods.docker_logs import LogMethods
+    from rpc.methods.docker_stats import StatsMethods
 
-__all__ = ["ContainerMethods", "ImageMethods", "VolumeMethods", "NetworkMethods"]
+__all__ = [
+    "ContainerMethods",
+    "ImageMethods",
+    "VolumeMethods",
+    "NetworkMethods",
+    "StateMethods",
+    "LogMethods",
+    "StatsMethods",
+]
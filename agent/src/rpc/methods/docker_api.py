@@ -0,0 +1,430 @@
+"""Asyncio Docker Engine API client.
+
+Talks HTTP/1.1 to the Docker daemon over its Unix socket, so RPC methods
+await the daemon instead of blocking the event loop or holding a worker
+thread. Up to ``POOL_SIZE`` keep-alive connections are shared by
+concurrent requests; a connection goes back to the pool only once its
+response body has been read completely. Streaming endpoints such as image
+pulls are read chunk by chunk and yielded as decoded JSON messages.
+
+The client is used when ``DOCKER_HOST`` is unset or a ``unix://`` URL and
+the socket exists. Otherwise ``get_async_client()`` returns None and the
+RPC methods fall back to the blocking docker-py client in a worker thread.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import struct
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from docker import auth as docker_auth
+
+try:
+    from ..errors import DockerOperationError
+except ImportError:
+    from rpc.errors import DockerOperationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+POOL_SIZE = 8
+DEFAULT_TIMEOUT = 60.0
+READ_SIZE = 64 * 1024
+# Longest single message accepted from a streaming endpoint
+MAX_STREAM_LINE = 1024 * 1024
+# Requests that are safe to send again after a stale connection failed
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+class DockerAPIError(DockerOperationError):
+    """Error response from the Docker daemon."""
+
+    def __init__(self, status: int, message: str, operation: str = ""):
+        self.status = status
+        super().__init__(message, operation=operation)
+
+
+def short_id(object_id: str) -> str:
+    """Shorten an ID the way docker-py does (images keep ``sha256:``)."""
+    if object_id.startswith("sha256:"):
+        return object_id[:19]
+    return object_id[:12]
+
+
+def path_arg(value: str) -> str:
+    """Quote a name, ID or image reference for use in a URL path."""
+    return quote(value, safe="/:")
+
+
+def registry_auth_header(repository: str) -> Optional[Dict[str, str]]:
+    """Build the X-Registry-Auth header docker-py would send for a pull."""
+    registry, _ = docker_auth.resolve_repository_name(repository)
+    config = docker_auth.resolve_authconfig(docker_auth.load_config(), registry)
+    if not config:
+        return None
+    return {"X-Registry-Auth": docker_auth.encode_header(config).decode("ascii")}
+
+
+def demux_logs(data: bytes) -> bytes:
+    """Join the stdout and stderr frames of a non-TTY log stream.
+
+    Each frame is an 8-byte header (stream type, three zero bytes and a
+    big-endian payload length) followed by the payload.
+    """
+    out = []
+    offset = 0
+    while offset + 8 <= len(data):
+        (length,) = struct.unpack(">I", data[offset + 4 : offset + 8])
+        out.append(data[offset + 8 : offset + 8 + length])
+        offset += 8 + length
+    return b"".join(out)
+
+
+def _query(params: Optional[Dict[str, Any]]) -> str:
+    """Encode query parameters; booleans become 1/0, dicts become JSON."""
+    if not params:
+        return ""
+    encoded = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        encoded[key] = value
+    return f"?{urlencode(encoded)}" if encoded else ""
+
+
+class _Connection:
+    """One HTTP/1.1 connection to the daemon socket."""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        """Close the socket."""
+        with contextlib.suppress(Exception):
+            self.writer.close()
+
+
+class _Response:
+    """Status, headers and incrementally read body of one response."""
+
+    def __init__(
+        self, conn: _Connection, method: str, status: int, headers: Dict[str, str]
+    ) -> None:
+        self.status = status
+        self.headers = headers
+        self._conn = conn
+        self._method = method
+        # Set once the body has been read to its end on a kept-alive connection
+        self.reusable = False
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield the body as it arrives."""
+        reader = self._conn.reader
+        keep_alive = self.headers.get("connection", "").lower() != "close"
+        if self._method == "HEAD" or self.status in (204, 304):
+            self.reusable = keep_alive
+            return
+
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await reader.readline()
+                if not size_line:
+                    raise ConnectionResetError("Docker daemon closed the connection")
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the blank line ending the message
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data = await reader.readexactly(size)
+                await reader.readexactly(2)
+                yield data
+            self.reusable = keep_alive
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining:
+                data = await reader.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise ConnectionResetError("Docker daemon closed the connection")
+                remaining -= len(data)
+                yield data
+            self.reusable = keep_alive
+        else:
+            # Body delimited by the end of the connection
+            while data := await reader.read(READ_SIZE):
+                yield data
+
+    async def read(self) -> bytes:
+        """Read the whole body."""
+        return b"".join([data async for data in self.chunks()])
+
+
+class AsyncDockerClient:
+    """Docker Engine API client over a Unix socket with pooled connections."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, pool_size: int = POOL_SIZE):
+        """Initialize the client.
+
+        Args:
+            socket_path: Path of the Docker daemon socket.
+            pool_size: Most connections open at once.
+        """
+        self.socket_path = socket_path
+        self._pool_size = pool_size
+        self._idle: List[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        raw: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """Send a request and return its decoded JSON body.
+
+        Args:
+            method: HTTP method.
+            path: API path such as ``/containers/json``.
+            params: Query parameters.
+            body: JSON request body.
+            timeout: Seconds for the whole exchange, None for no limit.
+            raw: Return the body bytes instead of decoding JSON.
+            headers: Extra request headers.
+
+        Returns:
+            Decoded JSON (None for an empty body), or bytes when raw.
+
+        Raises:
+            DockerAPIError: The daemon answered with an error status.
+        """
+        async with asyncio.timeout(timeout):
+            async with self._exchange(method, path, params, body, headers) as response:
+                data = await response.read()
+        if raw:
+            return data
+        return json.loads(data) if data.strip() else None
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a JSON resource."""
+        return await self.request("GET", path, params)
+
+    async def post(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> Any:
+        """POST to an endpoint."""
+        return await self.request("POST", path, params, body, timeout)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """DELETE a resource."""
+        return await self.request("DELETE", path, params)
+
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        pooled: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the JSON messages of a streaming endpoint as they arrive.
+
+        A connection left before the end of the stream is closed rather
+        than returned to the pool. Long-lived streams should pass
+        ``pooled=False`` so they do not hold one of the ``pool_size``
+        request slots for their whole lifetime.
+        """
+        async with self._exchange(
+            method, path, params, body, headers, pooled
+        ) as response:
+            buffer = b""
+            async for data in response.chunks():
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                if len(buffer) > MAX_STREAM_LINE:
+                    raise DockerAPIError(
+                        response.status, "Stream message too long", path
+                    )
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+
+    async def close(self) -> None:
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    @contextlib.asynccontextmanager
+    async def _exchange(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        body: Any,
+        headers: Optional[Dict[str, str]],
+        pooled: bool = True,
+    ) -> AsyncIterator[_Response]:
+        """Send a request on a pooled connection and yield its response."""
+        self._bind_loop()
+        async with self._slots if pooled else contextlib.nullcontext():
+            conn, status, response_headers = await self._send(
+                method, path + _query(params), body, headers
+            )
+            response = _Response(conn, method, status, response_headers)
+            try:
+                if status >= 400:
+                    raise _error(status, await response.read(), f"{method} {path}")
+                yield response
+            finally:
+                if response.reusable and len(self._idle) < self._pool_size:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+
+    async def _send(
+        self,
+        method: str,
+        target: str,
+        body: Any,
+        headers: Optional[Dict[str, str]],
+    ) -> Tuple[_Connection, int, Dict[str, str]]:
+        """Write a request and read the status line and headers.
+
+        A pooled connection the daemon has meanwhile closed fails before any
+        response arrives. GET and HEAD requests are then sent once more on a
+        new connection; other requests may already have reached the daemon,
+        so their error is raised instead.
+        """
+        payload = b"" if body is None else json.dumps(body).encode()
+        lines = [f"{method} {target} HTTP/1.1", "Host: docker"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+        while True:
+            conn, reused = await self._connect()
+            try:
+                conn.writer.write(message)
+                await conn.writer.drain()
+                status_line = await conn.reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("Docker daemon closed the connection")
+            except OSError:
+                conn.close()
+                if reused and method in IDEMPOTENT_METHODS:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        try:
+            status = int(status_line.split(b" ", 2)[1])
+            response_headers = {}
+            while True:
+                line = await conn.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+        except BaseException:
+            conn.close()
+            raise
+        return conn, status, response_headers
+
+    async def _connect(self) -> Tuple[_Connection, bool]:
+        """Take an idle connection or open a new one."""
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        return _Connection(reader, writer), False
+
+    def _bind_loop(self) -> None:
+        """Drop connections opened on another event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        for conn in self._idle:
+            conn.close()
+        self._idle = []
+        self._slots = asyncio.Semaphore(self._pool_size)
+        self._loop = loop
+
+
+def _error(status: int, data: bytes, operation: str) -> DockerAPIError:
+    """Build the error for a failed response."""
+    try:
+        message = json.loads(data).get("message") or ""
+    except (ValueError, AttributeError):
+        message = data.decode("utf-8", errors="replace").strip()
+    return DockerAPIError(status, message or f"HTTP {status}", operation)
+
+
+def docker_socket_path() -> Optional[str]:
+    """Path of the daemon's Unix socket, or None if it cannot be used."""
+    host = os.environ.get("DOCKER_HOST", "")
+    if not host:
+        path = DEFAULT_SOCKET
+    elif host.startswith("unix://"):
+        path = host[len("unix://") :]
+    else:
+        return None
+    return path if os.path.exists(path) else None
+
+
+_client: Optional[AsyncDockerClient] = None
+
+
+def get_async_client() -> Optional[AsyncDockerClient]:
+    """Get the shared asyncio client, or None to use docker-py instead."""
+    global _client
+    if _client is None:
+        path = docker_socket_path()
+        if path is None:
+            return None
+        _client = AsyncDockerClient(path)
+        logger.info(f"Using native asyncio Docker client on {path}")
+    return _client
+
+
+async def close_async_client() -> None:
+    """Close and forget the shared asyncio client."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.close()
+
+
+def reset_async_client() -> None:
+    """Forget the shared asyncio client (for testing purposes)."""
+    global _client
+    _client = None
@@ -1,27 +1,78 @@
 """Docker container RPC methods."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
+    from .docker_api import (
+        AsyncDockerClient,
+        DockerAPIError,
+        demux_logs,
+        get_async_client,
+        path_arg,
+        short_id,
+    )
     from .docker_client import get_client
+    from .docker_images import image_tags, pull_image
+    from .docker_logs import cursor_key, parse_log_line
+    from .docker_state import container_status, get_live_cache
+    from .docker_stats import get_stats_collector, summarize
     from ..errors import ContainerBlockedError, DockerOperationError
     from ...security import validate_docker_params, redact_sensitive_data
 except ImportError:
+    from rpc.methods.docker_api import (
+        AsyncDockerClient,
+        DockerAPIError,
+        demux_logs,
+        get_async_client,
+        path_arg,
+        short_id,
+    )
     from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_images import image_tags, pull_image
+    from rpc.methods.docker_logs import cursor_key, parse_log_line
+    from rpc.methods.docker_state import container_status, get_live_cache
+    from rpc.methods.docker_stats import get_stats_collector, summarize
     from rpc.errors import ContainerBlockedError, DockerOperationError
     from security import validate_docker_params, redact_sensitive_data
 
 logger = logging.getLogger(__name__)
 
+# Seconds added to a stop or restart grace period before giving up
+DOCKER_TIMEOUT = 60
+
 
 class ContainerMethods:
     """RPC methods for Docker container operations."""
 
-    def list(self, all: bool = False) -> List[Dict[str, Any]]:
-        """List Docker containers."""
-        client = get_client()
-        containers = client.containers.list(all=all)
+    async def list(self, all: bool = False) -> List[Dict[str, Any]]:
+        """List Docker containers.
+
+        Served from the Docker state cache when it is in sync.
+        """
+        cache = get_live_cache()
+        if cache and not cache.has_pending_writes():
+            return cache.list_containers(all=all)
+
+        api = get_async_client()
+        if api:
+            containers, images = await asyncio.gather(
+                api.get("/containers/json", {"all": all}), api.get("/images/json")
+            )
+            tags = {img["Id"]: image_tags(img) for img in images}
+            return [
+                {
+                    "id": short_id(c["Id"]),
+                    "name": (c.get("Names") or ["/"])[0].lstrip("/"),
+                    "status": c.get("State", ""),
+                    "image": (tags.get(c.get("ImageID")) or [None])[0]
+                    or short_id(c.get("ImageID", "")),
+                }
+                for c in containers
+            ]
+
+        containers = await asyncio.to_thread(get_client().containers.list, all=all)
         return [
             {
                 "id": c.short_id,
@@ -32,7 +83,7 @@ class ContainerMethods:
             for c in containers
         ]
 
-    def run(
+    async def run(
         self,
         image: str,
         name: Optional[str] = None,
@@ -111,25 +162,43 @@ class ContainerMethods:
             if len(policy_parts) > 1:
                 docker_restart["MaximumRetryCount"] = int(policy_parts[1])
 
-        client = get_client()
         try:
-            container = client.containers.run(
-                image,
-                name=name,
-                ports=docker_ports if docker_ports else None,
-                environment=env if env else None,
-                volumes=docker_volumes if docker_volumes else None,
-                network=network,
-                network_mode=network_mode,
-                restart_policy=docker_restart,
-                privileged=privileged,
-                cap_add=capabilities if capabilities else None,
-                detach=True,
-            )
+            api = get_async_client()
+            if api:
+                container_id, container_name = await self._create_and_start(
+                    api,
+                    image,
+                    name,
+                    docker_ports,
+                    env,
+                    docker_volumes,
+                    network,
+                    network_mode,
+                    docker_restart,
+                    privileged,
+                    capabilities,
+                )
+            else:
+                container = await asyncio.to_thread(
+                    get_client().containers.run,
+                    image,
+                    name=name,
+                    ports=docker_ports if docker_ports else None,
+                    environment=env if env else None,
+                    volumes=docker_volumes if docker_volumes else None,
+                    network=network,
+                    network_mode=network_mode,
+                    restart_policy=docker_restart,
+                    privileged=privileged,
+                    cap_add=capabilities if capabilities else None,
+                    detach=True,
+                )
+                container_id, container_name = container.id, container.name
+            self._mark_stale(container_id)
             return {
-                "id": container.short_id,
-                "name": container.name,
-                "container_id": container.id,
+                "id": short_id(container_id),
+                "name": container_name,
+                "container_id": container_id,
             }
         except Exception as e:
             # Log the actual Docker error for debugging
@@ -145,43 +214,126 @@ class ContainerMethods:
             )
             raise DockerOperationError(str(e), operation="container.run")
 
-    def start(self, container: str) -> Dict[str, str]:
+    async def start(self, container: str) -> Dict[str, str]:
         """Start a container."""
-        c = get_client().containers.get(container)
-        c.start()
+        api = get_async_client()
+        if api:
+            await api.post(f"/containers/{path_arg(container)}/start")
+        else:
+            await asyncio.to_thread(
+                lambda: get_client().containers.get(container).start()
+            )
+        self._mark_stale(container)
         return {"status": "started"}
 
-    def stop(self, container: str, timeout: int = 10) -> Dict[str, str]:
+    async def stop(self, container: str, timeout: int = 10) -> Dict[str, str]:
         """Stop a container."""
-        c = get_client().containers.get(container)
-        c.stop(timeout=timeout)
+        api = get_async_client()
+        if api:
+            await api.post(
+                f"/containers/{path_arg(container)}/stop",
+                {"t": timeout},
+                timeout=DOCKER_TIMEOUT + timeout,
+            )
+        else:
+            await asyncio.to_thread(
+                lambda: get_client().containers.get(container).stop(timeout=timeout)
+            )
+        self._mark_stale(container)
         return {"status": "stopped"}
 
-    def remove(self, container: str, force: bool = False) -> Dict[str, str]:
+    async def remove(self, container: str, force: bool = False) -> Dict[str, str]:
         """Remove a container."""
-        c = get_client().containers.get(container)
-        c.remove(force=force)
+        api = get_async_client()
+        if api:
+            await api.delete(f"/containers/{path_arg(container)}", {"force": force})
+        else:
+            await asyncio.to_thread(
+                lambda: get_client().containers.get(container).remove(force=force)
+            )
+        self._mark_stale(container)
         return {"status": "removed"}
 
-    def restart(self, container: str) -> Dict[str, str]:
+    async def restart(self, container: str) -> Dict[str, str]:
         """Restart a container."""
-        c = get_client().containers.get(container)
-        c.restart()
+        api = get_async_client()
+        if api:
+            await api.post(
+                f"/containers/{path_arg(container)}/restart",
+                {"t": 10},
+                timeout=DOCKER_TIMEOUT + 10,
+            )
+        else:
+            await asyncio.to_thread(
+                lambda: get_client().containers.get(container).restart()
+            )
+        self._mark_stale(container)
         return {"status": "restarted"}
 
-    def logs(
-        self, container: str, tail: int = 100, follow: bool = False
-    ) -> Dict[str, str]:
-        """Get container logs."""
-        c = get_client().containers.get(container)
-        logs = c.logs(tail=tail, follow=False)
-        return {"logs": logs.decode("utf-8", errors="replace")}
+    async def logs(
+        self,
+        container: str,
+        tail: int = 100,
+        follow: bool = False,
+        since: Optional[str] = None,
+        timestamps: bool = False,
+    ) -> Dict[str, Any]:
+        """Get a snapshot of container logs.
+
+        Following is done with a ``docker.logs.subscribe`` stream; ``follow``
+        is accepted for compatibility and ignored.
 
-    def inspect(self, container: str) -> Dict[str, Any]:
-        """Inspect a container."""
-        return get_client().containers.get(container).attrs
+        Args:
+            container: Container name or ID
+            tail: Number of lines to return
+            follow: Ignored, use docker.logs.subscribe
+            since: Cursor from a previous call; only newer lines are returned
+            timestamps: Return parsed ``lines`` and a ``cursor`` as well
+
+        Returns:
+            Dict with the log text and, with timestamps or since, the parsed
+            lines and the cursor of the last line.
+        """
+        skip_through = cursor_key(since)
+        kwargs: Dict[str, Any] = {"tail": tail}
+        if timestamps or skip_through is not None:
+            kwargs["timestamps"] = True
+        if skip_through is not None:
+            kwargs["since"] = max(1, skip_through[0])
+        logs = await self._read_logs(container, **kwargs)
+
+        if "timestamps" not in kwargs:
+            return {"logs": logs.decode("utf-8", errors="replace")}
+
+        lines = []
+        for raw in logs.splitlines():
+            line = parse_log_line(raw)
+            key = cursor_key(line["timestamp"])
+            if skip_through is not None and key is not None and key <= skip_through:
+                continue
+            lines.append(line)
+        cursor = next(
+            (line["timestamp"] for line in reversed(lines) if line["timestamp"]),
+            since,
+        )
+        return {
+            "logs": "\n".join(line["message"] for line in lines),
+            "lines": lines,
+            "cursor": cursor,
+        }
+
+    async def inspect(self, container: str) -> Dict[str, Any]:
+        """Inspect a container.
+
+        Served from the Docker state cache when it is in sync.
+        """
+        cache = get_live_cache()
+        attrs = cache.find_container(container) if cache else None
+        if attrs is not None:
+            return attrs
+        return await self._inspect(container)
 
-    def update(
+    async def update(
         self, container: str, restart_policy: Optional[str] = None
     ) -> Dict[str, str]:
         """Update container configuration.
@@ -190,7 +342,6 @@ class ContainerMethods:
             container: Container name or ID
             restart_policy: Restart policy (e.g., "unless-stopped", "always")
         """
-        c = get_client().containers.get(container)
         update_args = {}
 
         if restart_policy:
@@ -204,11 +355,23 @@ class ContainerMethods:
             }
 
         if update_args:
-            c.update(**update_args)
+            api = get_async_client()
+            if api:
+                await api.post(
+                    f"/containers/{path_arg(container)}/update",
+                    body={"RestartPolicy": update_args["restart_policy"]},
+                )
+            else:
+                await asyncio.to_thread(
+                    lambda: get_client().containers.get(container).update(**update_args)
+                )
+            self._mark_stale(container)
 
         return {"status": "updated"}
 
-    def status(self, container: str, include_logs: bool = False) -> Dict[str, Any]:
+    async def status(
+        self, container: str, include_logs: bool = False
+    ) -> Dict[str, Any]:
         """Get container status including health and restart count.
 
         Args:
@@ -216,54 +379,166 @@ class ContainerMethods:
             include_logs: Whether to include recent logs
 
         Returns:
-            Dict with status, health, restart_count, and optionally logs
+            Dict with status, health, restart_count, and optionally logs.
+            Results served from the Docker state cache carry an ``as_of``
+            Unix timestamp of the last cache update.
         """
-        c = get_client().containers.get(container)
-        c.reload()  # Refresh state
-
-        attrs = c.attrs
-        state = attrs.get("State", {})
-        health = state.get("Health", {})
-
-        result = {
-            "status": state.get("Status", "unknown"),
-            "health": health.get("Status", "none") if health else "none",
-            "restart_count": attrs.get("RestartCount", 0),
-            "running": state.get("Running", False),
-            "started_at": state.get("StartedAt"),
-            "finished_at": state.get("FinishedAt"),
-        }
+        cache = get_live_cache()
+        attrs = cache.find_container(container) if cache else None
+        if attrs is not None:
+            result = container_status(attrs)
+            result["as_of"] = cache.updated_at
+        else:
+            attrs = await self._inspect(container)
+            result = container_status(attrs)
 
         if include_logs:
             try:
-                logs = c.logs(tail=50, timestamps=False)
+                logs = await self._read_logs(attrs["Id"], attrs=attrs, tail=50)
                 result["logs"] = logs.decode("utf-8", errors="replace")[-500:]
             except Exception:
                 result["logs"] = ""
 
         return result
 
-    def stats(self, container: str) -> Dict[str, Any]:
-        """Get container resource statistics."""
-        c = get_client().containers.get(container)
-        stats = c.stats(stream=False)
+    async def stats(self, container: str) -> Dict[str, Any]:
+        """Get container resource statistics.
+
+        Served from the streaming stats collector when it follows the
+        container, which avoids the daemon's two-sample wait. Samples read
+        from the daemon are reduced the same way, so memory excludes the
+        page cache on every path.
+        """
+        collector = get_stats_collector()
+        latest = collector.find(container) if collector else None
+        if not latest:
+            api = get_async_client()
+            if api:
+                sample = await api.get(
+                    f"/containers/{path_arg(container)}/stats", {"stream": False}
+                )
+            else:
+                sample = await asyncio.to_thread(
+                    lambda: get_client().containers.get(container).stats(stream=False)
+                )
+            latest = summarize(sample)
         return {
-            "cpu_percent": self._calc_cpu_percent(stats),
-            "memory_usage": stats.get("memory_stats", {}).get("usage", 0),
-            "memory_limit": stats.get("memory_stats", {}).get("limit", 0),
+            "cpu_percent": latest["cpu"],
+            "memory_usage": latest["mem"],
+            "memory_limit": latest["mem_limit"],
         }
 
-    def _calc_cpu_percent(self, stats: Dict[str, Any]) -> float:
-        """Calculate CPU usage percentage from stats."""
-        cpu_stats = stats.get("cpu_stats", {})
-        precpu_stats = stats.get("precpu_stats", {})
-        cpu_usage = cpu_stats.get("cpu_usage", {})
-        precpu_usage = precpu_stats.get("cpu_usage", {})
-        cpu_delta = cpu_usage.get("total_usage", 0) - precpu_usage.get("total_usage", 0)
-        system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get(
-            "system_cpu_usage", 0
+    async def _inspect(self, container: str) -> Dict[str, Any]:
+        """Inspect a container on the daemon."""
+        api = get_async_client()
+        if api:
+            return await api.get(f"/containers/{path_arg(container)}/json")
+        # containers.get() inspects the container, so no reload() needed
+        return await asyncio.to_thread(
+            lambda: get_client().containers.get(container).attrs
+        )
+
+    async def _read_logs(
+        self,
+        container: str,
+        attrs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """Read a snapshot of stdout and stderr.
+
+        Args:
+            container: Container name or ID
+            attrs: Inspect data, when already known
+            kwargs: tail, timestamps and since, as for docker-py's logs()
+        """
+        api = get_async_client()
+        if not api:
+            client = get_client()
+            if attrs is not None:
+                return await asyncio.to_thread(client.api.logs, attrs["Id"], **kwargs)
+            return await asyncio.to_thread(
+                lambda: client.containers.get(container).logs(follow=False, **kwargs)
+            )
+        if attrs is None:
+            attrs = await self._inspect(container)
+        data = await api.request(
+            "GET",
+            f"/containers/{path_arg(attrs['Id'])}/logs",
+            {"stdout": True, "stderr": True, **kwargs},
+            raw=True,
         )
-        cpu_count = len(cpu_usage.get("percpu_usage", [])) or 1
-        if system_delta > 0 and cpu_delta > 0:
-            return (cpu_delta / system_delta) * cpu_count * 100.0
-        return 0.0
+        # Without a TTY, stdout and stderr arrive in framed chunks
+        if attrs.get("Config", {}).get("Tty"):
+            return data
+        return demux_logs(data)
+
+    async def _create_and_start(
+        self,
+        api: AsyncDockerClient,
+        image: str,
+        name: Optional[str],
+        ports: Dict[str, int],
+        env: Optional[Dict[str, str]],
+        volumes: Dict[str, Dict[str, str]],
+        network: Optional[str],
+        network_mode: Optional[str],
+        restart_policy: Optional[Dict[str, Any]],
+        privileged: bool,
+        capabilities: Optional[List[str]],
+    ) -> Tuple[str, str]:
+        """Create and start a container the way docker-py's run() does.
+
+        A missing image is pulled and the create retried once.
+
+        Returns:
+            Tuple of (container ID, container name)
+        """
+        port_specs = {
+            spec if "/" in spec else f"{spec}/tcp": host_port
+            for spec, host_port in ports.items()
+        }
+        host_config: Dict[str, Any] = {
+            "Binds": [
+                f"{host}:{bind['bind']}:{bind['mode']}"
+                for host, bind in volumes.items()
+            ]
+            or None,
+            "PortBindings": {
+                spec: [{"HostIp": "", "HostPort": str(host_port)}]
+                for spec, host_port in port_specs.items()
+            }
+            or None,
+            "NetworkMode": network or network_mode,
+            "RestartPolicy": restart_policy,
+            "Privileged": privileged,
+            "CapAdd": capabilities or None,
+        }
+        body: Dict[str, Any] = {
+            "Image": image,
+            "Env": [f"{key}={value}" for key, value in (env or {}).items()] or None,
+            "ExposedPorts": {spec: {} for spec in port_specs} or None,
+            "HostConfig": {k: v for k, v in host_config.items() if v is not None},
+        }
+        if network:
+            body["NetworkingConfig"] = {"EndpointsConfig": {network: {}}}
+        body = {k: v for k, v in body.items() if v is not None}
+
+        try:
+            created = await api.post("/containers/create", {"name": name}, body)
+        except DockerAPIError as e:
+            if e.status != 404 or "No such image" not in e.message:
+                raise
+            await pull_image(api, image, tag=None)
+            created = await api.post("/containers/create", {"name": name}, body)
+
+        container_id = created["Id"]
+        await api.post(f"/containers/{container_id}/start")
+        if name is None:
+            name = (await api.get(f"/containers/{container_id}/json"))["Name"]
+        return container_id, name.lstrip("/")
+
+    def _mark_stale(self, container: str) -> None:
+        """Route reads of a just-written container to the daemon until its event lands."""
+        cache = get_live_cache()
+        if cache:
+            cache.mark_stale(container)
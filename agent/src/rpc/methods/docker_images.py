@@ -1,27 +1,91 @@
 """Docker image RPC methods."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from docker.utils import parse_repository_tag
 
 try:
+    from .docker_api import (
+        AsyncDockerClient,
+        DockerAPIError,
+        get_async_client,
+        path_arg,
+        registry_auth_header,
+        short_id,
+    )
     from .docker_client import get_client
+    from .docker_state import get_list_cache, mark_list_stale
 except ImportError:
+    from rpc.methods.docker_api import (
+        AsyncDockerClient,
+        DockerAPIError,
+        get_async_client,
+        path_arg,
+        registry_auth_header,
+        short_id,
+    )
     from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_state import get_list_cache, mark_list_stale
 
 logger = logging.getLogger(__name__)
 
 
+async def pull_image(
+    api: AsyncDockerClient, image: str, tag: Optional[str] = "latest"
+) -> Dict[str, Any]:
+    """Pull an image with the asyncio client and return its attributes.
+
+    The pull progress stream is drained as it arrives; errors reported
+    inside the stream are raised like error responses.
+    """
+    repository, image_tag = parse_repository_tag(image)
+    tag = tag or image_tag or "latest"
+    params = {"fromImage": repository, "tag": tag}
+    async for message in api.stream(
+        "POST", "/images/create", params, headers=registry_auth_header(repository)
+    ):
+        if message.get("error"):
+            raise DockerAPIError(500, message["error"], operation="images.pull")
+    mark_list_stale("images")
+    sep = "@" if tag.startswith("sha256:") else ":"
+    return await api.get(f"/images/{path_arg(f'{repository}{sep}{tag}')}/json")
+
+
+def image_tags(attrs: Dict[str, Any]) -> List[str]:
+    """Tags of an image, without the untagged placeholder."""
+    return [t for t in attrs.get("RepoTags") or [] if t != "<none>:<none>"]
+
+
 class ImageMethods:
     """RPC methods for Docker image operations."""
 
-    def list(self) -> List[Dict[str, Any]]:
+    async def list(self) -> List[Dict[str, Any]]:
         """List Docker images.
 
         Returns:
-            List of image information dictionaries.
+            List of image information dictionaries. Served from the
+            Docker state cache when it is in sync and not written since
+            its last event.
         """
-        client = get_client()
-        images = client.images.list()
+        cache = get_list_cache("images")
+        if cache:
+            return cache.list_images()
+
+        api = get_async_client()
+        if api:
+            images = await api.get("/images/json")
+            return [
+                {
+                    "id": short_id(img["Id"]),
+                    "tags": image_tags(img),
+                    "size": img.get("Size", 0),
+                }
+                for img in images
+            ]
+
+        images = await asyncio.to_thread(get_client().images.list)
         return [
             {
                 "id": img.short_id,
@@ -31,7 +95,7 @@ class ImageMethods:
             for img in images
         ]
 
-    def pull(self, image: str, tag: str = "latest") -> Dict[str, Any]:
+    async def pull(self, image: str, tag: str = "latest") -> Dict[str, Any]:
         """Pull an image from a registry.
 
         Args:
@@ -39,13 +103,25 @@ class ImageMethods:
             tag: Image tag (default: "latest").
 
         Returns:
-            Pulled image information dictionary.
+            Pulled image information dictionary with the registry
+            digest, or None for images without one.
         """
-        client = get_client()
-        img = client.images.pull(image, tag=tag)
-        return {"id": img.short_id, "tags": img.tags}
+        api = get_async_client()
+        if api:
+            attrs = await pull_image(api, image, tag)
+            img_id, tags = short_id(attrs["Id"]), image_tags(attrs)
+        else:
+            img = await asyncio.to_thread(get_client().images.pull, image, tag=tag)
+            mark_list_stale("images")
+            attrs, img_id, tags = img.attrs, img.short_id, img.tags
+        digests = attrs.get("RepoDigests") or []
+        return {
+            "id": img_id,
+            "tags": tags,
+            "digest": digests[0] if digests else None,
+        }
 
-    def remove(self, image: str, force: bool = False) -> Dict[str, str]:
+    async def remove(self, image: str, force: bool = False) -> Dict[str, str]:
         """Remove an image.
 
         Args:
@@ -55,18 +131,26 @@ class ImageMethods:
         Returns:
             Status dictionary.
         """
-        client = get_client()
-        client.images.remove(image, force=force)
+        api = get_async_client()
+        if api:
+            await api.delete(f"/images/{path_arg(image)}", {"force": force})
+        else:
+            await asyncio.to_thread(get_client().images.remove, image, force=force)
+        mark_list_stale("images")
         return {"status": "removed"}
 
-    def prune(self) -> Dict[str, Any]:
+    async def prune(self) -> Dict[str, Any]:
         """Remove unused images.
 
         Returns:
             Prune result with space reclaimed.
         """
-        client = get_client()
-        result = client.images.prune()
+        api = get_async_client()
+        if api:
+            result = await api.post("/images/prune")
+        else:
+            result = await asyncio.to_thread(get_client().images.prune)
+        mark_list_stale("images")
         return {
             "deleted": result.get("ImagesDeleted") or [],
             "space_reclaimed": result.get("SpaceReclaimed", 0),
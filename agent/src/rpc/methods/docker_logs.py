@@ -0,0 +1,418 @@
+"""Streaming container log subscriptions.
+
+A subscription reads a container's log stream from the Docker daemon and
+pushes it to the server as ``docker.logs.chunk`` notifications. Frames are
+bounded in lines and bytes so they stay far below the server's message size
+cap, every line carries its Docker timestamp, and each frame reports a
+``cursor`` (the last timestamp sent) that can be passed back as ``since`` to
+resume without repeating lines. Delivery is rate limited per stream; a slow
+consumer backs up to the Docker socket rather than growing agent memory.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .docker_client import get_client
+    from ..errors import DockerOperationError, RateLimitError
+except ImportError:
+    from rpc.methods.docker_client import get_client
+    from rpc.errors import DockerOperationError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAMS = 8
+MAX_TAIL = 5000
+MAX_CHUNK_LINES = 500
+MAX_CHUNK_BYTES = 256 * 1024
+MAX_LINE_BYTES = 16 * 1024
+FLUSH_INTERVAL = 0.25
+DEFAULT_LINES_PER_SECOND = 200
+MAX_LINES_PER_SECOND = 2000
+# Raw reads buffered between the Docker reader thread and the sender
+READ_QUEUE_SIZE = 64
+
+_stream_ids = itertools.count(1)
+
+
+def cursor_key(timestamp: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a Docker RFC3339Nano timestamp into (epoch seconds, nanoseconds).
+
+    Docker trims trailing zeros from the fraction, so timestamps cannot be
+    compared as strings.
+
+    Args:
+        timestamp: Timestamp such as ``2024-01-01T00:00:00.123456789Z``.
+
+    Returns:
+        Comparable tuple, or None if the timestamp cannot be parsed.
+    """
+    if not timestamp or not timestamp.endswith("Z"):
+        return None
+    whole, _, fraction = timestamp[:-1].partition(".")
+    try:
+        parsed = datetime.strptime(whole, "%Y-%m-%dT%H:%M:%S")
+        nanos = int(fraction[:9].ljust(9, "0")) if fraction else 0
+    except ValueError:
+        return None
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp()), nanos
+
+
+def parse_log_line(raw: bytes) -> Dict[str, Any]:
+    """Split a timestamped Docker log line into timestamp and message."""
+    if len(raw) > MAX_LINE_BYTES:
+        raw = raw[:MAX_LINE_BYTES]
+    text = raw.decode("utf-8", errors="replace").rstrip("\r")
+    timestamp, sep, message = text.partition(" ")
+    if sep and cursor_key(timestamp) is not None:
+        return {"timestamp": timestamp, "message": message}
+    return {"timestamp": None, "message": text}
+
+
+class LogStream:
+    """State of a single log subscription."""
+
+    def __init__(
+        self,
+        container: str,
+        since: Optional[str],
+        follow: bool,
+        lines_per_second: int,
+    ) -> None:
+        self.stream_id = f"logs-{next(_stream_ids)}"
+        self.container = container
+        self.follow = follow
+        self.lines_per_second = lines_per_second
+        self.cursor = since
+        self.skip_through = cursor_key(since)
+        self.seq = 0
+        self.lines_sent = 0
+        self.started_at = time.time()
+        self.source: Any = None
+        self.task: Optional[asyncio.Task] = None
+        self.stopped = threading.Event()
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_bytes = 0
+        self._tokens = float(lines_per_second)
+        self._refilled_at = time.monotonic()
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the subscription."""
+        return {
+            "stream_id": self.stream_id,
+            "container": self.container,
+            "follow": self.follow,
+            "cursor": self.cursor,
+            "lines_sent": self.lines_sent,
+            "started_at": self.started_at,
+        }
+
+    def close_source(self) -> None:
+        """Close the Docker log stream, unblocking the reader thread."""
+        self.stopped.set()
+        if self.source is not None:
+            try:
+                self.source.close()
+            except Exception:
+                pass
+
+    async def throttle(self, count: int) -> None:
+        """Wait until ``count`` lines fit in the token bucket."""
+        rate = self.lines_per_second
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                float(rate), self._tokens + (now - self._refilled_at) * rate
+            )
+            self._refilled_at = now
+            if self._tokens >= count or self._tokens >= rate:
+                self._tokens -= count
+                return
+            await asyncio.sleep((min(count, rate) - self._tokens) / rate)
+
+
+class LogStreamManager:
+    """Runs log subscriptions and pushes their frames to the server."""
+
+    def __init__(self, get_websocket: Callable[[], Optional[Any]]) -> None:
+        """Initialize the manager.
+
+        Args:
+            get_websocket: Function returning the current websocket.
+        """
+        self._get_websocket = get_websocket
+        self._streams: Dict[str, LogStream] = {}
+
+    async def subscribe(
+        self,
+        container: str,
+        since: Optional[str] = None,
+        tail: int = 100,
+        follow: bool = True,
+        lines_per_second: int = DEFAULT_LINES_PER_SECOND,
+    ) -> Dict[str, Any]:
+        """Start streaming a container's logs.
+
+        Args:
+            container: Container name or ID.
+            since: Cursor from a previous frame; only newer lines are sent.
+            tail: Number of existing lines to send first (ignored with since).
+            follow: Keep streaming new lines until cancelled.
+            lines_per_second: Delivery rate limit for this stream.
+
+        Returns:
+            Dict with the stream_id and subscription details.
+        """
+        if len(self._streams) >= MAX_STREAMS:
+            raise RateLimitError(f"Too many log streams (max {MAX_STREAMS})")
+
+        rate = max(1, min(int(lines_per_second), MAX_LINES_PER_SECOND))
+        stream = LogStream(container, since, follow, rate)
+
+        kwargs: Dict[str, Any] = {
+            "stream": True,
+            "follow": follow,
+            "timestamps": True,
+        }
+        if stream.skip_through is not None:
+            # Docker's since has whole-second granularity here; lines up to
+            # the cursor are skipped when they arrive.
+            kwargs["since"] = max(1, stream.skip_through[0])
+        else:
+            kwargs["tail"] = max(0, min(int(tail), MAX_TAIL))
+
+        try:
+            stream.source = await asyncio.to_thread(
+                get_client().api.logs, container, **kwargs
+            )
+        except Exception as e:
+            raise DockerOperationError(str(e), operation="logs.subscribe")
+
+        self._streams[stream.stream_id] = stream
+        stream.task = asyncio.create_task(self._run(stream))
+        logger.info(f"Log stream {stream.stream_id} started for {container}")
+        return stream.info()
+
+    async def unsubscribe(self, stream_id: str) -> bool:
+        """Cancel a log subscription.
+
+        Returns:
+            True if the stream existed.
+        """
+        stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return False
+        stream.close_source()
+        if stream.task:
+            stream.task.cancel()
+            await asyncio.gather(stream.task, return_exceptions=True)
+        return True
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Describe the running subscriptions."""
+        return [s.info() for s in self._streams.values()]
+
+    async def stop(self) -> None:
+        """Cancel every subscription."""
+        for stream_id in list(self._streams):
+            await self.unsubscribe(stream_id)
+
+    async def _run(self, stream: LogStream) -> None:
+        """Forward a stream's lines until it ends or is cancelled."""
+        reason = "eof"
+        error = None
+        try:
+            await self._forward(stream)
+        except asyncio.CancelledError:
+            reason = "cancelled"
+        except Exception as e:
+            reason = "error"
+            error = str(e)
+            logger.error(f"Log stream {stream.stream_id} failed: {e}")
+        finally:
+            stream.close_source()
+            self._streams.pop(stream.stream_id, None)
+
+        await self._flush(stream, done=True, reason=reason, error=error)
+        logger.info(f"Log stream {stream.stream_id} ended ({reason})")
+
+    async def _forward(self, stream: LogStream) -> None:
+        """Assemble raw reads into lines and flush them as frames."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=READ_QUEUE_SIZE)
+        reader = threading.Thread(
+            target=self._read_source,
+            args=(stream, loop, queue),
+            name=f"docker-{stream.stream_id}",
+            daemon=True,
+        )
+        reader.start()
+
+        partial = b""
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                await self._flush(stream)
+                continue
+            if data is None:
+                break
+
+            *lines, partial = (partial + data).split(b"\n")
+            for raw in lines:
+                self._add_line(stream, raw)
+                if (
+                    len(stream.pending) >= MAX_CHUNK_LINES
+                    or stream.pending_bytes >= MAX_CHUNK_BYTES
+                ):
+                    await self._flush(stream)
+
+        if partial:
+            self._add_line(stream, partial)
+
+    def _add_line(self, stream: LogStream, raw: bytes) -> None:
+        """Queue a line for the next frame, skipping lines up to the cursor."""
+        line = parse_log_line(raw)
+        if stream.skip_through is not None:
+            key = cursor_key(line["timestamp"])
+            if key is not None and key <= stream.skip_through:
+                return
+            stream.skip_through = None
+        stream.pending.append(line)
+        stream.pending_bytes += len(raw)
+
+    def _read_source(
+        self, stream: LogStream, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue
+    ) -> None:
+        """Blocking reader: hand raw chunks to the event loop with backpressure."""
+        try:
+            for data in stream.source:
+                if stream.stopped.is_set():
+                    break
+                future = asyncio.run_coroutine_threadsafe(queue.put(data), loop)
+                while True:
+                    try:
+                        future.result(timeout=1.0)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if stream.stopped.is_set():
+                            future.cancel()
+                            return
+        except Exception as e:
+            if not stream.stopped.is_set():
+                logger.warning(f"Log stream {stream.stream_id} read error: {e}")
+        finally:
+            if not stream.stopped.is_set() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+
+    async def _flush(
+        self,
+        stream: LogStream,
+        done: bool = False,
+        reason: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Send pending lines as one frame."""
+        lines = stream.pending
+        if not lines and not done:
+            return
+        stream.pending = []
+        stream.pending_bytes = 0
+
+        if lines:
+            await stream.throttle(len(lines))
+            for line in reversed(lines):
+                if line["timestamp"]:
+                    stream.cursor = line["timestamp"]
+                    break
+
+        websocket = self._get_websocket()
+        if not websocket:
+            if not done:
+                raise ConnectionError("Not connected")
+            return
+
+        stream.seq += 1
+        stream.lines_sent += len(lines)
+        params: Dict[str, Any] = {
+            "stream_id": stream.stream_id,
+            "container": stream.container,
+            "seq": stream.seq,
+            "lines": lines,
+            "cursor": stream.cursor,
+            "done": done,
+        }
+        if done:
+            params["reason"] = reason
+            if error:
+                params["error"] = error
+
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "docker.logs.chunk",
+            "params": params,
+        }
+        try:
+            await websocket.send(json.dumps(notification))
+        except Exception as e:
+            if not done:
+                raise
+            logger.debug(f"Log stream {stream.stream_id} final frame not sent: {e}")
+
+
+class LogMethods:
+    """RPC methods for streaming container logs."""
+
+    async def subscribe(
+        self,
+        container: str,
+        since: Optional[str] = None,
+        tail: int = 100,
+        follow: bool = True,
+        lines_per_second: int = DEFAULT_LINES_PER_SECOND,
+    ) -> Dict[str, Any]:
+        """Start a log subscription pushing docker.logs.chunk frames."""
+        return await _require_manager().subscribe(
+            container,
+            since=since,
+            tail=tail,
+            follow=follow,
+            lines_per_second=lines_per_second,
+        )
+
+    async def unsubscribe(self, stream_id: str) -> Dict[str, Any]:
+        """Cancel a log subscription."""
+        cancelled = await _require_manager().unsubscribe(stream_id)
+        return {"stream_id": stream_id, "cancelled": cancelled}
+
+    def active(self) -> List[Dict[str, Any]]:
+        """List running log subscriptions."""
+        return _manager.active() if _manager else []
+
+
+_manager: Optional[LogStreamManager] = None
+
+
+def _require_manager() -> LogStreamManager:
+    """Get the manager or fail when the agent is not connected."""
+    if _manager is None:
+        raise DockerOperationError("Log streaming unavailable", operation="logs")
+    return _manager
+
+
+def get_log_streams() -> Optional[LogStreamManager]:
+    """Get the running log stream manager."""
+    return _manager
+
+
+def set_log_streams(manager: Optional[LogStreamManager]) -> None:
+    """Install (or clear) the running log stream manager."""
+    global _manager
+    _manager = manager
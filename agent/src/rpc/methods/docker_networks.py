@@ -1,12 +1,17 @@
 """Docker network RPC methods."""
 
+import asyncio
 import logging
 from typing import Any, Dict, List
 
 try:
+    from .docker_api import get_async_client, path_arg, short_id
     from .docker_client import get_client
+    from .docker_state import get_list_cache, mark_list_stale
 except ImportError:
+    from rpc.methods.docker_api import get_async_client, path_arg, short_id
     from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_state import get_list_cache, mark_list_stale
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +19,31 @@ logger = logging.getLogger(__name__)
 class NetworkMethods:
     """RPC methods for Docker network operations."""
 
-    def list(self) -> List[Dict[str, Any]]:
+    async def list(self) -> List[Dict[str, Any]]:
         """List Docker networks.
 
         Returns:
-            List of network information dictionaries.
+            List of network information dictionaries. Served from the
+            Docker state cache when it is in sync and not written since
+            its last event.
         """
-        client = get_client()
-        networks = client.networks.list()
+        cache = get_list_cache("networks")
+        if cache:
+            return cache.list_networks()
+
+        api = get_async_client()
+        if api:
+            networks = await api.get("/networks")
+            return [
+                {
+                    "id": short_id(n["Id"]),
+                    "name": n["Name"],
+                    "driver": n.get("Driver") or "bridge",
+                }
+                for n in networks
+            ]
+
+        networks = await asyncio.to_thread(get_client().networks.list)
         return [
             {
                 "id": n.short_id,
@@ -31,7 +53,7 @@ class NetworkMethods:
             for n in networks
         ]
 
-    def create(self, name: str, driver: str = "bridge") -> Dict[str, str]:
+    async def create(self, name: str, driver: str = "bridge") -> Dict[str, str]:
         """Create a network.
 
         Args:
@@ -41,11 +63,21 @@ class NetworkMethods:
         Returns:
             Created network information dictionary.
         """
-        client = get_client()
-        network = client.networks.create(name=name, driver=driver)
+        api = get_async_client()
+        if api:
+            created = await api.post(
+                "/networks/create", body={"Name": name, "Driver": driver}
+            )
+            mark_list_stale("networks")
+            return {"id": short_id(created["Id"]), "name": name}
+
+        network = await asyncio.to_thread(
+            get_client().networks.create, name=name, driver=driver
+        )
+        mark_list_stale("networks")
         return {"id": network.short_id, "name": network.name}
 
-    def remove(self, name: str) -> Dict[str, str]:
+    async def remove(self, name: str) -> Dict[str, str]:
         """Remove a network.
 
         Args:
@@ -54,7 +86,10 @@ class NetworkMethods:
         Returns:
             Status dictionary.
         """
-        client = get_client()
-        network = client.networks.get(name)
-        network.remove()
+        api = get_async_client()
+        if api:
+            await api.delete(f"/networks/{path_arg(name)}")
+        else:
+            await asyncio.to_thread(lambda: get_client().networks.get(name).remove())
+        mark_list_stale("networks")
         return {"status": "removed"}
@@ -0,0 +1,653 @@
+"""Shared Docker state cache for RPC methods.
+
+Keeps an in-memory model of containers, images, networks and volumes. The
+model is seeded once from the Docker daemon and then kept current from the
+Docker events stream, so read-only RPC methods (and the metrics container
+count) are answered without a daemon round trip per call. Container changes
+are pushed to the server as ``docker.state_changed`` notifications, which
+carry a ``live`` flag; losing sync with the daemon is pushed as one with
+``live`` false so the server stops trusting the feed until the next seed.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .docker_api import short_id
+    from .docker_client import get_client
+except ImportError:
+    from rpc.methods.docker_api import short_id
+    from rpc.methods.docker_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# Container event actions that never change inspect state. Healthchecks alone
+# emit three exec_* events per container per interval.
+IGNORED_CONTAINER_ACTIONS = (
+    "exec_",
+    "attach",
+    "detach",
+    "top",
+    "resize",
+    "copy",
+    "archive-path",
+    "extract-to-dir",
+    "export",
+    "commit",
+)
+
+# Volume actions that change the volume list (mount/unmount do not)
+VOLUME_LIST_ACTIONS = ("create", "destroy", "prune")
+
+# How long a container or object list touched by a write RPC is served from
+# the daemon while waiting for its event to arrive
+STALE_TTL_SECONDS = 10.0
+
+# Object lists that write RPCs can mark stale
+OBJECT_LISTS = ("images", "networks", "volumes")
+
+RESEED_MAX_BACKOFF = 60
+
+
+def container_status(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the container status summary from inspect attributes.
+
+    Args:
+        attrs: Container inspect attributes.
+
+    Returns:
+        Dict with status, health, restart_count, running and timestamps.
+    """
+    state = attrs.get("State") or {}
+    health = state.get("Health") or {}
+    return {
+        "status": state.get("Status", "unknown"),
+        "health": health.get("Status", "none") if health else "none",
+        "restart_count": attrs.get("RestartCount", 0),
+        "running": state.get("Running", False),
+        "started_at": state.get("StartedAt"),
+        "finished_at": state.get("FinishedAt"),
+    }
+
+
+def container_change(attrs: Dict[str, Any], action: str) -> Dict[str, Any]:
+    """Build the pushed change record for a container.
+
+    Args:
+        attrs: Container inspect attributes.
+        action: Docker event action that triggered the change.
+
+    Returns:
+        Change dict with identity, status summary, networks and mounts.
+    """
+    networks = (attrs.get("NetworkSettings") or {}).get("Networks") or {}
+    return {
+        "id": attrs.get("Id", ""),
+        "name": (attrs.get("Name") or "").lstrip("/"),
+        "action": action,
+        **container_status(attrs),
+        "networks": list(networks.keys()),
+        "mounts": [
+            {
+                "type": m.get("Type", ""),
+                "name": m.get("Name", ""),
+                "source": m.get("Source", ""),
+                "destination": m.get("Destination", ""),
+                "mode": m.get("Mode", "rw"),
+            }
+            for m in attrs.get("Mounts") or []
+        ],
+    }
+
+
+def _image_tags(summary: Dict[str, Any]) -> List[str]:
+    """Get the usable tags of an image summary."""
+    return [t for t in summary.get("RepoTags") or [] if t != "<none>:<none>"]
+
+
+class DockerStateCache:
+    """In-memory Docker object model kept current from the events stream."""
+
+    def __init__(self, get_websocket: Callable[[], Optional[Any]]):
+        """Initialize the state cache.
+
+        Args:
+            get_websocket: Callback to get current websocket connection.
+        """
+        self._get_websocket = get_websocket
+        self._containers: Dict[str, Dict[str, Any]] = {}
+        self._images: Dict[str, Dict[str, Any]] = {}
+        self._networks: Dict[str, Dict[str, Any]] = {}
+        self._volumes: Dict[str, Dict[str, Any]] = {}
+        self._stale: Dict[str, float] = {}
+        self._stale_lists: Dict[str, float] = {}
+        self._live = False
+        self._synced_at: Optional[float] = None
+        self._updated_at: Optional[float] = None
+        self._stream: Optional[Any] = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_live(self) -> bool:
+        """Whether the cache is seeded and following the events stream."""
+        return self._live
+
+    @property
+    def updated_at(self) -> Optional[float]:
+        """Unix time of the last seed or applied event batch."""
+        return self._updated_at
+
+    async def start(self) -> None:
+        """Start seeding and following Docker events."""
+        self._task = asyncio.create_task(self._run())
+        logger.info("Docker state cache started")
+
+    async def stop(self) -> None:
+        """Stop following Docker events."""
+        self._live = False
+        self._close_stream()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Docker state cache stopped")
+
+    # -------------------------------------------------------------------------
+    # Read API (called from RPC methods on the event loop)
+    # -------------------------------------------------------------------------
+
+    def find_container(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Find a container by ID, name or unique ID prefix.
+
+        Returns None when the container is unknown or was touched by a write
+        that has not been confirmed by an event yet, so callers fall back
+        to the daemon.
+
+        Args:
+            ref: Container ID, short ID or name.
+
+        Returns:
+            Inspect attributes or None.
+        """
+        attrs = self._containers.get(ref)
+        if attrs is None:
+            name = ref.lstrip("/")
+            matches = [
+                a
+                for a in self._containers.values()
+                if (a.get("Name") or "").lstrip("/") == name
+            ]
+            if not matches:
+                matches = [
+                    a for cid, a in self._containers.items() if cid.startswith(ref)
+                ]
+            if len(matches) != 1:
+                return None
+            attrs = matches[0]
+        if self._is_stale(attrs.get("Id", "")):
+            return None
+        return attrs
+
+    def has_pending_writes(self) -> bool:
+        """Whether any container write is still awaiting its event."""
+        return any(self._is_stale(cid) for cid in list(self._stale))
+
+    def mark_stale(self, ref: str) -> None:
+        """Serve a container from the daemon until its next event arrives.
+
+        Args:
+            ref: Container ID, short ID or name just written to.
+        """
+        container_id = ref
+        for cid, attrs in self._containers.items():
+            if cid.startswith(ref) or (attrs.get("Name") or "").lstrip("/") == ref:
+                container_id = cid
+                break
+        self._stale[container_id] = time.monotonic()
+
+    def mark_list_stale(self, kind: str) -> None:
+        """Serve an object list from the daemon until its next event arrives.
+
+        Args:
+            kind: One of ``OBJECT_LISTS``, just written to.
+        """
+        self._stale_lists[kind] = time.monotonic()
+
+    def serves_list(self, kind: str) -> bool:
+        """Whether an object list can be served from the cache.
+
+        Args:
+            kind: One of ``OBJECT_LISTS``.
+        """
+        marked = self._stale_lists.get(kind)
+        if marked is None:
+            return True
+        if time.monotonic() - marked > STALE_TTL_SECONDS:
+            self._stale_lists.pop(kind, None)
+            return True
+        return False
+
+    def list_containers(self, all: bool = False) -> List[Dict[str, Any]]:
+        """List containers in ``docker.containers.list`` format."""
+        containers = sorted(
+            self._containers.values(),
+            key=lambda a: a.get("Created", ""),
+            reverse=True,
+        )
+        result = []
+        for attrs in containers:
+            state = attrs.get("State") or {}
+            if not all and not state.get("Running", False):
+                continue
+            image_id = attrs.get("Image", "")
+            image = self._images.get(image_id)
+            tags = _image_tags(image) if image else []
+            result.append(
+                {
+                    "id": attrs.get("Id", "")[:12],
+                    "name": (attrs.get("Name") or "").lstrip("/"),
+                    "status": state.get("Status", "unknown"),
+                    "image": tags[0] if tags else short_id(image_id),
+                }
+            )
+        return result
+
+    def container_counts(self) -> Tuple[int, int]:
+        """Count running and stopped containers.
+
+        Returns:
+            Tuple of (running, stopped).
+        """
+        running = sum(
+            1
+            for a in self._containers.values()
+            if (a.get("State") or {}).get("Status") == "running"
+        )
+        return running, len(self._containers) - running
+
+    def list_images(self) -> List[Dict[str, Any]]:
+        """List images in ``docker.images.list`` format."""
+        return [
+            {
+                "id": short_id(image_id),
+                "tags": _image_tags(summary),
+                "size": summary.get("Size", 0),
+            }
+            for image_id, summary in self._images.items()
+        ]
+
+    def list_networks(self) -> List[Dict[str, Any]]:
+        """List networks in ``docker.networks.list`` format."""
+        return [
+            {
+                "id": network_id[:12],
+                "name": summary.get("Name"),
+                "driver": summary.get("Driver", "bridge"),
+            }
+            for network_id, summary in self._networks.items()
+        ]
+
+    def list_volumes(self) -> List[Dict[str, Any]]:
+        """List volumes in ``docker.volumes.list`` format."""
+        return [
+            {
+                "name": name,
+                "driver": summary.get("Driver", "local"),
+                "mountpoint": summary.get("Mountpoint", ""),
+            }
+            for name, summary in self._volumes.items()
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the full cached model with freshness information."""
+        return {
+            "live": self._live,
+            "synced_at": self._synced_at,
+            "as_of": self._updated_at,
+            "containers": [
+                container_change(attrs, "snapshot")
+                for attrs in self._containers.values()
+            ],
+            "images": self.list_images(),
+            "networks": self.list_networks(),
+            "volumes": self.list_volumes(),
+        }
+
+    def _is_stale(self, container_id: str) -> bool:
+        """Check whether a container write is still awaiting its event."""
+        marked = self._stale.get(container_id)
+        if marked is None:
+            return False
+        if time.monotonic() - marked > STALE_TTL_SECONDS:
+            self._stale.pop(container_id, None)
+            return False
+        return True
+
+    # -------------------------------------------------------------------------
+    # Seeding and event following
+    # -------------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        """Seed the model and follow events, reseeding after stream loss."""
+        backoff = 1
+        while True:
+            try:
+                # Events are replayed from before the seed so nothing that
+                # happens while seeding is lost; re-applying them is harmless.
+                since = int(time.time())
+                await self._seed()
+                backoff = 1
+                await self._notify(
+                    [
+                        container_change(a, "snapshot")
+                        for a in self._containers.values()
+                    ],
+                    full=True,
+                )
+                await self._follow_events(since)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Docker state cache out of sync: {e}")
+
+            if self._live:
+                self._live = False
+                await self._notify([])
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RESEED_MAX_BACKOFF)
+
+    async def _seed(self) -> None:
+        """Load every Docker object once."""
+        containers, images, networks, volumes = await asyncio.to_thread(self._load_all)
+        self._containers = containers
+        self._images = images
+        self._networks = networks
+        self._volumes = volumes
+        self._stale.clear()
+        self._synced_at = self._updated_at = time.time()
+        self._live = True
+        logger.info(
+            "Docker state cache seeded: %d containers, %d images",
+            len(containers),
+            len(images),
+        )
+
+    def _load_all(self) -> Tuple[Dict, Dict, Dict, Dict]:
+        """Fetch containers, images, networks and volumes (worker thread)."""
+        api = get_client().api
+        containers = {}
+        for summary in api.containers(all=True):
+            attrs = self._inspect_container(summary["Id"])
+            if attrs is not None:
+                containers[attrs["Id"]] = attrs
+        return (
+            containers,
+            self._load_images(),
+            self._load_networks(),
+            self._load_volumes(),
+        )
+
+    def _inspect_container(self, container_id: str) -> Optional[Dict[str, Any]]:
+        """Inspect one container, returning None if it no longer exists."""
+        try:
+            return get_client().api.inspect_container(container_id)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 404:
+                return None
+            raise
+
+    def _load_images(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch image summaries in one call."""
+        return {i["Id"]: i for i in get_client().api.images()}
+
+    def _load_networks(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch network summaries in one call."""
+        return {n["Id"]: n for n in get_client().api.networks()}
+
+    def _load_volumes(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch volume summaries in one call."""
+        volumes = get_client().api.volumes().get("Volumes") or []
+        return {v["Name"]: v for v in volumes}
+
+    async def _follow_events(self, since: int) -> None:
+        """Apply events from the Docker events stream until it ends."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._stream = await asyncio.to_thread(
+            get_client().events, since=since, decode=True
+        )
+        # A dedicated daemon thread, so a blocked stream never holds up
+        # interpreter or default executor shutdown
+        threading.Thread(
+            target=self._pump_events,
+            args=(self._stream, loop, queue),
+            name="docker-events",
+            daemon=True,
+        ).start()
+
+        try:
+            while True:
+                event = await queue.get()
+                batch = [event]
+                # Coalesce bursts (compose up, prune) into one refresh pass
+                while event is not None and not queue.empty():
+                    event = queue.get_nowait()
+                    batch.append(event)
+                events = [e for e in batch if e is not None]
+                if events:
+                    await self._apply_events(events)
+                if event is None:
+                    logger.warning("Docker events stream ended")
+                    return
+        finally:
+            self._close_stream()
+
+    @staticmethod
+    def _pump_events(
+        stream: Any, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue
+    ) -> None:
+        """Forward events from the blocking stream to the loop (worker thread)."""
+        try:
+            for event in stream:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            logger.debug(f"Docker events stream error: {e}")
+        finally:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+
+    def _close_stream(self) -> None:
+        """Close the events stream, unblocking the pump thread."""
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+    async def _apply_events(self, events: List[Dict[str, Any]]) -> None:
+        """Refresh the objects touched by a batch of events and notify."""
+        refresh: Dict[str, str] = {}
+        names: Dict[str, str] = {}
+        reload_images = reload_networks = reload_volumes = False
+
+        for event in events:
+            kind = event.get("Type")
+            action = event.get("Action") or event.get("status") or ""
+            actor = event.get("Actor") or {}
+            attributes = actor.get("Attributes") or {}
+            object_id = actor.get("ID") or event.get("id") or ""
+
+            if kind == "container":
+                if action.startswith(IGNORED_CONTAINER_ACTIONS):
+                    continue
+                refresh[object_id] = action
+                if attributes.get("name"):
+                    names[object_id] = attributes["name"]
+            elif kind == "image":
+                reload_images = True
+            elif kind == "network":
+                reload_networks = True
+                container_id = attributes.get("container")
+                if container_id and container_id not in refresh:
+                    refresh[container_id] = action
+            elif kind == "volume" and action in VOLUME_LIST_ACTIONS:
+                reload_volumes = True
+
+        if not (refresh or reload_images or reload_networks or reload_volumes):
+            return
+
+        # Destroyed containers are gone; only inspect the ones still around
+        to_inspect = [cid for cid, action in refresh.items() if action != "destroy"]
+        fetched = await asyncio.to_thread(
+            self._fetch, to_inspect, reload_images, reload_networks, reload_volumes
+        )
+        containers, images, networks, volumes = fetched
+
+        changes = []
+        for container_id, action in refresh.items():
+            self._stale.pop(container_id, None)
+            attrs = containers.get(container_id)
+            if attrs is None:
+                previous = self._containers.pop(container_id, None)
+                if previous is None and container_id not in names:
+                    continue
+                changes.append(
+                    {
+                        "id": container_id,
+                        "name": (previous or {}).get("Name", "").lstrip("/")
+                        or names.get(container_id, ""),
+                        "action": action,
+                        "removed": True,
+                    }
+                )
+            else:
+                self._containers[container_id] = attrs
+                changes.append(container_change(attrs, action))
+
+        if images is not None:
+            self._images = images
+            self._stale_lists.pop("images", None)
+        if networks is not None:
+            self._networks = networks
+            self._stale_lists.pop("networks", None)
+        if volumes is not None:
+            self._volumes = volumes
+            self._stale_lists.pop("volumes", None)
+        self._updated_at = time.time()
+
+        await self._notify(changes)
+
+    def _fetch(
+        self,
+        container_ids: List[str],
+        reload_images: bool,
+        reload_networks: bool,
+        reload_volumes: bool,
+    ) -> Tuple[Dict, Optional[Dict], Optional[Dict], Optional[Dict]]:
+        """Fetch the objects touched by an event batch (worker thread)."""
+        containers = {}
+        for container_id in container_ids:
+            attrs = self._inspect_container(container_id)
+            if attrs is not None:
+                containers[container_id] = attrs
+        return (
+            containers,
+            self._load_images() if reload_images else None,
+            self._load_networks() if reload_networks else None,
+            self._load_volumes() if reload_volumes else None,
+        )
+
+    async def _notify(self, changes: List[Dict[str, Any]], full: bool = False) -> None:
+        """Push container changes, or the loss of sync, to the server."""
+        if not changes and not full and self._live:
+            return
+        websocket = self._get_websocket()
+        if not websocket:
+            return
+
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "docker.state_changed",
+            "params": {
+                "live": self._live,
+                "full": full,
+                "as_of": self._updated_at,
+                "containers": changes,
+            },
+        }
+        try:
+            await websocket.send(json.dumps(notification))
+            logger.debug(f"Docker state pushed: {len(changes)} container change(s)")
+        except Exception as e:
+            logger.error(f"Docker state push error: {e}")
+
+
+class StateMethods:
+    """RPC methods exposing the Docker state cache."""
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the cached Docker model with its freshness timestamps."""
+        cache = get_state_cache()
+        if cache is None:
+            return {
+                "live": False,
+                "synced_at": None,
+                "as_of": None,
+                "containers": [],
+                "images": [],
+                "networks": [],
+                "volumes": [],
+            }
+        return cache.snapshot()
+
+
+_cache: Optional[DockerStateCache] = None
+
+
+def get_state_cache() -> Optional[DockerStateCache]:
+    """Get the running state cache, if any."""
+    return _cache
+
+
+def get_live_cache() -> Optional[DockerStateCache]:
+    """Get the state cache only when it is in sync with the daemon."""
+    if _cache is not None and _cache.is_live:
+        return _cache
+    return None
+
+
+def get_list_cache(kind: str) -> Optional[DockerStateCache]:
+    """Get the live state cache only when it can serve an object list.
+
+    Args:
+        kind: One of ``OBJECT_LISTS``.
+    """
+    cache = get_live_cache()
+    if cache is not None and cache.serves_list(kind):
+        return cache
+    return None
+
+
+def mark_list_stale(kind: str) -> None:
+    """Tell the state cache, if any, that an object list was just written.
+
+    Args:
+        kind: One of ``OBJECT_LISTS``.
+    """
+    if _cache is not None:
+        _cache.mark_list_stale(kind)
+
+
+def set_state_cache(cache: Optional[DockerStateCache]) -> None:
+    """Set (or clear) the global state cache."""
+    global _cache
+    _cache = cache
@@ -0,0 +1,326 @@
+"""Streaming container resource stats.
+
+A one-shot ``stats(stream=False)`` call takes about two seconds because the
+daemon has to take two samples, so polling many containers is slow. The
+collector instead keeps one streaming stats subscription per running
+container, computes CPU, memory, network and block I/O from consecutive
+samples as they arrive, and every ``stats_interval`` seconds pushes the
+latest figures for all containers as a single ``docker.stats.batch``
+notification.
+
+Subscriptions follow the set of running containers: they are opened for new
+containers and closed for stopped ones at every interval. With the asyncio
+Docker client each subscription is a dedicated socket outside the request
+pool; with the docker-py fallback each one is read by its own thread.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .docker_api import get_async_client
+    from .docker_client import get_client
+    from .docker_state import get_live_cache
+except ImportError:
+    from rpc.methods.docker_api import get_async_client
+    from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_state import get_live_cache
+
+logger = logging.getLogger(__name__)
+
+# Containers followed at once
+MAX_SUBSCRIPTIONS = 200
+
+
+def summarize(
+    sample: Dict[str, Any], previous: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Reduce a raw stats sample to the figures sent to the server.
+
+    CPU usage is the share of host CPU time used between the previous
+    sample and this one, scaled to the number of online CPUs like
+    ``docker stats``. Memory excludes the reclaimable page cache. Network
+    and block I/O are cumulative byte counters.
+
+    Args:
+        sample: Sample from the Docker stats endpoint.
+        previous: The sample before it on the same stream; without one the
+            daemon's own ``precpu_stats`` are used.
+
+    Returns:
+        Compact per-container stats.
+    """
+    cpu = sample.get("cpu_stats") or {}
+    precpu = (previous or {}).get("cpu_stats") or sample.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (
+        precpu.get("cpu_usage") or {}
+    ).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    cpus = cpu.get("online_cpus") or len(
+        (cpu.get("cpu_usage") or {}).get("percpu_usage") or []
+    )
+    cpu_percent = 0.0
+    if system_delta > 0 and cpu_delta > 0:
+        cpu_percent = cpu_delta / system_delta * (cpus or 1) * 100.0
+
+    memory = sample.get("memory_stats") or {}
+    memory_detail = memory.get("stats") or {}
+    # cgroup v2 reports inactive_file, cgroup v1 total_inactive_file
+    inactive = memory_detail.get(
+        "inactive_file", memory_detail.get("total_inactive_file", 0)
+    )
+    memory_usage = max(0, memory.get("usage", 0) - inactive)
+
+    networks = (sample.get("networks") or {}).values()
+    blkio = (sample.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+
+    return {
+        "cpu": round(cpu_percent, 2),
+        "mem": memory_usage,
+        "mem_limit": memory.get("limit", 0),
+        "net_rx": sum(n.get("rx_bytes", 0) for n in networks),
+        "net_tx": sum(n.get("tx_bytes", 0) for n in networks),
+        "blk_read": sum(
+            e.get("value", 0) for e in blkio if (e.get("op") or "").lower() == "read"
+        ),
+        "blk_write": sum(
+            e.get("value", 0) for e in blkio if (e.get("op") or "").lower() == "write"
+        ),
+        "pids": (sample.get("pids_stats") or {}).get("current", 0),
+    }
+
+
+class StatsSubscription:
+    """Streaming stats of a single container."""
+
+    def __init__(self, container_id: str, name: str) -> None:
+        self.container_id = container_id
+        self.name = name
+        self.previous: Optional[Dict[str, Any]] = None
+        self.latest: Optional[Dict[str, Any]] = None
+        # Set when a sample arrived since the last batch
+        self.fresh = False
+        self.task: Optional[asyncio.Task] = None
+        self.stopped = threading.Event()
+
+    def add(self, sample: Dict[str, Any]) -> None:
+        """Compute the figures of a new sample."""
+        # The daemon sends a sample without a read time for stopped containers
+        if not sample.get("cpu_stats"):
+            return
+        self.latest = summarize(sample, self.previous)
+        self.previous = sample
+        self.fresh = True
+
+    def entry(self) -> Dict[str, Any]:
+        """Batch entry with the container's latest figures."""
+        return {"id": self.container_id, "name": self.name, **(self.latest or {})}
+
+
+class ContainerStatsCollector:
+    """Follows running containers' stats and pushes them in batches."""
+
+    def __init__(
+        self,
+        get_interval: Callable[[], int],
+        get_websocket: Callable[[], Optional[Any]],
+    ) -> None:
+        """Initialize the collector.
+
+        Args:
+            get_interval: Function returning the batch interval in seconds.
+            get_websocket: Function returning the current websocket.
+        """
+        self._get_interval = get_interval
+        self._get_websocket = get_websocket
+        self._subscriptions: Dict[str, StatsSubscription] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start following containers."""
+        self._task = asyncio.create_task(self._run())
+        logger.info("Container stats collector started")
+
+    async def stop(self) -> None:
+        """Stop the batches and close every subscription."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for container_id in list(self._subscriptions):
+            await self._unsubscribe(container_id)
+        logger.info("Container stats collector stopped")
+
+    def find(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Latest figures of a container by ID, ID prefix or name."""
+        name = ref.lstrip("/")
+        for sub in self._subscriptions.values():
+            if sub.latest and (
+                sub.name == name
+                or sub.container_id.startswith(ref)
+                or ref.startswith(sub.container_id)
+            ):
+                return sub.latest
+        return None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Latest figures of every followed container."""
+        return [s.entry() for s in self._subscriptions.values() if s.latest]
+
+    async def _run(self) -> None:
+        """Reconcile subscriptions and push a batch every interval."""
+        while True:
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.error(f"Container stats sync error: {e}")
+            await asyncio.sleep(self._get_interval())
+            try:
+                await self._push()
+            except Exception as e:
+                logger.error(f"Container stats push error: {e}")
+
+    async def _sync(self) -> None:
+        """Follow new running containers and drop stopped ones."""
+        running = await self._running_containers()
+        for container_id in list(self._subscriptions):
+            if container_id not in running:
+                await self._unsubscribe(container_id)
+        for container_id, name in running.items():
+            sub = self._subscriptions.get(container_id)
+            if sub:
+                sub.name = name
+            elif len(self._subscriptions) < MAX_SUBSCRIPTIONS:
+                self._subscribe(container_id, name)
+
+    async def _running_containers(self) -> Dict[str, str]:
+        """Map the short IDs of running containers to their names."""
+        cache = get_live_cache()
+        if cache:
+            return {c["id"]: c["name"] for c in cache.list_containers()}
+        api = get_async_client()
+        if api:
+            summaries = await api.get("/containers/json")
+        else:
+            summaries = await asyncio.to_thread(get_client().api.containers)
+        return {
+            s["Id"][:12]: ((s.get("Names") or [""])[0]).lstrip("/") for s in summaries
+        }
+
+    def _subscribe(self, container_id: str, name: str) -> None:
+        """Open a stats stream for a container."""
+        sub = StatsSubscription(container_id, name)
+        self._subscriptions[container_id] = sub
+        sub.task = asyncio.create_task(self._follow(sub))
+
+    async def _unsubscribe(self, container_id: str) -> None:
+        """Close a container's stats stream."""
+        sub = self._subscriptions.pop(container_id, None)
+        if sub is None:
+            return
+        sub.stopped.set()
+        if sub.task:
+            sub.task.cancel()
+            await asyncio.gather(sub.task, return_exceptions=True)
+
+    async def _follow(self, sub: StatsSubscription) -> None:
+        """Feed a stream's samples to its subscription until it ends.
+
+        A subscription whose stream ended is dropped; the next sync opens
+        a new one if the container is still running.
+        """
+        try:
+            api = get_async_client()
+            if api:
+                async for sample in api.stream(
+                    "GET",
+                    f"/containers/{sub.container_id}/stats",
+                    {"stream": True},
+                    pooled=False,
+                ):
+                    sub.add(sample)
+            else:
+                await self._follow_in_thread(sub)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Stats stream for {sub.name} ended: {e}")
+        finally:
+            sub.stopped.set()
+            if self._subscriptions.get(sub.container_id) is sub:
+                del self._subscriptions[sub.container_id]
+
+    async def _follow_in_thread(self, sub: StatsSubscription) -> None:
+        """Read a docker-py stats stream in a dedicated thread."""
+        loop = asyncio.get_running_loop()
+        ended = asyncio.Event()
+
+        def read() -> None:
+            try:
+                source = get_client().api.stats(
+                    sub.container_id, stream=True, decode=True
+                )
+                for sample in source:
+                    if sub.stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(sub.add, sample)
+            except Exception as e:
+                if not sub.stopped.is_set():
+                    logger.debug(f"Stats stream for {sub.name} failed: {e}")
+            finally:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(ended.set)
+
+        threading.Thread(
+            target=read, name=f"stats-{sub.container_id}", daemon=True
+        ).start()
+        await ended.wait()
+
+    async def _push(self) -> None:
+        """Send the figures that changed since the last batch."""
+        websocket = self._get_websocket()
+        if not websocket:
+            return
+        fresh = [s for s in self._subscriptions.values() if s.fresh]
+        if not fresh:
+            return
+        for sub in fresh:
+            sub.fresh = False
+
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "docker.stats.batch",
+            "params": {
+                "timestamp": time.time(),
+                "interval": self._get_interval(),
+                "containers": [s.entry() for s in fresh],
+            },
+        }
+        await websocket.send(json.dumps(notification))
+        logger.debug(f"Container stats pushed for {len(fresh)} containers")
+
+
+class StatsMethods:
+    """RPC methods for streamed container stats."""
+
+    def latest(self) -> List[Dict[str, Any]]:
+        """Latest figures of every followed container."""
+        return _collector.snapshot() if _collector else []
+
+
+_collector: Optional[ContainerStatsCollector] = None
+
+
+def get_stats_collector() -> Optional[ContainerStatsCollector]:
+    """Get the running container stats collector."""
+    return _collector
+
+
+def set_stats_collector(collector: Optional[ContainerStatsCollector]) -> None:
+    """Install (or clear) the running container stats collector."""
+    global _collector
+    _collector = collector
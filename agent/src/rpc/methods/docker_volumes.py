@@ -1,12 +1,17 @@
 """Docker volume RPC methods."""
 
+import asyncio
 import logging
 from typing import Any, Dict, List
 
 try:
+    from .docker_api import get_async_client, path_arg
     from .docker_client import get_client
+    from .docker_state import get_list_cache, mark_list_stale
 except ImportError:
+    from rpc.methods.docker_api import get_async_client, path_arg
     from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_state import get_list_cache, mark_list_stale
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +19,31 @@ logger = logging.getLogger(__name__)
 class VolumeMethods:
     """RPC methods for Docker volume operations."""
 
-    def list(self) -> List[Dict[str, Any]]:
+    async def list(self) -> List[Dict[str, Any]]:
         """List Docker volumes.
 
         Returns:
-            List of volume information dictionaries.
+            List of volume information dictionaries. Served from the
+            Docker state cache when it is in sync and not written since
+            its last event.
         """
-        client = get_client()
-        volumes = client.volumes.list()
+        cache = get_list_cache("volumes")
+        if cache:
+            return cache.list_volumes()
+
+        api = get_async_client()
+        if api:
+            result = await api.get("/volumes")
+            return [
+                {
+                    "name": v["Name"],
+                    "driver": v.get("Driver", "local"),
+                    "mountpoint": v.get("Mountpoint", ""),
+                }
+                for v in result.get("Volumes") or []
+            ]
+
+        volumes = await asyncio.to_thread(get_client().volumes.list)
         return [
             {
                 "name": v.name,
@@ -31,7 +53,7 @@ class VolumeMethods:
             for v in volumes
         ]
 
-    def create(self, name: str, driver: str = "local") -> Dict[str, str]:
+    async def create(self, name: str, driver: str = "local") -> Dict[str, str]:
         """Create a volume.
 
         Args:
@@ -41,11 +63,21 @@ class VolumeMethods:
         Returns:
             Created volume information dictionary.
         """
-        client = get_client()
-        volume = client.volumes.create(name=name, driver=driver)
+        api = get_async_client()
+        if api:
+            attrs = await api.post(
+                "/volumes/create", body={"Name": name, "Driver": driver}
+            )
+            mark_list_stale("volumes")
+            return {"name": attrs["Name"], "driver": attrs.get("Driver", driver)}
+
+        volume = await asyncio.to_thread(
+            get_client().volumes.create, name=name, driver=driver
+        )
+        mark_list_stale("volumes")
         return {"name": volume.name, "driver": volume.attrs.get("Driver", driver)}
 
-    def remove(self, name: str, force: bool = False) -> Dict[str, str]:
+    async def remove(self, name: str, force: bool = False) -> Dict[str, str]:
         """Remove a volume.
 
         Args:
@@ -55,12 +87,17 @@ class VolumeMethods:
         Returns:
             Status dictionary.
         """
-        client = get_client()
-        volume = client.volumes.get(name)
-        volume.remove(force=force)
+        api = get_async_client()
+        if api:
+            await api.delete(f"/volumes/{path_arg(name)}", {"force": force})
+        else:
+            await asyncio.to_thread(
+                lambda: get_client().volumes.get(name).remove(force=force)
+            )
+        mark_list_stale("volumes")
         return {"status": "removed"}
 
-    def prune(self, filter: str = None) -> Dict[str, Any]:
+    async def prune(self, filter: str = None) -> Dict[str, Any]:
         """Remove unused volumes.
 
         Args:
@@ -69,13 +106,21 @@ class VolumeMethods:
         Returns:
             Prune result with space reclaimed.
         """
-        client = get_client()
         filters = {}
         if filter:
             # Parse filter string like "label=container=myapp"
             if filter.startswith("label="):
                 filters["label"] = [filter[6:]]
-        result = client.volumes.prune(filters=filters if filters else None)
+        api = get_async_client()
+        if api:
+            result = await api.post(
+                "/volumes/prune", {"filters": filters if filters else None}
+            )
+        else:
+            result = await asyncio.to_thread(
+                get_client().volumes.prune, filters=filters if filters else None
+            )
+        mark_list_stale("volumes")
         return {
             "deleted": result.get("VolumesDeleted") or [],
             "space_reclaimed": result.get("SpaceReclaimed", 0),
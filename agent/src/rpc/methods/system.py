@@ -37,11 +37,14 @@ def _redact_command_for_logging(command: str) -> str:
         return redacted[:100] + "..."
     return redacted
 
+
 try:
     from .docker_client import get_client
+    from .docker_state import get_live_cache
     from ...security import validate_command, acquire_command_slot, release_command_slot
 except ImportError:
     from rpc.methods.docker_client import get_client
+    from rpc.methods.docker_state import get_live_cache
     from security import validate_command, acquire_command_slot, release_command_slot
 
 logger = logging.getLogger(__name__)
@@ -228,116 +231,6 @@ class SystemMethods:
             },
         }
 
-    # Allowed writable paths for volume preparation (security boundary)
-    ALLOWED_DATA_PATHS = ["/DATA", "/opt/tomo"]
-
-    def prepare_volumes(
-        self, volumes: list, default_uid: int = 1000, default_gid: int = 1000
-    ) -> Dict[str, Any]:
-        """Prepare host directories for volume mounts.
-
-        Creates directories and sets ownership so containers can write to them.
-        Only paths under allowed directories can be prepared (security).
-
-        Args:
-            volumes: List of volume dicts with 'host' path and optional 'uid'/'gid'
-            default_uid: Default UID if not specified per volume
-            default_gid: Default GID if not specified per volume
-
-        Returns:
-            Dict with success status and details per volume
-        """
-        results = []
-        errors = []
-
-        # Determine host filesystem prefix (agent runs in container with / mounted at /host)
-        host_prefix = "/host" if os.path.exists("/host") else ""
-
-        for vol in volumes:
-            host_path = vol.get("host", "")
-            if not host_path:
-                continue
-
-            # Skip named volumes (no leading /)
-            if not host_path.startswith("/"):
-                results.append(
-                    {"path": host_path, "status": "skipped", "reason": "named volume"}
-                )
-                continue
-
-            # Security check: only allow paths under approved directories
-            path_allowed = any(
-                host_path.startswith(allowed) for allowed in self.ALLOWED_DATA_PATHS
-            )
-            if not path_allowed:
-                logger.warning(
-                    f"Volume path not in allowed directories: {host_path}. "
-                    f"Allowed: {self.ALLOWED_DATA_PATHS}"
-                )
-                results.append(
-                    {
-                        "path": host_path,
-                        "status": "skipped",
-                        "reason": f"not in allowed paths: {self.ALLOWED_DATA_PATHS}",
-                    }
-                )
-                continue
-
-            # Get ownership - use volume-specific or defaults
-            uid = vol.get("uid", default_uid)
-            gid = vol.get("gid", default_gid)
-
-            # Map to host filesystem
-            full_path = f"{host_prefix}{host_path}"
-
-            try:
-                # Create directory if not exists
-                os.makedirs(full_path, mode=0o755, exist_ok=True)
-
-                # Set ownership
-                os.chown(full_path, uid, gid)
-
-                # Also recursively set ownership for existing contents
-                for root, dirs, files in os.walk(full_path):
-                    for d in dirs:
-                        try:
-                            os.chown(os.path.join(root, d), uid, gid)
-                        except OSError:
-                            pass
-                    for f in files:
-                        try:
-                            os.chown(os.path.join(root, f), uid, gid)
-                        except OSError:
-                            pass
-
-                logger.info(f"Prepared volume: {host_path} (uid={uid}, gid={gid})")
-                results.append(
-                    {
-                        "path": host_path,
-                        "status": "ok",
-                        "uid": uid,
-                        "gid": gid,
-                    }
-                )
-
-            except PermissionError as e:
-                logger.error(f"Permission denied preparing {host_path}: {e}")
-                errors.append(f"Permission denied: {host_path}")
-                results.append(
-                    {"path": host_path, "status": "error", "error": "permission denied"}
-                )
-
-            except Exception as e:
-                logger.error(f"Error preparing volume {host_path}: {e}")
-                errors.append(f"Failed to prepare {host_path}: {str(e)}")
-                results.append({"path": host_path, "status": "error", "error": str(e)})
-
-        return {
-            "success": len(errors) == 0,
-            "results": results,
-            "errors": errors,
-        }
-
     def get_metrics(self) -> Dict[str, Any]:
         """Get current system metrics."""
         cpu_percent = psutil.cpu_percent(interval=1)
@@ -346,15 +239,19 @@ class SystemMethods:
 
         running = 0
         stopped = 0
-        try:
-            client = get_client()
-            for c in client.containers.list(all=True):
-                if c.status == "running":
-                    running += 1
-                else:
-                    stopped += 1
-        except Exception:
-            pass
+        cache = get_live_cache()
+        if cache:
+            running, stopped = cache.container_counts()
+        else:
+            try:
+                client = get_client()
+                for c in client.containers.list(all=True):
+                    if c.status == "running":
+                        running += 1
+                    else:
+                        stopped += 1
+            except Exception:
+                pass
 
         return {
             "cpu": cpu_percent,
@@ -0,0 +1,426 @@
+"""Streaming command execution.
+
+``system.exec_stream`` runs an allowlisted command as an asyncio subprocess
+and returns as soon as it has started. Output is pushed to the server as
+``system.exec.output`` notifications carrying the caller's ``stream_id``:
+complete stdout and stderr lines, bounded per frame, followed by a final
+``done`` frame with the exit code. Pipes are read through a bounded queue
+that only drains while frames are accepted by the websocket, so a slow
+connection stalls the command on its pipe instead of growing agent memory.
+"""
+
+import asyncio
+import codecs
+import json
+import logging
+import os
+import re
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .system import _prepare_command, _redact_command_for_logging
+    from ..errors import RateLimitError, SecurityError
+    from ...security import validate_command, acquire_command_slot, release_command_slot
+except ImportError:
+    from rpc.methods.system import _prepare_command, _redact_command_for_logging
+    from rpc.errors import RateLimitError, SecurityError
+    from security import validate_command, acquire_command_slot, release_command_slot
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAMS = 4
+MAX_FRAME_LINES = 500
+MAX_FRAME_BYTES = 64 * 1024
+MAX_LINE_CHARS = 16 * 1024
+READ_SIZE = 16 * 1024
+FLUSH_INTERVAL = 0.25
+# Raw pipe reads buffered between the readers and the sender
+READ_QUEUE_SIZE = 16
+DEFAULT_TIMEOUT = 600
+
+STREAM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]{1,64}$")
+# Both \n and \r end a line so progress bars redrawn with a carriage
+# return produce one line per update
+_LINE_BREAK = re.compile(r"[\r\n]+")
+
+
+class LineBuffer:
+    """Incrementally split one pipe's output into non-blank lines."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes) -> List[str]:
+        """Return the lines completed by data; a trailing partial line is kept."""
+        parts = _LINE_BREAK.split(self._partial + self._decoder.decode(data))
+        self._partial = parts.pop()
+        if len(self._partial) > MAX_LINE_CHARS:
+            # Emit runaway lines in pieces rather than buffering them whole
+            parts.append(self._partial)
+            self._partial = ""
+        return [line for line in parts if line.strip()]
+
+    def flush(self) -> List[str]:
+        """Return the trailing partial line once the pipe is closed."""
+        rest = (self._partial + self._decoder.decode(b"", final=True)).strip()
+        self._partial = ""
+        return [rest] if rest else []
+
+
+class ExecStream:
+    """State of a single streaming command."""
+
+    def __init__(self, stream_id: str, command: str, timeout: int) -> None:
+        self.stream_id = stream_id
+        self.command = command
+        self.timeout = timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.task: Optional[asyncio.Task] = None
+        self.seq = 0
+        self.pending: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        self.pending_lines = 0
+        self.pending_bytes = 0
+        self.lines_sent = 0
+        self.started_at = time.time()
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the command."""
+        return {
+            "stream_id": self.stream_id,
+            "command": _redact_command_for_logging(self.command),
+            "pid": self.process.pid if self.process else None,
+            "lines_sent": self.lines_sent,
+            "started_at": self.started_at,
+        }
+
+    def add_line(self, pipe: str, line: str) -> None:
+        """Queue a line for the next frame."""
+        self.pending[pipe].append(line)
+        self.pending_lines += 1
+        self.pending_bytes += len(line)
+
+    def take_pending(self) -> Dict[str, List[str]]:
+        """Return and reset the lines waiting to be sent."""
+        pending = self.pending
+        self.lines_sent += self.pending_lines
+        self.pending = {"stdout": [], "stderr": []}
+        self.pending_lines = 0
+        self.pending_bytes = 0
+        return pending
+
+    def kill(self) -> None:
+        """Kill the command and everything it spawned."""
+        if self.process is None or self.process.returncode is not None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class ExecStreamManager:
+    """Runs streaming commands and pushes their output to the server."""
+
+    def __init__(self, get_websocket: Callable[[], Optional[Any]]) -> None:
+        """Initialize the manager.
+
+        Args:
+            get_websocket: Function returning the current websocket.
+        """
+        self._get_websocket = get_websocket
+        self._streams: Dict[str, ExecStream] = {}
+
+    async def start(
+        self, command: str, stream_id: str, timeout: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Validate and spawn a command, then stream its output.
+
+        Args:
+            command: Shell command to execute (must be in allowlist).
+            stream_id: Caller-chosen ID echoed in every output frame.
+            timeout: Seconds before the command is killed.
+
+        Returns:
+            Dict describing the started command. Commands rejected by the
+            allowlist or rate limiter return ``exit_code`` -1 with the
+            reason in ``stderr``, like ``system.exec``.
+        """
+        timeout = int(timeout or DEFAULT_TIMEOUT)
+        if not STREAM_ID_PATTERN.match(stream_id or ""):
+            raise SecurityError("Invalid stream_id")
+        if stream_id in self._streams:
+            raise SecurityError(f"Stream already running: {stream_id}")
+        if len(self._streams) >= MAX_STREAMS:
+            raise RateLimitError(f"Too many streaming commands (max {MAX_STREAMS})")
+
+        is_valid, error_msg = validate_command(command, timeout)
+        if not is_valid:
+            logger.warning(
+                "Command rejected by security policy: %s",
+                _redact_command_for_logging(command),
+                extra={"reason": error_msg},
+            )
+            return {
+                "stream_id": stream_id,
+                "started": False,
+                "stderr": f"Command not allowed: {error_msg}",
+                "exit_code": -1,
+                "security_blocked": True,
+            }
+
+        allowed, rate_error = acquire_command_slot()
+        if not allowed:
+            logger.warning(
+                "Command rate limited: %s",
+                _redact_command_for_logging(command),
+                extra={"reason": rate_error},
+            )
+            return {
+                "stream_id": stream_id,
+                "started": False,
+                "stderr": f"Rate limit: {rate_error}",
+                "exit_code": -1,
+                "rate_limited": True,
+            }
+
+        stream = ExecStream(stream_id, command, timeout)
+        try:
+            stream.process = await self._spawn(command)
+        except Exception as e:
+            release_command_slot()
+            logger.error(f"Command spawn error: {e}")
+            return {
+                "stream_id": stream_id,
+                "started": False,
+                "stderr": "Command execution failed",  # Don't leak internal errors
+                "exit_code": -1,
+            }
+
+        self._streams[stream_id] = stream
+        stream.task = asyncio.create_task(self._run(stream))
+        logger.info(
+            "Started streaming command %s: %s",
+            stream_id,
+            _redact_command_for_logging(command),
+        )
+        return {"started": True, **stream.info()}
+
+    async def cancel(self, stream_id: str) -> bool:
+        """Kill a running command; its final frame reports ``cancelled``.
+
+        Returns:
+            True if the command was running.
+        """
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.task is None:
+            return False
+        stream.task.cancel()
+        await asyncio.gather(stream.task, return_exceptions=True)
+        # A task cancelled before it got to run never reaches _finish
+        await self._finish(stream, -1, "cancelled")
+        return True
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Describe the running commands."""
+        return [s.info() for s in self._streams.values()]
+
+    async def stop(self) -> None:
+        """Kill every running command."""
+        for stream_id in list(self._streams):
+            await self.cancel(stream_id)
+
+    async def _spawn(self, command: str) -> asyncio.subprocess.Process:
+        """Start the command in its own process group."""
+        cmd_args, use_shell = _prepare_command(command)
+        kwargs: Dict[str, Any] = {
+            "stdin": asyncio.subprocess.DEVNULL,
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+            "start_new_session": True,
+        }
+        if use_shell:
+            return await asyncio.create_subprocess_shell(cmd_args, **kwargs)
+        return await asyncio.create_subprocess_exec(*cmd_args, **kwargs)
+
+    async def _run(self, stream: ExecStream) -> None:
+        """Forward a command's output until it exits, times out or is cancelled."""
+        exit_code = -1
+        reason = "exit"
+        error = None
+        try:
+            # One deadline for the output and the exit; _finish kills on timeout
+            exit_code = await asyncio.wait_for(
+                self._forward_until_exit(stream), timeout=stream.timeout
+            )
+        except asyncio.TimeoutError:
+            reason = "timeout"
+            error = f"Command timed out after {stream.timeout}s"
+        except asyncio.CancelledError:
+            reason = "cancelled"
+        except Exception as e:
+            reason = "error"
+            error = str(e)
+            logger.error(f"Streaming command {stream.stream_id} failed: {e}")
+
+        await self._finish(stream, exit_code, reason, error)
+
+    async def _finish(
+        self,
+        stream: ExecStream,
+        exit_code: int,
+        reason: str,
+        error: Optional[str] = None,
+    ) -> None:
+        """Release a command's resources and send its final frame."""
+        if self._streams.pop(stream.stream_id, None) is None:
+            return
+        stream.kill()
+        await stream.process.wait()
+        release_command_slot()
+        await self._flush(
+            stream, done=True, exit_code=exit_code, reason=reason, error=error
+        )
+        logger.info(
+            f"Streaming command {stream.stream_id} ended ({reason}, exit {exit_code})"
+        )
+
+    async def _forward_until_exit(self, stream: ExecStream) -> int:
+        """Forward the output, then wait for the process to exit."""
+        await self._forward(stream)
+        return await stream.process.wait()
+
+    async def _forward(self, stream: ExecStream) -> None:
+        """Assemble pipe reads into lines and flush them as frames."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=READ_QUEUE_SIZE)
+        readers = [
+            asyncio.create_task(
+                self._read_pipe(stream.process.stdout, "stdout", queue)
+            ),
+            asyncio.create_task(
+                self._read_pipe(stream.process.stderr, "stderr", queue)
+            ),
+        ]
+        buffers = {"stdout": LineBuffer(), "stderr": LineBuffer()}
+        open_pipes = len(readers)
+        try:
+            while open_pipes:
+                try:
+                    pipe, data = await asyncio.wait_for(
+                        queue.get(), timeout=FLUSH_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    await self._flush(stream)
+                    continue
+
+                if data:
+                    lines = buffers[pipe].feed(data)
+                else:
+                    open_pipes -= 1
+                    lines = buffers[pipe].flush()
+                for line in lines:
+                    stream.add_line(pipe, line)
+                    if (
+                        stream.pending_lines >= MAX_FRAME_LINES
+                        or stream.pending_bytes >= MAX_FRAME_BYTES
+                    ):
+                        await self._flush(stream)
+        finally:
+            for reader in readers:
+                reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+
+    async def _read_pipe(
+        self, pipe: asyncio.StreamReader, name: str, queue: asyncio.Queue
+    ) -> None:
+        """Read a pipe into the queue; an empty read marks end of output."""
+        while True:
+            data = await pipe.read(READ_SIZE)
+            await queue.put((name, data))
+            if not data:
+                return
+
+    async def _flush(
+        self,
+        stream: ExecStream,
+        done: bool = False,
+        exit_code: Optional[int] = None,
+        reason: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Send pending lines as one frame."""
+        if not stream.pending_lines and not done:
+            return
+
+        websocket = self._get_websocket()
+        if not websocket:
+            if not done:
+                raise ConnectionError("Not connected")
+            return
+
+        stream.seq += 1
+        params: Dict[str, Any] = {
+            "stream_id": stream.stream_id,
+            "seq": stream.seq,
+            **stream.take_pending(),
+            "done": done,
+        }
+        if done:
+            params["exit_code"] = exit_code
+            params["reason"] = reason
+            if error:
+                params["error"] = error
+
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "system.exec.output",
+            "params": params,
+        }
+        try:
+            await websocket.send(json.dumps(notification))
+        except Exception as e:
+            if not done:
+                raise
+            logger.debug(f"Streaming command {stream.stream_id} final frame lost: {e}")
+
+
+class ExecStreamMethods:
+    """RPC methods for streaming command execution (``system`` prefix)."""
+
+    async def exec_stream(
+        self, command: str, stream_id: str, timeout: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Start a command pushing system.exec.output frames."""
+        return await _require_manager().start(command, stream_id, timeout)
+
+    async def exec_cancel(self, stream_id: str) -> Dict[str, Any]:
+        """Kill a streaming command."""
+        cancelled = await _require_manager().cancel(stream_id)
+        return {"stream_id": stream_id, "cancelled": cancelled}
+
+    def exec_active(self) -> List[Dict[str, Any]]:
+        """List running streaming commands."""
+        return _manager.active() if _manager else []
+
+
+_manager: Optional[ExecStreamManager] = None
+
+
+def _require_manager() -> ExecStreamManager:
+    """Get the manager or fail when the agent is not connected."""
+    if _manager is None:
+        raise RateLimitError("Command streaming unavailable")
+    return _manager
+
+
+def get_exec_streams() -> Optional[ExecStreamManager]:
+    """Get the running exec stream manager."""
+    return _manager
+
+
+def set_exec_streams(manager: Optional[ExecStreamManager]) -> None:
+    """Install (or clear) the running exec stream manager."""
+    global _manager
+    _manager = manager
@@ -0,0 +1,457 @@
+"""Volume preparation.
+
+``system.prepare_volumes`` creates bind-mount directories under the allowed
+data paths and hands them to the container's user. The work runs in worker
+threads so that reinstalling an app over a large data directory does not
+stall the agent's event loop. Entries already owned by the target uid/gid
+are skipped without a chown. With ``recursive=False`` only each volume's
+top-level directory is changed.
+
+Symlinks are changed in place but never followed: a volume path that is a
+symlink is refused, and the walk opens every directory relative to its
+parent's file descriptor with ``O_NOFOLLOW``, so a directory swapped for a
+symlink while the walk runs fails to open instead of leading elsewhere.
+Subdirectories are shared between ``CHOWN_WORKERS`` threads through a queue.
+
+When the caller passes a ``progress_id``, running counts are pushed as
+``system.volumes.progress`` notifications every ``PROGRESS_INTERVAL``
+seconds, followed by a final frame with ``done`` set.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import stat
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .system_exec import STREAM_ID_PATTERN
+    from ..errors import RateLimitError, SecurityError
+except ImportError:
+    from rpc.methods.system_exec import STREAM_ID_PATTERN
+    from rpc.errors import RateLimitError, SecurityError
+
+logger = logging.getLogger(__name__)
+
+# Allowed writable paths for volume preparation (security boundary)
+ALLOWED_DATA_PATHS = ["/DATA", "/opt/tomo"]
+# Threads changing ownership within one volume
+CHOWN_WORKERS = 8
+# Preparations running at once
+MAX_PREPS = 2
+PROGRESS_INTERVAL = 1.0
+# Open a directory without following a symlink in its last component
+_DIR_FLAGS = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC
+
+
+class ChownStats:
+    """Entry counts shared by the threads of one preparation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.scanned = 0
+        self.changed = 0
+        self.failed = 0
+
+    def add(self, scanned: int, changed: int, failed: int) -> None:
+        """Add the counts of one directory."""
+        with self._lock:
+            self.scanned += scanned
+            self.changed += changed
+            self.failed += failed
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the current counts."""
+        with self._lock:
+            return {
+                "scanned": self.scanned,
+                "changed": self.changed,
+                "failed": self.failed,
+            }
+
+
+def chown_entry(path: str, uid: int, gid: int) -> bool:
+    """Give a single path to uid:gid without following symlinks.
+
+    Returns:
+        True if the ownership was changed, False if it was already right.
+    """
+    st = os.lstat(path)
+    if st.st_uid == uid and st.st_gid == gid:
+        return False
+    os.chown(path, uid, gid, follow_symlinks=False)
+    return True
+
+
+def chown_tree(
+    root: str,
+    uid: int,
+    gid: int,
+    stats: ChownStats,
+    cancelled: Optional[threading.Event] = None,
+    workers: int = CHOWN_WORKERS,
+) -> None:
+    """Give everything below root to uid:gid, skipping entries already owned.
+
+    Args:
+        root: Directory whose contents are changed (root itself is not).
+        uid: Target owner.
+        gid: Target group.
+        stats: Counts updated as directories are processed.
+        cancelled: Event that stops the walk early when set.
+        workers: Threads sharing the directory queue.
+
+    Raises:
+        OSError: If root cannot be opened, including when it is a symlink.
+    """
+    root_fd = os.open(root, _DIR_FLAGS)
+    # Queued directories are paths relative to root, as name tuples
+    pending: queue.Queue = queue.Queue()
+    pending.put(())
+
+    def work() -> None:
+        while True:
+            parts = pending.get()
+            if parts is None:
+                return
+            try:
+                if cancelled is None or not cancelled.is_set():
+                    _chown_dir(root_fd, parts, uid, gid, stats, pending)
+            finally:
+                pending.task_done()
+
+    threads = [
+        threading.Thread(target=work, name=f"chown-{i}", daemon=True)
+        for i in range(max(1, workers))
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        pending.join()
+    finally:
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+        os.close(root_fd)
+
+
+def _open_below(root_fd: int, parts: Tuple[str, ...]) -> int:
+    """Open a directory below root one component at a time, never via a symlink."""
+    fd = os.dup(root_fd)
+    try:
+        for name in parts:
+            child = os.open(name, _DIR_FLAGS, dir_fd=fd)
+            os.close(fd)
+            fd = child
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _chown_dir(
+    root_fd: int,
+    parts: Tuple[str, ...],
+    uid: int,
+    gid: int,
+    stats: ChownStats,
+    pending: queue.Queue,
+) -> None:
+    """Change the entries of one directory and queue its subdirectories."""
+    scanned = changed = failed = 0
+    try:
+        fd = _open_below(root_fd, parts)
+    except OSError:
+        stats.add(0, 0, 1)
+        return
+    try:
+        with os.scandir(fd) as entries:
+            for entry in entries:
+                scanned += 1
+                try:
+                    st = os.stat(entry.name, dir_fd=fd, follow_symlinks=False)
+                    if stat.S_ISDIR(st.st_mode):
+                        pending.put((*parts, entry.name))
+                    if st.st_uid != uid or st.st_gid != gid:
+                        os.chown(entry.name, uid, gid, dir_fd=fd, follow_symlinks=False)
+                        changed += 1
+                except OSError:
+                    failed += 1
+    except OSError:
+        failed += 1
+    finally:
+        os.close(fd)
+    stats.add(scanned, changed, failed)
+
+
+def _path_allowed(host_path: str) -> bool:
+    """Check that a normalized host path lies under an allowed directory."""
+    path = os.path.normpath(host_path)
+    return any(
+        path == allowed or path.startswith(allowed + "/")
+        for allowed in ALLOWED_DATA_PATHS
+    )
+
+
+class VolumePrep:
+    """State of a single prepare_volumes call."""
+
+    def __init__(
+        self,
+        volumes: List[Dict[str, Any]],
+        default_uid: int,
+        default_gid: int,
+        recursive: bool = True,
+        progress_id: Optional[str] = None,
+    ) -> None:
+        self.volumes = volumes
+        self.default_uid = default_uid
+        self.default_gid = default_gid
+        self.recursive = recursive
+        self.progress_id = progress_id
+        self.stats = ChownStats()
+        self.cancelled = threading.Event()
+        self.current: Optional[str] = None
+        self.volumes_done = 0
+        self.seq = 0
+
+    def progress(self) -> Dict[str, Any]:
+        """Describe how far the preparation has got."""
+        return {
+            "path": self.current,
+            "volumes_done": self.volumes_done,
+            "volumes_total": len(self.volumes),
+            **self.stats.snapshot(),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """Prepare every volume; blocks, so it runs in a worker thread.
+
+        Returns:
+            Dict with success status and details per volume
+        """
+        results = []
+        errors = []
+
+        # Determine host filesystem prefix (agent runs in container with / mounted at /host)
+        host_prefix = "/host" if os.path.exists("/host") else ""
+
+        for vol in self.volumes:
+            host_path = vol.get("host", "")
+            if not host_path:
+                self.volumes_done += 1
+                continue
+            self.current = host_path
+            try:
+                results.append(self._prepare(vol, host_path, host_prefix, errors))
+            finally:
+                self.volumes_done += 1
+
+        return {
+            "success": len(errors) == 0,
+            "results": results,
+            "errors": errors,
+        }
+
+    def _prepare(
+        self,
+        vol: Dict[str, Any],
+        host_path: str,
+        host_prefix: str,
+        errors: List[str],
+    ) -> Dict[str, Any]:
+        """Prepare one volume and return its result entry."""
+        # Skip named volumes (no leading /)
+        if not host_path.startswith("/"):
+            return {"path": host_path, "status": "skipped", "reason": "named volume"}
+
+        # Security check: only allow paths under approved directories
+        if not _path_allowed(host_path):
+            logger.warning(
+                f"Volume path not in allowed directories: {host_path}. "
+                f"Allowed: {ALLOWED_DATA_PATHS}"
+            )
+            return {
+                "path": host_path,
+                "status": "skipped",
+                "reason": f"not in allowed paths: {ALLOWED_DATA_PATHS}",
+            }
+
+        # Get ownership - use volume-specific or defaults
+        uid = vol.get("uid", self.default_uid)
+        gid = vol.get("gid", self.default_gid)
+
+        # Map to host filesystem
+        full_path = f"{host_prefix}{host_path}"
+
+        try:
+            os.makedirs(full_path, mode=0o755, exist_ok=True)
+            if os.path.islink(full_path):
+                logger.warning(f"Refusing symlinked volume path: {host_path}")
+                errors.append(f"Symlinked volume path refused: {host_path}")
+                return {"path": host_path, "status": "error", "error": "symlink"}
+            chown_entry(full_path, uid, gid)
+
+            # Volumes run one after another, so their counts are the difference
+            before = self.stats.snapshot()
+            if self.recursive:
+                chown_tree(full_path, uid, gid, self.stats, self.cancelled)
+            after = self.stats.snapshot()
+            counts = {key: after[key] - before[key] for key in after}
+            if self.cancelled.is_set():
+                errors.append(f"Cancelled preparing {host_path}")
+                return {"path": host_path, "status": "error", "error": "cancelled"}
+
+            logger.info(
+                f"Prepared volume: {host_path} (uid={uid}, gid={gid}, "
+                f"changed {counts['changed']} of {counts['scanned']})"
+            )
+            return {
+                "path": host_path,
+                "status": "ok",
+                "uid": uid,
+                "gid": gid,
+                **counts,
+            }
+
+        except PermissionError as e:
+            logger.error(f"Permission denied preparing {host_path}: {e}")
+            errors.append(f"Permission denied: {host_path}")
+            return {"path": host_path, "status": "error", "error": "permission denied"}
+
+        except Exception as e:
+            logger.error(f"Error preparing volume {host_path}: {e}")
+            errors.append(f"Failed to prepare {host_path}: {str(e)}")
+            return {"path": host_path, "status": "error", "error": str(e)}
+
+
+class VolumePrepManager:
+    """Runs volume preparations off the event loop and reports progress."""
+
+    def __init__(self, get_websocket: Callable[[], Optional[Any]]) -> None:
+        """Initialize the manager.
+
+        Args:
+            get_websocket: Function returning the current websocket.
+        """
+        self._get_websocket = get_websocket
+        self._preps: Set[VolumePrep] = set()
+
+    async def prepare(
+        self,
+        volumes: List[Dict[str, Any]],
+        default_uid: int = 1000,
+        default_gid: int = 1000,
+        recursive: bool = True,
+        progress_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Prepare volumes in a worker thread, pushing progress meanwhile.
+
+        Args:
+            volumes: List of volume dicts with 'host' path and optional 'uid'/'gid'
+            default_uid: Default UID if not specified per volume
+            default_gid: Default GID if not specified per volume
+            recursive: Change existing contents too, not just each top directory
+            progress_id: Caller-chosen ID echoed in progress frames; no
+                frames are sent without one
+
+        Returns:
+            Dict with success status and details per volume
+        """
+        if progress_id is not None and not STREAM_ID_PATTERN.match(progress_id):
+            raise SecurityError("Invalid progress_id")
+        if len(self._preps) >= MAX_PREPS:
+            raise RateLimitError(
+                f"Too many volume preparations running (max {MAX_PREPS})"
+            )
+
+        prep = VolumePrep(volumes, default_uid, default_gid, recursive, progress_id)
+        self._preps.add(prep)
+        task = asyncio.ensure_future(asyncio.to_thread(prep.run))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=PROGRESS_INTERVAL)
+                if not task.done():
+                    await self._notify(prep)
+            result = task.result()
+        finally:
+            # Stops the worker threads if the call itself was cancelled
+            prep.cancelled.set()
+            self._preps.discard(prep)
+
+        await self._notify(prep, done=True)
+        return result
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Describe the running preparations."""
+        return [prep.progress() for prep in self._preps]
+
+    async def stop(self) -> None:
+        """Stop every running preparation at its next directory."""
+        for prep in self._preps:
+            prep.cancelled.set()
+
+    async def _notify(self, prep: VolumePrep, done: bool = False) -> None:
+        """Send a progress frame; progress is best effort."""
+        if not prep.progress_id:
+            return
+        websocket = self._get_websocket()
+        if not websocket:
+            return
+
+        prep.seq += 1
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "system.volumes.progress",
+            "params": {
+                "progress_id": prep.progress_id,
+                "seq": prep.seq,
+                **prep.progress(),
+                "done": done,
+            },
+        }
+        try:
+            await websocket.send(json.dumps(notification))
+        except Exception as e:
+            logger.debug(f"Volume progress {prep.progress_id} frame lost: {e}")
+
+
+class VolumePrepMethods:
+    """RPC methods for volume preparation (``system`` prefix)."""
+
+    async def prepare_volumes(
+        self,
+        volumes: list,
+        default_uid: int = 1000,
+        default_gid: int = 1000,
+        recursive: bool = True,
+        progress_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Prepare host directories for volume mounts.
+
+        Creates directories and sets ownership so containers can write to them.
+        Only paths under allowed directories can be prepared (security).
+        """
+        # Without a connection there is nowhere to send progress
+        manager = _manager or VolumePrepManager(lambda: None)
+        return await manager.prepare(
+            volumes, default_uid, default_gid, recursive, progress_id
+        )
+
+
+_manager: Optional[VolumePrepManager] = None
+
+
+def get_volume_preps() -> Optional[VolumePrepManager]:
+    """Get the running volume preparation manager."""
+    return _manager
+
+
+def set_volume_preps(manager: Optional[VolumePrepManager]) -> None:
+    """Install (or clear) the running volume preparation manager."""
+    global _manager
+    _manager = manager
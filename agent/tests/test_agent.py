@@ -9,6 +9,11 @@ import pytest
 
 from agent import Agent
 from config import AgentConfig
+from rpc.methods.docker_logs import get_log_streams, set_log_streams
+from rpc.methods.docker_state import get_state_cache, set_state_cache
+from rpc.methods.docker_stats import get_stats_collector, set_stats_collector
+from rpc.methods.system_exec import get_exec_streams, set_exec_streams
+from rpc.methods.system_volumes import get_volume_preps, set_volume_preps
 
 
 class TestAgentInit:
@@ -198,18 +203,41 @@ class TestAgentCollectors:
 
                 with patch("agent.MetricsCollector") as mock_metrics:
                     with patch("agent.HealthReporter") as mock_health:
-                        mock_metrics_instance = MagicMock()
-                        mock_metrics_instance.start = AsyncMock()
-                        mock_metrics.return_value = mock_metrics_instance
-
-                        mock_health_instance = MagicMock()
-                        mock_health_instance.start = AsyncMock()
-                        mock_health.return_value = mock_health_instance
-
-                        await agent._start_collectors()
-
-                        mock_metrics_instance.start.assert_called_once()
-                        mock_health_instance.start.assert_called_once()
+                        with patch("agent.DockerStateCache") as mock_cache:
+                            with patch("agent.ContainerStatsCollector") as mock_stats:
+                                mock_metrics_instance = MagicMock()
+                                mock_metrics_instance.start = AsyncMock()
+                                mock_metrics.return_value = mock_metrics_instance
+
+                                mock_health_instance = MagicMock()
+                                mock_health_instance.start = AsyncMock()
+                                mock_health.return_value = mock_health_instance
+
+                                mock_cache_instance = MagicMock()
+                                mock_cache_instance.start = AsyncMock()
+                                mock_cache.return_value = mock_cache_instance
+
+                                mock_stats_instance = MagicMock()
+                                mock_stats_instance.start = AsyncMock()
+                                mock_stats.return_value = mock_stats_instance
+
+                                await agent._start_collectors()
+
+                                mock_metrics_instance.start.assert_called_once()
+                                mock_health_instance.start.assert_called_once()
+                                mock_cache_instance.start.assert_called_once()
+                                mock_stats_instance.start.assert_called_once()
+                                assert get_log_streams() is agent._log_streams
+                                assert get_exec_streams() is agent._exec_streams
+                                assert get_volume_preps() is agent._volume_preps
+                                assert get_stats_collector() is mock_stats_instance
+
+                                # Cleanup the global references
+                                set_state_cache(None)
+                                set_log_streams(None)
+                                set_exec_streams(None)
+                                set_volume_preps(None)
+                                set_stats_collector(None)
 
     @pytest.mark.asyncio
     async def test_stop_collectors(self):
@@ -223,16 +251,48 @@ class TestAgentCollectors:
                 mock_metrics.stop = AsyncMock()
                 mock_health = MagicMock()
                 mock_health.stop = AsyncMock()
+                mock_cache = MagicMock()
+                mock_cache.stop = AsyncMock()
 
                 agent._metrics_collector = mock_metrics
                 agent._health_reporter = mock_health
+                mock_streams = MagicMock()
+                mock_streams.stop = AsyncMock()
+
+                agent._state_cache = mock_cache
+                agent._log_streams = mock_streams
+                mock_exec = MagicMock()
+                mock_exec.stop = AsyncMock()
+                agent._exec_streams = mock_exec
+                mock_preps = MagicMock()
+                mock_preps.stop = AsyncMock()
+                agent._volume_preps = mock_preps
+                mock_stats = MagicMock()
+                mock_stats.stop = AsyncMock()
+                agent._stats_collector = mock_stats
+                set_state_cache(mock_cache)
+                set_log_streams(mock_streams)
+                set_exec_streams(mock_exec)
+                set_volume_preps(mock_preps)
+                set_stats_collector(mock_stats)
 
                 await agent._stop_collectors()
 
                 mock_metrics.stop.assert_called_once()
                 mock_health.stop.assert_called_once()
+                mock_cache.stop.assert_called_once()
                 assert agent._metrics_collector is None
                 assert agent._health_reporter is None
+                assert agent._state_cache is None
+                assert get_state_cache() is None
+                mock_streams.stop.assert_called_once()
+                assert get_log_streams() is None
+                mock_exec.stop.assert_called_once()
+                assert get_exec_streams() is None
+                mock_preps.stop.assert_called_once()
+                assert get_volume_preps() is None
+                mock_stats.stop.assert_called_once()
+                assert get_stats_collector() is None
 
     @pytest.mark.asyncio
     async def test_stop_collectors_when_none(self):
@@ -0,0 +1,297 @@
+"""Tests for the asyncio Docker Engine API client.
+
+Tests requests, error mapping, connection reuse and streaming against a
+fake daemon on a Unix socket, and the native paths of the Docker methods.
+"""
+
+import asyncio
+import json
+import struct
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from rpc.methods import docker_api, docker_containers, docker_images
+from rpc.methods.docker_api import (
+    AsyncDockerClient,
+    DockerAPIError,
+    _Connection,
+    demux_logs,
+    docker_socket_path,
+    short_id,
+)
+from rpc.methods.docker_containers import ContainerMethods
+from rpc.methods.docker_images import ImageMethods
+
+
+class FakeDaemon:
+    """HTTP/1.1 server answering requests from a route table."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                self.requests.append(
+                    (method, target, json.loads(body) if body else None, headers)
+                )
+                path = target.split("?", 1)[0]
+                status, payload = self.routes[(method, path)]
+                writer.write(self._response(status, payload))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status, payload):
+        if isinstance(payload, list) and all(isinstance(p, bytes) for p in payload):
+            # Chunked body, one chunk per item
+            body = b"".join(b"%x\r\n%s\r\n" % (len(p), p) for p in payload)
+            head = "Transfer-Encoding: chunked"
+            body += b"0\r\n\r\n"
+        else:
+            body = (
+                payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            )
+            head = f"Content-Length: {len(body)}"
+        return f"HTTP/1.1 {status} X\r\n{head}\r\n\r\n".encode() + body
+
+
+@pytest.fixture
+async def daemon(tmp_path):
+    """Start a fake daemon and return it with a client connected to it."""
+    fake = FakeDaemon({})
+    path = str(tmp_path / "docker.sock")
+    server = await asyncio.start_unix_server(fake.handle, path)
+    client = AsyncDockerClient(path)
+    yield fake, client
+    await client.close()
+    server.close()
+
+
+class TestAsyncDockerClient:
+    """Tests for AsyncDockerClient."""
+
+    @pytest.mark.asyncio
+    async def test_get_decodes_json(self, daemon):
+        """Should send the query string and decode the body."""
+        fake, client = daemon
+        fake.routes[("GET", "/containers/json")] = (200, [{"Id": "abc"}])
+
+        result = await client.get("/containers/json", {"all": True, "x": None})
+
+        assert result == [{"Id": "abc"}]
+        assert fake.requests[0][1] == "/containers/json?all=1"
+
+    @pytest.mark.asyncio
+    async def test_post_sends_json_body(self, daemon):
+        """Should send the body as JSON; empty responses decode to None."""
+        fake, client = daemon
+        fake.routes[("POST", "/containers/web/update")] = (204, b"")
+
+        result = await client.post("/containers/web/update", body={"A": 1})
+
+        assert result is None
+        assert fake.requests[0][2] == {"A": 1}
+        assert fake.requests[0][3]["content-type"] == "application/json"
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises(self, daemon):
+        """Should raise with the daemon's status and message."""
+        fake, client = daemon
+        fake.routes[("DELETE", "/images/nginx")] = (
+            409,
+            {"message": "image is in use"},
+        )
+
+        with pytest.raises(DockerAPIError) as exc_info:
+            await client.delete("/images/nginx")
+
+        assert exc_info.value.status == 409
+        assert exc_info.value.message == "image is in use"
+
+    @pytest.mark.asyncio
+    async def test_reuses_connections(self, daemon):
+        """Sequential requests, failed ones included, share a connection."""
+        fake, client = daemon
+        fake.routes[("GET", "/info")] = (200, {"ok": True})
+        fake.routes[("GET", "/missing")] = (404, {"message": "no"})
+
+        await client.get("/info")
+        with pytest.raises(DockerAPIError):
+            await client.get("/missing")
+        await client.get("/info")
+
+        assert fake.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_daemon_closed(self, daemon):
+        """A pooled connection closed by the daemon should be replaced."""
+        fake, client = daemon
+        fake.routes[("GET", "/info")] = (200, {"ok": True})
+        await client.get("/info")
+        for conn in client._idle:
+            conn.writer.transport.abort()
+
+        assert await client.get("/info") == {"ok": True}
+        assert fake.connections == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("method", "path", "retried"),
+        [("GET", "/info", True), ("POST", "/containers/web/start", False)],
+    )
+    async def test_retries_only_idempotent_requests(
+        self, daemon, method, path, retried
+    ):
+        """Only GET and HEAD should be resent after a stale connection fails."""
+        fake, client = daemon
+        fake.routes[(method, path)] = (200, {"ok": True})
+        reader = asyncio.StreamReader()
+        reader.feed_eof()
+        stale = _Connection(reader, MagicMock(drain=AsyncMock()))
+        connect = client._connect
+        connections = iter([(stale, True)])
+
+        async def fake_connect():
+            return next(connections, None) or await connect()
+
+        with patch.object(client, "_connect", side_effect=fake_connect):
+            if retried:
+                assert await client.request(method, path) == {"ok": True}
+            else:
+                with pytest.raises(ConnectionResetError):
+                    await client.request(method, path)
+
+        assert len(fake.requests) == (1 if retried else 0)
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_messages_across_chunks(self, daemon):
+        """Messages split over chunks should be yielded whole and in order."""
+        fake, client = daemon
+        fake.routes[("POST", "/images/create")] = (
+            200,
+            [b'{"status": "Pull', b'ing"}\n{"status": "Done"}\n'],
+        )
+
+        messages = [m async for m in client.stream("POST", "/images/create")]
+
+        assert messages == [{"status": "Pulling"}, {"status": "Done"}]
+        assert len(client._idle) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_capped_by_pool(self, daemon):
+        """Concurrent requests should not open more than pool_size sockets."""
+        fake, client = daemon
+        client._pool_size = 2
+        fake.routes[("GET", "/info")] = (200, {"ok": True})
+
+        await asyncio.gather(*(client.get("/info") for _ in range(6)))
+
+        assert fake.connections <= 2
+        assert len(fake.requests) == 6
+
+
+class TestHelpers:
+    """Tests for the module helpers."""
+
+    def test_short_id(self):
+        """Images keep their digest prefix like docker-py's short_id."""
+        assert short_id("sha256:" + "a" * 64) == "sha256:" + "a" * 12
+        assert short_id("b" * 64) == "b" * 12
+
+    def test_demux_logs(self):
+        """Frame headers should be stripped from both streams."""
+        frame = struct.pack(">BxxxI", 1, 4) + b"out\n"
+        frame += struct.pack(">BxxxI", 2, 4) + b"err\n"
+
+        assert demux_logs(frame) == b"out\nerr\n"
+
+    def test_socket_path(self, tmp_path, monkeypatch):
+        """Only a local Unix socket that exists should be used."""
+        sock = tmp_path / "docker.sock"
+        sock.touch()
+
+        monkeypatch.setenv("DOCKER_HOST", f"unix://{sock}")
+        assert docker_socket_path() == str(sock)
+        monkeypatch.setenv("DOCKER_HOST", "tcp://10.0.0.1:2375")
+        assert docker_socket_path() is None
+        monkeypatch.setenv("DOCKER_HOST", f"unix://{tmp_path}/missing.sock")
+        assert docker_socket_path() is None
+
+
+class TestNativeMethods:
+    """Tests for the Docker methods on the asyncio client."""
+
+    @pytest.fixture
+    def native(self, daemon):
+        """Route the Docker methods to the fake daemon."""
+        fake, client = daemon
+        with (
+            patch.object(docker_containers, "get_async_client", return_value=client),
+            patch.object(docker_images, "get_async_client", return_value=client),
+            patch.object(docker_images, "registry_auth_header", return_value=None),
+        ):
+            yield fake
+
+    @pytest.mark.asyncio
+    async def test_run_pulls_missing_image(self, native):
+        """A missing image should be pulled before creating again."""
+        cid = "c" * 64
+        created = iter([(404, {"message": "No such image: nginx:latest"})])
+        native.routes[("POST", "/images/create")] = (200, [b'{"status": "ok"}\n'])
+        native.routes[("GET", "/images/nginx:latest/json")] = (200, {"Id": "x"})
+        native.routes[("POST", f"/containers/{cid}/start")] = (204, b"")
+
+        class Routes(dict):
+            def __getitem__(self, key):
+                if key == ("POST", "/containers/create"):
+                    return next(created, (201, {"Id": cid}))
+                return super().__getitem__(key)
+
+        native.routes = Routes(native.routes)
+
+        result = await ContainerMethods().run(
+            "nginx:latest", name="web", env={"A": "1"}, ports={"8080": "80/tcp"}
+        )
+
+        assert result == {"id": cid[:12], "name": "web", "container_id": cid}
+        creates = [r for r in native.requests if r[1].startswith("/containers/create")]
+        assert len(creates) == 2
+        assert creates[1][1] == "/containers/create?name=web"
+        assert creates[1][2]["Env"] == ["A=1"]
+        assert creates[1][2]["HostConfig"]["PortBindings"] == {
+            "80/tcp": [{"HostIp": "", "HostPort": "8080"}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_image_pull_error_in_stream(self, native):
+        """Errors reported inside the pull stream should be raised."""
+        native.routes[("POST", "/images/create")] = (
+            200,
+            [b'{"status": "Pulling"}\n{"error": "manifest unknown"}\n'],
+        )
+
+        with pytest.raises(DockerAPIError, match="manifest unknown"):
+            await ImageMethods().pull("nginx", "nope")
+
+
+def test_get_async_client_falls_back(monkeypatch):
+    """Without a usable socket the docker-py fallback should be chosen."""
+    monkeypatch.setenv("DOCKER_HOST", "ssh://host")
+    docker_api.reset_async_client()
+
+    assert docker_api.get_async_client() is None
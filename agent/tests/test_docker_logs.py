@@ -0,0 +1,298 @@
+"""Tests for streaming container log subscriptions.
+
+Tests cursor parsing, framing, resume, rate limiting and cancellation.
+"""
+
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from rpc.errors import DockerOperationError, RateLimitError
+from rpc.methods import docker_logs
+from rpc.methods.docker_containers import ContainerMethods
+from rpc.methods.docker_logs import (
+    LogMethods,
+    LogStreamManager,
+    cursor_key,
+    parse_log_line,
+    set_log_streams,
+)
+
+
+class FakeSource:
+    """Docker log stream yielding raw chunks, optionally blocking at the end."""
+
+    def __init__(self, chunks, block=False):
+        self._chunks = chunks
+        self._block = block
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield chunk
+        if self._block:
+            self._closed.wait(5)
+
+    def close(self):
+        self._closed.set()
+
+
+def make_client(source):
+    """Build a mock Docker client returning the given log source."""
+    client = MagicMock()
+    client.api.logs.return_value = source
+    return client
+
+
+def sent_frames(websocket):
+    """Decode all notification frames sent on a mock websocket."""
+    return [json.loads(c[0][0])["params"] for c in websocket.send.call_args_list]
+
+
+async def wait_done(manager):
+    """Wait for all streams of a manager to finish."""
+    for _ in range(200):
+        if not manager.active():
+            return
+        await asyncio.sleep(0.01)
+
+
+class TestCursorParsing:
+    """Tests for cursor_key() and parse_log_line()."""
+
+    def test_cursor_key_handles_trimmed_fractions(self):
+        """Should compare timestamps numerically, not as strings."""
+        assert cursor_key("2024-01-01T00:00:00.5Z") > cursor_key(
+            "2024-01-01T00:00:00.123456789Z"
+        )
+        assert cursor_key("2024-01-01T00:00:01Z") == (1704067201, 0)
+
+    def test_cursor_key_rejects_garbage(self):
+        """Should return None for unparseable input."""
+        assert cursor_key(None) is None
+        assert cursor_key("yesterday") is None
+        assert cursor_key("2024-01-01T00:00:00+01:00") is None
+
+    def test_parse_log_line(self):
+        """Should split the timestamp from the message."""
+        line = parse_log_line(b"2024-01-01T00:00:00.1Z hello world\r")
+
+        assert line == {"timestamp": "2024-01-01T00:00:00.1Z", "message": "hello world"}
+        assert parse_log_line(b"no timestamp")["timestamp"] is None
+
+
+class TestLogStreamManager:
+    """Tests for LogStreamManager."""
+
+    @pytest.mark.asyncio
+    async def test_streams_lines_as_frames(self):
+        """Should reassemble split reads into lines and finish with eof."""
+        websocket = AsyncMock()
+        manager = LogStreamManager(get_websocket=lambda: websocket)
+        source = FakeSource(
+            [
+                b"2024-01-01T00:00:01Z first\n2024-01-01T00:00:02Z sec",
+                b"ond\n2024-01-01T00:00:03Z third",
+            ]
+        )
+
+        with patch.object(docker_logs, "get_client", return_value=make_client(source)):
+            info = await manager.subscribe("web", tail=10, follow=False)
+            await wait_done(manager)
+
+        frames = sent_frames(websocket)
+        lines = [line["message"] for f in frames for line in f["lines"]]
+        assert info["stream_id"].startswith("logs-")
+        assert lines == ["first", "second", "third"]
+        assert frames[-1]["done"] is True
+        assert frames[-1]["reason"] == "eof"
+        assert frames[-1]["cursor"] == "2024-01-01T00:00:03Z"
+        assert [f["seq"] for f in frames] == list(range(1, len(frames) + 1))
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_lines_through_cursor(self):
+        """Should request whole-second since and drop already-seen lines."""
+        websocket = AsyncMock()
+        manager = LogStreamManager(get_websocket=lambda: websocket)
+        source = FakeSource(
+            [
+                b"2024-01-01T00:00:01.1Z old\n"
+                b"2024-01-01T00:00:01.25Z seen\n"
+                b"2024-01-01T00:00:01.3Z new\n"
+            ]
+        )
+        client = make_client(source)
+
+        with patch.object(docker_logs, "get_client", return_value=client):
+            await manager.subscribe(
+                "web", since="2024-01-01T00:00:01.25Z", follow=False
+            )
+            await wait_done(manager)
+
+        kwargs = client.api.logs.call_args[1]
+        assert kwargs["since"] == 1704067201
+        assert "tail" not in kwargs
+        lines = [line["message"] for f in sent_frames(websocket) for line in f["lines"]]
+        assert lines == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_frames_are_bounded(self):
+        """Should split large batches into frames of at most MAX_CHUNK_LINES."""
+        websocket = AsyncMock()
+        manager = LogStreamManager(get_websocket=lambda: websocket)
+        data = b"".join(b"2024-01-01T00:00:01Z line %d\n" % i for i in range(25))
+
+        with patch.object(docker_logs, "MAX_CHUNK_LINES", 10):
+            with patch.object(
+                docker_logs, "get_client", return_value=make_client(FakeSource([data]))
+            ):
+                await manager.subscribe(
+                    "web",
+                    follow=False,
+                    lines_per_second=docker_logs.MAX_LINES_PER_SECOND,
+                )
+                await wait_done(manager)
+
+        sizes = [len(f["lines"]) for f in sent_frames(websocket)]
+        assert max(sizes) <= 10
+        assert sum(sizes) == 25
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_cancels_follow_stream(self):
+        """Should stop a following stream and send a cancelled frame."""
+        websocket = AsyncMock()
+        manager = LogStreamManager(get_websocket=lambda: websocket)
+        source = FakeSource([b"2024-01-01T00:00:01Z hi\n"], block=True)
+
+        with patch.object(docker_logs, "get_client", return_value=make_client(source)):
+            info = await manager.subscribe("web", follow=True)
+            await asyncio.sleep(0.05)
+            cancelled = await manager.unsubscribe(info["stream_id"])
+
+        assert cancelled is True
+        assert manager.active() == []
+        assert source._closed.is_set()
+        assert sent_frames(websocket)[-1]["reason"] == "cancelled"
+        assert await manager.unsubscribe(info["stream_id"]) is False
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrent_streams(self):
+        """Should refuse streams beyond MAX_STREAMS."""
+        manager = LogStreamManager(get_websocket=lambda: AsyncMock())
+        source = FakeSource([], block=True)
+
+        with patch.object(docker_logs, "MAX_STREAMS", 1):
+            with patch.object(
+                docker_logs, "get_client", return_value=make_client(source)
+            ):
+                await manager.subscribe("web")
+                with pytest.raises(RateLimitError):
+                    await manager.subscribe("db")
+                await manager.stop()
+
+        assert manager.active() == []
+
+    @pytest.mark.asyncio
+    async def test_subscribe_reports_docker_errors(self):
+        """Should raise DockerOperationError when the container is missing."""
+        manager = LogStreamManager(get_websocket=lambda: AsyncMock())
+        client = MagicMock()
+        client.api.logs.side_effect = Exception("No such container: web")
+
+        with patch.object(docker_logs, "get_client", return_value=client):
+            with pytest.raises(DockerOperationError):
+                await manager.subscribe("web")
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_paces_delivery(self):
+        """Should not exceed the token bucket once the burst is spent."""
+        stream = docker_logs.LogStream("web", None, False, lines_per_second=100)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await stream.throttle(100)
+        await stream.throttle(10)
+        elapsed = loop.time() - start
+
+        assert elapsed >= 0.08
+
+
+class TestLogMethods:
+    """Tests for the docker.logs RPC methods."""
+
+    @pytest.mark.asyncio
+    async def test_requires_running_manager(self):
+        """Should fail when no manager is installed."""
+        set_log_streams(None)
+
+        with pytest.raises(DockerOperationError):
+            await LogMethods().subscribe("web")
+        assert LogMethods().active() == []
+
+    @pytest.mark.asyncio
+    async def test_delegates_to_manager(self):
+        """Should forward subscribe and unsubscribe to the manager."""
+        manager = MagicMock()
+        manager.subscribe = AsyncMock(return_value={"stream_id": "logs-1"})
+        manager.unsubscribe = AsyncMock(return_value=True)
+        set_log_streams(manager)
+        try:
+            result = await LogMethods().subscribe("web", since="c", tail=5)
+            cancel = await LogMethods().unsubscribe("logs-1")
+        finally:
+            set_log_streams(None)
+
+        assert result == {"stream_id": "logs-1"}
+        manager.subscribe.assert_called_once_with(
+            "web", since="c", tail=5, follow=True, lines_per_second=200
+        )
+        assert cancel == {"stream_id": "logs-1", "cancelled": True}
+
+
+class TestContainerLogsSnapshot:
+    """Tests for cursor support in ContainerMethods.logs()."""
+
+    @pytest.mark.asyncio
+    async def test_returns_lines_and_cursor(self):
+        """Should parse timestamped lines and report the last cursor."""
+        container = MagicMock()
+        container.logs.return_value = (
+            b"2024-01-01T00:00:01.1Z a\n2024-01-01T00:00:02.2Z b\n"
+        )
+        client = MagicMock()
+        client.containers.get.return_value = container
+
+        with (
+            patch("rpc.methods.docker_containers.get_async_client", return_value=None),
+            patch("rpc.methods.docker_containers.get_client", return_value=client),
+        ):
+            result = await ContainerMethods().logs(
+                "web", since="2024-01-01T00:00:01.1Z"
+            )
+
+        assert result["lines"] == [
+            {"timestamp": "2024-01-01T00:00:02.2Z", "message": "b"}
+        ]
+        assert result["cursor"] == "2024-01-01T00:00:02.2Z"
+        assert result["logs"] == "b"
+        assert container.logs.call_args[1]["since"] == 1704067201
+
+    @pytest.mark.asyncio
+    async def test_keeps_cursor_when_nothing_new(self):
+        """Should echo the cursor back when no newer lines exist."""
+        container = MagicMock()
+        container.logs.return_value = b""
+        client = MagicMock()
+        client.containers.get.return_value = container
+
+        with (
+            patch("rpc.methods.docker_containers.get_async_client", return_value=None),
+            patch("rpc.methods.docker_containers.get_client", return_value=client),
+        ):
+            result = await ContainerMethods().logs("web", since="2024-01-01T00:00:01Z")
+
+        assert result["lines"] == []
+        assert result["cursor"] == "2024-01-01T00:00:01Z"
@@ -1,10 +1,12 @@
 """Tests for Docker RPC methods.
 
-Tests container, image, volume, and network operations.
+Tests container, image, volume, and network operations through the
+docker-py fallback; the asyncio client is tested in test_docker_api.py.
 """
 
 from unittest.mock import MagicMock, patch
 
+import pytest
 
 from rpc.methods.docker_containers import ContainerMethods
 from rpc.methods.docker_images import ImageMethods
@@ -96,10 +98,23 @@ class MockNetwork:
         pass
 
 
+@pytest.fixture(autouse=True)
+def docker_py_fallback():
+    """Exercise the docker-py fallback used without a Docker socket."""
+    with (
+        patch("rpc.methods.docker_containers.get_async_client", return_value=None),
+        patch("rpc.methods.docker_images.get_async_client", return_value=None),
+        patch("rpc.methods.docker_networks.get_async_client", return_value=None),
+        patch("rpc.methods.docker_volumes.get_async_client", return_value=None),
+    ):
+        yield
+
+
 class TestContainerMethodsList:
     """Tests for ContainerMethods.list()."""
 
-    def test_lists_containers(self):
+    @pytest.mark.asyncio
+    async def test_lists_containers(self):
         """Should list containers."""
         mock_client = MagicMock()
         mock_client.containers.list.return_value = [
@@ -112,13 +127,14 @@ class TestContainerMethodsList:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.list()
+            result = await methods.list()
 
         assert len(result) == 2
         assert result[0]["name"] == "web"
         assert result[1]["name"] == "db"
 
-    def test_lists_all_containers(self):
+    @pytest.mark.asyncio
+    async def test_lists_all_containers(self):
         """Should pass all=True to Docker client."""
         mock_client = MagicMock()
         mock_client.containers.list.return_value = []
@@ -128,11 +144,12 @@ class TestContainerMethodsList:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            methods.list(all=True)
+            await methods.list(all=True)
 
         mock_client.containers.list.assert_called_once_with(all=True)
 
-    def test_returns_container_details(self):
+    @pytest.mark.asyncio
+    async def test_returns_container_details(self):
         """Should return container details."""
         container = MockContainer(id="container123", name="app", status="running")
         mock_client = MagicMock()
@@ -143,7 +160,7 @@ class TestContainerMethodsList:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.list()
+            result = await methods.list()
 
         assert result[0]["id"] == "container123"
         assert result[0]["name"] == "app"
@@ -154,7 +171,8 @@ class TestContainerMethodsList:
 class TestContainerMethodsStart:
     """Tests for ContainerMethods.start()."""
 
-    def test_starts_container(self):
+    @pytest.mark.asyncio
+    async def test_starts_container(self):
         """Should start container."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -165,7 +183,7 @@ class TestContainerMethodsStart:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.start("test")
+            result = await methods.start("test")
 
         assert result["status"] == "started"
         mock_client.containers.get.assert_called_once_with("test")
@@ -174,7 +192,8 @@ class TestContainerMethodsStart:
 class TestContainerMethodsStop:
     """Tests for ContainerMethods.stop()."""
 
-    def test_stops_container(self):
+    @pytest.mark.asyncio
+    async def test_stops_container(self):
         """Should stop container."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -185,11 +204,12 @@ class TestContainerMethodsStop:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.stop("test")
+            result = await methods.stop("test")
 
         assert result["status"] == "stopped"
 
-    def test_passes_timeout(self):
+    @pytest.mark.asyncio
+    async def test_passes_timeout(self):
         """Should pass timeout to Docker."""
         container = MagicMock()
         mock_client = MagicMock()
@@ -200,7 +220,7 @@ class TestContainerMethodsStop:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            methods.stop("test", timeout=30)
+            await methods.stop("test", timeout=30)
 
         container.stop.assert_called_once_with(timeout=30)
 
@@ -208,7 +228,8 @@ class TestContainerMethodsStop:
 class TestContainerMethodsRemove:
     """Tests for ContainerMethods.remove()."""
 
-    def test_removes_container(self):
+    @pytest.mark.asyncio
+    async def test_removes_container(self):
         """Should remove container."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -219,11 +240,12 @@ class TestContainerMethodsRemove:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.remove("test")
+            result = await methods.remove("test")
 
         assert result["status"] == "removed"
 
-    def test_force_removes_container(self):
+    @pytest.mark.asyncio
+    async def test_force_removes_container(self):
         """Should force remove container."""
         container = MagicMock()
         mock_client = MagicMock()
@@ -234,7 +256,7 @@ class TestContainerMethodsRemove:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            methods.remove("test", force=True)
+            await methods.remove("test", force=True)
 
         container.remove.assert_called_once_with(force=True)
 
@@ -242,7 +264,8 @@ class TestContainerMethodsRemove:
 class TestContainerMethodsRestart:
     """Tests for ContainerMethods.restart()."""
 
-    def test_restarts_container(self):
+    @pytest.mark.asyncio
+    async def test_restarts_container(self):
         """Should restart container."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -253,7 +276,7 @@ class TestContainerMethodsRestart:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.restart("test")
+            result = await methods.restart("test")
 
         assert result["status"] == "restarted"
 
@@ -261,7 +284,8 @@ class TestContainerMethodsRestart:
 class TestContainerMethodsLogs:
     """Tests for ContainerMethods.logs()."""
 
-    def test_gets_logs(self):
+    @pytest.mark.asyncio
+    async def test_gets_logs(self):
         """Should get container logs."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -272,7 +296,7 @@ class TestContainerMethodsLogs:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.logs("test")
+            result = await methods.logs("test")
 
         assert "logs" in result
         assert "container logs here" in result["logs"]
@@ -281,7 +305,8 @@ class TestContainerMethodsLogs:
 class TestContainerMethodsInspect:
     """Tests for ContainerMethods.inspect()."""
 
-    def test_inspects_container(self):
+    @pytest.mark.asyncio
+    async def test_inspects_container(self):
         """Should inspect container."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -292,7 +317,7 @@ class TestContainerMethodsInspect:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.inspect("test")
+            result = await methods.inspect("test")
 
         assert "State" in result
 
@@ -300,7 +325,8 @@ class TestContainerMethodsInspect:
 class TestContainerMethodsUpdate:
     """Tests for ContainerMethods.update()."""
 
-    def test_updates_restart_policy(self):
+    @pytest.mark.asyncio
+    async def test_updates_restart_policy(self):
         """Should update container restart policy."""
         container = MagicMock()
         mock_client = MagicMock()
@@ -311,7 +337,7 @@ class TestContainerMethodsUpdate:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.update("test", restart_policy="unless-stopped")
+            result = await methods.update("test", restart_policy="unless-stopped")
 
         assert result["status"] == "updated"
         container.update.assert_called_once()
@@ -320,7 +346,8 @@ class TestContainerMethodsUpdate:
 class TestContainerMethodsStatus:
     """Tests for ContainerMethods.status()."""
 
-    def test_gets_status(self):
+    @pytest.mark.asyncio
+    async def test_gets_status(self):
         """Should get container status."""
         container = MockContainer(status="running")
         mock_client = MagicMock()
@@ -331,12 +358,13 @@ class TestContainerMethodsStatus:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.status("test")
+            result = await methods.status("test")
 
         assert result["status"] == "running"
         assert result["running"] is True
 
-    def test_includes_logs_when_requested(self):
+    @pytest.mark.asyncio
+    async def test_includes_logs_when_requested(self):
         """Should include logs when requested."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -347,7 +375,7 @@ class TestContainerMethodsStatus:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.status("test", include_logs=True)
+            result = await methods.status("test", include_logs=True)
 
         assert "logs" in result
 
@@ -355,7 +383,8 @@ class TestContainerMethodsStatus:
 class TestContainerMethodsStats:
     """Tests for ContainerMethods.stats()."""
 
-    def test_gets_stats(self):
+    @pytest.mark.asyncio
+    async def test_gets_stats(self):
         """Should get container stats."""
         container = MockContainer()
         mock_client = MagicMock()
@@ -366,7 +395,7 @@ class TestContainerMethodsStats:
         with patch(
             "rpc.methods.docker_containers.get_client", return_value=mock_client
         ):
-            result = methods.stats("test")
+            result = await methods.stats("test")
 
         assert "cpu_percent" in result
         assert "memory_usage" in result
@@ -376,7 +405,8 @@ class TestContainerMethodsStats:
 class TestImageMethodsList:
     """Tests for ImageMethods.list()."""
 
-    def test_lists_images(self):
+    @pytest.mark.asyncio
+    async def test_lists_images(self):
         """Should list images."""
         mock_client = MagicMock()
         mock_client.images.list.return_value = [
@@ -387,7 +417,7 @@ class TestImageMethodsList:
         methods = ImageMethods()
 
         with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
-            result = methods.list()
+            result = await methods.list()
 
         assert len(result) == 2
         assert result[0]["tags"] == ["nginx:latest"]
@@ -396,7 +426,8 @@ class TestImageMethodsList:
 class TestImageMethodsPull:
     """Tests for ImageMethods.pull()."""
 
-    def test_pulls_image(self):
+    @pytest.mark.asyncio
+    async def test_pulls_image(self):
         """Should pull image."""
         mock_image = MockImage()
         mock_client = MagicMock()
@@ -405,23 +436,40 @@ class TestImageMethodsPull:
         methods = ImageMethods()
 
         with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
-            result = methods.pull("nginx", tag="1.21")
+            result = await methods.pull("nginx", tag="1.21")
 
         mock_client.images.pull.assert_called_once_with("nginx", tag="1.21")
         assert "id" in result
+        assert result["digest"] is None
+
+    @pytest.mark.asyncio
+    async def test_reports_digest(self):
+        """Should report the registry digest of the pulled image."""
+        mock_image = MockImage()
+        mock_image.attrs["RepoDigests"] = ["nginx@sha256:abc"]
+        mock_client = MagicMock()
+        mock_client.images.pull.return_value = mock_image
+
+        methods = ImageMethods()
+
+        with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
+            result = await methods.pull("nginx")
+
+        assert result["digest"] == "nginx@sha256:abc"
 
 
 class TestImageMethodsRemove:
     """Tests for ImageMethods.remove()."""
 
-    def test_removes_image(self):
+    @pytest.mark.asyncio
+    async def test_removes_image(self):
         """Should remove image."""
         mock_client = MagicMock()
 
         methods = ImageMethods()
 
         with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
-            result = methods.remove("nginx:latest")
+            result = await methods.remove("nginx:latest")
 
         assert result["status"] == "removed"
         mock_client.images.remove.assert_called_once()
@@ -430,7 +478,8 @@ class TestImageMethodsRemove:
 class TestImageMethodsPrune:
     """Tests for ImageMethods.prune()."""
 
-    def test_prunes_images(self):
+    @pytest.mark.asyncio
+    async def test_prunes_images(self):
         """Should prune unused images."""
         mock_client = MagicMock()
         mock_client.images.prune.return_value = {
@@ -441,7 +490,7 @@ class TestImageMethodsPrune:
         methods = ImageMethods()
 
         with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
-            result = methods.prune()
+            result = await methods.prune()
 
         assert result["space_reclaimed"] == 500000000
 
@@ -449,7 +498,8 @@ class TestImageMethodsPrune:
 class TestVolumeMethodsList:
     """Tests for VolumeMethods.list()."""
 
-    def test_lists_volumes(self):
+    @pytest.mark.asyncio
+    async def test_lists_volumes(self):
         """Should list volumes."""
         mock_client = MagicMock()
         mock_client.volumes.list.return_value = [
@@ -460,7 +510,7 @@ class TestVolumeMethodsList:
         methods = VolumeMethods()
 
         with patch("rpc.methods.docker_volumes.get_client", return_value=mock_client):
-            result = methods.list()
+            result = await methods.list()
 
         assert len(result) == 2
         assert result[0]["name"] == "data"
@@ -469,7 +519,8 @@ class TestVolumeMethodsList:
 class TestVolumeMethodsCreate:
     """Tests for VolumeMethods.create()."""
 
-    def test_creates_volume(self):
+    @pytest.mark.asyncio
+    async def test_creates_volume(self):
         """Should create volume."""
         mock_volume = MockVolume(name="newvol")
         mock_client = MagicMock()
@@ -478,7 +529,7 @@ class TestVolumeMethodsCreate:
         methods = VolumeMethods()
 
         with patch("rpc.methods.docker_volumes.get_client", return_value=mock_client):
-            result = methods.create("newvol")
+            result = await methods.create("newvol")
 
         assert result["name"] == "newvol"
         mock_client.volumes.create.assert_called_once()
@@ -487,7 +538,8 @@ class TestVolumeMethodsCreate:
 class TestVolumeMethodsRemove:
     """Tests for VolumeMethods.remove()."""
 
-    def test_removes_volume(self):
+    @pytest.mark.asyncio
+    async def test_removes_volume(self):
         """Should remove volume."""
         mock_volume = MockVolume()
         mock_client = MagicMock()
@@ -496,7 +548,7 @@ class TestVolumeMethodsRemove:
         methods = VolumeMethods()
 
         with patch("rpc.methods.docker_volumes.get_client", return_value=mock_client):
-            result = methods.remove("data")
+            result = await methods.remove("data")
 
         assert result["status"] == "removed"
 
@@ -504,7 +556,8 @@ class TestVolumeMethodsRemove:
 class TestVolumeMethodsPrune:
     """Tests for VolumeMethods.prune()."""
 
-    def test_prunes_volumes(self):
+    @pytest.mark.asyncio
+    async def test_prunes_volumes(self):
         """Should prune unused volumes."""
         mock_client = MagicMock()
         mock_client.volumes.prune.return_value = {
@@ -515,7 +568,7 @@ class TestVolumeMethodsPrune:
         methods = VolumeMethods()
 
         with patch("rpc.methods.docker_volumes.get_client", return_value=mock_client):
-            result = methods.prune()
+            result = await methods.prune()
 
         assert result["space_reclaimed"] == 100000000
 
@@ -523,7 +576,8 @@ class TestVolumeMethodsPrune:
 class TestNetworkMethodsList:
     """Tests for NetworkMethods.list()."""
 
-    def test_lists_networks(self):
+    @pytest.mark.asyncio
+    async def test_lists_networks(self):
         """Should list networks."""
         mock_client = MagicMock()
         mock_client.networks.list.return_value = [
@@ -534,7 +588,7 @@ class TestNetworkMethodsList:
         methods = NetworkMethods()
 
         with patch("rpc.methods.docker_networks.get_client", return_value=mock_client):
-            result = methods.list()
+            result = await methods.list()
 
         assert len(result) == 2
 
@@ -542,7 +596,8 @@ class TestNetworkMethodsList:
 class TestNetworkMethodsCreate:
     """Tests for NetworkMethods.create()."""
 
-    def test_creates_network(self):
+    @pytest.mark.asyncio
+    async def test_creates_network(self):
         """Should create network."""
         mock_network = MockNetwork(id="new123", name="mynet")
         mock_client = MagicMock()
@@ -551,7 +606,7 @@ class TestNetworkMethodsCreate:
         methods = NetworkMethods()
 
         with patch("rpc.methods.docker_networks.get_client", return_value=mock_client):
-            result = methods.create("mynet")
+            result = await methods.create("mynet")
 
         assert result["name"] == "mynet"
 
@@ -559,7 +614,8 @@ class TestNetworkMethodsCreate:
 class TestNetworkMethodsRemove:
     """Tests for NetworkMethods.remove()."""
 
-    def test_removes_network(self):
+    @pytest.mark.asyncio
+    async def test_removes_network(self):
         """Should remove network."""
         mock_network = MockNetwork()
         mock_client = MagicMock()
@@ -568,6 +624,6 @@ class TestNetworkMethodsRemove:
         methods = NetworkMethods()
 
         with patch("rpc.methods.docker_networks.get_client", return_value=mock_client):
-            result = methods.remove("mynet")
+            result = await methods.remove("mynet")
 
         assert result["status"] == "removed"
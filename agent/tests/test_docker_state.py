@@ -0,0 +1,403 @@
+"""Tests for the Docker state cache.
+
+Tests seeding, event application, change notifications and the cached
+read paths of the Docker RPC methods.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from rpc.methods.docker_containers import ContainerMethods
+from rpc.methods.docker_images import ImageMethods
+from rpc.methods.docker_state import (
+    DockerStateCache,
+    StateMethods,
+    container_change,
+    get_live_cache,
+    set_state_cache,
+)
+from rpc.methods.docker_volumes import VolumeMethods
+from rpc.methods.system import SystemMethods
+
+
+def make_attrs(cid, name, status="running", health=None, created="2024-01-01"):
+    """Build container inspect attributes."""
+    state = {
+        "Status": status,
+        "Running": status == "running",
+        "StartedAt": "2024-01-01T00:00:00Z",
+        "FinishedAt": None,
+    }
+    if health:
+        state["Health"] = {"Status": health}
+    return {
+        "Id": cid,
+        "Name": f"/{name}",
+        "Created": created,
+        "Image": "sha256:" + "a" * 64,
+        "State": state,
+        "RestartCount": 0,
+        "NetworkSettings": {"Networks": {"bridge": {}}},
+        "Mounts": [
+            {"Type": "bind", "Source": "/DATA/x", "Destination": "/data", "Mode": "rw"}
+        ],
+    }
+
+
+def make_api(containers):
+    """Build a mock low-level Docker API client over a container dict."""
+    api = MagicMock()
+    api.containers.return_value = [{"Id": cid} for cid in containers]
+
+    def inspect(cid):
+        if cid not in containers:
+            error = Exception("not found")
+            error.status_code = 404
+            raise error
+        return containers[cid]
+
+    api.inspect_container.side_effect = inspect
+    api.images.return_value = [
+        {"Id": "sha256:" + "a" * 64, "RepoTags": ["nginx:latest"], "Size": 100}
+    ]
+    api.networks.return_value = [{"Id": "n" * 64, "Name": "bridge", "Driver": "bridge"}]
+    api.volumes.return_value = {
+        "Volumes": [{"Name": "data", "Driver": "local", "Mountpoint": "/v"}]
+    }
+    client = MagicMock()
+    client.api = api
+    return client
+
+
+@pytest.fixture
+def containers():
+    """Daemon-side container state."""
+    return {
+        "c1" * 32: make_attrs("c1" * 32, "web", created="2024-01-02"),
+        "c2" * 32: make_attrs("c2" * 32, "db", status="exited"),
+    }
+
+
+@pytest.fixture
+async def seeded_cache(containers):
+    """A cache seeded from the mock daemon and registered globally."""
+    client = make_api(containers)
+    websocket = AsyncMock()
+    cache = DockerStateCache(get_websocket=lambda: websocket)
+    with patch("rpc.methods.docker_state.get_client", return_value=client):
+        await cache._seed()
+        set_state_cache(cache)
+        yield cache, client, websocket
+    set_state_cache(None)
+
+
+class TestContainerChange:
+    """Tests for container_change()."""
+
+    def test_builds_change_record(self):
+        """Should summarize status, networks and mounts."""
+        change = container_change(make_attrs("abc", "web", health="healthy"), "start")
+
+        assert change["name"] == "web"
+        assert change["action"] == "start"
+        assert change["status"] == "running"
+        assert change["health"] == "healthy"
+        assert change["networks"] == ["bridge"]
+        assert change["mounts"][0]["type"] == "bind"
+
+
+class TestDockerStateCacheSeed:
+    """Tests for DockerStateCache seeding."""
+
+    @pytest.mark.asyncio
+    async def test_seed_loads_all_objects(self, seeded_cache):
+        """Should load containers, images, networks and volumes once."""
+        cache, client, _ = seeded_cache
+
+        assert cache.is_live
+        assert cache.updated_at is not None
+        assert len(cache.list_containers(all=True)) == 2
+        assert cache.list_images()[0]["tags"] == ["nginx:latest"]
+        assert cache.list_networks()[0]["name"] == "bridge"
+        assert cache.list_volumes()[0]["name"] == "data"
+        client.api.images.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_lists_running_containers_newest_first(self, seeded_cache):
+        """Should filter stopped containers unless all=True."""
+        cache, _, _ = seeded_cache
+
+        running = cache.list_containers()
+        everything = cache.list_containers(all=True)
+
+        assert [c["name"] for c in running] == ["web"]
+        assert running[0]["image"] == "nginx:latest"
+        assert [c["name"] for c in everything] == ["web", "db"]
+
+    @pytest.mark.asyncio
+    async def test_counts_containers(self, seeded_cache):
+        """Should count running and stopped containers."""
+        cache, _, _ = seeded_cache
+
+        assert cache.container_counts() == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_finds_container_by_name_id_and_prefix(self, seeded_cache):
+        """Should resolve references the way Docker does."""
+        cache, _, _ = seeded_cache
+
+        assert cache.find_container("web")["Id"] == "c1" * 32
+        assert cache.find_container("c1" * 32)["Name"] == "/web"
+        assert cache.find_container("c2c2")["Name"] == "/db"
+        assert cache.find_container("c") is None  # Ambiguous prefix
+        assert cache.find_container("missing") is None
+
+
+class TestDockerStateCacheEvents:
+    """Tests for applying Docker events."""
+
+    @pytest.mark.asyncio
+    async def test_container_event_refreshes_and_notifies(
+        self, seeded_cache, containers
+    ):
+        """Should re-inspect the container and push the change."""
+        cache, client, websocket = seeded_cache
+        containers["c2" * 32] = make_attrs("c2" * 32, "db", status="running")
+
+        with patch("rpc.methods.docker_state.get_client", return_value=client):
+            await cache._apply_events(
+                [{"Type": "container", "Action": "start", "Actor": {"ID": "c2" * 32}}]
+            )
+
+        assert cache.container_counts() == (2, 0)
+        sent = json.loads(websocket.send.call_args[0][0])
+        assert sent["method"] == "docker.state_changed"
+        assert sent["params"]["containers"][0]["name"] == "db"
+        assert sent["params"]["containers"][0]["status"] == "running"
+
+    @pytest.mark.asyncio
+    async def test_destroy_removes_without_inspect(self, seeded_cache):
+        """Should drop destroyed containers without calling the daemon."""
+        cache, client, websocket = seeded_cache
+        client.api.inspect_container.reset_mock()
+
+        with patch("rpc.methods.docker_state.get_client", return_value=client):
+            await cache._apply_events(
+                [
+                    {
+                        "Type": "container",
+                        "Action": "destroy",
+                        "Actor": {"ID": "c2" * 32, "Attributes": {"name": "db"}},
+                    }
+                ]
+            )
+
+        client.api.inspect_container.assert_not_called()
+        assert cache.find_container("db") is None
+        change = json.loads(websocket.send.call_args[0][0])["params"]["containers"][0]
+        assert change == {
+            "id": "c2" * 32,
+            "name": "db",
+            "action": "destroy",
+            "removed": True,
+        }
+
+    @pytest.mark.asyncio
+    async def test_ignores_exec_events(self, seeded_cache):
+        """Should ignore healthcheck exec events entirely."""
+        cache, client, websocket = seeded_cache
+        client.api.inspect_container.reset_mock()
+
+        with patch("rpc.methods.docker_state.get_client", return_value=client):
+            await cache._apply_events(
+                [
+                    {
+                        "Type": "container",
+                        "Action": "exec_start: /bin/sh -c curl localhost",
+                        "Actor": {"ID": "c1" * 32},
+                    }
+                ]
+            )
+
+        client.api.inspect_container.assert_not_called()
+        websocket.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_coalesces_duplicate_events(self, seeded_cache):
+        """Should inspect each container once per batch."""
+        cache, client, _ = seeded_cache
+        client.api.inspect_container.reset_mock()
+        events = [
+            {"Type": "container", "Action": action, "Actor": {"ID": "c1" * 32}}
+            for action in ("kill", "die", "stop")
+        ]
+
+        with patch("rpc.methods.docker_state.get_client", return_value=client):
+            await cache._apply_events(events)
+
+        client.api.inspect_container.assert_called_once_with("c1" * 32)
+
+    @pytest.mark.asyncio
+    async def test_image_event_reloads_images(self, seeded_cache):
+        """Should reload the image list on image events."""
+        cache, client, websocket = seeded_cache
+        client.api.images.return_value = []
+
+        with patch("rpc.methods.docker_state.get_client", return_value=client):
+            await cache._apply_events(
+                [{"Type": "image", "Action": "delete", "Actor": {"ID": "x"}}]
+            )
+
+        assert cache.list_images() == []
+        websocket.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reports_lost_sync(self, seeded_cache):
+        """Should push the snapshot as live, then the loss of sync once."""
+        cache, client, websocket = seeded_cache
+
+        with (
+            patch("rpc.methods.docker_state.get_client", return_value=client),
+            patch.object(
+                cache, "_follow_events", AsyncMock(side_effect=OSError("gone"))
+            ),
+            patch("asyncio.sleep", AsyncMock(side_effect=asyncio.CancelledError)),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await cache._run()
+
+        sent = [json.loads(c[0][0])["params"] for c in websocket.send.call_args_list]
+        assert [(p["live"], p["full"]) for p in sent] == [(True, True), (False, False)]
+        assert sent[1]["containers"] == []
+        assert not cache.is_live
+
+
+class TestCachedReadPaths:
+    """Tests for RPC methods served from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_list_served_from_cache(self, seeded_cache):
+        """Should not call the daemon when the cache is live."""
+        mock_client = MagicMock()
+
+        with patch(
+            "rpc.methods.docker_containers.get_client", return_value=mock_client
+        ):
+            result = await ContainerMethods().list(all=True)
+
+        assert len(result) == 2
+        mock_client.containers.list.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_served_from_cache_with_timestamp(self, seeded_cache):
+        """Should return cached status with an as_of timestamp."""
+        cache, _, _ = seeded_cache
+        mock_client = MagicMock()
+
+        with patch(
+            "rpc.methods.docker_containers.get_client", return_value=mock_client
+        ):
+            result = await ContainerMethods().status("web")
+
+        assert result["status"] == "running"
+        assert result["as_of"] == cache.updated_at
+        mock_client.containers.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_write_falls_back_until_event(self, seeded_cache):
+        """Should read a just-written container from the daemon."""
+        cache, _, _ = seeded_cache
+        mock_client = MagicMock()
+        mock_client.containers.get.return_value.attrs = make_attrs(
+            "c1" * 32, "web", status="exited"
+        )
+
+        with (
+            patch("rpc.methods.docker_containers.get_async_client", return_value=None),
+            patch("rpc.methods.docker_containers.get_client", return_value=mock_client),
+        ):
+            methods = ContainerMethods()
+            await methods.stop("web")
+            result = await methods.status("web")
+
+        assert result["status"] == "exited"
+        assert "as_of" not in result
+        assert cache.has_pending_writes()
+
+    @pytest.mark.asyncio
+    async def test_list_write_falls_back_until_event(self, seeded_cache):
+        """Should list volumes from the daemon after a write until its event."""
+        cache, client, _ = seeded_cache
+        mock_client = MagicMock()
+        mock_client.volumes.list.return_value = []
+
+        with (
+            patch("rpc.methods.docker_volumes.get_async_client", return_value=None),
+            patch("rpc.methods.docker_volumes.get_client", return_value=mock_client),
+        ):
+            methods = VolumeMethods()
+            await methods.remove("data")
+            assert await methods.list() == []
+
+            client.api.volumes.return_value = {"Volumes": []}
+            with patch("rpc.methods.docker_state.get_client", return_value=client):
+                await cache._apply_events(
+                    [{"Type": "volume", "Action": "destroy", "Actor": {"ID": "data"}}]
+                )
+            assert await methods.list() == []
+
+        mock_client.volumes.list.assert_called_once()
+        assert cache.serves_list("volumes")
+        assert cache.serves_list("images")
+
+    @pytest.mark.asyncio
+    async def test_images_and_metrics_served_from_cache(self, seeded_cache):
+        """Should serve image list and container counts from the cache."""
+        mock_client = MagicMock()
+
+        with patch("rpc.methods.docker_images.get_client", return_value=mock_client):
+            images = await ImageMethods().list()
+        with patch("rpc.methods.system.get_client", return_value=mock_client):
+            with patch("psutil.cpu_percent", return_value=1.0):
+                metrics = SystemMethods().get_metrics()
+
+        assert images[0]["tags"] == ["nginx:latest"]
+        assert metrics["containers"] == {"running": 1, "stopped": 1}
+        mock_client.images.list.assert_not_called()
+        mock_client.containers.list.assert_not_called()
+
+    def test_not_used_when_not_live(self):
+        """Should ignore a cache that is not in sync."""
+        cache = DockerStateCache(get_websocket=lambda: None)
+        set_state_cache(cache)
+        try:
+            assert get_live_cache() is None
+            assert StateMethods().snapshot()["live"] is False
+        finally:
+            set_state_cache(None)
+
+
+class TestStateMethodsSnapshot:
+    """Tests for StateMethods.snapshot()."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_includes_freshness(self, seeded_cache):
+        """Should return every object kind with freshness timestamps."""
+        cache, _, _ = seeded_cache
+
+        snapshot = StateMethods().snapshot()
+
+        assert snapshot["live"] is True
+        assert snapshot["as_of"] == cache.updated_at
+        assert len(snapshot["containers"]) == 2
+        assert snapshot["volumes"][0]["name"] == "data"
+
+    def test_snapshot_without_cache(self):
+        """Should report not live when no cache is running."""
+        snapshot = StateMethods().snapshot()
+
+        assert snapshot["live"] is False
+        assert snapshot["containers"] == []
@@ -0,0 +1,252 @@
+"""Tests for streaming container stats.
+
+Tests figures computed from consecutive samples, subscriptions following the
+running containers, batch notifications and the stats served to RPC calls.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from rpc.methods import docker_containers, docker_stats
+from rpc.methods.docker_containers import ContainerMethods
+from rpc.methods.docker_stats import (
+    ContainerStatsCollector,
+    StatsMethods,
+    StatsSubscription,
+    set_stats_collector,
+    summarize,
+)
+
+
+def make_sample(total, system, memory=100, rx=10, read=5):
+    """Build a stats sample with cumulative counters."""
+    return {
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": total},
+            "system_cpu_usage": system,
+            "online_cpus": 2,
+        },
+        "precpu_stats": {},
+        "memory_stats": {
+            "usage": memory,
+            "limit": 1000,
+            "stats": {"inactive_file": 40},
+        },
+        "networks": {"eth0": {"rx_bytes": rx, "tx_bytes": 1}, "eth1": {"rx_bytes": rx}},
+        "blkio_stats": {
+            "io_service_bytes_recursive": [
+                {"op": "read", "value": read},
+                {"op": "Write", "value": 7},
+            ]
+        },
+        "pids_stats": {"current": 3},
+    }
+
+
+class FakeStreamClient:
+    """Asyncio client whose stats streams yield queued samples."""
+
+    def __init__(self, containers):
+        self.containers = containers
+        self.samples = {}
+        self.streams = []
+
+    async def get(self, path, params=None):
+        return self.containers
+
+    async def stream(self, method, path, params=None, pooled=True):
+        self.streams.append((path, pooled))
+        for sample in self.samples.get(path, []):
+            yield sample
+        await asyncio.Event().wait()
+
+
+def summary(cid, name):
+    """Running container summary as listed by the daemon."""
+    return {"Id": cid * 32, "Names": [f"/{name}"]}
+
+
+class TestSummarize:
+    """Tests for summarize()."""
+
+    def test_uses_previous_sample(self):
+        """CPU should be computed against the previous sample on the stream."""
+        result = summarize(make_sample(300, 2000), make_sample(100, 1000))
+
+        assert result == {
+            "cpu": 40.0,
+            "mem": 60,
+            "mem_limit": 1000,
+            "net_rx": 20,
+            "net_tx": 1,
+            "blk_read": 5,
+            "blk_write": 7,
+            "pids": 3,
+        }
+
+    def test_no_system_cpu_reading(self):
+        """A sample without system CPU time should report no CPU usage."""
+        sample = make_sample(300, 2000)
+        sample["cpu_stats"]["system_cpu_usage"] = 0
+
+        assert summarize(sample)["cpu"] == 0.0
+
+    def test_cgroup_v1_memory(self):
+        """Reclaimable cache should be subtracted on cgroup v1 too."""
+        sample = make_sample(300, 2000)
+        sample["memory_stats"]["stats"] = {"total_inactive_file": 30}
+
+        assert summarize(sample)["mem"] == 70
+
+
+class TestStatsSubscription:
+    """Tests for StatsSubscription."""
+
+    def test_consecutive_samples(self):
+        """Each sample should become the baseline of the next one."""
+        sub = StatsSubscription("c1", "web")
+
+        sub.add(make_sample(100, 1000))
+        sub.add(make_sample(150, 1100))
+
+        assert sub.latest["cpu"] == 100.0
+        assert sub.fresh is True
+        assert sub.entry()["name"] == "web"
+
+    def test_ignores_empty_sample(self):
+        """Samples of a stopped container carry no figures."""
+        sub = StatsSubscription("c1", "web")
+
+        sub.add({"cpu_stats": {}})
+
+        assert sub.latest is None
+
+
+class TestContainerStatsCollector:
+    """Tests for subscriptions and batches."""
+
+    @pytest.fixture
+    def client(self):
+        """Route the collector to a fake asyncio client."""
+        fake = FakeStreamClient([summary("a", "web"), summary("b", "db")])
+        with (
+            patch.object(docker_stats, "get_live_cache", return_value=None),
+            patch.object(docker_stats, "get_async_client", return_value=fake),
+        ):
+            yield fake
+
+    @pytest.mark.asyncio
+    async def test_follows_running_containers(self, client):
+        """Subscriptions should be opened and closed as containers come and go."""
+        collector = ContainerStatsCollector(lambda: 10, lambda: None)
+
+        await collector._sync()
+        await asyncio.sleep(0)
+        assert sorted(collector._subscriptions) == ["a" * 12, "b" * 12]
+        assert client.streams[0] == (f"/containers/{'a' * 12}/stats", False)
+
+        client.containers = [summary("b", "db")]
+        await collector._sync()
+        assert list(collector._subscriptions) == ["b" * 12]
+
+        await collector.stop()
+        assert collector._subscriptions == {}
+
+    @pytest.mark.asyncio
+    async def test_pushes_one_batch_of_fresh_stats(self, client):
+        """One notification should carry every container with a new sample."""
+        client.samples[f"/containers/{'a' * 12}/stats"] = [
+            make_sample(100, 1000),
+            make_sample(150, 1100),
+        ]
+        websocket = AsyncMock()
+        collector = ContainerStatsCollector(lambda: 10, lambda: websocket)
+
+        await collector._sync()
+        await asyncio.sleep(0)
+        await collector._push()
+        await collector._push()
+        await collector.stop()
+
+        websocket.send.assert_called_once()
+        message = json.loads(websocket.send.call_args[0][0])
+        assert message["method"] == "docker.stats.batch"
+        assert message["params"]["interval"] == 10
+        assert [c["name"] for c in message["params"]["containers"]] == ["web"]
+        assert message["params"]["containers"][0]["cpu"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_docker_py_fallback(self):
+        """Without the asyncio client streams should be read in threads."""
+        client = MagicMock()
+        client.api.containers.return_value = [summary("a", "web")]
+        client.api.stats.return_value = iter([make_sample(100, 1000)])
+        collector = ContainerStatsCollector(lambda: 10, lambda: None)
+
+        with (
+            patch.object(docker_stats, "get_live_cache", return_value=None),
+            patch.object(docker_stats, "get_async_client", return_value=None),
+            patch.object(docker_stats, "get_client", return_value=client),
+        ):
+            await collector._sync()
+            sub = collector._subscriptions["a" * 12]
+            await asyncio.wait_for(sub.task, timeout=5)
+
+        assert sub.latest["mem"] == 60
+        client.api.stats.assert_called_once_with("a" * 12, stream=True, decode=True)
+        # The stream ended, so the next sync subscribes again
+        assert collector._subscriptions == {}
+
+
+class TestStatsReads:
+    """Tests for reads served from the collector."""
+
+    @pytest.fixture
+    def collector(self):
+        """Install a collector following one container."""
+        collector = ContainerStatsCollector(lambda: 10, lambda: None)
+        sub = StatsSubscription("a" * 12, "web")
+        sub.add(make_sample(100, 1000))
+        collector._subscriptions[sub.container_id] = sub
+        set_stats_collector(collector)
+        yield collector
+        set_stats_collector(None)
+
+    @pytest.mark.asyncio
+    async def test_container_stats_served_from_collector(self, collector):
+        """Should not ask the daemon for a followed container."""
+        with patch.object(docker_containers, "get_async_client") as mock_api:
+            result = await ContainerMethods().stats("web")
+
+        assert result == {"cpu_percent": 20.0, "memory_usage": 60, "memory_limit": 1000}
+        mock_api.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_daemon_paths_match_collector(self, collector):
+        """Stats read from the daemon should exclude the page cache too."""
+        followed = await ContainerMethods().stats("web")
+        set_stats_collector(None)
+        api = MagicMock(get=AsyncMock(return_value=make_sample(100, 1000)))
+        client = MagicMock()
+        client.containers.get.return_value.stats.return_value = make_sample(100, 1000)
+
+        with patch.object(docker_containers, "get_async_client", return_value=api):
+            native = await ContainerMethods().stats("web")
+        with (
+            patch.object(docker_containers, "get_async_client", return_value=None),
+            patch.object(docker_containers, "get_client", return_value=client),
+        ):
+            docker_py = await ContainerMethods().stats("web")
+
+        assert native == docker_py == followed
+
+    def test_latest(self, collector):
+        """Should list the latest figures of every followed container."""
+        assert StatsMethods().latest()[0]["id"] == "a" * 12
+
+    def test_latest_without_collector(self):
+        """Should be empty while the agent is not connected."""
+        assert StatsMethods().latest() == []
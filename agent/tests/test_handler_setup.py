@@ -177,7 +177,7 @@ class TestSetupAllHandlers:
         shutdown = AsyncMock()
 
         with patch("handler_setup.setup_agent_handlers"):
-            with patch("handler_setup.SystemMethods"):
+            with patch("handler_setup.SystemMethods") as mock_system:
                 setup_all_handlers(
                     rpc_handler=rpc_handler,
                     get_config=get_config,
@@ -187,8 +187,10 @@ class TestSetupAllHandlers:
                 )
 
                 calls = rpc_handler.register_module.call_args_list
-                system_call = [c for c in calls if c[0][0] == "system"]
-                assert len(system_call) == 1
+                system_calls = [c for c in calls if c[0][0] == "system"]
+                # SystemMethods plus the streaming exec and volume methods
+                assert len(system_calls) == 3
+                assert system_calls[0][0][1] is mock_system.return_value
 
     def test_registers_agent_methods(self):
         """Should register agent methods."""
@@ -249,6 +251,7 @@ class TestSetupAllHandlers:
                 shutdown=shutdown,
             )
 
-        # Should have registered 6 modules
-        # docker.containers, docker.images, docker.volumes, docker.networks, system, agent
-        assert rpc_handler.register_module.call_count == 6
+        # Should have registered 11 modules
+        # docker.containers, docker.images, docker.volumes, docker.networks,
+        # docker.state, docker.logs, docker.stats, system (three times), agent
+        assert rpc_handler.register_module.call_count == 11
@@ -0,0 +1,230 @@
+"""Tests for streaming command execution.
+
+Tests line splitting, framing, exit codes, timeouts, cancellation and the
+security checks shared with system.exec.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from rpc.errors import RateLimitError, SecurityError
+from rpc.methods import system_exec
+from rpc.methods.system_exec import (
+    ExecStreamManager,
+    ExecStreamMethods,
+    LineBuffer,
+    set_exec_streams,
+)
+
+
+def sent_frames(websocket):
+    """Decode all notification frames sent on a mock websocket."""
+    return [json.loads(c[0][0])["params"] for c in websocket.send.call_args_list]
+
+
+async def wait_done(manager):
+    """Wait for all commands of a manager to finish."""
+    for _ in range(500):
+        if not manager.active():
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def allow_all():
+    """Accept every command and count slot usage."""
+    with patch.object(system_exec, "validate_command", return_value=(True, "")):
+        with patch.object(
+            system_exec, "acquire_command_slot", return_value=(True, "")
+        ) as acquire:
+            with patch.object(system_exec, "release_command_slot") as release:
+                yield acquire, release
+
+
+class TestLineBuffer:
+    """Tests for LineBuffer."""
+
+    def test_keeps_partial_line_and_splits_carriage_returns(self):
+        """feed should hold back partial lines and treat \\r as a line end."""
+        buffer = LineBuffer()
+
+        assert buffer.feed(b"10%\r20%\r\n\nnext") == ["10%", "20%"]
+        assert buffer.feed(b" line\n") == ["next line"]
+        assert buffer.flush() == []
+
+    def test_emits_runaway_lines_in_pieces(self):
+        """A line without terminator should not be buffered without bound."""
+        buffer = LineBuffer()
+        data = b"x" * (system_exec.MAX_LINE_CHARS + 10)
+
+        assert buffer.feed(data) == [data.decode()]
+        assert buffer.feed(b"tail") == []
+        assert buffer.flush() == ["tail"]
+
+
+class TestExecStreamManager:
+    """Tests for ExecStreamManager."""
+
+    @pytest.mark.asyncio
+    async def test_streams_stdout_stderr_and_exit_code(self, allow_all):
+        """Should push output lines, then a done frame with the exit code."""
+        websocket = AsyncMock()
+        manager = ExecStreamManager(get_websocket=lambda: websocket)
+
+        result = await manager.start(
+            "printf 'one\\ntwo\\n'; echo oops >&2; exit 3", "s-1", timeout=10
+        )
+        assert result["started"] is True
+        assert result["stream_id"] == "s-1"
+        await wait_done(manager)
+
+        frames = sent_frames(websocket)
+        assert [f["seq"] for f in frames] == list(range(1, len(frames) + 1))
+        assert all(f["stream_id"] == "s-1" for f in frames)
+        assert [line for f in frames for line in f["stdout"]] == ["one", "two"]
+        assert [line for f in frames for line in f["stderr"]] == ["oops"]
+        assert frames[-1]["done"] is True
+        assert frames[-1]["exit_code"] == 3
+        assert frames[-1]["reason"] == "exit"
+        allow_all[1].assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_splits_large_output_into_bounded_frames(self, allow_all):
+        """Frames should never exceed MAX_FRAME_LINES."""
+        websocket = AsyncMock()
+        manager = ExecStreamManager(get_websocket=lambda: websocket)
+
+        with patch.object(system_exec, "MAX_FRAME_LINES", 10):
+            await manager.start("seq 1 95", "s-1", timeout=10)
+            await wait_done(manager)
+
+        frames = sent_frames(websocket)
+        lines = [line for f in frames for line in f["stdout"]]
+        assert lines == [str(i) for i in range(1, 96)]
+        assert max(len(f["stdout"]) for f in frames) == 10
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_command(self, allow_all):
+        """Should kill the command and report the timeout."""
+        websocket = AsyncMock()
+        manager = ExecStreamManager(get_websocket=lambda: websocket)
+
+        await manager.start("echo started; sleep 30", "s-1", timeout=1)
+        await wait_done(manager)
+
+        final = sent_frames(websocket)[-1]
+        assert final["done"] is True
+        assert final["reason"] == "timeout"
+        assert final["exit_code"] == -1
+        assert "timed out" in final["error"]
+        allow_all[1].assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_timeout_covers_command_with_closed_output(self, allow_all):
+        """A command that closes its pipes and keeps running should time out."""
+        websocket = AsyncMock()
+        manager = ExecStreamManager(get_websocket=lambda: websocket)
+
+        await manager.start("exec >&- 2>&-; sleep 30", "s-1", timeout=1)
+        await wait_done(manager)
+
+        assert manager.active() == []
+        final = sent_frames(websocket)[-1]
+        assert final["reason"] == "timeout"
+        allow_all[1].assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_command(self, allow_all):
+        """cancel should end the command with a cancelled frame."""
+        websocket = AsyncMock()
+        manager = ExecStreamManager(get_websocket=lambda: websocket)
+
+        await manager.start("sleep 30", "s-1", timeout=60)
+
+        assert await manager.cancel("s-1") is True
+        assert await manager.cancel("s-1") is False
+        assert manager.active() == []
+        final = sent_frames(websocket)[-1]
+        assert final["reason"] == "cancelled"
+        allow_all[1].assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_blocked_command_is_not_started(self):
+        """Commands outside the allowlist should be reported like system.exec."""
+        manager = ExecStreamManager(get_websocket=AsyncMock)
+
+        with patch.object(
+            system_exec, "validate_command", return_value=(False, "not allowed")
+        ):
+            result = await manager.start("rm -rf /", "s-1")
+
+        assert result["started"] is False
+        assert result["security_blocked"] is True
+        assert result["exit_code"] == -1
+        assert manager.active() == []
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_command_is_not_started(self):
+        """Should not spawn when no command slot is available."""
+        manager = ExecStreamManager(get_websocket=AsyncMock)
+
+        with patch.object(system_exec, "validate_command", return_value=(True, "")):
+            with patch.object(
+                system_exec, "acquire_command_slot", return_value=(False, "busy")
+            ):
+                result = await manager.start("uptime", "s-1")
+
+        assert result["rate_limited"] is True
+        assert result["stderr"] == "Rate limit: busy"
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_duplicate_and_excess_streams(self, allow_all):
+        """Should validate stream IDs and cap concurrent commands."""
+        manager = ExecStreamManager(get_websocket=AsyncMock)
+
+        with pytest.raises(SecurityError):
+            await manager.start("uptime", "bad id!")
+
+        with patch.object(system_exec, "MAX_STREAMS", 1):
+            await manager.start("sleep 30", "s-1", timeout=60)
+            with pytest.raises(SecurityError):
+                await manager.start("sleep 30", "s-1", timeout=60)
+            with pytest.raises(RateLimitError):
+                await manager.start("sleep 30", "s-2", timeout=60)
+
+        await manager.stop()
+        assert manager.active() == []
+
+
+class TestExecStreamMethods:
+    """Tests for the system.exec_stream RPC methods."""
+
+    @pytest.mark.asyncio
+    async def test_requires_running_manager(self):
+        """Should fail cleanly when the agent is not connected."""
+        set_exec_streams(None)
+
+        with pytest.raises(RateLimitError):
+            await ExecStreamMethods().exec_stream("uptime", "s-1")
+        assert ExecStreamMethods().exec_active() == []
+
+    @pytest.mark.asyncio
+    async def test_delegates_to_manager(self, allow_all):
+        """exec_stream and exec_cancel should use the installed manager."""
+        manager = ExecStreamManager(get_websocket=AsyncMock)
+        set_exec_streams(manager)
+        methods = ExecStreamMethods()
+        try:
+            result = await methods.exec_stream("sleep 30", "s-1", timeout=60)
+            assert result["started"] is True
+            assert methods.exec_active()[0]["stream_id"] == "s-1"
+
+            assert await methods.exec_cancel("s-1") == {
+                "stream_id": "s-1",
+                "cancelled": True,
+            }
+        finally:
+            set_exec_streams(None)
@@ -283,59 +283,6 @@ class TestSystemMethodsPreflightCheck:
         assert any("MB" in e for e in result["errors"])
 
 
-class TestSystemMethodsPrepareVolumes:
-    """Tests for SystemMethods.prepare_volumes()."""
-
-    def test_skips_named_volumes(self):
-        """Should skip named volumes (no leading /)."""
-        methods = SystemMethods()
-
-        result = methods.prepare_volumes([{"host": "myvolume", "container": "/data"}])
-
-        assert result["results"][0]["status"] == "skipped"
-        assert result["results"][0]["reason"] == "named volume"
-
-    def test_skips_disallowed_paths(self):
-        """Should skip paths not in allowed directories."""
-        methods = SystemMethods()
-
-        result = methods.prepare_volumes(
-            [{"host": "/etc/passwd", "container": "/data"}]
-        )
-
-        assert result["results"][0]["status"] == "skipped"
-        assert "not in allowed paths" in result["results"][0]["reason"]
-
-    def test_creates_allowed_directory(self):
-        """Should create directory for allowed path."""
-        methods = SystemMethods()
-
-        with patch("os.path.exists", return_value=False):
-            with patch("os.makedirs") as mock_makedirs:
-                with patch("os.chown"):
-                    with patch("os.walk", return_value=[]):
-                        result = methods.prepare_volumes(
-                            [{"host": "/DATA/myapp/config", "container": "/config"}]
-                        )
-
-        assert result["success"] is True
-        assert result["results"][0]["status"] == "ok"
-        mock_makedirs.assert_called()
-
-    def test_handles_permission_error(self):
-        """Should handle permission errors."""
-        methods = SystemMethods()
-
-        with patch("os.path.exists", return_value=False):
-            with patch("os.makedirs", side_effect=PermissionError("Access denied")):
-                result = methods.prepare_volumes(
-                    [{"host": "/DATA/protected", "container": "/data"}]
-                )
-
-        assert result["success"] is False
-        assert result["results"][0]["status"] == "error"
-
-
 class TestSystemMethodsGetMetrics:
     """Tests for SystemMethods.get_metrics()."""
 
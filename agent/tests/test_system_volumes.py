@@ -0,0 +1,265 @@
+"""Tests for volume preparation.
+
+Tests path checks, ownership changes that skip already-owned entries and
+never follow symlinks, top-level-only mode and progress notifications.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from rpc.errors import SecurityError
+from rpc.methods import system_volumes
+from rpc.methods.system_volumes import (
+    ChownStats,
+    VolumePrepManager,
+    VolumePrepMethods,
+    chown_tree,
+)
+
+
+def record_chown(calls):
+    """os.chown stand-in recording the full path of every change."""
+
+    def chown(name, uid, gid, *, dir_fd=None, follow_symlinks=True):
+        if dir_fd is not None:
+            name = os.path.join(os.readlink(f"/proc/self/fd/{dir_fd}"), name)
+        calls.append((name, follow_symlinks))
+
+    return chown
+
+
+def sent_frames(websocket):
+    """Decode all notification frames sent on a mock websocket."""
+    return [json.loads(c[0][0])["params"] for c in websocket.send.call_args_list]
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    """Allow volume preparation under a temporary directory."""
+    root = tmp_path / "DATA"
+    root.mkdir()
+    with patch.object(system_volumes, "ALLOWED_DATA_PATHS", [str(root)]):
+        yield root
+
+
+@pytest.fixture
+def tree(data_root):
+    """Existing volume with nested files and a symlink out of the volume."""
+    outside = data_root.parent / "outside"
+    outside.mkdir()
+    (outside / "secret").write_text("x")
+    volume = data_root / "app"
+    (volume / "a" / "b").mkdir(parents=True)
+    (volume / "c").mkdir()
+    (volume / "a" / "f1").write_text("1")
+    (volume / "a" / "b" / "f2").write_text("2")
+    (volume / "c" / "f3").write_text("3")
+    (volume / "link").symlink_to(outside)
+    return volume
+
+
+class TestChownTree:
+    """Tests for chown_tree()."""
+
+    def test_changes_entries_without_following_symlinks(self, tree):
+        """Every entry should be changed once; symlinks are not descended."""
+        stats = ChownStats()
+        calls = []
+        with patch.object(system_volumes.os, "chown", side_effect=record_chown(calls)):
+            chown_tree(str(tree), os.getuid() + 1, os.getgid(), stats, workers=3)
+
+        assert sorted(name for name, _ in calls) == sorted(
+            str(tree / p) for p in ("a", "a/b", "a/f1", "a/b/f2", "c", "c/f3", "link")
+        )
+        assert not any(follow for _, follow in calls)
+        assert stats.snapshot() == {"scanned": 7, "changed": 7, "failed": 0}
+
+    def test_refuses_symlinked_root(self, tree):
+        """A root that is a symlink should not be walked."""
+        with pytest.raises(OSError):
+            chown_tree(str(tree / "link"), os.getuid() + 1, os.getgid(), ChownStats())
+
+    def test_swapped_directory_not_followed(self, tree):
+        """A queued directory replaced by a symlink should fail to open."""
+        stats = ChownStats()
+        calls = []
+        root_fd = os.open(str(tree), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            with patch.object(
+                system_volumes.os, "chown", side_effect=record_chown(calls)
+            ):
+                system_volumes._chown_dir(
+                    root_fd,
+                    ("link",),
+                    os.getuid() + 1,
+                    os.getgid(),
+                    stats,
+                    queue.Queue(),
+                )
+        finally:
+            os.close(root_fd)
+
+        assert calls == []
+        assert stats.snapshot() == {"scanned": 0, "changed": 0, "failed": 1}
+
+    def test_skips_owned_entries(self, tree):
+        """Entries already owned by the target should not be changed."""
+        stats = ChownStats()
+        with patch.object(system_volumes.os, "chown") as mock_chown:
+            chown_tree(str(tree), os.getuid(), os.getgid(), stats)
+
+        mock_chown.assert_not_called()
+        assert stats.snapshot() == {"scanned": 7, "changed": 0, "failed": 0}
+
+    def test_counts_failures(self, tree):
+        """Entries that cannot be changed should be counted, not raised."""
+        stats = ChownStats()
+        with patch.object(system_volumes.os, "chown", side_effect=PermissionError):
+            chown_tree(str(tree), os.getuid() + 1, os.getgid(), stats)
+
+        assert stats.snapshot()["failed"] == 7
+
+    def test_stops_when_cancelled(self, tree):
+        """A cancelled walk should not scan further directories."""
+        stats = ChownStats()
+        cancelled = threading.Event()
+        cancelled.set()
+
+        chown_tree(str(tree), os.getuid(), os.getgid(), stats, cancelled)
+
+        assert stats.snapshot()["scanned"] == 0
+
+
+class TestPrepareVolumes:
+    """Tests for system.prepare_volumes."""
+
+    @pytest.mark.asyncio
+    async def test_skips_named_and_disallowed(self, data_root):
+        """Named volumes and paths outside the allowed roots are skipped."""
+        result = await VolumePrepMethods().prepare_volumes(
+            [
+                {"host": "myvolume", "container": "/data"},
+                {"host": "/etc/passwd", "container": "/data"},
+                {"host": f"{data_root}/../outside", "container": "/data"},
+                {"host": f"{data_root}x/app", "container": "/data"},
+            ]
+        )
+
+        assert result["results"][0]["reason"] == "named volume"
+        assert all("not in allowed paths" in r["reason"] for r in result["results"][1:])
+
+    @pytest.mark.asyncio
+    async def test_creates_and_reports_counts(self, data_root, tree):
+        """Directories should be created and entry counts reported."""
+        new = data_root / "other" / "config"
+
+        result = await VolumePrepMethods().prepare_volumes(
+            [
+                {"host": str(new)},
+                {"host": str(tree), "uid": os.getuid(), "gid": os.getgid()},
+            ],
+            default_uid=os.getuid(),
+            default_gid=os.getgid(),
+        )
+
+        assert result["success"] is True
+        assert new.is_dir()
+        assert result["results"][1]["status"] == "ok"
+        assert result["results"][1]["scanned"] == 7
+        assert result["results"][1]["changed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_refuses_symlinked_volume(self, tree):
+        """A volume path that is a symlink should not be changed."""
+        with patch.object(system_volumes.os, "chown") as mock_chown:
+            result = await VolumePrepMethods().prepare_volumes(
+                [{"host": str(tree / "link")}]
+            )
+
+        assert result["success"] is False
+        assert result["results"][0]["error"] == "symlink"
+        mock_chown.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_top_level_only(self, tree):
+        """Non-recursive preparation should only change the volume itself."""
+        with patch.object(system_volumes.os, "chown") as mock_chown:
+            result = await VolumePrepMethods().prepare_volumes(
+                [{"host": str(tree), "uid": os.getuid() + 1}], recursive=False
+            )
+
+        assert result["results"][0]["scanned"] == 0
+        mock_chown.assert_called_once_with(
+            str(tree), os.getuid() + 1, 1000, follow_symlinks=False
+        )
+
+    @pytest.mark.asyncio
+    async def test_handles_permission_error(self, data_root):
+        """Permission errors should fail the volume."""
+        with patch.object(
+            system_volumes.os, "makedirs", side_effect=PermissionError("denied")
+        ):
+            result = await VolumePrepMethods().prepare_volumes(
+                [{"host": str(data_root / "protected")}]
+            )
+
+        assert result["success"] is False
+        assert result["results"][0]["error"] == "permission denied"
+
+
+class TestVolumePrepManager:
+    """Tests for off-loop preparation and progress frames."""
+
+    @pytest.mark.asyncio
+    async def test_pushes_progress_while_running(self, tree):
+        """Progress frames should be sent while the threads work."""
+        websocket = AsyncMock()
+        manager = VolumePrepManager(lambda: websocket)
+
+        def slow_tree(root, uid, gid, stats, cancelled=None):
+            stats.add(5, 2, 0)
+            time.sleep(0.1)
+
+        with (
+            patch.object(system_volumes, "PROGRESS_INTERVAL", 0.01),
+            patch.object(system_volumes, "chown_tree", side_effect=slow_tree),
+        ):
+            result = await manager.prepare([{"host": str(tree)}], progress_id="prep-1")
+
+        frames = sent_frames(websocket)
+        assert len(frames) >= 2
+        assert frames[0]["progress_id"] == "prep-1"
+        assert frames[0]["path"] == str(tree)
+        assert frames[0]["done"] is False
+        assert frames[-1]["done"] is True
+        assert frames[-1]["volumes_done"] == 1
+        assert frames[-1]["scanned"] == 5
+        assert [f["seq"] for f in frames] == list(range(1, len(frames) + 1))
+        assert result["results"][0]["changed"] == 2
+        assert manager.active() == []
+
+    @pytest.mark.asyncio
+    async def test_no_frames_without_progress_id(self, tree):
+        """Progress is only pushed when the caller asked for it."""
+        websocket = AsyncMock()
+        manager = VolumePrepManager(lambda: websocket)
+
+        await manager.prepare(
+            [{"host": str(tree)}], default_uid=os.getuid(), default_gid=os.getgid()
+        )
+
+        websocket.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_progress_id(self):
+        """Progress IDs should be validated like stream IDs."""
+        manager = VolumePrepManager(lambda: None)
+
+        with pytest.raises(SecurityError):
+            await manager.prepare([], progress_id="bad id!")
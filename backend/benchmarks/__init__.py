@@ -0,0 +1,4 @@
+"""Micro-benchmarks for backend hot paths.
+
+Run with ``python -m benchmarks`` from the backend directory.
+"""
@@ -0,0 +1,194 @@
+"""Run the backend micro-benchmarks.
+
+Usage:
+    cd backend && uv run python -m benchmarks --scale small
+    cd backend && uv run python -m benchmarks --output results.json
+    cd backend && uv run python -m benchmarks --baseline results.json
+
+Runs fully offline against seeded local SQLite datasets. Exits with
+status 1 when ``--baseline`` is given and a benchmark regressed by more
+than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+os.environ.setdefault("MCP_LOG_LEVEL", "WARNING")
+
+from benchmarks import cases  # noqa: E402
+from benchmarks.datasets import SCALES, ensure_dataset, working_copy  # noqa: E402
+from benchmarks.runner import (  # noqa: E402
+    Table,
+    compare,
+    format_duration,
+    results_document,
+    run_benchmark,
+    select,
+)
+from lib.logging_config import setup_logging  # noqa: E402
+from services.database import DatabaseConnection  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="full")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "-k",
+        "--filter",
+        action="append",
+        metavar="PATTERN",
+        help="Only run benchmarks matching this glob (repeatable)",
+    )
+    parser.add_argument("--rounds", type=int, help="Override rounds per benchmark")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=BENCH_DIR / ".data",
+        help="Where generated datasets are cached",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    parser.add_argument("--baseline", type=Path, help="Compare against this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Slowdown tolerated before a regression is reported (0.10 = 10%%)",
+    )
+    parser.add_argument("--list", action="store_true", help="List benchmarks")
+    return parser.parse_args(argv)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(args: argparse.Namespace) -> dict:
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "scale": args.scale,
+        "seed": args.seed,
+    }
+
+
+async def run(
+    args: argparse.Namespace, benches: list, dataset: Path, work_dir: Path
+) -> list:
+    """Run the selected benchmarks, each on a fresh copy of the dataset."""
+    results = []
+    for bench in benches:
+        if args.rounds:
+            bench.rounds = args.rounds
+        bench_dir = work_dir / bench.name
+        db_path = working_copy(dataset, bench_dir)
+        context = cases.BenchContext(DatabaseConnection(db_path=db_path), bench_dir)
+        result = await run_benchmark(bench, context)
+        print(
+            f"  {bench.name}: {format_duration(result.median)}",
+            file=sys.stderr,
+        )
+        results.append(result)
+    return results
+
+
+def _results_table(results: list) -> str:
+    table = Table(["benchmark", "median", "min", "stdev", "ops/s", "rounds x loops"])
+    for r in results:
+        table.rows.append(
+            [
+                r.name,
+                format_duration(r.median),
+                format_duration(r.min),
+                format_duration(r.stdev),
+                f"{r.ops_per_s:,.1f}",
+                f"{r.rounds} x {r.loops}",
+            ]
+        )
+    return table.render()
+
+
+def _comparison_table(comparisons: list) -> str:
+    table = Table(["benchmark", "baseline", "current", "change", "status"])
+    for c in comparisons:
+        table.rows.append(
+            [
+                c.name,
+                format_duration(c.baseline) if c.baseline is not None else "-",
+                format_duration(c.current) if c.current is not None else "-",
+                f"{(c.ratio - 1) * 100:+.1f}%" if c.ratio is not None else "-",
+                c.status,
+            ]
+        )
+    return table.render()
+
+
+def main() -> int:
+    args = parse_args()
+    setup_logging()
+
+    benches = select(args.filter)
+    if args.list:
+        for bench in benches:
+            print(bench.name)
+        return 0
+    if not benches:
+        print("No benchmarks match the given filters", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    print(f"Preparing '{args.scale}' dataset (seed {args.seed})", file=sys.stderr)
+    dataset = ensure_dataset(args.data_dir, args.scale, args.seed)
+    print(
+        f"Running {len(benches)} benchmarks "
+        f"(dataset ready in {time.perf_counter() - started:.1f}s)",
+        file=sys.stderr,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="tomo-bench-") as work_dir:
+        results = asyncio.run(run(args, benches, dataset, Path(work_dir)))
+
+    document = results_document(_meta(args), results)
+    print(_results_table(results))
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if not args.baseline:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    comparisons = compare(document, baseline, args.threshold)
+    print()
+    print(_comparison_table(comparisons))
+    regressions = [c for c in comparisons if c.status == "regression"]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
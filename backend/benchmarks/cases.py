@@ -0,0 +1,328 @@
+"""Benchmark cases for backend hot paths.
+
+Every case receives a ``BenchContext`` pointing at a fresh copy of the
+seeded dataset, does its setup and returns the operation to time.
+"""
+
+import asyncio
+import itertools
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks.datasets import DATASET_END
+from benchmarks.runner import benchmark
+from lib.encryption import CredentialManager
+from lib.git_sync import GitSync
+from models.log import LogFilter
+from models.metrics import ServerMetrics
+from services.agent_manager import AgentConnection, AgentManager
+from services.database import DatabaseConnection, MetricsDatabaseService
+from services.marketplace_service import MarketplaceService
+from services.service_log import LogService
+
+
+@dataclass
+class BenchContext:
+    """Shared state handed to every case."""
+
+    db: DatabaseConnection
+    work_dir: Path
+
+
+# ---------------------------------------------------------------------------
+# Marketplace
+# ---------------------------------------------------------------------------
+
+
+async def _marketplace(ctx: BenchContext) -> MarketplaceService:
+    service = MarketplaceService(ctx.db)
+    # Seeding the official repos is one-off work, keep it out of the timing
+    await service._ensure_initialized()
+    return service
+
+
+@benchmark("marketplace.search_apps[all]", rounds=5, max_loops=20)
+async def marketplace_search_all(ctx: BenchContext):
+    service = await _marketplace(ctx)
+    return lambda: service.search_apps(limit=50)
+
+
+@benchmark("marketplace.search_apps[text]", rounds=5, max_loops=20)
+async def marketplace_search_text(ctx: BenchContext):
+    service = await _marketplace(ctx)
+    return lambda: service.search_apps(search="vault", limit=50)
+
+
+@benchmark("marketplace.search_apps[category_tags]", rounds=5, max_loops=50)
+async def marketplace_search_category_tags(ctx: BenchContext):
+    service = await _marketplace(ctx)
+    return lambda: service.search_apps(
+        category="media", tags=["backup", "sync"], limit=50
+    )
+
+
+@benchmark("marketplace.search_apps[popular]", rounds=5, max_loops=20)
+async def marketplace_search_popular(ctx: BenchContext):
+    service = await _marketplace(ctx)
+    return lambda: service.search_apps(
+        sort_by="popularity", sort_order="desc", limit=20
+    )
+
+
+@benchmark("marketplace.get_stats[uncached]", rounds=5, max_loops=50)
+async def marketplace_stats_uncached(ctx: BenchContext):
+    service = await _marketplace(ctx)
+
+    def run():
+        service._invalidate_stats()
+        return service.get_stats()
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Logs
+# ---------------------------------------------------------------------------
+
+
+@benchmark("logs.get_logs[latest]")
+async def logs_latest(ctx: BenchContext):
+    service = LogService(ctx.db)
+    return lambda: service.get_logs(LogFilter(limit=100))
+
+
+@benchmark("logs.get_logs[level]")
+async def logs_level(ctx: BenchContext):
+    service = LogService(ctx.db)
+    return lambda: service.get_logs(LogFilter(level="ERROR", limit=100))
+
+
+@benchmark("logs.get_logs[source_deep_page]")
+async def logs_source_deep_page(ctx: BenchContext):
+    service = LogService(ctx.db)
+    return lambda: service.get_logs(LogFilter(source="dkr", limit=100, offset=5000))
+
+
+@benchmark("logs.count_logs[level]", rounds=5)
+async def logs_count_level(ctx: BenchContext):
+    service = LogService(ctx.db)
+    return lambda: service.count_logs(LogFilter(level="WARNING"))
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+@benchmark("metrics.get_server_metrics[last_day]")
+async def metrics_server_last_day(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    since = (DATASET_END - timedelta(days=1)).isoformat()
+    return lambda: service.get_server_metrics("server-003", since=since, limit=1440)
+
+
+@benchmark("metrics.get_container_metrics[container]")
+async def metrics_container(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    return lambda: service.get_container_metrics(
+        "server-003", container_name="app-4", limit=500
+    )
+
+
+@benchmark("metrics.server_chart[7d_rows]")
+async def metrics_chart_rows(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    since = (DATASET_END - timedelta(days=7)).isoformat()
+
+    async def chart():
+        metrics = await service.get_server_metrics(
+            "server-003", since=since, limit=7 * 1440
+        )
+        return json.dumps([m.model_dump() for m in metrics])
+
+    return chart
+
+
+@benchmark("metrics.server_chart[7d_series]")
+async def metrics_chart_series(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    since = (DATASET_END - timedelta(days=7)).isoformat()
+
+    async def chart():
+        series = await service.get_server_metric_series(
+            "server-003", since=since, delta=True, until=DATASET_END.isoformat()
+        )
+        return json.dumps(series.to_dict())
+
+    return chart
+
+
+@benchmark("metrics.server_chart[7d_500_points]")
+async def metrics_chart_points(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    since = (DATASET_END - timedelta(days=7)).isoformat()
+
+    async def chart():
+        series = await service.get_server_metric_series(
+            "server-003",
+            since=since,
+            fields=["cpu_percent", "memory_percent", "disk_percent"],
+            max_points=500,
+            until=DATASET_END.isoformat(),
+        )
+        return json.dumps(series.to_dict())
+
+    return chart
+
+
+@benchmark("metrics.save_server_metrics", max_loops=200)
+async def metrics_save_server(ctx: BenchContext):
+    service = MetricsDatabaseService(ctx.db)
+    counter = itertools.count(1)
+
+    def save():
+        n = next(counter)
+        return service.save_server_metrics(
+            ServerMetrics(
+                id=f"bench-sm-{n}",
+                server_id="server-000",
+                cpu_percent=12.5,
+                memory_percent=40.0,
+                memory_used_mb=6_500,
+                memory_total_mb=16_384,
+                disk_percent=55.0,
+                disk_used_gb=550,
+                disk_total_gb=1000,
+                timestamp=(DATASET_END + timedelta(seconds=n)).isoformat(),
+            )
+        )
+
+    return save
+
+
+# ---------------------------------------------------------------------------
+# Agent message routing
+# ---------------------------------------------------------------------------
+
+
+class _NullWebSocket:
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _agent_manager() -> tuple[AgentManager, AgentConnection]:
+    # Routing never touches the database, so no AgentDatabaseService is needed
+    manager = AgentManager(agent_db=None)
+    connection = AgentConnection(
+        agent_id="bench-agent", websocket=_NullWebSocket(), server_id="server-000"
+    )
+    manager._connections[connection.agent_id] = connection
+    return manager, connection
+
+
+@benchmark("agent_manager.handle_message[response]", rounds=20)
+async def agent_manager_response(ctx: BenchContext):
+    manager, connection = _agent_manager()
+    containers = [
+        {"id": f"{i:064x}", "name": f"app-{i}", "status": "running"} for i in range(50)
+    ]
+    message = json.dumps({"jsonrpc": "2.0", "id": "bench", "result": containers})
+    loop = asyncio.get_running_loop()
+
+    async def route():
+        connection.pending_requests["bench"] = loop.create_future()
+        await manager.handle_message(connection.agent_id, message)
+        connection.pending_requests.pop("bench")
+
+    return route
+
+
+@benchmark("agent_manager.handle_message[notification]", rounds=20)
+async def agent_manager_notification(ctx: BenchContext):
+    manager, connection = _agent_manager()
+
+    async def handler(agent_id, params):
+        pass
+
+    manager.register_notification_handler("metrics.update", handler)
+    message = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": "metrics.update",
+            "params": {
+                "cpu": 12.5,
+                "memory": {"used": 2 << 30, "total": 8 << 30, "percent": 25.0},
+                "disk": {"used": 20 << 30, "total": 100 << 30, "percent": 20.0},
+                "containers": {"running": 12, "stopped": 3},
+            },
+        }
+    )
+    return lambda: manager.handle_message(connection.agent_id, message)
+
+
+# ---------------------------------------------------------------------------
+# CPU-bound helpers
+# ---------------------------------------------------------------------------
+
+
+@benchmark("credentials.decrypt", rounds=5, max_loops=1)
+async def credentials_decrypt(ctx: BenchContext):
+    manager = CredentialManager("benchmark-master-password")
+    encrypted = manager.encrypt_credentials(
+        {"username": "admin", "password": "correct horse battery staple"}
+    )
+    return lambda: manager.decrypt_credentials(encrypted)
+
+
+APP_YAML = """
+id: nextcloud
+name: Nextcloud
+description: Self-hosted productivity platform
+long_description: |
+  Nextcloud gives you access to your files wherever you are, with calendar,
+  contacts, mail and office integration.
+version: 28.0.1
+category: productivity
+tags: [cloud, files, sync, office, calendar]
+icon: https://example.com/icons/nextcloud.png
+author: Nextcloud GmbH
+license: AGPL-3.0
+maintainers: [maintainer@example.com]
+repository: https://github.com/nextcloud/server
+docker:
+  image: nextcloud:28.0.1-apache
+  ports:
+    - container: 80
+      host: 8080
+    - 443
+  volumes:
+    - /srv/nextcloud/html:/var/www/html
+    - /srv/nextcloud/data:/var/www/html/data
+    - host_path: /srv/nextcloud/config
+      container_path: /var/www/html/config
+      readonly: true
+  environment:
+    - TZ=UTC
+    - NEXTCLOUD_ADMIN_USER
+    - name: NEXTCLOUD_ADMIN_PASSWORD
+      description: Initial admin password
+      required: true
+    - name: NEXTCLOUD_TRUSTED_DOMAINS
+      default: localhost
+  restart_policy: unless-stopped
+requirements:
+  min_ram: 1024
+  min_storage: 10240
+  architectures: [amd64, arm64]
+"""
+
+
+@benchmark("git_sync.parse_app_yaml")
+async def git_sync_parse_app_yaml(ctx: BenchContext):
+    sync = GitSync(cache_dir=str(ctx.work_dir / "git-cache"))
+    return lambda: sync.parse_app_yaml(APP_YAML, "bench-official")
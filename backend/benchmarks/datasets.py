@@ -0,0 +1,437 @@
+"""Seeded SQLite datasets for the benchmarks.
+
+Datasets are generated deterministically from a seed and cached on disk,
+so repeated runs (and runs on different machines) query identical data.
+Each run works on a fresh copy of the cached file, so write benchmarks do
+not drift the data between runs.
+"""
+
+import asyncio
+import json
+import random
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from models.marketplace import (
+    AppEnvVar,
+    AppPort,
+    AppRequirements,
+    AppVolume,
+    DockerConfig,
+)
+from services.database import DatabaseConnection, SchemaInitializer
+
+# Bump when the generated data changes so stale caches are not reused
+DATASET_VERSION = 3
+
+# All generated timestamps end here, independent of the wall clock
+DATASET_END = datetime(2026, 1, 1, tzinfo=UTC)
+
+BATCH_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Row counts for a dataset size."""
+
+    log_rows: int
+    server_metric_rows: int
+    container_metric_rows: int
+    apps: int
+    servers: int
+    containers_per_server: int = 10
+
+
+SCALES = {
+    "small": Scale(
+        log_rows=50_000,
+        server_metric_rows=50_000,
+        container_metric_rows=50_000,
+        apps=500,
+        servers=10,
+    ),
+    "full": Scale(
+        log_rows=2_000_000,
+        server_metric_rows=1_000_000,
+        container_metric_rows=1_000_000,
+        apps=5_000,
+        servers=50,
+    ),
+}
+
+LOG_LEVELS = (("INFO", 70), ("DEBUG", 12), ("WARNING", 13), ("ERROR", 5))
+LOG_SOURCES = ("srv", "app", "dkr", "agent", "auth", "sys", "mkt")
+LOG_MESSAGES = (
+    "Container {n} started",
+    "Health check passed for server {n}",
+    "Deployment {n} finished",
+    "User login from 10.0.0.{n}",
+    "Image pull completed for app-{n}",
+    "Agent {n} reconnected",
+    "Backup job {n} completed",
+)
+CATEGORIES = (
+    "media",
+    "networking",
+    "productivity",
+    "development",
+    "monitoring",
+    "security",
+    "storage",
+    "home-automation",
+    "communication",
+    "database",
+    "utility",
+    "gaming",
+)
+TAG_POOL = (
+    "docker",
+    "self-hosted",
+    "cloud",
+    "sync",
+    "backup",
+    "media",
+    "streaming",
+    "photos",
+    "music",
+    "video",
+    "files",
+    "vpn",
+    "dns",
+    "proxy",
+    "monitoring",
+    "metrics",
+    "logs",
+    "dashboard",
+    "wiki",
+    "notes",
+    "chat",
+    "email",
+    "calendar",
+    "git",
+    "ci",
+    "database",
+    "cache",
+    "search",
+    "ai",
+    "automation",
+    "smart-home",
+    "iot",
+    "security",
+    "password",
+    "download",
+    "torrent",
+    "books",
+    "recipes",
+    "rss",
+)
+NAME_PARTS = (
+    "cloud",
+    "home",
+    "media",
+    "net",
+    "sync",
+    "vault",
+    "flow",
+    "hub",
+    "box",
+    "stack",
+    "pilot",
+    "nest",
+    "link",
+    "grid",
+    "dash",
+)
+
+
+def dataset_path(data_dir: Path, scale: str, seed: int) -> Path:
+    """Return the cache file for a scale and seed."""
+    return data_dir / f"bench-{scale}-s{seed}-v{DATASET_VERSION}.db"
+
+
+def ensure_dataset(data_dir: Path, scale: str, seed: int) -> Path:
+    """Return the cached dataset for a scale and seed, building it if needed."""
+    cached = dataset_path(data_dir, scale, seed)
+    if not cached.exists():
+        data_dir.mkdir(parents=True, exist_ok=True)
+        partial = cached.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        asyncio.run(_create_schema(partial))
+        _seed(partial, SCALES[scale], random.Random(seed))
+        partial.rename(cached)
+    return cached
+
+
+def working_copy(cached: Path, work_dir: Path) -> Path:
+    """Copy a cached dataset into work_dir and return the copy."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    working = work_dir / "tomo.db"
+    shutil.copyfile(cached, working)
+    return working
+
+
+async def _create_schema(db_path: Path) -> None:
+    schema = SchemaInitializer(DatabaseConnection(db_path=db_path))
+    await schema.initialize_all_tables()
+    await schema.run_all_migrations()
+
+
+def _seed(db_path: Path, scale: Scale, rng: random.Random) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        server_ids = _seed_servers(conn, scale)
+        _seed_logs(conn, scale, rng)
+        _seed_server_metrics(conn, scale, server_ids, rng)
+        _seed_container_metrics(conn, scale, server_ids, rng)
+        _seed_marketplace(conn, scale, rng)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def _batched(conn: sqlite3.Connection, sql: str, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def _iso(ts: datetime) -> str:
+    return ts.isoformat()
+
+
+def _seed_servers(conn: sqlite3.Connection, scale: Scale) -> list[str]:
+    server_ids = [f"server-{i:03d}" for i in range(scale.servers)]
+    conn.executemany(
+        """INSERT INTO servers
+           (id, name, host, port, username, auth_type, status, created_at)
+           VALUES (?, ?, ?, 22, 'admin', 'password', 'connected', ?)""",
+        [
+            (sid, f"host-{i}", f"10.0.0.{i + 1}", _iso(DATASET_END))
+            for i, sid in enumerate(server_ids)
+        ],
+    )
+    return server_ids
+
+
+def _seed_logs(conn: sqlite3.Connection, scale: Scale, rng: random.Random) -> None:
+    levels = [level for level, _ in LOG_LEVELS]
+    weights = [weight for _, weight in LOG_LEVELS]
+    span = timedelta(days=30).total_seconds()
+    start = DATASET_END - timedelta(days=30)
+
+    def rows():
+        for i in range(scale.log_rows):
+            ts = _iso(start + timedelta(seconds=span * i / scale.log_rows))
+            source = rng.choice(LOG_SOURCES)
+            n = rng.randrange(1000)
+            extra = None
+            if rng.random() < 0.3:
+                extra = json.dumps({"event_type": "BENCH", "server_id": f"s{n}"})
+            yield (
+                f"log-{i:08x}",
+                ts,
+                rng.choices(levels, weights)[0],
+                source,
+                rng.choice(LOG_MESSAGES).format(n=n),
+                json.dumps([source, rng.choice(TAG_POOL)]),
+                extra,
+                ts,
+            )
+
+    _batched(
+        conn,
+        """INSERT INTO log_entries
+           (id, timestamp, level, source, message, tags, extra_data, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows(),
+    )
+
+
+def _epoch_ms(ts: datetime) -> int:
+    return int(ts.timestamp() * 1000)
+
+
+def _seed_server_metrics(
+    conn: sqlite3.Connection,
+    scale: Scale,
+    server_ids: list[str],
+    rng: random.Random,
+) -> None:
+    per_server = scale.server_metric_rows // len(server_ids)
+    conn.executemany(
+        "INSERT INTO metric_servers (id, server_id) VALUES (?, ?)",
+        [(s + 1, server_id) for s, server_id in enumerate(server_ids)],
+    )
+
+    def rows():
+        for s in range(len(server_ids)):
+            for i in range(per_server):
+                # One sample per minute, newest at DATASET_END
+                ts = DATASET_END - timedelta(minutes=per_server - i)
+                mem_total = 16_384
+                mem_used = rng.randrange(2_000, mem_total)
+                yield (
+                    s + 1,
+                    _epoch_ms(ts),
+                    round(rng.uniform(1, 95), 1),
+                    round(mem_used / mem_total * 100, 1),
+                    mem_used,
+                    mem_total,
+                    round(rng.uniform(10, 90), 1),
+                    rng.randrange(50, 900),
+                    1000,
+                    rng.randrange(1 << 32),
+                    rng.randrange(1 << 32),
+                    round(rng.uniform(0, 4), 2),
+                    round(rng.uniform(0, 4), 2),
+                    round(rng.uniform(0, 4), 2),
+                    i * 60,
+                )
+
+    _batched(
+        conn,
+        """INSERT INTO server_metric_samples
+           (server_key, ts, cpu_percent, memory_percent, memory_used_mb,
+            memory_total_mb, disk_percent, disk_used_gb, disk_total_gb,
+            network_rx_bytes, network_tx_bytes, load_average_1m,
+            load_average_5m, load_average_15m, uptime_seconds)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows(),
+    )
+
+
+def _seed_container_metrics(
+    conn: sqlite3.Connection,
+    scale: Scale,
+    server_ids: list[str],
+    rng: random.Random,
+) -> None:
+    containers = scale.containers_per_server
+    per_container = scale.container_metric_rows // (len(server_ids) * containers)
+    conn.executemany(
+        "INSERT INTO metric_containers (id, container_name, container_id)"
+        " VALUES (?, ?, ?)",
+        [
+            (s * containers + c + 1, f"app-{c}", f"{s:03d}{c:02d}".ljust(12, "0"))
+            for s in range(len(server_ids))
+            for c in range(containers)
+        ],
+    )
+
+    def rows():
+        for s in range(len(server_ids)):
+            for c in range(containers):
+                for i in range(per_container):
+                    ts = DATASET_END - timedelta(minutes=per_container - i)
+                    yield (
+                        s + 1,
+                        _epoch_ms(ts),
+                        s * containers + c + 1,
+                        round(rng.uniform(0, 50), 1),
+                        rng.randrange(20, 2_000),
+                        2_048,
+                        rng.randrange(1 << 30),
+                        rng.randrange(1 << 30),
+                        "running",
+                    )
+
+    _batched(
+        conn,
+        """INSERT INTO container_metric_samples
+           (server_key, ts, container_key, cpu_percent, memory_usage_mb,
+            memory_limit_mb, network_rx_bytes, network_tx_bytes, status)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows(),
+    )
+
+
+def _seed_marketplace(
+    conn: sqlite3.Connection, scale: Scale, rng: random.Random
+) -> None:
+    repos = [
+        ("bench-official", "Bench Official", "official", 1),
+        ("bench-community", "Bench Community", "community", 1),
+        ("bench-disabled", "Bench Disabled", "community", 0),
+    ]
+    conn.executemany(
+        """INSERT INTO marketplace_repos
+           (id, name, url, branch, repo_type, enabled, status, app_count)
+           VALUES (?, ?, ?, 'main', ?, ?, 'active', 0)""",
+        [
+            (rid, name, f"https://github.com/example/{rid}", kind, enabled)
+            for rid, name, kind, enabled in repos
+        ],
+    )
+
+    now = _iso(DATASET_END)
+    rows = []
+    for i in range(scale.apps):
+        name = f"{rng.choice(NAME_PARTS).title()}{rng.choice(NAME_PARTS).title()} {i}"
+        tags = rng.sample(TAG_POOL, rng.randint(2, 6))
+        docker = DockerConfig(
+            image=f"example/app{i}:latest",
+            ports=[AppPort(container=8000 + i % 100, host=8000 + i % 100)],
+            volumes=[AppVolume(host_path=f"/srv/app{i}/data", container_path="/data")],
+            environment=[
+                AppEnvVar(name="TZ", default="UTC", required=False),
+                AppEnvVar(name="APP_SECRET", required=True),
+            ],
+            restart_policy="unless-stopped",
+            privileged=False,
+            capabilities=[],
+        )
+        requirements = AppRequirements(
+            min_ram=512, min_storage=1024, architectures=["amd64", "arm64"]
+        )
+        install_count = rng.randrange(100_000)
+        avg_rating = round(rng.uniform(1, 5), 2)
+        rating_count = rng.randrange(500)
+        rows.append(
+            (
+                f"app-{i:05d}",
+                name,
+                f"{name} keeps your {' and '.join(tags[:2])} in one place",
+                "Long description. " * 20,
+                f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.0",
+                rng.choice(CATEGORIES),
+                json.dumps(tags),
+                f"https://example.com/icons/app{i}.png",
+                "Example Author",
+                "MIT",
+                json.dumps(["maintainer@example.com"]),
+                f"https://github.com/example/app{i}",
+                None,
+                repos[i % len(repos)][0],
+                docker.model_dump_json(),
+                requirements.model_dump_json(),
+                install_count,
+                avg_rating,
+                rating_count,
+                round(avg_rating * rating_count),
+                1 if rng.random() < 0.02 else 0,
+                now,
+                now,
+            )
+        )
+
+    conn.executemany(
+        """INSERT INTO marketplace_apps
+           (id, name, description, long_description, version, category, tags,
+            icon, author, license, maintainers, repository, documentation,
+            repo_id, docker_config, requirements, install_count, avg_rating,
+            rating_count, rating_sum, featured, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
@@ -0,0 +1,137 @@
+"""Profile backend import time.
+
+Usage:
+    cd backend && uv run python -m benchmarks.imports
+    cd backend && uv run python -m benchmarks.imports --module lib.tool_loader
+    cd backend && uv run python -m benchmarks.imports --top 40 --output imports.json
+
+Imports the module in a fresh interpreter under ``python -X importtime``
+and lists the slowest modules by cumulative and self time. The default
+``main`` module is the server entry point, so its module-level service
+creation and tool registration are included; it runs against a throwaway
+data directory and, unless one is set, a throwaway JWT secret.
+"""
+
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmarks.runner import Table, format_duration
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+IMPORT_TIME_PREFIX = "import time:"
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(stderr: str) -> list[ImportTiming]:
+    """Parse ``-X importtime`` lines, skipping the header and other output."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(IMPORT_TIME_PREFIX) :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        module = name.rstrip()
+        depth = (len(module) - len(module.lstrip())) // 2
+        timings.append(
+            ImportTiming(module.strip(), depth, int(self_us), int(cumulative_us))
+        )
+    return timings
+
+
+def profile_imports(module: str) -> tuple[list[ImportTiming], float]:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        Per-module timings and the wall-clock time of the whole process.
+    """
+    with tempfile.TemporaryDirectory(prefix="tomo-imports-") as data_dir:
+        python_path = [str(SRC_DIR), os.environ.get("PYTHONPATH", "")]
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, python_path)),
+            "DATA_DIRECTORY": data_dir,
+            "MCP_LOG_LEVEL": "WARNING",
+        }
+        env.setdefault("JWT_SECRET_KEY", secrets.token_urlsafe(64))
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SRC_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = time.perf_counter() - started
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_import_times(completed.stderr), wall
+
+
+def _table(timings: list[ImportTiming], key: str, top: int) -> str:
+    table = Table(["module", "self", "cumulative"])
+    for timing in sorted(timings, key=lambda t: getattr(t, key), reverse=True)[:top]:
+        table.rows.append(
+            [
+                timing.module,
+                format_duration(timing.self_us / 1e6),
+                format_duration(timing.cumulative_us / 1e6),
+            ]
+        )
+    return table.render()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backend import-time profile")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--output", type=Path, help="Write JSON timings here")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    timings, wall = profile_imports(args.module)
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+
+    print(
+        f"import {args.module}: {format_duration(total_us / 1e6)} importing, "
+        f"{format_duration(wall)} process wall time, {len(timings)} modules"
+    )
+    print()
+    print(_table(timings, "cumulative_us", args.top))
+    print()
+    print(_table(timings, "self_us", args.top))
+
+    if args.output:
+        document = {
+            "module": args.module,
+            "import_us": total_us,
+            "wall_s": wall,
+            "modules": [asdict(t) for t in timings],
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
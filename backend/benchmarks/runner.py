@@ -0,0 +1,209 @@
+"""Benchmark registry, timing loop and baseline comparison."""
+
+import gc
+import inspect
+import math
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatch
+from typing import Any
+
+RESULTS_SCHEMA = 1
+
+# A case receives the run context, performs its setup and returns the
+# operation to time. The operation may be sync or return an awaitable.
+Operation = Callable[[], Any]
+CaseFactory = Callable[[Any], Awaitable[Operation]]
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark case."""
+
+    name: str
+    factory: CaseFactory
+    rounds: int = 10
+    max_loops: int = 1000
+
+
+@dataclass
+class Result:
+    """Timing summary for one benchmark, per operation in seconds."""
+
+    name: str
+    rounds: int
+    loops: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+    ops_per_s: float
+
+
+@dataclass
+class Comparison:
+    """Median of one benchmark against its baseline."""
+
+    name: str
+    status: str
+    baseline: float | None = None
+    current: float | None = None
+    ratio: float | None = None
+
+
+REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, rounds: int = 10, max_loops: int = 1000
+) -> Callable[[CaseFactory], CaseFactory]:
+    """Register a benchmark case.
+
+    Args:
+        name: Unique dotted name, e.g. ``logs.get_logs[level]``.
+        rounds: Timed rounds; the median across rounds is compared.
+        max_loops: Upper bound on operations per round for fast cases.
+    """
+
+    def decorator(factory: CaseFactory) -> CaseFactory:
+        if name in REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        REGISTRY[name] = Benchmark(name, factory, rounds, max_loops)
+        return factory
+
+    return decorator
+
+
+def select(patterns: list[str] | None) -> list[Benchmark]:
+    """Return registered benchmarks matching any of the glob patterns."""
+    benches = sorted(REGISTRY.values(), key=lambda b: b.name)
+    if not patterns:
+        return benches
+    return [b for b in benches if any(fnmatch(b.name, p) for p in patterns)]
+
+
+async def _call(operation: Operation) -> None:
+    result = operation()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _time_loops(operation: Operation, loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        await _call(operation)
+    return time.perf_counter() - started
+
+
+async def run_benchmark(
+    bench: Benchmark, context: Any, min_round_time: float = 0.05
+) -> Result:
+    """Set up and time one benchmark.
+
+    The first call doubles as warm-up and calibration: each round runs
+    enough operations to take at least ``min_round_time``.
+    """
+    operation = await bench.factory(context)
+    single = await _time_loops(operation, 1)
+    loops = max(1, min(bench.max_loops, math.ceil(min_round_time / max(single, 1e-9))))
+
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(bench.rounds):
+            samples.append(await _time_loops(operation, loops) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(samples)
+    return Result(
+        name=bench.name,
+        rounds=bench.rounds,
+        loops=loops,
+        min=min(samples),
+        median=median,
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        ops_per_s=1 / median if median else 0.0,
+    )
+
+
+def results_document(meta: dict[str, Any], results: list[Result]) -> dict[str, Any]:
+    """Build the machine-readable results document."""
+    return {
+        "schema": RESULTS_SCHEMA,
+        "meta": meta,
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[Comparison]:
+    """Compare result medians against a baseline document.
+
+    Args:
+        current: Results document of this run.
+        baseline: Previously saved results document.
+        threshold: Relative slowdown tolerated before flagging a regression,
+            e.g. 0.10 for 10%.
+
+    Returns:
+        One comparison per benchmark present in either document.
+    """
+    old = {r["name"]: r["median"] for r in baseline.get("results", [])}
+    new = {r["name"]: r["median"] for r in current.get("results", [])}
+    comparisons = []
+    for name in sorted(old.keys() | new.keys()):
+        if name not in old:
+            comparisons.append(Comparison(name, "new", current=new[name]))
+            continue
+        if name not in new:
+            comparisons.append(Comparison(name, "missing", baseline=old[name]))
+            continue
+        ratio = new[name] / old[name] if old[name] else math.inf
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparisons.append(Comparison(name, status, old[name], new[name], ratio))
+    return comparisons
+
+
+def format_duration(seconds: float) -> str:
+    """Format a per-operation time with a readable unit."""
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+@dataclass
+class Table:
+    """Plain-text table for terminal output."""
+
+    headers: list[str]
+    rows: list[list[str]] = field(default_factory=list)
+
+    def render(self) -> str:
+        widths = [
+            max(len(str(cell)) for cell in column)
+            for column in zip(self.headers, *self.rows, strict=False)
+        ]
+        lines = []
+        for row in [self.headers, *self.rows]:
+            lines.append(
+                "  ".join(
+                    str(cell).ljust(width)
+                    for cell, width in zip(row, widths, strict=False)
+                ).rstrip()
+            )
+        return "\n".join(lines)
@@ -20,7 +20,7 @@ CREATE TABLE IF NOT EXISTS agents (
     token_hash TEXT,
     version TEXT,
     status TEXT NOT NULL DEFAULT 'pending'
-        CHECK (status IN ('pending', 'active', 'disconnected', 'error')),
+        CHECK (status IN ('pending', 'connected', 'disconnected', 'updating')),
     last_seen TEXT,
     registered_at TEXT,
     config TEXT,
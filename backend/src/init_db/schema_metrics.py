@@ -1,9 +1,26 @@
 """Metrics and activity log database schema."""
 
 METRICS_SCHEMA = """
-CREATE TABLE IF NOT EXISTS server_metrics (
-    id TEXT PRIMARY KEY,
-    server_id TEXT NOT NULL,
+-- Metric Series Keys
+-- Server and container ids are stored once and referenced by integer key
+CREATE TABLE IF NOT EXISTS metric_servers (
+    id INTEGER PRIMARY KEY,
+    server_id TEXT NOT NULL UNIQUE,
+    FOREIGN KEY (server_id) REFERENCES servers(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS metric_containers (
+    id INTEGER PRIMARY KEY,
+    container_name TEXT NOT NULL,
+    container_id TEXT NOT NULL,
+    UNIQUE (container_name, container_id)
+);
+
+-- Metric Samples
+-- Clustered by series and time; ts is Unix epoch milliseconds (UTC)
+CREATE TABLE IF NOT EXISTS server_metric_samples (
+    server_key INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
     cpu_percent REAL NOT NULL,
     memory_percent REAL NOT NULL,
     memory_used_mb INTEGER NOT NULL,
@@ -17,24 +34,24 @@ CREATE TABLE IF NOT EXISTS server_metrics (
     load_average_5m REAL,
     load_average_15m REAL,
     uptime_seconds INTEGER,
-    timestamp TEXT NOT NULL,
-    FOREIGN KEY (server_id) REFERENCES servers(id) ON DELETE CASCADE
-);
+    PRIMARY KEY (server_key, ts),
+    FOREIGN KEY (server_key) REFERENCES metric_servers(id) ON DELETE CASCADE
+) WITHOUT ROWID;
 
-CREATE TABLE IF NOT EXISTS container_metrics (
-    id TEXT PRIMARY KEY,
-    server_id TEXT NOT NULL,
-    container_id TEXT NOT NULL,
-    container_name TEXT NOT NULL,
+CREATE TABLE IF NOT EXISTS container_metric_samples (
+    server_key INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    container_key INTEGER NOT NULL,
     cpu_percent REAL NOT NULL,
     memory_usage_mb INTEGER NOT NULL,
     memory_limit_mb INTEGER NOT NULL,
     network_rx_bytes INTEGER DEFAULT 0,
     network_tx_bytes INTEGER DEFAULT 0,
     status TEXT NOT NULL,
-    timestamp TEXT NOT NULL,
-    FOREIGN KEY (server_id) REFERENCES servers(id) ON DELETE CASCADE
-);
+    PRIMARY KEY (server_key, ts, container_key),
+    FOREIGN KEY (server_key) REFERENCES metric_servers(id) ON DELETE CASCADE,
+    FOREIGN KEY (container_key) REFERENCES metric_containers(id)
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS activity_logs (
     id TEXT PRIMARY KEY,
@@ -47,10 +64,8 @@ CREATE TABLE IF NOT EXISTS activity_logs (
     timestamp TEXT NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_server_metrics_server ON server_metrics(server_id);
-CREATE INDEX IF NOT EXISTS idx_server_metrics_timestamp ON server_metrics(timestamp);
-CREATE INDEX IF NOT EXISTS idx_container_metrics_server ON container_metrics(server_id);
-CREATE INDEX IF NOT EXISTS idx_container_metrics_timestamp ON container_metrics(timestamp);
+CREATE INDEX IF NOT EXISTS idx_server_metric_samples_ts ON server_metric_samples(ts);
+CREATE INDEX IF NOT EXISTS idx_container_metric_samples_ts ON container_metric_samples(ts);
 CREATE INDEX IF NOT EXISTS idx_activity_logs_type ON activity_logs(activity_type);
 CREATE INDEX IF NOT EXISTS idx_activity_logs_timestamp ON activity_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_activity_logs_user ON activity_logs(user_id);
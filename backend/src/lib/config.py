@@ -17,6 +17,11 @@ DEFAULT_ENV_VALUES: dict[str, str] = {
     "VERSION": "0.1.0",
     "SSH_TIMEOUT": "30",
     "MAX_CONCURRENT_CONNECTIONS": "10",
+    "WORKERS": "1",
+    "DEPLOY_CONCURRENCY": "8",
+    "DEPLOY_CONCURRENCY_PER_SERVER": "2",
+    "PREPULL_CONCURRENCY": "2",
+    "METRICS_TOKEN": "",
     "TOOLS_DIRECTORY": "src/tools",
     "TOOLS_PACKAGE": "tools",
 }
@@ -92,6 +97,13 @@ def _cached_config() -> dict[str, Any]:
     config["version"] = config["VERSION"]
     config["ssh_timeout"] = int(config["SSH_TIMEOUT"])
     config["max_concurrent_connections"] = int(config["MAX_CONCURRENT_CONNECTIONS"])
+    config["workers"] = max(1, int(config["WORKERS"]))
+    config["deploy_concurrency"] = max(1, int(config["DEPLOY_CONCURRENCY"]))
+    config["deploy_concurrency_per_server"] = max(
+        1, int(config["DEPLOY_CONCURRENCY_PER_SERVER"])
+    )
+    config["prepull_concurrency"] = max(1, int(config["PREPULL_CONCURRENCY"]))
+    config["metrics_token"] = config["METRICS_TOKEN"] or None
 
     tools_directory_value = config.get(
         "TOOLS_DIRECTORY", DEFAULT_ENV_VALUES["TOOLS_DIRECTORY"]
@@ -0,0 +1,217 @@
+"""Compact password blocklist.
+
+A compiled blocklist is a header line followed by unique, lowercased
+entries in UTF-8 byte order, one per line. Lookups memory-map the file and
+binary search it, so checking a password touches a few pages instead of
+holding every entry in a Python set.
+
+Build an index from one or more text or gzipped lists (one password per
+line). Sources are sorted in bounded chunks and merged from disk, so
+memory use does not grow with the size of the list:
+
+    cd backend/src && python -m lib.password_blocklist
+    cd backend/src && python -m lib.password_blocklist big.txt.gz -o out.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import heapq
+import mmap
+import sys
+import tempfile
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO
+
+# First line of every compiled blocklist
+BLOCKLIST_MAGIC = b"TOMO-BLOCKLIST 1\n"
+# Entries sorted in memory at once while building
+BUILD_CHUNK_SIZE = 200_000
+# Bundled source list and its compiled index
+BLOCKLIST_DIR = Path(__file__).resolve().parent.parent / "data" / "blocklist"
+DEFAULT_SOURCE = BLOCKLIST_DIR / "common_passwords.txt.gz"
+DEFAULT_INDEX = BLOCKLIST_DIR / "common_passwords.bin"
+
+
+class CompactBlocklist:
+    """Memory-mapped, binary-searched set of lowercased passwords."""
+
+    def __init__(self, file: BinaryIO):
+        """Map a compiled blocklist.
+
+        Args:
+            file: Open binary file holding a compiled blocklist. It is
+                closed together with the blocklist.
+
+        Raises:
+            ValueError: If the file is not a compiled blocklist.
+        """
+        self._file = file
+        header = file.read(len(BLOCKLIST_MAGIC))
+        if header != BLOCKLIST_MAGIC:
+            file.close()
+            raise ValueError("Not a compiled password blocklist")
+        file.seek(0, 2)
+        size = file.tell()
+        self._map = (
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size > len(BLOCKLIST_MAGIC)
+            else None
+        )
+        self._size = size
+        self._count: int | None = None
+
+    @classmethod
+    def open(cls, path: str | Path) -> CompactBlocklist:
+        """Open a compiled blocklist file."""
+        return cls(open(path, "rb"))
+
+    def __contains__(self, password: object) -> bool:
+        if self._map is None or not isinstance(password, str):
+            return False
+        key = password.lower().encode("utf-8")
+        data = self._map
+        # [lo, hi) always spans whole lines; data[lo - 1] is a newline
+        lo, hi = len(BLOCKLIST_MAGIC), self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b"\n", lo - 1, mid) + 1
+            end = data.find(b"\n", start)
+            entry = data[start:end]
+            if entry == key:
+                return True
+            if entry < key:
+                lo = end + 1
+            else:
+                hi = start
+        return False
+
+    def __len__(self) -> int:
+        if self._count is None:
+            data = self._map
+            step = 1 << 20
+            self._count = (
+                sum(data[i : i + step].count(b"\n") for i in range(0, len(data), step))
+                - 1
+                if data
+                else 0
+            )
+        return self._count
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def read_entries(path: str | Path) -> Iterator[bytes]:
+    """Yield lowercased, stripped entries from a text or gzipped list.
+
+    Entries with control characters are skipped; every byte of a kept
+    entry sorts above the newline, so lines and entries share one order.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            entry = line.strip().lower()
+            if entry and min(entry) >= " ":
+                yield entry.encode("utf-8")
+
+
+def build_blocklist(
+    sources: Iterable[str | Path],
+    output: BinaryIO,
+    chunk_size: int = BUILD_CHUNK_SIZE,
+) -> int:
+    """Compile password lists into a blocklist index.
+
+    Args:
+        sources: Text or gzipped lists, one password per line.
+        output: Binary file the index is written to.
+        chunk_size: Entries sorted in memory before spilling to disk.
+
+    Returns:
+        Number of unique entries written.
+    """
+    with ExitStack() as stack:
+        runs = []
+        for chunk in _chunks(_all_entries(sources), chunk_size):
+            run = stack.enter_context(tempfile.TemporaryFile())
+            run.writelines(entry + b"\n" for entry in sorted(set(chunk)))
+            run.seek(0)
+            runs.append(run)
+
+        output.write(BLOCKLIST_MAGIC)
+        count = 0
+        previous = None
+        for line in heapq.merge(*runs):
+            if line != previous:
+                output.write(line)
+                previous = line
+                count += 1
+    output.flush()
+    return count
+
+
+def compile_blocklist(source: str | Path) -> CompactBlocklist:
+    """Compile a text list into an anonymous temporary index and map it."""
+    index = tempfile.TemporaryFile()  # noqa: SIM115 - owned by the blocklist
+    try:
+        build_blocklist([source], index)
+    except BaseException:
+        index.close()
+        raise
+    index.seek(0)
+    return CompactBlocklist(index)
+
+
+def _all_entries(sources: Iterable[str | Path]) -> Iterator[bytes]:
+    for source in sources:
+        yield from read_entries(source)
+
+
+def _chunks(entries: Iterator[bytes], size: int) -> Iterator[list[bytes]]:
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile a password blocklist")
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        default=[DEFAULT_SOURCE],
+        help="Text or gzipped password lists, one per line",
+    )
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_INDEX)
+    parser.add_argument("--chunk-size", type=int, default=BUILD_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    missing = [str(source) for source in args.sources if not source.exists()]
+    if missing:
+        print(f"Blocklist source not found: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    # Write next to the target and rename so readers never see a partial file
+    partial = args.output.with_name(args.output.name + ".partial")
+    with open(partial, "wb") as output:
+        count = build_blocklist(args.sources, output, args.chunk_size)
+    partial.replace(args.output)
+    print(f"Wrote {count} entries to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
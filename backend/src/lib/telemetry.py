@@ -0,0 +1,346 @@
+"""In-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain dicts keyed by label values, updated
+from the event loop without locks, so recording a sample costs a dict
+lookup and a bisect. ``REGISTRY.render()`` produces the text served on
+``/metrics``, which requires a bearer token when one is configured and is
+otherwise limited to loopback clients.
+
+Every worker process has its own registry. ``snapshot()`` exports the raw
+values so the worker answering a scrape can add up the other workers'
+registries and serve totals that do not depend on which worker it is.
+"""
+
+from __future__ import annotations
+
+import hmac
+import math
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Prometheus text exposition format served by /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Clients allowed to scrape without a token
+LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+# Latency buckets in seconds, from sub-millisecond queries to slow agent RPCs
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Sequence[str]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(label) for label in labels)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> list[list]:
+        """Raw values per label combination, JSON-serializable."""
+        raise NotImplementedError
+
+    def merge(self, series: list[list]) -> None:
+        """Add values exported by ``snapshot()`` to this metric."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter per label combination."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add to the counter for the given label values."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current value for the given label values."""
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """Sum over every label combination."""
+        return sum(self._values.values())
+
+    def snapshot(self) -> list[list]:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, series: list[list]) -> None:
+        for labels, value in series:
+            self.inc(*labels, amount=value)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations per label combination."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for the given label values."""
+        series = self._get_series(labels)
+        series.buckets[bisect_left(self.buckets, value)] += 1
+        series.count += 1
+        series.sum += value
+
+    def count(self, *labels: str) -> int:
+        """Number of observations for the given label values."""
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def snapshot(self) -> list[list]:
+        return [
+            [list(key), series.buckets, series.count, series.sum]
+            for key, series in self._series.items()
+        ]
+
+    def merge(self, series: list[list]) -> None:
+        for labels, buckets, count, total in series:
+            if len(buckets) != len(self.buckets) + 1:
+                raise ValueError(f"{self.name} buckets differ from the snapshot")
+            target = self._get_series(labels)
+            for index, bucket_count in enumerate(buckets):
+                target.buckets[index] += bucket_count
+            target.count += count
+            target.sum += total
+
+    def _get_series(self, labels: Sequence[str]) -> _HistogramSeries:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+        return series
+
+    def _samples(self) -> list[str]:
+        bucket_names = (*self.labelnames, "le")
+        bounds = [_format_value(bound) for bound in (*self.buckets, math.inf)]
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, series.buckets, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_names, (*key, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Create a counter, or return the existing one with this name."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create a histogram, or return the existing one with this name."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} already registered")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Export every metric's definition and values, JSON-serializable."""
+        exported = {}
+        for name, metric in self._metrics.items():
+            entry = {
+                "type": metric.type_name,
+                "documentation": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "series": metric.snapshot(),
+            }
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            exported[name] = entry
+        return exported
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """Add the values of another registry's snapshot to this one."""
+        for name, entry in snapshot.items():
+            if entry["type"] == Counter.type_name:
+                metric = self.counter(name, entry["documentation"], entry["labelnames"])
+            elif entry["type"] == Histogram.type_name:
+                metric = self.histogram(
+                    name, entry["documentation"], entry["labelnames"], entry["buckets"]
+                )
+            else:
+                continue
+            metric.merge(entry["series"])
+
+    def combined(self, snapshots: Iterable[dict[str, Any]]) -> MetricsRegistry:
+        """Return a new registry holding this one's values plus the snapshots."""
+        combined = MetricsRegistry()
+        combined.merge(self.snapshot())
+        for snapshot in snapshots:
+            combined.merge(snapshot)
+        return combined
+
+
+REGISTRY = MetricsRegistry()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Serve the default registry for Prometheus scrapes."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+def protected_metrics_endpoint(
+    token: str | None,
+    peer_snapshots: Callable[[], Awaitable[list[dict[str, Any]]]] | None = None,
+) -> Callable[[Request], Awaitable[Response]]:
+    """Build the /metrics handler guarded by a bearer token.
+
+    Args:
+        token: Token scrapers must send as ``Authorization: Bearer``. When
+            empty, only loopback clients are served.
+        peer_snapshots: Returns the registry snapshots of the other worker
+            processes, which are added to the default registry's values.
+
+    Returns:
+        Starlette endpoint serving the default registry.
+    """
+
+    async def endpoint(request: Request) -> Response:
+        if token:
+            scheme, _, credentials = request.headers.get("authorization", "").partition(
+                " "
+            )
+            if scheme.lower() != "bearer" or not hmac.compare_digest(
+                credentials.strip().encode(), token.encode()
+            ):
+                return Response(
+                    "Unauthorized",
+                    status_code=401,
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        elif request.client is None or request.client.host not in LOOPBACK_HOSTS:
+            return Response("Forbidden", status_code=403)
+        if peer_snapshots is None:
+            return await metrics_endpoint(request)
+        combined = REGISTRY.combined(await peer_snapshots())
+        return Response(combined.render(), media_type=CONTENT_TYPE)
+
+    return endpoint
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "metrics_endpoint",
+    "protected_metrics_endpoint",
+]
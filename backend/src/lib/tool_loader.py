@@ -13,22 +13,61 @@ Supports nested package structure:
     │   ├── __init__.py
     │   └── tools.py  (contains ServerTools class)
     └── ...
+
+When ``tools/manifest.json`` (generated with ``python -m lib.tool_loader``)
+matches a package's sources, its tools are registered from the recorded
+signatures and the module is only imported when one of them first runs.
+Packages whose import failed at generation time are left out of the
+manifest and imported again at startup, since the failure may come from
+modules or installed packages the fingerprint does not cover. Packages
+whose constructor needs a dependency that is not provided are skipped like
+on the import path.
+
+fastmcp is only imported when tools are built or registered, so importing
+this module stays cheap.
 """
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import importlib
 import inspect
+import json
+import time
 from collections.abc import Mapping
+from importlib import metadata
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import structlog
 
+from lib.telemetry import REGISTRY
+
+if TYPE_CHECKING:
+    from fastmcp.tools import FunctionTool
+
 logger = structlog.get_logger("tool_loader")
 SRC_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_TOOLS_DIRECTORY = (SRC_ROOT / "tools").resolve()
 DEFAULT_TOOLS_PACKAGE = "tools"
+# Generated signature manifest, looked up inside the tools directory
+MANIFEST_FILENAME = "manifest.json"
+# Bumped whenever the manifest layout changes
+MANIFEST_VERSION = 3
+# Label for calls to names the loader did not register, to bound cardinality
+UNKNOWN_TOOL = "unknown"
+
+TOOL_CALLS = REGISTRY.counter(
+    "tomo_tool_calls_total",
+    "MCP tool calls by outcome (success, failure, error)",
+    ("tool", "outcome"),
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "tomo_tool_duration_seconds",
+    "MCP tool call latency",
+    ("tool",),
+)
 
 
 def _resolve_tools_path(tools_directory: str | None) -> Path:
@@ -114,6 +153,16 @@ def _instantiate_tools_class(
     return cls(**kwargs)
 
 
+def _required_dependencies(cls: type) -> list[str]:
+    """Names of the constructor parameters without a default."""
+    signature = inspect.signature(cls.__init__)
+    return [
+        name
+        for name, param in signature.parameters.items()
+        if name != "self" and param.default is inspect.Parameter.empty
+    ]
+
+
 def _get_public_methods(instance: Any) -> list[tuple[str, Any]]:
     """Get all public methods from a class instance.
 
@@ -134,6 +183,244 @@ def _get_public_methods(instance: Any) -> list[tuple[str, Any]]:
     return methods
 
 
+def _fastmcp_version() -> str:
+    """Return the installed fastmcp version, which shapes tool schemas."""
+    return metadata.version("fastmcp")
+
+
+def _package_fingerprint(tools_path: Path, package_name: str) -> str:
+    """Hash the sources a package's tool signatures are built from.
+
+    Covers the package itself and the shared modules at the top of the
+    tools directory.
+    """
+    digest = hashlib.sha256()
+    files = sorted((tools_path / package_name).rglob("*.py"))
+    files += sorted(tools_path.glob("*.py"))
+    for path in files:
+        digest.update(str(path.relative_to(tools_path)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_tool_manifest(
+    tools_directory: str | None = None,
+    tools_package: str = DEFAULT_TOOLS_PACKAGE,
+) -> dict[str, Any]:
+    """Record the tool signatures of every package under the tools directory.
+
+    Args:
+        tools_directory: Tools directory, defaults to ``src/tools``.
+        tools_package: Import package name of the tools directory.
+
+    Returns:
+        JSON-serializable manifest keyed by package name. Packages that
+        fail to import are left out, so startup imports them again.
+    """
+    from fastmcp.tools import FunctionTool
+
+    tools_path = _resolve_tools_path(tools_directory)
+    packages: dict[str, Any] = {}
+
+    for package_name in _discover_tool_packages(tools_path):
+        full_module = f"{tools_package}.{package_name}.tools"
+        try:
+            module = importlib.import_module(full_module)
+        except ImportError as exc:
+            logger.warning(
+                "Leaving failed tool module out of manifest",
+                module=full_module,
+                error=str(exc),
+            )
+            continue
+
+        result = _find_tools_class(module)
+        if not result:
+            continue
+        class_name, cls = result
+
+        # Signatures only, so skip __init__ and its service dependencies
+        instance = object.__new__(cls)
+        tools = []
+        for _, method in _get_public_methods(instance):
+            tool = FunctionTool.from_function(method)
+            tools.append(
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.parameters,
+                    "output_schema": tool.output_schema,
+                }
+            )
+
+        packages[package_name] = {
+            "class_name": class_name,
+            "dependencies": _required_dependencies(cls),
+            "fingerprint": _package_fingerprint(tools_path, package_name),
+            "tools": tools,
+        }
+
+    return {
+        "version": MANIFEST_VERSION,
+        "fastmcp_version": _fastmcp_version(),
+        "packages": packages,
+    }
+
+
+def write_tool_manifest(
+    tools_directory: str | None = None,
+    tools_package: str = DEFAULT_TOOLS_PACKAGE,
+) -> Path:
+    """Build the tool manifest and write it into the tools directory.
+
+    Returns:
+        Path of the written manifest.
+    """
+    manifest = build_tool_manifest(tools_directory, tools_package)
+    path = _resolve_tools_path(tools_directory) / MANIFEST_FILENAME
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def _load_tool_manifest(tools_path: Path) -> dict[str, Any]:
+    """Return the manifest's package entries, or {} when it cannot be used."""
+    path = tools_path / MANIFEST_FILENAME
+    try:
+        manifest = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning(
+            "Ignoring unreadable tool manifest", path=str(path), error=str(exc)
+        )
+        return {}
+
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("fastmcp_version") != _fastmcp_version()
+    ):
+        logger.info("Ignoring tool manifest built for another version", path=str(path))
+        return {}
+    return manifest.get("packages", {})
+
+
+class _LazyToolsClass:
+    """Import and instantiate a *Tools class when one of its tools first runs."""
+
+    def __init__(
+        self, module_name: str, class_name: str, dependencies: Mapping[str, Any]
+    ):
+        self._module_name = module_name
+        self._class_name = class_name
+        self._dependencies = dependencies
+        self._tools: dict[str, FunctionTool] | None = None
+
+    def get_tool(self, name: str) -> FunctionTool:
+        """Return the real tool backing a manifest entry."""
+        if self._tools is None:
+            self._tools = self._load()
+        return self._tools[name]
+
+    def _load(self) -> dict[str, FunctionTool]:
+        from fastmcp.tools import FunctionTool
+
+        started = time.perf_counter()
+        module = importlib.import_module(self._module_name)
+        cls = getattr(module, self._class_name)
+        instance = _instantiate_tools_class(cls, self._class_name, self._dependencies)
+        tools = {
+            name: FunctionTool.from_function(method)
+            for name, method in _get_public_methods(instance)
+        }
+        logger.debug(
+            "Loaded tool module on first use",
+            module=self._module_name,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return tools
+
+
+@functools.cache
+def _lazy_tool_type() -> type:
+    """Build LazyTool on first use; it subclasses fastmcp's Tool."""
+    from fastmcp.tools import Tool
+    from pydantic import PrivateAttr
+
+    class LazyTool(Tool):
+        """Tool advertised from the manifest, backed by its module once it runs."""
+
+        _tools_class: _LazyToolsClass = PrivateAttr()
+
+        async def run(self, arguments: dict[str, Any]) -> Any:
+            return await self._tools_class.get_tool(self.name).run(arguments)
+
+    return LazyTool
+
+
+def _register_lazy_tools(
+    app: Any,
+    tools_class: _LazyToolsClass,
+    entries: list[dict[str, Any]],
+) -> list[str]:
+    """Register manifest entries as lazy tools, returning their names."""
+    lazy_tool = _lazy_tool_type()
+    for entry in entries:
+        tool = lazy_tool(
+            name=entry["name"],
+            description=entry["description"],
+            parameters=entry["parameters"],
+            output_schema=entry["output_schema"],
+        )
+        tool._tools_class = tools_class
+        app.add_tool(tool)
+    return [entry["name"] for entry in entries]
+
+
+@functools.cache
+def _tool_metrics_middleware_type() -> type:
+    """Build ToolMetricsMiddleware on first use; it subclasses fastmcp's Middleware."""
+    from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+    class ToolMetricsMiddleware(Middleware):
+        """Record latency and outcome of every call to a registered tool.
+
+        A call is a failure when the tool returns ``success: false`` and an
+        error when it raises.
+        """
+
+        def __init__(self):
+            self.tool_names: set[str] = set()
+
+        async def on_call_tool(self, context: MiddlewareContext, call_next: Any) -> Any:
+            name = context.message.name
+            if name not in self.tool_names:
+                name = UNKNOWN_TOOL
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await call_next(context)
+                structured = getattr(result, "structured_content", None)
+                failed = (
+                    isinstance(structured, dict) and structured.get("success") is False
+                )
+                outcome = "failure" if failed else "success"
+                return result
+            finally:
+                TOOL_DURATION.observe(time.perf_counter() - started, name)
+                TOOL_CALLS.inc(name, outcome)
+
+    return ToolMetricsMiddleware
+
+
+def __getattr__(name: str) -> Any:
+    # Classes built on fastmcp bases are created when first looked up
+    if name == "ToolMetricsMiddleware":
+        return _tool_metrics_middleware_type()
+    if name == "LazyTool":
+        return _lazy_tool_type()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def register_all_tools(
     app: Any,
     config: Mapping[str, Any],
@@ -141,8 +428,11 @@ def register_all_tools(
 ) -> None:
     """Discover and register all tool packages under the configured directory.
 
-    Scans for *Tools classes in each subpackage, instantiates them with
-    dependencies, and registers all their public methods as MCP tools.
+    Every call is timed through ToolMetricsMiddleware. Packages whose
+    sources match the manifest are registered lazily from their recorded
+    signatures. The rest are scanned for *Tools classes,
+    instantiated with dependencies, and have all their public methods
+    registered as MCP tools.
 
     Args:
         app: FastMCP application that will own the registered tools.
@@ -153,10 +443,35 @@ def register_all_tools(
     tools_package = config.get("tools_package", DEFAULT_TOOLS_PACKAGE)
 
     package_names = _discover_tool_packages(tools_path)
+    manifest = _load_tool_manifest(tools_path)
+    metrics = _tool_metrics_middleware_type()()
+    app.add_middleware(metrics)
     total_tools = 0
+    lazy_modules = 0
 
     for package_name in package_names:
         full_module = f"{tools_package}.{package_name}.tools"
+        entry = manifest.get(package_name)
+        if entry and entry["fingerprint"] == _package_fingerprint(
+            tools_path, package_name
+        ):
+            missing = [d for d in entry["dependencies"] if d not in dependencies]
+            if missing:
+                logger.warning(
+                    "Skipping tools class (missing dependency)",
+                    class_name=entry["class_name"],
+                    error=f"Missing dependency '{missing[0]}'",
+                )
+                continue
+            tools_class = _LazyToolsClass(
+                full_module, entry["class_name"], dependencies
+            )
+            names = _register_lazy_tools(app, tools_class, entry["tools"])
+            metrics.tool_names.update(names)
+            total_tools += len(names)
+            lazy_modules += 1
+            continue
+
         try:
             module = importlib.import_module(full_module)
         except ImportError as exc:
@@ -198,6 +513,7 @@ def register_all_tools(
         for method_name, method in methods:
             try:
                 app.tool(method)
+                metrics.tool_names.add(method_name)
                 total_tools += 1
             except Exception as exc:
                 logger.error(
@@ -217,8 +533,13 @@ def register_all_tools(
     logger.info(
         "Tool registration completed",
         modules=len(package_names),
+        lazy_modules=lazy_modules,
         total_tools=total_tools,
     )
 
 
-__all__ = ["register_all_tools"]
+__all__ = ["build_tool_manifest", "register_all_tools", "write_tool_manifest"]
+
+
+if __name__ == "__main__":
+    print(f"Wrote {write_tool_manifest()}")
@@ -1,5 +1,7 @@
 """Tomo MCP Server Entry Point."""
 
+import os
+
 import structlog
 from fastmcp import FastMCP
 
@@ -43,36 +45,14 @@ register_all_tools(app, config, services)
 agent_websocket_handler = services["agent_websocket_handler"]
 agent_lifecycle = services["agent_lifecycle"]
 database_service = services["database_service"]
+# Present only when the backend runs several worker processes
+agent_router = services.get("agent_router")
+# Seconds a scrape waits for the other workers' metrics
+METRICS_PEER_TIMEOUT = 5.0
 
 
-if __name__ == "__main__":
-    import asyncio
-    import os
-
-    import uvicorn
-    from starlette.middleware import Middleware
-    from starlette.middleware.cors import CORSMiddleware
-    from starlette.routing import WebSocketRoute
-
-    # Run database migrations and initializations
-    async def _run_migrations():
-        await database_service.run_installed_apps_migrations()
-        await database_service.run_users_migrations()
-        await database_service.initialize_system_info_table()
-        await database_service.initialize_users_table()
-        await database_service.initialize_sessions_table()
-        await database_service.initialize_account_locks_table()
-        await database_service.initialize_notifications_table()
-        await database_service.initialize_retention_settings_table()
-        await database_service.initialize_servers_table()
-        await database_service.initialize_agents_table()
-        await database_service.initialize_installed_apps_table()
-        await database_service.initialize_metrics_tables()
-        await database_service.initialize_rate_limit_events_table()
-        await database_service.initialize_csrf_tokens_table()
-
-    asyncio.run(_run_migrations())
-
+def get_allowed_origins() -> list[str]:
+    """Read CORS origins from ALLOWED_ORIGINS, rejecting unsafe wildcards."""
     # Configure CORS origins from environment variable
     default_origins = "http://localhost:3000,http://localhost:3001,http://localhost:3002,http://localhost:3003"
     allowed_origins = os.getenv("ALLOWED_ORIGINS", default_origins).split(",")
@@ -88,9 +68,7 @@ if __name__ == "__main__":
     if "*" in allowed_origins:
         env = os.getenv("APP_ENV", "production").lower()
         if env == "production":
-            logger.error(
-                "Wildcard CORS origin rejected in production mode"
-            )
+            logger.error("Wildcard CORS origin rejected in production mode")
             allowed_origins = [o for o in allowed_origins if o != "*"] or [
                 "http://localhost:3000"
             ]
@@ -98,6 +76,27 @@ if __name__ == "__main__":
             logger.warning(
                 "Wildcard CORS origin used — restrict via ALLOWED_ORIGINS in production"
             )
+    return allowed_origins
+
+
+def create_http_app():
+    """Build the Starlette app serving MCP, agent WebSockets and metrics.
+
+    Each worker process calls this once; with several workers uvicorn
+    imports it as an app factory.
+    """
+    from starlette.middleware import Middleware
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.routing import Route, WebSocketRoute
+
+    from lib.telemetry import REGISTRY, protected_metrics_endpoint
+    from services.database.slow_query import (
+        slow_query_log_from_env,
+        slow_query_report_path,
+    )
+
+    allowed_origins = get_allowed_origins()
+    logger.info("CORS origins configured", allowed_origins=allowed_origins)
 
     # Configure CORS middleware
     cors_middleware = Middleware(
@@ -123,32 +122,124 @@ if __name__ == "__main__":
         WebSocketRoute("/ws/agent", agent_websocket_handler.handle_connection)
     )
 
+    # Each worker counts what it served; the one answering a scrape adds
+    # up the other workers' registries so totals do not depend on which
+    # worker answers
+    peer_metrics = None
+    if agent_router is not None:
+
+        async def metrics_snapshot() -> dict:
+            return REGISTRY.snapshot()
+
+        async def peer_metrics() -> list[dict]:
+            return await agent_router.call_workers(
+                "metrics.snapshot", {}, timeout=METRICS_PEER_TIMEOUT
+            )
+
+        agent_router.register_handler("metrics.snapshot", metrics_snapshot)
+
+    # Prometheus scrape endpoint for tool, database and agent RPC metrics;
+    # bearer token when METRICS_TOKEN is set, loopback clients otherwise
+    starlette_app.routes.append(
+        Route(
+            "/metrics",
+            protected_metrics_endpoint(config.get("metrics_token"), peer_metrics),
+        )
+    )
+
     # Add lifecycle event handlers
     agent_service = services["agent_service"]
     agent_manager = services["agent_manager"]
+    retention_engine = services["retention_engine"]
+    monitoring_service = services["monitoring_service"]
+    deployment_queue = services["deployment_queue"]
+    log_streams = services["deployment_service"].log_streams
+
+    # Backend-wide schedulers run on one worker only
+    def runs_schedulers() -> bool:
+        return agent_router is None or agent_router.is_primary
 
     @starlette_app.on_event("startup")
     async def startup_lifecycle():
-        """Start agent lifecycle manager and rotation scheduler on app startup."""
-        logger.info("Starting agent lifecycle manager")
-        # Reset any stale CONNECTED statuses from previous run
-        reset_count = await agent_service.reset_stale_agent_statuses()
-        if reset_count > 0:
-            logger.info(f"Reset {reset_count} stale agent status(es) to DISCONNECTED")
+        """Start agent lifecycle, schedulers and backend telemetry on startup."""
+        if agent_router is None:
+            logger.info("Starting agent lifecycle manager")
+            # Reset any stale CONNECTED statuses from previous run
+            reset_count = await agent_service.reset_stale_agent_statuses()
+            if reset_count > 0:
+                logger.info(
+                    f"Reset {reset_count} stale agent status(es) to DISCONNECTED"
+                )
+        else:
+            await agent_router.start()
         await agent_lifecycle.start()
 
-        # Start automatic token rotation scheduler
-        logger.info("Starting token rotation scheduler")
-        agent_service.set_rotation_callback(agent_manager.send_rotation_request)
-        await agent_service.start_rotation_scheduler(check_interval=3600)  # 1 hour
+        if runs_schedulers():
+            # Start automatic token rotation scheduler
+            logger.info("Starting token rotation scheduler")
+            agent_service.set_rotation_callback(agent_manager.send_rotation_request)
+            await agent_service.start_rotation_scheduler(check_interval=3600)  # 1 hour
+
+            logger.info("Starting retention scheduler")
+            await retention_engine.start()
+
+            logger.info("Starting deployment queue")
+            await deployment_queue.start()
+
+        await monitoring_service.start()
+        # Log streams live in the worker that started them
+        await log_streams.start_sweeper()
 
     @starlette_app.on_event("shutdown")
     async def shutdown_lifecycle():
-        """Stop agent lifecycle manager and rotation scheduler on app shutdown."""
-        logger.info("Stopping token rotation scheduler")
-        await agent_service.stop_rotation_scheduler()
+        """Stop backend telemetry, schedulers and agent lifecycle on shutdown."""
+        await log_streams.stop_sweeper()
+        await monitoring_service.stop()
+        if runs_schedulers():
+            logger.info("Stopping deployment queue")
+            await deployment_queue.stop()
+            logger.info("Stopping retention scheduler")
+            await retention_engine.stop()
+            logger.info("Stopping token rotation scheduler")
+            await agent_service.stop_rotation_scheduler()
         logger.info("Stopping agent lifecycle manager")
         await agent_lifecycle.stop()
+        if agent_router is not None:
+            await agent_router.stop()
+
+        slow_query_log = slow_query_log_from_env()
+        if slow_query_log is not None:
+            worker_id = agent_router.worker_id if agent_router else None
+            slow_query_log.write_report(
+                slow_query_report_path(data_directory, worker_id)
+            )
+
+    return starlette_app
+
+
+async def prepare_workers() -> None:
+    """Reset agent state once before worker processes start.
+
+    No agent is connected yet, so CONNECTED statuses and routes left by
+    the previous run are stale.
+    """
+    reset_count = await services["agent_service"].reset_stale_agent_statuses()
+    if reset_count > 0:
+        logger.info(f"Reset {reset_count} stale agent status(es) to DISCONNECTED")
+    await agent_router.clear_routes()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    import uvicorn
+
+    # Bring the schema up to date (a single version read when current)
+    asyncio.run(database_service.run_migrations())
+
+    workers = config.get("workers", 1)
+    if agent_router is not None:
+        asyncio.run(prepare_workers())
 
     # Optional TLS configuration via environment variables
     ssl_certfile = os.getenv("SSL_CERTFILE")
@@ -181,10 +272,22 @@ if __name__ == "__main__":
     logger.info(
         "FastMCP HTTP server initialized",
         version=config.get("version", DEFAULT_ENV_VALUES["VERSION"]),
-        allowed_origins=allowed_origins,
         mcp_path="/mcp",
         ws_path="/ws/agent",
+        metrics_path="/metrics",
         tls=bool(ssl_kwargs),
+        workers=workers,
     )
 
-    uvicorn.run(starlette_app, host="0.0.0.0", port=8000, **ssl_kwargs)
+    if workers > 1:
+        # Each worker imports this module and builds its own services
+        uvicorn.run(
+            "main:create_http_app",
+            factory=True,
+            workers=workers,
+            host="0.0.0.0",
+            port=8000,
+            **ssl_kwargs,
+        )
+    else:
+        uvicorn.run(create_http_app(), host="0.0.0.0", port=8000, **ssl_kwargs)
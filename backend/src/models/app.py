@@ -247,6 +247,8 @@ class AppFilter(BaseModel):
     featured: bool | None = Field(None, description="Featured apps only")
     sort_by: str | None = Field("name", description="Sort field")
     sort_order: str | None = Field("asc", description="Sort direction")
+    limit: int | None = Field(None, ge=1, le=500, description="Page size")
+    cursor: str | None = Field(None, description="Cursor from a previous page")
 
 
 class AppSearchResult(BaseModel):
@@ -259,3 +261,4 @@ class AppSearchResult(BaseModel):
     page: int = Field(..., description="Current page number")
     limit: int = Field(..., description="Results per page")
     filters: AppFilter = Field(..., description="Applied filters")
+    next_cursor: str | None = Field(None, description="Cursor for the next page")
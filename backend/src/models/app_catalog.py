@@ -96,6 +96,9 @@ class InstalledApp(BaseModel):
     step_started_at: str | None = Field(
         default=None, description="When current step started"
     )
+    owner: str | None = Field(
+        default=None, description="Worker that ran the last deploy"
+    )
     networks: list[str] | None = Field(default=None, description="Docker networks")
     named_volumes: list[dict[str, str]] | None = Field(
         default=None, description="Named volume mounts"
@@ -179,3 +179,39 @@ class SecurityValidationResult(BaseModel):
     requires_additional_verification: bool = Field(
         default=False, description="Operation requires additional verification"
     )
+
+
+class TableRetentionResult(BaseModel):
+    """Outcome of purging one table during a retention run."""
+
+    table: str = Field(..., description="Table that was purged")
+    cutoff: str = Field(..., description="Rows older than this were deleted")
+    rows_deleted: int = Field(default=0, ge=0, description="Rows deleted")
+    batches: int = Field(default=0, ge=0, description="Delete transactions committed")
+    duration_seconds: float = Field(default=0.0, ge=0, description="Time spent")
+    complete: bool = Field(
+        default=True, description="False if the time budget ran out first"
+    )
+    error_message: str | None = Field(None, description="Error message if failed")
+
+
+class RetentionRunResult(BaseModel):
+    """Outcome of one scheduled retention run across all tables."""
+
+    start_time: str = Field(..., description="Run start timestamp")
+    end_time: str = Field(..., description="Run end timestamp")
+    duration_seconds: float = Field(default=0.0, ge=0, description="Run duration")
+    tables: list[TableRetentionResult] = Field(
+        default_factory=list, description="Per-table results"
+    )
+    pages_reclaimed: int = Field(
+        default=0, ge=0, description="Free pages returned to the filesystem"
+    )
+    space_freed_mb: float = Field(
+        default=0.0, ge=0, description="Disk space returned to the filesystem (MB)"
+    )
+
+    @property
+    def rows_deleted(self) -> int:
+        """Total rows deleted across all tables."""
+        return sum(table.rows_deleted for table in self.tables)
@@ -2,10 +2,15 @@
 
 Handles WebSocket connections to agents, message routing, and request/response
 correlation for JSON-RPC communication with tomo agents.
+
+When the backend runs several workers, an AgentRouter shares connections
+between them: agents connected to another worker count as connected here,
+and commands for them are forwarded to that worker.
 """
 
 import asyncio
 import json
+import time
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
@@ -13,10 +18,12 @@ from typing import TYPE_CHECKING, Any, Optional, Protocol
 
 if TYPE_CHECKING:
     from services.agent_lifecycle import AgentLifecycleManager
+    from services.agent_routing import AgentRouter
 from uuid import uuid4
 
 import structlog
 
+from lib.telemetry import REGISTRY
 from models.agent import (
     AgentConfig,
     AgentHeartbeat,
@@ -34,6 +41,17 @@ LifecycleManager = Any
 # Security: Maximum message size to prevent memory exhaustion (1MB default)
 MAX_MESSAGE_SIZE_BYTES = 1024 * 1024
 
+AGENT_RPC_DURATION = REGISTRY.histogram(
+    "tomo_agent_rpc_duration_seconds",
+    "Round-trip time of JSON-RPC commands sent to agents",
+    ("method",),
+)
+AGENT_RPC_CALLS = REGISTRY.counter(
+    "tomo_agent_rpc_calls_total",
+    "JSON-RPC commands sent to agents by outcome (ok, error, timeout)",
+    ("method", "outcome"),
+)
+
 
 class WebSocketProtocol(Protocol):
     """Protocol for WebSocket connections (compatible with any implementation)."""
@@ -69,15 +87,20 @@ class AgentManager:
         self,
         agent_db: AgentDatabaseService,
         lifecycle_manager: Optional["AgentLifecycleManager"] = None,
+        router: Optional["AgentRouter"] = None,
     ):
         """Initialize agent manager with database service.
 
         Args:
             agent_db: Agent database service for persistence operations.
             lifecycle_manager: Optional lifecycle manager for health tracking.
+            router: Optional router sharing connections with other workers.
         """
         self._agent_db = agent_db
         self._lifecycle = lifecycle_manager
+        self._router = router
+        if router:
+            router.attach(self)
         self._connections: dict[str, AgentConnection] = {}
         self._notification_handlers: dict[str, Callable] = {}
         # Locks to prevent race conditions during connection registration
@@ -167,6 +190,10 @@ class AgentManager:
             # Update agent status in database
             await self._update_agent_status(agent_id, AgentStatus.CONNECTED)
 
+            # Tell other workers where to forward commands for this agent
+            if self._router:
+                await self._router.claim(agent_id, server_id)
+
             # Register with lifecycle manager for heartbeat tracking
             if self._lifecycle:
                 self._lifecycle.register_agent_connection(agent_id)
@@ -191,6 +218,37 @@ class AgentManager:
             logger.warning("No connection found to unregister", agent_id=agent_id)
             return
 
+        await self._close_connection(connection)
+
+        if self._router:
+            await self._router.release(agent_id)
+
+        # Update agent status in database
+        await self._update_agent_status(agent_id, AgentStatus.DISCONNECTED)
+
+        logger.info("Agent connection unregistered", agent_id=agent_id)
+
+    async def drop_superseded_connection(self, agent_id: str) -> None:
+        """Close a connection the agent has replaced on another worker.
+
+        Unlike unregister_connection, the agent's status and route are left
+        to the worker that now holds the connection.
+
+        Args:
+            agent_id: Unique agent identifier.
+        """
+        connection = self._connections.pop(agent_id, None)
+        if not connection:
+            return
+        await self._close_connection(connection)
+        logger.info(
+            "Dropped connection superseded by another worker", agent_id=agent_id
+        )
+
+    async def _close_connection(self, connection: AgentConnection) -> None:
+        """Cancel pending requests, close the socket and stop tracking it."""
+        agent_id = connection.agent_id
+
         # Cancel all pending requests
         for request_id, future in connection.pending_requests.items():
             if not future.done():
@@ -211,15 +269,10 @@ class AgentManager:
                 error=str(e),
             )
 
-        # Update agent status in database
-        await self._update_agent_status(agent_id, AgentStatus.DISCONNECTED)
-
         # Remove from lifecycle tracking
         if self._lifecycle:
             self._lifecycle.unregister_agent_connection(agent_id)
 
-        logger.info("Agent connection unregistered", agent_id=agent_id)
-
     def is_connected(self, agent_id: str) -> bool:
         """Check if an agent is currently connected.
 
@@ -229,7 +282,9 @@ class AgentManager:
         Returns:
             True if agent has an active connection, False otherwise.
         """
-        return agent_id in self._connections
+        if agent_id in self._connections:
+            return True
+        return self._router is not None and self._router.get_route(agent_id) is not None
 
     def get_connection_by_server(self, server_id: str) -> AgentConnection | None:
         """Get agent connection by associated server ID.
@@ -269,6 +324,27 @@ class AgentManager:
             RuntimeError: If agent returns an error response.
         """
         connection = self._connections.get(agent_id)
+        if not connection and self._router:
+            return await self._router.forward_command(agent_id, method, params, timeout)
+        return await self.send_local_command(agent_id, method, params, timeout)
+
+    async def send_local_command(
+        self,
+        agent_id: str,
+        method: str,
+        params: dict | None = None,
+        timeout: float = 30.0,
+    ) -> Any:
+        """Send a JSON-RPC command over this worker's own connection.
+
+        Used for commands other workers forward here; never forwards again.
+
+        Raises:
+            ValueError: If agent is not connected to this worker.
+            TimeoutError: If response not received within timeout.
+            RuntimeError: If agent returns an error response.
+        """
+        connection = self._connections.get(agent_id)
         if not connection:
             raise ValueError(f"Agent {agent_id} is not connected")
 
@@ -285,6 +361,8 @@ class AgentManager:
         future: asyncio.Future = asyncio.get_running_loop().create_future()
         connection.pending_requests[request_id] = future
 
+        started = time.perf_counter()
+        outcome = "error"
         try:
             # Send request
             await connection.websocket.send_text(json.dumps(request))
@@ -297,9 +375,11 @@ class AgentManager:
 
             # Wait for response with timeout
             result = await asyncio.wait_for(future, timeout=timeout)
+            outcome = "ok"
             return result
 
         except TimeoutError:
+            outcome = "timeout"
             logger.error(
                 "Command timeout",
                 agent_id=agent_id,
@@ -311,6 +391,8 @@ class AgentManager:
                 f"Agent {agent_id} did not respond to {method} within {timeout}s"
             )
         finally:
+            AGENT_RPC_DURATION.observe(time.perf_counter() - started, method)
+            AGENT_RPC_CALLS.inc(method, outcome)
             # Cleanup pending request - use defensive check in case connection
             # was removed by another task during execution
             current_connection = self._connections.get(agent_id)
@@ -359,9 +441,20 @@ class AgentManager:
         # Check if this is a response (has id) or notification (no id)
         if "id" in data:
             await self._handle_response(connection, data)
-        else:
+        elif not (
+            self._router and await self._router.relay_notification(agent_id, data)
+        ):
             await self._handle_notification(agent_id, data)
 
+    async def dispatch_notification(self, agent_id: str, data: dict) -> None:
+        """Run the handler for a notification relayed from another worker.
+
+        Args:
+            agent_id: Source agent identifier.
+            data: Parsed JSON-RPC notification.
+        """
+        await self._handle_notification(agent_id, data)
+
     async def _handle_response(
         self,
         connection: AgentConnection,
@@ -451,14 +544,15 @@ class AgentManager:
         Args:
             config: New agent configuration to broadcast.
         """
-        if not self._connections:
+        agent_ids = self.get_connected_agent_ids()
+        if not agent_ids:
             logger.debug("No agents connected for config broadcast")
             return
 
         config_dict = config.model_dump()
         tasks = []
 
-        for agent_id in self._connections:
+        for agent_id in agent_ids:
             task = self._send_config_update(agent_id, config_dict)
             tasks.append(task)
 
@@ -658,12 +752,23 @@ class AgentManager:
         )
 
     def get_connected_agent_ids(self) -> list[str]:
-        """Get list of all connected agent IDs.
+        """Get list of all connected agent IDs, including other workers' agents.
 
         Returns:
             List of connected agent identifiers.
         """
-        return list(self._connections.keys())
+        agent_ids = list(self._connections.keys())
+        if self._router:
+            agent_ids.extend(
+                route.agent_id
+                for route in self._router.routes()
+                if route.agent_id not in self._connections
+            )
+        return agent_ids
+
+    def get_pending_request_count(self) -> int:
+        """Get the number of requests awaiting a response on this worker."""
+        return sum(len(c.pending_requests) for c in self._connections.values())
 
     def get_connection_info(self, agent_id: str) -> dict | None:
         """Get connection information for an agent.
@@ -676,7 +781,16 @@ class AgentManager:
         """
         connection = self._connections.get(agent_id)
         if not connection:
-            return None
+            route = self._router.get_route(agent_id) if self._router else None
+            if not route:
+                return None
+            return {
+                "agent_id": route.agent_id,
+                "server_id": route.server_id,
+                "connected_at": route.connected_at,
+                "pending_requests": None,
+                "worker_id": route.worker_id,
+            }
 
         return {
             "agent_id": connection.agent_id,
@@ -0,0 +1,770 @@
+"""Agent Connection Routing.
+
+Lets several backend worker processes share agent connections. An agent's
+WebSocket terminates on whichever worker accepted it; that worker records
+itself as the agent's owner in the agent_routes table and announces the
+route to its peers, so every worker knows which agents are connected.
+Commands for an agent owned by another worker are forwarded over that
+worker's Unix socket, and streamed notifications (frames carrying a
+stream_id) for a forwarded command are relayed back to the worker that
+started the stream.
+
+Workers can also call handlers registered on each other, for state that
+lives in one worker such as log stream buffers, and broadcast cache
+invalidations so a write on one worker clears every worker's copy.
+
+Each worker holds a lock on a lease file for its lifetime. The lock goes
+away with the process however it ends, so peers can tell whether the
+worker that owns some piece of work is still running.
+
+IPC frames are a 4-byte big-endian length followed by a JSON object.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import os
+import secrets
+import struct
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import structlog
+
+from lib.telemetry import REGISTRY
+from services.database.base import DatabaseConnection
+
+if TYPE_CHECKING:
+    from services.agent_manager import AgentManager
+
+logger = structlog.get_logger("agent_routing")
+
+# Directory under the data directory holding worker sockets
+IPC_DIRECTORY_NAME = "ipc"
+# Lock file held by the worker that runs backend-wide schedulers
+PRIMARY_LOCK_NAME = "primary.lock"
+# Length prefix of every IPC frame
+FRAME_HEADER = struct.Struct(">I")
+# Largest IPC frame accepted; agent messages are capped at 1MB
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+# Extra seconds a forwarding worker waits beyond the command timeout
+FORWARD_GRACE_SECONDS = 5.0
+# Notifications held per agent while a forwarded command is in flight
+MAX_HELD_NOTIFICATIONS = 1000
+
+AGENT_FORWARDED_CALLS = REGISTRY.counter(
+    "tomo_agent_forwarded_calls_total",
+    "Agent commands forwarded to the worker holding the connection, by outcome",
+    ("outcome",),
+)
+
+# Exceptions a forwarded command may raise, by name on the wire
+_WIRE_ERRORS: dict[str, type[Exception]] = {
+    "ValueError": ValueError,
+    "TimeoutError": TimeoutError,
+    "RuntimeError": RuntimeError,
+}
+
+
+@dataclass(frozen=True)
+class AgentRoute:
+    """The worker holding an agent's WebSocket."""
+
+    agent_id: str
+    worker_id: str
+    server_id: str
+    connected_at: str
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    """Encode a message as a length-prefixed IPC frame."""
+    payload = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict[str, Any] | None:
+    """Read one IPC frame.
+
+    Returns:
+        The decoded message, or None at the end of the stream.
+
+    Raises:
+        ValueError: If the frame is oversized or not JSON.
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            raise ValueError(f"IPC frame of {length} bytes exceeds the limit")
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(payload)
+
+
+class _WorkerPeer:
+    """Client connection to another worker's socket."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.worker_id = worker_id
+        self._reader = reader
+        self._writer = writer
+        self._write_lock = asyncio.Lock()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._reader_task = asyncio.create_task(self._read_replies())
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def send(self, message: dict[str, Any]) -> None:
+        async with self._write_lock:
+            self._writer.write(encode_frame(message))
+            await self._writer.drain()
+
+    async def request(self, message: dict[str, Any], timeout: float) -> dict:
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.send({**message, "id": request_id})
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        self._reader_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._reader_task
+        self._writer.close()
+        with contextlib.suppress(OSError):
+            await self._writer.wait_closed()
+
+    async def _read_replies(self) -> None:
+        try:
+            while (reply := await read_frame(self._reader)) is not None:
+                future = self._pending.get(reply.get("id"))
+                if future and not future.done():
+                    future.set_result(reply)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "Worker connection failed", worker_id=self.worker_id, error=str(e)
+            )
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError(
+                            f"Worker {self.worker_id} closed the connection"
+                        )
+                    )
+
+
+class AgentRouter:
+    """Routes agent commands and notifications between backend workers."""
+
+    def __init__(
+        self,
+        connection: DatabaseConnection,
+        ipc_dir: Path,
+        worker_id: str | None = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            connection: Database holding the shared agent_routes table.
+            ipc_dir: Directory for worker sockets, shared by all workers.
+            worker_id: Identifier of this worker; defaults to the process id
+                with a random suffix, so it is not reused after a restart.
+        """
+        self._conn = connection
+        self._ipc_dir = Path(ipc_dir)
+        self._worker_id = worker_id or f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._manager: AgentManager | None = None
+        self._routes: dict[str, AgentRoute] = {}
+        self._peers: dict[str, _WorkerPeer] = {}
+        self._peer_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._primary_lock: IO | None = None
+        self._lease: IO | None = None
+        # Worker that started each stream, by (agent_id, stream_id)
+        self._stream_origins: dict[tuple[str, str], str] = {}
+        # Forwarded commands in flight per agent; unknown stream frames
+        # wait for them since a stream id may arrive in the result
+        self._inflight: dict[str, int] = defaultdict(int)
+        self._held: dict[str, list[dict]] = defaultdict(list)
+        # Handlers other workers may call, and caches they may invalidate
+        self._handlers: dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._caches: dict[str, Callable[[], None]] = {}
+
+    @property
+    def worker_id(self) -> str:
+        """Identifier of this worker."""
+        return self._worker_id
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this worker runs the backend-wide schedulers."""
+        return self._primary_lock is not None
+
+    @property
+    def socket_path(self) -> Path:
+        """Unix socket this worker listens on."""
+        return self._socket_path(self._worker_id)
+
+    def attach(self, manager: "AgentManager") -> None:
+        """Set the agent manager that owns this worker's connections."""
+        self._manager = manager
+
+    async def start(self) -> None:
+        """Listen for peers, load the shared routes and elect a primary."""
+        self._ipc_dir.mkdir(parents=True, exist_ok=True)
+        self._lease = _try_lock(self._lease_path(self._worker_id))
+        self.socket_path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._serve, path=str(self.socket_path)
+        )
+        self._primary_lock = _try_lock(self._ipc_dir / PRIMARY_LOCK_NAME)
+        await self.refresh()
+        logger.info(
+            "Agent router started",
+            worker_id=self._worker_id,
+            primary=self.is_primary,
+            routes=len(self._routes),
+        )
+
+    async def stop(self) -> None:
+        """Release this worker's routes and close every IPC connection."""
+        if self._server:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        for route in self.routes():
+            if route.worker_id == self._worker_id:
+                await self.release(route.agent_id)
+        for task in list(self._tasks):
+            task.cancel()
+        for peer in list(self._peers.values()):
+            await peer.close()
+        self._peers.clear()
+        self.socket_path.unlink(missing_ok=True)
+        if self._primary_lock:
+            self._primary_lock.close()
+            self._primary_lock = None
+        if self._lease:
+            self._lease.close()
+            self._lease = None
+            self._lease_path(self._worker_id).unlink(missing_ok=True)
+        logger.info("Agent router stopped", worker_id=self._worker_id)
+
+    def is_worker_alive(self, worker_id: str) -> bool:
+        """Whether a worker process still holds its lease."""
+        if worker_id == self._worker_id:
+            return True
+        path = self._lease_path(worker_id)
+        if not path.exists():
+            return False
+        handle = _try_lock(path)
+        if handle is None:
+            return True
+        # Nobody holds the lease: the worker is gone
+        handle.close()
+        path.unlink(missing_ok=True)
+        return False
+
+    def get_route(self, agent_id: str) -> AgentRoute | None:
+        """Get the route of a connected agent, if any."""
+        return self._routes.get(agent_id)
+
+    def routes(self) -> list[AgentRoute]:
+        """Get the routes of every connected agent."""
+        return list(self._routes.values())
+
+    async def clear_routes(self) -> int:
+        """Forget every worker's routes.
+
+        Called once before workers start: no agent is connected to a
+        backend that is starting, so routes left by a previous run are
+        stale.
+
+        Returns:
+            Number of routes removed.
+        """
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute("DELETE FROM agent_routes")
+            await conn.commit()
+        self._routes.clear()
+        return cursor.rowcount
+
+    async def refresh(self) -> None:
+        """Reload every route from the database."""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT agent_id, worker_id, server_id, connected_at FROM agent_routes"
+            )
+            rows = await cursor.fetchall()
+        self._routes = {
+            row["agent_id"]: AgentRoute(
+                row["agent_id"], row["worker_id"], row["server_id"], row["connected_at"]
+            )
+            for row in rows
+        }
+
+    async def claim(self, agent_id: str, server_id: str) -> AgentRoute:
+        """Record this worker as the owner of an agent and tell the peers.
+
+        A peer still holding an older connection for the agent drops it.
+        """
+        route = AgentRoute(
+            agent_id, self._worker_id, server_id, datetime.now(UTC).isoformat()
+        )
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                """INSERT OR REPLACE INTO agent_routes
+                   (agent_id, worker_id, server_id, connected_at)
+                   VALUES (?, ?, ?, ?)""",
+                (route.agent_id, route.worker_id, route.server_id, route.connected_at),
+            )
+            await conn.commit()
+        self._routes[agent_id] = route
+        await self._broadcast({"op": "route", **route.to_dict()})
+        return route
+
+    async def release(self, agent_id: str) -> None:
+        """Remove this worker's route for an agent and tell the peers.
+
+        Routes another worker has claimed since are left alone.
+        """
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                "DELETE FROM agent_routes WHERE agent_id = ? AND worker_id = ?",
+                (agent_id, self._worker_id),
+            )
+            await conn.commit()
+        route = self._routes.get(agent_id)
+        if route and route.worker_id == self._worker_id:
+            del self._routes[agent_id]
+        self._drop_streams(agent_id)
+        await self._broadcast(
+            {"op": "unroute", "agent_id": agent_id, "worker_id": self._worker_id}
+        )
+
+    async def forward_command(
+        self,
+        agent_id: str,
+        method: str,
+        params: dict | None,
+        timeout: float,
+    ) -> Any:
+        """Send a command through the worker holding the agent's connection.
+
+        Raises:
+            ValueError: If no other worker holds a connection to the agent.
+            TimeoutError: If the agent or its worker does not respond in time.
+            RuntimeError: If the agent returns an error response.
+        """
+        route = self._routes.get(agent_id)
+        if route is None or route.worker_id == self._worker_id:
+            await self.refresh()
+            route = self._routes.get(agent_id)
+        if route is None or route.worker_id == self._worker_id:
+            raise ValueError(f"Agent {agent_id} is not connected")
+
+        message = {
+            "op": "command",
+            "origin": self._worker_id,
+            "agent_id": agent_id,
+            "method": method,
+            "params": params,
+            "timeout": timeout,
+        }
+        outcome = "error"
+        try:
+            peer = await self._peer(route.worker_id)
+            reply = await peer.request(message, timeout + FORWARD_GRACE_SECONDS)
+            error = reply.get("error")
+            if error:
+                error_type = _WIRE_ERRORS.get(error.get("type"), RuntimeError)
+                raise error_type(error.get("message", "Forwarded command failed"))
+            outcome = "ok"
+            return reply.get("result")
+        except TimeoutError:
+            outcome = "timeout"
+            raise
+        except OSError as e:
+            outcome = "unreachable"
+            await self._forget_worker(route.worker_id)
+            raise ValueError(f"Agent {agent_id} is not connected") from e
+        finally:
+            AGENT_FORWARDED_CALLS.inc(outcome)
+
+    async def relay_notification(self, agent_id: str, data: dict) -> bool:
+        """Pass a stream frame to the worker that started the stream.
+
+        Returns:
+            True if the frame was relayed or held for a forwarded command
+            still in flight; False if it belongs to this worker.
+        """
+        params = data.get("params")
+        stream_id = params.get("stream_id") if isinstance(params, dict) else None
+        if not stream_id:
+            return False
+
+        key = (agent_id, str(stream_id))
+        origin = self._stream_origins.get(key)
+        if origin is None:
+            if agent_id not in self._inflight:
+                return False
+            held = self._held[agent_id]
+            if len(held) < MAX_HELD_NOTIFICATIONS:
+                held.append(data)
+            else:
+                logger.warning("Dropping held stream frame", agent_id=agent_id)
+            return True
+
+        if params.get("done"):
+            self._stream_origins.pop(key, None)
+        try:
+            peer = await self._peer(origin)
+            await peer.send({"op": "notify", "agent_id": agent_id, "data": data})
+        except OSError as e:
+            self._stream_origins.pop(key, None)
+            logger.warning(
+                "Dropping stream frame for unreachable worker",
+                agent_id=agent_id,
+                worker_id=origin,
+                error=str(e),
+            )
+        return True
+
+    def register_handler(
+        self, name: str, handler: Callable[..., Awaitable[Any]]
+    ) -> None:
+        """Let other workers call a coroutine of this worker by name."""
+        self._handlers[name] = handler
+
+    async def call_worker(
+        self,
+        worker_id: str,
+        name: str,
+        args: dict[str, Any],
+        timeout: float = 30.0,
+    ) -> Any:
+        """Run a handler registered on another worker.
+
+        Args:
+            worker_id: Worker to run the handler on.
+            name: Name the handler was registered under.
+            args: Keyword arguments for the handler.
+            timeout: Seconds to wait for the result.
+
+        Raises:
+            ConnectionError: If the worker cannot be reached.
+            TimeoutError: If the worker does not respond in time.
+            RuntimeError: If the handler fails.
+        """
+        message = {"op": "call", "origin": self._worker_id, "name": name, "args": args}
+        try:
+            peer = await self._peer(worker_id)
+            reply = await peer.request(message, timeout)
+        except OSError as e:
+            raise ConnectionError(f"Worker {worker_id} is unreachable") from e
+        error = reply.get("error")
+        if error:
+            error_type = _WIRE_ERRORS.get(error.get("type"), RuntimeError)
+            raise error_type(error.get("message", "Worker call failed"))
+        return reply.get("result")
+
+    async def call_workers(
+        self,
+        name: str,
+        args: dict[str, Any],
+        timeout: float = 30.0,
+    ) -> list[Any]:
+        """Run a handler on every other worker and collect the results.
+
+        Workers whose lease is gone, or that cannot be reached, time out or
+        fail, are left out.
+
+        Args:
+            name: Name the handler was registered under.
+            args: Keyword arguments for the handler.
+            timeout: Seconds to wait for each worker.
+
+        Returns:
+            Results of the workers that answered.
+        """
+        worker_ids = [
+            worker_id
+            for path in self._ipc_dir.glob("worker-*.sock")
+            if (worker_id := path.stem.removeprefix("worker-")) != self._worker_id
+            and self.is_worker_alive(worker_id)
+        ]
+        replies = await asyncio.gather(
+            *(self.call_worker(w, name, args, timeout) for w in worker_ids),
+            return_exceptions=True,
+        )
+        results = []
+        for worker_id, reply in zip(worker_ids, replies, strict=True):
+            if isinstance(reply, Exception):
+                logger.warning(
+                    "Worker call failed",
+                    worker_id=worker_id,
+                    name=name,
+                    error=str(reply),
+                )
+            elif isinstance(reply, BaseException):
+                raise reply
+            else:
+                results.append(reply)
+        return results
+
+    def share_cache(self, name: str, clear: Callable[[], None]) -> Callable[[], None]:
+        """Keep a per-worker cache coherent across workers.
+
+        Args:
+            name: Cache name, the same on every worker.
+            clear: Drops this worker's copy of the cache.
+
+        Returns:
+            Function to call after the cache was invalidated locally; it
+            tells the other workers to clear their copies.
+        """
+        self._caches[name] = clear
+
+        def invalidate() -> None:
+            self._spawn(self._broadcast({"op": "invalidate", "name": name}))
+
+        return invalidate
+
+    # -------------------------------------------------------------------------
+    # IPC server
+    # -------------------------------------------------------------------------
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        write_lock = asyncio.Lock()
+        self._clients.add(writer)
+        try:
+            while (message := await read_frame(reader)) is not None:
+                op = message.get("op")
+                if op == "command":
+                    self._spawn(self._run_command(message, writer, write_lock))
+                elif op == "route":
+                    self._apply_route(message)
+                elif op == "unroute":
+                    self._apply_unroute(message)
+                elif op == "notify":
+                    self._spawn(self._dispatch(message["agent_id"], message["data"]))
+                elif op == "call":
+                    self._spawn(self._run_call(message, writer, write_lock))
+                elif op == "invalidate":
+                    self._apply_invalidate(message)
+                else:
+                    logger.warning("Unknown IPC operation", op=op)
+        except (OSError, ValueError) as e:
+            logger.warning("IPC connection failed", error=str(e))
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _run_command(
+        self,
+        message: dict[str, Any],
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ) -> None:
+        agent_id = message["agent_id"]
+        origin = message.get("origin")
+        params = message.get("params")
+        stream_id = params.get("stream_id") if isinstance(params, dict) else None
+        if origin and stream_id:
+            self._stream_origins[(agent_id, str(stream_id))] = origin
+
+        reply: dict[str, Any] = {"id": message.get("id")}
+        self._inflight[agent_id] += 1
+        try:
+            result = await self._manager.send_local_command(
+                agent_id,
+                message["method"],
+                params,
+                timeout=message.get("timeout", 30.0),
+            )
+            if origin and isinstance(result, dict) and result.get("stream_id"):
+                self._stream_origins[(agent_id, str(result["stream_id"]))] = origin
+            reply["result"] = result
+        except asyncio.CancelledError:
+            # Our own task is being cancelled, not the agent's request
+            if asyncio.current_task().cancelling():
+                raise
+            reply["error"] = {
+                "type": "ValueError",
+                "message": f"Agent {agent_id} disconnected",
+            }
+        except Exception as e:
+            reply["error"] = {"type": type(e).__name__, "message": str(e)}
+        finally:
+            self._inflight[agent_id] -= 1
+            if not self._inflight[agent_id]:
+                del self._inflight[agent_id]
+
+        await self._reply(writer, write_lock, reply, origin)
+
+        if agent_id not in self._inflight:
+            for data in self._held.pop(agent_id, []):
+                if not await self.relay_notification(agent_id, data):
+                    await self._dispatch(agent_id, data)
+
+    async def _run_call(
+        self,
+        message: dict[str, Any],
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ) -> None:
+        reply: dict[str, Any] = {"id": message.get("id")}
+        name = message.get("name")
+        handler = self._handlers.get(name)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown worker call {name}")
+            reply["result"] = await handler(**(message.get("args") or {}))
+        except Exception as e:
+            reply["error"] = {"type": type(e).__name__, "message": str(e)}
+        await self._reply(writer, write_lock, reply, message.get("origin"))
+
+    async def _reply(
+        self,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+        reply: dict[str, Any],
+        origin: str | None,
+    ) -> None:
+        try:
+            async with write_lock:
+                writer.write(encode_frame(reply))
+                await writer.drain()
+        except OSError as e:
+            logger.warning("Failed to reply to worker", worker_id=origin, error=str(e))
+
+    async def _dispatch(self, agent_id: str, data: dict) -> None:
+        await self._manager.dispatch_notification(agent_id, data)
+
+    def _apply_route(self, message: dict[str, Any]) -> None:
+        route = AgentRoute(
+            message["agent_id"],
+            message["worker_id"],
+            message["server_id"],
+            message["connected_at"],
+        )
+        self._routes[route.agent_id] = route
+        if self._manager and route.worker_id != self._worker_id:
+            # The agent reconnected to another worker; our socket is stale
+            self._spawn(self._manager.drop_superseded_connection(route.agent_id))
+
+    def _apply_unroute(self, message: dict[str, Any]) -> None:
+        agent_id = message["agent_id"]
+        route = self._routes.get(agent_id)
+        if route and route.worker_id == message["worker_id"]:
+            del self._routes[agent_id]
+
+    def _apply_invalidate(self, message: dict[str, Any]) -> None:
+        clear = self._caches.get(message.get("name"))
+        if clear:
+            clear()
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+
+    def _socket_path(self, worker_id: str) -> Path:
+        return self._ipc_dir / f"worker-{worker_id}.sock"
+
+    def _lease_path(self, worker_id: str) -> Path:
+        return self._ipc_dir / f"worker-{worker_id}.lease"
+
+    async def _peer(self, worker_id: str) -> _WorkerPeer:
+        async with self._peer_locks[worker_id]:
+            peer = self._peers.get(worker_id)
+            if peer is None or peer.closed:
+                reader, writer = await asyncio.open_unix_connection(
+                    str(self._socket_path(worker_id))
+                )
+                peer = _WorkerPeer(worker_id, reader, writer)
+                self._peers[worker_id] = peer
+            return peer
+
+    async def _broadcast(self, message: dict[str, Any]) -> None:
+        for path in self._ipc_dir.glob("worker-*.sock"):
+            worker_id = path.stem.removeprefix("worker-")
+            if worker_id == self._worker_id:
+                continue
+            try:
+                peer = await self._peer(worker_id)
+                await peer.send(message)
+            except OSError as e:
+                logger.debug(
+                    "Skipping unreachable worker", worker_id=worker_id, error=str(e)
+                )
+                await self._forget_worker(worker_id)
+
+    async def _forget_worker(self, worker_id: str) -> None:
+        """Drop the routes and socket of a worker that is gone."""
+        logger.warning("Dropping routes of unreachable worker", worker_id=worker_id)
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                "DELETE FROM agent_routes WHERE worker_id = ?", (worker_id,)
+            )
+            await conn.commit()
+        for agent_id, route in list(self._routes.items()):
+            if route.worker_id == worker_id:
+                del self._routes[agent_id]
+        peer = self._peers.pop(worker_id, None)
+        if peer:
+            await peer.close()
+        self._socket_path(worker_id).unlink(missing_ok=True)
+
+    def _drop_streams(self, agent_id: str) -> None:
+        for key in [k for k in self._stream_origins if k[0] == agent_id]:
+            del self._stream_origins[key]
+        self._held.pop(agent_id, None)
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def _try_lock(path: Path) -> IO | None:
+    """Take an exclusive lock on a file without waiting.
+
+    Returns:
+        The open file holding the lock, or None if another process has it.
+    """
+    handle = open(path, "a")  # noqa: SIM115 - held for the worker's lifetime
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
@@ -4,7 +4,11 @@ Provides data access and business logic for the application marketplace."""
 
 from __future__ import annotations
 
+import base64
+import binascii
 import json
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 
@@ -34,6 +38,21 @@ _APP_JOIN_SQL = """
     JOIN app_categories c ON a.category_id = c.id
 """
 
+# ORDER BY expressions per sort key; a.id breaks ties so keyset cursors are
+# unambiguous. name and popularity are backed by expression indexes.
+_SORT_EXPRESSIONS = {
+    "name": "lower(a.name)",
+    "rating": "COALESCE(a.rating, 0)",
+    "popularity": "COALESCE(a.install_count, 0)",
+    "install_count": "COALESCE(a.install_count, 0)",
+    "updated": "COALESCE(julianday(a.updated_at), 0)",
+}
+
+# Search results are reused for identical filters for this long, and
+# dropped as soon as the catalog changes, on every worker
+SEARCH_CACHE_TTL_SECONDS = 30.0
+MAX_CACHED_SEARCHES = 128
+
 
 class AppService:
     """Service for managing applications and installations."""
@@ -46,81 +65,179 @@ class AppService:
         self._conn = connection
         self._log_service = log_service
         self.installations: dict[str, AppInstallation] = {}
+        self._search_cache: dict[str, tuple[float, AppSearchResult]] = {}
+        self._on_invalidate: Callable[[], None] | None = None
         logger.info("Application service initialized")
 
-    async def _fetch_all_apps(self) -> list[App]:
-        """Fetch all applications with their categories from the database."""
-        async with self._conn.get_connection() as conn:
-            cursor = await conn.execute(_APP_JOIN_SQL)
-            rows = await cursor.fetchall()
+    def set_invalidation_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener whenever the catalog changes, e.g. to tell peers."""
+        self._on_invalidate = listener
 
-        apps = [App.from_row(row) for row in rows]
-        logger.debug("Fetched applications from database", count=len(apps))
-        return apps
+    @staticmethod
+    def _sort_key(filters: AppFilter) -> tuple[str, bool]:
+        """Return the normalized sort key and whether it is descending."""
+        sort_key = (filters.sort_by or "name").lower()
+        if sort_key not in _SORT_EXPRESSIONS:
+            logger.debug("Unknown sort key, defaulting to name", sort_key=sort_key)
+            sort_key = "name"
+        return sort_key, (filters.sort_order or "asc").lower() == "desc"
 
     @staticmethod
-    def _apply_filters(apps: list[App], filters: AppFilter) -> list[App]:
-        """Apply in-memory filtering to the application list."""
-        filtered: list[App] = []
-        search_term = filters.search.lower() if filters.search else None
-        required_tags = set(tag.lower() for tag in filters.tags or [])
-
-        for app in apps:
-            if filters.category and app.category.id != filters.category:
-                continue
-            if filters.status and app.status != filters.status:
-                continue
-            if filters.featured is not None and bool(app.featured) != filters.featured:
-                continue
-            if required_tags and not required_tags.issubset(
-                {tag.lower() for tag in app.tags}
-            ):
-                continue
-            if (
-                search_term
-                and search_term not in app.name.lower()
-                and search_term not in app.description.lower()
-            ):
-                continue
-            filtered.append(app)
-
-        return filtered
+    def _build_where(filters: AppFilter) -> tuple[str, list[Any]]:
+        """Translate filters into SQL predicates on the applications JOIN."""
+        conditions: list[str] = []
+        params: list[Any] = []
+
+        if filters.category:
+            conditions.append("a.category_id = ?")
+            params.append(filters.category)
+        if filters.status:
+            conditions.append("a.status = ?")
+            params.append(AppStatus(filters.status).value)
+        if filters.featured is not None:
+            conditions.append("COALESCE(a.featured, 0) = ?")
+            params.append(1 if filters.featured else 0)
+        for tag in sorted({tag.lower() for tag in filters.tags or []}):
+            conditions.append(
+                "EXISTS (SELECT 1 FROM json_each(a.tags) t WHERE lower(t.value) = ?)"
+            )
+            params.append(tag)
+        if filters.search:
+            conditions.append(
+                "(instr(lower(a.name), ?) > 0 OR instr(lower(a.description), ?) > 0)"
+            )
+            params.extend([filters.search.lower()] * 2)
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, params
 
     @staticmethod
-    def _apply_sorting(apps: list[App], filters: AppFilter) -> None:
-        """Sort applications in-place based on filter configuration."""
-        reverse = (filters.sort_order or "asc").lower() == "desc"
-        sort_key = (filters.sort_by or "name").lower()
+    def _encode_cursor(sort_key: str, descending: bool, row: Any, page: int) -> str:
+        """Encode the position after row for keyset pagination."""
+        payload = {
+            "sort": sort_key,
+            "desc": descending,
+            "value": row["sort_value"],
+            "id": row["id"],
+            "page": page,
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
 
-        if sort_key == "name":
-            apps.sort(key=lambda app: app.name.lower(), reverse=reverse)
-        elif sort_key == "rating":
-            apps.sort(key=lambda app: app.rating or 0, reverse=reverse)
-        elif sort_key in {"popularity", "install_count"}:
-            apps.sort(key=lambda app: app.install_count or 0, reverse=reverse)
-        elif sort_key == "updated":
-            apps.sort(
-                key=lambda app: AppService._iso_to_datetime(app.updated_at),
-                reverse=reverse,
-            )
-        else:
-            logger.debug("Unknown sort key, defaulting to name", sort_key=sort_key)
-            apps.sort(key=lambda app: app.name.lower(), reverse=reverse)
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_key: str, descending: bool) -> dict:
+        """Decode a cursor, rejecting ones issued for a different sort."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError("Invalid search cursor") from e
+        if (
+            not isinstance(payload, dict)
+            or payload.get("sort") != sort_key
+            or payload.get("desc") != descending
+            or "value" not in payload
+            or "id" not in payload
+        ):
+            raise ValueError("Search cursor does not match the requested sort")
+        return payload
 
     @staticmethod
-    def _iso_to_datetime(value: str) -> datetime:
-        """Convert ISO formatted string to datetime for sorting."""
-        if value.lower().endswith("z"):
-            value = value[:-1] + "+00:00"
-        return datetime.fromisoformat(value)
+    def _cache_key(filters: AppFilter) -> str:
+        """Key equivalent filters (case, tag order, whitespace) the same way."""
+        data = filters.model_dump(mode="json")
+        data["search"] = (filters.search or "").strip().lower() or None
+        data["tags"] = sorted({tag.lower() for tag in filters.tags or []}) or None
+        data["sort_by"], data["sort_order"] = AppService._sort_key(filters)
+        return json.dumps(data, sort_keys=True)
+
+    def _cached_search(self, key: str) -> AppSearchResult | None:
+        """Return a cached result that has not expired."""
+        entry = self._search_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._search_cache[key]
+            return None
+        return result
+
+    def _cache_search(self, key: str, result: AppSearchResult) -> None:
+        """Store a result, evicting the oldest entries beyond the limit."""
+        self._search_cache[key] = (
+            time.monotonic() + SEARCH_CACHE_TTL_SECONDS,
+            result,
+        )
+        while len(self._search_cache) > MAX_CACHED_SEARCHES:
+            del self._search_cache[next(iter(self._search_cache))]
+
+    def clear_search_cache(self) -> None:
+        """Forget this process's cached search results."""
+        self._search_cache.clear()
+
+    def _invalidate_search_cache(self) -> None:
+        """Forget cached search results after a catalog change."""
+        self.clear_search_cache()
+        if self._on_invalidate:
+            self._on_invalidate()
 
     async def search_apps(self, filters: AppFilter) -> AppSearchResult:
-        """Search applications with filters and return a result set."""
-        apps = await self._fetch_all_apps()
-        filtered_apps = self._apply_filters(apps, filters)
-        self._apply_sorting(filtered_apps, filters)
+        """Search applications with filters and return a result set.
+
+        Filtering, sorting and keyset pagination run in SQL. Pass
+        ``next_cursor`` back as ``filters.cursor`` to fetch the next page.
+
+        Raises:
+            ValueError: If the cursor is invalid or was issued for another sort.
+        """
+        cache_key = self._cache_key(filters)
+        cached = self._cached_search(cache_key)
+        if cached is not None:
+            logger.debug("Application search served from cache", total=cached.total)
+            return cached.model_copy(update={"filters": filters})
+
+        sort_key, descending = self._sort_key(filters)
+        sort_expr = _SORT_EXPRESSIONS[sort_key]
+        direction = "DESC" if descending else "ASC"
+        where, params = self._build_where(filters)
+
+        page = 1
+        keyset = ""
+        keyset_params: list[Any] = []
+        if filters.cursor:
+            position = self._decode_cursor(filters.cursor, sort_key, descending)
+            page = int(position.get("page", 1)) + 1
+            op = "<" if descending else ">"
+            keyset = f"({sort_expr} {op} ? OR ({sort_expr} = ? AND a.id {op} ?))"
+            keyset = (" AND " if where else " WHERE ") + keyset
+            keyset_params = [position["value"], position["value"], position["id"]]
+
+        query = (
+            f"SELECT a.*, c.id AS cat_id, c.name AS cat_name,"
+            f" c.description AS cat_desc, c.icon AS cat_icon,"
+            f" c.color AS cat_color, {sort_expr} AS sort_value"
+            f" FROM applications a JOIN app_categories c ON a.category_id = c.id"
+            f"{where}{keyset} ORDER BY {sort_expr} {direction}, a.id {direction}"
+        )
+        # One extra row tells whether another page follows
+        query_params = [*params, *keyset_params]
+        if filters.limit:
+            query += " LIMIT ?"
+            query_params.append(filters.limit + 1)
 
-        total = len(filtered_apps)
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT COUNT(*) FROM applications a"
+                " JOIN app_categories c ON a.category_id = c.id" + where,
+                params,
+            )
+            total = (await cursor.fetchone())[0]
+            cursor = await conn.execute(query, query_params)
+            rows = await cursor.fetchall()
+
+        next_cursor = None
+        if filters.limit and len(rows) > filters.limit:
+            rows = rows[: filters.limit]
+            next_cursor = self._encode_cursor(sort_key, descending, rows[-1], page)
+        apps = [App.from_row(row) for row in rows]
 
         if total == 0:
             metadata_filters = filters.model_dump(exclude_none=True, mode="json")
@@ -133,21 +250,21 @@ class AppService:
                 logger.warning(str(error))
 
         result = AppSearchResult(
-            apps=filtered_apps,
+            apps=apps,
             total=total,
-            page=1,
-            limit=total or len(apps),
+            page=page,
+            limit=filters.limit or len(apps),
             filters=filters,
+            next_cursor=next_cursor,
         )
+        self._cache_search(cache_key, result)
         logger.info("Application search completed", total=total)
         return result
 
     async def get_app_by_id(self, app_id: str) -> App | None:
         """Retrieve a single application by identifier."""
         async with self._conn.get_connection() as conn:
-            cursor = await conn.execute(
-                _APP_JOIN_SQL + " WHERE a.id = ?", (app_id,)
-            )
+            cursor = await conn.execute(_APP_JOIN_SQL + " WHERE a.id = ?", (app_id,))
             row = await cursor.fetchone()
 
         if not row:
@@ -237,6 +354,7 @@ class AppService:
             await conn.commit()
             logger.info("Application created from import", app_id=app.id, name=app.name)
 
+        self._invalidate_search_cache()
         return app
 
     async def remove_app(self, app_id: str) -> bool:
@@ -259,6 +377,7 @@ class AppService:
             await conn.commit()
             logger.info("Application removed from catalog", app_id=app_id)
 
+        self._invalidate_search_cache()
         return True
 
     async def remove_apps_bulk(self, app_ids: list[str]) -> dict[str, Any]:
@@ -306,6 +425,7 @@ class AppService:
             await conn.commit()
             logger.info("Application marked as uninstalled", app_id=app_id)
 
+        self._invalidate_search_cache()
         return True
 
     async def mark_app_installed(self, app_id: str, server_id: str) -> bool:
@@ -341,6 +461,7 @@ class AppService:
                 server_id=server_id,
             )
 
+        self._invalidate_search_cache()
         return True
 
     async def mark_apps_uninstalled_bulk(self, app_ids: list[str]) -> dict[str, Any]:
@@ -0,0 +1,337 @@
+"""Backend Self-Telemetry.
+
+Samples the backend process itself: event loop lag, asyncio task count,
+RSS, CPU, open file descriptors, the SQLite database and WAL size, busy
+database errors and agent connections. A background task probes the
+event loop twice a second and records a sample every ten seconds into a
+short in-memory history, so reading the current state is a few syscalls
+and never touches the database.
+
+Process figures come from /proc and are None on platforms without it.
+"""
+
+import asyncio
+import contextlib
+import os
+import resource
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from services.database.base import DB_BUSY_ERRORS, DatabaseConnection
+
+if TYPE_CHECKING:
+    from services.agent_manager import AgentManager
+
+logger = structlog.get_logger("backend_telemetry")
+
+# Seconds between event loop lag probes
+LAG_PROBE_INTERVAL_SECONDS = 0.5
+# Seconds between recorded samples
+SAMPLE_INTERVAL_SECONDS = 10.0
+# Samples kept in memory (one hour at the default interval)
+HISTORY_SIZE = 360
+# Event loop lag at which the backend is degraded or unhealthy
+LOOP_LAG_DEGRADED_MS = 100.0
+LOOP_LAG_UNHEALTHY_MS = 1000.0
+# Database round trip at which the database is degraded
+DB_PROBE_DEGRADED_MS = 500.0
+# WAL size at which checkpoints are falling behind
+WAL_DEGRADED_BYTES = 64 << 20
+# Share of the descriptor limit in use at which the process is degraded
+FD_DEGRADED_RATIO = 0.8
+
+# Health states from best to worst; "unknown" does not change the overall state
+_SEVERITY = {"healthy": 0, "degraded": 1, "unhealthy": 2}
+
+
+@dataclass(frozen=True)
+class TelemetrySample:
+    """One reading of the backend's own resource use."""
+
+    timestamp: float
+    loop_lag_ms: float | None
+    tasks: int
+    rss_bytes: int | None
+    cpu_percent: float | None
+    open_fds: int | None
+    db_size_bytes: int | None
+    wal_size_bytes: int | None
+    db_busy_errors: int
+    agents_connected: int | None
+    agent_pending_requests: int | None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        data = asdict(self)
+        data["timestamp"] = datetime.fromtimestamp(self.timestamp, UTC).isoformat()
+        return data
+
+
+class BackendTelemetry:
+    """Low-overhead collector of the backend's own health figures."""
+
+    def __init__(
+        self,
+        connection: DatabaseConnection | None = None,
+        agent_manager: "AgentManager | None" = None,
+        history_size: int = HISTORY_SIZE,
+    ):
+        """Initialize the collector.
+
+        Args:
+            connection: Database whose files are measured and probed.
+            agent_manager: Source of agent connection counts.
+            history_size: Number of samples kept in memory.
+        """
+        self._connection = connection
+        self._agent_manager = agent_manager
+        self._history: deque[TelemetrySample] = deque(maxlen=history_size)
+        self._task: asyncio.Task | None = None
+        self._window_lag: float | None = None
+        self._cpu_mark: tuple[float, float] | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background collector is running."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def latest(self) -> TelemetrySample | None:
+        """Most recent recorded sample, if any."""
+        return self._history[-1] if self._history else None
+
+    def history(self) -> list[TelemetrySample]:
+        """Recorded samples, oldest first."""
+        return list(self._history)
+
+    def history_series(self) -> dict[str, list[Any]]:
+        """Recorded samples as one array per field, oldest first."""
+        samples = self._history
+        return {
+            field.name: [getattr(sample, field.name) for sample in samples]
+            for field in fields(TelemetrySample)
+        }
+
+    async def start(
+        self,
+        sample_interval: float = SAMPLE_INTERVAL_SECONDS,
+        probe_interval: float = LAG_PROBE_INTERVAL_SECONDS,
+    ) -> None:
+        """Start probing the event loop and recording samples.
+
+        Args:
+            sample_interval: Seconds between recorded samples.
+            probe_interval: Seconds between event loop lag probes.
+        """
+        if self.running:
+            logger.warning("Backend telemetry already running")
+            return
+        self.record()
+        self._task = asyncio.create_task(self._run(sample_interval, probe_interval))
+        logger.info("Backend telemetry started", interval_seconds=sample_interval)
+
+    async def stop(self) -> None:
+        """Stop the background collector."""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        logger.info("Backend telemetry stopped")
+
+    def sample(self) -> TelemetrySample:
+        """Read the current figures without recording them.
+
+        Loop lag is the worst probe since the last recorded sample, and
+        CPU is averaged since then; both are None before the first one.
+        """
+        db_size, wal_size = self._database_sizes()
+        return TelemetrySample(
+            timestamp=time.time(),
+            loop_lag_ms=(
+                round(self._window_lag * 1000, 3)
+                if self._window_lag is not None
+                else None
+            ),
+            tasks=_task_count(),
+            rss_bytes=_rss_bytes(),
+            cpu_percent=self._cpu_percent(),
+            open_fds=_open_fds(),
+            db_size_bytes=db_size,
+            wal_size_bytes=wal_size,
+            db_busy_errors=int(DB_BUSY_ERRORS.total()),
+            agents_connected=(
+                len(self._agent_manager.get_connected_agent_ids())
+                if self._agent_manager
+                else None
+            ),
+            agent_pending_requests=(
+                self._agent_manager.get_pending_request_count()
+                if self._agent_manager
+                else None
+            ),
+        )
+
+    def record(self) -> TelemetrySample:
+        """Take a sample, add it to the history and start a new window."""
+        sample = self.sample()
+        self._history.append(sample)
+        self._window_lag = None
+        self._cpu_mark = (time.process_time(), time.perf_counter())
+        return sample
+
+    async def check_health(self) -> dict[str, Any]:
+        """Grade the backend's components from the latest figures.
+
+        The database is probed with a round trip; everything else comes
+        from a fresh sample.
+
+        Returns:
+            Dict with the overall status and a status per component.
+        """
+        sample = self.sample()
+        components = {
+            "event_loop": _event_loop_health(sample),
+            "database": await self._database_health(sample),
+            "file_descriptors": _descriptor_health(sample),
+            "agents": {
+                "status": "healthy" if self._agent_manager else "unknown",
+                "connected": sample.agents_connected,
+                "pending_requests": sample.agent_pending_requests,
+            },
+            "telemetry": {
+                "status": "healthy" if self.running else "degraded",
+                "samples": len(self._history),
+            },
+        }
+        statuses = [
+            c["status"] for c in components.values() if c["status"] in _SEVERITY
+        ]
+        overall = max(statuses, key=_SEVERITY.__getitem__, default="unknown")
+        return {"status": overall, "components": components}
+
+    async def _run(self, sample_interval: float, probe_interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time() + sample_interval
+        while True:
+            expected = loop.time() + probe_interval
+            await asyncio.sleep(probe_interval)
+            lag = max(0.0, loop.time() - expected)
+            if self._window_lag is None or lag > self._window_lag:
+                self._window_lag = lag
+            if loop.time() >= next_sample:
+                next_sample += sample_interval
+                try:
+                    self.record()
+                except Exception as e:
+                    logger.error("Failed to record backend telemetry", error=str(e))
+
+    def _cpu_percent(self) -> float | None:
+        if self._cpu_mark is None:
+            return None
+        cpu_then, wall_then = self._cpu_mark
+        elapsed = time.perf_counter() - wall_then
+        if elapsed <= 0:
+            return None
+        return round((time.process_time() - cpu_then) / elapsed * 100, 2)
+
+    def _database_sizes(self) -> tuple[int | None, int | None]:
+        if self._connection is None:
+            return None, None
+        return _file_size(self._connection.path), _file_size(
+            self._connection.path + "-wal"
+        )
+
+    async def _database_health(self, sample: TelemetrySample) -> dict[str, Any]:
+        health: dict[str, Any] = {
+            "size_bytes": sample.db_size_bytes,
+            "wal_size_bytes": sample.wal_size_bytes,
+            "busy_errors": sample.db_busy_errors,
+        }
+        if self._connection is None:
+            return {"status": "unknown", **health}
+
+        started = time.perf_counter()
+        try:
+            async with self._connection.get_connection() as conn:
+                cursor = await conn.execute("SELECT 1")
+                await cursor.fetchone()
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e), **health}
+        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        degraded = latency_ms >= DB_PROBE_DEGRADED_MS or (
+            (sample.wal_size_bytes or 0) >= WAL_DEGRADED_BYTES
+        )
+        return {
+            "status": "degraded" if degraded else "healthy",
+            "latency_ms": latency_ms,
+            **health,
+        }
+
+
+def _event_loop_health(sample: TelemetrySample) -> dict[str, Any]:
+    lag = sample.loop_lag_ms
+    if lag is None:
+        status = "unknown"
+    elif lag >= LOOP_LAG_UNHEALTHY_MS:
+        status = "unhealthy"
+    elif lag >= LOOP_LAG_DEGRADED_MS:
+        status = "degraded"
+    else:
+        status = "healthy"
+    return {"status": status, "lag_ms": lag, "tasks": sample.tasks}
+
+
+def _descriptor_health(sample: TelemetrySample) -> dict[str, Any]:
+    limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    if sample.open_fds is None:
+        status = "unknown"
+    elif limit != resource.RLIM_INFINITY and sample.open_fds >= (
+        limit * FD_DEGRADED_RATIO
+    ):
+        status = "degraded"
+    else:
+        status = "healthy"
+    return {
+        "status": status,
+        "open": sample.open_fds,
+        "limit": None if limit == resource.RLIM_INFINITY else limit,
+    }
+
+
+def _task_count() -> int:
+    try:
+        return len(asyncio.all_tasks())
+    except RuntimeError:
+        return 0
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _open_fds() -> int | None:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _file_size(path: str) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+    except OSError:
+        return None
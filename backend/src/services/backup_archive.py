@@ -0,0 +1,363 @@
+"""Backup Archive Format.
+
+Streaming, chunked, authenticated encryption for full database backups.
+
+An archive is a magic string, a length-prefixed JSON header and a series
+of frames. The database snapshot is zlib-compressed and cut into chunks;
+each chunk is sealed with AES-256-GCM under a key derived from the backup
+password. Nonces carry a chunk counter and a final-chunk flag, and the
+header is bound to every chunk as associated data, so reordered, dropped,
+truncated or edited frames fail authentication. Only one chunk is held in
+memory at a time in either direction.
+
+All functions here are blocking; callers run them in a worker thread.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import struct
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, BinaryIO
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Leading bytes of every archive
+ARCHIVE_MAGIC = b"TOMOBAK2"
+# Archive format version recorded in the header
+ARCHIVE_VERSION = "2.0"
+# Compressed bytes sealed per frame
+CHUNK_SIZE = 1 << 20
+# Largest chunk size a reader accepts from a header
+MAX_CHUNK_SIZE = 16 << 20
+# Largest header a reader accepts
+MAX_HEADER_SIZE = 64 << 10
+# PBKDF2-SHA256 iterations for new archives
+KDF_ITERATIONS = 480_000
+# Iterations a reader accepts from a header, so a crafted one cannot stall it
+MAX_KDF_ITERATIONS = 10_000_000
+# Database pages copied per step of the online backup
+SNAPSHOT_PAGES_PER_STEP = 1024
+
+_SALT_SIZE = 16
+_NONCE_PREFIX_SIZE = 7
+_TAG_SIZE = 16
+_UINT32 = struct.Struct(">I")
+# High bit of a frame length marks the final frame
+_FINAL_FLAG = 1 << 31
+
+
+class BackupFormatError(ValueError):
+    """Archive is malformed, truncated, tampered with or the password is wrong."""
+
+
+@dataclass(frozen=True)
+class ArchiveInfo:
+    """Header fields of an archive."""
+
+    version: str
+    created_at: str
+    schema_version: int
+    database_size: int
+    header: dict[str, Any]
+
+
+def derive_key(password: str, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
+    """Derive a 256-bit archive key from a password."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iterations
+    )
+    return kdf.derive(password.encode("utf-8"))
+
+
+def is_archive(path: str) -> bool:
+    """Check whether a file starts with the archive magic."""
+    with open(path, "rb") as f:
+        return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def write_archive(
+    source: BinaryIO,
+    output: BinaryIO,
+    password: str,
+    metadata: dict[str, Any],
+) -> ArchiveInfo:
+    """Compress, encrypt and write a database snapshot.
+
+    Args:
+        source: Snapshot file, read in chunks.
+        output: Destination; only ever written sequentially.
+        password: Backup password.
+        metadata: Extra header fields (schema_version, database_size).
+
+    Returns:
+        The header written to the archive.
+    """
+    salt = os.urandom(_SALT_SIZE)
+    iterations = KDF_ITERATIONS
+    nonce_prefix = os.urandom(_NONCE_PREFIX_SIZE)
+    header = {
+        **metadata,
+        "version": ARCHIVE_VERSION,
+        "created_at": datetime.now(UTC).isoformat(),
+        "cipher": "AES-256-GCM",
+        "compression": "zlib",
+        "chunk_size": CHUNK_SIZE,
+        "kdf": {
+            "name": "PBKDF2-SHA256",
+            "iterations": iterations,
+            "salt": base64.b64encode(salt).decode("ascii"),
+        },
+        "nonce_prefix": base64.b64encode(nonce_prefix).decode("ascii"),
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    output.write(ARCHIVE_MAGIC + _UINT32.pack(len(header_bytes)) + header_bytes)
+
+    aead = AESGCM(derive_key(password, salt, iterations))
+    associated = ARCHIVE_MAGIC + header_bytes
+    counter = 0
+
+    def seal(chunk: bytes, final: bool) -> None:
+        nonlocal counter
+        frame = aead.encrypt(_nonce(nonce_prefix, counter, final), chunk, associated)
+        length = len(frame) | (_FINAL_FLAG if final else 0)
+        output.write(_UINT32.pack(length) + frame)
+        counter += 1
+
+    compressor = zlib.compressobj(6)
+    pending = bytearray()
+    while block := source.read(CHUNK_SIZE):
+        pending += compressor.compress(block)
+        while len(pending) > CHUNK_SIZE:
+            seal(bytes(pending[:CHUNK_SIZE]), final=False)
+            del pending[:CHUNK_SIZE]
+    pending += compressor.flush()
+    while len(pending) > CHUNK_SIZE:
+        seal(bytes(pending[:CHUNK_SIZE]), final=False)
+        del pending[:CHUNK_SIZE]
+    seal(bytes(pending), final=True)
+    output.flush()
+    return _info(header)
+
+
+def read_header(source: BinaryIO) -> tuple[bytes, dict[str, Any]]:
+    """Read and check the archive header.
+
+    Returns:
+        The raw header bytes and the decoded header.
+
+    Raises:
+        BackupFormatError: If the file is not a supported archive.
+    """
+    if source.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+        raise BackupFormatError("Not a database backup archive")
+    (length,) = _UINT32.unpack(_read_exact(source, _UINT32.size))
+    if length > MAX_HEADER_SIZE:
+        raise BackupFormatError("Backup header is too large")
+    header_bytes = _read_exact(source, length)
+    try:
+        header = json.loads(header_bytes)
+    except ValueError as e:
+        raise BackupFormatError("Backup header is not valid JSON") from e
+
+    version = str(header.get("version", "0"))
+    if version.split(".")[0] != ARCHIVE_VERSION.split(".")[0]:
+        raise BackupFormatError(
+            f"Backup version {version} is not supported (expected {ARCHIVE_VERSION})"
+        )
+    chunk_size = header.get("chunk_size")
+    if not isinstance(chunk_size, int) or not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise BackupFormatError("Backup header has an invalid chunk size")
+    return header_bytes, header
+
+
+def read_archive(
+    source: BinaryIO, password: str, output: BinaryIO | None = None
+) -> ArchiveInfo:
+    """Authenticate, decrypt and decompress an archive.
+
+    Args:
+        source: Archive file, read frame by frame.
+        password: Backup password.
+        output: Receives the database snapshot; None only verifies.
+
+    Returns:
+        The archive header.
+
+    Raises:
+        BackupFormatError: If the password is wrong or the archive is
+            malformed, truncated or modified.
+    """
+    header_bytes, header = read_header(source)
+    info = _info(header)
+    kdf = header.get("kdf", {})
+    try:
+        salt = base64.b64decode(kdf["salt"])
+        nonce_prefix = base64.b64decode(header["nonce_prefix"])
+        iterations = int(kdf["iterations"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise BackupFormatError("Backup header is missing key parameters") from e
+    if len(nonce_prefix) != _NONCE_PREFIX_SIZE or not (
+        0 < iterations <= MAX_KDF_ITERATIONS
+    ):
+        raise BackupFormatError("Backup header has invalid key parameters")
+
+    aead = AESGCM(derive_key(password, salt, iterations))
+    associated = ARCHIVE_MAGIC + header_bytes
+    max_frame = header["chunk_size"] + _TAG_SIZE
+    decompressor = zlib.decompressobj()
+    written = 0
+    counter = 0
+    final = False
+
+    while not final:
+        raw_length = source.read(_UINT32.size)
+        if len(raw_length) < _UINT32.size:
+            raise BackupFormatError("Backup is truncated")
+        (length,) = _UINT32.unpack(raw_length)
+        final = bool(length & _FINAL_FLAG)
+        length &= ~_FINAL_FLAG
+        if length > max_frame:
+            raise BackupFormatError("Backup frame is too large")
+        frame = _read_exact(source, length)
+        try:
+            chunk = aead.decrypt(
+                _nonce(nonce_prefix, counter, final), frame, associated
+            )
+        except InvalidTag as e:
+            raise BackupFormatError("Invalid password or corrupted backup") from e
+        counter += 1
+        written += _inflate(decompressor, chunk, output, info.database_size - written)
+
+    if source.read(1):
+        raise BackupFormatError("Unexpected data after the final backup frame")
+    if not decompressor.eof or decompressor.unused_data:
+        raise BackupFormatError("Backup data is incomplete")
+    if written != info.database_size:
+        raise BackupFormatError("Backup size does not match its header")
+    return info
+
+
+def snapshot_database(
+    db_path: str,
+    destination: str,
+    progress: Callable[[int, int, int], object] | None = None,
+) -> int:
+    """Copy a live database with SQLite's online backup API.
+
+    Pages are copied in steps so writers are not locked out for the whole
+    copy; SQLite restarts the copy if another connection writes meanwhile.
+
+    Returns:
+        Size of the snapshot in bytes.
+    """
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(destination)
+    try:
+        source.backup(target, pages=SNAPSHOT_PAGES_PER_STEP, progress=progress)
+    finally:
+        target.close()
+        source.close()
+    return os.path.getsize(destination)
+
+
+def restore_database(snapshot_path: str, db_path: str) -> None:
+    """Replace the contents of a live database with a snapshot.
+
+    Uses the online backup API in the other direction, so open connections
+    see the restored data without the file being swapped under them.
+    """
+    source = sqlite3.connect(snapshot_path)
+    target = sqlite3.connect(db_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def inspect_snapshot(snapshot_path: str) -> dict[str, Any]:
+    """Check a snapshot's integrity and count its rows per table.
+
+    Raises:
+        BackupFormatError: If SQLite reports the snapshot as damaged.
+    """
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        try:
+            problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        except sqlite3.DatabaseError as e:
+            raise BackupFormatError(f"Backup is not a valid database: {e}") from e
+        if problems != ["ok"]:
+            raise BackupFormatError(f"Backup database is damaged: {problems[0]}")
+        tables = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+                " AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        rows = {
+            table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            for table in tables
+        }
+        return {"tables": rows, "schema_version": _schema_version(conn)}
+    finally:
+        conn.close()
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def _inflate(
+    decompressor: Any, chunk: bytes, output: BinaryIO | None, remaining: int
+) -> int:
+    """Decompress one chunk without exceeding the declared database size."""
+    written = 0
+    data = chunk
+    while True:
+        # Never inflate past the declared size, so a crafted archive cannot
+        # expand into an arbitrarily large file
+        block = decompressor.decompress(data, CHUNK_SIZE)
+        written += len(block)
+        if written > remaining:
+            raise BackupFormatError("Backup expands beyond its declared size")
+        if output is not None:
+            output.write(block)
+        data = decompressor.unconsumed_tail
+        # A full block may leave output buffered inside zlib; drain it
+        if not data and len(block) < CHUNK_SIZE:
+            return written
+
+
+def _nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if final else b"\x00")
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise BackupFormatError("Backup is truncated")
+    return data
+
+
+def _info(header: dict[str, Any]) -> ArchiveInfo:
+    return ArchiveInfo(
+        version=str(header.get("version", "")),
+        created_at=str(header.get("created_at", "")),
+        schema_version=int(header.get("schema_version", 0)),
+        database_size=int(header.get("database_size", 0)),
+        header=header,
+    )
@@ -2,14 +2,23 @@
 Backup Service
 
 Export and import encrypted backups of all application data.
+
+Backups are full database snapshots taken with SQLite's online backup API
+and streamed through compression and chunked authenticated encryption (see
+services.backup_archive) in a worker thread. JSON backups written by
+earlier releases, which held users, servers and settings, can still be
+imported.
 """
 
+import asyncio
 import base64
+import contextlib
 import hashlib
 import json
 import os
-from datetime import UTC, datetime
-from typing import Any
+import tempfile
+from collections.abc import Iterator
+from typing import Any, BinaryIO
 
 import aiofiles
 import structlog
@@ -17,8 +26,20 @@ from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+from services.backup_archive import (
+    ArchiveInfo,
+    inspect_snapshot,
+    is_archive,
+    read_archive,
+    restore_database,
+    snapshot_database,
+    write_archive,
+)
+from services.database.migrations import MIGRATIONS
+
 logger = structlog.get_logger("backup_service")
 
+# Version and fields of the legacy JSON backups, still accepted on import
 BACKUP_VERSION = "1.0"
 REQUIRED_FIELDS = ["version", "timestamp", "users", "servers", "settings"]
 
@@ -67,22 +88,6 @@ class BackupService:
         )
         return base64.urlsafe_b64encode(kdf.derive(password.encode()))
 
-    def _encrypt_data(self, data: dict[str, Any], password: str) -> bytes:
-        """Encrypt backup data with password."""
-        # Generate random salt
-        salt = os.urandom(16)
-
-        # Derive key from password
-        key = self._derive_key(password, salt)
-        fernet = Fernet(key)
-
-        # Serialize and encrypt
-        json_data = json.dumps(data, indent=2).encode("utf-8")
-        encrypted = fernet.encrypt(json_data)
-
-        # Prepend salt to encrypted data
-        return salt + encrypted
-
     def _decrypt_data(self, encrypted: bytes, password: str) -> dict[str, Any]:
         """Decrypt backup data with password."""
         # Extract salt and encrypted data
@@ -119,87 +124,215 @@ class BackupService:
 
         return {"valid": True}
 
-    async def _collect_backup_data(self) -> dict[str, Any]:
-        """Collect all data for backup."""
-        users = await self.db_service.export_users()
-        servers = await self.db_service.export_servers()
-        settings = await self.db_service.export_settings()
-
-        return {
-            "version": BACKUP_VERSION,
-            "timestamp": datetime.now(UTC).isoformat(),
-            "users": users,
-            "servers": servers,
-            "settings": settings,
-            "app_configs": [],  # Future: installed app configurations
-        }
-
     async def export_backup(self, output_path: str, password: str) -> dict[str, Any]:
-        """Export encrypted backup to file."""
+        """Export an encrypted snapshot of the whole database to file.
+
+        The snapshot, compression and encryption run in a worker thread and
+        stream through fixed-size chunks, so memory use does not grow with
+        the database and the event loop is not blocked.
+        """
         try:
             output_path = self._validate_path(output_path)
+            result = await asyncio.to_thread(self._write_backup, output_path, password)
+            logger.info(
+                "Backup exported",
+                path=output_path,
+                checksum=result["checksum"],
+                size=result["size"],
+                database_size=result["database_size"],
+            )
+            return {"success": True, **result}
 
-            # Collect data
-            data = await self._collect_backup_data()
-
-            # Encrypt
-            encrypted = self._encrypt_data(data, password)
-
-            # Write to file
-            async with aiofiles.open(output_path, "wb") as f:
-                await f.write(encrypted)
-
-            # Calculate checksum
-            checksum = hashlib.sha256(encrypted).hexdigest()[:16]
+        except Exception as e:
+            logger.error("Export failed", error=str(e))
+            return {"success": False, "error": str(e)}
 
-            logger.info("Backup exported", path=output_path, checksum=checksum)
+    async def verify_backup(self, input_path: str, password: str) -> dict[str, Any]:
+        """Check that a backup decrypts completely into an intact database."""
+        try:
+            input_path = self._validate_path(input_path)
+            info, contents = await asyncio.to_thread(
+                self._unpack_backup, input_path, password
+            )
             return {
                 "success": True,
-                "path": output_path,
-                "size": len(encrypted),
-                "checksum": checksum,
-                "timestamp": data["timestamp"],
+                "version": info.version,
+                "timestamp": info.created_at,
+                "schema_version": contents["schema_version"],
+                "database_size": info.database_size,
+                "tables": contents["tables"],
             }
 
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
-            logger.error("Export failed", error=str(e))
+            logger.error("Verify failed", error=str(e))
             return {"success": False, "error": str(e)}
 
     async def import_backup(
         self, input_path: str, password: str, overwrite: bool = False
     ) -> dict[str, Any]:
-        """Import backup from encrypted file."""
+        """Import backup from encrypted file.
+
+        Database snapshots replace all current data, so they are only
+        restored when overwrite is set. Legacy JSON backups are merged
+        into the current data as before.
+        """
         try:
             input_path = self._validate_path(input_path)
 
-            # Read file
-            async with aiofiles.open(input_path, "rb") as f:
-                encrypted = await f.read()
-
-            # Decrypt
-            data = self._decrypt_data(encrypted, password)
-
-            # Validate
-            validation = self._validate_backup(data)
-            if not validation["valid"]:
-                return {"success": False, "error": validation["error"]}
-
-            # Import data
-            await self.db_service.import_users(data["users"], overwrite=overwrite)
-            await self.db_service.import_servers(data["servers"], overwrite=overwrite)
-            await self.db_service.import_settings(data["settings"], overwrite=overwrite)
-
-            logger.info("Backup imported", path=input_path, timestamp=data["timestamp"])
-            return {
-                "success": True,
-                "version": data["version"],
-                "timestamp": data["timestamp"],
-                "users_imported": len(data["users"]),
-                "servers_imported": len(data["servers"]),
-            }
+            if await asyncio.to_thread(is_archive, input_path):
+                return await self._restore_backup(input_path, password, overwrite)
+            return await self._import_legacy_backup(input_path, password, overwrite)
 
         except ValueError as e:
             return {"success": False, "error": str(e)}
         except Exception as e:
             logger.error("Import failed", error=str(e))
             return {"success": False, "error": str(e)}
+
+    async def _restore_backup(
+        self, input_path: str, password: str, overwrite: bool
+    ) -> dict[str, Any]:
+        if not overwrite:
+            return {
+                "success": False,
+                "error": "Restoring a database backup replaces all current data;"
+                " set overwrite to confirm",
+            }
+
+        info, contents = await asyncio.to_thread(
+            self._unpack_backup, input_path, password, restore=True
+        )
+        # Snapshots from older releases are brought up to the current schema
+        await self.db_service.run_migrations()
+
+        tables = contents["tables"]
+        logger.info(
+            "Backup restored",
+            path=input_path,
+            timestamp=info.created_at,
+            schema_version=contents["schema_version"],
+        )
+        return {
+            "success": True,
+            "version": info.version,
+            "timestamp": info.created_at,
+            "users_imported": tables.get("users", 0),
+            "servers_imported": tables.get("servers", 0),
+            "tables_restored": len(tables),
+        }
+
+    async def _import_legacy_backup(
+        self, input_path: str, password: str, overwrite: bool
+    ) -> dict[str, Any]:
+        async with aiofiles.open(input_path, "rb") as f:
+            encrypted = await f.read()
+
+        # Key derivation is deliberately slow; keep it off the event loop
+        data = await asyncio.to_thread(self._decrypt_data, encrypted, password)
+
+        validation = self._validate_backup(data)
+        if not validation["valid"]:
+            return {"success": False, "error": validation["error"]}
+
+        await self.db_service.import_users(data["users"], overwrite=overwrite)
+        await self.db_service.import_servers(data["servers"], overwrite=overwrite)
+        await self.db_service.import_settings(data["settings"], overwrite=overwrite)
+
+        logger.info("Backup imported", path=input_path, timestamp=data["timestamp"])
+        return {
+            "success": True,
+            "version": data["version"],
+            "timestamp": data["timestamp"],
+            "users_imported": len(data["users"]),
+            "servers_imported": len(data["servers"]),
+        }
+
+    def _write_backup(self, output_path: str, password: str) -> dict[str, Any]:
+        """Snapshot the database and stream it into an archive (blocking)."""
+        db_path = self.db_service.db_path
+        partial_path = output_path + ".partial"
+        with _temporary_path(os.path.dirname(db_path), ".snapshot") as snapshot:
+            database_size = snapshot_database(db_path, snapshot)
+            schema_version = inspect_snapshot(snapshot)["schema_version"]
+            try:
+                with open(snapshot, "rb") as source, open(partial_path, "wb") as out:
+                    output = _HashingWriter(out)
+                    info = write_archive(
+                        source,
+                        output,
+                        password,
+                        {
+                            "schema_version": schema_version,
+                            "database_size": database_size,
+                        },
+                    )
+                os.replace(partial_path, output_path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(partial_path)
+                raise
+
+        return {
+            "path": output_path,
+            "size": output.size,
+            "checksum": output.hexdigest()[:16],
+            "timestamp": info.created_at,
+            "database_size": database_size,
+        }
+
+    def _unpack_backup(
+        self, input_path: str, password: str, restore: bool = False
+    ) -> tuple[ArchiveInfo, dict[str, Any]]:
+        """Decrypt an archive to a scratch file, check it and maybe restore it.
+
+        Raises:
+            ValueError: If the archive is unreadable, damaged, or from a
+                newer schema than this release understands.
+        """
+        db_path = self.db_service.db_path
+        with _temporary_path(os.path.dirname(db_path), ".restore") as scratch:
+            with open(input_path, "rb") as source, open(scratch, "wb") as out:
+                info = read_archive(source, password, out)
+            contents = inspect_snapshot(scratch)
+            if contents["schema_version"] > MIGRATIONS[-1].version:
+                raise ValueError(
+                    f"Backup schema version {contents['schema_version']} is newer"
+                    f" than supported {MIGRATIONS[-1].version}"
+                )
+            if restore:
+                restore_database(scratch, db_path)
+        return info, contents
+
+
+class _HashingWriter:
+    """Write-through file wrapper that tracks size and SHA-256."""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+@contextlib.contextmanager
+def _temporary_path(directory: str, suffix: str) -> Iterator[str]:
+    """Reserve a private scratch file next to the database."""
+    fd, path = tempfile.mkstemp(dir=directory, prefix=".tomo-", suffix=suffix)
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
@@ -5,10 +5,13 @@ when the agent is unavailable. Provides a unified interface for command
 execution regardless of transport mechanism.
 """
 
+import asyncio
+import uuid
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from enum import Enum
+from typing import Any
 
 import structlog
 
@@ -19,6 +22,17 @@ from services.ssh_service import SSHService
 
 logger = structlog.get_logger("command_router")
 
+# Seconds the agent has to accept a streaming command
+EXEC_STREAM_START_TIMEOUT = 30.0
+# Extra time after the command timeout for the agent's final frame
+EXEC_STREAM_GRACE_SECONDS = 15.0
+# How often a quiet stream checks that its agent is still connected
+EXEC_STREAM_CHECK_INTERVAL = 5.0
+# Frames buffered per command; when full the agent's connection waits for
+# the consumer, which in turn stalls the command on the agent
+MAX_QUEUED_FRAMES = 256
+METHOD_NOT_FOUND = "Agent error -32601"
+
 
 class ExecutionMethod(str, Enum):
     """Command execution method used."""
@@ -70,6 +84,7 @@ class CommandRouter:
         self._server_service = server_service
         self._ssh_service = ssh_service
         self._prefer_agent = prefer_agent
+        self._exec_streams: dict[tuple[str, str], asyncio.Queue] = {}
 
     async def execute(
         self,
@@ -136,11 +151,13 @@ class CommandRouter:
         progress_callback: Callable[[str], None],
         timeout: float = 600.0,
         force_ssh: bool = False,
+        force_agent: bool = False,
     ) -> CommandResult:
         """Execute a command with streaming progress output.
 
         For long-running commands, streams output as it becomes available.
-        Currently only supported via SSH (agent streaming not implemented).
+        Agents stream through system.exec_stream; agents too old to support
+        it fall back to SSH, or to a buffered system.exec when forced.
 
         Args:
             server_id: Target server identifier.
@@ -148,22 +165,55 @@ class CommandRouter:
             progress_callback: Async callback for each output line.
             timeout: Execution timeout in seconds.
             force_ssh: Force SSH execution.
+            force_agent: Force agent execution, fail if not connected.
 
         Returns:
             CommandResult with execution details.
         """
         start_time = datetime.now(UTC)
 
-        # Progress streaming requires SSH (agent streaming not yet implemented)
-        result = await self._execute_via_ssh_with_progress(
-            server_id, command, progress_callback, timeout
-        )
+        method = await self._determine_method(server_id, force_ssh, force_agent)
+
+        if method == ExecutionMethod.NONE:
+            error_msg = await self._get_agent_unavailable_reason(server_id)
+            return CommandResult(
+                success=False,
+                output="",
+                method=ExecutionMethod.NONE,
+                error=error_msg,
+            )
+
+        if method == ExecutionMethod.AGENT:
+            result = await self._execute_via_agent_with_progress(
+                server_id, command, progress_callback, timeout, force_agent
+            )
+        else:
+            result = await self._execute_via_ssh_with_progress(
+                server_id, command, progress_callback, timeout
+            )
 
         elapsed = (datetime.now(UTC) - start_time).total_seconds() * 1000
         result.execution_time_ms = round(elapsed, 2)
 
         return result
 
+    async def handle_exec_output(self, agent_id: str, params: dict[str, Any]) -> None:
+        """Handle a system.exec.output notification from an agent.
+
+        Args:
+            agent_id: Agent that sent the frame.
+            params: Frame with stream_id, seq, stdout, stderr and done.
+        """
+        queue = self._exec_streams.get((agent_id, params.get("stream_id", "")))
+        if queue is None:
+            logger.debug(
+                "Dropping output for unknown exec stream",
+                agent_id=agent_id,
+                stream_id=params.get("stream_id"),
+            )
+            return
+        await queue.put(params)
+
     async def is_agent_available(self, server_id: str) -> bool:
         """Check if agent is available for a server.
 
@@ -340,6 +390,199 @@ class CommandRouter:
                 error=str(e),
             )
 
+    async def _execute_via_agent_with_progress(
+        self,
+        server_id: str,
+        command: str,
+        progress_callback: Callable[[str], None],
+        timeout: float,
+        force_agent: bool,
+    ) -> CommandResult:
+        """Execute command via agent, streaming output from system.exec_stream.
+
+        Args:
+            server_id: Target server identifier.
+            command: Shell command to execute.
+            progress_callback: Callback for each stdout line.
+            timeout: Execution timeout in seconds.
+            force_agent: Whether SSH fallback is ruled out.
+
+        Returns:
+            CommandResult from agent execution.
+        """
+        agent = await self._agent_service.get_agent_by_server(server_id)
+        if not agent or not self._agent_manager.is_connected(agent.id):
+            return CommandResult(
+                success=False,
+                output="",
+                method=ExecutionMethod.AGENT,
+                error="Agent not connected",
+            )
+
+        stream_id = uuid.uuid4().hex
+        key = (agent.id, stream_id)
+        # Registered before the request so no frame can arrive unclaimed
+        queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_FRAMES)
+        self._exec_streams[key] = queue
+        running = False
+        try:
+            response = await self._agent_manager.send_command(
+                agent_id=agent.id,
+                method="system.exec_stream",
+                params={
+                    "command": command,
+                    "stream_id": stream_id,
+                    "timeout": int(timeout),
+                },
+                timeout=EXEC_STREAM_START_TIMEOUT,
+            )
+            if not response.get("started"):
+                return CommandResult(
+                    success=False,
+                    output="",
+                    method=ExecutionMethod.AGENT,
+                    exit_code=response.get("exit_code", -1),
+                    error=response.get("stderr") or "Command was not started",
+                )
+            running = True
+
+            stdout, stderr, final = await self._consume_exec_stream(
+                agent.id, queue, progress_callback, timeout
+            )
+            running = False
+            exit_code = final.get("exit_code", -1)
+            stderr_text = "\n".join(stderr)
+            if final.get("error"):
+                stderr_text = "\n".join(filter(None, [stderr_text, final["error"]]))
+            return CommandResult(
+                success=exit_code == 0,
+                output="\n".join(stdout) or stderr_text,
+                method=ExecutionMethod.AGENT,
+                exit_code=exit_code,
+                error=stderr_text if exit_code != 0 else None,
+            )
+
+        except RuntimeError as e:
+            if not str(e).startswith(METHOD_NOT_FOUND):
+                logger.error("Agent streaming error", server_id=server_id, error=str(e))
+                return CommandResult(
+                    success=False,
+                    output="",
+                    method=ExecutionMethod.AGENT,
+                    error=str(e),
+                )
+            logger.info(
+                "Agent does not support exec streaming",
+                server_id=server_id,
+                agent_id=agent.id,
+            )
+        except (TimeoutError, ConnectionError) as e:
+            logger.error(
+                "Agent streaming command failed", server_id=server_id, error=str(e)
+            )
+            return CommandResult(
+                success=False,
+                output="",
+                method=ExecutionMethod.AGENT,
+                error=str(e) or "Command timed out",
+            )
+        except Exception as e:
+            logger.error("Agent streaming error", server_id=server_id, error=str(e))
+            return CommandResult(
+                success=False,
+                output="",
+                method=ExecutionMethod.AGENT,
+                error=str(e),
+            )
+        finally:
+            await self._close_exec_stream(key, cancel=running)
+
+        # Older agent without system.exec_stream
+        if not force_agent:
+            return await self._execute_via_ssh_with_progress(
+                server_id, command, progress_callback, timeout
+            )
+        result = await self._execute_via_agent(server_id, command, timeout)
+        for line in result.output.splitlines():
+            if line.strip():
+                await self._report_progress(progress_callback, line)
+        return result
+
+    async def _consume_exec_stream(
+        self,
+        agent_id: str,
+        queue: asyncio.Queue,
+        progress_callback: Callable[[str], None],
+        timeout: float,
+    ) -> tuple[list[str], list[str], dict[str, Any]]:
+        """Read output frames until the final one.
+
+        Returns:
+            Tuple of (stdout lines, stderr lines, final frame).
+
+        Raises:
+            TimeoutError: If no final frame arrives in time.
+            ConnectionError: If the agent disconnects.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout + EXEC_STREAM_GRACE_SECONDS
+        stdout: list[str] = []
+        stderr: list[str] = []
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Command timed out after {timeout:.0f}s")
+            try:
+                frame = await asyncio.wait_for(
+                    queue.get(), min(remaining, EXEC_STREAM_CHECK_INTERVAL)
+                )
+            except TimeoutError:
+                if not self._agent_manager.is_connected(agent_id):
+                    raise ConnectionError("Agent disconnected") from None
+                continue
+
+            for line in frame.get("stdout", []):
+                stdout.append(line)
+                await self._report_progress(progress_callback, line)
+            stderr.extend(frame.get("stderr", []))
+            if frame.get("done"):
+                return stdout, stderr, frame
+
+    async def _close_exec_stream(self, key: tuple[str, str], cancel: bool) -> None:
+        """Unregister a stream, cancelling the command if it may still run."""
+        queue = self._exec_streams.pop(key, None)
+        if queue is None:
+            return
+        finished = False
+        # Free a notification handler waiting on a full queue
+        while not queue.empty():
+            finished = finished or bool(queue.get_nowait().get("done"))
+        if not cancel or finished:
+            return
+        agent_id, stream_id = key
+        if not self._agent_manager.is_connected(agent_id):
+            return
+        try:
+            await self._agent_manager.send_command(
+                agent_id=agent_id,
+                method="system.exec_cancel",
+                params={"stream_id": stream_id},
+                timeout=EXEC_STREAM_START_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to cancel agent command", stream_id=stream_id, error=str(e)
+            )
+
+    async def _report_progress(
+        self, progress_callback: Callable[[str], None], line: str
+    ) -> None:
+        """Pass an output line to the progress callback."""
+        try:
+            await progress_callback(line)
+        except Exception as e:
+            logger.warning("Progress callback failed", error=str(e))
+
     async def _execute_via_ssh(
         self,
         server_id: str,
@@ -13,11 +13,13 @@ from .base import (
     DatabaseConnection,
 )
 from .export_service import ExportDatabaseService
-from .metrics_service import MetricsDatabaseService
+from .metrics_service import MetricsDatabaseService, MetricSeries
+from .migrations import MIGRATIONS, MigrationRunner
 from .registration_code_service import RegistrationCodeDatabaseService
 from .schema_init import SchemaInitializer
 from .server_service import ServerDatabaseService
 from .session_service import SessionDatabaseService
+from .slow_query import SlowQueryLog, slow_query_log_from_env
 from .system_service import SystemDatabaseService
 from .user_service import UserDatabaseService
 
@@ -35,6 +37,14 @@ __all__ = [
     "AgentDatabaseService",
     "RegistrationCodeDatabaseService",
     "SchemaInitializer",
+    # Results
+    "MetricSeries",
+    # Migrations
+    "MigrationRunner",
+    "MIGRATIONS",
+    # Profiling
+    "SlowQueryLog",
+    "slow_query_log_from_env",
     # Column whitelists
     "ALLOWED_SERVER_COLUMNS",
     "ALLOWED_INSTALLATION_COLUMNS",
@@ -4,6 +4,7 @@ Database operations for app installations.
 """
 
 import json
+from typing import Any
 
 import structlog
 
@@ -16,6 +17,65 @@ from .base import (
 
 logger = structlog.get_logger("database.app")
 
+# Installations joined with the few server and marketplace fields the
+# applications list shows. Filters are appended to the WHERE clause.
+INSTALLATION_DETAILS_QUERY = """
+    SELECT
+        i.id, i.app_id, i.server_id, i.container_id, i.container_name,
+        i.status, i.config, i.installed_at, i.started_at, i.error_message,
+        i.networks, i.named_volumes, i.bind_mounts,
+        a.name AS app_name, a.icon AS app_icon, a.version AS app_version,
+        a.description AS app_description, a.category AS app_category,
+        r.name AS repo_name,
+        s.name AS server_name, s.host AS server_host
+    FROM installed_apps i
+    LEFT JOIN servers s ON s.id = i.server_id
+    LEFT JOIN marketplace_apps a ON a.id = i.app_id
+    LEFT JOIN marketplace_repos r ON r.id = a.repo_id
+"""
+
+INSTALLATION_COUNT_QUERY = """
+    SELECT COUNT(*)
+    FROM installed_apps i
+    LEFT JOIN servers s ON s.id = i.server_id
+    LEFT JOIN marketplace_apps a ON a.id = i.app_id
+"""
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _installation_filters(
+    server_id: str | None, status: str | None, search: str | None
+) -> tuple[str, list[Any]]:
+    """Build the WHERE clause shared by the installation details queries."""
+    conditions = []
+    params: list[Any] = []
+    if server_id:
+        conditions.append("i.server_id = ?")
+        params.append(server_id)
+    if status:
+        conditions.append("i.status = ?")
+        params.append(status)
+    if search:
+        pattern = f"%{_escape_like(search)}%"
+        conditions.append(
+            "(COALESCE(a.name, i.app_id) LIKE ? ESCAPE '\\'"
+            " OR s.name LIKE ? ESCAPE '\\'"
+            " OR i.container_name LIKE ? ESCAPE '\\')"
+        )
+        params.extend([pattern] * 3)
+    if not conditions:
+        return "", params
+    return " WHERE " + " AND ".join(conditions), params
+
+
+def _json_list(value: str | None) -> list:
+    """Decode a JSON list column, treating NULL as empty."""
+    return json.loads(value) if value else []
+
 
 class AppDatabaseService:
     """Database operations for app installation management."""
@@ -39,6 +99,7 @@ class AppDatabaseService:
         status: str,
         config: dict,
         installed_at: str,
+        owner: str | None = None,
     ) -> InstalledApp | None:
         """Create a new installation record."""
         try:
@@ -46,8 +107,9 @@ class AppDatabaseService:
             async with self._conn.get_connection() as conn:
                 await conn.execute(
                     """INSERT INTO installed_apps
-                       (id, server_id, app_id, container_name, status, config, installed_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                       (id, server_id, app_id, container_name, status, config,
+                        installed_at, owner)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
                     (
                         id,
                         server_id,
@@ -56,6 +118,7 @@ class AppDatabaseService:
                         status,
                         config_json,
                         installed_at,
+                        owner,
                     ),
                 )
                 await conn.commit()
@@ -68,6 +131,7 @@ class AppDatabaseService:
                 status=InstallationStatus(status),
                 config=config,
                 installed_at=installed_at,
+                owner=owner,
             )
         except Exception as e:
             logger.error("Failed to create installation", error=str(e))
@@ -266,6 +330,7 @@ class AppDatabaseService:
                         step_started_at=row["step_started_at"]
                         if "step_started_at" in row_keys
                         else None,
+                        owner=row["owner"] if "owner" in row_keys else None,
                         networks=networks,
                         named_volumes=named_volumes,
                         bind_mounts=bind_mounts,
@@ -276,6 +341,97 @@ class AppDatabaseService:
             logger.error("Failed to get all installations", error=str(e))
             return []
 
+    async def get_installation_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Get installations with server and app details in one query.
+
+        Args:
+            server_id: Only installations on this server.
+            status: Only installations with this status.
+            search: Case-insensitive match on app, server or container name.
+            limit: Maximum rows to return (all when None).
+            offset: Rows to skip, for pagination.
+
+        Returns:
+            Newest installations first, as plain dicts.
+        """
+        where, params = _installation_filters(server_id, status, search)
+        query = INSTALLATION_DETAILS_QUERY + where
+        query += " ORDER BY i.installed_at DESC, i.id LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        try:
+            async with self._conn.get_connection() as conn:
+                cursor = await conn.execute(query, params)
+                rows = await cursor.fetchall()
+
+            return [self._installation_details_from_row(row) for row in rows]
+        except Exception as e:
+            logger.error("Failed to get installation details", error=str(e))
+            return []
+
+    async def count_installation_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+    ) -> int:
+        """Count the installations get_installation_details would match.
+
+        Args:
+            server_id: Only installations on this server.
+            status: Only installations with this status.
+            search: Case-insensitive match on app, server or container name.
+
+        Returns:
+            Number of matching installations, 0 on error.
+        """
+        where, params = _installation_filters(server_id, status, search)
+        try:
+            async with self._conn.get_connection() as conn:
+                cursor = await conn.execute(INSTALLATION_COUNT_QUERY + where, params)
+                row = await cursor.fetchone()
+            return row[0]
+        except Exception as e:
+            logger.error("Failed to count installation details", error=str(e))
+            return 0
+
+    @staticmethod
+    def _installation_details_from_row(row) -> dict[str, Any]:
+        """Convert a joined installation row to the applications list shape."""
+        config = json.loads(row["config"]) if row["config"] else {}
+        return {
+            "id": row["id"],
+            "app_id": row["app_id"],
+            "app_name": row["app_name"] or row["app_id"],
+            "app_icon": row["app_icon"],
+            "app_version": row["app_version"] or "Unknown",
+            "app_description": row["app_description"] or "",
+            "app_category": row["app_category"] or "Unknown",
+            "app_source": row["repo_name"] or "Unknown",
+            "server_id": row["server_id"],
+            "server_name": row["server_name"] or "Unknown",
+            "server_host": row["server_host"] or "",
+            "container_id": row["container_id"],
+            "container_name": row["container_name"],
+            "status": row["status"],
+            "ports": config.get("ports", {}),
+            "env": config.get("env", {}),
+            "volumes": config.get("volumes", {}),
+            "networks": _json_list(row["networks"]),
+            "named_volumes": _json_list(row["named_volumes"]),
+            "bind_mounts": _json_list(row["bind_mounts"]),
+            "installed_at": row["installed_at"],
+            "started_at": row["started_at"],
+            "error_message": row["error_message"],
+        }
+
     async def delete_installation(self, server_id: str, app_id: str) -> bool:
         """Delete installation record."""
         try:
@@ -5,6 +5,9 @@ for SQL injection prevention.
 """
 
 import os
+import sqlite3
+import sys
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -12,8 +15,32 @@ from pathlib import Path
 import aiosqlite
 import structlog
 
+from lib.telemetry import REGISTRY
+
+from .slow_query import SlowQueryLog, slow_query_log_from_env
+
 logger = structlog.get_logger("database")
 
+# Modules skipped when attributing a connection to the code that opened it
+_CALLER_SKIP_MODULES = frozenset({"contextlib", __name__})
+
+DB_QUERIES = REGISTRY.counter(
+    "tomo_db_queries_total",
+    "SQL statements executed, by the function that opened the connection",
+    ("caller",),
+)
+DB_CONNECTION_DURATION = REGISTRY.histogram(
+    "tomo_db_connection_seconds",
+    "Time a database connection was held, by the function that opened it",
+    ("caller",),
+)
+DB_BUSY_ERRORS = REGISTRY.counter(
+    "tomo_db_busy_errors_total",
+    "Statements that gave up waiting for a database lock, by the function"
+    " that opened the connection",
+    ("caller",),
+)
+
 # Whitelisted columns for dynamic updates (SQL injection prevention)
 ALLOWED_SERVER_COLUMNS = frozenset(
     {
@@ -79,12 +106,15 @@ class DatabaseConnection:
         self,
         db_path: str | Path | None = None,
         data_directory: str | Path | None = None,
+        slow_query_log: SlowQueryLog | None = None,
     ):
         """Initialize database connection with path to tomo.db.
 
         Args:
             db_path: Direct path to database file.
             data_directory: Directory containing tomo.db.
+            slow_query_log: Log for slow statements. Defaults to the shared
+                log enabled by DB_SLOW_QUERY_MS, if any.
 
         Raises:
             ValueError: If both db_path and data_directory are provided.
@@ -109,6 +139,7 @@ class DatabaseConnection:
             resolved_path = directory / "tomo.db"
 
         self.db_path = str(resolved_path)
+        self.slow_query_log = slow_query_log or slow_query_log_from_env()
         logger.info("Database connection initialized", db_path=self.db_path)
 
     @property
@@ -120,16 +151,60 @@ class DatabaseConnection:
     async def get_connection(self) -> AsyncIterator[aiosqlite.Connection]:
         """Get async database connection with automatic cleanup.
 
+        Statements and the time the connection is held are recorded against
+        the function that opened it. With a slow query log, statements over
+        its threshold are recorded before the connection closes.
+
         Yields:
             aiosqlite connection with row factory enabled.
 
         Raises:
             Exception: Re-raises any exception after rolling back.
         """
-        async with aiosqlite.connect(self.db_path) as connection:
-            connection.row_factory = aiosqlite.Row
-            try:
-                yield connection
-            except Exception:
-                await connection.rollback()
-                raise
+        caller = _caller_name()
+        statements = [0]
+
+        def count_statement(_sql: str) -> None:
+            statements[0] += 1
+
+        started = time.perf_counter()
+        try:
+            async with aiosqlite.connect(self.db_path) as connection:
+                connection.row_factory = aiosqlite.Row
+                await connection.set_trace_callback(count_statement)
+                tracker = (
+                    self.slow_query_log.track(connection, caller)
+                    if self.slow_query_log is not None
+                    else None
+                )
+                try:
+                    yield connection
+                except Exception as e:
+                    if _is_busy(e):
+                        DB_BUSY_ERRORS.inc(caller)
+                    await connection.rollback()
+                    raise
+                finally:
+                    if tracker is not None:
+                        await tracker.flush()
+        finally:
+            DB_CONNECTION_DURATION.observe(time.perf_counter() - started, caller)
+            DB_QUERIES.inc(caller, amount=statements[0])
+
+
+def _is_busy(error: Exception) -> bool:
+    """Whether an error means the busy timeout ran out waiting for a lock."""
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in str(error) or "busy" in str(error)
+    )
+
+
+def _caller_name() -> str:
+    """Name the function that entered get_connection, as module.qualname."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in _CALLER_SKIP_MODULES:
+            return f"{module}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return "unknown"
@@ -1,9 +1,21 @@
 """Metrics Database Service.
 
 Database operations for server metrics, container metrics, and activity logs.
+
+Metric samples live in WITHOUT ROWID tables clustered by series and time,
+with integer epoch-millisecond timestamps and server and container ids
+interned into small lookup tables, so a range query for one server reads
+contiguous pages of a single b-tree.
+
+Series queries return a chart-ready struct of arrays built straight from
+the cursor: one timestamp array plus one array per requested field,
+optionally averaged into time buckets and delta encoded.
 """
 
 import json
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
 from typing import Any
 
 import structlog
@@ -14,6 +26,167 @@ from .base import DatabaseConnection
 
 logger = structlog.get_logger("database.metrics")
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Resolves a server id to its series key inside a statement
+_SERVER_KEY = "(SELECT id FROM metric_servers WHERE server_id = ?)"
+
+_SERVER_METRIC_COLUMNS = (
+    "cpu_percent",
+    "memory_percent",
+    "memory_used_mb",
+    "memory_total_mb",
+    "disk_percent",
+    "disk_used_gb",
+    "disk_total_gb",
+    "network_rx_bytes",
+    "network_tx_bytes",
+    "load_average_1m",
+    "load_average_5m",
+    "load_average_15m",
+    "uptime_seconds",
+)
+_CONTAINER_METRIC_COLUMNS = (
+    "cpu_percent",
+    "memory_usage_mb",
+    "memory_limit_mb",
+    "network_rx_bytes",
+    "network_tx_bytes",
+    "status",
+)
+# Integer columns; with the timestamps, the only arrays that are delta encoded
+_INTEGER_METRIC_COLUMNS = frozenset(
+    {
+        "memory_used_mb",
+        "memory_total_mb",
+        "disk_used_gb",
+        "disk_total_gb",
+        "network_rx_bytes",
+        "network_tx_bytes",
+        "uptime_seconds",
+        "memory_usage_mb",
+        "memory_limit_mb",
+    }
+)
+
+
+def to_epoch_ms(timestamp: str) -> int:
+    """Convert an ISO-8601 timestamp to Unix epoch milliseconds.
+
+    Timestamps without an offset are taken as UTC, as SQLite does.
+    """
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return (parsed - _EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_ms(ts: int) -> str:
+    """Convert Unix epoch milliseconds to an ISO-8601 UTC timestamp."""
+    return (_EPOCH + timedelta(milliseconds=ts)).isoformat()
+
+
+@dataclass(frozen=True)
+class MetricSeries:
+    """Metric samples as parallel arrays, oldest first.
+
+    Attributes:
+        timestamps: Sample times in Unix epoch milliseconds. For bucketed
+            series, the time of the last sample in each bucket.
+        fields: One array per requested field, aligned with timestamps.
+        bucket_ms: Bucket width when samples were averaged, else None.
+        delta: Arrays stored as the first value followed by the difference
+            to the previous value ("timestamps" and integer fields).
+    """
+
+    timestamps: list[int]
+    fields: dict[str, list[Any]]
+    bucket_ms: int | None = None
+    delta: tuple[str, ...] = field(default=())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "timestamps": self.timestamps,
+            "fields": self.fields,
+            "count": len(self.timestamps),
+            "bucket_ms": self.bucket_ms,
+            "delta": list(self.delta),
+        }
+
+
+def delta_encode(values: list[int]) -> list[int]:
+    """Keep the first value and replace the rest by their differences."""
+    return values[:1] + [b - a for a, b in pairwise(values)]
+
+
+def delta_decode(values: list[int]) -> list[int]:
+    """Invert delta_encode."""
+    decoded = []
+    total = 0
+    for value in values:
+        total += value
+        decoded.append(total)
+    return decoded
+
+
+def _series_columns(fields: list[str] | None, available: tuple[str, ...]) -> list[str]:
+    """Validate requested fields, defaulting to every column."""
+    if not fields:
+        return list(available)
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown metric fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def _series_select(columns: list[str], bucketed: bool) -> str:
+    """Select list for a series query, averaging numbers per bucket.
+
+    In a bucketed query the bare status column takes its value from the
+    row holding MAX(ts), so it reports the latest status in each bucket.
+    """
+    if not bucketed:
+        return ", ".join(["ts", *columns])
+    selected = ["MAX(ts) AS ts"]
+    for name in columns:
+        if name == "status":
+            selected.append(name)
+        elif name in _INTEGER_METRIC_COLUMNS:
+            selected.append(f"CAST(ROUND(AVG({name})) AS INTEGER) AS {name}")
+        else:
+            selected.append(f"AVG({name}) AS {name}")
+    return ", ".join(selected)
+
+
+def _bucket_width(since_ms: int, until_ms: int, max_points: int | None) -> int | None:
+    """Bucket width that keeps a range within max_points, or None."""
+    if max_points is None:
+        return None
+    if max_points < 1:
+        raise ValueError("max_points must be at least 1")
+    return max(1, -(-(until_ms - since_ms) // max_points))
+
+
+def _build_series(
+    rows: list[Any], columns: list[str], bucket_ms: int | None, delta: bool
+) -> MetricSeries:
+    """Transpose cursor rows into arrays and delta encode integer arrays."""
+    arrays = [list(values) for values in zip(*rows, strict=True)] or [
+        [] for _ in range(len(columns) + 1)
+    ]
+    timestamps, values = arrays[0], dict(zip(columns, arrays[1:], strict=True))
+    encoded: list[str] = []
+    if delta:
+        timestamps = delta_encode(timestamps)
+        encoded.append("timestamps")
+        for name in columns:
+            # Nullable columns stay plain; a gap cannot be differenced
+            if name in _INTEGER_METRIC_COLUMNS and None not in values[name]:
+                values[name] = delta_encode(values[name])
+                encoded.append(name)
+    return MetricSeries(timestamps, values, bucket_ms, tuple(encoded))
+
 
 class MetricsDatabaseService:
     """Database operations for metrics and activity log management."""
@@ -29,33 +202,26 @@ class MetricsDatabaseService:
     # ========== Server Metrics ==========
 
     async def save_server_metrics(self, metrics: ServerMetrics) -> bool:
-        """Save server metrics to database."""
+        """Save server metrics to database.
+
+        A sample for the same server and millisecond replaces the earlier one.
+        """
         try:
+            columns = ", ".join(_SERVER_METRIC_COLUMNS)
+            placeholders = ", ".join("?" * len(_SERVER_METRIC_COLUMNS))
             async with self._conn.get_connection() as conn:
                 await conn.execute(
-                    """INSERT INTO server_metrics
-                       (id, server_id, cpu_percent, memory_percent, memory_used_mb,
-                        memory_total_mb, disk_percent, disk_used_gb, disk_total_gb,
-                        network_rx_bytes, network_tx_bytes, load_average_1m,
-                        load_average_5m, load_average_15m, uptime_seconds, timestamp)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    "INSERT OR IGNORE INTO metric_servers (server_id) VALUES (?)",
+                    (metrics.server_id,),
+                )
+                await conn.execute(
+                    f"""INSERT OR REPLACE INTO server_metric_samples
+                        (server_key, ts, {columns})
+                        VALUES ({_SERVER_KEY}, ?, {placeholders})""",
                     (
-                        metrics.id,
                         metrics.server_id,
-                        metrics.cpu_percent,
-                        metrics.memory_percent,
-                        metrics.memory_used_mb,
-                        metrics.memory_total_mb,
-                        metrics.disk_percent,
-                        metrics.disk_used_gb,
-                        metrics.disk_total_gb,
-                        metrics.network_rx_bytes,
-                        metrics.network_tx_bytes,
-                        metrics.load_average_1m,
-                        metrics.load_average_5m,
-                        metrics.load_average_15m,
-                        metrics.uptime_seconds,
-                        metrics.timestamp,
+                        to_epoch_ms(metrics.timestamp),
+                        *(getattr(metrics, name) for name in _SERVER_METRIC_COLUMNS),
                     ),
                 )
                 await conn.commit()
@@ -67,16 +233,19 @@ class MetricsDatabaseService:
     async def get_server_metrics(
         self, server_id: str, since: str | None = None, limit: int = 100
     ) -> list[ServerMetrics]:
-        """Get server metrics from database."""
+        """Get server metrics from database, newest first."""
         try:
-            query = "SELECT * FROM server_metrics WHERE server_id = ?"
+            query = (
+                f"SELECT ts, {', '.join(_SERVER_METRIC_COLUMNS)}"
+                f" FROM server_metric_samples WHERE server_key = {_SERVER_KEY}"
+            )
             params: list[Any] = [server_id]
 
             if since:
-                query += " AND timestamp >= ?"
-                params.append(since)
+                query += " AND ts >= ?"
+                params.append(to_epoch_ms(since))
 
-            query += " ORDER BY timestamp DESC LIMIT ?"
+            query += " ORDER BY ts DESC LIMIT ?"
             params.append(limit)
 
             async with self._conn.get_connection() as conn:
@@ -85,22 +254,10 @@ class MetricsDatabaseService:
 
             return [
                 ServerMetrics(
-                    id=row["id"],
-                    server_id=row["server_id"],
-                    cpu_percent=row["cpu_percent"],
-                    memory_percent=row["memory_percent"],
-                    memory_used_mb=row["memory_used_mb"],
-                    memory_total_mb=row["memory_total_mb"],
-                    disk_percent=row["disk_percent"],
-                    disk_used_gb=row["disk_used_gb"],
-                    disk_total_gb=row["disk_total_gb"],
-                    network_rx_bytes=row["network_rx_bytes"],
-                    network_tx_bytes=row["network_tx_bytes"],
-                    load_average_1m=row["load_average_1m"],
-                    load_average_5m=row["load_average_5m"],
-                    load_average_15m=row["load_average_15m"],
-                    uptime_seconds=row["uptime_seconds"],
-                    timestamp=row["timestamp"],
+                    id=f"sm-{row['ts']}",
+                    server_id=server_id,
+                    timestamp=from_epoch_ms(row["ts"]),
+                    **{name: row[name] for name in _SERVER_METRIC_COLUMNS},
                 )
                 for row in rows
             ]
@@ -108,31 +265,100 @@ class MetricsDatabaseService:
             logger.error("Failed to get server metrics", error=str(e))
             return []
 
+    async def get_server_metric_series(
+        self,
+        server_id: str,
+        since: str,
+        fields: list[str] | None = None,
+        max_points: int | None = None,
+        delta: bool = False,
+        until: str | None = None,
+    ) -> MetricSeries:
+        """Get server metrics as arrays, oldest first.
+
+        Args:
+            server_id: Server whose samples are read.
+            since: Start of the range (ISO-8601).
+            fields: Metric columns to return; all of them when omitted.
+            max_points: Average samples into at most this many time buckets.
+                Every sample is returned when omitted.
+            delta: Delta encode the timestamps and integer fields.
+            until: End of the range (ISO-8601); defaults to now.
+
+        Raises:
+            ValueError: If a field is unknown or max_points is below 1.
+        """
+        columns = _series_columns(fields, _SERVER_METRIC_COLUMNS)
+        since_ms = to_epoch_ms(since)
+        until_ms = to_epoch_ms(until or datetime.now(UTC).isoformat())
+        bucket_ms = _bucket_width(since_ms, until_ms, max_points)
+        query = (
+            f"SELECT {_series_select(columns, bucket_ms is not None)}"
+            f" FROM server_metric_samples WHERE server_key = {_SERVER_KEY}"
+            " AND ts >= ? AND ts <= ?"
+        )
+        params: list[Any] = [server_id, since_ms, until_ms]
+        if bucket_ms is not None:
+            query += " GROUP BY (ts - ?) / ?"
+            params += [since_ms, bucket_ms]
+        query += " ORDER BY ts"
+
+        try:
+            async with self._conn.get_connection() as conn:
+                cursor = await conn.execute(query, params)
+                rows = await cursor.fetchall()
+        except Exception as e:
+            logger.error("Failed to get server metric series", error=str(e))
+            rows = []
+        return _build_series(rows, columns, bucket_ms, delta)
+
     # ========== Container Metrics ==========
 
     async def save_container_metrics(self, metrics: ContainerMetrics) -> bool:
-        """Save container metrics to database."""
+        """Save container metrics to database.
+
+        A sample for the same container and millisecond replaces the earlier
+        one.
+        """
+        return await self.save_container_metrics_batch([metrics])
+
+    async def save_container_metrics_batch(
+        self, metrics: list[ContainerMetrics]
+    ) -> bool:
+        """Save samples of several containers in one transaction."""
+        if not metrics:
+            return True
         try:
+            columns = ", ".join(_CONTAINER_METRIC_COLUMNS)
+            placeholders = ", ".join("?" * len(_CONTAINER_METRIC_COLUMNS))
             async with self._conn.get_connection() as conn:
-                await conn.execute(
-                    """INSERT INTO container_metrics
-                       (id, server_id, container_id, container_name, cpu_percent,
-                        memory_usage_mb, memory_limit_mb, network_rx_bytes,
-                        network_tx_bytes, status, timestamp)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        metrics.id,
-                        metrics.server_id,
-                        metrics.container_id,
-                        metrics.container_name,
-                        metrics.cpu_percent,
-                        metrics.memory_usage_mb,
-                        metrics.memory_limit_mb,
-                        metrics.network_rx_bytes,
-                        metrics.network_tx_bytes,
-                        metrics.status,
-                        metrics.timestamp,
-                    ),
+                await conn.executemany(
+                    "INSERT OR IGNORE INTO metric_servers (server_id) VALUES (?)",
+                    {(m.server_id,) for m in metrics},
+                )
+                await conn.executemany(
+                    "INSERT OR IGNORE INTO metric_containers"
+                    " (container_name, container_id) VALUES (?, ?)",
+                    [(m.container_name, m.container_id) for m in metrics],
+                )
+                await conn.executemany(
+                    f"""INSERT OR REPLACE INTO container_metric_samples
+                        (server_key, ts, container_key, {columns})
+                        VALUES (
+                            {_SERVER_KEY}, ?,
+                            (SELECT id FROM metric_containers
+                             WHERE container_name = ? AND container_id = ?),
+                            {placeholders})""",
+                    [
+                        (
+                            m.server_id,
+                            to_epoch_ms(m.timestamp),
+                            m.container_name,
+                            m.container_id,
+                            *(getattr(m, name) for name in _CONTAINER_METRIC_COLUMNS),
+                        )
+                        for m in metrics
+                    ],
                 )
                 await conn.commit()
             return True
@@ -147,20 +373,30 @@ class MetricsDatabaseService:
         since: str | None = None,
         limit: int = 100,
     ) -> list[ContainerMetrics]:
-        """Get container metrics from database."""
+        """Get container metrics from database, newest first."""
         try:
-            query = "SELECT * FROM container_metrics WHERE server_id = ?"
+            columns = ", ".join(f"m.{name}" for name in _CONTAINER_METRIC_COLUMNS)
+            query = (
+                f"SELECT m.ts, m.container_key, c.container_id, c.container_name,"
+                f" {columns}"
+                " FROM container_metric_samples m"
+                " JOIN metric_containers c ON c.id = m.container_key"
+                f" WHERE m.server_key = {_SERVER_KEY}"
+            )
             params: list[Any] = [server_id]
 
             if container_name:
-                query += " AND container_name = ?"
+                query += (
+                    " AND m.container_key IN"
+                    " (SELECT id FROM metric_containers WHERE container_name = ?)"
+                )
                 params.append(container_name)
 
             if since:
-                query += " AND timestamp >= ?"
-                params.append(since)
+                query += " AND m.ts >= ?"
+                params.append(to_epoch_ms(since))
 
-            query += " ORDER BY timestamp DESC LIMIT ?"
+            query += " ORDER BY m.ts DESC LIMIT ?"
             params.append(limit)
 
             async with self._conn.get_connection() as conn:
@@ -169,17 +405,12 @@ class MetricsDatabaseService:
 
             return [
                 ContainerMetrics(
-                    id=row["id"],
-                    server_id=row["server_id"],
+                    id=f"cm-{row['container_key']}-{row['ts']}",
+                    server_id=server_id,
                     container_id=row["container_id"],
                     container_name=row["container_name"],
-                    cpu_percent=row["cpu_percent"],
-                    memory_usage_mb=row["memory_usage_mb"],
-                    memory_limit_mb=row["memory_limit_mb"],
-                    network_rx_bytes=row["network_rx_bytes"],
-                    network_tx_bytes=row["network_tx_bytes"],
-                    status=row["status"],
-                    timestamp=row["timestamp"],
+                    timestamp=from_epoch_ms(row["ts"]),
+                    **{name: row[name] for name in _CONTAINER_METRIC_COLUMNS},
                 )
                 for row in rows
             ]
@@ -187,6 +418,51 @@ class MetricsDatabaseService:
             logger.error("Failed to get container metrics", error=str(e))
             return []
 
+    async def get_container_metric_series(
+        self,
+        server_id: str,
+        container_name: str,
+        since: str,
+        fields: list[str] | None = None,
+        max_points: int | None = None,
+        delta: bool = False,
+        until: str | None = None,
+    ) -> MetricSeries:
+        """Get one container's metrics as arrays, oldest first.
+
+        Samples of every container that carried the name are one series,
+        so a recreated container continues its predecessor's chart.
+        Arguments are as for get_server_metric_series.
+
+        Raises:
+            ValueError: If a field is unknown or max_points is below 1.
+        """
+        columns = _series_columns(fields, _CONTAINER_METRIC_COLUMNS)
+        since_ms = to_epoch_ms(since)
+        until_ms = to_epoch_ms(until or datetime.now(UTC).isoformat())
+        bucket_ms = _bucket_width(since_ms, until_ms, max_points)
+        query = (
+            f"SELECT {_series_select(columns, bucket_ms is not None)}"
+            f" FROM container_metric_samples WHERE server_key = {_SERVER_KEY}"
+            " AND container_key IN"
+            " (SELECT id FROM metric_containers WHERE container_name = ?)"
+            " AND ts >= ? AND ts <= ?"
+        )
+        params: list[Any] = [server_id, container_name, since_ms, until_ms]
+        if bucket_ms is not None:
+            query += " GROUP BY (ts - ?) / ?"
+            params += [since_ms, bucket_ms]
+        query += " ORDER BY ts"
+
+        try:
+            async with self._conn.get_connection() as conn:
+                cursor = await conn.execute(query, params)
+                rows = await cursor.fetchall()
+        except Exception as e:
+            logger.error("Failed to get container metric series", error=str(e))
+            rows = []
+        return _build_series(rows, columns, bucket_ms, delta)
+
     # ========== Activity Logs ==========
 
     async def save_activity_log(self, log: ActivityLog) -> bool:
@@ -0,0 +1,500 @@
+"""Versioned Schema Migrations.
+
+Ordered, idempotent schema steps recorded in a schema_migrations table.
+Startup reads a single version number and skips everything when the
+database is current; pending steps are applied in one transaction.
+"""
+
+import re
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+import aiosqlite
+import structlog
+
+from .base import DatabaseConnection
+from .schema_sql import (
+    AGENT_ROUTES_SCHEMA,
+    DEPLOYMENT_JOBS_SCHEMA,
+    METRICS_SCHEMA,
+    SERVER_IMAGES_SCHEMA,
+    TABLE_SCHEMAS,
+)
+
+logger = structlog.get_logger("database.migrations")
+
+# Legacy rows copied per statement when converting metrics tables
+METRICS_CONVERSION_CHUNK_ROWS = 20_000
+
+# ISO-8601 TEXT timestamp to Unix epoch milliseconds, NULL when unparseable
+_EPOCH_MS_SQL = "CAST(ROUND((julianday({0}) - 2440587.5) * 86400000) AS INTEGER)"
+
+SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT (datetime('now')),
+    duration_ms REAL NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single schema step.
+
+    Steps must be idempotent so databases created before versioning,
+    which already have some of the changes, can be brought up to date.
+    """
+
+    version: int
+    name: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class AppliedMigration:
+    """Timing for a migration applied during startup."""
+
+    version: int
+    name: str
+    duration_ms: float
+
+
+def split_statements(script: str) -> list[str]:
+    """Split a SQL script into complete statements.
+
+    executescript() commits the open transaction, so scripts are run
+    statement by statement instead. Trigger bodies stay intact because a
+    statement only ends where SQLite considers it complete.
+    """
+    statements = []
+    pending = ""
+    for line in script.splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            statements.append(pending.strip())
+            pending = ""
+    if pending.strip() and not _is_comment_only(pending):
+        statements.append(pending.strip())
+    return statements
+
+
+def _is_comment_only(sql: str) -> bool:
+    """Check whether leftover SQL holds nothing but comments."""
+    return all(
+        not line.strip() or line.strip().startswith("--") for line in sql.splitlines()
+    )
+
+
+async def _add_missing_columns(
+    conn: aiosqlite.Connection, table: str, columns: Sequence[tuple[str, str]]
+) -> list[str]:
+    """Add the columns a table does not have yet.
+
+    Returns:
+        Names of the columns that were added.
+    """
+    cursor = await conn.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in await cursor.fetchall()}
+    added = []
+    for name, definition in columns:
+        if name not in existing:
+            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            added.append(name)
+    return added
+
+
+async def _create_tables(conn: aiosqlite.Connection) -> None:
+    for script in TABLE_SCHEMAS:
+        for statement in split_statements(script):
+            await conn.execute(statement)
+
+
+async def _installed_apps_columns(conn: aiosqlite.Connection) -> None:
+    await _add_missing_columns(
+        conn,
+        "installed_apps",
+        [
+            ("step_durations", "TEXT"),
+            ("step_started_at", "TEXT"),
+            ("networks", "TEXT"),
+            ("named_volumes", "TEXT"),
+            ("bind_mounts", "TEXT"),
+        ],
+    )
+
+
+async def _users_columns(conn: aiosqlite.Connection) -> None:
+    added = await _add_missing_columns(
+        conn,
+        "users",
+        [("avatar", "TEXT DEFAULT NULL"), ("password_changed_at", "TEXT")],
+    )
+    if "password_changed_at" in added:
+        await conn.execute(
+            "UPDATE users SET password_changed_at = created_at"
+            " WHERE password_changed_at IS NULL"
+        )
+
+
+async def _marketplace_columns(conn: aiosqlite.Connection) -> None:
+    await _add_missing_columns(conn, "marketplace_apps", [("maintainers", "TEXT")])
+
+
+async def _agent_token_rotation_columns(conn: aiosqlite.Connection) -> None:
+    await _add_missing_columns(
+        conn,
+        "agents",
+        [
+            ("pending_token_hash", "TEXT"),
+            ("token_issued_at", "TEXT"),
+            ("token_expires_at", "TEXT"),
+        ],
+    )
+
+
+async def _agent_token_indexes(conn: aiosqlite.Connection) -> None:
+    # Agent authentication looks agents up by token hash on every connect
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_agents_token_hash ON agents(token_hash)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_agents_pending_token_hash"
+        " ON agents(pending_token_hash)"
+    )
+
+
+async def _compact_metrics_storage(conn: aiosqlite.Connection) -> None:
+    """Move metrics into the clustered, interned sample tables."""
+    for statement in split_statements(METRICS_SCHEMA):
+        await conn.execute(statement)
+    tables = await _table_names(conn)
+
+    if "server_metrics" in tables:
+        await conn.execute(
+            "INSERT OR IGNORE INTO metric_servers (server_id)"
+            " SELECT DISTINCT server_id FROM server_metrics"
+        )
+        await _convert_in_chunks(
+            conn,
+            "server_metrics",
+            """INSERT OR REPLACE INTO server_metric_samples
+               (server_key, ts, cpu_percent, memory_percent, memory_used_mb,
+                memory_total_mb, disk_percent, disk_used_gb, disk_total_gb,
+                network_rx_bytes, network_tx_bytes, load_average_1m,
+                load_average_5m, load_average_15m, uptime_seconds)
+               SELECT s.id, {ts}, m.cpu_percent, m.memory_percent,
+                      m.memory_used_mb, m.memory_total_mb, m.disk_percent,
+                      m.disk_used_gb, m.disk_total_gb, m.network_rx_bytes,
+                      m.network_tx_bytes, m.load_average_1m, m.load_average_5m,
+                      m.load_average_15m, m.uptime_seconds
+               FROM server_metrics m
+               JOIN metric_servers s ON s.server_id = m.server_id
+               WHERE m.rowid > ? AND m.rowid <= ? AND {ts} IS NOT NULL""",
+        )
+
+    if "container_metrics" in tables:
+        await conn.execute(
+            "INSERT OR IGNORE INTO metric_servers (server_id)"
+            " SELECT DISTINCT server_id FROM container_metrics"
+        )
+        await conn.execute(
+            "INSERT OR IGNORE INTO metric_containers (container_name, container_id)"
+            " SELECT DISTINCT container_name, container_id FROM container_metrics"
+        )
+        await _convert_in_chunks(
+            conn,
+            "container_metrics",
+            """INSERT OR REPLACE INTO container_metric_samples
+               (server_key, ts, container_key, cpu_percent, memory_usage_mb,
+                memory_limit_mb, network_rx_bytes, network_tx_bytes, status)
+               SELECT s.id, {ts}, c.id, m.cpu_percent, m.memory_usage_mb,
+                      m.memory_limit_mb, m.network_rx_bytes, m.network_tx_bytes,
+                      m.status
+               FROM container_metrics m
+               JOIN metric_servers s ON s.server_id = m.server_id
+               JOIN metric_containers c ON c.container_name = m.container_name
+                   AND c.container_id = m.container_id
+               WHERE m.rowid > ? AND m.rowid <= ? AND {ts} IS NOT NULL""",
+        )
+
+
+async def _convert_in_chunks(
+    conn: aiosqlite.Connection, legacy_table: str, insert_sql: str
+) -> None:
+    """Copy a legacy table by rowid ranges, then drop it with its indexes.
+
+    Each statement handles at most METRICS_CONVERSION_CHUNK_ROWS rows, so
+    large tables convert with bounded memory and progress is logged.
+    """
+    cursor = await conn.execute(
+        f"SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM {legacy_table}"
+    )
+    low, high, total = await cursor.fetchone()
+    sql = insert_sql.format(ts=_EPOCH_MS_SQL.format("m.timestamp"))
+    converted = 0
+    if total:
+        for start in range(low - 1, high, METRICS_CONVERSION_CHUNK_ROWS):
+            cursor = await conn.execute(
+                sql, (start, start + METRICS_CONVERSION_CHUNK_ROWS)
+            )
+            converted += cursor.rowcount
+            logger.debug(
+                "Converting metrics",
+                table=legacy_table,
+                converted=converted,
+                total=total,
+            )
+    await conn.execute(f"DROP TABLE {legacy_table}")
+    logger.info(
+        "Converted metrics table",
+        table=legacy_table,
+        rows=total,
+        converted=converted,
+        skipped=total - converted,
+    )
+
+
+async def _marketplace_rating_sums(conn: aiosqlite.Connection) -> None:
+    """Keep a running rating sum and rebuild the aggregates from ratings."""
+    await _add_missing_columns(
+        conn, "marketplace_apps", [("rating_sum", "INTEGER NOT NULL DEFAULT 0")]
+    )
+    await conn.execute(
+        """UPDATE marketplace_apps SET
+           rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM app_ratings
+                         WHERE app_id = marketplace_apps.id),
+           rating_count = (SELECT COUNT(*) FROM app_ratings
+                           WHERE app_id = marketplace_apps.id),
+           avg_rating = (SELECT AVG(rating) FROM app_ratings
+                         WHERE app_id = marketplace_apps.id)"""
+    )
+
+
+async def _agent_routes(conn: aiosqlite.Connection) -> None:
+    for statement in split_statements(AGENT_ROUTES_SCHEMA):
+        await conn.execute(statement)
+
+
+async def _deployment_jobs(conn: aiosqlite.Connection) -> None:
+    for statement in split_statements(DEPLOYMENT_JOBS_SCHEMA):
+        await conn.execute(statement)
+
+
+async def _server_images(conn: aiosqlite.Connection) -> None:
+    for statement in split_statements(SERVER_IMAGES_SCHEMA):
+        await conn.execute(statement)
+
+
+async def _deployment_owners(conn: aiosqlite.Connection) -> None:
+    # Worker running a deploy, so recovery skips deploys a live worker owns
+    await _add_missing_columns(conn, "installed_apps", [("owner", "TEXT")])
+    await _add_missing_columns(conn, "deployment_jobs", [("owner", "TEXT")])
+
+
+# Agent statuses accepted by the agents table, matching AgentStatus
+AGENT_STATUSES = ("pending", "connected", "disconnected", "updating")
+_AGENT_STATUS_CHECK = re.compile(r"CHECK\s*\(\s*status\s+IN\s*\([^)]*\)\s*\)")
+
+
+async def _agent_status_check(conn: aiosqlite.Connection) -> None:
+    """Rebuild the agents table with the AgentStatus CHECK constraint.
+
+    Databases created before the constraint was aligned with the model
+    only accept 'active' and 'error', so connecting agents are rejected.
+    SQLite cannot alter a CHECK constraint in place: the table is copied
+    into one created from its own definition with the new constraint,
+    keeping columns added by earlier steps, indexes and triggers. Foreign
+    keys are not enforced on these connections, so dropping the old table
+    leaves rows that reference agents alone.
+    """
+    cursor = await conn.execute(
+        "SELECT type, name, sql FROM sqlite_master"
+        " WHERE tbl_name = 'agents' AND sql IS NOT NULL"
+    )
+    objects = await cursor.fetchall()
+    table_sql = next((sql for kind, _, sql in objects if kind == "table"), None)
+    if table_sql is None:
+        return
+    check = "CHECK (status IN ({}))".format(
+        ", ".join(f"'{status}'" for status in AGENT_STATUSES)
+    )
+    if check in table_sql:
+        return
+
+    new_sql, count = _AGENT_STATUS_CHECK.subn(check, table_sql, count=1)
+    if not count:
+        raise RuntimeError("agents table has no status CHECK constraint")
+    new_sql = re.sub(
+        r"^CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?agents\"?",
+        "CREATE TABLE agents_new",
+        new_sql,
+        count=1,
+    )
+    cursor = await conn.execute("PRAGMA table_info(agents)")
+    names = [row[1] for row in await cursor.fetchall()]
+    # Statuses the old constraint allowed map to disconnected; agents
+    # reconnect and report their real status
+    statuses = ", ".join("?" for _ in AGENT_STATUSES)
+    selected = [
+        f"CASE WHEN status IN ({statuses}) THEN status ELSE 'disconnected' END"
+        if name == "status"
+        else name
+        for name in names
+    ]
+
+    await conn.execute(new_sql)
+    await conn.execute(
+        f"INSERT INTO agents_new ({', '.join(names)})"
+        f" SELECT {', '.join(selected)} FROM agents",
+        AGENT_STATUSES,
+    )
+    await conn.execute("DROP TABLE agents")
+    await conn.execute("ALTER TABLE agents_new RENAME TO agents")
+    for kind, _, sql in objects:
+        if kind != "table":
+            await conn.execute(sql)
+
+
+async def _table_names(conn: aiosqlite.Connection) -> set[str]:
+    cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {row[0] for row in await cursor.fetchall()}
+
+
+# Ordered schema history. Append new steps; never renumber or edit old ones.
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "create_tables", _create_tables),
+    Migration(2, "installed_apps_columns", _installed_apps_columns),
+    Migration(3, "users_columns", _users_columns),
+    Migration(4, "marketplace_columns", _marketplace_columns),
+    Migration(5, "agent_token_rotation_columns", _agent_token_rotation_columns),
+    Migration(6, "agent_token_indexes", _agent_token_indexes),
+    Migration(7, "compact_metrics_storage", _compact_metrics_storage),
+    Migration(8, "marketplace_rating_sums", _marketplace_rating_sums),
+    Migration(9, "agent_routes", _agent_routes),
+    Migration(10, "deployment_jobs", _deployment_jobs),
+    Migration(11, "server_images", _server_images),
+    Migration(12, "agent_status_check", _agent_status_check),
+    Migration(13, "deployment_owners", _deployment_owners),
+)
+
+
+class MigrationRunner:
+    """Apply pending schema migrations in order."""
+
+    def __init__(
+        self,
+        connection: DatabaseConnection,
+        migrations: Sequence[Migration] = MIGRATIONS,
+    ):
+        """Initialize with database connection.
+
+        Args:
+            connection: DatabaseConnection instance.
+            migrations: Steps ordered by strictly increasing version.
+
+        Raises:
+            ValueError: If the versions are not strictly increasing.
+        """
+        versions = [migration.version for migration in migrations]
+        if any(a >= b for a, b in zip(versions, versions[1:], strict=False)):
+            raise ValueError("Migration versions must be strictly increasing")
+        self._conn = connection
+        self._migrations = tuple(migrations)
+
+    @property
+    def latest_version(self) -> int:
+        """Version of the newest known migration."""
+        return self._migrations[-1].version if self._migrations else 0
+
+    async def current_version(self) -> int:
+        """Read the applied schema version, 0 for an unversioned database."""
+        async with self._conn.get_connection() as conn:
+            return await self._read_version(conn)
+
+    async def migrate(self) -> list[AppliedMigration]:
+        """Bring the schema up to the latest version.
+
+        Returns:
+            The migrations applied by this call, empty when already current.
+
+        Raises:
+            Exception: Whatever a failing step raised, after rolling back
+                every step of this run.
+        """
+        started = time.perf_counter()
+        async with self._conn.get_connection() as conn:
+            version = await self._read_version(conn)
+            if version >= self.latest_version:
+                logger.debug(
+                    "Schema is current",
+                    version=version,
+                    check_ms=_elapsed_ms(started),
+                )
+                return []
+
+            # Re-read under the write lock in case another process migrated
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.execute(SCHEMA_MIGRATIONS_TABLE)
+                version = await self._read_version(conn)
+                applied = []
+                for migration in self._migrations:
+                    if migration.version <= version:
+                        continue
+                    applied.append(await self._apply(conn, migration))
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                logger.error(
+                    "Schema migration failed, rolled back",
+                    from_version=version,
+                    error=str(e),
+                )
+                raise
+
+        logger.info(
+            "Schema migrated",
+            from_version=version,
+            to_version=self.latest_version,
+            steps=len(applied),
+            duration_ms=_elapsed_ms(started),
+        )
+        return applied
+
+    async def _apply(
+        self, conn: aiosqlite.Connection, migration: Migration
+    ) -> AppliedMigration:
+        started = time.perf_counter()
+        await migration.apply(conn)
+        duration_ms = _elapsed_ms(started)
+        await conn.execute(
+            "INSERT INTO schema_migrations (version, name, duration_ms)"
+            " VALUES (?, ?, ?)",
+            (migration.version, migration.name, duration_ms),
+        )
+        logger.info(
+            "Applied schema migration",
+            version=migration.version,
+            name=migration.name,
+            duration_ms=duration_ms,
+        )
+        return AppliedMigration(migration.version, migration.name, duration_ms)
+
+    @staticmethod
+    async def _read_version(conn: aiosqlite.Connection) -> int:
+        try:
+            cursor = await conn.execute("SELECT MAX(version) FROM schema_migrations")
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            return 0
+        row = await cursor.fetchone()
+        return row[0] or 0
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
@@ -0,0 +1,266 @@
+"""Slow Query Log.
+
+Opt-in statement profiling for DatabaseConnection. Statements slower than
+a threshold are recorded with the shape of their parameters (types, never
+values), their EXPLAIN QUERY PLAN is captured once per statement and full
+table scans are flagged. The report ranks statements by total time.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+import structlog
+
+logger = structlog.get_logger("database.slow_query")
+
+# Environment variable enabling the log; its value is the threshold in ms
+SLOW_QUERY_ENV = "DB_SLOW_QUERY_MS"
+# Report written to the data directory on shutdown
+SLOW_QUERY_REPORT_FILENAME = "slow_queries.json"
+# Report of one worker process when the backend runs several
+SLOW_QUERY_WORKER_REPORT_FILENAME = "slow_queries-{worker_id}.json"
+# Plan detail for a full table scan, e.g. "SCAN agents"
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+# Cursor methods whose time counts towards the statement that created it
+_FETCH_METHODS = ("fetchone", "fetchmany", "fetchall")
+
+
+@dataclass
+class QueryStats:
+    """Aggregated timings for one slow statement."""
+
+    sql: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    callers: set[str] = field(default_factory=set)
+    parameter_shapes: set[str] = field(default_factory=set)
+    plan: list[str] = field(default_factory=list)
+    full_scans: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "callers": sorted(self.callers),
+            "parameter_shapes": sorted(self.parameter_shapes),
+            "plan": self.plan,
+            "full_scans": self.full_scans,
+        }
+
+
+class _Execution:
+    """One execute() call and the fetches made from its cursor."""
+
+    __slots__ = ("elapsed", "parameters", "sql")
+
+    def __init__(self, sql: str, parameters: Any):
+        self.sql = sql
+        self.parameters = parameters
+        self.elapsed = 0.0
+
+
+class SlowQueryLog:
+    """Record statements slower than a threshold across connections."""
+
+    def __init__(self, threshold_ms: float):
+        """Initialize the log.
+
+        Args:
+            threshold_ms: Statements taking at least this long are recorded.
+        """
+        self.threshold_ms = threshold_ms
+        self._stats: dict[str, QueryStats] = {}
+
+    def track(self, connection: aiosqlite.Connection, caller: str) -> "QueryTracker":
+        """Start timing the statements executed on a connection."""
+        return QueryTracker(self, connection, caller)
+
+    def report(self, limit: int | None = None) -> list[QueryStats]:
+        """Slow statements ranked by total time, slowest first."""
+        ranked = sorted(self._stats.values(), key=lambda s: s.total_ms, reverse=True)
+        return ranked[:limit]
+
+    def write_report(self, path: str | Path) -> Path:
+        """Write the ranked report as JSON.
+
+        Returns:
+            Path of the written report.
+        """
+        path = Path(path)
+        document = {
+            "threshold_ms": self.threshold_ms,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "queries": [stats.to_dict() for stats in self.report()],
+        }
+        path.write_text(json.dumps(document, indent=2) + "\n")
+        logger.info(
+            "Slow query report written",
+            path=str(path),
+            statements=len(self._stats),
+            full_scans=sum(1 for stats in self._stats.values() if stats.full_scans),
+        )
+        return path
+
+    async def _record(
+        self,
+        explain: Callable[..., Awaitable[aiosqlite.Cursor]],
+        execution: _Execution,
+        caller: str,
+    ) -> None:
+        duration_ms = execution.elapsed * 1000
+        key = " ".join(execution.sql.split())
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = QueryStats(sql=key)
+            stats.plan = await _explain(explain, execution)
+            stats.full_scans = _full_scans(stats.plan)
+
+        shape = _parameter_shape(execution.parameters)
+        stats.calls += 1
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.callers.add(caller)
+        stats.parameter_shapes.add(shape)
+
+        logger.warning(
+            "Slow query",
+            sql=key,
+            duration_ms=round(duration_ms, 2),
+            caller=caller,
+            parameters=shape,
+            full_scans=stats.full_scans,
+        )
+
+
+class QueryTracker:
+    """Times the statements of one connection for a SlowQueryLog.
+
+    execute() is wrapped on the connection instance, and fetches from the
+    cursor it returns are added to the same statement, since SQLite does
+    most of the work for a SELECT while rows are being stepped.
+    """
+
+    def __init__(
+        self, log: SlowQueryLog, connection: aiosqlite.Connection, caller: str
+    ):
+        self._log = log
+        self._caller = caller
+        self._execute = connection.execute
+        self._executions: list[_Execution] = []
+        connection.execute = self._timed_execute
+
+    async def _timed_execute(self, sql: str, parameters: Any = None):
+        execution = _Execution(sql, parameters)
+        self._executions.append(execution)
+        started = time.perf_counter()
+        try:
+            cursor = await self._execute(sql, parameters)
+        finally:
+            execution.elapsed += time.perf_counter() - started
+        for name in _FETCH_METHODS:
+            setattr(cursor, name, _timed(getattr(cursor, name), execution))
+        return cursor
+
+    async def flush(self) -> None:
+        """Record the slow statements while the connection is still open."""
+        executions, self._executions = self._executions, []
+        threshold = self._log.threshold_ms / 1000
+        for execution in executions:
+            if execution.elapsed >= threshold:
+                await self._log._record(self._execute, execution, self._caller)
+
+
+def _timed(
+    method: Callable[..., Awaitable[Any]], execution: _Execution
+) -> Callable[..., Awaitable[Any]]:
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            execution.elapsed += time.perf_counter() - started
+
+    return wrapper
+
+
+async def _explain(
+    execute: Callable[..., Awaitable[aiosqlite.Cursor]], execution: _Execution
+) -> list[str]:
+    """Capture the query plan, empty for statements that cannot be explained."""
+    if not execution.sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    try:
+        cursor = await execute(
+            f"EXPLAIN QUERY PLAN {execution.sql}", execution.parameters
+        )
+        rows = await cursor.fetchall()
+    except (sqlite3.Error, ValueError) as e:
+        logger.debug("Could not explain slow query", sql=execution.sql, error=str(e))
+        return []
+    return [row[3] for row in rows]
+
+
+def _full_scans(plan: list[str]) -> list[str]:
+    """Tables read by a full scan in a query plan."""
+    return [match.group(1) for line in plan if (match := _FULL_SCAN.match(line))]
+
+
+def _parameter_shape(parameters: Any) -> str:
+    """Describe parameters by type so values never reach the log."""
+    if parameters is None:
+        return "()"
+    if isinstance(parameters, Mapping):
+        pairs = ", ".join(
+            f"{name}: {_type_name(value)}" for name, value in parameters.items()
+        )
+        return "{" + pairs + "}"
+    return "(" + ", ".join(_type_name(value) for value in parameters) + ")"
+
+
+def _type_name(value: Any) -> str:
+    return "None" if value is None else type(value).__name__
+
+
+@cache
+def slow_query_log_from_env() -> SlowQueryLog | None:
+    """Shared log enabled by DB_SLOW_QUERY_MS, or None when unset."""
+    value = os.getenv(SLOW_QUERY_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        threshold_ms = float(value)
+    except ValueError:
+        logger.warning("Invalid slow query threshold, disabled", value=value)
+        return None
+    logger.info("Slow query log enabled", threshold_ms=threshold_ms)
+    return SlowQueryLog(threshold_ms)
+
+
+def slow_query_report_path(directory: str | Path, worker_id: str | None = None) -> Path:
+    """Where the slow query report goes; one file per worker process.
+
+    Args:
+        directory: Data directory holding the reports.
+        worker_id: Worker writing the report, None for a single process.
+    """
+    if worker_id is None:
+        return Path(directory) / SLOW_QUERY_REPORT_FILENAME
+    return Path(directory) / SLOW_QUERY_WORKER_REPORT_FILENAME.format(
+        worker_id=worker_id
+    )
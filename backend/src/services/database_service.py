@@ -20,6 +20,8 @@ from services.database import (
     DatabaseConnection,
     ExportDatabaseService,
     MetricsDatabaseService,
+    MetricSeries,
+    MigrationRunner,
     SchemaInitializer,
     ServerDatabaseService,
     SessionDatabaseService,
@@ -58,6 +60,7 @@ class DatabaseService:
         self._system = SystemDatabaseService(self._connection)
         self._export = ExportDatabaseService(self._connection)
         self._schema = SchemaInitializer(self._connection)
+        self._migrations = MigrationRunner(self._connection)
 
     @property
     def db_path(self) -> str:
@@ -216,9 +219,10 @@ class DatabaseService:
         status: str,
         config: dict,
         installed_at: str,
+        owner: str | None = None,
     ) -> InstalledApp | None:
         return await self._app.create_installation(
-            id, server_id, app_id, container_name, status, config, installed_at
+            id, server_id, app_id, container_name, status, config, installed_at, owner
         )
 
     async def update_installation(self, install_id: str, **kwargs) -> bool:
@@ -238,6 +242,32 @@ class DatabaseService:
     async def get_all_installations(self) -> list[InstalledApp]:
         return await self._app.get_all_installations()
 
+    async def get_installation_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        return await self._app.get_installation_details(
+            server_id=server_id,
+            status=status,
+            search=search,
+            limit=limit,
+            offset=offset,
+        )
+
+    async def count_installation_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+    ) -> int:
+        return await self._app.count_installation_details(
+            server_id=server_id, status=status, search=search
+        )
+
     async def delete_installation(self, server_id: str, app_id: str) -> bool:
         return await self._app.delete_installation(server_id, app_id)
 
@@ -249,6 +279,11 @@ class DatabaseService:
     async def save_container_metrics(self, metrics: ContainerMetrics) -> bool:
         return await self._metrics.save_container_metrics(metrics)
 
+    async def save_container_metrics_batch(
+        self, metrics: list[ContainerMetrics]
+    ) -> bool:
+        return await self._metrics.save_container_metrics_batch(metrics)
+
     async def save_activity_log(self, log: ActivityLog) -> bool:
         return await self._metrics.save_activity_log(log)
 
@@ -268,6 +303,31 @@ class DatabaseService:
             server_id, container_name, since, limit
         )
 
+    async def get_server_metric_series(
+        self,
+        server_id: str,
+        since: str,
+        fields: list[str] = None,
+        max_points: int = None,
+        delta: bool = False,
+    ) -> MetricSeries:
+        return await self._metrics.get_server_metric_series(
+            server_id, since, fields, max_points, delta
+        )
+
+    async def get_container_metric_series(
+        self,
+        server_id: str,
+        container_name: str,
+        since: str,
+        fields: list[str] = None,
+        max_points: int = None,
+        delta: bool = False,
+    ) -> MetricSeries:
+        return await self._metrics.get_container_metric_series(
+            server_id, container_name, since, fields, max_points, delta
+        )
+
     async def get_activity_logs(
         self,
         activity_types: list = None,
@@ -309,6 +369,9 @@ class DatabaseService:
 
     # ========== Migration Methods ==========
 
+    async def run_migrations(self) -> list:
+        return await self._migrations.migrate()
+
     async def run_installed_apps_migrations(self) -> None:
         return await self._schema.run_installed_apps_migrations()
 
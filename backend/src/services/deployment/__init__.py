@@ -4,7 +4,15 @@ Deployment Service Package
 Provides Docker container deployment and management on remote servers.
 """
 
+from services.deployment.jobs import DeploymentJob, DeploymentQueue
 from services.deployment.service import DeploymentError, DeploymentService
 from services.deployment.ssh_executor import AgentExecutor, SSHExecutor
 
-__all__ = ["DeploymentService", "DeploymentError", "SSHExecutor", "AgentExecutor"]
+__all__ = [
+    "DeploymentService",
+    "DeploymentError",
+    "DeploymentQueue",
+    "DeploymentJob",
+    "SSHExecutor",
+    "AgentExecutor",
+]
@@ -6,11 +6,18 @@ via the agent manager.
 """
 
 from typing import Any, Protocol, runtime_checkable
+from uuid import uuid4
 
 import structlog
 
+from services.deployment.images import split_image
+
 logger = structlog.get_logger("deployment")
 
+# Seconds to wait for an agent to take ownership of large existing data
+# directories; progress arrives meanwhile as system.volumes.progress
+VOLUME_PREP_TIMEOUT = 1800
+
 
 @runtime_checkable
 class _DeploymentServiceProtocol(Protocol):
@@ -49,11 +56,7 @@ class AgentRPCMixin:
         if not agent:
             return {"success": False, "error": "Agent not connected"}
 
-        # Parse image:tag
-        if ":" in image:
-            img_name, tag = image.rsplit(":", 1)
-        else:
-            img_name, tag = image, "latest"
+        img_name, tag = split_image(image)
 
         try:
             result = await self.agent_manager.send_command(
@@ -68,6 +71,25 @@ class AgentRPCMixin:
             logger.error("Agent image pull failed", image=image, error=str(e))
             return {"success": False, "error": str(e)}
 
+    async def _agent_list_images(self, server_id: str) -> dict[str, Any]:
+        """List Docker images on a server via agent RPC.
+
+        Served from the agent's Docker state cache when it is in sync.
+        """
+        agent = await self._get_agent_for_server(server_id)
+        if not agent:
+            return {"success": False, "error": "Agent not connected"}
+
+        try:
+            result = await self.agent_manager.send_command(
+                agent_id=agent.id,
+                method="docker.images.list",
+                timeout=30,
+            )
+            return {"success": True, "data": result}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
     async def _agent_run_container(
         self,
         server_id: str,
@@ -432,8 +454,9 @@ class AgentRPCMixin:
                     "volumes": agent_volumes,
                     "default_uid": default_uid,
                     "default_gid": default_gid,
+                    "progress_id": f"volumes-{uuid4().hex}",
                 },
-                timeout=60,
+                timeout=VOLUME_PREP_TIMEOUT,
             )
             return {"success": result.get("success", False), "data": result}
         except Exception as e:
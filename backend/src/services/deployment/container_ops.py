@@ -1,7 +1,7 @@
 """
 Container Operations
 
-Mixin providing container health checks, log retrieval,
+Mixin providing container health checks, log retrieval and streaming,
 and installation status refresh.
 """
 
@@ -19,6 +19,8 @@ class _DeploymentServiceProtocol(Protocol):
 
     db_service: Any
     agent_manager: Any
+    status_manager: Any
+    log_streams: Any
 
     async def _get_agent_for_server(self, server_id: str) -> Any: ...
 
@@ -52,6 +54,18 @@ class ContainerOpsMixin:
                     status = status.value
                 return {"status": str(status)}
 
+            # A connected agent keeps the record current via pushed changes
+            if self.status_manager.has_live_state_feed(installation.server_id):
+                status = installation.status
+                if hasattr(status, "value"):
+                    status = status.value
+                return {
+                    "status": str(status),
+                    "networks": installation.networks or [],
+                    "named_volumes": installation.named_volumes or [],
+                    "bind_mounts": installation.bind_mounts or [],
+                }
+
             # Get live status from Docker via agent
             logger.info(
                 "Refreshing installation status via agent",
@@ -206,33 +220,85 @@ class ContainerOpsMixin:
             return {"healthy": False, "error": str(e)}
 
     async def get_container_logs(
-        self, server_id: str, container_name: str, tail: int = 100
+        self,
+        server_id: str,
+        container_name: str,
+        tail: int = 100,
+        since: str | None = None,
     ) -> dict[str, Any]:
-        """Get container logs via agent."""
+        """Get container logs via agent.
+
+        Pass the returned ``cursor`` as ``since`` to fetch only newer lines.
+        """
         try:
             agent = await self._get_agent_for_server(server_id)
             if not agent:
                 return {"logs": [], "error": "Agent not connected"}
 
+            params: dict[str, Any] = {
+                "container": container_name,
+                "tail": tail,
+                "timestamps": True,
+            }
+            if since:
+                params["since"] = since
             result = await self.agent_manager.send_command(
                 agent_id=agent.id,
                 method="docker.containers.logs",
-                params={"container": container_name, "tail": tail},
+                params=params,
                 timeout=30,
             )
 
-            logs_text = result.get("logs", "")
-            logs = []
-            for line in logs_text.strip().split("\n"):
-                if line:
-                    logs.append({"timestamp": None, "message": line})
+            logs = result.get("lines")
+            if logs is None:
+                # Agents without cursor support return plain text
+                logs = [
+                    {"timestamp": None, "message": line}
+                    for line in result.get("logs", "").strip().split("\n")
+                    if line
+                ]
 
             return {
                 "logs": logs,
                 "container_name": container_name,
                 "line_count": len(logs),
+                "cursor": result.get("cursor", since),
             }
 
         except Exception as e:
             logger.error("Get container logs failed", error=str(e))
             return {"logs": [], "error": str(e)}
+
+    async def start_log_stream(
+        self,
+        server_id: str,
+        container_name: str,
+        since: str | None = None,
+        tail: int = 100,
+        follow: bool = True,
+    ) -> dict[str, Any]:
+        """Start streaming container logs from the server's agent.
+
+        Returns:
+            Dict with the stream_id to read from, or an error
+        """
+        agent = await self._get_agent_for_server(server_id)
+        if not agent:
+            return {"error": "Agent not connected"}
+        try:
+            return await self.log_streams.start(
+                agent.id, server_id, container_name, since, tail, follow
+            )
+        except Exception as e:
+            logger.error("Start log stream failed", error=str(e))
+            return {"error": str(e)}
+
+    async def read_log_stream(
+        self, stream_id: str, after: int = 0, limit: int = 1000
+    ) -> dict[str, Any] | None:
+        """Read lines received on a log stream since an offset."""
+        return await self.log_streams.read(stream_id, after, limit)
+
+    async def stop_log_stream(self, stream_id: str) -> bool:
+        """Cancel a log stream."""
+        return await self.log_streams.stop(stream_id)
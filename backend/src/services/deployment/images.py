@@ -0,0 +1,144 @@
+"""
+Server Image Presence
+
+Records which images have been pulled onto each server in the
+server_images table. A pre-pull or an install writes the image ID and
+registry digest the agent reported; a later install of the same image
+skips its pull when the recorded image is recent and still on the host.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from services.database.base import DatabaseConnection
+
+# Seconds a recorded pull is trusted before installs pull the tag again
+IMAGE_REUSE_SECONDS = 24 * 3600
+
+
+def split_image(image: str) -> tuple[str, str]:
+    """Split an image reference into its name and tag or digest.
+
+    A colon in a registry host (``registry:5000/app``) is not a tag, and
+    references without a tag use ``latest``.
+    """
+    if "@" in image:
+        name, digest = image.split("@", 1)
+        return name, digest
+    name, _, last = image.rpartition("/")
+    if ":" in last:
+        last, tag = last.rsplit(":", 1)
+    else:
+        tag = "latest"
+    return (f"{name}/{last}" if name else last), tag
+
+
+def image_ref(image: str) -> str:
+    """Normalize an image reference to ``name:tag`` or ``name@digest``."""
+    name, tag = split_image(image)
+    return f"{name}@{tag}" if tag.startswith("sha256:") else f"{name}:{tag}"
+
+
+@dataclass(frozen=True)
+class ServerImage:
+    """An image pulled onto a server."""
+
+    server_id: str
+    image: str
+    image_id: str
+    digest: str | None
+    pulled_at: str
+
+    def age_seconds(self) -> float:
+        """Seconds since the image was pulled."""
+        pulled = datetime.fromisoformat(self.pulled_at)
+        return time.time() - pulled.timestamp()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class ServerImageStore:
+    """Per-server image presence backed by the server_images table."""
+
+    def __init__(self, connection: DatabaseConnection):
+        """Initialize the store.
+
+        Args:
+            connection: Database holding the server_images table.
+        """
+        self._conn = connection
+
+    async def get(self, server_id: str, image: str) -> ServerImage | None:
+        """Get the recorded pull of an image on a server."""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT * FROM server_images WHERE server_id = ? AND image = ?",
+                (server_id, image_ref(image)),
+            )
+            row = await cursor.fetchone()
+        return ServerImage(**dict(row)) if row else None
+
+    async def record(
+        self, server_id: str, image: str, image_id: str, digest: str | None = None
+    ) -> ServerImage:
+        """Record that an image was pulled onto a server."""
+        entry = ServerImage(
+            server_id=server_id,
+            image=image_ref(image),
+            image_id=image_id,
+            digest=digest,
+            pulled_at=datetime.now(UTC).isoformat(),
+        )
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                """INSERT INTO server_images
+                   (server_id, image, image_id, digest, pulled_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (server_id, image) DO UPDATE SET
+                       image_id = excluded.image_id,
+                       digest = excluded.digest,
+                       pulled_at = excluded.pulled_at""",
+                (
+                    entry.server_id,
+                    entry.image,
+                    entry.image_id,
+                    entry.digest,
+                    entry.pulled_at,
+                ),
+            )
+            await conn.commit()
+        return entry
+
+    async def forget(self, server_id: str, image: str) -> None:
+        """Drop the record of an image no longer on a server."""
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                "DELETE FROM server_images WHERE server_id = ? AND image = ?",
+                (server_id, image_ref(image)),
+            )
+            await conn.commit()
+
+    async def list_images(
+        self, server_id: str | None = None, image: str | None = None
+    ) -> list[ServerImage]:
+        """List recorded images, optionally for one server or one image."""
+        clauses = []
+        values = []
+        if server_id:
+            clauses.append("server_id = ?")
+            values.append(server_id)
+        if image:
+            clauses.append("image = ?")
+            values.append(image_ref(image))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                f"SELECT * FROM server_images {where} ORDER BY server_id, image",
+                values,
+            )
+            rows = await cursor.fetchall()
+        return [ServerImage(**dict(row)) for row in rows]
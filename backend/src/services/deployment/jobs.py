@@ -0,0 +1,668 @@
+"""
+Deployment Job Queue
+
+Persists app installs, removals and image pre-pulls as jobs in the deployment_jobs table
+and runs them from a pool of tasks, so a bulk deployment returns at once
+and proceeds in the background. Queued jobs start highest priority first,
+then oldest first, within a global limit and a per-server limit so one
+host never pulls more than a few images at a time. Jobs for the same app
+on the same server never run together.
+
+Jobs interrupted by a backend restart are queued again on startup (the
+install flow replaces a half-made installation) until they have been
+started MAX_JOB_ATTEMPTS times; installations left mid-deploy with no job
+to finish them are marked failed. In multi-worker mode every worker may
+enqueue jobs and only the primary worker runs the pool. Running jobs and
+installations record the worker that runs them, and recovery leaves
+alone those of workers that are still alive, such as a synchronous
+install another worker is in the middle of.
+
+Pre-pulls warm an app's image on servers ahead of its install. They run
+at a low priority and at most DEFAULT_PREPULL_CONCURRENCY at a time, so
+warming the fleet never takes the slots or bandwidth deploys need.
+"""
+
+import asyncio
+import contextlib
+import json
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from lib.telemetry import REGISTRY
+from models.app_catalog import InstallationStatus
+from services.database.base import DatabaseConnection
+from services.deployment.service import DeploymentError
+
+if TYPE_CHECKING:
+    from services.agent_routing import AgentRouter
+
+logger = structlog.get_logger("deployment.jobs")
+
+# Jobs running at once across all servers
+DEFAULT_CONCURRENCY = 8
+# Jobs running at once on a single server
+DEFAULT_CONCURRENCY_PER_SERVER = 2
+# Seconds between queue scans when nothing wakes the dispatcher; picks up
+# jobs enqueued by other workers
+DISPATCH_POLL_SECONDS = 2.0
+# Queued rows read per dispatch pass
+DISPATCH_SCAN_ROWS = 500
+# Starts after which a job interrupted by restarts is given up
+MAX_JOB_ATTEMPTS = 3
+# Image pre-pulls running at once across all servers
+DEFAULT_PREPULL_CONCURRENCY = 2
+# Pre-pulls start after any deploy queued at the default priority
+PREPULL_PRIORITY = -10
+
+# What a job does with its app
+JOB_KINDS = ("install", "uninstall", "prepull")
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+# Installation states of a deploy still in progress
+_IN_FLIGHT_INSTALL_STATUSES = frozenset(
+    {
+        InstallationStatus.PENDING.value,
+        InstallationStatus.PULLING.value,
+        InstallationStatus.CREATING.value,
+        InstallationStatus.STARTING.value,
+    }
+)
+
+DEPLOYMENT_JOBS = REGISTRY.counter(
+    "tomo_deployment_jobs_total",
+    "Deployment jobs finished, by kind and outcome",
+    ("kind", "outcome"),
+)
+
+
+@dataclass(frozen=True)
+class DeploymentJob:
+    """A queued or finished job for one app on one server."""
+
+    id: str
+    kind: str
+    server_id: str
+    app_id: str
+    params: dict[str, Any]
+    priority: int
+    status: str
+    attempts: int
+    cancel_requested: bool
+    installation_id: str | None
+    error: str | None
+    created_at: str
+    started_at: str | None
+    finished_at: str | None
+
+    @classmethod
+    def from_row(cls, row: Any) -> "DeploymentJob":
+        """Build a job from a deployment_jobs row."""
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            server_id=row["server_id"],
+            app_id=row["app_id"],
+            params=json.loads(row["params"] or "{}"),
+            priority=row["priority"],
+            status=row["status"],
+            attempts=row["attempts"],
+            cancel_requested=bool(row["cancel_requested"]),
+            installation_id=row["installation_id"],
+            error=row["error"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class DeploymentQueue:
+    """Persistent deployment job queue with a bounded worker pool."""
+
+    def __init__(
+        self,
+        connection: DatabaseConnection,
+        deployment_service: Any,
+        app_service: Any | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        concurrency_per_server: int = DEFAULT_CONCURRENCY_PER_SERVER,
+        prepull_concurrency: int = DEFAULT_PREPULL_CONCURRENCY,
+        router: "AgentRouter | None" = None,
+    ):
+        """Initialize the queue.
+
+        Args:
+            connection: Database holding the deployment_jobs table.
+            deployment_service: Service running the install and removal flows.
+            app_service: Optional service whose catalog entries are marked
+                installed or uninstalled when a job succeeds.
+            concurrency: Jobs running at once across all servers.
+            concurrency_per_server: Jobs running at once on one server.
+            prepull_concurrency: Image pre-pulls running at once.
+            router: Router of this worker when several workers run; tells
+                recovery which workers are still alive.
+        """
+        self._conn = connection
+        self._deployment_service = deployment_service
+        self._app_service = app_service
+        self._concurrency = max(1, concurrency)
+        self._concurrency_per_server = max(1, concurrency_per_server)
+        self._prepull_concurrency = max(1, prepull_concurrency)
+        self._router = router
+        self._owner = router.worker_id if router else None
+        self._dispatcher: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        # job_id -> task running it, and the job
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._running: dict[str, DeploymentJob] = {}
+        # Jobs whose task was cancelled by a user rather than by shutdown
+        self._cancelling: set[str] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatcher is running jobs."""
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self) -> None:
+        """Recover interrupted work and start running queued jobs."""
+        if self.running:
+            logger.warning("Deployment queue already running")
+            return
+        await self.recover()
+        self._dispatcher = asyncio.create_task(self._run())
+        logger.info(
+            "Deployment queue started",
+            concurrency=self._concurrency,
+            concurrency_per_server=self._concurrency_per_server,
+        )
+
+    async def stop(self) -> None:
+        """Stop dispatching and abandon running jobs to the next startup."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._dispatcher
+            self._dispatcher = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Deployment queue stopped", abandoned=len(tasks))
+
+    async def enqueue(
+        self,
+        kind: str,
+        server_id: str,
+        app_id: str,
+        params: dict[str, Any] | None = None,
+        priority: int = 0,
+    ) -> DeploymentJob:
+        """Queue one job.
+
+        Args:
+            kind: One of JOB_KINDS.
+            server_id: Server to deploy to or remove from.
+            app_id: App to install or remove.
+            params: Options of the kind: ``config`` for installs,
+                ``remove_data`` for removals.
+            priority: Higher priorities start first.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        jobs = await self.enqueue_many(kind, [server_id], [app_id], params, priority)
+        return jobs[0]
+
+    async def enqueue_many(
+        self,
+        kind: str,
+        server_ids: list[str],
+        app_ids: list[str],
+        params: dict[str, Any] | None = None,
+        priority: int = 0,
+    ) -> list[DeploymentJob]:
+        """Queue a job for every app on every server in one transaction.
+
+        Returns:
+            The queued jobs, ordered by server then app.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        targets = [
+            (server_id, app_id) for server_id in server_ids for app_id in app_ids
+        ]
+        return await self._insert(kind, targets, params, priority)
+
+    async def enqueue_prepulls(
+        self,
+        app_ids: list[str] | None = None,
+        server_ids: list[str] | None = None,
+        priority: int = PREPULL_PRIORITY,
+    ) -> list[DeploymentJob]:
+        """Queue image pre-pulls for apps ahead of their installs.
+
+        With servers, every app is warmed on each of them. Without, each
+        app is warmed where it is installed, ready for an update after a
+        catalog change; without apps too, every installed app is warmed.
+        Targets that already have a pre-pull queued or running are skipped.
+
+        Args:
+            app_ids: Marketplace apps whose current images are pulled.
+            server_ids: Servers to warm.
+            priority: Higher priorities start first.
+
+        Returns:
+            The queued jobs.
+
+        Raises:
+            ValueError: If servers are given without apps.
+        """
+        if server_ids is not None:
+            if not app_ids:
+                raise ValueError("app_ids are required when server_ids are given")
+            targets = [(s, a) for s in server_ids for a in app_ids]
+        else:
+            db_service = self._deployment_service.db_service
+            installations = await db_service.get_all_installations()
+            wanted = set(app_ids) if app_ids else None
+            targets = sorted(
+                {
+                    (inst.server_id, inst.app_id)
+                    for inst in installations
+                    if wanted is None or inst.app_id in wanted
+                }
+            )
+
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                """SELECT server_id, app_id FROM deployment_jobs
+                   WHERE kind = 'prepull' AND status IN ('queued', 'running')"""
+            )
+            active = {(row[0], row[1]) for row in await cursor.fetchall()}
+        targets = [target for target in targets if target not in active]
+        if not targets:
+            return []
+        return await self._insert("prepull", targets, None, priority)
+
+    async def _insert(
+        self,
+        kind: str,
+        targets: list[tuple[str, str]],
+        params: dict[str, Any] | None,
+        priority: int,
+    ) -> list[DeploymentJob]:
+        """Insert queued jobs for (server_id, app_id) targets."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown deployment job kind: {kind}")
+        now = _now()
+        encoded = json.dumps(params or {})
+        rows = [
+            (f"job-{uuid.uuid4().hex[:12]}", kind, server_id, app_id, encoded, priority)
+            for server_id, app_id in targets
+        ]
+        async with self._conn.get_connection() as conn:
+            await conn.executemany(
+                """INSERT INTO deployment_jobs
+                   (id, kind, server_id, app_id, params, priority, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [(*row, now) for row in rows],
+            )
+            await conn.commit()
+        self._wake.set()
+        logger.info("Deployment jobs queued", kind=kind, jobs=len(rows))
+        return [
+            DeploymentJob(
+                id=job_id,
+                kind=kind,
+                server_id=server_id,
+                app_id=app_id,
+                params=params or {},
+                priority=priority,
+                status="queued",
+                attempts=0,
+                cancel_requested=False,
+                installation_id=None,
+                error=None,
+                created_at=now,
+                started_at=None,
+                finished_at=None,
+            )
+            for job_id, _, server_id, app_id, _, _ in rows
+        ]
+
+    async def get_job(self, job_id: str) -> DeploymentJob | None:
+        """Get a job by ID."""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT * FROM deployment_jobs WHERE id = ?", (job_id,)
+            )
+            row = await cursor.fetchone()
+        return DeploymentJob.from_row(row) if row else None
+
+    async def list_jobs(
+        self,
+        status: str | None = None,
+        server_id: str | None = None,
+        limit: int = 100,
+    ) -> list[DeploymentJob]:
+        """List jobs, newest first.
+
+        Args:
+            status: Only jobs in this status.
+            server_id: Only jobs for this server.
+            limit: Maximum jobs to return.
+        """
+        clauses = []
+        values: list[Any] = []
+        if status:
+            clauses.append("status = ?")
+            values.append(status)
+        if server_id:
+            clauses.append("server_id = ?")
+            values.append(server_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                f"SELECT * FROM deployment_jobs {where}"
+                " ORDER BY created_at DESC, rowid DESC LIMIT ?",
+                (*values, limit),
+            )
+            rows = await cursor.fetchall()
+        return [DeploymentJob.from_row(row) for row in rows]
+
+    async def count_jobs(self) -> dict[str, int]:
+        """Count jobs by status."""
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT status, COUNT(*) FROM deployment_jobs GROUP BY status"
+            )
+            rows = await cursor.fetchall()
+        return dict(rows)
+
+    async def cancel(self, job_id: str) -> DeploymentJob | None:
+        """Cancel a queued or running job.
+
+        Queued jobs are cancelled at once. Running jobs are interrupted by
+        the worker running them, which marks their installation failed.
+
+        Returns:
+            The job after the request, or None if it does not exist.
+        """
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                """UPDATE deployment_jobs
+                   SET status = 'cancelled', error = 'Cancelled', finished_at = ?
+                   WHERE id = ? AND status = 'queued'""",
+                (_now(), job_id),
+            )
+            await conn.execute(
+                """UPDATE deployment_jobs SET cancel_requested = 1
+                   WHERE id = ? AND status = 'running'""",
+                (job_id,),
+            )
+            await conn.commit()
+        self._cancel_task(job_id)
+        return await self.get_job(job_id)
+
+    async def recover(self) -> dict[str, int]:
+        """Settle work interrupted by the previous run.
+
+        Running jobs are queued again, or failed once they have been
+        started MAX_JOB_ATTEMPTS times, and installations still mid-deploy
+        without a queued job are marked failed. Work owned by a worker that
+        is still alive is left to it.
+
+        Returns:
+            Counts of requeued, failed and cancelled jobs and of failed
+            installations.
+        """
+        now = _now()
+        cancelled = failed = requeued = 0
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT id, owner FROM deployment_jobs WHERE status = 'running'"
+            )
+            orphaned = [
+                row["id"]
+                for row in await cursor.fetchall()
+                if not self._owner_alive(row["owner"])
+            ]
+            if orphaned:
+                ids = ", ".join("?" * len(orphaned))
+                cursor = await conn.execute(
+                    f"""UPDATE deployment_jobs
+                        SET status = 'cancelled', error = 'Cancelled', finished_at = ?
+                        WHERE status = 'running' AND cancel_requested = 1
+                          AND id IN ({ids})""",
+                    (now, *orphaned),
+                )
+                cancelled = cursor.rowcount
+                cursor = await conn.execute(
+                    f"""UPDATE deployment_jobs
+                        SET status = 'failed', finished_at = ?,
+                            error = 'Interrupted by backend restarts'
+                        WHERE status = 'running' AND attempts >= ? AND id IN ({ids})""",
+                    (now, MAX_JOB_ATTEMPTS, *orphaned),
+                )
+                failed = cursor.rowcount
+                cursor = await conn.execute(
+                    f"""UPDATE deployment_jobs SET status = 'queued', owner = NULL
+                        WHERE status = 'running' AND id IN ({ids})""",
+                    orphaned,
+                )
+                requeued = cursor.rowcount
+                await conn.commit()
+            cursor = await conn.execute(
+                "SELECT server_id, app_id FROM deployment_jobs WHERE status = 'queued'"
+            )
+            queued = {(row[0], row[1]) for row in await cursor.fetchall()}
+
+        interrupted = 0
+        db_service = self._deployment_service.db_service
+        for installation in await db_service.get_all_installations():
+            status = getattr(installation.status, "value", installation.status)
+            key = (installation.server_id, installation.app_id)
+            if (
+                status in _IN_FLIGHT_INSTALL_STATUSES
+                and key not in queued
+                and not self._owner_alive(installation.owner)
+            ):
+                await db_service.update_installation(
+                    installation.id,
+                    status=InstallationStatus.ERROR.value,
+                    error_message="Deployment interrupted by a backend restart",
+                )
+                interrupted += 1
+
+        counts = {
+            "requeued": requeued,
+            "failed": failed,
+            "cancelled": cancelled,
+            "interrupted_installations": interrupted,
+        }
+        if any(counts.values()):
+            logger.info("Recovered interrupted deployments", **counts)
+        return counts
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self._apply_cancellations()
+                await self._dispatch()
+            except Exception as e:
+                logger.error("Deployment queue dispatch failed", error=str(e))
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), DISPATCH_POLL_SECONDS)
+
+    async def _dispatch(self) -> None:
+        """Start queued jobs while the concurrency limits allow."""
+        free = self._concurrency - len(self._tasks)
+        if free <= 0:
+            return
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                """SELECT * FROM deployment_jobs WHERE status = 'queued'
+                   ORDER BY priority DESC, created_at, rowid LIMIT ?""",
+                (DISPATCH_SCAN_ROWS,),
+            )
+            candidates = [
+                DeploymentJob.from_row(row) for row in await cursor.fetchall()
+            ]
+
+            per_server: dict[str, int] = {}
+            busy = set()
+            prepulls = 0
+            for running in self._running.values():
+                busy.add((running.server_id, running.app_id))
+                per_server[running.server_id] = per_server.get(running.server_id, 0) + 1
+                prepulls += running.kind == "prepull"
+
+            claimed = []
+            started_at = _now()
+            for job in candidates:
+                if len(claimed) >= free:
+                    break
+                key = (job.server_id, job.app_id)
+                if key in busy:
+                    continue
+                if per_server.get(job.server_id, 0) >= self._concurrency_per_server:
+                    continue
+                if job.kind == "prepull" and prepulls >= self._prepull_concurrency:
+                    continue
+                cursor = await conn.execute(
+                    """UPDATE deployment_jobs
+                       SET status = 'running', attempts = attempts + 1,
+                           started_at = ?, owner = ?
+                       WHERE id = ? AND status = 'queued'""",
+                    (started_at, self._owner, job.id),
+                )
+                if cursor.rowcount != 1:
+                    continue
+                busy.add(key)
+                per_server[job.server_id] = per_server.get(job.server_id, 0) + 1
+                prepulls += job.kind == "prepull"
+                claimed.append(job)
+            await conn.commit()
+
+        for job in claimed:
+            task = asyncio.create_task(self._execute(job))
+            self._tasks[job.id] = task
+            self._running[job.id] = job
+            task.add_done_callback(lambda _, job_id=job.id: self._release(job_id))
+
+    def _owner_alive(self, owner: str | None) -> bool:
+        """Whether the worker that took on some work is still running."""
+        return bool(owner and self._router and self._router.is_worker_alive(owner))
+
+    async def _apply_cancellations(self) -> None:
+        """Interrupt running jobs cancelled through another worker."""
+        if not self._tasks:
+            return
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                """SELECT id FROM deployment_jobs
+                   WHERE status = 'running' AND cancel_requested = 1"""
+            )
+            rows = await cursor.fetchall()
+        for (job_id,) in rows:
+            self._cancel_task(job_id)
+
+    def _cancel_task(self, job_id: str) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None and job_id not in self._cancelling:
+            self._cancelling.add(job_id)
+            task.cancel()
+
+    def _release(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._running.pop(job_id, None)
+        self._cancelling.discard(job_id)
+        self._wake.set()
+
+    async def _execute(self, job: DeploymentJob) -> None:
+        logger.info(
+            "Deployment job started",
+            job_id=job.id,
+            kind=job.kind,
+            server_id=job.server_id,
+            app_id=job.app_id,
+            attempt=job.attempts + 1,
+        )
+        installation_id = None
+        error = None
+        try:
+            installation_id = await self._perform(job)
+            status = "succeeded"
+        except asyncio.CancelledError:
+            if job.id not in self._cancelling:
+                # Shutdown; the job stays running and is requeued on startup
+                raise
+            status, error = "cancelled", "Cancelled"
+            await self._fail_installation(job, "Deployment cancelled")
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.warning("Deployment job failed", job_id=job.id, error=error)
+
+        async with self._conn.get_connection() as conn:
+            await conn.execute(
+                """UPDATE deployment_jobs
+                   SET status = ?, error = ?, installation_id = ?, finished_at = ?
+                   WHERE id = ?""",
+                (status, error, installation_id, _now(), job.id),
+            )
+            await conn.commit()
+        DEPLOYMENT_JOBS.inc(job.kind, status)
+        logger.info("Deployment job finished", job_id=job.id, status=status)
+
+    async def _perform(self, job: DeploymentJob) -> str | None:
+        """Run a job's flow, returning the installation it created."""
+        if job.kind == "install":
+            installation = await self._deployment_service.install_app(
+                job.server_id, job.app_id, job.params.get("config") or {}
+            )
+            if self._app_service:
+                await self._app_service.mark_app_installed(job.app_id, job.server_id)
+            return installation.id if installation else None
+
+        if job.kind == "prepull":
+            await self._deployment_service.prepull_app(job.server_id, job.app_id)
+            return None
+
+        removed = await self._deployment_service.uninstall_app(
+            job.server_id, job.app_id, remove_data=bool(job.params.get("remove_data"))
+        )
+        if not removed:
+            raise DeploymentError(f"Failed to remove app '{job.app_id}'")
+        if self._app_service:
+            await self._app_service.mark_app_uninstalled(job.app_id)
+        return None
+
+    async def _fail_installation(self, job: DeploymentJob, message: str) -> None:
+        """Mark a job's installation failed if its deploy was still running."""
+        db_service = self._deployment_service.db_service
+        installation = await db_service.get_installation(job.server_id, job.app_id)
+        if installation is None:
+            return
+        status = getattr(installation.status, "value", installation.status)
+        if status in _IN_FLIGHT_INSTALL_STATUSES:
+            await db_service.update_installation(
+                installation.id,
+                status=InstallationStatus.ERROR.value,
+                error_message=message,
+            )
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
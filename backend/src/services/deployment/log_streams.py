@@ -0,0 +1,358 @@
+"""
+Container Log Streams
+
+Buffers container log subscriptions pushed by agents as docker.logs.chunk
+notifications, so callers can poll new lines by offset instead of
+re-fetching the whole tail. A periodic sweep cancels streams nobody reads
+and drops finished buffers that were never drained.
+
+Agents send a stream's frames to the worker that started it, so with
+several workers the buffer lives there: stream IDs are prefixed with that
+worker's ID and reads or stops landing on another worker are forwarded.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+if TYPE_CHECKING:
+    from services.agent_routing import AgentRouter
+
+logger = structlog.get_logger("deployment.log_streams")
+
+# Lines kept per stream; older lines are dropped once a reader falls behind
+BUFFER_LINES = 2000
+# Streams nobody has read for this long are cancelled on the agent
+IDLE_TIMEOUT_SECONDS = 120.0
+# Finished streams nobody has read for this long are dropped
+FINISHED_TTL_SECONDS = 300.0
+SWEEP_INTERVAL_SECONDS = 30.0
+MAX_READ_LINES = 1000
+# Frames that arrive before the subscribe response has been processed are
+# held briefly; frames for streams that never get registered expire
+MAX_EARLY_FRAMES = 64
+EARLY_FRAME_TTL_SECONDS = 10.0
+
+
+@dataclass
+class LogStreamBuffer:
+    """Lines received for one agent log subscription."""
+
+    stream_id: str
+    agent_id: str
+    agent_stream_id: str
+    server_id: str
+    container: str
+    lines: deque = field(default_factory=lambda: deque(maxlen=BUFFER_LINES))
+    next_offset: int = 0
+    last_seq: int = 0
+    cursor: str | None = None
+    done: bool = False
+    reason: str | None = None
+    error: str | None = None
+    last_read: float = field(default_factory=time.monotonic)
+
+    @property
+    def first_offset(self) -> int:
+        """Offset of the oldest buffered line."""
+        return self.next_offset - len(self.lines)
+
+
+class LogStreamRegistry:
+    """Tracks agent log subscriptions and buffers their frames."""
+
+    def __init__(self, agent_manager: Any):
+        """Initialize the registry.
+
+        Args:
+            agent_manager: Agent manager used to send subscribe/unsubscribe
+        """
+        self.agent_manager = agent_manager
+        self._streams: dict[str, LogStreamBuffer] = {}
+        self._early: dict[str, list[tuple[float, dict]]] = {}
+        self._sweeper: asyncio.Task | None = None
+        self._router: AgentRouter | None = None
+
+    def share(self, router: "AgentRouter") -> None:
+        """Serve this worker's streams to the other workers.
+
+        Args:
+            router: Router connecting this worker to its peers
+        """
+        self._router = router
+        router.register_handler("log_streams.read", self._read_local)
+        router.register_handler("log_streams.stop", self._stop_local)
+
+    def _stream_key(self, agent_id: str, agent_stream_id: Any) -> str:
+        """Build the stream ID callers see for an agent's stream."""
+        # Agent stream IDs are per-agent counters; qualify them with the agent
+        key = f"{agent_id}:{agent_stream_id}"
+        return f"{self._router.worker_id}/{key}" if self._router else key
+
+    def _owner(self, stream_id: str) -> str | None:
+        """Return the worker holding a stream's buffer, if not this one."""
+        if self._router is None:
+            return None
+        worker_id, sep, _ = stream_id.partition("/")
+        if not sep or worker_id == self._router.worker_id:
+            return None
+        return worker_id
+
+    async def start_sweeper(self, interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+        """Start sweeping idle and abandoned streams in the background.
+
+        Args:
+            interval: Seconds between sweeps
+        """
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+
+    async def stop_sweeper(self) -> None:
+        """Stop the background sweep."""
+        if self._sweeper:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    async def sweep(self) -> None:
+        """Cancel idle streams on their agents and drop stale buffers.
+
+        Streams that do not receive frames are otherwise never checked, and
+        finished buffers are otherwise only freed once fully read.
+        """
+        now = time.monotonic()
+        for stream in list(self._streams.values()):
+            idle = now - stream.last_read
+            if stream.done:
+                if idle > FINISHED_TTL_SECONDS:
+                    logger.info(
+                        "Dropping unread log stream", stream_id=stream.stream_id
+                    )
+                    self._streams.pop(stream.stream_id, None)
+            elif idle > IDLE_TIMEOUT_SECONDS:
+                logger.info("Cancelling idle log stream", stream_id=stream.stream_id)
+                await self._stop_local(stream.stream_id)
+        self._expire_early_frames(now)
+
+    async def _sweep_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error("Log stream sweep failed", error=str(e))
+
+    async def start(
+        self,
+        agent_id: str,
+        server_id: str,
+        container: str,
+        since: str | None = None,
+        tail: int = 100,
+        follow: bool = True,
+    ) -> dict[str, Any]:
+        """Subscribe to a container's logs on an agent.
+
+        Args:
+            agent_id: Agent running the container
+            server_id: Server the agent runs on
+            container: Container name or ID
+            since: Cursor from an earlier read to resume after
+            tail: Existing lines to include when not resuming
+            follow: Keep streaming new lines
+
+        Returns:
+            Stream info dict with stream_id
+        """
+        result = await self.agent_manager.send_command(
+            agent_id=agent_id,
+            method="docker.logs.subscribe",
+            params={
+                "container": container,
+                "since": since,
+                "tail": tail,
+                "follow": follow,
+            },
+            timeout=30,
+        )
+        stream_id = self._stream_key(agent_id, result["stream_id"])
+        self._streams[stream_id] = LogStreamBuffer(
+            stream_id=stream_id,
+            agent_id=agent_id,
+            agent_stream_id=result["stream_id"],
+            server_id=server_id,
+            container=container,
+            cursor=since,
+        )
+        for _, params in self._early.pop(stream_id, []):
+            await self.handle_chunk(agent_id, params)
+        logger.info(
+            "Log stream started",
+            stream_id=stream_id,
+            agent_id=agent_id,
+            container=container,
+        )
+        return {"stream_id": stream_id, "container": container, "cursor": since}
+
+    async def handle_chunk(self, agent_id: str, params: dict) -> None:
+        """Handle docker.logs.chunk notifications from agents.
+
+        Args:
+            agent_id: Agent that sent the frame
+            params: Frame with stream_id, seq, lines, cursor and done
+        """
+        stream_id = self._stream_key(agent_id, params.get("stream_id", ""))
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            self._hold_early_frame(stream_id, params)
+            return
+
+        seq = params.get("seq", 0)
+        if seq and seq <= stream.last_seq:
+            return
+        stream.last_seq = seq
+
+        for line in params.get("lines") or []:
+            stream.lines.append({"offset": stream.next_offset, **line})
+            stream.next_offset += 1
+        stream.cursor = params.get("cursor") or stream.cursor
+
+        if params.get("done"):
+            stream.done = True
+            stream.reason = params.get("reason")
+            stream.error = params.get("error")
+        elif time.monotonic() - stream.last_read > IDLE_TIMEOUT_SECONDS:
+            logger.info("Cancelling idle log stream", stream_id=stream.stream_id)
+            await self._stop_local(stream.stream_id)
+
+    def _hold_early_frame(self, stream_id: str, params: dict) -> None:
+        """Keep a frame for a stream whose subscribe has not returned yet."""
+        now = time.monotonic()
+        self._expire_early_frames(now)
+
+        if sum(len(frames) for frames in self._early.values()) >= MAX_EARLY_FRAMES:
+            logger.debug("Dropping log chunk for unknown stream", stream_id=stream_id)
+            return
+        self._early.setdefault(stream_id, []).append((now, params))
+
+    def _expire_early_frames(self, now: float) -> None:
+        """Forget held frames for streams that never got registered."""
+        for key in list(self._early):
+            frames = [
+                f for f in self._early[key] if now - f[0] < EARLY_FRAME_TTL_SECONDS
+            ]
+            if frames:
+                self._early[key] = frames
+            else:
+                del self._early[key]
+
+    async def read(
+        self, stream_id: str, after: int = 0, limit: int = MAX_READ_LINES
+    ) -> dict[str, Any] | None:
+        """Read buffered lines starting at an offset.
+
+        Args:
+            stream_id: Stream to read
+            after: First offset wanted (``next`` from the previous read)
+            limit: Maximum lines to return
+
+        Returns:
+            Dict with lines, next offset, cursor and done flag, or None if the
+            stream is unknown. ``dropped`` counts lines that fell out of the
+            buffer before they were read.
+        """
+        owner = self._owner(stream_id)
+        if owner is None:
+            return await self._read_local(stream_id, after, limit)
+        try:
+            return await self._router.call_worker(
+                owner,
+                "log_streams.read",
+                {"stream_id": stream_id, "after": after, "limit": limit},
+            )
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(
+                "Log stream worker unreachable", stream_id=stream_id, error=str(e)
+            )
+            return None
+
+    async def _read_local(
+        self, stream_id: str, after: int = 0, limit: int = MAX_READ_LINES
+    ) -> dict[str, Any] | None:
+        """Read a stream buffered in this worker."""
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return None
+        stream.last_read = time.monotonic()
+
+        if not stream.done and not self.agent_manager.is_connected(stream.agent_id):
+            stream.done = True
+            stream.reason = "disconnected"
+
+        limit = max(1, min(limit, MAX_READ_LINES))
+        start = max(after, stream.first_offset)
+        skip = start - stream.first_offset
+        lines = list(islice(stream.lines, skip, skip + limit))
+        next_offset = start + len(lines)
+
+        result = {
+            "stream_id": stream_id,
+            "container": stream.container,
+            "lines": lines,
+            "next": next_offset,
+            "dropped": max(0, start - after),
+            "cursor": stream.cursor,
+            "done": stream.done and next_offset >= stream.next_offset,
+            "reason": stream.reason,
+        }
+        if stream.error:
+            result["error"] = stream.error
+        if result["done"]:
+            # Fully drained: nothing more will arrive for this stream
+            self._streams.pop(stream_id, None)
+        return result
+
+    async def stop(self, stream_id: str) -> bool:
+        """Cancel a stream on its agent and drop its buffer.
+
+        Returns:
+            True if the stream was known
+        """
+        owner = self._owner(stream_id)
+        if owner is None:
+            return await self._stop_local(stream_id)
+        try:
+            return await self._router.call_worker(
+                owner, "log_streams.stop", {"stream_id": stream_id}
+            )
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(
+                "Log stream worker unreachable", stream_id=stream_id, error=str(e)
+            )
+            return False
+
+    async def _stop_local(self, stream_id: str) -> bool:
+        """Cancel a stream buffered in this worker."""
+        stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return False
+        if not stream.done and self.agent_manager.is_connected(stream.agent_id):
+            try:
+                await self.agent_manager.send_command(
+                    agent_id=stream.agent_id,
+                    method="docker.logs.unsubscribe",
+                    params={"stream_id": stream.agent_stream_id},
+                    timeout=10,
+                )
+            except Exception as e:
+                logger.warning(
+                    "Log stream unsubscribe failed", stream_id=stream_id, error=str(e)
+                )
+        return True
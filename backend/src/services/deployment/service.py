@@ -16,6 +16,8 @@ from models.app_catalog import InstallationStatus, InstalledApp
 from models.metrics import ActivityType
 from services.deployment.agent_rpc import AgentRPCMixin
 from services.deployment.container_ops import ContainerOpsMixin
+from services.deployment.images import IMAGE_REUSE_SECONDS, ServerImageStore
+from services.deployment.log_streams import LogStreamRegistry
 from services.deployment.ssh_executor import SSHExecutor
 from services.deployment.status import StatusManager
 from services.deployment.validation import DeploymentValidator
@@ -42,6 +44,8 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
         executor: SSHExecutor | None = None,
         agent_manager: Any | None = None,
         agent_service: Any | None = None,
+        image_store: ServerImageStore | None = None,
+        worker_id: str | None = None,
     ):
         """Initialize deployment service.
 
@@ -55,6 +59,10 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
                       If not provided, falls back to direct SSH.
             agent_manager: Agent manager for Docker RPC calls
             agent_service: Agent service to get agent by server
+            image_store: Optional record of images pulled onto each server,
+                letting installs skip pulls of images already present
+            worker_id: Worker running this service's installs, recorded on
+                installations in flight when several workers run
         """
         self.ssh_service = ssh_service
         self.server_service = server_service
@@ -63,6 +71,8 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
         self.activity_service = activity_service
         self.agent_manager = agent_manager
         self.agent_service = agent_service
+        self.image_store = image_store
+        self.worker_id = worker_id
 
         # Use provided executor or fall back to direct SSH
         self.ssh = executor or SSHExecutor(ssh_service, server_service)
@@ -70,8 +80,13 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
             self.ssh, marketplace_service, server_service
         )
         self.status_manager = StatusManager(
-            self.ssh, db_service, server_service, marketplace_service
+            self.ssh,
+            db_service,
+            server_service,
+            marketplace_service,
+            agent_manager=agent_manager,
         )
+        self.log_streams = LogStreamRegistry(agent_manager)
 
         logger.info("Deployment service initialized")
 
@@ -140,6 +155,7 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
                 status=InstallationStatus.PENDING.value,
                 config=config,
                 installed_at=original_installed_at or now,
+                owner=self.worker_id,
             )
 
             if not installation:
@@ -166,8 +182,7 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
                 step_started_at=pulling_started.isoformat(),
             )
 
-            logger.info("Pulling image via agent", image=app.docker.image)
-            pull_result = await self._agent_pull_image(server_id, app.docker.image)
+            pull_result = await self._ensure_image(server_id, app.docker.image)
 
             if not pull_result["success"]:
                 error_msg = (
@@ -178,7 +193,11 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
                 )
                 raise DeploymentError(error_msg)
 
-            logger.info("Image pulled successfully", image=app.docker.image)
+            logger.info(
+                "Image ready",
+                image=app.docker.image,
+                already_present=pull_result["present"],
+            )
             await self.db_service.update_installation(install_id, progress=100)
 
             # Prepare volume directories with correct ownership
@@ -517,6 +536,29 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
             cleanup_result["errors"].append(str(e))
             return cleanup_result
 
+    async def prepull_app(self, server_id: str, app_id: str) -> dict[str, Any]:
+        """Pull an app's image onto a server ahead of its install.
+
+        Args:
+            server_id: Server to warm
+            app_id: Marketplace app whose current image is pulled
+
+        Returns:
+            Dict with the image and whether it was already present
+
+        Raises:
+            DeploymentError: If the app is unknown or the pull fails
+        """
+        app = await self.marketplace_service.get_app(app_id)
+        if not app:
+            raise DeploymentError(f"App '{app_id}' not found in marketplace")
+        result = await self._ensure_image(server_id, app.docker.image)
+        if not result["success"]:
+            raise DeploymentError(
+                f"Failed to pull image: {result.get('error', 'Unknown error')}"
+            )
+        return {"image": app.docker.image, "present": result["present"]}
+
     # -------------------------------------------------------------------------
     # Delegated Methods (to sub-components)
     # -------------------------------------------------------------------------
@@ -549,9 +591,78 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
         """Get installation status by ID."""
         return await self.status_manager.get_installation_status_by_id(installation_id)
 
-    async def get_all_installations_with_details(self) -> list[dict[str, Any]]:
-        """Get all installations with details."""
-        return await self.status_manager.get_all_installations_with_details()
+    async def get_all_installations_with_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Get installations with details, optionally filtered and paginated."""
+        return await self.status_manager.get_all_installations_with_details(
+            server_id=server_id,
+            status=status,
+            search=search,
+            limit=limit,
+            offset=offset,
+        )
+
+    async def count_installations(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+    ) -> int:
+        """Count installations matching the same filters, ignoring pagination."""
+        return await self.status_manager.count_installations(
+            server_id=server_id, status=status, search=search
+        )
+
+    async def get_server_images(
+        self, server_id: str | None = None, image: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Get images recorded as pulled, optionally for one server or image."""
+        if not self.image_store:
+            return []
+        entries = await self.image_store.list_images(server_id, image)
+        return [entry.to_dict() for entry in entries]
+
+    async def handle_docker_state_changed(self, agent_id: str, params: dict) -> None:
+        """Handle docker.state_changed notifications pushed by agents.
+
+        Args:
+            agent_id: Agent that sent the notification
+            params: Notification params with changed containers
+        """
+        info = None
+        if self.agent_manager:
+            info = self.agent_manager.get_connection_info(agent_id)
+        if not info or not info.get("server_id"):
+            logger.warning("Docker state from unknown agent", agent_id=agent_id)
+            return
+        await self.status_manager.apply_container_state(
+            info["server_id"], agent_id, params
+        )
+
+    async def handle_volume_progress(self, agent_id: str, params: dict) -> None:
+        """Handle system.volumes.progress notifications pushed by agents.
+
+        Args:
+            agent_id: Agent preparing the volumes
+            params: Notification params with the current path and counts
+        """
+        event = "Volumes prepared" if params.get("done") else "Preparing volumes"
+        logger.info(
+            event,
+            agent_id=agent_id,
+            path=params.get("path"),
+            volumes_done=params.get("volumes_done"),
+            volumes_total=params.get("volumes_total"),
+            scanned=params.get("scanned"),
+            changed=params.get("changed"),
+            failed=params.get("failed"),
+        )
 
     # -------------------------------------------------------------------------
     # Private Helpers
@@ -600,6 +711,49 @@ class DeploymentService(AgentRPCMixin, ContainerOpsMixin):
             else:
                 logger.info("Volume directories prepared successfully")
 
+    async def _ensure_image(self, server_id: str, image: str) -> dict[str, Any]:
+        """Pull an image unless a recent pull of it is still on the server.
+
+        Returns:
+            Pull result with ``present`` set when the pull was skipped
+        """
+        if await self._image_present(server_id, image):
+            logger.info("Image already present", image=image, server_id=server_id)
+            return {"success": True, "present": True}
+
+        logger.info("Pulling image via agent", image=image)
+        result = await self._agent_pull_image(server_id, image)
+        data = result.get("data") or {}
+        if result["success"] and self.image_store and data.get("id"):
+            try:
+                await self.image_store.record(
+                    server_id, image, data["id"], data.get("digest")
+                )
+            except Exception as e:
+                logger.warning("Failed to record pulled image", error=str(e))
+        return {**result, "present": False}
+
+    async def _image_present(self, server_id: str, image: str) -> bool:
+        """Check that a recorded recent pull of an image is still on the host."""
+        if not self.image_store:
+            return False
+        try:
+            entry = await self.image_store.get(server_id, image)
+        except Exception as e:
+            logger.warning("Image record lookup failed", error=str(e))
+            return False
+        if entry is None or entry.age_seconds() > IMAGE_REUSE_SECONDS:
+            return False
+
+        listed = await self._agent_list_images(server_id)
+        if not listed["success"]:
+            return False
+        if any(item.get("id") == entry.image_id for item in listed["data"] or []):
+            return True
+        # Removed from the host since it was pulled
+        await self.image_store.forget(server_id, image)
+        return False
+
     async def _cleanup_container(
         self, server_id: str, container_name: str, image: str = None
     ):
@@ -137,16 +137,7 @@ class AgentExecutor:
             force_agent=True,
         )
 
-        exit_code = (
-            result.exit_code
-            if result.exit_code is not None
-            else (0 if result.success else 1)
-        )
-
-        if result.success:
-            return (exit_code, result.output, "")
-        else:
-            return (exit_code, "", result.error or result.output)
+        return self._to_tuple(result)
 
     async def execute_with_progress(
         self,
@@ -155,19 +146,39 @@ class AgentExecutor:
         progress_callback=None,
         timeout: int = 600,
     ) -> tuple[int, str, str]:
-        """Execute command via agent (progress callback ignored).
-
-        Note: Progress streaming not yet implemented for agent.
-        Command executes normally, callback is not used.
+        """Execute command via agent, streaming output to the callback.
 
         Args:
             server_id: Target server ID.
             command: Command to execute.
-            progress_callback: Ignored (agent streaming not implemented).
+            progress_callback: Async callback for each stdout line.
             timeout: Command timeout in seconds.
 
         Returns:
             Tuple of (exit_code, stdout, stderr).
         """
-        # Agent doesn't support progress streaming yet - execute normally
-        return await self.execute(server_id, command, timeout)
+        if progress_callback is None:
+            return await self.execute(server_id, command, timeout)
+
+        result = await self.command_router.execute_with_progress(
+            server_id=server_id,
+            command=command,
+            progress_callback=progress_callback,
+            timeout=float(timeout),
+            force_agent=True,
+        )
+        return self._to_tuple(result)
+
+    @staticmethod
+    def _to_tuple(result) -> tuple[int, str, str]:
+        """Convert a CommandResult to (exit_code, stdout, stderr)."""
+        exit_code = (
+            result.exit_code
+            if result.exit_code is not None
+            else (0 if result.success else 1)
+        )
+
+        if result.success:
+            return (exit_code, result.output, "")
+        else:
+            return (exit_code, "", result.error or result.output)
@@ -4,7 +4,6 @@ Deployment Status
 Status queries, health checks, and installation status management.
 """
 
-import asyncio
 import json
 from typing import Any
 
@@ -14,11 +13,68 @@ from services.deployment.scripts import health_check_script
 
 logger = structlog.get_logger("deployment.status")
 
+# Installation statuses owned by Docker state; in-flight deploy states are not
+# overwritten by pushed container changes.
+SETTLED_STATUSES = ("running", "stopped", "error")
+
+
+def map_docker_status(docker_status: str) -> str:
+    """Map a Docker container state to an installation status."""
+    docker_status = (docker_status or "").lower()
+    if docker_status == "running":
+        return "running"
+    if docker_status == "exited":
+        return "stopped"
+    if docker_status == "restarting":
+        return "error"
+    if docker_status in ["created", "paused"]:
+        return "stopped"
+    return docker_status or "stopped"
+
+
+def split_mounts(
+    mounts: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Split mounts into named volumes and bind mounts.
+
+    Accepts both Docker inspect mounts (``Type``, ``Name``...) and the
+    lower-case mounts pushed by agents.
+    """
+    named_volumes = []
+    bind_mounts = []
+    for raw in mounts:
+        mount = {key.lower(): value for key, value in raw.items()}
+        mount_type = mount.get("type", "")
+        if mount_type == "volume":
+            named_volumes.append(
+                {
+                    "name": mount.get("name", ""),
+                    "destination": mount.get("destination", ""),
+                    "mode": mount.get("mode", "rw"),
+                }
+            )
+        elif mount_type == "bind":
+            bind_mounts.append(
+                {
+                    "source": mount.get("source", ""),
+                    "destination": mount.get("destination", ""),
+                    "mode": mount.get("mode", "rw"),
+                }
+            )
+    return named_volumes, bind_mounts
+
 
 class StatusManager:
     """Manages deployment status queries and health checks."""
 
-    def __init__(self, ssh_executor, db_service, server_service, marketplace_service):
+    def __init__(
+        self,
+        ssh_executor,
+        db_service,
+        server_service,
+        marketplace_service,
+        agent_manager=None,
+    ):
         """Initialize status manager.
 
         Args:
@@ -26,11 +82,112 @@ class StatusManager:
             db_service: Database service for installation records
             server_service: Server service for server info
             marketplace_service: Marketplace service for app info
+            agent_manager: Optional agent manager used to check that a
+                server's pushed Docker state feed is still connected
         """
         self.ssh = ssh_executor
         self.db_service = db_service
         self.server_service = server_service
         self.marketplace_service = marketplace_service
+        self.agent_manager = agent_manager
+        # server_id -> agent_id of agents pushing docker.state_changed while
+        # in sync with their Docker daemon
+        self._state_feeds: dict[str, str] = {}
+
+    def has_live_state_feed(self, server_id: str) -> bool:
+        """Check whether a connected, in-sync agent pushes Docker state for a server.
+
+        A feed is dropped when its agent disconnects or reports that it lost
+        sync with the Docker daemon, until the agent pushes a new snapshot.
+        """
+        agent_id = self._state_feeds.get(server_id)
+        if not agent_id or not self.agent_manager:
+            return False
+        if self.agent_manager.is_connected(agent_id):
+            return True
+        self._state_feeds.pop(server_id, None)
+        return False
+
+    async def apply_container_state(
+        self, server_id: str, agent_id: str, params: dict[str, Any]
+    ) -> int:
+        """Apply a pushed docker.state_changed notification to installations.
+
+        Args:
+            server_id: Server the agent runs on
+            agent_id: Agent that pushed the changes
+            params: Notification params (``live``, ``full``, ``as_of``,
+                ``containers``)
+
+        Returns:
+            Number of installations updated
+        """
+        # Agents without the flag only push while in sync
+        if not params.get("live", True):
+            self._state_feeds.pop(server_id, None)
+            logger.info(
+                "Pushed Docker state out of sync",
+                server_id=server_id,
+                agent_id=agent_id,
+            )
+            return 0
+        self._state_feeds[server_id] = agent_id
+        changes = params.get("containers") or []
+        by_name = {c.get("name"): c for c in changes if c.get("name")}
+        by_id = {c.get("id"): c for c in changes if c.get("id")}
+        full = bool(params.get("full"))
+
+        try:
+            installations = await self.db_service.get_installations(server_id)
+        except Exception as e:
+            logger.error("Apply container state failed", error=str(e))
+            return 0
+
+        updated = 0
+        for inst in installations:
+            current = inst.status
+            if hasattr(current, "value"):
+                current = current.value
+            if current not in SETTLED_STATUSES or not inst.container_name:
+                continue
+
+            change = by_name.get(inst.container_name) or (
+                by_id.get(inst.container_id) if inst.container_id else None
+            )
+            if change is None:
+                if not full:
+                    continue
+                # Absent from a full snapshot: the container no longer exists
+                change = {"removed": True}
+
+            if change.get("removed"):
+                fields = {"status": "stopped"}
+            else:
+                named_volumes, bind_mounts = split_mounts(change.get("mounts") or [])
+                fields = {
+                    "status": map_docker_status(change.get("status", "")),
+                    "networks": json.dumps(change.get("networks") or []),
+                    "named_volumes": json.dumps(named_volumes),
+                    "bind_mounts": json.dumps(bind_mounts),
+                }
+
+            try:
+                await self.db_service.update_installation(inst.id, **fields)
+                updated += 1
+            except Exception as e:
+                logger.error(
+                    "Apply container state failed",
+                    error=str(e),
+                    install_id=inst.id,
+                )
+
+        logger.debug(
+            "Applied pushed container state",
+            server_id=server_id,
+            changes=len(changes),
+            updated=updated,
+        )
+        return updated
 
     async def get_app_status(
         self, server_id: str, app_id: str
@@ -133,101 +290,64 @@ class StatusManager:
             logger.error("Get installation status failed", error=str(e))
             return None
 
-    async def get_all_installations_with_details(self) -> list[dict[str, Any]]:
-        """Get all installations with server and app details.
+    async def get_all_installations_with_details(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Get installations with server and app details.
+
+        Reads from database only - no Docker calls. Server, app and repo
+        fields come from a single joined query.
 
-        Reads from database only - no Docker calls.
+        Args:
+            server_id: Only installations on this server
+            status: Only installations with this status
+            search: Match on app, server or container name
+            limit: Maximum installations to return (all when None)
+            offset: Installations to skip, for pagination
 
         Returns:
             List of detailed installation dicts
         """
         try:
-            installations = await self.db_service.get_all_installations()
-            if not installations:
-                return []
-
-            # Pre-fetch all unique servers and apps in parallel
-            server_ids = list(set(inst.server_id for inst in installations))
-            app_ids = list(set(inst.app_id for inst in installations))
-
-            server_tasks = [self.server_service.get_server(sid) for sid in server_ids]
-            app_tasks = [self.marketplace_service.get_app(aid) for aid in app_ids]
-
-            servers_list, apps_list = await asyncio.gather(
-                asyncio.gather(*server_tasks), asyncio.gather(*app_tasks)
-            )
-
-            servers_map = {sid: server for sid, server in zip(server_ids, servers_list, strict=True)}
-            apps_map = {aid: app for aid, app in zip(app_ids, apps_list, strict=True)}
-
-            # Pre-fetch repo info
-            repo_ids = list(
-                set(
-                    app.repo_id
-                    for app in apps_map.values()
-                    if app and hasattr(app, "repo_id") and app.repo_id
-                )
+            return await self.db_service.get_installation_details(
+                server_id=server_id,
+                status=status,
+                search=search,
+                limit=limit,
+                offset=offset,
             )
-            if repo_ids:
-                repo_tasks = [
-                    self.marketplace_service.get_repo(rid) for rid in repo_ids
-                ]
-                repos_list = await asyncio.gather(*repo_tasks)
-                repos_map = {rid: repo for rid, repo in zip(repo_ids, repos_list, strict=True)}
-            else:
-                repos_map = {}
-
-            # Build result list
-            result = []
-            for inst in installations:
-                server = servers_map.get(inst.server_id)
-                app = apps_map.get(inst.app_id)
+        except Exception as e:
+            logger.error("Get all installations with details failed", error=str(e))
+            return []
 
-                app_source = "Unknown"
-                if app and hasattr(app, "repo_id") and app.repo_id:
-                    repo = repos_map.get(app.repo_id)
-                    app_source = repo.name if repo else "Unknown"
+    async def count_installations(
+        self,
+        server_id: str | None = None,
+        status: str | None = None,
+        search: str | None = None,
+    ) -> int:
+        """Count installations matching the get_all_installations_with_details filters.
 
-                config = inst.config or {}
-                status = inst.status
-                if hasattr(status, "value"):
-                    status = status.value
-                else:
-                    status = str(status)
-
-                result.append(
-                    {
-                        "id": inst.id,
-                        "app_id": inst.app_id,
-                        "app_name": app.name if app else inst.app_id,
-                        "app_icon": app.icon if app else None,
-                        "app_version": app.version if app else "Unknown",
-                        "app_description": app.description if app else "",
-                        "app_category": app.category if app else "Unknown",
-                        "app_source": app_source,
-                        "server_id": inst.server_id,
-                        "server_name": server.name if server else "Unknown",
-                        "server_host": server.host if server else "",
-                        "container_id": inst.container_id,
-                        "container_name": inst.container_name,
-                        "status": status,
-                        "ports": config.get("ports", {}),
-                        "env": config.get("env", {}),
-                        "volumes": config.get("volumes", {}),
-                        "networks": inst.networks or [],
-                        "named_volumes": inst.named_volumes or [],
-                        "bind_mounts": inst.bind_mounts or [],
-                        "installed_at": inst.installed_at,
-                        "started_at": inst.started_at,
-                        "error_message": inst.error_message,
-                    }
-                )
-
-            return result
+        Args:
+            server_id: Only installations on this server
+            status: Only installations with this status
+            search: Match on app, server or container name
 
+        Returns:
+            Number of matching installations
+        """
+        try:
+            return await self.db_service.count_installation_details(
+                server_id=server_id, status=status, search=search
+            )
         except Exception as e:
-            logger.error("Get all installations with details failed", error=str(e))
-            return []
+            logger.error("Count installations failed", error=str(e))
+            return 0
 
     async def refresh_installation_status(
         self, install_id: str
@@ -264,43 +384,12 @@ class StatusManager:
 
             info = container_info[0]
 
-            # Get status
-            docker_status = info.get("State", {}).get("Status", "").lower()
-            if docker_status == "running":
-                new_status = "running"
-            elif docker_status == "exited":
-                new_status = "stopped"
-            elif docker_status == "restarting":
-                new_status = "error"
-            elif docker_status in ["created", "paused"]:
-                new_status = "stopped"
-            else:
-                new_status = docker_status or "stopped"
+            new_status = map_docker_status(info.get("State", {}).get("Status", ""))
 
             # Get networks and mounts
             network_settings = info.get("NetworkSettings", {}).get("Networks", {})
             networks = list(network_settings.keys())
-
-            named_volumes = []
-            bind_mounts = []
-            for mount in info.get("Mounts", []):
-                mount_type = mount.get("Type", "")
-                if mount_type == "volume":
-                    named_volumes.append(
-                        {
-                            "name": mount.get("Name", ""),
-                            "destination": mount.get("Destination", ""),
-                            "mode": mount.get("Mode", "rw"),
-                        }
-                    )
-                elif mount_type == "bind":
-                    bind_mounts.append(
-                        {
-                            "source": mount.get("Source", ""),
-                            "destination": mount.get("Destination", ""),
-                            "mode": mount.get("Mode", "rw"),
-                        }
-                    )
+            named_volumes, bind_mounts = split_mounts(info.get("Mounts", []))
 
             # Update database
             await self.db_service.update_installation(
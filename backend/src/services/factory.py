@@ -8,23 +8,27 @@ import structlog
 from services.activity_service import ActivityService
 from services.agent_lifecycle import AgentLifecycleManager
 from services.agent_manager import AgentManager
+from services.agent_routing import IPC_DIRECTORY_NAME, AgentRouter
 from services.agent_service import AgentService
 from services.agent_websocket import AgentWebSocketHandler
 from services.app_service import AppService
 from services.auth_service import AuthService
+from services.backend_telemetry import BackendTelemetry
 from services.backup_service import BackupService
 from services.command_router import CommandRouter
 from services.csrf_service import CSRFService
 from services.dashboard_service import DashboardService
 from services.database import AgentDatabaseService, DatabaseConnection
 from services.database_service import DatabaseService
-from services.deployment import DeploymentService
+from services.deployment import DeploymentQueue, DeploymentService
+from services.deployment.images import ServerImageStore
 from services.deployment.ssh_executor import AgentExecutor
 from services.marketplace_service import MarketplaceService
 from services.metrics_service import MetricsService
 from services.monitoring_service import MonitoringService
 from services.notification_service import NotificationService
 from services.rate_limit_service import RateLimitService
+from services.retention_engine import RetentionEngine
 from services.retention_service import RetentionService
 from services.server_service import ServerService
 from services.service_log import LogService
@@ -60,23 +64,18 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
     rate_limit_service = RateLimitService(db_service=database_service)
     csrf_service = CSRFService(db_service=database_service)
     ssh_service = SSHService()
-    monitoring_service = MonitoringService(log_service=log_service)
     server_service = ServerService(db_service=database_service)
     settings_service = SettingsService(db_service=database_service)
     marketplace_service = MarketplaceService(connection=db_connection)
     backup_service = BackupService(db_service=database_service)
     activity_service = ActivityService(db_service=database_service)
     notification_service = NotificationService(db_service=database_service)
+    retention_engine = RetentionEngine(db_service=database_service)
     retention_service = RetentionService(
         db_service=database_service,
         auth_service=auth_service,
         log_service=log_service,
-    )
-
-    metrics_service = MetricsService(
-        ssh_service=ssh_service,
-        db_service=database_service,
-        server_service=server_service,
+        retention_engine=retention_engine,
     )
 
     # Agent services for WebSocket-based agent communication
@@ -90,13 +89,36 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
     # Lifecycle manager for health monitoring and updates
     agent_lifecycle = AgentLifecycleManager(agent_db=agent_db_service)
 
+    # Shares agent connections between workers when there are several
+    agent_router = None
+    if config.get("workers", 1) > 1:
+        agent_router = AgentRouter(db_connection, data_directory / IPC_DIRECTORY_NAME)
+
     # Agent manager with lifecycle integration
     agent_manager = AgentManager(
         agent_db=agent_db_service,
         lifecycle_manager=agent_lifecycle,
+        router=agent_router,
     )
     agent_websocket_handler = AgentWebSocketHandler(agent_service, agent_manager)
 
+    metrics_service = MetricsService(
+        ssh_service=ssh_service,
+        db_service=database_service,
+        server_service=server_service,
+        agent_manager=agent_manager,
+    )
+    # Agents push per-interval stats for all their running containers
+    agent_manager.register_notification_handler(
+        "docker.stats.batch", metrics_service.handle_stats_batch
+    )
+
+    # Backend self-telemetry for system metrics and health checks
+    monitoring_service = MonitoringService(
+        log_service=log_service,
+        telemetry=BackendTelemetry(db_connection, agent_manager),
+    )
+
     # Command router for agent-first execution with SSH fallback
     command_router = CommandRouter(
         agent_service=agent_service,
@@ -105,6 +127,9 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
         ssh_service=ssh_service,
         prefer_agent=True,
     )
+    agent_manager.register_notification_handler(
+        "system.exec.output", command_router.handle_exec_output
+    )
 
     # Agent executor for deployment (agent-only, no SSH fallback)
     agent_executor = AgentExecutor(command_router)
@@ -119,6 +144,42 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
         executor=agent_executor,
         agent_manager=agent_manager,
         agent_service=agent_service,
+        image_store=ServerImageStore(db_connection),
+        worker_id=agent_router.worker_id if agent_router else None,
+    )
+    # Agents push container changes from their Docker events stream
+    agent_manager.register_notification_handler(
+        "docker.state_changed", deployment_service.handle_docker_state_changed
+    )
+    agent_manager.register_notification_handler(
+        "docker.logs.chunk", deployment_service.log_streams.handle_chunk
+    )
+    agent_manager.register_notification_handler(
+        "system.volumes.progress", deployment_service.handle_volume_progress
+    )
+
+    if agent_router:
+        # Log buffers stay with the worker an agent streams to; reads and
+        # cache invalidations reach the other workers over the router
+        deployment_service.log_streams.share(agent_router)
+        app_service.set_invalidation_listener(
+            agent_router.share_cache("app_search", app_service.clear_search_cache)
+        )
+        marketplace_service.set_invalidation_listener(
+            agent_router.share_cache(
+                "marketplace_stats", marketplace_service.clear_stats_cache
+            )
+        )
+
+    # Persistent job queue for background installs and removals
+    deployment_queue = DeploymentQueue(
+        db_connection,
+        deployment_service,
+        app_service=app_service,
+        concurrency=config.get("deploy_concurrency", 8),
+        concurrency_per_server=config.get("deploy_concurrency_per_server", 2),
+        prepull_concurrency=config.get("prepull_concurrency", 2),
+        router=agent_router,
     )
 
     dashboard_service = DashboardService(
@@ -128,7 +189,7 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
         activity_service=activity_service,
     )
 
-    logger.info("All services created", service_count=24)
+    logger.info("All services created", service_count=25)
 
     return {
         "config": config,
@@ -148,11 +209,14 @@ def create_services(data_directory: Path, config: dict[str, Any]) -> dict[str, A
         "activity_service": activity_service,
         "notification_service": notification_service,
         "retention_service": retention_service,
+        "retention_engine": retention_engine,
         "deployment_service": deployment_service,
+        "deployment_queue": deployment_queue,
         "metrics_service": metrics_service,
         "dashboard_service": dashboard_service,
         "agent_service": agent_service,
         "agent_manager": agent_manager,
+        "agent_router": agent_router,
         "agent_lifecycle": agent_lifecycle,
         "agent_websocket_handler": agent_websocket_handler,
         "command_router": command_router,
@@ -5,5 +5,12 @@ Common helper functions shared across services.
 """
 
 from services.helpers.ssh_helpers import connect_key, connect_password, get_system_info
+from services.helpers.ssh_stream import CommandStream, LineSplitter
 
-__all__ = ["connect_password", "connect_key", "get_system_info"]
+__all__ = [
+    "connect_password",
+    "connect_key",
+    "get_system_info",
+    "CommandStream",
+    "LineSplitter",
+]
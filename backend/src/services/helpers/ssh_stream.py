@@ -0,0 +1,180 @@
+"""
+SSH Command Output Streaming
+
+Moves the output of a remote command from paramiko's blocking channel into
+the event loop. A reader thread blocks in recv() and wakes as soon as data
+arrives, coalesces whatever else is already buffered into one batch of
+complete lines, and hands the batch to a bounded asyncio queue. When the
+consumer falls behind, the queue fills and the reader stops draining the
+channel, so SSH flow control throttles the remote command.
+"""
+
+import asyncio
+import codecs
+import re
+from typing import Any
+
+import paramiko
+import structlog
+
+logger = structlog.get_logger("ssh_stream")
+
+CHUNK_SIZE = 32 * 1024
+MAX_BATCH_BYTES = 256 * 1024
+MAX_QUEUED_BATCHES = 64
+
+# Both \n and \r end a line so progress bars redrawn with a carriage
+# return produce one line per update
+_LINE_BREAK = re.compile(r"[\r\n]+")
+_DONE = object()
+
+
+class LineSplitter:
+    """Incrementally split raw command output into non-blank lines."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes) -> list[str]:
+        """Return the lines completed by data; a trailing partial line is kept."""
+        parts = _LINE_BREAK.split(self._partial + self._decoder.decode(data))
+        self._partial = parts.pop()
+        return [line for line in parts if line.strip()]
+
+    def flush(self) -> list[str]:
+        """Return the trailing partial line once the output has ended."""
+        rest = (self._partial + self._decoder.decode(b"", final=True)).strip()
+        self._partial = ""
+        return [rest] if rest else []
+
+
+class CommandStream:
+    """Async iterator over batches of output lines from a remote command.
+
+    Usage:
+        stream = await CommandStream.start(client, "apt-get install -y ...")
+        async with stream:
+            async for lines in stream:
+                ...
+        stream.exit_status, stream.stderr
+
+    ``exit_status`` and ``stderr`` are set once iteration has finished.
+    Leaving the ``async with`` block early closes the channel.
+    """
+
+    def __init__(
+        self,
+        channel: paramiko.Channel,
+        stderr: Any,
+        timeout: float | None = None,
+        max_queued_batches: int = MAX_QUEUED_BATCHES,
+    ):
+        self._channel = channel
+        self._stderr = stderr
+        self._timeout = timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_batches)
+        self._loop = asyncio.get_running_loop()
+        self._reader: asyncio.Future | None = None
+        self._closed = False
+        self._finished = False
+        self.exit_status: int | None = None
+        self.stderr = ""
+
+    @classmethod
+    async def start(
+        cls,
+        client: paramiko.SSHClient,
+        command: str,
+        timeout: float | None = None,
+        max_queued_batches: int = MAX_QUEUED_BATCHES,
+    ) -> "CommandStream":
+        """Execute command on client and start streaming its stdout.
+
+        Args:
+            client: Connected SSH client.
+            command: Command to execute.
+            timeout: Seconds without any output before the command fails.
+            max_queued_batches: Batches buffered before the reader pauses.
+        """
+        _, stdout, stderr = await asyncio.to_thread(
+            client.exec_command, command, timeout=timeout
+        )
+        stream = cls(stdout.channel, stderr, timeout, max_queued_batches)
+        stream._reader = stream._loop.run_in_executor(None, stream._read)
+        return stream
+
+    def _read(self) -> None:
+        """Reader thread: pump channel output into the queue."""
+        splitter = LineSplitter()
+        try:
+            while True:
+                try:
+                    data = self._recv_batch()
+                except TimeoutError as e:
+                    raise TimeoutError(
+                        f"No output received for {self._timeout} seconds"
+                    ) from e
+                if not data or self._closed:
+                    break
+                lines = splitter.feed(data)
+                if lines and not self._put(lines):
+                    return
+            lines = splitter.flush()
+            if self._closed or (lines and not self._put(lines)):
+                return
+            self.exit_status = self._channel.recv_exit_status()
+            self.stderr = self._stderr.read().decode("utf-8", errors="replace")
+        finally:
+            self._put(_DONE)
+
+    def _recv_batch(self) -> bytes:
+        """Block for the next chunk, then take whatever else is buffered."""
+        chunks = [self._channel.recv(CHUNK_SIZE)]
+        size = len(chunks[0])
+        while size and size < MAX_BATCH_BYTES and self._channel.recv_ready():
+            chunk = self._channel.recv(CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks)
+
+    def _put(self, item: Any) -> bool:
+        """Queue an item from the reader thread, waiting while the queue is full."""
+        if self._closed:
+            return False
+        asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop).result()
+        return True
+
+    def __aiter__(self) -> "CommandStream":
+        return self
+
+    async def __anext__(self) -> list[str]:
+        if self._finished:
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _DONE:
+            self._finished = True
+            # Surface reader errors such as timeouts to the consumer
+            await self._reader
+            raise StopAsyncIteration
+        return item
+
+    async def __aenter__(self) -> "CommandStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop reading and close the channel if the command is still running."""
+        if self._reader is None or self._reader.done():
+            return
+        self._closed = True
+        self._channel.close()
+        # Unblock a reader waiting on a full queue
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        await asyncio.gather(self._reader, return_exceptions=True)
+        logger.debug("SSH command stream closed early")
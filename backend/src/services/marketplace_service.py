@@ -1,13 +1,22 @@
 """Marketplace Service.
 
-Provides data access and business logic for marketplace repository management."""
+Provides data access and business logic for marketplace repository management.
+
+Marketplace statistics come from aggregate queries and are cached until a
+repository is added, synced, toggled or removed or an app is rated; with
+several workers the change is announced so every worker drops its copy. Apps
+keep a running sum and count of their ratings, so rating an app updates
+its average without reading every rating back.
+"""
 
 from __future__ import annotations
 
 import json
 import uuid
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 import structlog
 
@@ -42,8 +51,27 @@ class MarketplaceService:
     def __init__(self, connection: DatabaseConnection) -> None:
         self._conn = connection
         self._initialized = False
+        self._stats: dict[str, Any] | None = None
+        # Bumped on every change so a stale computation is not cached
+        self._stats_generation = 0
+        self._on_invalidate: Callable[[], None] | None = None
         logger.info("Marketplace service initialized")
 
+    def set_invalidation_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener whenever the statistics change, e.g. to tell peers."""
+        self._on_invalidate = listener
+
+    def clear_stats_cache(self) -> None:
+        """Drop this process's cached statistics."""
+        self._stats = None
+        self._stats_generation += 1
+
+    def _invalidate_stats(self) -> None:
+        """Drop cached statistics after repositories, apps or ratings change."""
+        self.clear_stats_cache()
+        if self._on_invalidate:
+            self._on_invalidate()
+
     async def _ensure_initialized(self) -> None:
         """Ensure the marketplace database is initialized with official repos."""
         if not self._initialized:
@@ -144,6 +172,7 @@ class MarketplaceService:
             )
             row = await cursor.fetchone()
 
+        self._invalidate_stats()
         repo = self._repo_from_row(row)
         logger.info(
             "Repository added",
@@ -212,6 +241,7 @@ class MarketplaceService:
             deleted = cursor.rowcount > 0
             await conn.commit()
 
+        self._invalidate_stats()
         if deleted:
             logger.info("Repository removed", repo_id=repo_id)
         else:
@@ -232,6 +262,7 @@ class MarketplaceService:
             updated = cursor.rowcount > 0
             await conn.commit()
 
+        self._invalidate_stats()
         if updated:
             action = "enabled" if enabled else "disabled"
             logger.info(f"Repository {action}", repo_id=repo_id)
@@ -317,6 +348,7 @@ class MarketplaceService:
             raise
 
         finally:
+            self._invalidate_stats()
             if not local_path:
                 git_sync.cleanup()
 
@@ -493,19 +525,73 @@ class MarketplaceService:
         await self._ensure_initialized()
 
         async with self._conn.get_connection() as conn:
-            cursor = await conn.execute("SELECT category FROM marketplace_apps")
+            cursor = await conn.execute(
+                """SELECT category, COUNT(*) AS count FROM marketplace_apps
+                   GROUP BY category ORDER BY category"""
+            )
             rows = await cursor.fetchall()
 
-        category_counts: dict = {}
-        for row in rows:
-            cat = row["category"]
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-
         return [
-            {"id": cat, "name": cat.title(), "count": count}
-            for cat, count in sorted(category_counts.items())
+            {
+                "id": row["category"],
+                "name": row["category"].title(),
+                "count": row["count"],
+            }
+            for row in rows
         ]
 
+    async def get_stats(self) -> dict[str, Any]:
+        """Get repository, app, rating and category statistics.
+
+        App and rating figures cover enabled repositories; categories
+        cover every app, as in get_categories.
+        """
+        await self._ensure_initialized()
+
+        if self._stats is not None:
+            return dict(self._stats)
+        generation = self._stats_generation
+
+        async with self._conn.get_connection() as conn:
+            cursor = await conn.execute(
+                """SELECT COUNT(*) AS total_repos,
+                          COALESCE(SUM(enabled), 0) AS enabled_repos,
+                          COALESCE(SUM(last_synced IS NOT NULL), 0) AS synced_repos
+                   FROM marketplace_repos"""
+            )
+            repos = await cursor.fetchone()
+            cursor = await conn.execute(
+                """SELECT COUNT(*) AS total_apps,
+                          COALESCE(SUM(a.featured), 0) AS featured_apps,
+                          COALESCE(SUM(a.rating_count), 0) AS total_ratings,
+                          COALESCE(SUM(a.rating_sum), 0) AS rating_sum,
+                          COALESCE(SUM(a.rating_count > 0), 0) AS rated_apps
+                   FROM marketplace_apps a
+                   JOIN marketplace_repos r ON a.repo_id = r.id
+                   WHERE r.enabled = 1"""
+            )
+            apps = await cursor.fetchone()
+        categories = await self.get_categories()
+
+        total_ratings = apps["total_ratings"]
+        stats = {
+            "total_repos": repos["total_repos"],
+            "enabled_repos": repos["enabled_repos"],
+            "synced_repos": repos["synced_repos"],
+            "total_apps": apps["total_apps"],
+            "featured_apps": apps["featured_apps"],
+            "categories": categories,
+            "category_count": len(categories),
+            "total_ratings": total_ratings,
+            "avg_rating": (
+                round(apps["rating_sum"] / total_ratings, 2) if total_ratings else 0.0
+            ),
+            "rated_apps": apps["rated_apps"],
+        }
+        if generation == self._stats_generation:
+            self._stats = stats
+        return dict(stats)
+
     # ─────────────────────────────────────────────────────────────
     # Ratings
     # ─────────────────────────────────────────────────────────────
@@ -523,17 +609,26 @@ class MarketplaceService:
         async with self._conn.get_connection() as conn:
             # Check for existing rating
             cursor = await conn.execute(
-                "SELECT id FROM app_ratings WHERE app_id = ? AND user_id = ?",
+                "SELECT id, rating FROM app_ratings WHERE app_id = ? AND user_id = ?",
                 (app_id, user_id),
             )
             existing = await cursor.fetchone()
 
+            # SET expressions see the row before the update
             if existing:
                 rating_id = existing["id"]
                 await conn.execute(
                     "UPDATE app_ratings SET rating = ?, updated_at = ? WHERE id = ?",
                     (rating, now, rating_id),
                 )
+                change = rating - existing["rating"]
+                await conn.execute(
+                    """UPDATE marketplace_apps SET
+                       rating_sum = rating_sum + ?,
+                       avg_rating = CAST(rating_sum + ? AS REAL) / rating_count
+                       WHERE id = ?""",
+                    (change, change, app_id),
+                )
             else:
                 await conn.execute(
                     """INSERT INTO app_ratings
@@ -541,22 +636,18 @@ class MarketplaceService:
                        VALUES (?, ?, ?, ?, ?, ?)""",
                     (rating_id, app_id, user_id, rating, now, now),
                 )
+                await conn.execute(
+                    """UPDATE marketplace_apps SET
+                       rating_sum = rating_sum + ?,
+                       rating_count = rating_count + 1,
+                       avg_rating = CAST(rating_sum + ? AS REAL) / (rating_count + 1)
+                       WHERE id = ?""",
+                    (rating, rating, app_id),
+                )
 
             await conn.commit()
 
-            # Update app's average rating
-            cursor = await conn.execute(
-                "SELECT rating FROM app_ratings WHERE app_id = ?", (app_id,)
-            )
-            all_ratings = [r["rating"] for r in await cursor.fetchall()]
-            avg_rating = sum(all_ratings) / len(all_ratings) if all_ratings else None
-
-            await conn.execute(
-                "UPDATE marketplace_apps SET avg_rating = ?, rating_count = ? WHERE id = ?",
-                (avg_rating, len(all_ratings), app_id),
-            )
-            await conn.commit()
-
+        self._invalidate_stats()
         logger.info("App rated", app_id=app_id, user_id=user_id, rating=rating)
 
         return AppRating(
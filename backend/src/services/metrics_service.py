@@ -1,7 +1,8 @@
 """
 Metrics Collection Service
 
-Collects server and container metrics via SSH.
+Collects server and container metrics via SSH. Agents push container stats
+on their own as ``docker.stats.batch`` notifications.
 """
 
 import re
@@ -12,6 +13,7 @@ from typing import Any
 import structlog
 
 from models.metrics import ContainerMetrics, ServerMetrics
+from services.database import MetricSeries
 
 logger = structlog.get_logger("metrics_service")
 
@@ -23,16 +25,20 @@ PERIOD_MAP = {
     "7d": timedelta(days=7),
     "30d": timedelta(days=30),
 }
+# Points in a chart series unless the caller asks for another count
+DEFAULT_SERIES_POINTS = 500
+BYTES_PER_MB = 1024 * 1024
 
 
 class MetricsService:
     """Service for collecting and managing metrics."""
 
-    def __init__(self, ssh_service, db_service, server_service):
+    def __init__(self, ssh_service, db_service, server_service, agent_manager=None):
         """Initialize metrics service."""
         self.ssh_service = ssh_service
         self.db_service = db_service
         self.server_service = server_service
+        self.agent_manager = agent_manager
         logger.info("Metrics service initialized")
 
     def _parse_cpu_percent(self, output: str) -> float:
@@ -213,6 +219,50 @@ class MetricsService:
             logger.error("Failed to collect container metrics", error=str(e))
             return []
 
+    async def handle_stats_batch(self, agent_id: str, params: dict) -> None:
+        """Handle docker.stats.batch notifications pushed by agents.
+
+        Every container in the batch is stored as one container_metrics
+        sample, all in a single transaction.
+
+        Args:
+            agent_id: Agent that sent the batch
+            params: Notification params with the per-container figures
+        """
+        info = None
+        if self.agent_manager:
+            info = self.agent_manager.get_connection_info(agent_id)
+        if not info or not info.get("server_id"):
+            logger.warning("Container stats from unknown agent", agent_id=agent_id)
+            return
+
+        try:
+            sent_at = params.get("timestamp")
+            timestamp = (
+                datetime.fromtimestamp(sent_at, UTC) if sent_at else datetime.now(UTC)
+            ).isoformat()
+            metrics = [
+                ContainerMetrics(
+                    id=f"cm-{uuid.uuid4().hex[:8]}",
+                    server_id=info["server_id"],
+                    container_id=c["id"],
+                    container_name=c["name"],
+                    cpu_percent=c.get("cpu", 0.0),
+                    memory_usage_mb=c.get("mem", 0) // BYTES_PER_MB,
+                    memory_limit_mb=c.get("mem_limit", 0) // BYTES_PER_MB,
+                    network_rx_bytes=c.get("net_rx", 0),
+                    network_tx_bytes=c.get("net_tx", 0),
+                    status="running",
+                    timestamp=timestamp,
+                )
+                for c in params.get("containers", [])
+            ]
+            await self.db_service.save_container_metrics_batch(metrics)
+        except Exception as e:
+            logger.error(
+                "Failed to store container stats", agent_id=agent_id, error=str(e)
+            )
+
     async def get_server_metrics(
         self, server_id: str, period: str = "24h"
     ) -> list[ServerMetrics]:
@@ -244,3 +294,51 @@ class MetricsService:
         except Exception as e:
             logger.error("Failed to get container metrics", error=str(e))
             return []
+
+    async def get_server_metric_series(
+        self,
+        server_id: str,
+        period: str = "24h",
+        fields: list[str] | None = None,
+        max_points: int = DEFAULT_SERIES_POINTS,
+        delta: bool = False,
+    ) -> MetricSeries:
+        """Get a server's metrics for a period as chart arrays.
+
+        Raises:
+            ValueError: If a field is unknown or max_points is below 1.
+        """
+        window = PERIOD_MAP.get(period, timedelta(hours=24))
+        since = datetime.now(UTC) - window
+        return await self.db_service.get_server_metric_series(
+            server_id=server_id,
+            since=since.isoformat(),
+            fields=fields,
+            max_points=max_points,
+            delta=delta,
+        )
+
+    async def get_container_metric_series(
+        self,
+        server_id: str,
+        container_name: str,
+        period: str = "24h",
+        fields: list[str] | None = None,
+        max_points: int = DEFAULT_SERIES_POINTS,
+        delta: bool = False,
+    ) -> MetricSeries:
+        """Get a container's metrics for a period as chart arrays.
+
+        Raises:
+            ValueError: If a field is unknown or max_points is below 1.
+        """
+        window = PERIOD_MAP.get(period, timedelta(hours=24))
+        since = datetime.now(UTC) - window
+        return await self.db_service.get_container_metric_series(
+            server_id=server_id,
+            container_name=container_name,
+            since=since.isoformat(),
+            fields=fields,
+            max_points=max_points,
+            delta=delta,
+        )
@@ -1,7 +1,7 @@
 """
 Monitoring Service
 
-Handles metrics collection and log management for system monitoring.
+Handles backend self-telemetry and log management for system monitoring.
 Provides data access layer for monitoring operations.
 """
 
@@ -11,39 +11,38 @@ from typing import Any
 import structlog
 
 from models.log import LogEntry, LogFilter
+from services.backend_telemetry import BackendTelemetry
 from services.service_log import LogService
 
 logger = structlog.get_logger("monitoring_service")
 
 
 class MonitoringService:
-    """Service for managing system metrics and logs."""
-
-    def __init__(self, log_service: LogService | None = None):
-        """Initialize monitoring service with storage."""
+    """Service for backend metrics and logs."""
+
+    def __init__(
+        self,
+        log_service: LogService | None = None,
+        telemetry: BackendTelemetry | None = None,
+    ):
+        """Initialize monitoring service.
+
+        Args:
+            log_service: Log storage.
+            telemetry: Backend self-telemetry collector. A collector without
+                database or agent figures is created when omitted.
+        """
         self._log_service = log_service
-        self.metrics_cache: dict[str, Any] = {}
+        self.telemetry = telemetry or BackendTelemetry()
         logger.info("Monitoring service initialized")
 
-        # Initialize with sample data
-        self._initialize_sample_data()
-
-    def _initialize_sample_data(self):
-        """Initialize with sample metrics and logs."""
-        self._initialize_metrics()
-        # Note: _initialize_logs() will be called async during first log request
-
-    def _initialize_metrics(self):
-        """Initialize sample system metrics in frontend-compatible format."""
-        self.metrics_cache = {
-            "cpu": {"usage": 45.2, "cores": 8, "temperature": 65.5},
-            "memory": {"used": 6.8, "total": 16.0, "percentage": 42.5},
-            "disk": {"used": 125.3, "total": 500.0, "percentage": 25.1},
-            "network": {"inbound": 1024000, "outbound": 2048000, "connections": 24},
-            "uptime": 86400,  # 1 day in seconds
-            "processes": 127,
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
+    async def start(self) -> None:
+        """Start collecting backend telemetry."""
+        await self.telemetry.start()
+
+    async def stop(self) -> None:
+        """Stop collecting backend telemetry."""
+        await self.telemetry.stop()
 
     async def _initialize_logs(self):
         """Initialize sample log entries in database."""
@@ -162,11 +161,22 @@ class MonitoringService:
         except Exception as e:
             logger.warning("Failed to initialize sample logs", error=str(e))
 
-    def get_current_metrics(self) -> dict[str, Any]:
-        """Get current system metrics."""
-        # Update timestamp for real-time feeling
-        self.metrics_cache["timestamp"] = datetime.now(UTC).isoformat()
-        return self.metrics_cache
+    def get_current_metrics(self, include_history: bool = False) -> dict[str, Any]:
+        """Get the backend's current resource use.
+
+        Args:
+            include_history: Also return the recorded samples as one array
+                per field, oldest first.
+        """
+        metrics = self.telemetry.sample().to_dict()
+        metrics["collector_running"] = self.telemetry.running
+        if include_history:
+            metrics["history"] = self.telemetry.history_series()
+        return metrics
+
+    async def check_health(self) -> dict[str, Any]:
+        """Grade the backend's components for a detailed health check."""
+        return await self.telemetry.check_health()
 
     async def get_filtered_logs(
         self, filters: dict[str, Any] | None = None
@@ -6,7 +6,6 @@ Checks passwords against common password lists, patterns, and context-specific w
 Optionally integrates with Have I Been Pwned API using k-Anonymity.
 """
 
-import gzip
 import hashlib
 import re
 from pathlib import Path
@@ -15,6 +14,14 @@ from typing import Any
 import httpx
 import structlog
 
+from lib.password_blocklist import (
+    BLOCKLIST_MAGIC,
+    DEFAULT_INDEX,
+    DEFAULT_SOURCE,
+    CompactBlocklist,
+    compile_blocklist,
+)
+
 logger = structlog.get_logger("password_blocklist")
 
 # Pattern definitions
@@ -99,32 +106,43 @@ class PasswordBlocklistService:
         context_words_path: Path | None = None,
         enable_hibp: bool = False,
     ):
-        self._blocklist: set[str] = set()
+        self._blocklist: CompactBlocklist | None = None
         self._context_words: set[str] = set(DEFAULT_CONTEXT_WORDS)
         self._enable_hibp = enable_hibp
         self._blocklist_loaded = False
+        self._blocklist_attempted = False
 
-        # Set default paths
+        # Set default paths; prefer the index compiled at packaging time
         data_dir = Path(__file__).parent.parent / "data" / "blocklist"
-        self._blocklist_path = blocklist_path or data_dir / "common_passwords.txt.gz"
+        self._blocklist_path = blocklist_path or (
+            DEFAULT_INDEX if DEFAULT_INDEX.exists() else DEFAULT_SOURCE
+        )
         self._context_words_path = context_words_path or data_dir / "context_words.txt"
 
-        # Load blocklists
-        self._load_blocklist()
+        # The blocklist is opened on first use; context words are small
         self._load_context_words()
 
     def _load_blocklist(self) -> None:
-        """Load the common passwords blocklist from gzipped file."""
+        """Open the common passwords blocklist.
+
+        A compiled index is memory-mapped as is. A text or gzipped list is
+        compiled into a temporary index first, which is slower but keeps
+        the entries off the heap all the same.
+        """
+        self._blocklist_attempted = True
         try:
             if self._blocklist_path.exists():
-                with gzip.open(self._blocklist_path, "rt", encoding="utf-8") as f:
-                    self._blocklist = {
-                        line.strip().lower() for line in f if line.strip()
-                    }
+                with open(self._blocklist_path, "rb") as f:
+                    compiled = f.read(len(BLOCKLIST_MAGIC)) == BLOCKLIST_MAGIC
+                if compiled:
+                    self._blocklist = CompactBlocklist.open(self._blocklist_path)
+                else:
+                    self._blocklist = compile_blocklist(self._blocklist_path)
                 self._blocklist_loaded = True
                 logger.info(
                     "password_blocklist_loaded",
                     count=len(self._blocklist),
+                    compiled=compiled,
                     path=str(self._blocklist_path),
                 )
             else:
@@ -134,6 +152,12 @@ class PasswordBlocklistService:
         except Exception as e:
             logger.error("password_blocklist_load_error", error=str(e))
 
+    def _ensure_blocklist(self) -> CompactBlocklist | None:
+        """Open the blocklist on first use."""
+        if not self._blocklist_attempted:
+            self._load_blocklist()
+        return self._blocklist
+
     def _load_context_words(self) -> None:
         """Load context-specific words from file."""
         try:
@@ -153,7 +177,8 @@ class PasswordBlocklistService:
 
     def check_common_password(self, password: str) -> bool:
         """Check if password is in the common passwords blocklist."""
-        return password.lower() in self._blocklist
+        blocklist = self._ensure_blocklist()
+        return blocklist is not None and password in blocklist
 
     def check_sequential_pattern(self, password: str) -> str | None:
         """Check for sequential character patterns."""
@@ -326,12 +351,14 @@ class PasswordBlocklistService:
     @property
     def blocklist_loaded(self) -> bool:
         """Check if blocklist was successfully loaded."""
+        self._ensure_blocklist()
         return self._blocklist_loaded
 
     @property
     def blocklist_size(self) -> int:
         """Get number of passwords in blocklist."""
-        return len(self._blocklist)
+        blocklist = self._ensure_blocklist()
+        return len(blocklist) if blocklist is not None else 0
 
 
 # Singleton instance
@@ -0,0 +1,421 @@
+"""
+Retention Engine
+
+Applies the retention settings to every time-series and housekeeping table
+on a schedule. Rows are deleted oldest-first in short transactions that
+commit and yield between batches, so other writers are never locked out for
+the length of a purge. Freed pages are returned to the filesystem with
+incremental vacuum.
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import structlog
+
+from models.retention import RetentionRunResult, TableRetentionResult
+from services.database.metrics_service import to_epoch_ms
+from services.database_service import DatabaseService
+
+logger = structlog.get_logger("retention_engine")
+
+# Seconds between scheduled retention runs
+RETENTION_INTERVAL_SECONDS = 3600
+
+# Delay before the first run so startup is not competing with a purge
+INITIAL_DELAY_SECONDS = 60
+
+# Rows per delete transaction; adapted between the bounds to hit the target
+DEFAULT_BATCH_SIZE = 1000
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 10000
+
+# How long one delete transaction should hold the write lock
+BATCH_TARGET_SECONDS = 0.05
+
+# Pause between transactions so queued writers get the lock
+BATCH_PAUSE_SECONDS = 0.01
+
+# Time one table may take per run; the remainder is purged next run
+TABLE_TIME_BUDGET_SECONDS = 10.0
+
+# Free pages returned to the filesystem per run
+VACUUM_PAGES_PER_RUN = 2000
+
+# Largest database switched to incremental auto-vacuum automatically, since
+# the switch needs one full VACUUM
+AUTO_VACUUM_CONVERT_MAX_BYTES = 64 * 1024 * 1024
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_NONE = 0
+AUTO_VACUUM_INCREMENTAL = 2
+
+# retention_settings defaults, used when the settings row is missing
+DEFAULT_RETENTION_DAYS = {
+    "audit_log_retention": 365,
+    "access_log_retention": 30,
+    "application_log_retention": 30,
+    "server_log_retention": 90,
+    "metrics_retention": 90,
+    "notification_retention": 30,
+    "session_retention": 7,
+}
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long rows of one table are kept.
+
+    Rows whose timestamp_column is older than the cutoff are deleted. The
+    cutoff comes from a retention_settings column (in days) or, for
+    housekeeping tables, a fixed age. key_column may list several
+    comma-separated columns for tables with a composite primary key, and
+    epoch_ms marks timestamp columns holding Unix epoch milliseconds
+    instead of ISO text.
+    """
+
+    table: str
+    key_column: str
+    timestamp_column: str
+    setting: str | None = None
+    fixed_age: timedelta | None = None
+    epoch_ms: bool = False
+
+
+# Every table the engine purges. Each timestamp column is indexed.
+RETENTION_POLICIES = (
+    RetentionPolicy("log_entries", "id", "timestamp", setting="access_log_retention"),
+    RetentionPolicy("activity_logs", "id", "timestamp", setting="audit_log_retention"),
+    RetentionPolicy(
+        "server_metric_samples",
+        "server_key, ts",
+        "ts",
+        setting="metrics_retention",
+        epoch_ms=True,
+    ),
+    RetentionPolicy(
+        "container_metric_samples",
+        "server_key, ts, container_key",
+        "ts",
+        setting="metrics_retention",
+        epoch_ms=True,
+    ),
+    RetentionPolicy(
+        "notifications", "id", "created_at", setting="notification_retention"
+    ),
+    RetentionPolicy("sessions", "id", "expires_at", setting="session_retention"),
+    RetentionPolicy("csrf_tokens", "token_hash", "expires_at", fixed_age=timedelta(0)),
+    RetentionPolicy(
+        "rate_limit_events", "id", "created_at", fixed_age=timedelta(hours=1)
+    ),
+)
+
+POLICIES_BY_TABLE = {policy.table: policy for policy in RETENTION_POLICIES}
+
+
+class RetentionEngine:
+    """Scheduled, chunked retention across all tables."""
+
+    def __init__(self, db_service: DatabaseService | None = None):
+        """Initialize retention engine.
+
+        Args:
+            db_service: Database service providing connections.
+        """
+        self.db_service = db_service or DatabaseService()
+        self.last_run: RetentionRunResult | None = None
+        self._running = False
+        self._task: asyncio.Task | None = None
+        self._run_lock = asyncio.Lock()
+        self._interval = RETENTION_INTERVAL_SECONDS
+        self._vacuum_warning_logged = False
+        logger.info("Retention engine initialized")
+
+    async def start(
+        self,
+        interval: int = RETENTION_INTERVAL_SECONDS,
+        initial_delay: float = INITIAL_DELAY_SECONDS,
+    ) -> None:
+        """Start the retention scheduler.
+
+        Args:
+            interval: Seconds between runs.
+            initial_delay: Seconds before the first run.
+        """
+        if self._running:
+            logger.warning("Retention scheduler already running")
+            return
+
+        self._interval = interval
+        self._running = True
+        self._task = asyncio.create_task(self._scheduler_loop(initial_delay))
+        logger.info("Retention scheduler started", interval_seconds=interval)
+
+    async def stop(self) -> None:
+        """Stop the retention scheduler, abandoning a run in progress."""
+        self._running = False
+
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        logger.info("Retention scheduler stopped")
+
+    async def _scheduler_loop(self, initial_delay: float) -> None:
+        """Background loop that runs retention periodically."""
+        try:
+            await asyncio.sleep(initial_delay)
+        except asyncio.CancelledError:
+            return
+
+        while self._running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Retention run failed", error=str(e))
+
+            try:
+                await asyncio.sleep(self._interval)
+            except asyncio.CancelledError:
+                break
+
+    async def run_once(self) -> RetentionRunResult:
+        """Purge every table according to its policy, then reclaim space.
+
+        Returns:
+            Per-table rows deleted and time spent, plus space reclaimed.
+        """
+        async with self._run_lock:
+            started = time.monotonic()
+            start_time = datetime.now(UTC)
+
+            settings = await self._load_settings()
+            existing = await self._existing_tables()
+            results = []
+            for policy in RETENTION_POLICIES:
+                if policy.table not in existing:
+                    logger.debug("Retention table missing, skipped", table=policy.table)
+                    continue
+                cutoff = self.cutoff_for(policy, settings, start_time)
+                if cutoff is None:
+                    continue
+                results.append(await self.purge(policy, cutoff))
+
+            pages, space_freed = await self._reclaim_space()
+            result = RetentionRunResult(
+                start_time=start_time.isoformat(),
+                end_time=datetime.now(UTC).isoformat(),
+                duration_seconds=round(time.monotonic() - started, 3),
+                tables=results,
+                pages_reclaimed=pages,
+                space_freed_mb=space_freed,
+            )
+            self.last_run = result
+
+            logger.info(
+                "Retention run completed",
+                rows_deleted=result.rows_deleted,
+                duration_seconds=result.duration_seconds,
+                pages_reclaimed=pages,
+            )
+            return result
+
+    @staticmethod
+    def cutoff_for(
+        policy: RetentionPolicy, settings: dict[str, Any], now: datetime
+    ) -> str | None:
+        """Return the ISO cutoff for a policy, or None to keep everything."""
+        if policy.fixed_age is not None:
+            return (now - policy.fixed_age).isoformat()
+
+        days = settings.get(policy.setting)
+        if not days or days <= 0:
+            return None
+        return (now - timedelta(days=days)).isoformat()
+
+    async def purge(
+        self,
+        policy: RetentionPolicy,
+        cutoff: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        time_budget: float = TABLE_TIME_BUDGET_SECONDS,
+    ) -> TableRetentionResult:
+        """Delete rows older than cutoff in short, separate transactions.
+
+        Each batch takes the write lock with BEGIN IMMEDIATE, deletes the
+        oldest rows through the timestamp index and commits. The batch size
+        adapts so a transaction holds the lock for about
+        BATCH_TARGET_SECONDS.
+
+        Args:
+            policy: Table to purge.
+            cutoff: Rows older than this ISO timestamp are deleted.
+            batch_size: Initial rows per transaction.
+            time_budget: Seconds to spend before leaving the rest for later.
+
+        Returns:
+            Rows deleted, batches committed and time spent.
+        """
+        query = (
+            f"DELETE FROM {policy.table} WHERE ({policy.key_column}) IN ("
+            f"SELECT {policy.key_column} FROM {policy.table}"
+            f" WHERE {policy.timestamp_column} < ?"
+            f" ORDER BY {policy.timestamp_column} LIMIT ?)"
+        )
+        bound = to_epoch_ms(cutoff) if policy.epoch_ms else cutoff
+        batch_size = max(MIN_BATCH_SIZE, min(batch_size, MAX_BATCH_SIZE))
+        started = time.monotonic()
+        deleted = 0
+        batches = 0
+        complete = False
+        error_message = None
+
+        try:
+            async with self.db_service.get_connection() as conn:
+                while True:
+                    batch_started = time.monotonic()
+                    await conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        cursor = await conn.execute(query, (bound, batch_size))
+                        await conn.commit()
+                    except Exception:
+                        await conn.rollback()
+                        raise
+
+                    count = cursor.rowcount
+                    deleted += count
+                    batches += 1
+                    if count < batch_size:
+                        complete = True
+                        break
+                    if time.monotonic() - started >= time_budget:
+                        break
+
+                    batch_size = self._next_batch_size(
+                        batch_size, time.monotonic() - batch_started
+                    )
+                    await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        except Exception as e:
+            error_message = str(e)
+            logger.error(
+                "Retention purge failed",
+                table=policy.table,
+                rows_deleted=deleted,
+                error=error_message,
+            )
+
+        result = TableRetentionResult(
+            table=policy.table,
+            cutoff=cutoff,
+            rows_deleted=deleted,
+            batches=batches,
+            duration_seconds=round(time.monotonic() - started, 3),
+            complete=complete,
+            error_message=error_message,
+        )
+        if error_message is None:
+            logger.info(
+                "Retention purge completed",
+                table=policy.table,
+                rows_deleted=deleted,
+                batches=batches,
+                duration_seconds=result.duration_seconds,
+                complete=complete,
+            )
+        return result
+
+    @staticmethod
+    def _next_batch_size(batch_size: int, elapsed: float) -> int:
+        """Shrink slow batches and grow fast ones toward the target."""
+        if elapsed > BATCH_TARGET_SECONDS:
+            return max(MIN_BATCH_SIZE, batch_size // 2)
+        if elapsed < BATCH_TARGET_SECONDS / 4:
+            return min(MAX_BATCH_SIZE, batch_size * 2)
+        return batch_size
+
+    async def _load_settings(self) -> dict[str, Any]:
+        """Load retention days per settings column, falling back to defaults."""
+        try:
+            async with self.db_service.get_connection() as conn:
+                cursor = await conn.execute(
+                    "SELECT * FROM retention_settings WHERE id = 'system'"
+                )
+                row = await cursor.fetchone()
+        except Exception as e:
+            logger.error("Failed to load retention settings", error=str(e))
+            row = None
+
+        if not row:
+            return dict(DEFAULT_RETENTION_DAYS)
+        return {column: row[column] for column in DEFAULT_RETENTION_DAYS}
+
+    async def _existing_tables(self) -> set[str]:
+        """Return the names of tables present in the database."""
+        async with self.db_service.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+            rows = await cursor.fetchall()
+        return {row[0] for row in rows}
+
+    async def _reclaim_space(self) -> tuple[int, float]:
+        """Return free pages to the filesystem with incremental vacuum.
+
+        Databases created without auto-vacuum are switched to incremental
+        mode when small enough for the one-off VACUUM to be quick.
+
+        Returns:
+            Pages reclaimed and the space they took in MB.
+        """
+        try:
+            async with self.db_service.get_connection() as conn:
+                mode = await self._pragma(conn, "auto_vacuum")
+                page_size = await self._pragma(conn, "page_size")
+
+                if mode == AUTO_VACUUM_NONE:
+                    page_count = await self._pragma(conn, "page_count")
+                    if page_count * page_size > AUTO_VACUUM_CONVERT_MAX_BYTES:
+                        if not self._vacuum_warning_logged:
+                            logger.warning(
+                                "Auto-vacuum disabled; run VACUUM during "
+                                "maintenance to enable incremental vacuum",
+                                size_mb=round(page_count * page_size / 1048576, 1),
+                            )
+                            self._vacuum_warning_logged = True
+                        return 0, 0.0
+
+                    before = await self._pragma(conn, "page_count")
+                    await conn.execute(
+                        f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}"
+                    )
+                    await conn.execute("VACUUM")
+                    pages = max(0, before - await self._pragma(conn, "page_count"))
+                    logger.info("Switched database to incremental auto-vacuum")
+                elif mode == AUTO_VACUUM_INCREMENTAL:
+                    before = await self._pragma(conn, "freelist_count")
+                    # executescript steps the pragma to completion; execute
+                    # would stop after freeing the first page
+                    await conn.executescript(
+                        f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_RUN});"
+                    )
+                    pages = max(0, before - await self._pragma(conn, "freelist_count"))
+                else:
+                    return 0, 0.0
+
+            return pages, round(pages * page_size / 1048576, 2)
+        except Exception as e:
+            logger.error("Failed to reclaim database space", error=str(e))
+            return 0, 0.0
+
+    @staticmethod
+    async def _pragma(conn, name: str) -> int:
+        """Read an integer PRAGMA value."""
+        cursor = await conn.execute(f"PRAGMA {name}")
+        row = await cursor.fetchone()
+        return row[0]
@@ -25,10 +25,18 @@ from models.retention import (
 )
 from services.auth_service import AuthService
 from services.database_service import DatabaseService
+from services.retention_engine import POLICIES_BY_TABLE, RetentionEngine
 from services.service_log import LogService
 
 logger = structlog.get_logger("retention_service")
 
+# Tables purged for each data retention type
+_DATA_RETENTION_TABLES = {
+    RetentionType.METRICS: ("server_metric_samples", "container_metric_samples"),
+    RetentionType.NOTIFICATIONS: ("notifications",),
+    RetentionType.SESSIONS: ("sessions",),
+}
+
 
 class RetentionService:
     """Service for managing data retention policies and cleanup operations."""
@@ -38,11 +46,13 @@ class RetentionService:
         db_service: DatabaseService | None = None,
         auth_service: AuthService | None = None,
         log_service: LogService | None = None,
+        retention_engine: RetentionEngine | None = None,
     ):
         """Initialize retention service with required dependencies."""
         self.db_service = db_service or DatabaseService()
         self.auth_service = auth_service or AuthService()
         self._log_service = log_service
+        self.retention_engine = retention_engine or RetentionEngine(self.db_service)
         self.max_batch_size = 10000
         self.min_batch_size = 100
         logger.info("Retention service initialized")
@@ -557,6 +567,11 @@ class RetentionService:
                 total_deleted, estimated_space_freed = await self._delete_logs_batch(
                     cutoff_date, batch_size
                 )
+            else:
+                for table in _DATA_RETENTION_TABLES.get(retention_type, ()):
+                    total_deleted += await self._purge_table(
+                        table, cutoff_date, batch_size
+                    )
 
             logger.info(
                 "Secure deletion completed",
@@ -575,60 +590,30 @@ class RetentionService:
     async def _delete_logs_batch(
         self, cutoff_date: str, batch_size: int
     ) -> tuple[int, float]:
-        """Delete log entries in batches with transaction safety."""
-        total_deleted = 0
-
-        try:
-            async with self.db_service.get_connection() as conn:
-                # Begin transaction
-                await conn.execute("BEGIN IMMEDIATE")
-
-                try:
-                    # Delete in batches to avoid locking issues
-                    while True:
-                        cursor = await conn.execute(
-                            "DELETE FROM log_entries WHERE timestamp < ? LIMIT ?",
-                            (cutoff_date, batch_size),
-                        )
-
-                        deleted_count = cursor.rowcount
-                        total_deleted += deleted_count
-
-                        logger.debug(
-                            "Deleted batch of log entries",
-                            batch_size=deleted_count,
-                            total=total_deleted,
-                        )
-
-                        # Break if no more records to delete
-                        if deleted_count < batch_size:
-                            break
-
-                    # Commit transaction
-                    await conn.commit()
-
-                    # Estimate space freed (rough calculation)
-                    estimated_space_mb = total_deleted * 0.001  # ~1KB per log entry
-
-                    logger.info(
-                        "Log deletion completed successfully",
-                        total_deleted=total_deleted,
-                        space_freed_mb=estimated_space_mb,
-                    )
-
-                    return total_deleted, round(estimated_space_mb, 2)
+        """Delete log entries in batches, one short transaction per batch."""
+        total_deleted = await self._purge_table("log_entries", cutoff_date, batch_size)
 
-                except Exception as e:
-                    # Rollback on error
-                    await conn.rollback()
-                    logger.error(
-                        "Log deletion failed, transaction rolled back", error=str(e)
-                    )
-                    raise
+        # Estimate space freed (rough calculation)
+        estimated_space_mb = total_deleted * 0.001  # ~1KB per log entry
 
-        except Exception as e:
-            logger.error("Failed to delete logs in batches", error=str(e))
-            raise
+        logger.info(
+            "Log deletion completed successfully",
+            total_deleted=total_deleted,
+            space_freed_mb=estimated_space_mb,
+        )
+        return total_deleted, round(estimated_space_mb, 2)
+
+    async def _purge_table(self, table: str, cutoff_date: str, batch_size: int) -> int:
+        """Purge a table to completion through the retention engine."""
+        result = await self.retention_engine.purge(
+            POLICIES_BY_TABLE[table],
+            cutoff_date,
+            batch_size=batch_size,
+            time_budget=float("inf"),
+        )
+        if result.error_message:
+            raise RuntimeError(f"Failed to delete from {table}: {result.error_message}")
+        return result.rows_deleted
 
     def _create_error_result(
         self,
@@ -7,12 +7,15 @@ Implements connection pooling to prevent SSH flooding.
 
 import asyncio
 import os
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 import paramiko
 import structlog
 
+from services.helpers.ssh_stream import CommandStream
+
 logger = structlog.get_logger("ssh_service")
 
 
@@ -250,6 +253,32 @@ class SSHService:
             logger.error("SSH command execution failed", host=host, error=str(e))
             return False, str(e)
 
+    @asynccontextmanager
+    async def stream_command(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        auth_type: str,
+        credentials: dict,
+        command: str,
+        timeout: int = 600,
+    ) -> AsyncIterator[CommandStream]:
+        """Execute a command and stream its output as batches of lines.
+
+        Usage:
+            async with ssh.stream_command(host, ...) as stream:
+                async for lines in stream:
+                    ...
+            stream.exit_status, stream.stderr
+        """
+        async with self._get_connection(
+            host, port, username, auth_type, credentials
+        ) as client:
+            stream = await CommandStream.start(client, command, timeout=timeout)
+            async with stream:
+                yield stream
+
     async def execute_command_with_progress(
         self,
         host: str,
@@ -261,78 +290,43 @@ class SSHService:
         progress_callback=None,
         timeout: int = 600,
     ) -> tuple[bool, str]:
-        """Execute a command with real-time progress callback."""
+        """Execute a command with real-time progress callback.
+
+        The callback is awaited once per output line, in order, as batches
+        arrive from the remote host.
+        """
         try:
             logger.info("Executing SSH command with progress", host=host, port=port)
 
-            async with self._get_connection(
-                host, port, username, auth_type, credentials
-            ) as client:
-                loop = asyncio.get_running_loop()
-
-                def run_command_streaming():
-                    stdin, stdout, stderr = client.exec_command(
-                        command, timeout=timeout
-                    )
-                    channel = stdout.channel
-
-                    full_output = []
-                    buffer = ""
-
-                    while not channel.exit_status_ready() or channel.recv_ready():
-                        if channel.recv_ready():
-                            chunk = channel.recv(1024).decode("utf-8", errors="replace")
-                            buffer += chunk
-
-                            while "\n" in buffer or "\r" in buffer:
-                                for sep in ["\n", "\r"]:
-                                    if sep in buffer:
-                                        line, buffer = buffer.split(sep, 1)
-                                        if line.strip():
-                                            full_output.append(line)
-                                            if progress_callback:
-                                                loop.call_soon_threadsafe(
-                                                    lambda current_line=line: asyncio.run_coroutine_threadsafe(
-                                                        progress_callback(current_line),
-                                                        loop,
-                                                    )
-                                                )
-                                        break
-                        else:
-                            import time
-
-                            time.sleep(0.1)
-
-                    if buffer.strip():
-                        full_output.append(buffer.strip())
-                        if progress_callback:
-                            remaining = buffer.strip()
-                            loop.call_soon_threadsafe(
-                                lambda rem=remaining: asyncio.run_coroutine_threadsafe(
-                                    progress_callback(rem), loop
-                                )
-                            )
-
-                    exit_status = channel.recv_exit_status()
-                    error = stderr.read().decode("utf-8")
-
-                    return exit_status, "\n".join(full_output), error
-
-                exit_status, output, error = await loop.run_in_executor(
-                    None, run_command_streaming
-                )
-
-                if exit_status == 0:
-                    logger.info("SSH command with progress completed", host=host)
-                    return True, output
-                else:
-                    logger.error("SSH command with progress failed", host=host)
-                    return False, error or output
+            output_lines: list[str] = []
+            async with self.stream_command(
+                host, port, username, auth_type, credentials, command, timeout
+            ) as stream:
+                async for lines in stream:
+                    output_lines.extend(lines)
+                    if progress_callback:
+                        await self._report_progress(progress_callback, lines)
+
+            output = "\n".join(output_lines)
+            if stream.exit_status == 0:
+                logger.info("SSH command with progress completed", host=host)
+                return True, output
+            else:
+                logger.error("SSH command with progress failed", host=host)
+                return False, stream.stderr or output
 
         except Exception as e:
             logger.error("SSH command with progress failed", host=host, error=str(e))
             return False, str(e)
 
+    async def _report_progress(self, progress_callback, lines: list[str]) -> None:
+        """Pass a batch of output lines to the progress callback."""
+        for line in lines:
+            try:
+                await progress_callback(line)
+            except Exception as e:
+                logger.warning("Progress callback failed", error=str(e))
+
     async def close_connection(self, host: str, port: int, username: str) -> None:
         """Explicitly close a pooled connection."""
         key = self._pool._make_key(host, port, username)
@@ -15,23 +15,34 @@ class TestMetricsSchema:
         assert isinstance(METRICS_SCHEMA, str)
         assert len(METRICS_SCHEMA) > 0
 
-    def test_schema_creates_server_metrics_table(self):
-        """Test that schema creates server_metrics table."""
-        assert "CREATE TABLE IF NOT EXISTS server_metrics" in METRICS_SCHEMA
+    def test_schema_creates_server_metric_samples_table(self):
+        """Test that schema creates a clustered server_metric_samples table."""
+        assert "CREATE TABLE IF NOT EXISTS server_metric_samples" in METRICS_SCHEMA
+        assert "PRIMARY KEY (server_key, ts)" in METRICS_SCHEMA
 
-    def test_schema_creates_container_metrics_table(self):
-        """Test that schema creates container_metrics table."""
-        assert "CREATE TABLE IF NOT EXISTS container_metrics" in METRICS_SCHEMA
+    def test_schema_creates_container_metric_samples_table(self):
+        """Test that schema creates a clustered container_metric_samples table."""
+        assert "CREATE TABLE IF NOT EXISTS container_metric_samples" in METRICS_SCHEMA
+        assert "PRIMARY KEY (server_key, ts, container_key)" in METRICS_SCHEMA
+
+    def test_samples_are_without_rowid(self):
+        """Test that sample tables are stored without a separate rowid."""
+        assert METRICS_SCHEMA.count(") WITHOUT ROWID;") == 2
+
+    def test_schema_creates_series_key_tables(self):
+        """Test that server and container ids are interned."""
+        assert "CREATE TABLE IF NOT EXISTS metric_servers" in METRICS_SCHEMA
+        assert "CREATE TABLE IF NOT EXISTS metric_containers" in METRICS_SCHEMA
 
     def test_schema_creates_activity_logs_table(self):
         """Test that schema creates activity_logs table."""
         assert "CREATE TABLE IF NOT EXISTS activity_logs" in METRICS_SCHEMA
 
     def test_server_metrics_has_required_columns(self):
-        """Test that server_metrics has required columns."""
+        """Test that server_metric_samples has required columns."""
         required_columns = [
-            "id TEXT PRIMARY KEY",
-            "server_id TEXT NOT NULL",
+            "server_key INTEGER NOT NULL",
+            "ts INTEGER NOT NULL",
             "cpu_percent REAL NOT NULL",
             "memory_percent REAL NOT NULL",
             "memory_used_mb INTEGER NOT NULL",
@@ -39,13 +50,12 @@ class TestMetricsSchema:
             "disk_percent REAL NOT NULL",
             "disk_used_gb INTEGER NOT NULL",
             "disk_total_gb INTEGER NOT NULL",
-            "timestamp TEXT NOT NULL",
         ]
         for column in required_columns:
             assert column in METRICS_SCHEMA, f"Missing column: {column}"
 
     def test_container_metrics_has_required_columns(self):
-        """Test that container_metrics has required columns."""
+        """Test that container metric tables have required columns."""
         required_columns = [
             "container_id TEXT NOT NULL",
             "container_name TEXT NOT NULL",
@@ -76,10 +86,8 @@ class TestMetricsSchema:
     def test_schema_has_indexes(self):
         """Test that schema creates required indexes."""
         indexes = [
-            "idx_server_metrics_server",
-            "idx_server_metrics_timestamp",
-            "idx_container_metrics_server",
-            "idx_container_metrics_timestamp",
+            "idx_server_metric_samples_ts",
+            "idx_container_metric_samples_ts",
             "idx_activity_logs_type",
             "idx_activity_logs_timestamp",
             "idx_activity_logs_user",
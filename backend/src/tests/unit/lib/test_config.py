@@ -70,6 +70,10 @@ class TestDefaultValues:
         assert "MAX_CONCURRENT_CONNECTIONS" in DEFAULT_ENV_VALUES
         assert DEFAULT_ENV_VALUES["MAX_CONCURRENT_CONNECTIONS"] == "10"
 
+    def test_default_env_values_has_workers(self):
+        """DEFAULT_ENV_VALUES should run a single worker."""
+        assert DEFAULT_ENV_VALUES["WORKERS"] == "1"
+
     def test_project_root_is_path(self):
         """PROJECT_ROOT should be a Path object."""
         assert isinstance(PROJECT_ROOT, Path)
@@ -249,6 +253,15 @@ class TestLoadConfig:
         assert "max_concurrent_connections" in config
         assert isinstance(config["max_concurrent_connections"], int)
 
+    def test_load_config_has_at_least_one_worker(self, clean_env, monkeypatch):
+        """load_config should convert workers to an int of at least one."""
+        monkeypatch.setenv("WORKERS", "0")
+        assert reload_config()["workers"] == 1
+
+        monkeypatch.setenv("WORKERS", "4")
+        assert reload_config()["workers"] == 4
+        _cached_config.cache_clear()
+
     def test_load_config_has_tools_directory(self, clean_env):
         """load_config should include tools_directory."""
         config = load_config()
@@ -0,0 +1,117 @@
+"""
+Unit tests for lib/password_blocklist.py
+
+Tests building compiled blocklists and binary-searched lookups.
+"""
+
+import gzip
+import random
+import string
+
+import pytest
+
+from lib.password_blocklist import (
+    BLOCKLIST_MAGIC,
+    CompactBlocklist,
+    build_blocklist,
+    compile_blocklist,
+    main,
+)
+
+
+def build(tmp_path, sources, chunk_size=3):
+    """Build an index from sources and open it."""
+    index = tmp_path / "index.bin"
+    with open(index, "wb") as f:
+        build_blocklist(sources, f, chunk_size=chunk_size)
+    return CompactBlocklist.open(index)
+
+
+class TestBuildBlocklist:
+    """Tests for build_blocklist."""
+
+    def test_merges_sorted_unique_lowercased_entries(self, tmp_path):
+        """Entries from every source should be lowercased, sorted and unique."""
+        first = tmp_path / "first.txt"
+        first.write_text("Zebra\napple\n\n  mango  \nAPPLE\nbad\tentry\n")
+        second = tmp_path / "second.txt.gz"
+        with gzip.open(second, "wt", encoding="utf-8") as f:
+            f.write("apple\nbanana\nzebra\n")
+        index = tmp_path / "index.bin"
+
+        with open(index, "wb") as f:
+            count = build_blocklist([first, second], f, chunk_size=2)
+
+        assert count == 4
+        assert index.read_bytes() == BLOCKLIST_MAGIC + b"apple\nbanana\nmango\nzebra\n"
+
+    def test_main_writes_index(self, tmp_path, capsys):
+        """The command line should compile sources into the output path."""
+        source = tmp_path / "source.txt"
+        source.write_text("hunter2\n")
+        output = tmp_path / "out.bin"
+
+        assert main([str(source), "-o", str(output)]) == 0
+
+        assert "hunter2" in CompactBlocklist.open(output)
+        assert not (tmp_path / "out.bin.partial").exists()
+        assert "Wrote 1 entries" in capsys.readouterr().out
+
+    def test_main_reports_missing_source(self, tmp_path, capsys):
+        """A missing source should fail without writing output."""
+        output = tmp_path / "out.bin"
+
+        assert main([str(tmp_path / "missing.txt"), "-o", str(output)]) == 1
+
+        assert not output.exists()
+        assert "not found" in capsys.readouterr().err
+
+
+class TestCompactBlocklist:
+    """Tests for CompactBlocklist lookups."""
+
+    def test_finds_every_entry_and_nothing_else(self, tmp_path):
+        """Lookups should agree with a set over the same entries."""
+        rng = random.Random(7)
+        alphabet = string.ascii_letters + string.digits + "!é"
+        words = {
+            "".join(rng.choices(alphabet, k=rng.randint(1, 12))) for _ in range(2000)
+        }
+        source = tmp_path / "words.txt"
+        source.write_text("\n".join(words) + "\n", encoding="utf-8")
+        expected = {word.lower() for word in words}
+
+        blocklist = build(tmp_path, [source], chunk_size=300)
+
+        assert len(blocklist) == len(expected)
+        assert all(word in blocklist for word in expected)
+        assert all(word.upper() in blocklist for word in list(expected)[:100])
+        probes = {"".join(rng.choices(alphabet, k=13)).lower() for _ in range(500)}
+        assert not any(probe in blocklist for probe in probes - expected)
+        assert "" not in blocklist
+
+    def test_empty_index(self, tmp_path):
+        """An index without entries should contain nothing."""
+        blocklist = build(tmp_path, [])
+
+        assert len(blocklist) == 0
+        assert "password" not in blocklist
+
+    def test_rejects_other_files(self, tmp_path):
+        """Files without the header should not be mapped."""
+        path = tmp_path / "plain.txt"
+        path.write_text("password\n")
+
+        with pytest.raises(ValueError, match="Not a compiled"):
+            CompactBlocklist.open(path)
+
+    def test_compile_blocklist_uses_temporary_index(self, tmp_path):
+        """Text lists should be compiled on the fly."""
+        source = tmp_path / "source.txt"
+        source.write_text("Secret\n")
+
+        blocklist = compile_blocklist(source)
+
+        assert "secret" in blocklist
+        assert list(tmp_path.iterdir()) == [source]
+        blocklist.close()
@@ -0,0 +1,187 @@
+"""
+Unit tests for lib/telemetry.py
+
+Tests counters, histograms and Prometheus text rendering.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from lib.telemetry import (
+    CONTENT_TYPE,
+    REGISTRY,
+    MetricsRegistry,
+    metrics_endpoint,
+    protected_metrics_endpoint,
+)
+
+
+def make_request(host="127.0.0.1", authorization=None):
+    """Create a scrape request from a client host."""
+    request = MagicMock()
+    request.client.host = host
+    request.headers = {"authorization": authorization} if authorization else {}
+    return request
+
+
+@pytest.fixture
+def registry():
+    """Create an empty registry."""
+    return MetricsRegistry()
+
+
+class TestCounter:
+    """Tests for Counter."""
+
+    def test_inc_per_label_set(self, registry):
+        """Counters should keep one value per label combination."""
+        counter = registry.counter("calls_total", "Calls", ("tool", "outcome"))
+
+        counter.inc("login", "success")
+        counter.inc("login", "success", amount=2)
+        counter.inc("login", "error")
+
+        assert counter.value("login", "success") == 3
+        assert counter.value("login", "error") == 1
+        assert counter.value("logout", "success") == 0
+        assert counter.total() == 4
+
+    def test_rejects_wrong_label_count(self, registry):
+        """Label values must match the declared label names."""
+        counter = registry.counter("calls_total", "Calls", ("tool",))
+
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc("login", "extra")
+
+
+class TestHistogram:
+    """Tests for Histogram."""
+
+    def test_renders_cumulative_buckets(self, registry):
+        """Buckets should be cumulative with inclusive upper bounds."""
+        histogram = registry.histogram(
+            "latency_seconds", "Latency", ("tool",), buckets=(0.1, 1.0)
+        )
+
+        histogram.observe(0.1, "login")
+        histogram.observe(0.5, "login")
+        histogram.observe(2, "login")
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == [
+            "# HELP latency_seconds Latency",
+            "# TYPE latency_seconds histogram",
+        ]
+        assert 'latency_seconds_bucket{tool="login",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{tool="login",le="1"} 2' in lines
+        assert 'latency_seconds_bucket{tool="login",le="+Inf"} 3' in lines
+        assert 'latency_seconds_sum{tool="login"} 2.6' in lines
+        assert 'latency_seconds_count{tool="login"} 3' in lines
+        assert histogram.count("login") == 3
+
+
+class TestRegistry:
+    """Tests for MetricsRegistry."""
+
+    def test_same_name_returns_existing_metric(self, registry):
+        """Registering a name twice should return the first metric."""
+        first = registry.counter("calls_total", "Calls", ("tool",))
+
+        assert registry.counter("calls_total", "Calls", ("tool",)) is first
+        with pytest.raises(ValueError, match="already registered"):
+            registry.histogram("calls_total", "Calls")
+
+    def test_escapes_label_values(self, registry):
+        """Quotes, backslashes and newlines should be escaped."""
+        registry.counter("calls_total", "Calls", ("caller",)).inc('a"b\\c\nd')
+
+        assert 'calls_total{caller="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+class TestSnapshots:
+    """Tests for combining registries of several workers."""
+
+    def test_combined_adds_up_snapshots(self, registry):
+        """Counters and histograms from other registries should be summed."""
+        registry.counter("calls_total", "Calls", ("tool",)).inc("a")
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(0.5)
+        peer = MetricsRegistry()
+        peer.counter("calls_total", "Calls", ("tool",)).inc("a", amount=2)
+        peer.counter("calls_total", "Calls", ("tool",)).inc("b")
+        peer.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(3.0)
+
+        text = registry.combined([peer.snapshot()]).render()
+
+        assert 'calls_total{tool="a"} 3' in text
+        assert 'calls_total{tool="b"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+        assert "latency_seconds_sum 3.5" in text
+        assert registry.counter("calls_total", "Calls", ("tool",)).value("a") == 1
+
+    def test_rejects_mismatched_buckets(self, registry):
+        """Histograms with other bucket bounds cannot be summed."""
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+        peer = MetricsRegistry()
+        peer.histogram("latency_seconds", "Latency", buckets=(1.0, 2.0)).observe(1)
+
+        with pytest.raises(ValueError, match="buckets differ"):
+            registry.merge(peer.snapshot())
+
+
+class TestMetricsEndpoint:
+    """Tests for metrics_endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_serves_default_registry(self):
+        """The endpoint should return the rendered default registry."""
+        REGISTRY.counter("tomo_test_endpoint_total", "Test").inc()
+
+        response = await metrics_endpoint(None)
+
+        assert response.media_type == CONTENT_TYPE
+        assert b"tomo_test_endpoint_total 1" in response.body
+
+
+class TestProtectedMetricsEndpoint:
+    """Tests for protected_metrics_endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_requires_bearer_token(self):
+        """A configured token should be required from every client."""
+        endpoint = protected_metrics_endpoint("s3cret")
+
+        missing = await endpoint(make_request())
+        wrong = await endpoint(make_request(authorization="Bearer nope"))
+        ok = await endpoint(make_request("10.0.0.5", "Bearer s3cret"))
+
+        assert missing.status_code == 401
+        assert missing.headers["www-authenticate"] == "Bearer"
+        assert wrong.status_code == 401
+        assert ok.status_code == 200
+        assert ok.media_type == CONTENT_TYPE
+
+    @pytest.mark.asyncio
+    async def test_loopback_only_without_token(self):
+        """Without a token only local scrapes should be served."""
+        endpoint = protected_metrics_endpoint(None)
+
+        assert (await endpoint(make_request("127.0.0.1"))).status_code == 200
+        assert (await endpoint(make_request("::1"))).status_code == 200
+        assert (await endpoint(make_request("203.0.113.7"))).status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_adds_other_workers(self):
+        """Scrapes should include the metrics of the other workers."""
+        REGISTRY.counter("tomo_test_workers_total", "Test").inc()
+        peer = MetricsRegistry()
+        peer.counter("tomo_test_workers_total", "Test").inc(amount=4)
+
+        async def peer_snapshots():
+            return [peer.snapshot()]
+
+        endpoint = protected_metrics_endpoint(None, peer_snapshots)
+        response = await endpoint(make_request())
+
+        assert b"tomo_test_workers_total 5" in response.body
@@ -4,22 +4,32 @@ Unit tests for lib/tool_loader.py
 Tests dynamic MCP tool discovery and registration.
 """
 
+import contextlib
+import importlib
+import subprocess
+import sys
 from pathlib import Path
-from types import ModuleType
-from unittest.mock import MagicMock, patch
+from types import ModuleType, SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastmcp import Client, FastMCP
 
 from lib.tool_loader import (
     DEFAULT_TOOLS_DIRECTORY,
     DEFAULT_TOOLS_PACKAGE,
     SRC_ROOT,
+    TOOL_CALLS,
+    TOOL_DURATION,
+    ToolMetricsMiddleware,
     _discover_tool_packages,
     _find_tools_class,
     _get_public_methods,
     _instantiate_tools_class,
     _resolve_tools_path,
+    build_tool_manifest,
     register_all_tools,
+    write_tool_manifest,
 )
 
 
@@ -532,3 +542,197 @@ class AuthTools:
         config = {"tools_directory": str(tools_dir)}
         # Should not raise
         register_all_tools(mock_app, config, {})
+
+
+class TestToolManifest:
+    """Tests for manifest generation and lazy registration."""
+
+    @pytest.fixture
+    def tools_dir(self, tmp_path, monkeypatch):
+        """Create an importable 'lazytools' package with one tools module."""
+        tools_dir = tmp_path / "lazytools"
+        greet_dir = tools_dir / "greet"
+        greet_dir.mkdir(parents=True)
+        (tools_dir / "__init__.py").touch()
+        (greet_dir / "__init__.py").touch()
+        (greet_dir / "tools.py").write_text('''
+class GreetTools:
+    def __init__(self, greeting):
+        self.greeting = greeting
+
+    async def greet(self, name: str) -> dict:
+        """Greet someone."""
+        return {"message": f"{self.greeting}, {name}"}
+''')
+        monkeypatch.syspath_prepend(str(tmp_path))
+        yield tools_dir
+        for module in [m for m in sys.modules if m.startswith("lazytools")]:
+            del sys.modules[module]
+
+    def _config(self, tools_dir):
+        return {"tools_directory": str(tools_dir), "tools_package": "lazytools"}
+
+    def _write_manifest(self, tools_dir):
+        write_tool_manifest(str(tools_dir), "lazytools")
+        for module in [m for m in sys.modules if m.startswith("lazytools")]:
+            del sys.modules[module]
+
+    def test_build_records_signatures_without_instantiating(self, tools_dir):
+        """The manifest should hold each tool's schema and the class name."""
+        manifest = build_tool_manifest(str(tools_dir), "lazytools")
+
+        entry = manifest["packages"]["greet"]
+        assert entry["class_name"] == "GreetTools"
+        assert entry["fingerprint"]
+        [tool] = entry["tools"]
+        assert tool["name"] == "greet"
+        assert tool["description"] == "Greet someone."
+        assert tool["parameters"]["required"] == ["name"]
+
+    @pytest.mark.asyncio
+    async def test_registers_from_manifest_and_imports_on_first_run(self, tools_dir):
+        """Tools should be listed without importing their module."""
+        self._write_manifest(tools_dir)
+        app = FastMCP("test")
+
+        register_all_tools(app, self._config(tools_dir), {"greeting": "Hello"})
+
+        assert "lazytools.greet.tools" not in sys.modules
+        async with Client(app) as client:
+            [tool] = await client.list_tools()
+            result = await client.call_tool("greet", {"name": "Ada"})
+        assert tool.inputSchema["required"] == ["name"]
+        assert result.data == {"message": "Hello, Ada"}
+        assert "lazytools.greet.tools" in sys.modules
+
+    def test_changed_sources_fall_back_to_import(self, tools_dir):
+        """A package edited after generation should be registered eagerly."""
+        self._write_manifest(tools_dir)
+        with (tools_dir / "greet" / "tools.py").open("a") as f:
+            f.write("\n    async def wave(self) -> str:\n        return 'wave'\n")
+        mock_app = MagicMock()
+
+        register_all_tools(mock_app, self._config(tools_dir), {"greeting": "Hi"})
+
+        mock_app.add_tool.assert_not_called()
+        assert mock_app.tool.call_count == 2
+
+    def test_manifest_from_other_fastmcp_version_is_ignored(self, tools_dir):
+        """Schemas generated by another fastmcp release should not be trusted."""
+        self._write_manifest(tools_dir)
+        mock_app = MagicMock()
+
+        with patch("lib.tool_loader._fastmcp_version", return_value="0.0.0"):
+            register_all_tools(mock_app, self._config(tools_dir), {"greeting": "Hi"})
+
+        mock_app.add_tool.assert_not_called()
+        mock_app.tool.assert_called_once()
+
+    def test_import_failure_left_out_and_retried(self, tools_dir):
+        """A package that failed to import should be imported again at startup."""
+        broken_dir = tools_dir / "broken"
+        broken_dir.mkdir()
+        (broken_dir / "__init__.py").touch()
+        (broken_dir / "tools.py").write_text(
+            "import lazytools_dep\n\n\nclass BrokenTools:\n"
+            "    def __init__(self):\n        pass\n\n"
+            "    async def fixed(self) -> str:\n        return 'ok'\n"
+        )
+        self._write_manifest(tools_dir)
+        manifest = build_tool_manifest(str(tools_dir), "lazytools")
+        # The missing module shows up without touching the package sources
+        (tools_dir.parent / "lazytools_dep.py").touch()
+        importlib.invalidate_caches()
+        mock_app = MagicMock()
+
+        try:
+            register_all_tools(mock_app, self._config(tools_dir), {"greeting": "Hi"})
+        finally:
+            sys.modules.pop("lazytools_dep", None)
+
+        assert "broken" not in manifest["packages"]
+        assert [c.args[0].name for c in mock_app.add_tool.call_args_list] == ["greet"]
+        mock_app.tool.assert_called_once()
+
+    def test_missing_dependency_skips_lazy_tools(self, tools_dir):
+        """Tools whose class lacks a dependency should not be advertised."""
+        self._write_manifest(tools_dir)
+        mock_app = MagicMock()
+
+        register_all_tools(mock_app, self._config(tools_dir), {})
+
+        assert build_tool_manifest(str(tools_dir), "lazytools")["packages"]["greet"][
+            "dependencies"
+        ] == ["greeting"]
+        mock_app.add_tool.assert_not_called()
+        mock_app.tool.assert_not_called()
+
+
+def test_import_does_not_load_fastmcp():
+    """Importing the loader should not pull in fastmcp."""
+    code = (
+        "import sys, lib.tool_loader; "
+        "print(any(m.split('.')[0] == 'fastmcp' for m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+class TestToolMetricsMiddleware:
+    """Tests for ToolMetricsMiddleware."""
+
+    def _context(self, name):
+        return SimpleNamespace(message=SimpleNamespace(name=name))
+
+    async def _call(self, middleware, name, call_next):
+        with contextlib.suppress(RuntimeError):
+            await middleware.on_call_tool(self._context(name), call_next)
+
+    @pytest.mark.asyncio
+    async def test_records_outcomes(self):
+        """Calls should be counted as success, failure or error."""
+        middleware = ToolMetricsMiddleware()
+        middleware.tool_names.add("metrics_probe")
+        ok = AsyncMock(return_value=SimpleNamespace(structured_content={"a": 1}))
+        failed = AsyncMock(
+            return_value=SimpleNamespace(structured_content={"success": False})
+        )
+        boom = AsyncMock(side_effect=RuntimeError("boom"))
+        before = TOOL_DURATION.count("metrics_probe")
+
+        for call_next in (ok, failed, boom):
+            await self._call(middleware, "metrics_probe", call_next)
+
+        assert TOOL_CALLS.value("metrics_probe", "success") >= 1
+        assert TOOL_CALLS.value("metrics_probe", "failure") >= 1
+        assert TOOL_CALLS.value("metrics_probe", "error") >= 1
+        assert TOOL_DURATION.count("metrics_probe") == before + 3
+
+    @pytest.mark.asyncio
+    async def test_unregistered_names_share_one_label(self):
+        """Arbitrary tool names from clients should not create new series."""
+        middleware = ToolMetricsMiddleware()
+        before = TOOL_CALLS.value("unknown", "error")
+
+        await self._call(
+            middleware, "no_such_tool", AsyncMock(side_effect=RuntimeError())
+        )
+
+        assert TOOL_CALLS.value("unknown", "error") == before + 1
+        assert TOOL_CALLS.value("no_such_tool", "error") == 0
+
+    def test_register_all_tools_installs_middleware(self, tmp_path):
+        """register_all_tools should add the metrics middleware to the app."""
+        mock_app = MagicMock()
+
+        register_all_tools(mock_app, {"tools_directory": str(tmp_path)}, {})
+
+        [middleware] = mock_app.add_middleware.call_args.args
+        assert isinstance(middleware, ToolMetricsMiddleware)
@@ -11,6 +11,8 @@ import pytest
 
 from models.app_catalog import InstallationStatus
 from services.database.app_service import AppDatabaseService
+from services.database.base import DatabaseConnection
+from services.database.schema_init import SchemaInitializer
 
 
 @pytest.fixture
@@ -465,6 +467,154 @@ class TestGetAllInstallations:
         assert result == []
 
 
+@pytest.fixture
+async def details_db(tmp_path):
+    """Real database with servers, marketplace apps and installations."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await SchemaInitializer(connection).initialize_all_tables()
+    async with connection.get_connection() as conn:
+        await conn.executemany(
+            """INSERT INTO servers (id, name, host, username, auth_type, created_at)
+               VALUES (?, ?, ?, 'admin', 'password', '2024-01-01')""",
+            [("srv-1", "alpha", "10.0.0.1"), ("srv-2", "beta", "10.0.0.2")],
+        )
+        await conn.execute(
+            """INSERT INTO marketplace_repos (id, name, url)
+               VALUES ('repo-1', 'Official', 'https://example.com/repo')"""
+        )
+        await conn.execute(
+            """INSERT INTO marketplace_apps
+               (id, name, description, version, category, icon, author, license,
+                repo_id, docker_config)
+               VALUES ('nginx', 'Nginx', 'Web server', '1.25', 'web', 'nginx.png',
+                       'F5', 'BSD', 'repo-1', '{}')"""
+        )
+        await conn.executemany(
+            """INSERT INTO installed_apps
+               (id, server_id, app_id, container_name, status, config,
+                installed_at, networks)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    "inst-1",
+                    "srv-1",
+                    "nginx",
+                    "web_proxy",
+                    "running",
+                    '{"ports": {"80": 8080}, "env": {"A": "1"}}',
+                    "2024-01-01",
+                    '["bridge"]',
+                ),
+                (
+                    "inst-2",
+                    "srv-2",
+                    "nginx",
+                    "nginx",
+                    "stopped",
+                    None,
+                    "2024-01-02",
+                    None,
+                ),
+                ("inst-3", "srv-1", "gone", "gone", "error", "{}", "2024-01-03", None),
+            ],
+        )
+        await conn.commit()
+    return AppDatabaseService(connection)
+
+
+class TestGetInstallationDetails:
+    """Tests for get_installation_details method."""
+
+    @pytest.mark.asyncio
+    async def test_joins_server_app_and_repo(self, details_db):
+        """Should return server, app and repo fields with each installation."""
+        result = await details_db.get_installation_details()
+
+        assert [r["id"] for r in result] == ["inst-3", "inst-2", "inst-1"]
+        inst = result[2]
+        assert inst["app_name"] == "Nginx"
+        assert inst["app_icon"] == "nginx.png"
+        assert inst["app_version"] == "1.25"
+        assert inst["app_description"] == "Web server"
+        assert inst["app_category"] == "web"
+        assert inst["app_source"] == "Official"
+        assert inst["server_name"] == "alpha"
+        assert inst["server_host"] == "10.0.0.1"
+        assert inst["status"] == "running"
+        assert inst["ports"] == {"80": 8080}
+        assert inst["env"] == {"A": "1"}
+        assert inst["volumes"] == {}
+        assert inst["networks"] == ["bridge"]
+        assert inst["named_volumes"] == []
+
+    @pytest.mark.asyncio
+    async def test_missing_app_uses_defaults(self, details_db):
+        """Installations of unknown apps should fall back like before."""
+        result = await details_db.get_installation_details(status="error")
+
+        assert len(result) == 1
+        assert result[0]["app_name"] == "gone"
+        assert result[0]["app_version"] == "Unknown"
+        assert result[0]["app_category"] == "Unknown"
+        assert result[0]["app_source"] == "Unknown"
+        assert result[0]["app_icon"] is None
+
+    @pytest.mark.asyncio
+    async def test_filters_by_server_and_search(self, details_db):
+        """Should filter in SQL by server and by name search."""
+        on_alpha = await details_db.get_installation_details(server_id="srv-1")
+        by_server_name = await details_db.get_installation_details(search="BETA")
+        by_container = await details_db.get_installation_details(search="proxy")
+
+        assert {r["id"] for r in on_alpha} == {"inst-1", "inst-3"}
+        assert [r["id"] for r in by_server_name] == ["inst-2"]
+        assert [r["id"] for r in by_container] == ["inst-1"]
+
+    @pytest.mark.asyncio
+    async def test_search_wildcards_match_literally(self, details_db):
+        """LIKE wildcards in the search term should not match everything."""
+        assert await details_db.get_installation_details(search="%") == []
+        underscore = await details_db.get_installation_details(search="b_proxy")
+        assert [r["id"] for r in underscore] == ["inst-1"]
+
+    @pytest.mark.asyncio
+    async def test_paginates(self, details_db):
+        """Should apply limit and offset after ordering."""
+        page = await details_db.get_installation_details(limit=1, offset=1)
+
+        assert [r["id"] for r in page] == ["inst-2"]
+
+    @pytest.mark.asyncio
+    async def test_exception_returns_empty(self, service, mock_connection):
+        """Should return empty list on exception."""
+        mock_connection.get_connection.side_effect = Exception("DB error")
+
+        with patch("services.database.app_service.logger"):
+            result = await service.get_installation_details()
+
+        assert result == []
+
+
+class TestCountInstallationDetails:
+    """Tests for count_installation_details method."""
+
+    @pytest.mark.asyncio
+    async def test_counts_matches_with_filters(self, details_db):
+        """Should count every match, like the unpaginated details query."""
+        assert await details_db.count_installation_details() == 3
+        assert await details_db.count_installation_details(server_id="srv-1") == 2
+        assert await details_db.count_installation_details(search="BETA") == 1
+        assert await details_db.count_installation_details(status="error") == 1
+
+    @pytest.mark.asyncio
+    async def test_exception_returns_zero(self, service, mock_connection):
+        """Should return 0 on exception."""
+        mock_connection.get_connection.side_effect = Exception("DB error")
+
+        with patch("services.database.app_service.logger"):
+            assert await service.count_installation_details() == 0
+
+
 class TestDeleteInstallation:
     """Tests for delete_installation method."""
 
@@ -4,6 +4,7 @@ Unit tests for services/database/base.py
 Tests database connection manager and column whitelists.
 """
 
+import sqlite3
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
@@ -13,6 +14,9 @@ from services.database.base import (
     ALLOWED_INSTALLATION_COLUMNS,
     ALLOWED_SERVER_COLUMNS,
     ALLOWED_SYSTEM_INFO_COLUMNS,
+    DB_BUSY_ERRORS,
+    DB_CONNECTION_DURATION,
+    DB_QUERIES,
     DatabaseConnection,
 )
 
@@ -196,3 +200,39 @@ class TestGetConnection:
             await db.execute("SELECT 1")
 
         assert db_file.exists()
+
+    @pytest.mark.asyncio
+    async def test_get_connection_records_caller_metrics(self, tmp_path):
+        """get_connection should count statements and time per caller."""
+        conn = DatabaseConnection(db_path=tmp_path / "test.db")
+        test = self.test_get_connection_records_caller_metrics
+        caller = f"{__name__}.{test.__qualname__}"
+        held_before = DB_CONNECTION_DURATION.count(caller)
+
+        async with conn.get_connection() as db:
+            await db.execute("SELECT 1")
+            await db.execute("SELECT 2")
+
+        assert DB_QUERIES.value(caller) >= 2
+        assert DB_CONNECTION_DURATION.count(caller) == held_before + 1
+
+    @pytest.mark.asyncio
+    async def test_get_connection_counts_busy_errors(self, tmp_path):
+        """Lock timeouts should be counted against the caller."""
+        path = tmp_path / "test.db"
+        conn = DatabaseConnection(db_path=path)
+        test = self.test_get_connection_counts_busy_errors
+        caller = f"{__name__}.{test.__qualname__}"
+        locker = sqlite3.connect(path)
+        locker.execute("BEGIN EXCLUSIVE")
+
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                async with conn.get_connection() as db:
+                    await db.execute("PRAGMA busy_timeout = 0")
+                    await db.execute("SELECT * FROM sqlite_master")
+        finally:
+            locker.rollback()
+            locker.close()
+
+        assert DB_BUSY_ERRORS.value(caller) == 1
@@ -1,7 +1,8 @@
 """
 Unit tests for services/database/metrics_service.py.
 
-Tests MetricsDatabaseService methods.
+Tests MetricsDatabaseService methods. Metric samples are read and written
+against a real SQLite database; activity logs use a mocked connection.
 """
 
 from contextlib import asynccontextmanager
@@ -10,7 +11,15 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from models.metrics import ActivityLog, ActivityType, ContainerMetrics, ServerMetrics
-from services.database.metrics_service import MetricsDatabaseService
+from services.database.base import DatabaseConnection
+from services.database.metrics_service import (
+    MetricsDatabaseService,
+    delta_decode,
+    delta_encode,
+    from_epoch_ms,
+    to_epoch_ms,
+)
+from services.database.schema_init import SchemaInitializer
 
 
 @pytest.fixture
@@ -25,6 +34,14 @@ def service(mock_connection):
     return MetricsDatabaseService(mock_connection)
 
 
+@pytest.fixture
+async def metrics_db(tmp_path):
+    """Create MetricsDatabaseService over a real database."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await SchemaInitializer(connection).initialize_metrics_tables()
+    return MetricsDatabaseService(connection)
+
+
 def create_mock_context(mock_conn):
     """Create async context manager for database connection."""
 
@@ -58,29 +75,6 @@ def sample_server_metrics():
     )
 
 
-@pytest.fixture
-def sample_server_metrics_row():
-    """Create sample server metrics row from database."""
-    return {
-        "id": "metric-123",
-        "server_id": "server-456",
-        "cpu_percent": 45.5,
-        "memory_percent": 67.2,
-        "memory_used_mb": 2048,
-        "memory_total_mb": 4096,
-        "disk_percent": 55.0,
-        "disk_used_gb": 100,
-        "disk_total_gb": 200,
-        "network_rx_bytes": 1000000,
-        "network_tx_bytes": 500000,
-        "load_average_1m": 1.5,
-        "load_average_5m": 1.2,
-        "load_average_15m": 1.0,
-        "uptime_seconds": 86400,
-        "timestamp": "2024-01-15T10:00:00",
-    }
-
-
 @pytest.fixture
 def sample_container_metrics():
     """Create sample container metrics."""
@@ -99,24 +93,6 @@ def sample_container_metrics():
     )
 
 
-@pytest.fixture
-def sample_container_metrics_row():
-    """Create sample container metrics row from database."""
-    return {
-        "id": "container-metric-123",
-        "server_id": "server-456",
-        "container_id": "abc123",
-        "container_name": "nginx",
-        "cpu_percent": 10.5,
-        "memory_usage_mb": 256,
-        "memory_limit_mb": 512,
-        "network_rx_bytes": 50000,
-        "network_tx_bytes": 25000,
-        "status": "running",
-        "timestamp": "2024-01-15T10:00:00",
-    }
-
-
 @pytest.fixture
 def sample_activity_log():
     """Create sample activity log."""
@@ -190,53 +166,53 @@ class TestGetServerMetrics:
     """Tests for get_server_metrics method."""
 
     @pytest.mark.asyncio
-    async def test_get_server_metrics_success(
-        self, service, mock_connection, sample_server_metrics_row
-    ):
-        """get_server_metrics should return list of metrics."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[sample_server_metrics_row])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+    async def test_round_trip(self, metrics_db, sample_server_metrics):
+        """Saved samples should read back with the same values."""
+        await metrics_db.save_server_metrics(sample_server_metrics)
 
-        with patch("services.database.metrics_service.logger"):
-            result = await service.get_server_metrics("server-456")
+        [result] = await metrics_db.get_server_metrics("server-456")
 
-        assert len(result) == 1
-        assert result[0].id == "metric-123"
-        assert result[0].cpu_percent == 45.5
+        expected = sample_server_metrics.model_dump(exclude={"id", "timestamp"})
+        assert result.model_dump(exclude={"id", "timestamp"}) == expected
+        assert result.timestamp == "2024-01-15T10:00:00+00:00"
 
     @pytest.mark.asyncio
-    async def test_get_server_metrics_with_since(
-        self, service, mock_connection, sample_server_metrics_row
+    async def test_newest_first_with_since_and_limit(
+        self, metrics_db, sample_server_metrics
     ):
-        """get_server_metrics should filter by since timestamp."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[sample_server_metrics_row])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+        """Results should be filtered by since, newest first, up to limit."""
+        for hour in range(6):
+            await metrics_db.save_server_metrics(
+                sample_server_metrics.model_copy(
+                    update={"timestamp": f"2024-01-15T0{hour}:00:00Z"}
+                )
+            )
+        await metrics_db.save_server_metrics(
+            sample_server_metrics.model_copy(update={"server_id": "other"})
+        )
 
-        with patch("services.database.metrics_service.logger"):
-            await service.get_server_metrics("server-456", since="2024-01-15T00:00:00")
+        result = await metrics_db.get_server_metrics(
+            "server-456", since="2024-01-15T02:00:00+00:00", limit=3
+        )
 
-        call_args = mock_conn.execute.call_args[0]
-        assert "timestamp >=" in call_args[0]
+        assert [m.timestamp[11:13] for m in result] == ["05", "04", "03"]
 
     @pytest.mark.asyncio
-    async def test_get_server_metrics_empty(self, service, mock_connection):
-        """get_server_metrics should return empty list when no metrics."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+    async def test_same_millisecond_replaces(self, metrics_db, sample_server_metrics):
+        """A second sample at the same instant should replace the first."""
+        await metrics_db.save_server_metrics(sample_server_metrics)
+        await metrics_db.save_server_metrics(
+            sample_server_metrics.model_copy(update={"cpu_percent": 99.0})
+        )
 
-        with patch("services.database.metrics_service.logger"):
-            result = await service.get_server_metrics("server-456")
+        result = await metrics_db.get_server_metrics("server-456")
 
-        assert result == []
+        assert [m.cpu_percent for m in result] == [99.0]
+
+    @pytest.mark.asyncio
+    async def test_unknown_server(self, metrics_db):
+        """get_server_metrics should return empty list when no metrics."""
+        assert await metrics_db.get_server_metrics("server-456") == []
 
     @pytest.mark.asyncio
     async def test_get_server_metrics_exception(self, service, mock_connection):
@@ -279,85 +255,336 @@ class TestSaveContainerMetrics:
         assert result is False
 
 
-class TestGetContainerMetrics:
-    """Tests for get_container_metrics method."""
+class TestSaveContainerMetricsBatch:
+    """Tests for save_container_metrics_batch method."""
 
     @pytest.mark.asyncio
-    async def test_get_container_metrics_success(
-        self, service, mock_connection, sample_container_metrics_row
-    ):
-        """get_container_metrics should return list of metrics."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[sample_container_metrics_row])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+    async def test_saves_every_container(self, metrics_db, sample_container_metrics):
+        """All samples of a batch should be stored."""
+        batch = [
+            sample_container_metrics.model_copy(
+                update={"container_name": name, "container_id": f"{name}-id"}
+            )
+            for name in ("nginx", "redis", "postgres")
+        ]
 
-        with patch("services.database.metrics_service.logger"):
-            result = await service.get_container_metrics("server-456")
+        assert await metrics_db.save_container_metrics_batch(batch) is True
 
-        assert len(result) == 1
-        assert result[0].container_name == "nginx"
+        result = await metrics_db.get_container_metrics("server-456")
+        assert sorted(m.container_name for m in result) == [
+            "nginx",
+            "postgres",
+            "redis",
+        ]
 
     @pytest.mark.asyncio
-    async def test_get_container_metrics_by_name(
-        self, service, mock_connection, sample_container_metrics_row
+    async def test_single_commit(
+        self, service, mock_connection, sample_container_metrics
     ):
-        """get_container_metrics should filter by container name."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[sample_container_metrics_row])
+        """A batch should be written in one transaction."""
         mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
         mock_connection.get_connection.return_value = create_mock_context(mock_conn)
 
-        with patch("services.database.metrics_service.logger"):
-            await service.get_container_metrics("server-456", container_name="nginx")
+        result = await service.save_container_metrics_batch(
+            [sample_container_metrics] * 3
+        )
 
-        call_args = mock_conn.execute.call_args[0]
-        assert "container_name" in call_args[0]
+        assert result is True
+        mock_conn.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, service, mock_connection):
+        """An empty batch should not open a connection."""
+        assert await service.save_container_metrics_batch([]) is True
+        mock_connection.get_connection.assert_not_called()
+
+
+class TestGetContainerMetrics:
+    """Tests for get_container_metrics method."""
 
     @pytest.mark.asyncio
-    async def test_get_container_metrics_with_since(
-        self, service, mock_connection, sample_container_metrics_row
+    async def test_round_trip(self, metrics_db, sample_container_metrics):
+        """Saved samples should read back with the same values."""
+        await metrics_db.save_container_metrics(sample_container_metrics)
+
+        [result] = await metrics_db.get_container_metrics("server-456")
+
+        expected = sample_container_metrics.model_dump(exclude={"id", "timestamp"})
+        assert result.model_dump(exclude={"id", "timestamp"}) == expected
+
+    @pytest.mark.asyncio
+    async def test_filters_by_name_and_since(
+        self, metrics_db, sample_container_metrics
     ):
-        """get_container_metrics should filter by since timestamp."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[sample_container_metrics_row])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+        """Only samples of the named container after since should match."""
+        for hour in range(4):
+            for name in ("nginx", "redis"):
+                await metrics_db.save_container_metrics(
+                    sample_container_metrics.model_copy(
+                        update={
+                            "container_name": name,
+                            "container_id": f"{name}-id",
+                            "timestamp": f"2024-01-15T0{hour}:00:00+00:00",
+                        }
+                    )
+                )
+
+        result = await metrics_db.get_container_metrics(
+            "server-456", container_name="redis", since="2024-01-15T02:00:00"
+        )
 
-        with patch("services.database.metrics_service.logger"):
-            await service.get_container_metrics(
-                "server-456", since="2024-01-15T00:00:00"
+        assert [(m.container_name, m.timestamp[11:13]) for m in result] == [
+            ("redis", "03"),
+            ("redis", "02"),
+        ]
+        assert {m.container_id for m in result} == {"redis-id"}
+
+    @pytest.mark.asyncio
+    async def test_recreated_container_keeps_name(
+        self, metrics_db, sample_container_metrics
+    ):
+        """A new container id under the same name should still match."""
+        await metrics_db.save_container_metrics(sample_container_metrics)
+        await metrics_db.save_container_metrics(
+            sample_container_metrics.model_copy(
+                update={"container_id": "def456", "timestamp": "2024-01-15T11:00:00"}
             )
+        )
 
-        call_args = mock_conn.execute.call_args[0]
-        assert "timestamp >=" in call_args[0]
+        result = await metrics_db.get_container_metrics(
+            "server-456", container_name="nginx"
+        )
+
+        assert [m.container_id for m in result] == ["def456", "abc123"]
 
     @pytest.mark.asyncio
-    async def test_get_container_metrics_empty(self, service, mock_connection):
+    async def test_unknown_server(self, metrics_db):
         """get_container_metrics should return empty list when no metrics."""
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[])
-        mock_conn = AsyncMock()
-        mock_conn.execute = AsyncMock(return_value=mock_cursor)
-        mock_connection.get_connection.return_value = create_mock_context(mock_conn)
+        assert await metrics_db.get_container_metrics("server-456") == []
+
+    @pytest.mark.asyncio
+    async def test_get_container_metrics_exception(self, service, mock_connection):
+        """get_container_metrics should return empty list on exception."""
+        mock_connection.get_connection.side_effect = Exception("DB error")
 
         with patch("services.database.metrics_service.logger"):
             result = await service.get_container_metrics("server-456")
 
         assert result == []
 
+
+async def save_minutes(metrics_db, sample, minutes, **updates):
+    """Save one sample per minute after 10:00, varying cpu and memory."""
+    for minute in range(minutes):
+        await metrics_db.save_server_metrics(
+            sample.model_copy(
+                update={
+                    "timestamp": f"2024-01-15T10:{minute:02d}:00",
+                    "cpu_percent": float(minute),
+                    "memory_used_mb": 1000 + minute * 10,
+                    **updates,
+                }
+            )
+        )
+
+
+class TestGetMetricSeries:
+    """Tests for the columnar series queries."""
+
+    SINCE = "2024-01-15T10:00:00"
+    UNTIL = "2024-01-15T11:00:00"
+
     @pytest.mark.asyncio
-    async def test_get_container_metrics_exception(self, service, mock_connection):
-        """get_container_metrics should return empty list on exception."""
+    async def test_server_series_oldest_first(self, metrics_db, sample_server_metrics):
+        """Every sample should become one entry per array, oldest first."""
+        await save_minutes(metrics_db, sample_server_metrics, 3)
+        await save_minutes(
+            metrics_db, sample_server_metrics, 3, server_id="other", cpu_percent=9.0
+        )
+
+        series = await metrics_db.get_server_metric_series(
+            "server-456",
+            since=self.SINCE,
+            fields=["memory_used_mb", "cpu_percent"],
+            until=self.UNTIL,
+        )
+
+        start = to_epoch_ms(self.SINCE)
+        assert series.to_dict() == {
+            "timestamps": [start, start + 60_000, start + 120_000],
+            "fields": {
+                "memory_used_mb": [1000, 1010, 1020],
+                "cpu_percent": [0.0, 1.0, 2.0],
+            },
+            "count": 3,
+            "bucket_ms": None,
+            "delta": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_all_fields_by_default(self, metrics_db, sample_server_metrics):
+        """Without fields every metric column should be returned."""
+        await save_minutes(metrics_db, sample_server_metrics, 1)
+
+        series = await metrics_db.get_server_metric_series(
+            "server-456", since=self.SINCE, until=self.UNTIL
+        )
+
+        expected = sample_server_metrics.model_dump(
+            exclude={"id", "server_id", "timestamp"}
+        )
+        assert {name: values[0] for name, values in series.fields.items()} == {
+            **expected,
+            "cpu_percent": 0.0,
+            "memory_used_mb": 1000,
+        }
+
+    @pytest.mark.asyncio
+    async def test_max_points_averages_buckets(self, metrics_db, sample_server_metrics):
+        """Samples should be averaged into at most max_points buckets."""
+        await save_minutes(metrics_db, sample_server_metrics, 60)
+
+        series = await metrics_db.get_server_metric_series(
+            "server-456",
+            since=self.SINCE,
+            fields=["cpu_percent", "memory_used_mb"],
+            max_points=4,
+            until=self.UNTIL,
+        )
+
+        assert series.bucket_ms == 15 * 60_000
+        assert series.fields["cpu_percent"] == [7.0, 22.0, 37.0, 52.0]
+        assert series.fields["memory_used_mb"] == [1070, 1220, 1370, 1520]
+        assert series.timestamps[-1] == to_epoch_ms("2024-01-15T10:59:00")
+
+    @pytest.mark.asyncio
+    async def test_delta_encodes_integers(self, metrics_db, sample_server_metrics):
+        """Timestamps and integer fields should decode to the plain arrays."""
+        await save_minutes(metrics_db, sample_server_metrics, 5)
+        await metrics_db.save_server_metrics(
+            sample_server_metrics.model_copy(
+                update={"timestamp": "2024-01-15T10:07:00", "uptime_seconds": None}
+            )
+        )
+        fields = ["cpu_percent", "memory_used_mb", "uptime_seconds"]
+        plain = await metrics_db.get_server_metric_series(
+            "server-456", since=self.SINCE, fields=fields, until=self.UNTIL
+        )
+
+        series = await metrics_db.get_server_metric_series(
+            "server-456", since=self.SINCE, fields=fields, delta=True, until=self.UNTIL
+        )
+
+        assert series.delta == ("timestamps", "memory_used_mb")
+        assert series.timestamps[1:] == [60_000] * 4 + [180_000]
+        assert delta_decode(series.timestamps) == plain.timestamps
+        memory = plain.fields["memory_used_mb"]
+        assert delta_decode(series.fields["memory_used_mb"]) == memory
+        assert series.fields["cpu_percent"] == plain.fields["cpu_percent"]
+        assert series.fields["uptime_seconds"] == plain.fields["uptime_seconds"]
+
+    @pytest.mark.asyncio
+    async def test_container_series_follows_name(
+        self, metrics_db, sample_container_metrics
+    ):
+        """A recreated container should continue the series of its name."""
+        for minute, container_id, name in [
+            (0, "abc123", "nginx"),
+            (1, "abc123", "nginx"),
+            (1, "redis-id", "redis"),
+            (2, "def456", "nginx"),
+        ]:
+            await metrics_db.save_container_metrics(
+                sample_container_metrics.model_copy(
+                    update={
+                        "container_id": container_id,
+                        "container_name": name,
+                        "timestamp": f"2024-01-15T10:0{minute}:00",
+                        "memory_usage_mb": 100 * (minute + 1),
+                        "status": "exited" if minute == 2 else "running",
+                    }
+                )
+            )
+
+        series = await metrics_db.get_container_metric_series(
+            "server-456",
+            "nginx",
+            since=self.SINCE,
+            fields=["memory_usage_mb", "status"],
+            until=self.UNTIL,
+        )
+        bucketed = await metrics_db.get_container_metric_series(
+            "server-456",
+            "nginx",
+            since=self.SINCE,
+            fields=["memory_usage_mb", "status"],
+            max_points=1,
+            until=self.UNTIL,
+        )
+
+        assert series.fields == {
+            "memory_usage_mb": [100, 200, 300],
+            "status": ["running", "running", "exited"],
+        }
+        assert bucketed.fields == {"memory_usage_mb": [200], "status": ["exited"]}
+
+    @pytest.mark.asyncio
+    async def test_empty_series(self, metrics_db):
+        """Unknown servers should give empty arrays for each field."""
+        series = await metrics_db.get_server_metric_series(
+            "server-456", since=self.SINCE, fields=["cpu_percent"], delta=True
+        )
+
+        assert series.timestamps == []
+        assert series.fields == {"cpu_percent": []}
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_fields_and_points(self, metrics_db):
+        """Unknown fields and empty point counts should raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown metric fields: id"):
+            await metrics_db.get_server_metric_series(
+                "server-456", since=self.SINCE, fields=["cpu_percent", "id"]
+            )
+        with pytest.raises(ValueError, match="max_points"):
+            await metrics_db.get_container_metric_series(
+                "server-456", "nginx", since=self.SINCE, max_points=0
+            )
+
+    @pytest.mark.asyncio
+    async def test_series_exception(self, service, mock_connection):
+        """Database errors should give an empty series."""
         mock_connection.get_connection.side_effect = Exception("DB error")
 
         with patch("services.database.metrics_service.logger"):
-            result = await service.get_container_metrics("server-456")
+            series = await service.get_container_metric_series(
+                "server-456", "nginx", since=self.SINCE, fields=["status"]
+            )
 
-        assert result == []
+        assert series.fields == {"status": []}
+
+    def test_delta_round_trip(self):
+        """delta_decode should invert delta_encode."""
+        values = [5, 5, 8, 2, 2**40]
+
+        assert delta_encode(values) == [5, 0, 3, -6, 2**40 - 2]
+        assert delta_decode(delta_encode(values)) == values
+        assert delta_encode([]) == []
+
+
+class TestEpochConversion:
+    """Tests for the timestamp conversion helpers."""
+
+    def test_offsets_and_naive_timestamps(self):
+        """Naive timestamps are UTC and offsets are applied."""
+        assert to_epoch_ms("1970-01-01T00:00:01") == 1000
+        assert to_epoch_ms("1970-01-01T00:00:01Z") == 1000
+        assert to_epoch_ms("1970-01-01T01:00:01.5+01:00") == 1500
+
+    def test_round_trip(self):
+        """Converting back should give the same instant in UTC."""
+        ts = to_epoch_ms("2024-01-15T10:00:00.123456+00:00")
+
+        assert from_epoch_ms(ts) == "2024-01-15T10:00:00.123000+00:00"
 
 
 class TestSaveActivityLog:
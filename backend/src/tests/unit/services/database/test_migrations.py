@@ -0,0 +1,423 @@
+"""
+Unit tests for services/database/migrations.py.
+
+Tests versioned migrations against a real SQLite database: fresh installs,
+the no-op fast path, upgrading pre-versioning databases, rollback, the
+metrics storage conversion, the marketplace rating sums, the agents
+table rebuild and the deployment owner columns.
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from services.database.base import DatabaseConnection
+from services.database.metrics_service import MetricsDatabaseService
+from services.database.migrations import (
+    MIGRATIONS,
+    Migration,
+    MigrationRunner,
+    split_statements,
+)
+from services.database.schema_sql import DEPLOYMENT_JOBS_SCHEMA, SYSTEM_INFO_SCHEMA
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """Create a connection to an empty database file."""
+    return DatabaseConnection(db_path=tmp_path / "tomo.db")
+
+
+async def tables(connection):
+    """Return the names of all tables in the database."""
+    async with connection.get_connection() as conn:
+        cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        return {row[0] for row in await cursor.fetchall()}
+
+
+async def columns(connection, table):
+    """Return the column names of a table."""
+    async with connection.get_connection() as conn:
+        cursor = await conn.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in await cursor.fetchall()}
+
+
+class TestSplitStatements:
+    """Tests for split_statements."""
+
+    def test_keeps_trigger_bodies_whole(self):
+        """Semicolons inside a trigger body should not split the statement."""
+        statements = split_statements(SYSTEM_INFO_SCHEMA)
+
+        triggers = [s for s in statements if "CREATE TRIGGER" in s]
+        assert len(triggers) == 1
+        assert triggers[0].endswith("END;")
+        assert len(statements) == 4
+
+    def test_drops_trailing_comments(self):
+        """A trailing comment should not become an empty statement."""
+        assert split_statements("SELECT 1;\n-- done\n") == ["SELECT 1;"]
+
+
+class TestMigrate:
+    """Tests for MigrationRunner.migrate."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_gets_every_step(self, connection):
+        """A new database should get all tables and a recorded version."""
+        runner = MigrationRunner(connection)
+
+        with patch("services.database.migrations.logger") as mock_logger:
+            applied = await runner.migrate()
+
+        assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+        assert all(m.duration_ms >= 0 for m in applied)
+        assert await runner.current_version() == runner.latest_version
+        assert {"users", "agents", "marketplace_apps", "schema_migrations"} <= (
+            await tables(connection)
+        )
+        assert "password_changed_at" in await columns(connection, "users")
+        step_logs = [
+            call
+            for call in mock_logger.info.call_args_list
+            if call.args[0] == "Applied schema migration"
+        ]
+        assert len(step_logs) == len(MIGRATIONS)
+        assert "duration_ms" in step_logs[0].kwargs
+
+    @pytest.mark.asyncio
+    async def test_current_database_is_a_single_read(self, connection):
+        """A second run should only open one connection to read the version."""
+        runner = MigrationRunner(connection)
+        await runner.migrate()
+
+        with patch.object(
+            connection, "get_connection", wraps=connection.get_connection
+        ) as get_connection:
+            applied = await runner.migrate()
+
+        assert applied == []
+        assert get_connection.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_upgrades_pre_versioning_database(self, connection):
+        """Old databases should get missing columns and keep their rows."""
+        async with connection.get_connection() as conn:
+            await conn.executescript("""
+                CREATE TABLE users (
+                    id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL UNIQUE,
+                    email TEXT DEFAULT '',
+                    password_hash TEXT NOT NULL,
+                    role TEXT NOT NULL DEFAULT 'user',
+                    created_at TEXT NOT NULL,
+                    last_login TEXT,
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    preferences_json TEXT DEFAULT '{}'
+                );
+                INSERT INTO users (id, username, password_hash, created_at)
+                VALUES ('u1', 'admin', 'hash', '2024-01-01T00:00:00');
+            """)
+
+        await MigrationRunner(connection).migrate()
+
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT password_changed_at, avatar FROM users WHERE id = 'u1'"
+            )
+            row = await cursor.fetchone()
+        assert tuple(row) == ("2024-01-01T00:00:00", None)
+
+    @pytest.mark.asyncio
+    async def test_only_pending_steps_are_applied(self, connection):
+        """Steps at or below the recorded version should be skipped."""
+        await MigrationRunner(connection, MIGRATIONS[:2]).migrate()
+
+        applied = await MigrationRunner(connection).migrate()
+
+        assert [m.version for m in applied] == [m.version for m in MIGRATIONS[2:]]
+
+    @pytest.mark.asyncio
+    async def test_failure_rolls_back_every_step(self, connection):
+        """A failing step should leave the database untouched."""
+
+        async def broken(conn):
+            await conn.execute("CREATE TABLE half_done (id INTEGER)")
+            raise sqlite3.OperationalError("boom")
+
+        runner = MigrationRunner(connection, [*MIGRATIONS, Migration(99, "x", broken)])
+
+        with pytest.raises(sqlite3.OperationalError, match="boom"):
+            await runner.migrate()
+
+        assert await tables(connection) == set()
+        assert await runner.current_version() == 0
+
+    def test_rejects_unordered_versions(self, connection):
+        """Versions must be strictly increasing."""
+        with pytest.raises(ValueError, match="strictly increasing"):
+            MigrationRunner(connection, [MIGRATIONS[1], MIGRATIONS[0]])
+
+
+LEGACY_METRICS = """
+CREATE TABLE server_metrics (
+    id TEXT PRIMARY KEY,
+    server_id TEXT NOT NULL,
+    cpu_percent REAL NOT NULL,
+    memory_percent REAL NOT NULL,
+    memory_used_mb INTEGER NOT NULL,
+    memory_total_mb INTEGER NOT NULL,
+    disk_percent REAL NOT NULL,
+    disk_used_gb INTEGER NOT NULL,
+    disk_total_gb INTEGER NOT NULL,
+    network_rx_bytes INTEGER DEFAULT 0,
+    network_tx_bytes INTEGER DEFAULT 0,
+    load_average_1m REAL,
+    load_average_5m REAL,
+    load_average_15m REAL,
+    uptime_seconds INTEGER,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE container_metrics (
+    id TEXT PRIMARY KEY,
+    server_id TEXT NOT NULL,
+    container_id TEXT NOT NULL,
+    container_name TEXT NOT NULL,
+    cpu_percent REAL NOT NULL,
+    memory_usage_mb INTEGER NOT NULL,
+    memory_limit_mb INTEGER NOT NULL,
+    network_rx_bytes INTEGER DEFAULT 0,
+    network_tx_bytes INTEGER DEFAULT 0,
+    status TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX idx_server_metrics_server ON server_metrics(server_id);
+"""
+
+
+class TestCompactMetricsStorage:
+    """Tests for the metrics storage conversion."""
+
+    @pytest.mark.asyncio
+    async def test_converts_legacy_rows_in_chunks(self, connection):
+        """Legacy rows should move to the sample tables and the old ones go."""
+        async with connection.get_connection() as conn:
+            await conn.executescript(LEGACY_METRICS)
+            await conn.executemany(
+                "INSERT INTO server_metrics (id, server_id, cpu_percent,"
+                " memory_percent, memory_used_mb, memory_total_mb, disk_percent,"
+                " disk_used_gb, disk_total_gb, load_average_1m, timestamp)"
+                " VALUES (?, ?, ?, 50, 1024, 2048, 40, 10, 100, 0.5, ?)",
+                [
+                    ("sm-1", "srv-a", 10.0, "2024-01-15T10:00:00+00:00"),
+                    ("sm-2", "srv-a", 20.0, "2024-01-15T10:01:00.250000"),
+                    ("sm-3", "srv-b", 30.0, "2024-01-15T11:00:00Z"),
+                    ("sm-4", "srv-a", 40.0, "not a timestamp"),
+                    ("sm-5", "srv-a", 50.0, "2024-01-15T12:00:00+02:00"),
+                ],
+            )
+            await conn.executemany(
+                "INSERT INTO container_metrics (id, server_id, container_id,"
+                " container_name, cpu_percent, memory_usage_mb, memory_limit_mb,"
+                " status, timestamp) VALUES (?, 'srv-a', ?, ?, 1, 64, 128,"
+                " 'running', ?)",
+                [
+                    ("cm-1", "c1", "web", "2024-01-15T10:00:00"),
+                    ("cm-2", "c2", "db", "2024-01-15T10:00:00"),
+                    ("cm-3", "c1", "web", "2024-01-15T10:01:00"),
+                ],
+            )
+            await conn.commit()
+
+        with patch("services.database.migrations.METRICS_CONVERSION_CHUNK_ROWS", 2):
+            await MigrationRunner(connection).migrate()
+
+        existing = await tables(connection)
+        assert not {"server_metrics", "container_metrics"} & existing
+        metrics = MetricsDatabaseService(connection)
+        server_a = await metrics.get_server_metrics("srv-a")
+        assert [(m.cpu_percent, m.timestamp) for m in server_a] == [
+            (20.0, "2024-01-15T10:01:00.250000+00:00"),
+            (50.0, "2024-01-15T10:00:00+00:00"),
+        ]
+        assert server_a[0].load_average_1m == 0.5
+        assert len(await metrics.get_server_metrics("srv-b")) == 1
+        web = await metrics.get_container_metrics("srv-a", container_name="web")
+        assert [m.container_id for m in web] == ["c1", "c1"]
+        assert len(await metrics.get_container_metrics("srv-a")) == 3
+
+    @pytest.mark.asyncio
+    async def test_versioned_database_only_converts(self, connection):
+        """Databases already at version 6 should only run the conversion."""
+        async with connection.get_connection() as conn:
+            await conn.executescript(LEGACY_METRICS)
+        await MigrationRunner(connection, MIGRATIONS[:6]).migrate()
+
+        applied = await MigrationRunner(connection).migrate()
+
+        assert applied[0].name == "compact_metrics_storage"
+        assert [m.name for m in applied] == [m.name for m in MIGRATIONS[6:]]
+        assert "server_metrics" not in await tables(connection)
+
+
+class TestMarketplaceRatingSums:
+    """Tests for the marketplace rating aggregate backfill."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_aggregates_from_ratings(self, connection):
+        """Rating sums, counts and averages should match the stored ratings."""
+        await MigrationRunner(connection, MIGRATIONS[:7]).migrate()
+        async with connection.get_connection() as conn:
+            await conn.execute("ALTER TABLE marketplace_apps DROP COLUMN rating_sum")
+            await conn.execute(
+                "INSERT INTO marketplace_repos (id, name, url)"
+                " VALUES ('r1', 'Repo', 'https://example.com')"
+            )
+            await conn.executemany(
+                "INSERT INTO marketplace_apps (id, name, description, version,"
+                " category, author, license, repo_id, docker_config, avg_rating,"
+                " rating_count) VALUES (?, ?, '', '1.0', 'utility', 'me', 'MIT',"
+                " 'r1', '{}', 1.0, 9)",
+                [("a1", "One"), ("a2", "Two")],
+            )
+            await conn.executemany(
+                "INSERT INTO app_ratings (id, app_id, user_id, rating, created_at,"
+                " updated_at) VALUES (?, 'a1', ?, ?, '2024-01-01', '2024-01-01')",
+                [("x1", "u1", 5), ("x2", "u2", 2)],
+            )
+            await conn.commit()
+
+        applied = await MigrationRunner(connection).migrate()
+
+        assert applied[0].name == "marketplace_rating_sums"
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT id, rating_sum, rating_count, avg_rating"
+                " FROM marketplace_apps ORDER BY id"
+            )
+            rows = [tuple(row) for row in await cursor.fetchall()]
+        assert rows == [("a1", 7, 2, 3.5), ("a2", 0, 0, None)]
+
+
+LEGACY_AGENTS = """
+CREATE TABLE agents (
+    id TEXT PRIMARY KEY,
+    server_id TEXT NOT NULL UNIQUE,
+    token_hash TEXT,
+    version TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'active', 'disconnected', 'error')),
+    last_seen TEXT,
+    registered_at TEXT,
+    config TEXT,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (server_id) REFERENCES servers(id) ON DELETE CASCADE
+);
+CREATE INDEX idx_agents_server_id ON agents(server_id);
+INSERT INTO agents (id, server_id, token_hash, status) VALUES
+    ('a1', 'srv-1', 'h1', 'active'),
+    ('a2', 'srv-2', 'h2', 'error'),
+    ('a3', 'srv-3', NULL, 'pending');
+"""
+
+
+class TestAgentStatusCheck:
+    """Tests for rebuilding the agents table constraint."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_legacy_agents_table(self, connection):
+        """Legacy databases should accept AgentStatus values and keep rows."""
+        async with connection.get_connection() as conn:
+            await conn.executescript(LEGACY_AGENTS)
+        await MigrationRunner(connection, MIGRATIONS[:11]).migrate()
+        async with connection.get_connection() as conn:
+            await conn.execute(
+                "INSERT INTO agent_registration_codes (id, agent_id, code,"
+                " expires_at) VALUES ('rc1', 'a3', 'code', '2099-01-01')"
+            )
+            await conn.commit()
+
+        applied = await MigrationRunner(connection, MIGRATIONS[:12]).migrate()
+
+        assert [m.name for m in applied] == ["agent_status_check"]
+        async with connection.get_connection() as conn:
+            await conn.execute("UPDATE agents SET status = 'connected' WHERE id = 'a1'")
+            with pytest.raises(sqlite3.IntegrityError):
+                await conn.execute(
+                    "UPDATE agents SET status = 'active' WHERE id = 'a2'"
+                )
+            cursor = await conn.execute(
+                "SELECT id, status, token_hash FROM agents ORDER BY id"
+            )
+            rows = [tuple(row) for row in await cursor.fetchall()]
+            cursor = await conn.execute("SELECT agent_id FROM agent_registration_codes")
+            codes = [row[0] for row in await cursor.fetchall()]
+            cursor = await conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+                " AND tbl_name = 'agents' AND sql IS NOT NULL"
+            )
+            indexes = {row[0] for row in await cursor.fetchall()}
+        assert rows == [
+            ("a1", "connected", "h1"),
+            ("a2", "disconnected", "h2"),
+            ("a3", "pending", None),
+        ]
+        assert codes == ["a3"]
+        assert {"idx_agents_server_id", "idx_agents_token_hash"} <= indexes
+        assert "pending_token_hash" in await columns(connection, "agents")
+        assert "agents_new" not in await tables(connection)
+
+    @pytest.mark.asyncio
+    async def test_current_table_is_left_alone(self, connection):
+        """Fresh databases already have the constraint and are not rebuilt."""
+        await MigrationRunner(connection, MIGRATIONS[:11]).migrate()
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'agents'"
+            )
+            before = (await cursor.fetchone())[0]
+
+        await MigrationRunner(connection).migrate()
+
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'agents'"
+            )
+            assert (await cursor.fetchone())[0] == before
+
+
+class TestDeploymentOwners:
+    """Tests for the deployment owner columns."""
+
+    @pytest.mark.asyncio
+    async def test_adds_owner_columns(self, connection):
+        """Databases from before the columns should get them and keep rows."""
+        async with connection.get_connection() as conn:
+            await conn.executescript("""
+                CREATE TABLE installed_apps (
+                    id TEXT PRIMARY KEY,
+                    server_id TEXT NOT NULL,
+                    app_id TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending'
+                );
+                INSERT INTO installed_apps (id, server_id, app_id, status)
+                VALUES ('i1', 's1', 'web', 'pulling');
+            """)
+            await conn.executescript(DEPLOYMENT_JOBS_SCHEMA.replace("owner TEXT,", ""))
+            await conn.execute(
+                "INSERT INTO deployment_jobs (id, kind, server_id, app_id, status,"
+                " created_at) VALUES ('j1', 'install', 's1', 'web', 'running', 'now')"
+            )
+            await conn.commit()
+        await MigrationRunner(connection, MIGRATIONS[:12]).migrate()
+
+        applied = await MigrationRunner(connection).migrate()
+
+        assert [m.name for m in applied] == ["deployment_owners"]
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute("SELECT status, owner FROM installed_apps")
+            assert tuple(await cursor.fetchone()) == ("pulling", None)
+            cursor = await conn.execute("SELECT status, owner FROM deployment_jobs")
+            assert tuple(await cursor.fetchone()) == ("running", None)
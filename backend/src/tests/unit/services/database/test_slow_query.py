@@ -0,0 +1,157 @@
+"""
+Unit tests for services/database/slow_query.py.
+
+Tests slow statement capture against a real SQLite database: thresholds,
+parameter shapes, query plans, full scan detection and the ranked report.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from services.database.base import DatabaseConnection
+from services.database.migrations import MIGRATIONS, MigrationRunner
+from services.database.slow_query import (
+    SLOW_QUERY_ENV,
+    SlowQueryLog,
+    _full_scans,
+    _parameter_shape,
+    slow_query_log_from_env,
+    slow_query_report_path,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path to a database with the agents table."""
+    return tmp_path / "tomo.db"
+
+
+async def create_agents(db_path, migrations=MIGRATIONS):
+    """Create the schema up to the given migrations."""
+    await MigrationRunner(DatabaseConnection(db_path=db_path), migrations).migrate()
+
+
+async def find_agent(connection, token_hash):
+    """Look an agent up by token hash and fetch the row."""
+    async with connection.get_connection() as conn:
+        cursor = await conn.execute(
+            "SELECT * FROM agents WHERE token_hash = ?", (token_hash,)
+        )
+        return await cursor.fetchone()
+
+
+class TestSlowQueryLog:
+    """Tests for SlowQueryLog with DatabaseConnection."""
+
+    @pytest.mark.asyncio
+    async def test_records_shape_plan_and_caller(self, db_path):
+        """Slow statements should keep parameter types, plan and caller."""
+        await create_agents(db_path, MIGRATIONS[:5])
+        log = SlowQueryLog(threshold_ms=0)
+        connection = DatabaseConnection(db_path=db_path, slow_query_log=log)
+
+        with patch("services.database.slow_query.logger") as mock_logger:
+            await find_agent(connection, "secret-hash")
+            await find_agent(connection, "other-hash")
+
+        [stats] = log.report()
+        assert stats.sql == "SELECT * FROM agents WHERE token_hash = ?"
+        assert stats.calls == 2
+        assert stats.parameter_shapes == {"(str)"}
+        assert stats.callers == {f"{__name__}.find_agent"}
+        assert stats.full_scans == ["agents"]
+        assert stats.total_ms >= stats.max_ms > 0
+        logged = mock_logger.warning.call_args.kwargs
+        assert "secret-hash" not in json.dumps(logged)
+
+    @pytest.mark.asyncio
+    async def test_token_hash_lookup_uses_index(self, db_path):
+        """After migrating, agent token lookups should not scan the table."""
+        await create_agents(db_path)
+        log = SlowQueryLog(threshold_ms=0)
+
+        with patch("services.database.slow_query.logger"):
+            await find_agent(
+                DatabaseConnection(db_path=db_path, slow_query_log=log), "x"
+            )
+
+        [stats] = log.report()
+        assert stats.full_scans == []
+        assert "idx_agents_token_hash" in stats.plan[0]
+
+    @pytest.mark.asyncio
+    async def test_fast_statements_are_ignored(self, db_path):
+        """Statements under the threshold should not be recorded."""
+        log = SlowQueryLog(threshold_ms=60_000)
+        connection = DatabaseConnection(db_path=db_path, slow_query_log=log)
+
+        async with connection.get_connection() as conn:
+            await conn.execute("SELECT 1")
+
+        assert log.report() == []
+
+    @pytest.mark.asyncio
+    async def test_write_report_ranks_by_total_time(self, db_path, tmp_path):
+        """The report should list the most expensive statement first."""
+        log = SlowQueryLog(threshold_ms=0)
+        connection = DatabaseConnection(db_path=db_path, slow_query_log=log)
+
+        with patch("services.database.slow_query.logger"):
+            async with connection.get_connection() as conn:
+                await conn.execute("SELECT 1")
+                cursor = await conn.execute(
+                    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL"
+                    " SELECT i + 1 FROM n WHERE i < 50000) SELECT count(*) FROM n"
+                )
+                await cursor.fetchall()
+            path = log.write_report(tmp_path / "report.json")
+
+        queries = json.loads(path.read_text())["queries"]
+        assert len(queries) == 2
+        assert queries[0]["sql"].startswith("WITH RECURSIVE")
+        assert queries[0]["total_ms"] >= queries[1]["total_ms"]
+
+
+class TestHelpers:
+    """Tests for plan and parameter helpers."""
+
+    def test_full_scans_ignore_index_searches(self):
+        """Only plain table scans should be flagged."""
+        plan = [
+            "SCAN agents",
+            "SCAN TABLE servers",
+            "SEARCH users USING INDEX idx_users_username (username=?)",
+            "SCAN logs USING COVERING INDEX idx_logs_level",
+        ]
+
+        assert _full_scans(plan) == ["agents", "servers"]
+
+    def test_parameter_shape_uses_types(self):
+        """Sequences and mappings should be described by value types."""
+        assert _parameter_shape(None) == "()"
+        assert _parameter_shape(("a", 1, None)) == "(str, int, None)"
+        assert _parameter_shape({"id": "a", "n": 2.5}) == "{id: str, n: float}"
+
+    def test_from_env(self, monkeypatch):
+        """The shared log should follow DB_SLOW_QUERY_MS."""
+        slow_query_log_from_env.cache_clear()
+        monkeypatch.setenv(SLOW_QUERY_ENV, "25")
+        try:
+            log = slow_query_log_from_env()
+            assert log.threshold_ms == 25
+            assert slow_query_log_from_env() is log
+            slow_query_log_from_env.cache_clear()
+            monkeypatch.setenv(SLOW_QUERY_ENV, "")
+            assert slow_query_log_from_env() is None
+        finally:
+            slow_query_log_from_env.cache_clear()
+
+    def test_report_path_per_worker(self, tmp_path):
+        """Workers should not overwrite each other's reports."""
+        assert slow_query_report_path(tmp_path) == tmp_path / "slow_queries.json"
+        assert (
+            slow_query_report_path(tmp_path, "12-ab")
+            == tmp_path / "slow_queries-12-ab.json"
+        )
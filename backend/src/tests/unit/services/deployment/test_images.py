@@ -0,0 +1,193 @@
+"""
+Unit tests for services/deployment/images.py and the image pulls of
+services/deployment/service.py.
+
+Tests image reference parsing, the server_images store against a real
+SQLite database, and installs and pre-pulls skipping images that are
+already on the server.
+"""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.database.base import DatabaseConnection
+from services.database.migrations import MigrationRunner
+from services.deployment.images import (
+    IMAGE_REUSE_SECONDS,
+    ServerImageStore,
+    image_ref,
+    split_image,
+)
+from services.deployment.service import DeploymentError, DeploymentService
+
+
+@pytest.fixture
+async def store(tmp_path):
+    """Image store over a migrated database."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await MigrationRunner(connection).migrate()
+    return ServerImageStore(connection)
+
+
+@pytest.fixture
+def agent_manager():
+    """Agent manager answering image pulls and listings."""
+    manager = MagicMock()
+    manager.is_connected.return_value = True
+
+    async def send_command(agent_id, method, params=None, timeout=30):
+        if method == "docker.images.pull":
+            return {"id": "sha256:new", "tags": ["nginx:1.25"], "digest": "d1"}
+        if method == "docker.images.list":
+            return manager.images
+        raise AssertionError(method)
+
+    manager.images = []
+    manager.send_command = AsyncMock(side_effect=send_command)
+    return manager
+
+
+@pytest.fixture
+def service(store, agent_manager):
+    """Deployment service recording pulls in the store."""
+    agent = MagicMock()
+    agent.id = "agent-1"
+    agent_service = MagicMock()
+    agent_service.get_agent_by_server = AsyncMock(return_value=agent)
+    marketplace = MagicMock()
+    app = MagicMock()
+    app.docker.image = "nginx:1.25"
+    marketplace.get_app = AsyncMock(side_effect=lambda app_id: app if app_id else None)
+    with patch("services.deployment.service.logger"):
+        return DeploymentService(
+            ssh_service=MagicMock(),
+            server_service=MagicMock(),
+            marketplace_service=marketplace,
+            db_service=MagicMock(),
+            agent_manager=agent_manager,
+            agent_service=agent_service,
+            image_store=store,
+        )
+
+
+def pulls(agent_manager):
+    """Count image pulls sent to the agent."""
+    return sum(
+        1
+        for call in agent_manager.send_command.await_args_list
+        if call.kwargs["method"] == "docker.images.pull"
+    )
+
+
+class TestImageRefs:
+    """Tests for image reference parsing."""
+
+    @pytest.mark.parametrize(
+        ("image", "expected"),
+        [
+            ("nginx", ("nginx", "latest")),
+            ("nginx:1.25", ("nginx", "1.25")),
+            ("registry:5000/team/app", ("registry:5000/team/app", "latest")),
+            ("registry:5000/app:v2", ("registry:5000/app", "v2")),
+            ("app@sha256:abc", ("app", "sha256:abc")),
+        ],
+    )
+    def test_split_image(self, image, expected):
+        """Registry ports should not be read as tags."""
+        assert split_image(image) == expected
+
+    def test_image_ref(self):
+        """References should normalize to name:tag or name@digest."""
+        assert image_ref("nginx") == "nginx:latest"
+        assert image_ref("app@sha256:abc") == "app@sha256:abc"
+
+
+class TestServerImageStore:
+    """Tests for ServerImageStore."""
+
+    @pytest.mark.asyncio
+    async def test_record_get_forget(self, store):
+        """Records should be upserted per server and image."""
+        await store.record("s1", "nginx", "sha256:old")
+        await store.record("s1", "nginx:latest", "sha256:new", "nginx@sha256:d")
+        await store.record("s2", "redis:7", "sha256:r")
+
+        entry = await store.get("s1", "nginx")
+        assert entry.image == "nginx:latest"
+        assert entry.image_id == "sha256:new"
+        assert entry.digest == "nginx@sha256:d"
+        assert entry.age_seconds() < 60
+        assert [e.server_id for e in await store.list_images()] == ["s1", "s2"]
+        assert len(await store.list_images(image="redis:7")) == 1
+
+        await store.forget("s1", "nginx")
+        assert await store.get("s1", "nginx") is None
+
+
+class TestEnsureImage:
+    """Tests for skipping pulls of images already on a server."""
+
+    @pytest.mark.asyncio
+    async def test_pull_is_recorded_then_skipped(self, service, store, agent_manager):
+        """A recorded image still on the host should not be pulled again."""
+        first = await service._ensure_image("s1", "nginx:1.25")
+        assert first["present"] is False
+        assert (await store.get("s1", "nginx:1.25")).digest == "d1"
+
+        agent_manager.images = [{"id": "sha256:new", "tags": ["nginx:1.25"]}]
+        second = await service._ensure_image("s1", "nginx:1.25")
+
+        assert second == {"success": True, "present": True}
+        assert pulls(agent_manager) == 1
+
+    @pytest.mark.asyncio
+    async def test_removed_image_is_pulled_again(self, service, store, agent_manager):
+        """An image gone from the host should be forgotten and pulled."""
+        await store.record("s1", "nginx:1.25", "sha256:gone")
+
+        result = await service._ensure_image("s1", "nginx:1.25")
+
+        assert result["present"] is False
+        assert pulls(agent_manager) == 1
+        assert (await store.get("s1", "nginx:1.25")).image_id == "sha256:new"
+
+    @pytest.mark.asyncio
+    async def test_stale_record_is_pulled_again(self, service, store, agent_manager):
+        """Pulls older than the reuse window should refresh the tag."""
+        await store.record("s1", "nginx:1.25", "sha256:new")
+        old = datetime.now(UTC) - timedelta(seconds=IMAGE_REUSE_SECONDS + 60)
+        async with store._conn.get_connection() as conn:
+            await conn.execute(
+                "UPDATE server_images SET pulled_at = ?", (old.isoformat(),)
+            )
+            await conn.commit()
+        agent_manager.images = [{"id": "sha256:new"}]
+
+        result = await service._ensure_image("s1", "nginx:1.25")
+
+        assert result["present"] is False
+        assert pulls(agent_manager) == 1
+
+
+class TestPrepullApp:
+    """Tests for prepull_app."""
+
+    @pytest.mark.asyncio
+    async def test_prepull_app(self, service, agent_manager):
+        """An app's current image should be pulled and reported."""
+        result = await service.prepull_app("s1", "web")
+
+        assert result == {"image": "nginx:1.25", "present": False}
+        assert await service.get_server_images("s1") != []
+
+    @pytest.mark.asyncio
+    async def test_prepull_errors(self, service, agent_manager):
+        """Unknown apps and failed pulls should raise DeploymentError."""
+        with pytest.raises(DeploymentError, match="not found"):
+            await service.prepull_app("s1", "")
+
+        agent_manager.send_command.side_effect = RuntimeError("registry down")
+        with pytest.raises(DeploymentError, match="registry down"):
+            await service.prepull_app("s1", "web")
@@ -0,0 +1,435 @@
+"""
+Unit tests for services/deployment/jobs.py
+
+Tests the persistent deployment job queue against a real SQLite database:
+priorities, global and per-server concurrency, image pre-pulls,
+cancellation and recovery of work interrupted by a restart.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from models.app_catalog import InstallationStatus
+from services.database.base import DatabaseConnection
+from services.database.migrations import MigrationRunner
+from services.deployment.jobs import MAX_JOB_ATTEMPTS, DeploymentQueue
+from services.deployment.service import DeploymentError
+
+
+class FakeDeployments:
+    """Deployment service whose installs wait until released."""
+
+    def __init__(self):
+        self.db_service = MagicMock()
+        self.db_service.get_all_installations = AsyncMock(return_value=[])
+        self.db_service.get_installation = AsyncMock(return_value=None)
+        self.db_service.update_installation = AsyncMock()
+        self.started = []
+        self.active = set()
+        self._gates: dict[tuple[str, str], asyncio.Event] = {}
+
+    def release(self, server_id, app_id):
+        self._gate(server_id, app_id).set()
+
+    async def install_app(self, server_id, app_id, config):
+        key = (server_id, app_id)
+        self.started.append(key)
+        self.active.add(key)
+        try:
+            await self._gate(server_id, app_id).wait()
+        finally:
+            self.active.discard(key)
+        if app_id == "broken":
+            raise DeploymentError("Failed to pull image")
+        return SimpleNamespace(id=f"inst-{app_id}", config=config)
+
+    async def prepull_app(self, server_id, app_id):
+        key = (server_id, app_id)
+        self.started.append(key)
+        self.active.add(key)
+        try:
+            await self._gate(server_id, app_id).wait()
+        finally:
+            self.active.discard(key)
+        return {"image": f"{app_id}:latest", "present": False}
+
+    async def uninstall_app(self, server_id, app_id, remove_data=True):
+        return app_id != "broken"
+
+    def _gate(self, server_id, app_id):
+        return self._gates.setdefault((server_id, app_id), asyncio.Event())
+
+
+@pytest.fixture
+async def connection(tmp_path):
+    """Migrated database."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await MigrationRunner(connection).migrate()
+    return connection
+
+
+@pytest.fixture
+def deployments():
+    """Deployment service double."""
+    return FakeDeployments()
+
+
+@pytest.fixture
+async def queue(connection, deployments):
+    """Queue running at most three jobs, two per server."""
+    app_service = MagicMock()
+    app_service.mark_app_installed = AsyncMock()
+    app_service.mark_app_uninstalled = AsyncMock()
+    queue = DeploymentQueue(
+        connection,
+        deployments,
+        app_service=app_service,
+        concurrency=3,
+        concurrency_per_server=2,
+    )
+    yield queue
+    await queue.stop()
+
+
+async def until(predicate):
+    """Wait for the queue's background tasks to reach a state."""
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+async def wait_status(queue, job_id, status):
+    """Wait for a job to reach a status."""
+    for _ in range(200):
+        job = await queue.get_job(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"job {job_id} is {job.status}, not {status}")
+
+
+class TestEnqueue:
+    """Tests for queueing and listing jobs."""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_many_persists_jobs(self, queue):
+        """Every app on every server should become a queued job."""
+        jobs = await queue.enqueue_many(
+            "install", ["s1", "s2"], ["web", "db"], {"config": {"port": 80}}, 5
+        )
+
+        assert [(j.server_id, j.app_id) for j in jobs] == [
+            ("s1", "web"),
+            ("s1", "db"),
+            ("s2", "web"),
+            ("s2", "db"),
+        ]
+        stored = await queue.get_job(jobs[0].id)
+        assert stored == jobs[0]
+        assert stored.params == {"config": {"port": 80}}
+        assert await queue.count_jobs() == {"queued": 4}
+        assert len(await queue.list_jobs(status="queued", server_id="s2")) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_kind(self, queue):
+        """Only known job kinds should be queued."""
+        with pytest.raises(ValueError, match="Unknown deployment job kind"):
+            await queue.enqueue("upgrade", "s1", "web")
+
+
+class TestDispatch:
+    """Tests for running queued jobs."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limits(self, queue, deployments):
+        """Jobs should respect the per-server and global limits."""
+        await queue.enqueue_many("install", ["s1"], ["a", "b", "c"])
+        await queue.enqueue_many("install", ["s2"], ["a", "b"])
+
+        await queue.start()
+        await until(lambda: len(deployments.active) == 3)
+
+        on_s1 = [key for key in deployments.active if key[0] == "s1"]
+        assert len(on_s1) == 2
+        assert ("s1", "c") not in deployments.started
+
+        deployments.release("s1", "a")
+        await until(lambda: ("s1", "c") in deployments.started)
+        assert len(deployments.active) == 3
+
+    @pytest.mark.asyncio
+    async def test_priority_then_age(self, connection, deployments):
+        """Higher priorities should start first, then older jobs."""
+        queue = DeploymentQueue(connection, deployments, concurrency=1)
+        await queue.enqueue("install", "s1", "old")
+        await queue.enqueue("install", "s2", "urgent", priority=10)
+        await queue.enqueue("install", "s3", "new")
+
+        await queue.start()
+        try:
+            for key in (("s2", "urgent"), ("s1", "old"), ("s3", "new")):
+                await until(lambda key=key: key in deployments.active)
+                deployments.release(*key)
+        finally:
+            await queue.stop()
+
+        assert deployments.started == [("s2", "urgent"), ("s1", "old"), ("s3", "new")]
+
+    @pytest.mark.asyncio
+    async def test_records_outcomes(self, queue, deployments):
+        """Finished jobs should record their installation or error."""
+        ok = await queue.enqueue("install", "s1", "web", {"config": {"a": 1}})
+        broken = await queue.enqueue("install", "s2", "broken")
+        deployments.release("s1", "web")
+        deployments.release("s2", "broken")
+
+        await queue.start()
+        done = await wait_status(queue, ok.id, "succeeded")
+        failed = await wait_status(queue, broken.id, "failed")
+
+        assert done.installation_id == "inst-web"
+        assert done.attempts == 1
+        assert done.finished_at is not None
+        assert failed.error == "Failed to pull image"
+        queue._app_service.mark_app_installed.assert_awaited_once_with("web", "s1")
+
+    @pytest.mark.asyncio
+    async def test_uninstall_jobs(self, queue):
+        """Removals should report apps that could not be removed."""
+        removed = await queue.enqueue("uninstall", "s1", "web", {"remove_data": True})
+        broken = await queue.enqueue("uninstall", "s1", "broken")
+
+        await queue.start()
+
+        await wait_status(queue, removed.id, "succeeded")
+        failed = await wait_status(queue, broken.id, "failed")
+        assert "broken" in failed.error
+        queue._app_service.mark_app_uninstalled.assert_awaited_once_with("web")
+
+
+class TestPrepull:
+    """Tests for image pre-pull jobs."""
+
+    @pytest.mark.asyncio
+    async def test_targets_installed_apps(self, queue, deployments):
+        """Without servers, apps should be warmed where they are installed."""
+        deployments.db_service.get_all_installations.return_value = [
+            SimpleNamespace(server_id="s1", app_id="web"),
+            SimpleNamespace(server_id="s2", app_id="web"),
+            SimpleNamespace(server_id="s2", app_id="db"),
+        ]
+
+        jobs = await queue.enqueue_prepulls(["web"])
+        again = await queue.enqueue_prepulls()
+
+        assert [(j.server_id, j.app_id) for j in jobs] == [("s1", "web"), ("s2", "web")]
+        assert all(j.kind == "prepull" and j.priority < 0 for j in jobs)
+        # Targets with a pre-pull already queued are skipped
+        assert [(j.server_id, j.app_id) for j in again] == [("s2", "db")]
+
+        with pytest.raises(ValueError, match="app_ids are required"):
+            await queue.enqueue_prepulls(server_ids=["s1"])
+
+    @pytest.mark.asyncio
+    async def test_prepulls_are_capped(self, connection, deployments):
+        """Pre-pulls should not exceed their own limit or delay deploys."""
+        queue = DeploymentQueue(
+            connection, deployments, concurrency=4, prepull_concurrency=1
+        )
+        jobs = await queue.enqueue_prepulls(["web"], ["s1", "s2"])
+        await queue.enqueue("install", "s3", "db")
+
+        await queue.start()
+        try:
+            await until(lambda: ("s3", "db") in deployments.active)
+            await until(lambda: ("s1", "web") in deployments.active)
+            assert ("s2", "web") not in deployments.started
+
+            deployments.release("s1", "web")
+            await wait_status(queue, jobs[0].id, "succeeded")
+            await until(lambda: ("s2", "web") in deployments.active)
+        finally:
+            await queue.stop()
+
+
+class TestCancel:
+    """Tests for cancelling jobs."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self, queue, deployments):
+        """A queued job should be cancelled without running."""
+        job = await queue.enqueue("install", "s1", "web")
+
+        cancelled = await queue.cancel(job.id)
+        await queue.start()
+        await asyncio.sleep(0.02)
+
+        assert cancelled.status == "cancelled"
+        assert deployments.started == []
+        assert await queue.cancel("job-missing") is None
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(self, queue, deployments):
+        """A running job should be interrupted and its installation failed."""
+        deployments.db_service.get_installation.return_value = SimpleNamespace(
+            id="inst-1", status=InstallationStatus.PULLING
+        )
+        job = await queue.enqueue("install", "s1", "web")
+        await queue.start()
+        await until(lambda: ("s1", "web") in deployments.active)
+
+        requested = await queue.cancel(job.id)
+
+        assert requested.cancel_requested
+        cancelled = await wait_status(queue, job.id, "cancelled")
+        assert cancelled.error == "Cancelled"
+        deployments.db_service.update_installation.assert_awaited_once_with(
+            "inst-1", status="error", error_message="Deployment cancelled"
+        )
+
+    @pytest.mark.asyncio
+    async def test_cancel_from_another_worker(self, queue, connection, deployments):
+        """Cancellations recorded by another worker should reach the job."""
+        job = await queue.enqueue("install", "s1", "web")
+        await queue.start()
+        await until(lambda: ("s1", "web") in deployments.active)
+
+        other = DeploymentQueue(connection, deployments)
+        await other.cancel(job.id)
+        queue._wake.set()
+
+        await wait_status(queue, job.id, "cancelled")
+
+
+class TestRecover:
+    """Tests for recovering work interrupted by a restart."""
+
+    @pytest.mark.asyncio
+    async def test_shutdown_leaves_jobs_for_recovery(self, queue, deployments):
+        """Jobs running at shutdown should be queued again on startup."""
+        job = await queue.enqueue("install", "s1", "web")
+        await queue.start()
+        await until(lambda: ("s1", "web") in deployments.active)
+
+        await queue.stop()
+        assert (await queue.get_job(job.id)).status == "running"
+
+        counts = await queue.recover()
+
+        assert counts["requeued"] == 1
+        assert (await queue.get_job(job.id)).status == "queued"
+
+    @pytest.mark.asyncio
+    async def test_gives_up_and_fails_orphaned_installs(
+        self, queue, connection, deployments
+    ):
+        """Jobs out of attempts fail; installs without a job are failed."""
+        retry = await queue.enqueue("install", "s1", "web")
+        spent = await queue.enqueue("install", "s2", "db")
+        async with connection.get_connection() as conn:
+            await conn.execute(
+                "UPDATE deployment_jobs SET status = 'running', attempts = 1"
+                " WHERE id = ?",
+                (retry.id,),
+            )
+            await conn.execute(
+                "UPDATE deployment_jobs SET status = 'running', attempts = ?"
+                " WHERE id = ?",
+                (MAX_JOB_ATTEMPTS, spent.id),
+            )
+            await conn.commit()
+        deployments.db_service.get_all_installations.return_value = [
+            SimpleNamespace(
+                id="inst-web",
+                server_id="s1",
+                app_id="web",
+                status="pulling",
+                owner=None,
+            ),
+            SimpleNamespace(
+                id="inst-db", server_id="s2", app_id="db", status="creating", owner=None
+            ),
+            SimpleNamespace(
+                id="inst-ok", server_id="s3", app_id="ok", status="running", owner=None
+            ),
+        ]
+
+        counts = await queue.recover()
+
+        assert counts == {
+            "requeued": 1,
+            "failed": 1,
+            "cancelled": 0,
+            "interrupted_installations": 1,
+        }
+        assert (await queue.get_job(retry.id)).status == "queued"
+        assert (await queue.get_job(spent.id)).status == "failed"
+        deployments.db_service.update_installation.assert_awaited_once_with(
+            "inst-db",
+            status="error",
+            error_message="Deployment interrupted by a backend restart",
+        )
+
+    @pytest.mark.asyncio
+    async def test_leaves_work_of_live_workers(self, connection, deployments):
+        """Jobs and installs owned by a worker still running are left alone."""
+        router = MagicMock(worker_id="primary")
+        router.is_worker_alive.side_effect = lambda worker_id: worker_id == "live"
+        queue = DeploymentQueue(connection, deployments, router=router)
+        live = await queue.enqueue("install", "s1", "web")
+        dead = await queue.enqueue("install", "s2", "db")
+        async with connection.get_connection() as conn:
+            await conn.execute(
+                "UPDATE deployment_jobs SET status = 'running', attempts = 1,"
+                " owner = CASE id WHEN ? THEN 'live' ELSE 'gone' END",
+                (live.id,),
+            )
+            await conn.commit()
+        deployments.db_service.get_all_installations.return_value = [
+            SimpleNamespace(
+                id="inst-sync",
+                server_id="s3",
+                app_id="ok",
+                status="pulling",
+                owner="live",
+            ),
+            SimpleNamespace(
+                id="inst-lost",
+                server_id="s4",
+                app_id="x",
+                status="pulling",
+                owner="gone",
+            ),
+        ]
+
+        counts = await queue.recover()
+
+        assert counts["requeued"] == 1
+        assert counts["interrupted_installations"] == 1
+        assert (await queue.get_job(live.id)).status == "running"
+        assert (await queue.get_job(dead.id)).status == "queued"
+        deployments.db_service.update_installation.assert_awaited_once()
+        assert deployments.db_service.update_installation.call_args.args == (
+            "inst-lost",
+        )
+
+    @pytest.mark.asyncio
+    async def test_running_jobs_record_their_worker(self, connection, deployments):
+        """Claimed jobs should name the worker running them."""
+        router = MagicMock(worker_id="primary")
+        queue = DeploymentQueue(connection, deployments, router=router)
+        job = await queue.enqueue("install", "s1", "web")
+        await queue.start()
+        await until(lambda: ("s1", "web") in deployments.active)
+        await queue.stop()
+
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT owner FROM deployment_jobs WHERE id = ?", (job.id,)
+            )
+            assert (await cursor.fetchone())[0] == "primary"
@@ -0,0 +1,282 @@
+"""
+Unit tests for services/deployment/log_streams.py
+
+Tests for LogStreamRegistry buffering, offsets, resume and cancellation.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.deployment import log_streams
+from services.deployment.log_streams import LogStreamRegistry
+
+
+def frame(seq, messages, done=False, reason=None, stream_id="logs-1"):
+    """Build a docker.logs.chunk frame."""
+    lines = [
+        {"timestamp": f"2024-01-01T00:00:0{i}Z", "message": m}
+        for i, m in enumerate(messages)
+    ]
+    params = {
+        "stream_id": stream_id,
+        "seq": seq,
+        "lines": lines,
+        "cursor": lines[-1]["timestamp"] if lines else None,
+        "done": done,
+    }
+    if done:
+        params["reason"] = reason
+    return params
+
+
+@pytest.fixture
+def agent_manager():
+    """Create mock agent manager."""
+    manager = MagicMock()
+    manager.is_connected = MagicMock(return_value=True)
+    manager.send_command = AsyncMock(return_value={"stream_id": "logs-1"})
+    return manager
+
+
+@pytest.fixture
+def registry(agent_manager):
+    """Create a LogStreamRegistry."""
+    return LogStreamRegistry(agent_manager)
+
+
+class TestStart:
+    """Tests for LogStreamRegistry.start."""
+
+    @pytest.mark.asyncio
+    async def test_subscribes_on_agent(self, registry, agent_manager):
+        """Should subscribe on the agent and qualify the stream ID."""
+        result = await registry.start("agent-1", "server-1", "web", since="c1")
+
+        call = agent_manager.send_command.call_args[1]
+        assert call["method"] == "docker.logs.subscribe"
+        assert call["params"]["since"] == "c1"
+        assert result["stream_id"] == "agent-1:logs-1"
+
+    @pytest.mark.asyncio
+    async def test_replays_frames_that_arrived_early(self, registry):
+        """Should keep frames that overtake the subscribe response."""
+        await registry.handle_chunk("agent-1", frame(1, ["early"]))
+
+        await registry.start("agent-1", "server-1", "web")
+        result = await registry.read("agent-1:logs-1")
+
+        assert [line["message"] for line in result["lines"]] == ["early"]
+
+
+class TestReadAndChunks:
+    """Tests for handle_chunk and read."""
+
+    @pytest.mark.asyncio
+    async def test_reads_by_offset(self, registry):
+        """Should return only lines after the given offset."""
+        await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a", "b"]))
+        await registry.handle_chunk("agent-1", frame(2, ["c"]))
+
+        first = await registry.read("agent-1:logs-1", after=0, limit=2)
+        second = await registry.read("agent-1:logs-1", after=first["next"])
+
+        assert [line["message"] for line in first["lines"]] == ["a", "b"]
+        assert [line["offset"] for line in second["lines"]] == [2]
+        assert second["next"] == 3
+        assert second["cursor"] == "2024-01-01T00:00:00Z"
+        assert second["done"] is False
+
+    @pytest.mark.asyncio
+    async def test_ignores_duplicate_frames(self, registry):
+        """Should drop frames with an already-seen sequence number."""
+        await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a"]))
+        await registry.handle_chunk("agent-1", frame(1, ["a"]))
+
+        assert (await registry.read("agent-1:logs-1"))["next"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reports_dropped_lines(self, registry):
+        """Should report lines that fell out of the buffer."""
+        with patch.object(log_streams, "BUFFER_LINES", 2):
+            await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a", "b", "c"]))
+
+        result = await registry.read("agent-1:logs-1", after=0)
+
+        assert result["dropped"] == 1
+        assert [line["message"] for line in result["lines"]] == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_done_stream_is_removed_once_drained(self, registry):
+        """Should finish the stream after its last line has been read."""
+        await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a"], done=True, reason="eof"))
+
+        result = await registry.read("agent-1:logs-1")
+
+        assert result["done"] is True
+        assert result["reason"] == "eof"
+        assert await registry.read("agent-1:logs-1") is None
+
+    @pytest.mark.asyncio
+    async def test_marks_disconnected_agents_done(self, registry, agent_manager):
+        """Should end streams whose agent disconnected."""
+        await registry.start("agent-1", "server-1", "web")
+        agent_manager.is_connected.return_value = False
+
+        result = await registry.read("agent-1:logs-1")
+
+        assert result["done"] is True
+        assert result["reason"] == "disconnected"
+
+    @pytest.mark.asyncio
+    async def test_cancels_idle_streams(self, registry, agent_manager):
+        """Should unsubscribe streams nobody reads."""
+        await registry.start("agent-1", "server-1", "web")
+
+        with patch.object(log_streams, "IDLE_TIMEOUT_SECONDS", -1):
+            await registry.handle_chunk("agent-1", frame(1, ["a"]))
+
+        assert agent_manager.send_command.call_args[1]["method"] == (
+            "docker.logs.unsubscribe"
+        )
+        assert await registry.read("agent-1:logs-1") is None
+
+
+class TestSweep:
+    """Tests for LogStreamRegistry.sweep."""
+
+    @pytest.mark.asyncio
+    async def test_cancels_quiet_idle_streams(self, registry, agent_manager):
+        """Should unsubscribe idle streams even when no frames arrive."""
+        await registry.start("agent-1", "server-1", "web")
+
+        with patch.object(log_streams, "IDLE_TIMEOUT_SECONDS", -1):
+            await registry.sweep()
+
+        assert agent_manager.send_command.call_args[1]["method"] == (
+            "docker.logs.unsubscribe"
+        )
+        assert await registry.read("agent-1:logs-1") is None
+
+    @pytest.mark.asyncio
+    async def test_drops_unread_finished_streams(self, registry, agent_manager):
+        """Should free finished buffers nobody drains after the TTL."""
+        await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a"], done=True))
+
+        await registry.sweep()
+        assert "agent-1:logs-1" in registry._streams
+
+        with patch.object(log_streams, "FINISHED_TTL_SECONDS", -1):
+            await registry.sweep()
+
+        assert registry._streams == {}
+        assert agent_manager.send_command.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expires_early_frames(self, registry):
+        """Should forget frames for streams that were never registered."""
+        await registry.handle_chunk("agent-1", frame(1, ["a"], stream_id="logs-9"))
+
+        with patch.object(log_streams, "EARLY_FRAME_TTL_SECONDS", -1):
+            await registry.sweep()
+
+        assert registry._early == {}
+
+    @pytest.mark.asyncio
+    async def test_sweeper_runs_periodically(self, registry):
+        """Should sweep in the background until stopped."""
+        with patch.object(registry, "sweep", new_callable=AsyncMock) as mock_sweep:
+            await registry.start_sweeper(interval=0)
+            await asyncio.sleep(0.01)
+            await registry.stop_sweeper()
+
+        assert mock_sweep.await_count >= 1
+        assert registry._sweeper is None
+
+
+class TestStop:
+    """Tests for LogStreamRegistry.stop."""
+
+    @pytest.mark.asyncio
+    async def test_unsubscribes_on_agent(self, registry, agent_manager):
+        """Should send the agent-local stream ID to unsubscribe."""
+        await registry.start("agent-1", "server-1", "web")
+
+        stopped = await registry.stop("agent-1:logs-1")
+
+        assert stopped is True
+        call = agent_manager.send_command.call_args[1]
+        assert call["params"] == {"stream_id": "logs-1"}
+        assert await registry.stop("agent-1:logs-1") is False
+
+    @pytest.mark.asyncio
+    async def test_ignores_unsubscribe_errors(self, registry, agent_manager):
+        """Should drop the stream even if the agent call fails."""
+        await registry.start("agent-1", "server-1", "web")
+        agent_manager.send_command.side_effect = Exception("timeout")
+
+        assert await registry.stop("agent-1:logs-1") is True
+
+
+class TestShared:
+    """Tests for streams shared between workers."""
+
+    @pytest.fixture
+    def router(self):
+        """Create a mock router for worker a."""
+        router = MagicMock()
+        router.worker_id = "a"
+        router.call_worker = AsyncMock(return_value={"lines": []})
+        return router
+
+    @pytest.mark.asyncio
+    async def test_stream_ids_name_the_worker(self, registry, router):
+        """Should prefix stream IDs and serve local streams directly."""
+        registry.share(router)
+        result = await registry.start("agent-1", "server-1", "web")
+        await registry.handle_chunk("agent-1", frame(1, ["a"]))
+
+        read = await registry.read(result["stream_id"])
+
+        assert result["stream_id"] == "a/agent-1:logs-1"
+        assert [line["message"] for line in read["lines"]] == ["a"]
+        router.call_worker.assert_not_called()
+        handlers = {c.args[0] for c in router.register_handler.call_args_list}
+        assert handlers == {"log_streams.read", "log_streams.stop"}
+
+    @pytest.mark.asyncio
+    async def test_forwards_other_workers_streams(self, registry, router):
+        """Should read and stop another worker's streams on that worker."""
+        registry.share(router)
+
+        read = await registry.read("b/agent-1:logs-1", after=3)
+        router.call_worker.return_value = True
+        stopped = await registry.stop("b/agent-1:logs-1")
+
+        assert read == {"lines": []}
+        assert stopped is True
+        assert router.call_worker.call_args_list[0].args == (
+            "b",
+            "log_streams.read",
+            {"stream_id": "b/agent-1:logs-1", "after": 3, "limit": 1000},
+        )
+        assert router.call_worker.call_args_list[1].args == (
+            "b",
+            "log_streams.stop",
+            {"stream_id": "b/agent-1:logs-1"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_unreachable_owner(self, registry, router):
+        """Streams of a worker that is gone should be unknown."""
+        registry.share(router)
+        router.call_worker.side_effect = ConnectionError("gone")
+
+        assert await registry.read("b/agent-1:logs-1") is None
+        assert await registry.stop("b/agent-1:logs-1") is False
@@ -532,6 +532,9 @@ class TestAgentPrepareVolumes:
         assert result["success"] is True
         call_kwargs = mock_services["agent_manager"].send_command.call_args[1]
         assert call_kwargs["method"] == "system.prepare_volumes"
+        # Large data directories report progress instead of timing out
+        assert call_kwargs["params"]["progress_id"].startswith("volumes-")
+        assert call_kwargs["timeout"] > 60
 
     @pytest.mark.asyncio
     async def test_skips_non_absolute_paths(self, deployment_service, mock_services):
@@ -435,6 +435,27 @@ class TestGetContainerLogs:
         assert result["logs"] == []
         assert "Logs failed" in result["error"]
 
+    @pytest.mark.asyncio
+    async def test_passes_cursor_and_returns_lines(
+        self, deployment_service, mock_services
+    ):
+        """Should request lines after the cursor and return the new cursor."""
+        mock_services["agent_manager"].send_command.return_value = {
+            "logs": "new",
+            "lines": [{"timestamp": "2024-01-01T00:00:02Z", "message": "new"}],
+            "cursor": "2024-01-01T00:00:02Z",
+        }
+
+        result = await deployment_service.get_container_logs(
+            "server-1", "my-container", since="2024-01-01T00:00:01Z"
+        )
+
+        params = mock_services["agent_manager"].send_command.call_args[1]["params"]
+        assert params["since"] == "2024-01-01T00:00:01Z"
+        assert params["timestamps"] is True
+        assert result["logs"][0]["timestamp"] == "2024-01-01T00:00:02Z"
+        assert result["cursor"] == "2024-01-01T00:00:02Z"
+
 
 class TestHandleInstallError:
     """Tests for _handle_install_error helper method."""
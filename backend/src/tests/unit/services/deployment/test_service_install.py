@@ -146,6 +146,25 @@ class TestInstallApp:
 
         assert "Failed to create installation record" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    async def test_records_the_worker_running_the_install(
+        self, deployment_service, mock_services, mock_app, mock_server
+    ):
+        """The installation should name the worker so recovery leaves it alone."""
+        from services.deployment.service import DeploymentError
+
+        deployment_service.worker_id = "1234-abcd"
+        mock_services["marketplace"].get_app = AsyncMock(return_value=mock_app)
+        mock_services["server"].get_server = AsyncMock(return_value=mock_server)
+        mock_services["db"].get_installation = AsyncMock(return_value=None)
+        mock_services["db"].create_installation = AsyncMock(return_value=None)
+
+        with pytest.raises(DeploymentError):
+            await deployment_service.install_app("server-1", "app-1")
+
+        call = mock_services["db"].create_installation.call_args
+        assert call.kwargs["owner"] == "1234-abcd"
+
     @pytest.mark.asyncio
     async def test_raises_when_image_pull_fails(
         self, deployment_service, mock_services, mock_app, mock_server
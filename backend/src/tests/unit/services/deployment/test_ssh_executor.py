@@ -333,6 +333,7 @@ class TestAgentExecutorExecuteWithProgress:
         result.output = "output"
         result.error = None
         router.execute = AsyncMock(return_value=result)
+        router.execute_with_progress = AsyncMock(return_value=result)
         return router
 
     @pytest.fixture
@@ -343,10 +344,10 @@ class TestAgentExecutorExecuteWithProgress:
         return AgentExecutor(mock_command_router)
 
     @pytest.mark.asyncio
-    async def test_execute_with_progress_calls_execute(
+    async def test_execute_with_progress_streams_via_router(
         self, agent_executor, mock_command_router
     ):
-        """Should delegate to execute method (progress not supported)."""
+        """Should stream through the router with agent forced."""
         callback = AsyncMock()
 
         result = await agent_executor.execute_with_progress(
@@ -354,19 +355,40 @@ class TestAgentExecutorExecuteWithProgress:
         )
 
         assert result == (0, "output", "")
-        # Progress callback is ignored for agent
-        mock_command_router.execute.assert_called_once()
+        mock_command_router.execute_with_progress.assert_called_once_with(
+            server_id="server-1",
+            command="command",
+            progress_callback=callback,
+            timeout=300.0,
+            force_agent=True,
+        )
+        mock_command_router.execute.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_execute_with_progress_ignores_callback(
+    async def test_execute_with_progress_failure(
         self, agent_executor, mock_command_router
     ):
-        """Should ignore progress callback (not implemented for agent)."""
-        callback = AsyncMock()
+        """Should map a failed streamed result to (exit_code, '', error)."""
+        result = MagicMock()
+        result.success = False
+        result.exit_code = 100
+        result.output = ""
+        result.error = "E: Unable to locate package"
+        mock_command_router.execute_with_progress.return_value = result
 
-        await agent_executor.execute_with_progress(
-            "server-1", "cmd", progress_callback=callback
+        exec_result = await agent_executor.execute_with_progress(
+            "server-1", "cmd", progress_callback=AsyncMock()
         )
 
-        # Callback should never be called
-        callback.assert_not_called()
+        assert exec_result == (100, "", "E: Unable to locate package")
+
+    @pytest.mark.asyncio
+    async def test_execute_with_progress_without_callback(
+        self, agent_executor, mock_command_router
+    ):
+        """Should use plain execute when there is no callback."""
+        result = await agent_executor.execute_with_progress("server-1", "cmd")
+
+        assert result == (0, "output", "")
+        mock_command_router.execute.assert_called_once()
+        mock_command_router.execute_with_progress.assert_not_called()
@@ -0,0 +1,316 @@
+"""
+Unit tests for services/deployment/status.py - Pushed Docker state
+
+Tests for apply_container_state, the live feed check and the
+docker.state_changed notification handler.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.deployment.status import StatusManager, map_docker_status, split_mounts
+
+
+def make_installation(inst_id, name, status="running", container_id=None):
+    """Create an installation mock."""
+    inst = MagicMock()
+    inst.id = inst_id
+    inst.server_id = "server-1"
+    inst.container_name = name
+    inst.container_id = container_id
+    inst.status = status
+    inst.networks = ["bridge"]
+    inst.named_volumes = []
+    inst.bind_mounts = []
+    return inst
+
+
+@pytest.fixture
+def mock_db_service():
+    """Create mock database service."""
+    service = MagicMock()
+    service.get_installations = AsyncMock(return_value=[])
+    service.get_installation_by_id = AsyncMock(return_value=None)
+    service.update_installation = AsyncMock()
+    return service
+
+
+@pytest.fixture
+def agent_manager():
+    """Create mock agent manager."""
+    manager = MagicMock()
+    manager.is_connected = MagicMock(return_value=True)
+    manager.get_connection_info = MagicMock(
+        return_value={"agent_id": "agent-1", "server_id": "server-1"}
+    )
+    return manager
+
+
+@pytest.fixture
+def status_manager(mock_db_service, agent_manager):
+    """Create StatusManager with an agent manager."""
+    return StatusManager(
+        ssh_executor=MagicMock(),
+        db_service=mock_db_service,
+        server_service=MagicMock(),
+        marketplace_service=MagicMock(),
+        agent_manager=agent_manager,
+    )
+
+
+class TestHelpers:
+    """Tests for module-level status helpers."""
+
+    def test_map_docker_status(self):
+        """Should map Docker states to installation statuses."""
+        assert map_docker_status("running") == "running"
+        assert map_docker_status("Exited") == "stopped"
+        assert map_docker_status("restarting") == "error"
+        assert map_docker_status("paused") == "stopped"
+        assert map_docker_status("") == "stopped"
+
+    def test_split_mounts_accepts_both_key_styles(self):
+        """Should parse inspect mounts and agent-pushed mounts alike."""
+        named, binds = split_mounts(
+            [
+                {"Type": "volume", "Name": "data", "Destination": "/data"},
+                {"type": "bind", "source": "/h", "destination": "/c", "mode": "ro"},
+            ]
+        )
+
+        assert named == [{"name": "data", "destination": "/data", "mode": "rw"}]
+        assert binds == [{"source": "/h", "destination": "/c", "mode": "ro"}]
+
+
+class TestApplyContainerState:
+    """Tests for apply_container_state method."""
+
+    @pytest.mark.asyncio
+    async def test_updates_matching_installation(self, status_manager, mock_db_service):
+        """Should update status, networks and mounts of matched containers."""
+        mock_db_service.get_installations.return_value = [
+            make_installation("inst-1", "web-1234"),
+            make_installation("inst-2", "db-5678"),
+        ]
+
+        updated = await status_manager.apply_container_state(
+            "server-1",
+            "agent-1",
+            {
+                "containers": [
+                    {
+                        "id": "abc",
+                        "name": "web-1234",
+                        "status": "exited",
+                        "networks": ["bridge"],
+                        "mounts": [
+                            {"type": "volume", "name": "v", "destination": "/d"}
+                        ],
+                    }
+                ]
+            },
+        )
+
+        assert updated == 1
+        mock_db_service.update_installation.assert_called_once()
+        args, kwargs = mock_db_service.update_installation.call_args
+        assert args == ("inst-1",)
+        assert kwargs["status"] == "stopped"
+        assert kwargs["networks"] == '["bridge"]'
+        assert '"name": "v"' in kwargs["named_volumes"]
+
+    @pytest.mark.asyncio
+    async def test_matches_by_container_id(self, status_manager, mock_db_service):
+        """Should fall back to matching by container ID."""
+        mock_db_service.get_installations.return_value = [
+            make_installation("inst-1", "renamed", container_id="abc")
+        ]
+
+        await status_manager.apply_container_state(
+            "server-1",
+            "agent-1",
+            {"containers": [{"id": "abc", "name": "other", "status": "running"}]},
+        )
+
+        assert mock_db_service.update_installation.call_args[1]["status"] == "running"
+
+    @pytest.mark.asyncio
+    async def test_removed_container_marks_stopped(
+        self, status_manager, mock_db_service
+    ):
+        """Should mark installations of removed containers as stopped."""
+        mock_db_service.get_installations.return_value = [
+            make_installation("inst-1", "web-1234")
+        ]
+
+        await status_manager.apply_container_state(
+            "server-1",
+            "agent-1",
+            {"containers": [{"id": "abc", "name": "web-1234", "removed": True}]},
+        )
+
+        mock_db_service.update_installation.assert_called_once_with(
+            "inst-1", status="stopped"
+        )
+
+    @pytest.mark.asyncio
+    async def test_full_snapshot_stops_missing_containers(
+        self, status_manager, mock_db_service
+    ):
+        """Should treat containers absent from a full snapshot as gone."""
+        mock_db_service.get_installations.return_value = [
+            make_installation("inst-1", "web-1234")
+        ]
+
+        await status_manager.apply_container_state(
+            "server-1", "agent-1", {"full": True, "containers": []}
+        )
+
+        mock_db_service.update_installation.assert_called_once_with(
+            "inst-1", status="stopped"
+        )
+
+    @pytest.mark.asyncio
+    async def test_skips_in_flight_installations(self, status_manager, mock_db_service):
+        """Should not overwrite installations that are still deploying."""
+        mock_db_service.get_installations.return_value = [
+            make_installation("inst-1", "web-1234", status="pulling")
+        ]
+
+        updated = await status_manager.apply_container_state(
+            "server-1",
+            "agent-1",
+            {"containers": [{"name": "web-1234", "status": "created"}]},
+        )
+
+        assert updated == 0
+        mock_db_service.update_installation.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handles_db_error(self, status_manager, mock_db_service):
+        """Should return 0 when installations cannot be loaded."""
+        mock_db_service.get_installations.side_effect = Exception("DB error")
+
+        result = await status_manager.apply_container_state(
+            "server-1", "agent-1", {"containers": []}
+        )
+
+        assert result == 0
+
+
+class TestHasLiveStateFeed:
+    """Tests for has_live_state_feed method."""
+
+    @pytest.mark.asyncio
+    async def test_live_after_push_while_connected(self, status_manager):
+        """Should report a live feed once an agent has pushed state."""
+        assert status_manager.has_live_state_feed("server-1") is False
+
+        await status_manager.apply_container_state(
+            "server-1", "agent-1", {"containers": []}
+        )
+
+        assert status_manager.has_live_state_feed("server-1") is True
+
+    @pytest.mark.asyncio
+    async def test_drops_feed_when_agent_disconnects(
+        self, status_manager, agent_manager
+    ):
+        """Should forget the feed when the agent is gone."""
+        await status_manager.apply_container_state(
+            "server-1", "agent-1", {"containers": []}
+        )
+        agent_manager.is_connected.return_value = False
+
+        assert status_manager.has_live_state_feed("server-1") is False
+        assert "server-1" not in status_manager._state_feeds
+
+    @pytest.mark.asyncio
+    async def test_drops_feed_when_agent_loses_sync(
+        self, status_manager, mock_db_service
+    ):
+        """Should stop trusting a connected agent until it pushes a new snapshot."""
+        await status_manager.apply_container_state(
+            "server-1", "agent-1", {"live": True, "full": True, "containers": []}
+        )
+
+        updated = await status_manager.apply_container_state(
+            "server-1", "agent-1", {"live": False, "full": False, "containers": []}
+        )
+
+        assert updated == 0
+        assert status_manager.has_live_state_feed("server-1") is False
+        assert mock_db_service.get_installations.await_count == 1
+
+        await status_manager.apply_container_state(
+            "server-1", "agent-1", {"live": True, "full": True, "containers": []}
+        )
+
+        assert status_manager.has_live_state_feed("server-1") is True
+
+
+class TestDeploymentServiceStateFeed:
+    """Tests for DeploymentService docker.state_changed handling."""
+
+    @pytest.fixture
+    def deployment_service(self, mock_db_service, agent_manager):
+        """Create deployment service with mocked dependencies."""
+        from services.deployment import DeploymentService
+
+        return DeploymentService(
+            ssh_service=MagicMock(),
+            server_service=MagicMock(),
+            marketplace_service=MagicMock(),
+            db_service=mock_db_service,
+            agent_manager=agent_manager,
+            agent_service=MagicMock(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_handler_resolves_server(self, deployment_service):
+        """Should apply the changes to the agent's server."""
+        with patch.object(
+            deployment_service.status_manager,
+            "apply_container_state",
+            new_callable=AsyncMock,
+        ) as mock_apply:
+            await deployment_service.handle_docker_state_changed(
+                "agent-1", {"containers": []}
+            )
+
+        mock_apply.assert_called_once_with("server-1", "agent-1", {"containers": []})
+
+    @pytest.mark.asyncio
+    async def test_handler_ignores_unknown_agent(
+        self, deployment_service, agent_manager
+    ):
+        """Should ignore notifications from agents without a connection."""
+        agent_manager.get_connection_info.return_value = None
+
+        with patch.object(
+            deployment_service.status_manager,
+            "apply_container_state",
+            new_callable=AsyncMock,
+        ) as mock_apply:
+            await deployment_service.handle_docker_state_changed("agent-x", {})
+
+        mock_apply.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_refresh_uses_pushed_state(self, deployment_service, mock_db_service):
+        """Should answer refreshes from the database while the feed is live."""
+        inst = make_installation("inst-1", "web-1234", status="running")
+        mock_db_service.get_installation_by_id.return_value = inst
+        await deployment_service.handle_docker_state_changed(
+            "agent-1", {"containers": []}
+        )
+
+        with patch.object(
+            deployment_service, "_agent_inspect_container", new_callable=AsyncMock
+        ) as mock_inspect:
+            result = await deployment_service.refresh_installation_status("inst-1")
+
+        mock_inspect.assert_not_called()
+        assert result["status"] == "running"
+        assert result["networks"] == ["bridge"]
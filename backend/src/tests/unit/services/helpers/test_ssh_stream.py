@@ -0,0 +1,134 @@
+"""
+Unit tests for services/helpers/ssh_stream.py
+
+Tests incremental line splitting and the CommandStream async iterator.
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.helpers.ssh_stream import CommandStream, LineSplitter
+
+
+def make_client(chunks, exit_status=0, stderr=b""):
+    """Create a mock SSH client whose channel returns chunks then EOF."""
+    channel = MagicMock()
+    channel.recv_ready.return_value = False
+    channel.recv.side_effect = [*chunks, b""]
+    channel.recv_exit_status.return_value = exit_status
+    stdout = MagicMock()
+    stdout.channel = channel
+    stderr_file = MagicMock()
+    stderr_file.read.return_value = stderr
+    client = MagicMock()
+    client.exec_command.return_value = (MagicMock(), stdout, stderr_file)
+    return client, channel
+
+
+class TestLineSplitter:
+    """Tests for LineSplitter."""
+
+    def test_keeps_partial_line_until_completed(self):
+        """feed should hold back a line until its terminator arrives."""
+        splitter = LineSplitter()
+
+        assert splitter.feed(b"first\nsec") == ["first"]
+        assert splitter.feed(b"ond\n") == ["second"]
+
+    def test_splits_on_carriage_returns_and_skips_blank_lines(self):
+        """feed should treat \\r and \\r\\n as line ends and drop blanks."""
+        splitter = LineSplitter()
+
+        assert splitter.feed(b"10%\r20%\r\n\n  \nok\n") == ["10%", "20%", "ok"]
+
+    def test_decodes_multibyte_characters_split_across_chunks(self):
+        """feed should not mangle UTF-8 sequences split between chunks."""
+        splitter = LineSplitter()
+        data = "café\n".encode()
+
+        assert splitter.feed(data[:4]) == []
+        assert splitter.feed(data[4:]) == ["café"]
+
+    def test_flush_returns_stripped_remainder(self):
+        """flush should return the trailing partial line once."""
+        splitter = LineSplitter()
+        splitter.feed(b"done\n  tail  ")
+
+        assert splitter.flush() == ["tail"]
+        assert splitter.flush() == []
+
+
+class TestCommandStream:
+    """Tests for CommandStream."""
+
+    @pytest.mark.asyncio
+    async def test_iterates_batches_and_collects_exit_status(self):
+        """Iteration should yield line batches, then expose exit status."""
+        client, _ = make_client([b"a\nb\n", b"c"], exit_status=2, stderr=b"boom")
+
+        stream = await CommandStream.start(client, "cmd", timeout=30)
+        async with stream:
+            batches = [lines async for lines in stream]
+
+        assert batches == [["a", "b"], ["c"]]
+        assert stream.exit_status == 2
+        assert stream.stderr == "boom"
+        client.exec_command.assert_called_once_with("cmd", timeout=30)
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_raised_to_consumer(self):
+        """A channel timeout should surface from the iterator."""
+        client, channel = make_client([])
+        channel.recv.side_effect = TimeoutError()
+
+        stream = await CommandStream.start(client, "cmd", timeout=5)
+        with pytest.raises(TimeoutError, match="No output received for 5 seconds"):
+            async with stream:
+                async for _ in stream:
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_reader_pauses_when_queue_is_full(self):
+        """The reader should stop pulling from the channel until consumed."""
+        client, channel = make_client([b"1\n", b"2\n", b"3\n", b"4\n"])
+
+        stream = await CommandStream.start(client, "cmd", max_queued_batches=1)
+        async with stream:
+            await asyncio.sleep(0.1)
+            # One batch queued, one blocked on the full queue
+            assert channel.recv.call_count == 2
+
+            batches = [lines async for lines in stream]
+
+        assert batches == [["1"], ["2"], ["3"], ["4"]]
+
+    @pytest.mark.asyncio
+    async def test_leaving_early_closes_channel(self):
+        """Exiting the context mid-stream should close the channel."""
+        client, channel = make_client([])
+        unblock = threading.Event()
+
+        calls = []
+
+        def recv(size):
+            calls.append(size)
+            if len(calls) == 1:
+                return b"line\n"
+            # Still running: block until the channel gets closed
+            unblock.wait(5)
+            return b""
+
+        channel.recv.side_effect = recv
+        channel.close.side_effect = unblock.set
+
+        stream = await CommandStream.start(client, "cmd", max_queued_batches=1)
+        async with stream:
+            async for lines in stream:
+                assert lines == ["line"]
+                break
+
+        channel.close.assert_called_once()
+        assert stream.exit_status is None
@@ -356,6 +356,29 @@ class TestGetConnectedAgentIds:
         assert ids == []
 
 
+class TestGetPendingRequestCount:
+    """Tests for get_pending_request_count method."""
+
+    @pytest.mark.asyncio
+    async def test_counts_across_agents(self, agent_manager, mock_websocket):
+        """Pending requests of every connection should be summed."""
+        with patch("services.agent_manager.logger"):
+            await agent_manager.register_connection(
+                "agent-1", mock_websocket, "server-1"
+            )
+            await agent_manager.register_connection("agent-2", AsyncMock(), "server-2")
+        agent_manager._connections["agent-1"].pending_requests.update(
+            {"r1": MagicMock(), "r2": MagicMock()}
+        )
+        agent_manager._connections["agent-2"].pending_requests["r3"] = MagicMock()
+
+        assert agent_manager.get_pending_request_count() == 3
+
+    def test_no_connections(self, agent_manager):
+        """Without connections nothing is pending."""
+        assert agent_manager.get_pending_request_count() == 0
+
+
 class TestGetConnectionInfo:
     """Tests for get_connection_info method."""
 
@@ -11,7 +11,12 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from models.agent import AgentConfig, AgentStatus
-from services.agent_manager import MAX_MESSAGE_SIZE_BYTES, AgentManager
+from services.agent_manager import (
+    AGENT_RPC_CALLS,
+    AGENT_RPC_DURATION,
+    MAX_MESSAGE_SIZE_BYTES,
+    AgentManager,
+)
 
 
 @pytest.fixture
@@ -120,6 +125,26 @@ class TestSendCommand:
 
         assert len(agent_manager._connections["agent-123"].pending_requests) == 0
 
+    @pytest.mark.asyncio
+    async def test_send_command_records_rpc_metrics(
+        self, agent_manager, mock_websocket
+    ):
+        """send_command should time each call and count its outcome."""
+        method = "metrics.probe"
+        with patch("services.agent_manager.logger"):
+            await agent_manager.register_connection("agent-123", mock_websocket, "srv")
+            task = asyncio.create_task(
+                resolve_pending_requests(agent_manager, "agent-123")
+            )
+            await agent_manager.send_command("agent-123", method, timeout=1.0)
+            await task
+            with pytest.raises(TimeoutError):
+                await agent_manager.send_command("agent-123", method, timeout=0.01)
+
+        assert AGENT_RPC_CALLS.value(method, "ok") == 1
+        assert AGENT_RPC_CALLS.value(method, "timeout") == 1
+        assert AGENT_RPC_DURATION.count(method) == 2
+
 
 class TestHandleMessage:
     """Tests for handle_message method."""
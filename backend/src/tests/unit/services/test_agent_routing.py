@@ -0,0 +1,392 @@
+"""
+Unit tests for services/agent_routing.py
+
+Tests two workers sharing agent connections over real Unix sockets and a
+real SQLite database: route announcements, forwarded commands, relayed
+stream notifications, worker calls, shared cache invalidations and
+workers that go away.
+"""
+
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.agent_manager import AgentManager
+from services.agent_routing import (
+    FRAME_HEADER,
+    AgentRouter,
+    encode_frame,
+    read_frame,
+)
+from services.database.base import DatabaseConnection
+from services.database.migrations import MigrationRunner
+
+
+class FakeAgent:
+    """Agent end of a WebSocket that answers every command."""
+
+    def __init__(self, result=None, error=None, frames=()):
+        self.manager = None
+        self.agent_id = None
+        self.result = result
+        self.error = error
+        self.frames = list(frames)
+        self.sent = []
+        self.closed = False
+
+    async def send_text(self, data):
+        request = json.loads(data)
+        self.sent.append(request)
+        asyncio.get_running_loop().create_task(self._respond(request))
+
+    async def close(self, code=1000):
+        self.closed = True
+
+    async def notify(self, method, params):
+        message = json.dumps({"jsonrpc": "2.0", "method": method, "params": params})
+        await self.manager.handle_message(self.agent_id, message)
+
+    async def _respond(self, request):
+        for params in self.frames:
+            await self.notify("test.stream", params)
+        reply = {"jsonrpc": "2.0", "id": request["id"]}
+        if self.error:
+            reply["error"] = {"code": -1, "message": self.error}
+        else:
+            reply["result"] = self.result
+        await self.manager.handle_message(self.agent_id, json.dumps(reply))
+
+
+@pytest.fixture
+async def connection(tmp_path):
+    """Migrated database shared by both workers."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await MigrationRunner(connection).migrate()
+    return connection
+
+
+@pytest.fixture
+async def workers(connection, tmp_path):
+    """Two started workers with their managers, as (router, manager) pairs."""
+    pairs = []
+    for worker_id in ("a", "b"):
+        agent_db = MagicMock()
+        agent_db.update_agent = AsyncMock()
+        router = AgentRouter(connection, tmp_path / "ipc", worker_id=worker_id)
+        manager = AgentManager(agent_db, router=router)
+        await router.start()
+        pairs.append((router, manager))
+    yield pairs
+    for router, _ in pairs:
+        await router.stop()
+
+
+async def connect(manager, agent_id, agent):
+    """Register a fake agent on a worker."""
+    agent.manager = manager
+    agent.agent_id = agent_id
+    await manager.register_connection(agent_id, agent, f"server-{agent_id}")
+
+
+async def settle():
+    """Let IPC frames in flight be delivered."""
+    for _ in range(20):
+        await asyncio.sleep(0.005)
+
+
+class TestFrames:
+    """Tests for the IPC frame encoding."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_end_of_stream(self):
+        """Frames should decode to the message and EOF to None."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame({"op": "route", "n": 1}))
+        reader.feed_eof()
+
+        assert await read_frame(reader) == {"op": "route", "n": 1}
+        assert await read_frame(reader) is None
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_frames(self):
+        """A length above the limit should be refused before reading it."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(FRAME_HEADER.pack(1 << 30))
+
+        with pytest.raises(ValueError, match="exceeds"):
+            await read_frame(reader)
+
+
+class TestRoutes:
+    """Tests for claiming and releasing agent routes."""
+
+    @pytest.mark.asyncio
+    async def test_peers_learn_routes(self, workers):
+        """Agents on one worker should count as connected on the other."""
+        (router_a, manager_a), (router_b, manager_b) = workers
+
+        await connect(manager_a, "agent-1", FakeAgent())
+        await settle()
+
+        assert router_b.get_route("agent-1").worker_id == "a"
+        assert manager_b.is_connected("agent-1")
+        assert manager_b.get_connected_agent_ids() == ["agent-1"]
+        info = manager_b.get_connection_info("agent-1")
+        assert info["server_id"] == "server-agent-1"
+        assert info["worker_id"] == "a"
+
+        await manager_a.unregister_connection("agent-1")
+        await settle()
+
+        assert not manager_b.is_connected("agent-1")
+        assert router_a.routes() == []
+
+    @pytest.mark.asyncio
+    async def test_new_worker_loads_routes(self, workers, connection, tmp_path):
+        """A worker starting later should read the routes from the database."""
+        (_, manager_a), _ = workers
+        await connect(manager_a, "agent-1", FakeAgent())
+        late = AgentRouter(connection, tmp_path / "ipc", worker_id="c")
+
+        await late.start()
+        try:
+            assert late.get_route("agent-1").worker_id == "a"
+            assert not late.is_primary
+        finally:
+            await late.stop()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_supersedes_old_worker(self, workers):
+        """Reconnecting to another worker should drop the old socket only."""
+        (router_a, manager_a), (_, manager_b) = workers
+        old, new = FakeAgent(), FakeAgent()
+        await connect(manager_a, "agent-1", old)
+        await settle()
+
+        await connect(manager_b, "agent-1", new)
+        await settle()
+
+        assert old.closed
+        assert router_a.get_route("agent-1").worker_id == "b"
+        assert manager_a.get_connection_info("agent-1")["worker_id"] == "b"
+        # The old worker must not mark the reconnected agent disconnected
+        assert manager_a._agent_db.update_agent.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_first_worker_is_primary(self, workers):
+        """Exactly one worker should run the backend-wide schedulers."""
+        (router_a, _), (router_b, _) = workers
+
+        assert router_a.is_primary
+        assert not router_b.is_primary
+
+    @pytest.mark.asyncio
+    async def test_worker_leases(self, workers, connection, tmp_path):
+        """Workers should look alive until they stop or die."""
+        (router_a, _), (router_b, _) = workers
+        crashed = tmp_path / "ipc" / "worker-crashed.lease"
+        crashed.touch()
+
+        assert router_a.is_worker_alive("b") is True
+        assert router_a.is_worker_alive("crashed") is False
+        assert not crashed.exists()
+        assert router_a.is_worker_alive("never-started") is False
+
+        await router_b.stop()
+        assert router_a.is_worker_alive("b") is False
+
+    def test_default_worker_ids_are_unique(self, connection, tmp_path):
+        """A restarted process with the same pid should get a new worker id."""
+        first = AgentRouter(connection, tmp_path / "ipc")
+        second = AgentRouter(connection, tmp_path / "ipc")
+
+        assert first.worker_id != second.worker_id
+        assert first.worker_id.startswith(f"{os.getpid()}-")
+
+    @pytest.mark.asyncio
+    async def test_clear_routes(self, workers):
+        """Clearing should forget every worker's routes."""
+        (_, manager_a), (router_b, _) = workers
+        await connect(manager_a, "agent-1", FakeAgent())
+
+        assert await router_b.clear_routes() == 1
+        await router_b.refresh()
+        assert router_b.routes() == []
+
+
+class TestForwardCommand:
+    """Tests for commands sent to agents on another worker."""
+
+    @pytest.mark.asyncio
+    async def test_forwards_to_owner(self, workers):
+        """Commands should travel to the worker holding the socket."""
+        (_, manager_a), (_, manager_b) = workers
+        agent = FakeAgent(result={"containers": 3})
+        await connect(manager_a, "agent-1", agent)
+        await settle()
+
+        result = await manager_b.send_command("agent-1", "docker.list", {"all": True})
+
+        assert result == {"containers": 3}
+        assert agent.sent[0]["method"] == "docker.list"
+        assert agent.sent[0]["params"] == {"all": True}
+
+    @pytest.mark.asyncio
+    async def test_agent_errors_keep_their_type(self, workers):
+        """Agent errors should surface as RuntimeError on the caller."""
+        (_, manager_a), (_, manager_b) = workers
+        await connect(manager_a, "agent-1", FakeAgent(error="no such container"))
+        await settle()
+
+        with pytest.raises(RuntimeError, match="no such container"):
+            await manager_b.send_command("agent-1", "docker.inspect")
+
+    @pytest.mark.asyncio
+    async def test_unknown_agent(self, workers):
+        """Agents no worker holds should not be connected."""
+        (_, manager_b) = workers[1]
+
+        with pytest.raises(ValueError, match="not connected"):
+            await manager_b.send_command("agent-9", "ping")
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_routes_are_dropped(self, workers, connection, tmp_path):
+        """A worker that stopped answering should lose its routes."""
+        (_, manager_a), _ = workers
+        gone = AgentRouter(connection, tmp_path / "ipc", worker_id="gone")
+        await gone.start()
+        await gone.claim("agent-1", "server-1")
+        gone._server.close()
+        for writer in list(gone._clients):
+            writer.close()
+        await gone._server.wait_closed()
+        gone._server = None
+        await settle()
+
+        with pytest.raises(ValueError, match="not connected"):
+            await manager_a.send_command("agent-1", "ping")
+
+        assert not manager_a.is_connected("agent-1")
+        assert not gone.socket_path.exists()
+        await gone.refresh()
+        assert gone.routes() == []
+        await gone.stop()
+
+
+class TestRelayNotifications:
+    """Tests for stream frames of forwarded commands."""
+
+    @pytest.mark.asyncio
+    async def test_frames_follow_the_stream(self, workers):
+        """Frames should reach the worker that started the stream."""
+        (_, manager_a), (_, manager_b) = workers
+        received_a, received_b = [], []
+        for manager, received in ((manager_a, received_a), (manager_b, received_b)):
+            manager.register_notification_handler(
+                "test.stream",
+                lambda agent_id, params, received=received: _append(received, params),
+            )
+        # Frames sent before the result carries the stream id are held
+        agent = FakeAgent(
+            result={"stream_id": "s1"},
+            frames=[{"stream_id": "s1", "seq": 1}],
+        )
+        await connect(manager_a, "agent-1", agent)
+        await settle()
+
+        await manager_b.send_command("agent-1", "docker.logs.subscribe")
+        await agent.notify("test.stream", {"stream_id": "s1", "seq": 2, "done": True})
+        await agent.notify("test.stream", {"stream_id": "s1", "seq": 3})
+        await agent.notify("test.stream", {"seq": 4})
+        await settle()
+
+        assert [p["seq"] for p in received_b] == [1, 2]
+        assert [p["seq"] for p in received_a] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_stream_id_in_params(self, workers):
+        """Streams named by the caller should be relayed from the start."""
+        (_, manager_a), (_, manager_b) = workers
+        received = []
+        manager_b.register_notification_handler(
+            "test.stream", lambda agent_id, params: _append(received, params)
+        )
+        agent = FakeAgent(result={"ok": True}, frames=[{"stream_id": "x", "seq": 1}])
+        await connect(manager_a, "agent-1", agent)
+        await settle()
+
+        await manager_b.send_command("agent-1", "system.exec", {"stream_id": "x"})
+        await settle()
+
+        assert [p["seq"] for p in received] == [1]
+
+
+class TestWorkerCalls:
+    """Tests for handlers called on another worker."""
+
+    @pytest.mark.asyncio
+    async def test_calls_registered_handler(self, workers):
+        """Should run the handler on the named worker with the arguments."""
+        (router_a, _), (router_b, _) = workers
+
+        async def read(stream_id, after=0):
+            return {"stream_id": stream_id, "after": after, "worker": "b"}
+
+        router_b.register_handler("streams.read", read)
+
+        result = await router_a.call_worker(
+            "b", "streams.read", {"stream_id": "s1", "after": 2}
+        )
+
+        assert result == {"stream_id": "s1", "after": 2, "worker": "b"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_handler(self, workers):
+        """Calls to handlers the worker never registered should fail."""
+        (router_a, _), _ = workers
+
+        with pytest.raises(ValueError, match="Unknown worker call"):
+            await router_a.call_worker("b", "missing", {})
+
+    @pytest.mark.asyncio
+    async def test_unreachable_worker(self, workers):
+        """Calling a worker without a socket should raise ConnectionError."""
+        (router_a, _), _ = workers
+
+        with pytest.raises(ConnectionError):
+            await router_a.call_worker("gone", "streams.read", {})
+
+    @pytest.mark.asyncio
+    async def test_calls_every_other_worker(self, workers):
+        """Should collect results from live workers and skip the rest."""
+        (router_a, _), (router_b, _) = workers
+
+        async def snapshot():
+            return {"worker": "b"}
+
+        router_b.register_handler("metrics.snapshot", snapshot)
+        # Socket left behind by a worker that no longer holds its lease
+        (router_a.socket_path.parent / "worker-gone.sock").touch()
+
+        assert await router_a.call_workers("metrics.snapshot", {}) == [{"worker": "b"}]
+        assert await router_a.call_workers("missing", {}) == []
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_invalidation(self, workers):
+        """Invalidating a cache should clear every other worker's copy."""
+        (router_a, _), (router_b, _) = workers
+        cleared = []
+        invalidate = router_a.share_cache("stats", lambda: cleared.append("a"))
+        router_b.share_cache("stats", lambda: cleared.append("b"))
+
+        invalidate()
+        await settle()
+
+        assert cleared == ["b"]
+
+
+async def _append(received, params):
+    received.append(params)
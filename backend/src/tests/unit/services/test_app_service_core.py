@@ -1,7 +1,7 @@
 """
 Unit tests for services/app_service.py - Core functionality
 
-Tests initialization, fetch, filtering, and sorting.
+Tests initialization, SQL filtering, sorting, pagination and caching.
 """
 
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -16,6 +16,8 @@ from models.app import (
     AppStatus,
 )
 from services.app_service import AppService
+from services.database.base import DatabaseConnection
+from services.database.schema_init import SchemaInitializer
 
 
 @pytest.fixture
@@ -135,292 +137,191 @@ class TestAppServiceInit:
             assert service._log_service is mock_log
 
 
-class TestFetchAllApps:
-    """Tests for _fetch_all_apps method."""
+@pytest.fixture
+async def catalog(tmp_path):
+    """Create an AppService over a real database seeded with a few apps."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await SchemaInitializer(connection).initialize_all_tables()
+    log_service = MagicMock()
+    log_service.create_log_entry = AsyncMock()
+    service = AppService(connection=connection, log_service=log_service)
+
+    seed = [
+        ("plex", "Plex", "Media server", "media", ["Media", "streaming"], 300, 4.5),
+        ("jellyfin", "Jellyfin", "Free media system", "media", ["media"], 200, 4.8),
+        ("nextcloud", "Nextcloud", "File sync", "storage", ["files"], 500, 4.2),
+        ("pihole", "Pi-hole", "DNS sinkhole", "network", ["dns"], 200, None),
+        ("adguard", "AdGuard", "DNS blocker for media", "network", ["dns"], 50, 3.9),
+    ]
+    for app_id, name, description, category, tags, installs, rating in seed:
+        await service.add_app(
+            {
+                "id": app_id,
+                "name": name,
+                "description": description,
+                "version": "1.0.0",
+                "category": category,
+                "tags": tags,
+                "author": "Example",
+                "license": "MIT",
+                "featured": app_id in {"plex", "nextcloud"},
+                "avg_rating": rating,
+            }
+        )
+        async with connection.get_connection() as conn:
+            await conn.execute(
+                "UPDATE applications SET install_count = ? WHERE id = ?",
+                (installs, app_id),
+            )
+            await conn.commit()
+    return service
+
+
+def ids(result):
+    """Return the app IDs of a search result in order."""
+    return [app.id for app in result.apps]
+
+
+class TestSearchAppsSql:
+    """Tests for filtering, sorting and pagination in SQL."""
 
     @pytest.mark.asyncio
-    async def test_fetch_all_apps_returns_apps(
-        self, mock_db_conn, sample_app_row
-    ):
-        """_fetch_all_apps should return list of App instances."""
-        mock_conn, mock_aiosqlite = mock_db_conn
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall.return_value = [sample_app_row]
-        mock_aiosqlite.execute.return_value = mock_cursor
+    async def test_filters_combine(self, catalog):
+        """Category, featured, tags and search should all narrow the result."""
+        assert ids(await catalog.search_apps(AppFilter(category="media"))) == [
+            "jellyfin",
+            "plex",
+        ]
+        assert ids(await catalog.search_apps(AppFilter(featured=True))) == [
+            "nextcloud",
+            "plex",
+        ]
+        assert ids(await catalog.search_apps(AppFilter(tags=["MEDIA"]))) == [
+            "jellyfin",
+            "plex",
+        ]
+        assert ids(
+            await catalog.search_apps(AppFilter(tags=["media", "streaming"]))
+        ) == ["plex"]
+        assert ids(await catalog.search_apps(AppFilter(search="MEDIA"))) == [
+            "adguard",
+            "jellyfin",
+            "plex",
+        ]
+        assert (
+            ids(
+                await catalog.search_apps(
+                    AppFilter(status=AppStatus.INSTALLED, category="media")
+                )
+            )
+            == []
+        )
 
-        mock_log = MagicMock()
-        with patch("services.app_service.logger"):
-            service = AppService(connection=mock_conn, log_service=mock_log)
-            apps = await service._fetch_all_apps()
+    @pytest.mark.asyncio
+    async def test_sorts_with_id_tie_breaker(self, catalog):
+        """Sort keys should order in SQL, with NULLs as zero and ties by ID."""
+        result = await catalog.search_apps(
+            AppFilter(sort_by="popularity", sort_order="desc")
+        )
+        assert ids(result) == ["nextcloud", "plex", "pihole", "jellyfin", "adguard"]
+
+        result = await catalog.search_apps(AppFilter(sort_by="rating"))
+        assert ids(result) == ["pihole", "adguard", "nextcloud", "plex", "jellyfin"]
 
-            assert len(apps) == 1
-            assert apps[0].id == "plex"
-            assert apps[0].name == "Plex"
+        result = await catalog.search_apps(AppFilter(sort_by="bogus", sort_order=None))
+        assert ids(result) == ["adguard", "jellyfin", "nextcloud", "pihole", "plex"]
 
     @pytest.mark.asyncio
-    async def test_fetch_all_apps_logs_count(
-        self, mock_db_conn, sample_app_row
-    ):
-        """_fetch_all_apps should log fetched count."""
-        mock_conn, mock_aiosqlite = mock_db_conn
-        mock_cursor = AsyncMock()
-        mock_cursor.fetchall.return_value = [sample_app_row]
-        mock_aiosqlite.execute.return_value = mock_cursor
+    async def test_keyset_pagination_walks_all_pages(self, catalog):
+        """Cursors should page through every match exactly once."""
+        filters = AppFilter(sort_by="popularity", sort_order="desc", limit=2)
+        seen = []
+        pages = []
+        while True:
+            result = await catalog.search_apps(filters)
+            seen.extend(ids(result))
+            pages.append(result.page)
+            assert result.total == 5
+            assert result.limit == 2
+            if result.next_cursor is None:
+                break
+            filters = filters.model_copy(update={"cursor": result.next_cursor})
+
+        assert seen == ["nextcloud", "plex", "pihole", "jellyfin", "adguard"]
+        assert pages == [1, 2, 3]
 
-        mock_log = MagicMock()
-        with patch("services.app_service.logger") as mock_logger:
-            service = AppService(connection=mock_conn, log_service=mock_log)
-            await service._fetch_all_apps()
+    @pytest.mark.asyncio
+    async def test_rejects_foreign_or_invalid_cursor(self, catalog):
+        """A cursor is only valid for the sort it was issued for."""
+        result = await catalog.search_apps(AppFilter(limit=2))
 
-            mock_logger.debug.assert_called_with(
-                "Fetched applications from database", count=1
+        with pytest.raises(ValueError, match="does not match"):
+            await catalog.search_apps(
+                AppFilter(limit=2, sort_by="rating", cursor=result.next_cursor)
             )
+        with pytest.raises(ValueError, match="Invalid search cursor"):
+            await catalog.search_apps(AppFilter(limit=2, cursor="not-a-cursor"))
+
+    @pytest.mark.asyncio
+    async def test_empty_result_writes_log_entry(self, catalog):
+        """A search without matches should be recorded once."""
+        result = await catalog.search_apps(AppFilter(search="nothing"))
 
+        assert result.total == 0
+        assert result.apps == []
+        catalog._log_service.create_log_entry.assert_called_once()
 
-class TestApplyFilters:
-    """Tests for _apply_filters static method."""
 
-    def test_filter_by_category(self, sample_app):
-        """_apply_filters should filter by category."""
-        filters = AppFilter(category="media")
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
+class TestSearchCache:
+    """Tests for the search result cache."""
 
-        filters = AppFilter(category="networking")
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 0
+    @pytest.mark.asyncio
+    async def test_equivalent_filters_share_cache_entry(self, catalog):
+        """Case and tag order should not defeat the cache."""
+        first = await catalog.search_apps(AppFilter(search=" Media", tags=["a", "B"]))
+        with patch.object(catalog, "_conn") as conn:
+            second = await catalog.search_apps(
+                AppFilter(search="media", tags=["b", "A"])
+            )
+            conn.get_connection.assert_not_called()
 
-    def test_filter_by_status(self, sample_app):
-        """_apply_filters should filter by status."""
-        filters = AppFilter(status=AppStatus.AVAILABLE)
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
+        assert second.total == first.total
+        assert second.filters.search == "media"
 
+    @pytest.mark.asyncio
+    async def test_catalog_changes_invalidate_cache(self, catalog):
+        """add_app, remove_app and install markers should clear the cache."""
         filters = AppFilter(status=AppStatus.INSTALLED)
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 0
-
-    def test_filter_by_featured(self, sample_app):
-        """_apply_filters should filter by featured flag."""
-        filters = AppFilter(featured=True)
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-        filters = AppFilter(featured=False)
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 0
-
-    def test_filter_by_tags(self, sample_app):
-        """_apply_filters should filter by tags."""
-        filters = AppFilter(tags=["media"])
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-        filters = AppFilter(tags=["media", "streaming"])
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-        filters = AppFilter(tags=["nonexistent"])
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 0
-
-    def test_filter_by_search_name(self, sample_app):
-        """_apply_filters should search in name."""
-        filters = AppFilter(search="plex")
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-        filters = AppFilter(search="PLEX")  # Case insensitive
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-    def test_filter_by_search_description(self, sample_app):
-        """_apply_filters should search in description."""
-        filters = AppFilter(search="media server")
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-    def test_filter_no_match(self, sample_app):
-        """_apply_filters should return empty for no match."""
-        filters = AppFilter(search="nonexistent")
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 0
-
-    def test_filter_empty_filters(self, sample_app):
-        """_apply_filters should return all apps with empty filters."""
-        filters = AppFilter()
-        result = AppService._apply_filters([sample_app], filters)
-        assert len(result) == 1
-
-
-class TestApplySorting:
-    """Tests for _apply_sorting static method."""
-
-    def test_sort_by_name_asc(self, sample_category):
-        """_apply_sorting should sort by name ascending."""
-        app1 = App(
-            id="a", name="Zebra", description="Z", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="Alpha", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="name", sort_order="asc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].name == "Alpha"
-        assert apps[1].name == "Zebra"
-
-    def test_sort_by_name_desc(self, sample_category):
-        """_apply_sorting should sort by name descending."""
-        app1 = App(
-            id="a", name="Alpha", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="Zebra", description="Z", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="name", sort_order="desc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].name == "Zebra"
-        assert apps[1].name == "Alpha"
-
-    def test_sort_by_rating(self, sample_category):
-        """_apply_sorting should sort by rating."""
-        app1 = App(
-            id="a", name="A", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            rating=3.0,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="B", description="B", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            rating=5.0,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="rating", sort_order="desc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].rating == 5.0
-
-    def test_sort_by_popularity(self, sample_category):
-        """_apply_sorting should sort by install_count for popularity."""
-        app1 = App(
-            id="a", name="A", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            install_count=10,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="B", description="B", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            install_count=100,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="popularity", sort_order="desc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].install_count == 100
-
-    def test_sort_by_install_count(self, sample_category):
-        """_apply_sorting should handle install_count sort key."""
-        app1 = App(
-            id="a", name="A", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            install_count=50,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="B", description="B", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            install_count=200,
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="install_count", sort_order="desc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].install_count == 200
-
-    def test_sort_by_updated(self, sample_category):
-        """_apply_sorting should sort by updated_at."""
-        app1 = App(
-            id="a", name="A", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="B", description="B", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-06-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="updated", sort_order="desc")
-        AppService._apply_sorting(apps, filters)
-        assert apps[0].id == "b"
-
-    def test_sort_by_unknown_key(self, sample_category):
-        """_apply_sorting should default to name for unknown key."""
-        app1 = App(
-            id="a", name="Zebra", description="Z", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        app2 = App(
-            id="b", name="Alpha", description="A", version="1.0",
-            category=sample_category, author="test", license="MIT",
-            created_at="2024-01-01T00:00:00Z",
-            updated_at="2024-01-01T00:00:00Z",
-        )
-        apps = [app1, app2]
-        filters = AppFilter(sort_by="unknown", sort_order="asc")
+        assert (await catalog.search_apps(filters)).total == 0
 
-        with patch("services.app_service.logger") as mock_logger:
-            AppService._apply_sorting(apps, filters)
-            mock_logger.debug.assert_called()
-
-        assert apps[0].name == "Alpha"
-
-
-class TestIsoToDatetime:
-    """Tests for _iso_to_datetime static method."""
-
-    def test_iso_to_datetime_z_suffix(self):
-        """_iso_to_datetime should handle Z suffix."""
-        result = AppService._iso_to_datetime("2024-01-01T00:00:00Z")
-        assert result.year == 2024
-        assert result.month == 1
-        assert result.day == 1
-
-    def test_iso_to_datetime_offset(self):
-        """_iso_to_datetime should handle timezone offset."""
-        result = AppService._iso_to_datetime("2024-06-15T12:30:00+00:00")
-        assert result.year == 2024
-        assert result.month == 6
-        assert result.hour == 12
-
-    def test_iso_to_datetime_no_tz(self):
-        """_iso_to_datetime should handle no timezone."""
-        result = AppService._iso_to_datetime("2024-03-20T15:45:30")
-        assert result.year == 2024
-        assert result.minute == 45
+        await catalog.mark_app_installed("plex", "server-1")
+        assert ids(await catalog.search_apps(filters)) == ["plex"]
+
+        await catalog.mark_app_uninstalled("plex")
+        assert (await catalog.search_apps(filters)).total == 0
+
+        await catalog.remove_app("adguard")
+        assert (await catalog.search_apps(AppFilter())).total == 4
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, catalog):
+        """Entries older than the TTL should be recomputed."""
+        await catalog.search_apps(AppFilter())
+
+        with patch("services.app_service.time.monotonic", return_value=1e12):
+            assert catalog._cached_search(catalog._cache_key(AppFilter())) is None
+        assert catalog._search_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_changes_notify_listener(self, catalog):
+        """Catalog changes should be announced; remote clears should not echo."""
+        listener = MagicMock()
+        catalog.set_invalidation_listener(listener)
+        await catalog.search_apps(AppFilter())
+
+        catalog.clear_search_cache()
+        assert catalog._search_cache == {}
+        listener.assert_not_called()
+
+        await catalog.remove_app("adguard")
+        listener.assert_called_once_with()
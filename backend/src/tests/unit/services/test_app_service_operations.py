@@ -108,6 +108,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (1,)
         mock_cursor.fetchall.return_value = [sample_app_row]
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -128,6 +129,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (1,)
         mock_cursor.fetchall.return_value = [sample_app_row]
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -146,6 +148,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (0,)
         mock_cursor.fetchall.return_value = []
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -167,6 +170,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (0,)
         mock_cursor.fetchall.return_value = []
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -189,6 +193,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (1,)
         mock_cursor.fetchall.return_value = [sample_app_row]
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -210,6 +215,7 @@ class TestSearchApps:
         mock_conn, mock_aiosqlite = mock_db_conn
 
         mock_cursor = AsyncMock()
+        mock_cursor.fetchone.return_value = (1,)
         mock_cursor.fetchall.return_value = [sample_app_row]
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -0,0 +1,193 @@
+"""
+Unit tests for services/backend_telemetry.py
+
+Tests sampling the backend process, the background collector and the
+graded health report against a real SQLite database.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.backend_telemetry import (
+    LOOP_LAG_DEGRADED_MS,
+    WAL_DEGRADED_BYTES,
+    BackendTelemetry,
+)
+from services.database.base import DB_BUSY_ERRORS, DatabaseConnection
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """Database connection to a fresh file."""
+    return DatabaseConnection(db_path=tmp_path / "tomo.db")
+
+
+@pytest.fixture
+def agent_manager():
+    """Agent manager with two connected agents."""
+    manager = MagicMock()
+    manager.get_connected_agent_ids.return_value = ["agent-1", "agent-2"]
+    manager.get_pending_request_count.return_value = 3
+    return manager
+
+
+@pytest.fixture
+def telemetry(connection, agent_manager):
+    """Collector over the database and agents."""
+    return BackendTelemetry(connection, agent_manager, history_size=3)
+
+
+class TestSample:
+    """Tests for sample and record."""
+
+    @pytest.mark.asyncio
+    async def test_reads_process_database_and_agents(self, telemetry, connection):
+        """A sample should describe the process, database files and agents."""
+        async with connection.get_connection() as conn:
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("CREATE TABLE t (x)")
+            await conn.commit()
+
+        sample = telemetry.sample()
+
+        assert sample.rss_bytes > 0
+        assert sample.open_fds > 0
+        assert sample.tasks >= 1
+        assert sample.db_size_bytes > 0
+        assert sample.wal_size_bytes >= 0
+        assert sample.agents_connected == 2
+        assert sample.agent_pending_requests == 3
+        assert sample.loop_lag_ms is None
+        assert sample.cpu_percent is None
+
+    def test_missing_database_and_agents(self, tmp_path):
+        """Absent files count as empty and unknown sources as None."""
+        connection = DatabaseConnection(db_path=tmp_path / "missing.db")
+
+        sample = BackendTelemetry(connection).sample()
+
+        assert sample.db_size_bytes == 0
+        assert sample.wal_size_bytes == 0
+        assert sample.agents_connected is None
+        assert BackendTelemetry().sample().db_size_bytes is None
+
+    def test_record_keeps_bounded_history(self, telemetry):
+        """History should keep only the newest samples, oldest first."""
+        recorded = [telemetry.record() for _ in range(5)]
+
+        assert telemetry.history() == recorded[2:]
+        assert telemetry.latest is recorded[-1]
+        series = telemetry.history_series()
+        assert series["timestamp"] == [s.timestamp for s in recorded[2:]]
+        assert series["agents_connected"] == [2, 2, 2]
+
+    def test_cpu_since_last_record(self, telemetry):
+        """CPU use should be measured since the previous recorded sample."""
+        telemetry.record()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+        assert telemetry.sample().cpu_percent > 0
+
+    def test_counts_busy_errors(self, telemetry):
+        """Busy database errors should be read from the shared counter."""
+        before = telemetry.sample().db_busy_errors
+        DB_BUSY_ERRORS.inc("tests.busy")
+
+        assert telemetry.sample().db_busy_errors == before + 1
+
+    def test_to_dict_uses_iso_timestamps(self, telemetry):
+        """Timestamps should be rendered as ISO-8601 UTC."""
+        data = telemetry.sample().to_dict()
+
+        assert data["timestamp"].endswith("+00:00")
+        assert data["agents_connected"] == 2
+
+
+class TestCollector:
+    """Tests for the background collector."""
+
+    @pytest.mark.asyncio
+    async def test_records_samples_with_loop_lag(self, connection):
+        """The collector should notice a blocked event loop."""
+        telemetry = BackendTelemetry(connection)
+        with patch("services.backend_telemetry.logger"):
+            await telemetry.start(sample_interval=0.05, probe_interval=0.01)
+            assert telemetry.running
+            await asyncio.sleep(0.02)
+            time.sleep(0.03)
+            await asyncio.sleep(0.15)
+            await telemetry.stop()
+
+        assert not telemetry.running
+        lags = [s.loop_lag_ms for s in telemetry.history() if s.loop_lag_ms]
+        assert max(lags) >= 20
+
+    @pytest.mark.asyncio
+    async def test_start_twice_warns(self, telemetry):
+        """Starting a running collector should not start a second task."""
+        with patch("services.backend_telemetry.logger") as mock_logger:
+            await telemetry.start()
+            task = telemetry._task
+            await telemetry.start()
+            assert telemetry._task is task
+            await telemetry.stop()
+
+        mock_logger.warning.assert_called_once()
+
+
+class TestCheckHealth:
+    """Tests for check_health."""
+
+    @pytest.mark.asyncio
+    async def test_healthy_backend(self, telemetry):
+        """A responsive backend should be healthy with a database probe."""
+        with patch("services.backend_telemetry.logger"):
+            await telemetry.start()
+            report = await telemetry.check_health()
+            await telemetry.stop()
+
+        components = report["components"]
+        assert report["status"] == "healthy"
+        assert components["database"]["status"] == "healthy"
+        assert components["database"]["latency_ms"] >= 0
+        assert components["agents"]["connected"] == 2
+        assert components["event_loop"]["status"] == "unknown"
+        assert components["file_descriptors"]["open"] > 0
+
+    @pytest.mark.asyncio
+    async def test_lag_and_stopped_collector_degrade(self, telemetry):
+        """Loop lag and a stopped collector should degrade the backend."""
+        telemetry._window_lag = LOOP_LAG_DEGRADED_MS / 1000
+
+        report = await telemetry.check_health()
+
+        assert report["status"] == "degraded"
+        assert report["components"]["event_loop"]["status"] == "degraded"
+        assert report["components"]["telemetry"]["status"] == "degraded"
+
+    @pytest.mark.asyncio
+    async def test_large_wal_degrades_database(self, telemetry, connection):
+        """A WAL past the threshold should degrade the database."""
+        with patch(
+            "services.backend_telemetry._file_size",
+            side_effect=[0, WAL_DEGRADED_BYTES],
+        ):
+            report = await telemetry.check_health()
+
+        assert report["components"]["database"]["status"] == "degraded"
+
+    @pytest.mark.asyncio
+    async def test_unreachable_database(self, telemetry, connection):
+        """A database that cannot be opened should be unhealthy."""
+        with patch.object(
+            connection, "get_connection", side_effect=Exception("disk I/O error")
+        ):
+            report = await telemetry.check_health()
+
+        assert report["status"] == "unhealthy"
+        assert report["components"]["database"]["error"] == "disk I/O error"
@@ -0,0 +1,252 @@
+"""
+Unit tests for services/backup_archive.py
+
+Tests the chunked, authenticated archive format: round trips, tampering,
+truncation, header checks and the snapshot helpers.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from services.backup_archive import (
+    ARCHIVE_MAGIC,
+    ARCHIVE_VERSION,
+    BackupFormatError,
+    inspect_snapshot,
+    is_archive,
+    read_archive,
+    read_header,
+    restore_database,
+    snapshot_database,
+    write_archive,
+)
+
+# Keep key derivation cheap in tests
+FAST_KDF = patch("services.backup_archive.KDF_ITERATIONS", 1000)
+
+
+def pack(data, password="pw", metadata=None):
+    """Write an archive of data to memory."""
+    output = io.BytesIO()
+    with FAST_KDF:
+        write_archive(
+            io.BytesIO(data),
+            output,
+            password,
+            metadata or {"schema_version": 3, "database_size": len(data)},
+        )
+    return output.getvalue()
+
+
+def unpack(archive, password="pw"):
+    """Read an archive from memory and return header and contents."""
+    output = io.BytesIO()
+    info = read_archive(io.BytesIO(archive), password, output)
+    return info, output.getvalue()
+
+
+def frame_offsets(archive):
+    """Offsets at which each frame of an archive starts."""
+    position = len(ARCHIVE_MAGIC)
+    position += 4 + int.from_bytes(archive[position : position + 4], "big")
+    offsets = []
+    while position < len(archive):
+        offsets.append(position)
+        length = int.from_bytes(archive[position : position + 4], "big")
+        position += 4 + (length & 0x7FFFFFFF)
+    return offsets
+
+
+class TestArchiveRoundTrip:
+    """Tests for write_archive and read_archive."""
+
+    def test_round_trip(self):
+        """Data should come back unchanged along with the header fields."""
+        data = b"page" * 5000
+
+        info, restored = unpack(pack(data))
+
+        assert restored == data
+        assert info.version == ARCHIVE_VERSION
+        assert info.schema_version == 3
+        assert info.database_size == len(data)
+        assert info.header["cipher"] == "AES-256-GCM"
+
+    def test_round_trip_many_chunks(self):
+        """Incompressible data should span frames and still round trip."""
+        data = os.urandom(50_000)
+
+        with patch("services.backup_archive.CHUNK_SIZE", 4096):
+            archive = pack(data)
+            _, restored = unpack(archive)
+
+        assert restored == data
+        assert len(archive) > 12 * 4096
+
+    def test_empty_data(self):
+        """An empty snapshot should produce a single final frame."""
+        _, restored = unpack(pack(b""))
+
+        assert restored == b""
+
+    def test_verify_without_output(self):
+        """read_archive should authenticate without writing anything."""
+        info = read_archive(io.BytesIO(pack(b"x" * 100)), "pw")
+
+        assert info.database_size == 100
+
+    def test_is_archive(self, tmp_path):
+        """is_archive should check the magic bytes."""
+        archive = tmp_path / "backup.enc"
+        archive.write_bytes(pack(b"data"))
+        other = tmp_path / "legacy.enc"
+        other.write_bytes(os.urandom(64))
+
+        assert is_archive(str(archive)) is True
+        assert is_archive(str(other)) is False
+
+
+class TestArchiveIntegrity:
+    """Tests for rejecting damaged or hostile archives."""
+
+    def test_wrong_password(self):
+        """A wrong password should fail authentication."""
+        with pytest.raises(BackupFormatError, match="Invalid password"):
+            unpack(pack(b"secret"), password="other")
+
+    def test_modified_frame(self):
+        """Flipping a ciphertext bit should fail authentication."""
+        archive = bytearray(pack(b"secret" * 100))
+        archive[-5] ^= 0x01
+
+        with pytest.raises(BackupFormatError, match="corrupted"):
+            unpack(bytes(archive))
+
+    def test_modified_header(self):
+        """Header edits should invalidate every frame."""
+        archive = pack(b"secret" * 100)
+        tampered = archive.replace(b'"schema_version": 3', b'"schema_version": 4')
+
+        with pytest.raises(BackupFormatError, match="corrupted"):
+            unpack(tampered)
+
+    def test_truncated_at_frame_boundary(self):
+        """Dropping the final frame should be detected."""
+        data = os.urandom(20_000)
+        with patch("services.backup_archive.CHUNK_SIZE", 4096):
+            archive = pack(data)
+        offsets = frame_offsets(archive)
+        assert len(offsets) > 2
+
+        with pytest.raises(BackupFormatError, match="truncated"):
+            unpack(archive[: offsets[-1]])
+
+    def test_truncated_mid_frame(self):
+        """A partial frame should be reported as truncated."""
+        archive = pack(b"secret" * 100)
+
+        with pytest.raises(BackupFormatError, match="truncated"):
+            unpack(archive[:-3])
+
+    def test_trailing_data(self):
+        """Bytes after the final frame should be rejected."""
+        with pytest.raises(BackupFormatError, match="after the final"):
+            unpack(pack(b"secret") + b"extra")
+
+    def test_declared_size_mismatch(self):
+        """Data larger than the declared size should not be inflated."""
+        data = b"\x00" * 100_000
+        archive = pack(data, metadata={"schema_version": 1, "database_size": 10})
+
+        with pytest.raises(BackupFormatError, match="declared size"):
+            unpack(archive)
+
+    def test_not_an_archive(self):
+        """Other files should be rejected by their magic."""
+        with pytest.raises(BackupFormatError, match="Not a database backup"):
+            read_header(io.BytesIO(b"something else"))
+
+    def test_unsupported_version(self):
+        """Archives from a newer major version should be rejected."""
+        header = json.dumps({"version": "3.0", "chunk_size": 1024}).encode()
+        source = io.BytesIO(ARCHIVE_MAGIC + len(header).to_bytes(4, "big") + header)
+
+        with pytest.raises(BackupFormatError, match="not supported"):
+            read_header(source)
+
+    def test_oversized_chunk_size(self):
+        """Headers asking for huge frames should be rejected."""
+        header = json.dumps({"version": ARCHIVE_VERSION, "chunk_size": 1 << 30})
+        encoded = header.encode()
+        source = io.BytesIO(ARCHIVE_MAGIC + len(encoded).to_bytes(4, "big") + encoded)
+
+        with pytest.raises(BackupFormatError, match="chunk size"):
+            read_header(source)
+
+    def test_frames_are_compressed(self):
+        """Compressible snapshots should shrink in the archive."""
+        data = b"A" * 200_000
+
+        assert len(pack(data)) < len(zlib.compress(data)) + 1024
+
+
+class TestSnapshots:
+    """Tests for the SQLite snapshot helpers."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """A database with one table and a migrations table."""
+        path = tmp_path / "live.db"
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE schema_migrations (version INTEGER)")
+        conn.execute("INSERT INTO schema_migrations VALUES (1), (2)")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany(
+            "INSERT INTO items (name) VALUES (?)", [(str(i),) for i in range(3000)]
+        )
+        conn.commit()
+        conn.close()
+        return path
+
+    def test_snapshot_and_inspect(self, db_path, tmp_path):
+        """A snapshot should hold every row and the schema version."""
+        snapshot = tmp_path / "snapshot.db"
+        steps = []
+
+        size = snapshot_database(
+            str(db_path), str(snapshot), lambda *args: steps.append(args)
+        )
+
+        assert size == snapshot.stat().st_size
+        assert steps
+        assert inspect_snapshot(str(snapshot)) == {
+            "tables": {"items": 3000, "schema_migrations": 2},
+            "schema_version": 2,
+        }
+
+    def test_restore_replaces_contents(self, db_path, tmp_path):
+        """Restoring should overwrite rows seen by an open connection."""
+        snapshot = tmp_path / "snapshot.db"
+        snapshot_database(str(db_path), str(snapshot))
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM items")
+        conn.commit()
+
+        restore_database(str(snapshot), str(db_path))
+
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 3000
+        conn.close()
+
+    def test_inspect_rejects_non_database(self, tmp_path):
+        """Garbage should not pass the integrity check."""
+        path = tmp_path / "garbage.db"
+        path.write_bytes(os.urandom(4096))
+
+        with pytest.raises(BackupFormatError, match="not a valid database"):
+            inspect_snapshot(str(path))
@@ -4,12 +4,19 @@ Unit tests for services/backup_service.py
 Tests backup and restore operations with encryption.
 """
 
+import asyncio
+import json
+import os
+import sqlite3
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from cryptography.fernet import Fernet
 
+from services.backup_archive import ARCHIVE_MAGIC, ARCHIVE_VERSION
 from services.backup_service import BACKUP_VERSION, REQUIRED_FIELDS, BackupService
+from services.database_service import DatabaseService
 
 
 @pytest.fixture
@@ -25,6 +32,64 @@ def backup_service(mock_db_service, tmp_path):
         return BackupService(mock_db_service, backup_directory=str(tmp_path))
 
 
+@pytest.fixture
+async def database(tmp_path):
+    """Create a migrated database with one user and one server."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    db_service = DatabaseService(data_directory=data_dir)
+    await db_service.run_migrations()
+    conn = sqlite3.connect(db_service.db_path)
+    conn.execute(
+        "INSERT INTO users (id, username, password_hash, created_at)"
+        " VALUES ('u1', 'admin', 'hash', '2024-01-01T00:00:00')"
+    )
+    conn.execute(
+        "INSERT INTO servers (id, name, host, port, username, auth_type, created_at)"
+        " VALUES ('s1', 'Server1', '10.0.0.1', 22, 'root', 'password', '2024-01-01')"
+    )
+    conn.commit()
+    conn.close()
+    return db_service
+
+
+@pytest.fixture
+def snapshot_service(database, tmp_path):
+    """Create BackupService over a real database."""
+    with patch("services.backup_service.logger"):
+        return BackupService(database, backup_directory=str(tmp_path))
+
+
+def write_legacy_backup(path, data, password):
+    """Write a backup in the JSON format used before database snapshots."""
+    salt = os.urandom(16)
+    with patch("services.backup_service.logger"):
+        service = BackupService(MagicMock())
+    fernet = Fernet(service._derive_key(password, salt))
+    path.write_bytes(salt + fernet.encrypt(json.dumps(data).encode("utf-8")))
+
+
+def query(db_service, sql):
+    """Run a query against the database file."""
+    conn = sqlite3.connect(db_service.db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def legacy_data(**overrides):
+    """Build legacy backup contents."""
+    return {
+        "version": "1.0",
+        "timestamp": datetime.now(UTC).isoformat(),
+        "users": [{"id": "u1", "username": "admin"}],
+        "servers": [{"id": "s1", "name": "Server1"}],
+        "settings": {"theme": "dark"},
+        **overrides,
+    }
+
+
 class TestBackupServiceInit:
     """Tests for BackupService initialization."""
 
@@ -71,47 +136,24 @@ class TestDeriveKey:
         assert key1 != key2
 
 
-class TestEncryptData:
-    """Tests for _encrypt_data method."""
-
-    def test_encrypt_data_returns_bytes(self, backup_service):
-        """_encrypt_data should return bytes."""
-        data = {"key": "value"}
-        result = backup_service._encrypt_data(data, "password")
-        assert isinstance(result, bytes)
-
-    def test_encrypt_data_prepends_salt(self, backup_service):
-        """_encrypt_data should prepend 16-byte salt."""
-        data = {"key": "value"}
-        result = backup_service._encrypt_data(data, "password")
-        # Encrypted data should be at least 16 bytes (salt) + some ciphertext
-        assert len(result) > 16
-
-    def test_encrypt_data_different_each_time(self, backup_service):
-        """_encrypt_data should produce different output each time (random salt)."""
-        data = {"key": "value"}
-        result1 = backup_service._encrypt_data(data, "password")
-        result2 = backup_service._encrypt_data(data, "password")
-        assert result1 != result2
-
-
 class TestDecryptData:
     """Tests for _decrypt_data method."""
 
-    def test_decrypt_data_roundtrip(self, backup_service):
-        """_decrypt_data should decrypt what _encrypt_data encrypted."""
+    def test_decrypt_data_reads_legacy_backups(self, backup_service, tmp_path):
+        """_decrypt_data should decrypt backups written by earlier releases."""
         original = {"key": "value", "nested": {"a": 1}}
-        encrypted = backup_service._encrypt_data(original, "password")
-        decrypted = backup_service._decrypt_data(encrypted, "password")
-        assert decrypted == original
+        path = tmp_path / "legacy.enc"
+        write_legacy_backup(path, original, "password")
+
+        assert backup_service._decrypt_data(path.read_bytes(), "password") == original
 
-    def test_decrypt_data_wrong_password(self, backup_service):
+    def test_decrypt_data_wrong_password(self, backup_service, tmp_path):
         """_decrypt_data should raise ValueError for wrong password."""
-        original = {"key": "value"}
-        encrypted = backup_service._encrypt_data(original, "password1")
+        path = tmp_path / "legacy.enc"
+        write_legacy_backup(path, {"key": "value"}, "password1")
 
         with pytest.raises(ValueError) as exc_info:
-            backup_service._decrypt_data(encrypted, "password2")
+            backup_service._decrypt_data(path.read_bytes(), "password2")
         assert "Invalid password or corrupted backup" in str(exc_info.value)
 
 
@@ -164,111 +206,55 @@ class TestValidateBackup:
         assert "newer" in result["error"]
 
 
-class TestCollectBackupData:
-    """Tests for _collect_backup_data method."""
-
-    @pytest.mark.asyncio
-    async def test_collect_backup_data_calls_db_service(
-        self, backup_service, mock_db_service
-    ):
-        """_collect_backup_data should call db_service export methods."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
-
-        await backup_service._collect_backup_data()
-
-        mock_db_service.export_users.assert_called_once()
-        mock_db_service.export_servers.assert_called_once()
-        mock_db_service.export_settings.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_collect_backup_data_returns_structure(
-        self, backup_service, mock_db_service
-    ):
-        """_collect_backup_data should return correct structure."""
-        mock_db_service.export_users = AsyncMock(
-            return_value=[{"id": "u1", "username": "admin"}]
-        )
-        mock_db_service.export_servers = AsyncMock(
-            return_value=[{"id": "s1", "name": "Server1"}]
-        )
-        mock_db_service.export_settings = AsyncMock(return_value={"theme": "dark"})
-
-        result = await backup_service._collect_backup_data()
-
-        assert result["version"] == BACKUP_VERSION
-        assert "timestamp" in result
-        assert result["users"] == [{"id": "u1", "username": "admin"}]
-        assert result["servers"] == [{"id": "s1", "name": "Server1"}]
-        assert result["settings"] == {"theme": "dark"}
-        assert result["app_configs"] == []
-
-
 class TestExportBackup:
     """Tests for export_backup method."""
 
     @pytest.mark.asyncio
-    async def test_export_backup_success(
-        self, backup_service, mock_db_service, tmp_path
-    ):
-        """export_backup should write encrypted file."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
-
+    async def test_export_backup_success(self, snapshot_service, tmp_path):
+        """export_backup should write an encrypted snapshot archive."""
         output_path = str(tmp_path / "backup.enc")
 
         with patch("services.backup_service.logger"):
-            result = await backup_service.export_backup(output_path, "password123")
+            result = await snapshot_service.export_backup(output_path, "password123")
 
         assert result["success"] is True
         assert result["path"] == output_path
-        assert "size" in result
-        assert "checksum" in result
+        assert result["size"] == os.path.getsize(output_path)
+        assert result["database_size"] > 0
         assert "timestamp" in result
-        assert (tmp_path / "backup.enc").exists()
+        with open(output_path, "rb") as f:
+            assert f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+        assert not os.path.exists(output_path + ".partial")
 
     @pytest.mark.asyncio
-    async def test_export_backup_creates_file(
-        self, backup_service, mock_db_service, tmp_path
+    async def test_export_backup_does_not_leak_plaintext(
+        self, snapshot_service, tmp_path
     ):
-        """export_backup should create readable encrypted file."""
-        mock_db_service.export_users = AsyncMock(return_value=[{"id": "u1"}])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
-
-        output_path = str(tmp_path / "backup.enc")
+        """The archive should not contain readable rows or temp files."""
+        output_path = tmp_path / "backup.enc"
 
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(output_path, "password123")
+            await snapshot_service.export_backup(str(output_path), "password123")
 
-        # File should exist and be readable
-        with open(output_path, "rb") as f:
-            data = f.read()
-        assert len(data) > 16  # At least salt + some data
+        assert b"admin" not in output_path.read_bytes()
+        data_dir = tmp_path / "data"
+        assert [p.name for p in data_dir.iterdir()] == ["tomo.db"]
 
     @pytest.mark.asyncio
     async def test_export_backup_checksum_matches_size(
-        self, backup_service, mock_db_service, tmp_path
+        self, snapshot_service, tmp_path
     ):
         """export_backup checksum should be 16 chars (SHA256 truncated)."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
-
         output_path = str(tmp_path / "backup.enc")
 
         with patch("services.backup_service.logger"):
-            result = await backup_service.export_backup(output_path, "password123")
+            result = await snapshot_service.export_backup(output_path, "password123")
 
         assert len(result["checksum"]) == 16
 
     @pytest.mark.asyncio
-    async def test_export_backup_failure(self, backup_service, mock_db_service):
+    async def test_export_backup_failure(self, backup_service):
         """export_backup should return error on failure."""
-        mock_db_service.export_users = AsyncMock(side_effect=Exception("DB error"))
-
         with patch("services.backup_service.logger"):
             result = await backup_service.export_backup("/invalid/path", "password")
 
@@ -276,115 +262,171 @@ class TestExportBackup:
         assert "error" in result
 
     @pytest.mark.asyncio
-    async def test_export_backup_logs_success(
-        self, backup_service, mock_db_service, tmp_path
+    async def test_export_backup_runs_off_the_event_loop(
+        self, snapshot_service, tmp_path
     ):
-        """export_backup should log success."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
+        """Snapshot and encryption should run in a worker thread."""
+        output_path = str(tmp_path / "backup.enc")
+
+        with (
+            patch("services.backup_service.logger"),
+            patch(
+                "services.backup_service.asyncio.to_thread",
+                wraps=asyncio.to_thread,
+            ) as to_thread,
+        ):
+            await snapshot_service.export_backup(output_path, "password123")
+
+        assert to_thread.call_args.args[0] == snapshot_service._write_backup
 
+    @pytest.mark.asyncio
+    async def test_export_backup_logs_success(self, snapshot_service, tmp_path):
+        """export_backup should log success."""
         output_path = str(tmp_path / "backup.enc")
 
         with patch("services.backup_service.logger") as mock_logger:
-            await backup_service.export_backup(output_path, "password123")
+            await snapshot_service.export_backup(output_path, "password123")
             mock_logger.info.assert_called_once()
             call_kwargs = mock_logger.info.call_args.kwargs
             assert "path" in call_kwargs
             assert "checksum" in call_kwargs
 
 
+class TestVerifyBackup:
+    """Tests for verify_backup method."""
+
+    @pytest.mark.asyncio
+    async def test_verify_backup_reports_contents(self, snapshot_service, tmp_path):
+        """verify_backup should decrypt the archive and count rows per table."""
+        backup_path = str(tmp_path / "backup.enc")
+        with patch("services.backup_service.logger"):
+            exported = await snapshot_service.export_backup(backup_path, "pw")
+            result = await snapshot_service.verify_backup(backup_path, "pw")
+
+        assert result["success"] is True
+        assert result["version"] == ARCHIVE_VERSION
+        assert result["timestamp"] == exported["timestamp"]
+        assert result["database_size"] == exported["database_size"]
+        assert result["tables"]["users"] == 1
+        assert result["tables"]["servers"] == 1
+        assert result["schema_version"] > 0
+
+    @pytest.mark.asyncio
+    async def test_verify_backup_detects_tampering(self, snapshot_service, tmp_path):
+        """A modified byte should fail authentication."""
+        backup_path = tmp_path / "backup.enc"
+        with patch("services.backup_service.logger"):
+            await snapshot_service.export_backup(str(backup_path), "pw")
+        data = bytearray(backup_path.read_bytes())
+        data[-20] ^= 0x01
+        backup_path.write_bytes(bytes(data))
+
+        with patch("services.backup_service.logger"):
+            result = await snapshot_service.verify_backup(str(backup_path), "pw")
+
+        assert result["success"] is False
+        assert "corrupted" in result["error"]
+
+
 class TestImportBackup:
     """Tests for import_backup method."""
 
     @pytest.mark.asyncio
-    async def test_import_backup_success(
-        self, backup_service, mock_db_service, tmp_path
+    async def test_import_backup_restores_snapshot(
+        self, snapshot_service, database, tmp_path
     ):
-        """import_backup should decrypt and import data."""
-        # First export a backup
-        mock_db_service.export_users = AsyncMock(
-            return_value=[{"id": "u1", "username": "admin"}]
-        )
-        mock_db_service.export_servers = AsyncMock(
-            return_value=[{"id": "s1", "name": "Server1"}]
-        )
-        mock_db_service.export_settings = AsyncMock(return_value={"theme": "dark"})
-        mock_db_service.import_users = AsyncMock()
-        mock_db_service.import_servers = AsyncMock()
-        mock_db_service.import_settings = AsyncMock()
-
+        """import_backup should replace the database with the snapshot."""
         backup_path = str(tmp_path / "backup.enc")
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(backup_path, "password123")
+            await snapshot_service.export_backup(backup_path, "password123")
+        conn = sqlite3.connect(database.db_path)
+        conn.execute("DELETE FROM users")
+        conn.execute(
+            "INSERT INTO servers (id, name, host, port, username,"
+            " auth_type, created_at) VALUES ('s2', 'New', 'h', 22, 'u',"
+            " 'password', '2024')"
+        )
+        conn.commit()
+        conn.close()
 
-        # Now import it
         with patch("services.backup_service.logger"):
-            result = await backup_service.import_backup(backup_path, "password123")
+            result = await snapshot_service.import_backup(
+                backup_path, "password123", overwrite=True
+            )
 
         assert result["success"] is True
-        assert result["version"] == BACKUP_VERSION
-        assert "timestamp" in result
+        assert result["version"] == ARCHIVE_VERSION
         assert result["users_imported"] == 1
         assert result["servers_imported"] == 1
+        assert query(database, "SELECT id FROM users") == [("u1",)]
+        assert query(database, "SELECT id FROM servers") == [("s1",)]
 
     @pytest.mark.asyncio
-    async def test_import_backup_calls_db_service(
-        self, backup_service, mock_db_service, tmp_path
+    async def test_import_backup_snapshot_requires_overwrite(
+        self, snapshot_service, database, tmp_path
     ):
-        """import_backup should call db_service import methods."""
-        mock_db_service.export_users = AsyncMock(return_value=[{"id": "u1"}])
-        mock_db_service.export_servers = AsyncMock(return_value=[{"id": "s1"}])
-        mock_db_service.export_settings = AsyncMock(return_value={"k": "v"})
-        mock_db_service.import_users = AsyncMock()
-        mock_db_service.import_servers = AsyncMock()
-        mock_db_service.import_settings = AsyncMock()
+        """Restoring a snapshot should need explicit confirmation."""
+        backup_path = str(tmp_path / "backup.enc")
+        with patch("services.backup_service.logger"):
+            await snapshot_service.export_backup(backup_path, "password123")
+
+        with patch("services.backup_service.logger"):
+            result = await snapshot_service.import_backup(backup_path, "password123")
+
+        assert result["success"] is False
+        assert "overwrite" in result["error"]
 
+    @pytest.mark.asyncio
+    async def test_import_backup_wrong_password(self, snapshot_service, tmp_path):
+        """import_backup should fail with wrong password."""
         backup_path = str(tmp_path / "backup.enc")
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(backup_path, "password123")
-            await backup_service.import_backup(backup_path, "password123")
+            await snapshot_service.export_backup(backup_path, "password123")
+            result = await snapshot_service.import_backup(
+                backup_path, "wrongpassword", overwrite=True
+            )
 
-        mock_db_service.import_users.assert_called_once()
-        mock_db_service.import_servers.assert_called_once()
-        mock_db_service.import_settings.assert_called_once()
+        assert result["success"] is False
+        assert "Invalid password" in result["error"]
 
     @pytest.mark.asyncio
-    async def test_import_backup_with_overwrite(
+    async def test_import_backup_legacy_json(
         self, backup_service, mock_db_service, tmp_path
     ):
-        """import_backup should pass overwrite flag."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
+        """import_backup should still merge legacy JSON backups."""
         mock_db_service.import_users = AsyncMock()
         mock_db_service.import_servers = AsyncMock()
         mock_db_service.import_settings = AsyncMock()
+        backup_path = tmp_path / "backup.enc"
+        write_legacy_backup(backup_path, legacy_data(), "password123")
 
-        backup_path = str(tmp_path / "backup.enc")
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(backup_path, "password123")
-            await backup_service.import_backup(
-                backup_path, "password123", overwrite=True
+            result = await backup_service.import_backup(
+                str(backup_path), "password123", overwrite=True
             )
 
-        mock_db_service.import_users.assert_called_once_with([], overwrite=True)
-        mock_db_service.import_servers.assert_called_once_with([], overwrite=True)
-        mock_db_service.import_settings.assert_called_once_with({}, overwrite=True)
+        assert result["success"] is True
+        assert result["version"] == BACKUP_VERSION
+        assert result["users_imported"] == 1
+        assert result["servers_imported"] == 1
+        mock_db_service.import_users.assert_called_once_with(
+            [{"id": "u1", "username": "admin"}], overwrite=True
+        )
+        mock_db_service.import_servers.assert_called_once_with(
+            [{"id": "s1", "name": "Server1"}], overwrite=True
+        )
+        mock_db_service.import_settings.assert_called_once_with(
+            {"theme": "dark"}, overwrite=True
+        )
 
     @pytest.mark.asyncio
-    async def test_import_backup_wrong_password(
-        self, backup_service, mock_db_service, tmp_path
-    ):
-        """import_backup should fail with wrong password."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
+    async def test_import_backup_legacy_wrong_password(self, backup_service, tmp_path):
+        """Legacy backups should also reject a wrong password."""
+        backup_path = tmp_path / "backup.enc"
+        write_legacy_backup(backup_path, legacy_data(), "password123")
 
-        backup_path = str(tmp_path / "backup.enc")
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(backup_path, "password123")
-            result = await backup_service.import_backup(backup_path, "wrongpassword")
+            result = await backup_service.import_backup(str(backup_path), "wrong")
 
         assert result["success"] is False
         assert "Invalid password" in result["error"]
@@ -399,67 +441,42 @@ class TestImportBackup:
         assert "error" in result
 
     @pytest.mark.asyncio
-    async def test_import_backup_validation_failure(
-        self, backup_service, mock_db_service, tmp_path
-    ):
-        """import_backup should reject invalid backup data."""
-        # Create a backup with missing fields by mocking _collect_backup_data
-        backup_path = str(tmp_path / "backup.enc")
-
-        # Write corrupted backup (valid encryption but invalid data)
-        invalid_data = {"version": "1.0"}  # Missing required fields
-        encrypted = backup_service._encrypt_data(invalid_data, "password")
-        with open(backup_path, "wb") as f:
-            f.write(encrypted)
+    async def test_import_backup_validation_failure(self, backup_service, tmp_path):
+        """import_backup should reject invalid legacy backup data."""
+        backup_path = tmp_path / "backup.enc"
+        write_legacy_backup(backup_path, {"version": "1.0"}, "password")
 
         with patch("services.backup_service.logger"):
-            result = await backup_service.import_backup(backup_path, "password")
+            result = await backup_service.import_backup(str(backup_path), "password")
 
         assert result["success"] is False
         assert "Missing required fields" in result["error"]
 
     @pytest.mark.asyncio
     async def test_import_backup_newer_version(self, backup_service, tmp_path):
-        """import_backup should reject newer version backups."""
-        backup_path = str(tmp_path / "backup.enc")
-
-        # Create backup with newer version
-        data = {
-            "version": "99.0",
-            "timestamp": datetime.now(UTC).isoformat(),
-            "users": [],
-            "servers": [],
-            "settings": {},
-        }
-        encrypted = backup_service._encrypt_data(data, "password")
-        with open(backup_path, "wb") as f:
-            f.write(encrypted)
+        """import_backup should reject newer legacy version backups."""
+        backup_path = tmp_path / "backup.enc"
+        write_legacy_backup(backup_path, legacy_data(version="99.0"), "password")
 
         with patch("services.backup_service.logger"):
-            result = await backup_service.import_backup(backup_path, "password")
+            result = await backup_service.import_backup(str(backup_path), "password")
 
         assert result["success"] is False
         assert "newer" in result["error"]
 
     @pytest.mark.asyncio
     async def test_import_backup_logs_success(
-        self, backup_service, mock_db_service, tmp_path
+        self, snapshot_service, database, tmp_path
     ):
         """import_backup should log success."""
-        mock_db_service.export_users = AsyncMock(return_value=[])
-        mock_db_service.export_servers = AsyncMock(return_value=[])
-        mock_db_service.export_settings = AsyncMock(return_value={})
-        mock_db_service.import_users = AsyncMock()
-        mock_db_service.import_servers = AsyncMock()
-        mock_db_service.import_settings = AsyncMock()
-
         backup_path = str(tmp_path / "backup.enc")
         with patch("services.backup_service.logger"):
-            await backup_service.export_backup(backup_path, "password123")
+            await snapshot_service.export_backup(backup_path, "password123")
 
         with patch("services.backup_service.logger") as mock_logger:
-            await backup_service.import_backup(backup_path, "password123")
-            mock_logger.info.assert_called_once()
+            await snapshot_service.import_backup(
+                backup_path, "password123", overwrite=True
+            )
             call_kwargs = mock_logger.info.call_args.kwargs
             assert "path" in call_kwargs
             assert "timestamp" in call_kwargs
@@ -1,13 +1,16 @@
 """
 Unit tests for services/command_router.py - Internal execution methods
 
-Tests for _execute_via_agent, _execute_via_ssh, and _execute_via_ssh_with_progress.
+Tests for _execute_via_agent, _execute_via_agent_with_progress, _execute_via_ssh,
+and _execute_via_ssh_with_progress.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from services import command_router
 from services.command_router import (
     CommandRouter,
     ExecutionMethod,
@@ -422,3 +425,259 @@ class TestExecuteViaSSHWithProgress:
 
         assert result.success is False
         assert "Network error" in result.error
+
+
+def frame(stream_id, seq, stdout=(), stderr=(), **final):
+    """Build a system.exec.output frame; final fields mark it done."""
+    return {
+        "stream_id": stream_id,
+        "seq": seq,
+        "stdout": list(stdout),
+        "stderr": list(stderr),
+        "done": bool(final),
+        **final,
+    }
+
+
+@pytest.fixture
+def connected_agent(mock_agent_service, mock_agent_manager):
+    """Make the server's agent connected."""
+    agent = MagicMock(id="agent-123")
+    mock_agent_service.get_agent_by_server = AsyncMock(return_value=agent)
+    mock_agent_manager.is_connected.return_value = True
+    return agent
+
+
+def agent_pushes(router, frames, response=None):
+    """Make send_command start a stream that pushes frames (by seq) at once."""
+
+    async def send_command(agent_id, method, params, timeout):
+        if method != "system.exec_stream":
+            return {"cancelled": True}
+        stream_id = params["stream_id"]
+        for f in frames:
+            await router.handle_exec_output(agent_id, {**f, "stream_id": stream_id})
+        return response or {"started": True, "stream_id": stream_id}
+
+    return send_command
+
+
+class TestExecuteViaAgentWithProgress:
+    """Tests for _execute_via_agent_with_progress method."""
+
+    @pytest.mark.asyncio
+    async def test_streams_lines_to_callback(
+        self, router, mock_agent_manager, connected_agent
+    ):
+        """Should pass stdout lines to the callback in order."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(
+            router,
+            [
+                frame(None, 1, stdout=["one", "two"], stderr=["warn"]),
+                frame(None, 2, stdout=["three"], exit_code=0, reason="exit"),
+            ],
+        )
+        callback = AsyncMock()
+
+        result = await router._execute_via_agent_with_progress(
+            "server-123", "apt upgrade", callback, 600.0, False
+        )
+
+        assert result.success is True
+        assert result.method == ExecutionMethod.AGENT
+        assert result.exit_code == 0
+        assert result.output == "one\ntwo\nthree"
+        assert [c.args[0] for c in callback.call_args_list] == ["one", "two", "three"]
+        call = mock_agent_manager.send_command.call_args_list[0].kwargs
+        assert call["method"] == "system.exec_stream"
+        assert call["params"]["command"] == "apt upgrade"
+        assert call["params"]["timeout"] == 600
+        # Finished streams are not cancelled and are unregistered
+        assert mock_agent_manager.send_command.call_count == 1
+        assert router._exec_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_reports_stderr(
+        self, router, mock_agent_manager, connected_agent
+    ):
+        """Should fail with stderr and the agent's error on a non-zero exit."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(
+            router,
+            [
+                frame(
+                    None,
+                    1,
+                    stderr=["E: broken"],
+                    exit_code=-1,
+                    reason="timeout",
+                    error="Command timed out after 600s",
+                )
+            ],
+        )
+
+        result = await router._execute_via_agent_with_progress(
+            "server-123", "cmd", AsyncMock(), 600.0, False
+        )
+
+        assert result.success is False
+        assert result.exit_code == -1
+        assert result.error == "E: broken\nCommand timed out after 600s"
+
+    @pytest.mark.asyncio
+    async def test_blocked_command(self, router, mock_agent_manager, connected_agent):
+        """Should report commands the agent refused to start."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(
+            router,
+            [],
+            response={
+                "started": False,
+                "exit_code": -1,
+                "stderr": "Command not allowed: not in allowlist",
+                "security_blocked": True,
+            },
+        )
+
+        result = await router._execute_via_agent_with_progress(
+            "server-123", "rm -rf /", AsyncMock(), 60.0, True
+        )
+
+        assert result.success is False
+        assert "not allowed" in result.error
+        assert router._exec_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_callback_errors_do_not_abort(
+        self, router, mock_agent_manager, connected_agent
+    ):
+        """A failing callback should not stop the command."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(
+            router, [frame(None, 1, stdout=["a", "b"], exit_code=0)]
+        )
+        callback = AsyncMock(side_effect=ValueError("ui gone"))
+
+        with patch("services.command_router.logger"):
+            result = await router._execute_via_agent_with_progress(
+                "server-123", "cmd", callback, 60.0, False
+            )
+
+        assert result.success is True
+        assert callback.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_agent_command(
+        self, router, mock_agent_manager, connected_agent
+    ):
+        """Should cancel the command when no final frame arrives in time."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(
+            router, [frame(None, 1, stdout=["still going"])]
+        )
+
+        with (
+            patch.object(command_router, "EXEC_STREAM_GRACE_SECONDS", 0.05),
+            patch("services.command_router.logger"),
+        ):
+            result = await router._execute_via_agent_with_progress(
+                "server-123", "cmd", AsyncMock(), 0.05, False
+            )
+
+        assert result.success is False
+        assert "timed out" in result.error
+        cancel = mock_agent_manager.send_command.call_args_list[-1].kwargs
+        assert cancel["method"] == "system.exec_cancel"
+        assert router._exec_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_agent_disconnect_fails(
+        self, router, mock_agent_manager, connected_agent
+    ):
+        """Should fail when the agent disconnects mid-stream."""
+        mock_agent_manager.send_command.side_effect = agent_pushes(router, [])
+
+        async def disconnect():
+            await asyncio.sleep(0.01)
+            mock_agent_manager.is_connected.return_value = False
+
+        with (
+            patch.object(command_router, "EXEC_STREAM_CHECK_INTERVAL", 0.02),
+            patch("services.command_router.logger"),
+        ):
+            _, result = await asyncio.gather(
+                disconnect(),
+                router._execute_via_agent_with_progress(
+                    "server-123", "cmd", AsyncMock(), 60.0, False
+                ),
+            )
+
+        assert result.success is False
+        assert result.error == "Agent disconnected"
+
+    @pytest.mark.asyncio
+    async def test_old_agent_falls_back_to_ssh(
+        self,
+        router,
+        mock_agent_manager,
+        mock_server_service,
+        mock_ssh_service,
+        mock_server,
+        connected_agent,
+    ):
+        """Agents without system.exec_stream should fall back to SSH."""
+        mock_agent_manager.send_command.side_effect = RuntimeError(
+            "Agent error -32601: Method not found: system.exec_stream"
+        )
+        mock_server_service.get_server.return_value = mock_server
+        mock_server_service.get_credentials.return_value = {"password": "secret"}
+        mock_ssh_service.execute_command_with_progress.return_value = (True, "ok")
+
+        with patch("services.command_router.logger"):
+            result = await router._execute_via_agent_with_progress(
+                "server-123", "cmd", AsyncMock(), 60.0, False
+            )
+
+        assert result.method == ExecutionMethod.SSH
+        assert result.output == "ok"
+
+    @pytest.mark.asyncio
+    async def test_old_agent_forced_uses_buffered_exec(
+        self, router, mock_agent_manager, mock_ssh_service, connected_agent
+    ):
+        """Forced agent execution should fall back to system.exec."""
+        mock_agent_manager.send_command.side_effect = [
+            RuntimeError("Agent error -32601: Method not found: system.exec_stream"),
+            {"stdout": "line 1\nline 2", "stderr": "", "exit_code": 0},
+        ]
+        callback = AsyncMock()
+
+        with patch("services.command_router.logger"):
+            result = await router._execute_via_agent_with_progress(
+                "server-123", "cmd", callback, 60.0, True
+            )
+
+        assert result.method == ExecutionMethod.AGENT
+        assert result.success is True
+        assert [c.args[0] for c in callback.call_args_list] == ["line 1", "line 2"]
+        mock_ssh_service.execute_command_with_progress.assert_not_called()
+
+
+class TestHandleExecOutput:
+    """Tests for handle_exec_output notification handler."""
+
+    @pytest.mark.asyncio
+    async def test_drops_unknown_streams(self, router):
+        """Frames for unregistered streams should be ignored."""
+        with patch("services.command_router.logger"):
+            await router.handle_exec_output("agent-1", frame("nope", 1, stdout=["x"]))
+
+        assert router._exec_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_frames_are_keyed_by_agent(self, router):
+        """A stream id from another agent should not reach the queue."""
+        queue = asyncio.Queue()
+        router._exec_streams[("agent-1", "s-1")] = queue
+
+        with patch("services.command_router.logger"):
+            await router.handle_exec_output("agent-2", frame("s-1", 1))
+        await router.handle_exec_output("agent-1", frame("s-1", 1))
+
+        assert queue.qsize() == 1
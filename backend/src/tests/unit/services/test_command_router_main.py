@@ -205,9 +205,15 @@ class TestExecuteWithProgress:
 
     @pytest.mark.asyncio
     async def test_execute_with_progress_uses_ssh(
-        self, router, mock_server_service, mock_ssh_service, mock_server
+        self,
+        router,
+        mock_agent_service,
+        mock_server_service,
+        mock_ssh_service,
+        mock_server,
     ):
-        """execute_with_progress should always use SSH."""
+        """execute_with_progress should use SSH when agent not available."""
+        mock_agent_service.get_agent_by_server = AsyncMock(return_value=None)
         mock_server_service.get_server.return_value = mock_server
         mock_server_service.get_credentials.return_value = {"password": "secret"}
         mock_ssh_service.execute_command_with_progress.return_value = (True, "output")
@@ -220,9 +226,15 @@ class TestExecuteWithProgress:
 
     @pytest.mark.asyncio
     async def test_execute_with_progress_records_time(
-        self, router, mock_server_service, mock_ssh_service, mock_server
+        self,
+        router,
+        mock_agent_service,
+        mock_server_service,
+        mock_ssh_service,
+        mock_server,
     ):
         """execute_with_progress should record execution time."""
+        mock_agent_service.get_agent_by_server = AsyncMock(return_value=None)
         mock_server_service.get_server.return_value = mock_server
         mock_server_service.get_credentials.return_value = {"password": "secret"}
         mock_ssh_service.execute_command_with_progress.return_value = (True, "output")
@@ -234,3 +246,51 @@ class TestExecuteWithProgress:
 
         assert result.execution_time_ms is not None
         assert result.execution_time_ms >= 0
+
+    @pytest.mark.asyncio
+    async def test_execute_with_progress_via_agent(
+        self, router, mock_agent_service, mock_agent_manager, mock_ssh_service
+    ):
+        """execute_with_progress should stream through a connected agent."""
+        mock_agent_service.get_agent_by_server = AsyncMock(
+            return_value=MagicMock(id="agent-123")
+        )
+        mock_agent_manager.is_connected.return_value = True
+
+        async def send_command(agent_id, method, params, timeout):
+            await router.handle_exec_output(
+                agent_id,
+                {
+                    "stream_id": params["stream_id"],
+                    "seq": 1,
+                    "stdout": ["done"],
+                    "stderr": [],
+                    "done": True,
+                    "exit_code": 0,
+                },
+            )
+            return {"started": True, "stream_id": params["stream_id"]}
+
+        mock_agent_manager.send_command.side_effect = send_command
+
+        result = await router.execute_with_progress("server-123", "cmd", AsyncMock())
+
+        assert result.method == ExecutionMethod.AGENT
+        assert result.output == "done"
+        mock_ssh_service.execute_command_with_progress.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_with_progress_force_agent_unavailable(
+        self, router, mock_agent_service
+    ):
+        """execute_with_progress should fail when forced agent is unavailable."""
+        mock_agent_service.get_agent_by_server = AsyncMock(return_value=None)
+
+        with patch("services.command_router.logger"):
+            result = await router.execute_with_progress(
+                "server-123", "cmd", AsyncMock(), force_agent=True
+            )
+
+        assert result.success is False
+        assert result.method == ExecutionMethod.NONE
+        assert "not installed" in result.error
@@ -83,6 +83,7 @@ class TestCreateInstallation:
             "running",
             {"port": 8080},
             "2024-01-15T10:00:00Z",
+            None,
         )
         assert result == sample_installed_app
 
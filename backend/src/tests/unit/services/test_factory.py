@@ -27,6 +27,7 @@ class TestCreateServices:
             "CSRFService": patch("services.factory.CSRFService"),
             "SSHService": patch("services.factory.SSHService"),
             "MonitoringService": patch("services.factory.MonitoringService"),
+            "BackendTelemetry": patch("services.factory.BackendTelemetry"),
             "ServerService": patch("services.factory.ServerService"),
             "SettingsService": patch("services.factory.SettingsService"),
             "MarketplaceService": patch("services.factory.MarketplaceService"),
@@ -34,16 +35,19 @@ class TestCreateServices:
             "ActivityService": patch("services.factory.ActivityService"),
             "NotificationService": patch("services.factory.NotificationService"),
             "RetentionService": patch("services.factory.RetentionService"),
+            "RetentionEngine": patch("services.factory.RetentionEngine"),
             "MetricsService": patch("services.factory.MetricsService"),
             "DatabaseConnection": patch("services.factory.DatabaseConnection"),
             "AgentDatabaseService": patch("services.factory.AgentDatabaseService"),
             "AgentService": patch("services.factory.AgentService"),
             "AgentLifecycleManager": patch("services.factory.AgentLifecycleManager"),
             "AgentManager": patch("services.factory.AgentManager"),
+            "AgentRouter": patch("services.factory.AgentRouter"),
             "AgentWebSocketHandler": patch("services.factory.AgentWebSocketHandler"),
             "CommandRouter": patch("services.factory.CommandRouter"),
             "AgentExecutor": patch("services.factory.AgentExecutor"),
             "DeploymentService": patch("services.factory.DeploymentService"),
+            "DeploymentQueue": patch("services.factory.DeploymentQueue"),
             "DashboardService": patch("services.factory.DashboardService"),
             "LogService": patch("services.factory.LogService"),
             "logger": patch("services.factory.logger"),
@@ -82,11 +86,14 @@ class TestCreateServices:
             "activity_service",
             "notification_service",
             "retention_service",
+            "retention_engine",
             "deployment_service",
+            "deployment_queue",
             "metrics_service",
             "dashboard_service",
             "agent_service",
             "agent_manager",
+            "agent_router",
             "agent_lifecycle",
             "agent_websocket_handler",
             "command_router",
@@ -173,7 +180,73 @@ class TestCreateServices:
                 ssh_service=mock_ssh,
                 db_service=mock_db,
                 server_service=mock_server,
+                agent_manager=mocks["AgentManager"].return_value,
             )
+            agent_manager = mocks["AgentManager"].return_value
+            agent_manager.register_notification_handler.assert_any_call(
+                "docker.stats.batch",
+                mocks["MetricsService"].return_value.handle_stats_batch,
+            )
+
+        for mock in mock_services.values():
+            mock.stop()
+
+    def test_create_services_single_worker_has_no_router(self, mock_services, tmp_path):
+        """A single worker should not share connections with peers."""
+        mocks = {name: mock.start() for name, mock in mock_services.items()}
+
+        with patch.multiple("services.factory", **mocks):
+            result = create_services(tmp_path, {})
+            assert result["agent_router"] is None
+            mocks["AgentRouter"].assert_not_called()
+            assert mocks["AgentManager"].call_args.kwargs["router"] is None
+
+        for mock in mock_services.values():
+            mock.stop()
+
+    def test_create_services_wires_agent_router(self, mock_services, tmp_path):
+        """Several workers should share agents, log streams and caches."""
+        mocks = {name: mock.start() for name, mock in mock_services.items()}
+        mock_conn = MagicMock()
+        mocks["DatabaseConnection"].return_value = mock_conn
+
+        with patch.multiple("services.factory", **mocks):
+            result = create_services(tmp_path, {"workers": 4})
+            router = mocks["AgentRouter"].return_value
+            mocks["AgentRouter"].assert_called_once_with(mock_conn, tmp_path / "ipc")
+            assert result["agent_router"] is router
+            assert mocks["AgentManager"].call_args.kwargs["router"] is router
+            deployment = mocks["DeploymentService"].return_value
+            deployment.log_streams.share.assert_called_once_with(router)
+            shared = {c.args[0] for c in router.share_cache.call_args_list}
+            assert shared == {"app_search", "marketplace_stats"}
+
+        for mock in mock_services.values():
+            mock.stop()
+
+    def test_create_services_wires_deployment_queue(self, mock_services, tmp_path):
+        """create_services should build the queue with the configured limits."""
+        mocks = {name: mock.start() for name, mock in mock_services.items()}
+        mock_conn = MagicMock()
+        mocks["DatabaseConnection"].return_value = mock_conn
+        config = {
+            "deploy_concurrency": 4,
+            "deploy_concurrency_per_server": 1,
+            "prepull_concurrency": 3,
+        }
+
+        with patch.multiple("services.factory", **mocks):
+            result = create_services(tmp_path, config)
+            mocks["DeploymentQueue"].assert_called_once_with(
+                mock_conn,
+                mocks["DeploymentService"].return_value,
+                app_service=mocks["AppService"].return_value,
+                concurrency=4,
+                concurrency_per_server=1,
+                prepull_concurrency=3,
+                router=None,
+            )
+            assert result["deployment_queue"] is mocks["DeploymentQueue"].return_value
 
         for mock in mock_services.values():
             mock.stop()
@@ -191,7 +264,7 @@ class TestCreateServices:
             mock.stop()
 
     def test_create_services_wires_retention_service(self, mock_services, tmp_path):
-        """create_services should wire RetentionService with db, auth, and log."""
+        """create_services should wire RetentionService with db, auth, log and engine."""
         mocks = {name: mock.start() for name, mock in mock_services.items()}
         mock_db = MagicMock()
         mock_auth = MagicMock()
@@ -202,10 +275,12 @@ class TestCreateServices:
 
         with patch.multiple("services.factory", **mocks):
             create_services(tmp_path, {})
+            mocks["RetentionEngine"].assert_called_once_with(db_service=mock_db)
             mocks["RetentionService"].assert_called_once_with(
                 db_service=mock_db,
                 auth_service=mock_auth,
                 log_service=mock_log,
+                retention_engine=mocks["RetentionEngine"].return_value,
             )
 
         for mock in mock_services.values():
@@ -157,10 +157,9 @@ class TestGetCategories:
         mock_conn, mock_aiosqlite = mock_db_conn
         mock_cursor = AsyncMock()
         mock_cursor.fetchall.return_value = [
-            {"category": "utility"},
-            {"category": "utility"},
-            {"category": "media"},
-            {"category": "networking"},
+            {"category": "media", "count": 1},
+            {"category": "networking", "count": 1},
+            {"category": "utility", "count": 2},
         ]
         mock_aiosqlite.execute.return_value = mock_cursor
 
@@ -170,6 +169,8 @@ class TestGetCategories:
 
             result = await service.get_categories()
 
+            sql = mock_aiosqlite.execute.call_args[0][0]
+            assert "GROUP BY category" in sql
             assert len(result) == 3
             # Categories should be sorted alphabetically
             assert result[0]["id"] == "media"
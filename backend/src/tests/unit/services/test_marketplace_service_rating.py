@@ -79,16 +79,7 @@ class TestRateApp:
             cursor = AsyncMock()
             if idx == 0:
                 # Check existing rating -> found
-                cursor.fetchone.return_value = {"id": "rating-abc123"}
-            elif idx == 1:
-                # UPDATE existing rating
-                pass
-            elif idx == 2:
-                # SELECT all ratings for average
-                cursor.fetchall.return_value = [{"rating": 5}]
-            else:
-                # UPDATE app avg rating
-                pass
+                cursor.fetchone.return_value = {"id": "rating-abc123", "rating": 3}
             return cursor
 
         mock_aiosqlite.execute = mock_execute
@@ -151,31 +142,16 @@ class TestRateApp:
 
     @pytest.mark.asyncio
     async def test_rate_app_updates_app_average_rating(self, mock_db_conn):
-        """rate_app should update app's average rating."""
+        """rate_app should adjust the app's running sum instead of re-reading."""
         mock_conn, mock_aiosqlite = mock_db_conn
 
-        call_count = [0]
+        calls = []
 
-        async def mock_execute(*args, **kwargs):
-            idx = call_count[0]
-            call_count[0] += 1
+        async def mock_execute(sql, params=()):
+            calls.append((sql, params))
             cursor = AsyncMock()
-            if idx == 0:
-                # No existing rating
-                cursor.fetchone.return_value = None
-            elif idx == 1:
-                # INSERT
-                pass
-            elif idx == 2:
-                # SELECT all ratings: avg = 4.0
-                cursor.fetchall.return_value = [
-                    {"rating": 3},
-                    {"rating": 4},
-                    {"rating": 5},
-                ]
-            else:
-                # UPDATE app
-                pass
+            # Existing rating of 2 changes to 5
+            cursor.fetchone.return_value = {"id": "rating-abc123", "rating": 2}
             return cursor
 
         mock_aiosqlite.execute = mock_execute
@@ -187,8 +163,12 @@ class TestRateApp:
 
             await service.rate_app("test-app", "user-456", 5)
 
-            # Should have called execute at least 4 times
-            assert call_count[0] >= 4
+        assert len(calls) == 3
+        assert not any("AVG(" in sql for sql, _ in calls)
+        sql, params = calls[2]
+        assert "rating_sum = rating_sum + ?" in sql
+        assert params == (3, 3, "test-app")
+        mock_aiosqlite.commit.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_rate_app_logs_operation(self, mock_db_conn):
@@ -0,0 +1,151 @@
+"""
+Unit tests for services/marketplace_service.py - Aggregate statistics.
+
+Tests get_stats, the running rating aggregates kept by rate_app and
+invalidation of the statistics cache against a real SQLite database.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.database.base import DatabaseConnection
+from services.database.migrations import MigrationRunner
+from services.marketplace_service import MarketplaceService
+
+
+@pytest.fixture
+async def service(tmp_path):
+    """Marketplace service over a migrated database with two repos."""
+    connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await MigrationRunner(connection).migrate()
+    async with connection.get_connection() as conn:
+        await conn.executemany(
+            "INSERT INTO marketplace_repos (id, name, url, enabled, last_synced)"
+            " VALUES (?, ?, 'https://example.com', ?, ?)",
+            [("on", "On", 1, "2024-01-15T10:00:00"), ("off", "Off", 0, None)],
+        )
+        await conn.executemany(
+            "INSERT INTO marketplace_apps (id, name, description, version,"
+            " category, author, license, repo_id, docker_config, featured)"
+            " VALUES (?, ?, '', '1.0', ?, 'me', 'MIT', ?, '{}', ?)",
+            [
+                ("web", "Web", "networking", "on", 1),
+                ("db", "DB", "database", "on", 0),
+                ("media", "Media", "media", "on", 0),
+                ("hidden", "Hidden", "media", "off", 1),
+            ],
+        )
+        await conn.commit()
+
+    with patch("services.marketplace_service.logger"):
+        marketplace = MarketplaceService(connection=connection)
+        marketplace._initialized = True
+        yield marketplace
+
+
+async def app_ratings(service, app_id):
+    """Return the stored rating aggregates of an app."""
+    async with service._conn.get_connection() as conn:
+        cursor = await conn.execute(
+            "SELECT rating_sum, rating_count, avg_rating FROM marketplace_apps"
+            " WHERE id = ?",
+            (app_id,),
+        )
+        return tuple(await cursor.fetchone())
+
+
+class TestRatingAggregates:
+    """Tests for the rating aggregates maintained by rate_app."""
+
+    @pytest.mark.asyncio
+    async def test_new_and_changed_ratings(self, service):
+        """Rating sums, counts and averages should follow every rating."""
+        await service.rate_app("web", "u1", 5)
+        await service.rate_app("web", "u2", 2)
+        assert await app_ratings(service, "web") == (7, 2, 3.5)
+
+        await service.rate_app("web", "u2", 4)
+
+        assert await app_ratings(service, "web") == (9, 2, 4.5)
+        assert await service.get_user_rating("web", "u2") == 4
+
+
+class TestGetStats:
+    """Tests for get_stats."""
+
+    @pytest.mark.asyncio
+    async def test_aggregates_enabled_repos(self, service):
+        """App and rating figures should only cover enabled repositories."""
+        await service.rate_app("web", "u1", 5)
+        await service.rate_app("db", "u1", 4)
+        await service.rate_app("db", "u2", 4)
+        await service.rate_app("hidden", "u1", 1)
+
+        stats = await service.get_stats()
+
+        assert stats == {
+            "total_repos": 2,
+            "enabled_repos": 1,
+            "synced_repos": 1,
+            "total_apps": 3,
+            "featured_apps": 1,
+            "categories": [
+                {"id": "database", "name": "Database", "count": 1},
+                {"id": "media", "name": "Media", "count": 2},
+                {"id": "networking", "name": "Networking", "count": 1},
+            ],
+            "category_count": 3,
+            "total_ratings": 3,
+            "avg_rating": 4.33,
+            "rated_apps": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_empty_marketplace(self, tmp_path):
+        """An empty marketplace should report zeros."""
+        connection = DatabaseConnection(db_path=tmp_path / "empty.db")
+        await MigrationRunner(connection).migrate()
+        service = MarketplaceService(connection=connection)
+        service._initialized = True
+
+        stats = await service.get_stats()
+
+        assert stats["total_repos"] == 0
+        assert stats["total_apps"] == 0
+        assert stats["avg_rating"] == 0.0
+        assert stats["categories"] == []
+
+    @pytest.mark.asyncio
+    async def test_cached_until_changed(self, service):
+        """Stats should be cached and recomputed after a change."""
+        first = await service.get_stats()
+        first["total_apps"] = -1
+
+        with patch.object(service, "get_categories") as get_categories:
+            cached = await service.get_stats()
+        get_categories.assert_not_called()
+        assert cached["total_apps"] == 3
+
+        await service.rate_app("media", "u1", 3)
+        assert (await service.get_stats())["total_ratings"] == 1
+
+        await service.toggle_repo("on", False)
+        assert (await service.get_stats())["total_apps"] == 0
+
+        await service.remove_repo("off")
+        assert (await service.get_stats())["total_repos"] == 1
+
+    @pytest.mark.asyncio
+    async def test_changes_notify_listener(self, service):
+        """Changes should be announced; remote clears should not echo."""
+        listener = MagicMock()
+        service.set_invalidation_listener(listener)
+        await service.get_stats()
+
+        service.clear_stats_cache()
+        assert service._stats is None
+        listener.assert_not_called()
+
+        await service.rate_app("media", "u1", 4)
+        listener.assert_called_once_with()
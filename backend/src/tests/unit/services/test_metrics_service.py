@@ -4,11 +4,12 @@ Unit tests for services/metrics_service.py
 Tests metrics collection and management via SSH.
 """
 
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from services.metrics_service import PERIOD_MAP, MetricsService
+from services.metrics_service import DEFAULT_SERIES_POINTS, PERIOD_MAP, MetricsService
 
 
 @pytest.fixture
@@ -318,6 +319,62 @@ class TestCollectServerMetrics:
         assert result is None
 
 
+class TestHandleStatsBatch:
+    """Tests for handle_stats_batch method."""
+
+    @pytest.fixture
+    def agent_manager(self, metrics_service):
+        """Attach an agent manager knowing one agent."""
+        manager = MagicMock()
+        manager.get_connection_info.side_effect = lambda agent_id: (
+            {"server_id": "srv-123"} if agent_id == "agent-1" else None
+        )
+        metrics_service.agent_manager = manager
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_stores_batch(self, metrics_service, mock_db_service, agent_manager):
+        """Every container in the batch should be saved in one call."""
+        mock_db_service.save_container_metrics_batch = AsyncMock()
+        params = {
+            "timestamp": 1705312800.0,
+            "interval": 10,
+            "containers": [
+                {
+                    "id": "abc123",
+                    "name": "nginx",
+                    "cpu": 12.5,
+                    "mem": 256 * 1024 * 1024,
+                    "mem_limit": 512 * 1024 * 1024,
+                    "net_rx": 1024,
+                    "net_tx": 2048,
+                },
+                {"id": "def456", "name": "redis", "cpu": 0.5, "mem": 0},
+            ],
+        }
+
+        await metrics_service.handle_stats_batch("agent-1", params)
+
+        [metrics] = mock_db_service.save_container_metrics_batch.call_args[0]
+        assert [m.container_name for m in metrics] == ["nginx", "redis"]
+        assert metrics[0].server_id == "srv-123"
+        assert metrics[0].memory_usage_mb == 256
+        assert metrics[0].memory_limit_mb == 512
+        assert metrics[0].network_tx_bytes == 2048
+        assert metrics[0].timestamp == "2024-01-15T10:00:00+00:00"
+        assert metrics[1].memory_limit_mb == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_agent(self, metrics_service, mock_db_service, agent_manager):
+        """Batches from agents without a server should be dropped."""
+        mock_db_service.save_container_metrics_batch = AsyncMock()
+
+        with patch("services.metrics_service.logger"):
+            await metrics_service.handle_stats_batch("agent-2", {"containers": []})
+
+        mock_db_service.save_container_metrics_batch.assert_not_called()
+
+
 class TestCollectContainerMetrics:
     """Tests for collect_container_metrics method."""
 
@@ -462,3 +519,47 @@ class TestGetContainerMetrics:
             result = await metrics_service.get_container_metrics("srv-123")
 
         assert result == []
+
+
+class TestGetMetricSeries:
+    """Tests for the metric series methods."""
+
+    @pytest.mark.asyncio
+    async def test_server_series_uses_period(self, metrics_service, mock_db_service):
+        """The period should become since and options should pass through."""
+        series = MagicMock()
+        mock_db_service.get_server_metric_series = AsyncMock(return_value=series)
+
+        result = await metrics_service.get_server_metric_series(
+            "srv-123", "7d", fields=["cpu_percent"], max_points=50, delta=True
+        )
+
+        assert result is series
+        kwargs = mock_db_service.get_server_metric_series.call_args.kwargs
+        since = datetime.fromisoformat(kwargs["since"])
+        assert abs(datetime.now(UTC) - since - PERIOD_MAP["7d"]) < timedelta(minutes=1)
+        assert kwargs["fields"] == ["cpu_percent"]
+        assert kwargs["max_points"] == 50
+        assert kwargs["delta"] is True
+
+    @pytest.mark.asyncio
+    async def test_container_series_defaults(self, metrics_service, mock_db_service):
+        """Container series should default to the chart point count."""
+        mock_db_service.get_container_metric_series = AsyncMock()
+
+        await metrics_service.get_container_metric_series("srv-123", "nginx")
+
+        kwargs = mock_db_service.get_container_metric_series.call_args.kwargs
+        assert kwargs["container_name"] == "nginx"
+        assert kwargs["max_points"] == DEFAULT_SERIES_POINTS
+        assert kwargs["delta"] is False
+
+    @pytest.mark.asyncio
+    async def test_invalid_fields_propagate(self, metrics_service, mock_db_service):
+        """Invalid fields should surface to the caller."""
+        mock_db_service.get_server_metric_series = AsyncMock(
+            side_effect=ValueError("Unknown metric fields: x")
+        )
+
+        with pytest.raises(ValueError):
+            await metrics_service.get_server_metric_series("srv-123", fields=["x"])
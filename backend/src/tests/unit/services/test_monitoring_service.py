@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from services.backend_telemetry import BackendTelemetry
 from services.monitoring_service import MonitoringService
 
 
@@ -31,11 +32,13 @@ def monitoring_service(mock_log_service):
 class TestMonitoringServiceInit:
     """Tests for MonitoringService initialization."""
 
-    def test_init_creates_metrics_cache(self):
-        """MonitoringService should create metrics_cache."""
+    def test_init_creates_default_telemetry(self):
+        """MonitoringService should create a collector when none is given."""
         with patch("services.monitoring_service.logger"):
             service = MonitoringService()
-            assert isinstance(service.metrics_cache, dict)
+
+        assert isinstance(service.telemetry, BackendTelemetry)
+        assert service.telemetry.running is False
 
     def test_init_logs_message(self):
         """MonitoringService should log initialization."""
@@ -46,77 +49,18 @@ class TestMonitoringServiceInit:
             first_call = mock_logger.info.call_args_list[0]
             assert first_call[0][0] == "Monitoring service initialized"
 
-    def test_init_calls_initialize_sample_data(self):
-        """MonitoringService should call _initialize_sample_data."""
-        with (
-            patch("services.monitoring_service.logger"),
-            patch.object(MonitoringService, "_initialize_sample_data") as mock_init,
-        ):
-            MonitoringService()
-            mock_init.assert_called_once()
-
-
-class TestInitializeSampleData:
-    """Tests for _initialize_sample_data method."""
-
-    def test_initialize_sample_data_calls_initialize_metrics(self):
-        """_initialize_sample_data should call _initialize_metrics."""
-        with (
-            patch("services.monitoring_service.logger"),
-            patch.object(MonitoringService, "_initialize_metrics") as mock_init_metrics,
-        ):
-            service = MonitoringService.__new__(MonitoringService)
-            service.metrics_cache = {}
-            service._initialize_sample_data()
-            mock_init_metrics.assert_called_once()
-
-
-class TestInitializeMetrics:
-    """Tests for _initialize_metrics method."""
-
-    def test_initialize_metrics_sets_cpu(self, monitoring_service):
-        """_initialize_metrics should set CPU metrics."""
-        assert "cpu" in monitoring_service.metrics_cache
-        assert "usage" in monitoring_service.metrics_cache["cpu"]
-        assert "cores" in monitoring_service.metrics_cache["cpu"]
-        assert "temperature" in monitoring_service.metrics_cache["cpu"]
-
-    def test_initialize_metrics_sets_memory(self, monitoring_service):
-        """_initialize_metrics should set memory metrics."""
-        assert "memory" in monitoring_service.metrics_cache
-        assert "used" in monitoring_service.metrics_cache["memory"]
-        assert "total" in monitoring_service.metrics_cache["memory"]
-        assert "percentage" in monitoring_service.metrics_cache["memory"]
-
-    def test_initialize_metrics_sets_disk(self, monitoring_service):
-        """_initialize_metrics should set disk metrics."""
-        assert "disk" in monitoring_service.metrics_cache
-        assert "used" in monitoring_service.metrics_cache["disk"]
-        assert "total" in monitoring_service.metrics_cache["disk"]
-        assert "percentage" in monitoring_service.metrics_cache["disk"]
-
-    def test_initialize_metrics_sets_network(self, monitoring_service):
-        """_initialize_metrics should set network metrics."""
-        assert "network" in monitoring_service.metrics_cache
-        assert "inbound" in monitoring_service.metrics_cache["network"]
-        assert "outbound" in monitoring_service.metrics_cache["network"]
-        assert "connections" in monitoring_service.metrics_cache["network"]
-
-    def test_initialize_metrics_sets_uptime(self, monitoring_service):
-        """_initialize_metrics should set uptime."""
-        assert "uptime" in monitoring_service.metrics_cache
-        assert monitoring_service.metrics_cache["uptime"] == 86400
-
-    def test_initialize_metrics_sets_processes(self, monitoring_service):
-        """_initialize_metrics should set processes count."""
-        assert "processes" in monitoring_service.metrics_cache
-        assert monitoring_service.metrics_cache["processes"] == 127
-
-    def test_initialize_metrics_sets_timestamp(self, monitoring_service):
-        """_initialize_metrics should set timestamp."""
-        assert "timestamp" in monitoring_service.metrics_cache
-        # Timestamp should be ISO format
-        assert "T" in monitoring_service.metrics_cache["timestamp"]
+    @pytest.mark.asyncio
+    async def test_start_and_stop_collector(self):
+        """start and stop should run the telemetry collector."""
+        telemetry = MagicMock(start=AsyncMock(), stop=AsyncMock())
+        with patch("services.monitoring_service.logger"):
+            service = MonitoringService(telemetry=telemetry)
+
+        await service.start()
+        await service.stop()
+
+        telemetry.start.assert_awaited_once()
+        telemetry.stop.assert_awaited_once()
 
 
 class TestInitializeLogs:
@@ -170,36 +114,35 @@ class TestInitializeLogs:
 
 
 class TestGetCurrentMetrics:
-    """Tests for get_current_metrics method."""
+    """Tests for get_current_metrics and check_health."""
 
-    def test_get_current_metrics_returns_dict(self, monitoring_service):
-        """get_current_metrics should return dictionary."""
+    def test_get_current_metrics_reads_process(self, monitoring_service):
+        """get_current_metrics should report the running process."""
         result = monitoring_service.get_current_metrics()
-        assert isinstance(result, dict)
 
-    def test_get_current_metrics_updates_timestamp(self, monitoring_service):
-        """get_current_metrics should update timestamp."""
-        # Small delay to ensure different timestamp
-        import time
+        assert datetime.fromisoformat(result["timestamp"]).tzinfo == UTC
+        assert result["rss_bytes"] > 0
+        assert result["open_fds"] > 0
+        assert result["collector_running"] is False
+        assert "history" not in result
 
-        time.sleep(0.01)
+    def test_get_current_metrics_history(self, monitoring_service):
+        """History should be returned as one array per field."""
+        monitoring_service.telemetry.record()
+        monitoring_service.telemetry.record()
 
-        result = monitoring_service.get_current_metrics()
+        result = monitoring_service.get_current_metrics(include_history=True)
 
-        # Timestamp should be updated (or at least current)
-        assert "timestamp" in result
-        assert result["timestamp"] is not None
+        assert len(result["history"]["timestamp"]) == 2
+        assert len(result["history"]["rss_bytes"]) == 2
 
-    def test_get_current_metrics_includes_all_sections(self, monitoring_service):
-        """get_current_metrics should include all metric sections."""
-        result = monitoring_service.get_current_metrics()
+    @pytest.mark.asyncio
+    async def test_check_health_delegates(self, monitoring_service):
+        """check_health should return the collector's report."""
+        report = {"status": "healthy", "components": {}}
+        monitoring_service.telemetry.check_health = AsyncMock(return_value=report)
 
-        assert "cpu" in result
-        assert "memory" in result
-        assert "disk" in result
-        assert "network" in result
-        assert "uptime" in result
-        assert "processes" in result
+        assert await monitoring_service.check_health() is report
 
 
 class TestGetFilteredLogs:
@@ -11,6 +11,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 import services.password_blocklist_service as blocklist_module
+from lib.password_blocklist import build_blocklist
 from services.password_blocklist_service import (
     DEFAULT_CONTEXT_WORDS,
     SEQUENTIAL_PATTERNS,
@@ -58,14 +59,18 @@ class TestPasswordBlocklistServiceInit:
             service = PasswordBlocklistService(
                 blocklist_path=Path("/nonexistent/path.txt.gz")
             )
-            assert service._blocklist == set()
+            assert service.check_common_password("password") is False
+            assert service.blocklist_size == 0
 
-    def test_init_loads_blocklist(self, mock_blocklist_path):
-        """Init should load blocklist from file."""
+    def test_init_defers_blocklist_loading(self, mock_blocklist_path):
+        """Init should not open the blocklist until it is first used."""
         with patch("services.password_blocklist_service.logger"):
             service = PasswordBlocklistService(blocklist_path=mock_blocklist_path)
-            assert "password123" in service._blocklist
-            assert "qwerty" in service._blocklist
+            assert service._blocklist is None
+
+            assert service.check_common_password("password123") is True
+            assert service.check_common_password("qwerty") is True
+            assert service._blocklist is not None
 
     def test_init_loads_context_words(self, mock_context_path):
         """Init should load context words from file."""
@@ -103,8 +108,8 @@ class TestLoadBlocklist:
         """_load_blocklist should load passwords from gzipped file."""
         with patch("services.password_blocklist_service.logger"):
             service = PasswordBlocklistService(blocklist_path=mock_blocklist_path)
-            assert service._blocklist_loaded is True
-            assert len(service._blocklist) == 3
+            assert service.blocklist_loaded is True
+            assert service.blocklist_size == 3
 
     def test_load_blocklist_lowercases_passwords(self, tmp_path):
         """_load_blocklist should lowercase all passwords."""
@@ -114,8 +119,8 @@ class TestLoadBlocklist:
 
         with patch("services.password_blocklist_service.logger"):
             service = PasswordBlocklistService(blocklist_path=blocklist_file)
-            assert "password" in service._blocklist
-            assert "qwerty" in service._blocklist
+            assert service.check_common_password("password") is True
+            assert service.check_common_password("qwerty") is True
 
     def test_load_blocklist_file_not_found(self):
         """_load_blocklist should handle missing file."""
@@ -123,7 +128,7 @@ class TestLoadBlocklist:
             service = PasswordBlocklistService(
                 blocklist_path=Path("/nonexistent/file.txt.gz")
             )
-            assert service._blocklist_loaded is False
+            assert service.blocklist_loaded is False
             mock_logger.warning.assert_called()
 
     def test_load_blocklist_error(self, tmp_path):
@@ -132,9 +137,24 @@ class TestLoadBlocklist:
         bad_file.write_bytes(b"not valid gzip")
 
         with patch("services.password_blocklist_service.logger") as mock_logger:
-            PasswordBlocklistService(blocklist_path=bad_file)
+            service = PasswordBlocklistService(blocklist_path=bad_file)
+            assert service.check_common_password("password") is False
             mock_logger.error.assert_called()
 
+    def test_load_compiled_index(self, tmp_path):
+        """_load_blocklist should map an index built by build_blocklist."""
+        source = tmp_path / "passwords.txt"
+        source.write_text("Dragon\nmonkey\n")
+        index = tmp_path / "passwords.bin"
+        with open(index, "wb") as f:
+            build_blocklist([source], f)
+
+        with patch("services.password_blocklist_service.logger"):
+            service = PasswordBlocklistService(blocklist_path=index)
+            assert service.check_common_password("DRAGON") is True
+            assert service.check_common_password("dragon1") is False
+            assert service.blocklist_size == 2
+
 
 class TestLoadContextWords:
     """Tests for _load_context_words method."""
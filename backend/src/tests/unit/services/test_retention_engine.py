@@ -0,0 +1,298 @@
+"""
+Unit tests for services/retention_engine.py
+
+Tests policy cutoffs, chunked purges, scheduled runs across tables and
+incremental vacuum against a real SQLite database.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from models.metrics import ContainerMetrics
+from services import retention_engine
+from services.database.base import DatabaseConnection
+from services.database.metrics_service import MetricsDatabaseService
+from services.database.schema_init import SchemaInitializer
+from services.retention_engine import (
+    POLICIES_BY_TABLE,
+    RetentionEngine,
+    RetentionPolicy,
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+def iso(days_ago: float) -> str:
+    """Return an ISO timestamp the given number of days before now."""
+    return (datetime.now(UTC) - timedelta(days=days_ago)).isoformat()
+
+
+@pytest.fixture
+async def connection(tmp_path):
+    """Create a real database with all tables."""
+    conn = DatabaseConnection(db_path=tmp_path / "tomo.db")
+    await SchemaInitializer(conn).initialize_all_tables()
+    return conn
+
+
+async def insert_logs(connection, timestamps):
+    """Insert log entries with the given timestamps."""
+    async with connection.get_connection() as conn:
+        await conn.executemany(
+            "INSERT INTO log_entries (id, timestamp, level, source, message)"
+            " VALUES (?, ?, 'INFO', 'test', ?)",
+            [(f"log-{i}", ts, "x" * 500) for i, ts in enumerate(timestamps)],
+        )
+        await conn.commit()
+
+
+async def count(connection, table):
+    """Return the row count of a table."""
+    async with connection.get_connection() as conn:
+        cursor = await conn.execute(f"SELECT COUNT(*) FROM {table}")
+        return (await cursor.fetchone())[0]
+
+
+class TestCutoffFor:
+    """Tests for RetentionEngine.cutoff_for."""
+
+    def test_uses_setting_days(self):
+        """Setting-based policies should subtract the configured days."""
+        policy = POLICIES_BY_TABLE["server_metric_samples"]
+
+        cutoff = RetentionEngine.cutoff_for(policy, {"metrics_retention": 30}, NOW)
+
+        assert cutoff == (NOW - timedelta(days=30)).isoformat()
+
+    def test_fixed_age_ignores_settings(self):
+        """Housekeeping tables should use their fixed age."""
+        policy = POLICIES_BY_TABLE["rate_limit_events"]
+
+        assert (
+            RetentionEngine.cutoff_for(policy, {}, NOW)
+            == (NOW - timedelta(hours=1)).isoformat()
+        )
+
+    def test_non_positive_setting_keeps_everything(self):
+        """A zero or missing retention should skip the table."""
+        policy = POLICIES_BY_TABLE["notifications"]
+
+        assert RetentionEngine.cutoff_for(policy, {}, NOW) is None
+        assert (
+            RetentionEngine.cutoff_for(policy, {"notification_retention": 0}, NOW)
+            is None
+        )
+
+
+class TestPurge:
+    """Tests for RetentionEngine.purge."""
+
+    @pytest.mark.asyncio
+    async def test_deletes_only_rows_before_cutoff(self, connection):
+        """purge should delete old rows in several batches and keep new ones."""
+        await insert_logs(connection, [iso(60)] * 450 + [iso(1)] * 50)
+        engine = RetentionEngine(connection)
+
+        result = await engine.purge(
+            POLICIES_BY_TABLE["log_entries"], iso(30), batch_size=100
+        )
+
+        assert result.rows_deleted == 450
+        assert result.batches >= 3
+        assert result.complete is True
+        assert result.error_message is None
+        assert await count(connection, "log_entries") == 50
+
+    @pytest.mark.asyncio
+    async def test_stops_at_time_budget(self, connection):
+        """purge should leave the rest for later once the budget is spent."""
+        await insert_logs(connection, [iso(60)] * 300)
+        engine = RetentionEngine(connection)
+
+        result = await engine.purge(
+            POLICIES_BY_TABLE["log_entries"], iso(30), batch_size=100, time_budget=0
+        )
+
+        assert result.rows_deleted == 100
+        assert result.batches == 1
+        assert result.complete is False
+        assert await count(connection, "log_entries") == 200
+
+    @pytest.mark.asyncio
+    async def test_yields_to_other_writers_between_batches(self, connection):
+        """Another connection should be able to write between batches."""
+        await insert_logs(connection, [iso(60)] * 400)
+        engine = RetentionEngine(connection)
+        written = []
+
+        async def writer():
+            async with connection.get_connection() as conn:
+                await conn.execute(
+                    "INSERT INTO activity_logs (id, activity_type, message, timestamp)"
+                    " VALUES ('a-1', 'test', 'written during purge', ?)",
+                    (iso(0),),
+                )
+                await conn.commit()
+            written.append(True)
+
+        with patch.object(retention_engine, "MAX_BATCH_SIZE", 100):
+            purge = asyncio.create_task(
+                engine.purge(POLICIES_BY_TABLE["log_entries"], iso(30), batch_size=100)
+            )
+            await asyncio.sleep(0)
+            await asyncio.wait_for(writer(), timeout=5)
+            result = await purge
+
+        assert written == [True]
+        assert result.rows_deleted == 400
+
+    @pytest.mark.asyncio
+    async def test_purges_epoch_ms_samples(self, connection):
+        """Composite-key sample tables should compare epoch-ms timestamps."""
+        metrics = MetricsDatabaseService(connection)
+        for days_ago in (60, 45, 1):
+            for name in ("web", "db"):
+                await metrics.save_container_metrics(
+                    ContainerMetrics(
+                        id="unused",
+                        server_id="srv-1",
+                        container_id=f"{name}-id",
+                        container_name=name,
+                        cpu_percent=1.0,
+                        memory_usage_mb=10,
+                        memory_limit_mb=100,
+                        status="running",
+                        timestamp=iso(days_ago),
+                    )
+                )
+        engine = RetentionEngine(connection)
+
+        result = await engine.purge(
+            POLICIES_BY_TABLE["container_metric_samples"], iso(30), batch_size=1
+        )
+
+        assert result.rows_deleted == 4
+        assert result.complete is True
+        assert await count(connection, "container_metric_samples") == 2
+
+    @pytest.mark.asyncio
+    async def test_reports_errors(self, connection):
+        """purge should report a failing table instead of raising."""
+        engine = RetentionEngine(connection)
+        policy = RetentionPolicy("missing_table", "id", "timestamp", setting="x")
+
+        result = await engine.purge(policy, iso(30))
+
+        assert result.rows_deleted == 0
+        assert result.complete is False
+        assert "missing_table" in result.error_message
+
+    def test_batch_size_adapts_to_lock_time(self):
+        """Slow batches should shrink and fast batches grow within bounds."""
+        target = retention_engine.BATCH_TARGET_SECONDS
+
+        assert RetentionEngine._next_batch_size(1000, target * 2) == 500
+        assert RetentionEngine._next_batch_size(1000, target / 10) == 2000
+        assert RetentionEngine._next_batch_size(1000, target / 2) == 1000
+        assert (
+            RetentionEngine._next_batch_size(
+                retention_engine.MIN_BATCH_SIZE, target * 2
+            )
+            == retention_engine.MIN_BATCH_SIZE
+        )
+
+
+class TestRunOnce:
+    """Tests for RetentionEngine.run_once."""
+
+    @pytest.mark.asyncio
+    async def test_applies_settings_to_every_table(self, connection):
+        """run_once should purge each table by its own retention setting."""
+        async with connection.get_connection() as conn:
+            await conn.execute(
+                "UPDATE retention_settings SET access_log_retention = 10,"
+                " metrics_retention = 20 WHERE id = 'system'"
+            )
+            await conn.executemany(
+                "INSERT INTO rate_limit_events (category, key, created_at)"
+                " VALUES ('login', 'k', ?)",
+                [(iso(1),), (iso(0),)],
+            )
+            await conn.executemany(
+                "INSERT INTO csrf_tokens (token_hash, user_id, session_id, expires_at)"
+                " VALUES (?, 'u', 's', ?)",
+                [("expired", iso(1)), ("valid", iso(-1))],
+            )
+            await conn.commit()
+        await insert_logs(connection, [iso(15), iso(5)])
+
+        engine = RetentionEngine(connection)
+        result = await engine.run_once()
+
+        by_table = {table.table: table for table in result.tables}
+        assert set(by_table) == {
+            policy.table for policy in retention_engine.RETENTION_POLICIES
+        }
+        assert by_table["log_entries"].rows_deleted == 1
+        assert by_table["rate_limit_events"].rows_deleted == 1
+        assert by_table["csrf_tokens"].rows_deleted == 1
+        assert result.rows_deleted == 3
+        assert engine.last_run is result
+        assert await count(connection, "log_entries") == 1
+
+    @pytest.mark.asyncio
+    async def test_switches_to_incremental_vacuum_and_reclaims(self, connection):
+        """Deleted pages should be returned to the filesystem."""
+        await insert_logs(connection, [iso(400)] * 2000)
+        engine = RetentionEngine(connection)
+
+        # First run converts the database, the next one reclaims incrementally
+        await engine.run_once()
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute("PRAGMA auto_vacuum")
+            assert (await cursor.fetchone())[
+                0
+            ] == retention_engine.AUTO_VACUUM_INCREMENTAL
+
+        await insert_logs(connection, [iso(400)] * 2000)
+        result = await engine.run_once()
+
+        assert result.pages_reclaimed > 0
+        assert result.space_freed_mb > 0
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute("PRAGMA freelist_count")
+            assert (await cursor.fetchone())[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_large_database_is_not_converted(self, connection):
+        """Databases above the size limit should keep their vacuum mode."""
+        engine = RetentionEngine(connection)
+
+        with patch.object(retention_engine, "AUTO_VACUUM_CONVERT_MAX_BYTES", 0):
+            result = await engine.run_once()
+
+        assert result.pages_reclaimed == 0
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute("PRAGMA auto_vacuum")
+            assert (await cursor.fetchone())[0] == retention_engine.AUTO_VACUUM_NONE
+
+
+class TestScheduler:
+    """Tests for start and stop."""
+
+    @pytest.mark.asyncio
+    async def test_start_runs_periodically_until_stopped(self, connection):
+        """The scheduler should run after the delay and stop cleanly."""
+        engine = RetentionEngine(connection)
+        engine.run_once = AsyncMock(side_effect=[Exception("boom"), None, None])
+
+        await engine.start(interval=0.01, initial_delay=0)
+        await engine.start(interval=0.01, initial_delay=0)
+        await asyncio.sleep(0.05)
+        await engine.stop()
+
+        assert engine.run_once.await_count >= 2
+        assert engine._task is None
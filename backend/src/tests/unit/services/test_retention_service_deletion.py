@@ -2,7 +2,7 @@
 Unit tests for services/retention_service.py - Deletion operations.
 
 Tests preview_records_for_deletion, preview_log_deletion, perform_secure_deletion,
-and delete_logs_batch methods.
+delete_logs_batch and purge_table methods.
 """
 
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -12,7 +12,11 @@ import pytest
 from models.retention import (
     CleanupPreview,
     RetentionType,
+    TableRetentionResult,
 )
+from services.database.base import DatabaseConnection
+from services.database.schema_init import SchemaInitializer
+from services.retention_engine import POLICIES_BY_TABLE
 from services.retention_service import RetentionService
 
 
@@ -376,15 +380,27 @@ class TestPerformSecureDeletion:
         assert space == 1.0
 
     @pytest.mark.asyncio
-    async def test_perform_secure_deletion_unsupported_type(self, retention_service):
-        """_perform_secure_deletion should return zero for unsupported types."""
-        with patch("services.retention_service.logger"):
+    async def test_perform_secure_deletion_metrics(self, retention_service):
+        """_perform_secure_deletion should purge both metrics tables."""
+        with (
+            patch("services.retention_service.logger"),
+            patch.object(
+                retention_service,
+                "_purge_table",
+                new_callable=AsyncMock,
+                side_effect=[40, 60],
+            ) as mock_purge,
+        ):
             deleted, space = await retention_service._perform_secure_deletion(
                 RetentionType.METRICS, "2024-01-15T00:00:00+00:00", 1000
             )
 
-        assert deleted == 0
+        assert deleted == 100
         assert space == 0.0
+        assert [c.args[0] for c in mock_purge.call_args_list] == [
+            "server_metric_samples",
+            "container_metric_samples",
+        ]
 
     @pytest.mark.asyncio
     async def test_perform_secure_deletion_handles_exception(self, retention_service):
@@ -408,149 +424,71 @@ class TestPerformSecureDeletion:
 
 
 class TestDeleteLogsBatch:
-    """Tests for _delete_logs_batch method."""
+    """Tests for _delete_logs_batch and _purge_table methods."""
 
     @pytest.mark.asyncio
-    async def test_delete_logs_batch_single_batch(
-        self, retention_service, mock_connection
-    ):
-        """_delete_logs_batch should delete in single batch."""
-        mock_cursor = AsyncMock()
-        mock_cursor.rowcount = 500  # Less than batch size
-        mock_connection.execute = AsyncMock(return_value=mock_cursor)
-
-        with patch("services.retention_service.logger"):
-            deleted, space = await retention_service._delete_logs_batch(
-                "2024-01-15T00:00:00+00:00", 1000
+    async def test_delete_logs_batch_purges_log_entries(self, retention_service):
+        """_delete_logs_batch should purge log_entries through the engine."""
+        retention_service.retention_engine.purge = AsyncMock(
+            return_value=TableRetentionResult(
+                table="log_entries",
+                cutoff="2024-01-15T00:00:00+00:00",
+                rows_deleted=1234,
             )
-
-        assert deleted == 500
-        assert space == 0.5  # 500 * 0.001
-        mock_connection.commit.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_delete_logs_batch_multiple_batches(
-        self, retention_service, mock_connection
-    ):
-        """_delete_logs_batch should delete in multiple batches."""
-        mock_cursor = AsyncMock()
-        # First batch full, second batch partial
-        mock_cursor.rowcount = 1000
-
-        call_count = 0
-
-        async def execute_side_effect(*args, **kwargs):
-            nonlocal call_count
-            # Skip the BEGIN IMMEDIATE call
-            if "BEGIN" in str(args[0]) if args else False:
-                return mock_cursor
-            call_count += 1
-            if call_count <= 2:
-                mock_cursor.rowcount = 1000
-            else:
-                mock_cursor.rowcount = 500  # Last batch
-            return mock_cursor
-
-        mock_connection.execute = AsyncMock(side_effect=execute_side_effect)
+        )
 
         with patch("services.retention_service.logger"):
             deleted, space = await retention_service._delete_logs_batch(
-                "2024-01-15T00:00:00+00:00", 1000
+                "2024-01-15T00:00:00+00:00", 2000
             )
 
-        assert deleted == 2500  # 1000 + 1000 + 500
-        mock_connection.commit.assert_called_once()
+        assert deleted == 1234
+        assert space == 1.23  # Rounded to 2 decimal places
+        call = retention_service.retention_engine.purge.call_args
+        assert call.args[0] is POLICIES_BY_TABLE["log_entries"]
+        assert call.kwargs["batch_size"] == 2000
+        assert call.kwargs["time_budget"] == float("inf")
 
     @pytest.mark.asyncio
-    async def test_delete_logs_batch_no_records(
-        self, retention_service, mock_connection
-    ):
-        """_delete_logs_batch should handle no records to delete."""
-        mock_cursor = AsyncMock()
-        mock_cursor.rowcount = 0
-        mock_connection.execute = AsyncMock(return_value=mock_cursor)
-
-        with patch("services.retention_service.logger"):
-            deleted, space = await retention_service._delete_logs_batch(
-                "2024-01-15T00:00:00+00:00", 1000
+    async def test_purge_table_raises_on_engine_error(self, retention_service):
+        """_purge_table should surface a failed purge as an exception."""
+        retention_service.retention_engine.purge = AsyncMock(
+            return_value=TableRetentionResult(
+                table="sessions",
+                cutoff="2024-01-15T00:00:00+00:00",
+                rows_deleted=10,
+                error_message="database is locked",
             )
+        )
 
-        assert deleted == 0
-        assert space == 0.0
-        mock_connection.commit.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_delete_logs_batch_rollback_on_error(self, mock_auth_service):
-        """_delete_logs_batch should rollback on error."""
-        # Create a fresh service with error-raising connection
-        mock_db_svc = MagicMock()
-        mock_error_conn = AsyncMock()
-        call_count = 0
-
-        async def execute_side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:  # BEGIN IMMEDIATE
-                return AsyncMock()
-            raise Exception("Delete failed")
-
-        mock_error_conn.execute = AsyncMock(side_effect=execute_side_effect)
-        mock_error_conn.rollback = AsyncMock()
-        mock_error_conn.commit = AsyncMock()
-
-        mock_context_manager = AsyncMock()
-        mock_context_manager.__aenter__.return_value = mock_error_conn
-        mock_context_manager.__aexit__.return_value = None
-        mock_db_svc.get_connection = MagicMock(return_value=mock_context_manager)
-
-        with (
-            patch("services.retention_service.logger") as mock_logger,
-            pytest.raises(Exception) as exc_info,
-        ):
-            service = RetentionService(mock_db_svc, mock_auth_service)
-            await service._delete_logs_batch("2024-01-15T00:00:00+00:00", 1000)
-
-        assert "Delete failed" in str(exc_info.value)
-        mock_error_conn.rollback.assert_called_once()
-        mock_logger.error.assert_called()
-
-    @pytest.mark.asyncio
-    async def test_delete_logs_batch_connection_error(self, mock_auth_service):
-        """_delete_logs_batch should handle connection errors."""
-        # Create a fresh service with error-raising connection
-        mock_db_svc = MagicMock()
-        mock_error_conn = AsyncMock()
-        mock_error_conn.execute = AsyncMock(side_effect=Exception("Connection lost"))
-        mock_error_conn.rollback = AsyncMock()
-
-        mock_context_manager = AsyncMock()
-        mock_context_manager.__aenter__.return_value = mock_error_conn
-        mock_context_manager.__aexit__.return_value = None
-        mock_db_svc.get_connection = MagicMock(return_value=mock_context_manager)
-
-        with (
-            patch("services.retention_service.logger") as mock_logger,
-            pytest.raises(Exception) as exc_info,
-        ):
-            service = RetentionService(mock_db_svc, mock_auth_service)
-            await service._delete_logs_batch("2024-01-15T00:00:00+00:00", 1000)
-
-        assert "Connection lost" in str(exc_info.value)
-        mock_logger.error.assert_called()
+        with pytest.raises(RuntimeError, match="database is locked"):
+            await retention_service._purge_table(
+                "sessions", "2024-01-15T00:00:00+00:00", 1000
+            )
 
     @pytest.mark.asyncio
-    async def test_delete_logs_batch_space_calculation(
-        self, retention_service, mock_connection
-    ):
-        """_delete_logs_batch should calculate space freed correctly."""
-        mock_cursor = AsyncMock()
-        mock_cursor.rowcount = 1234
-        mock_connection.execute = AsyncMock(return_value=mock_cursor)
+    async def test_delete_logs_batch_real_database(self, tmp_path):
+        """_delete_logs_batch should delete only old rows across batches."""
+        connection = DatabaseConnection(db_path=tmp_path / "tomo.db")
+        await SchemaInitializer(connection).initialize_log_entries_table()
+        rows = [(f"old-{i}", "2023-06-01T00:00:00+00:00") for i in range(250)]
+        rows += [(f"new-{i}", "2024-06-01T00:00:00+00:00") for i in range(50)]
+        async with connection.get_connection() as conn:
+            await conn.executemany(
+                "INSERT INTO log_entries (id, timestamp, level, source, message)"
+                " VALUES (?, ?, 'INFO', 'test', 'message')",
+                rows,
+            )
+            await conn.commit()
 
         with patch("services.retention_service.logger"):
-            deleted, space = await retention_service._delete_logs_batch(
-                "2024-01-15T00:00:00+00:00", 2000
+            service = RetentionService(connection, MagicMock())
+            deleted, _ = await service._delete_logs_batch(
+                "2024-01-15T00:00:00+00:00", 100
             )
 
-        assert deleted == 1234
-        assert space == 1.23  # Rounded to 2 decimal places
+        async with connection.get_connection() as conn:
+            cursor = await conn.execute("SELECT id FROM log_entries")
+            remaining = [row[0] for row in await cursor.fetchall()]
+        assert deleted == 250
+        assert sorted(remaining) == sorted(f"new-{i}" for i in range(50))
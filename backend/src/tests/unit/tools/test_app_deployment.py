@@ -413,7 +413,7 @@ class TestGetContainerLogs:
 
         assert result["success"] is True
         mock_services["deployment_service"].get_container_logs.assert_called_with(
-            server_id="server-123", container_name="nginx", tail=100
+            server_id="server-123", container_name="nginx", tail=100, since=None
         )
 
     @pytest.mark.asyncio
@@ -432,6 +432,87 @@ class TestGetContainerLogs:
         assert result["error"] == "LOGS_ERROR"
 
 
+class TestLogStreams:
+    """Tests for start/read/stop_log_stream methods."""
+
+    @pytest.fixture
+    def mock_services(self):
+        """Create mock services."""
+        return {
+            "app_service": MagicMock(),
+            "marketplace_service": MagicMock(),
+            "deployment_service": MagicMock(),
+        }
+
+    @pytest.fixture
+    def app_tools(self, mock_services):
+        """Create AppTools instance."""
+        with patch("tools.app.tools.logger"):
+            return AppTools(
+                mock_services["app_service"],
+                mock_services["marketplace_service"],
+                mock_services["deployment_service"],
+            )
+
+    @pytest.mark.asyncio
+    async def test_start_log_stream(self, app_tools, mock_services):
+        """Test starting a log stream."""
+        mock_services["deployment_service"].start_log_stream = AsyncMock(
+            return_value={"stream_id": "agent-1:logs-1", "container": "nginx"}
+        )
+
+        result = await app_tools.start_log_stream("server-123", "nginx")
+
+        assert result["success"] is True
+        assert result["data"]["stream_id"] == "agent-1:logs-1"
+
+    @pytest.mark.asyncio
+    async def test_start_log_stream_error(self, app_tools, mock_services):
+        """Test start_log_stream surfaces agent errors."""
+        mock_services["deployment_service"].start_log_stream = AsyncMock(
+            return_value={"error": "Agent not connected"}
+        )
+
+        result = await app_tools.start_log_stream("server-123", "nginx")
+
+        assert result["success"] is False
+        assert result["error"] == "LOG_STREAM_ERROR"
+
+    @pytest.mark.asyncio
+    async def test_read_log_stream(self, app_tools, mock_services):
+        """Test reading a log stream."""
+        mock_services["deployment_service"].read_log_stream = AsyncMock(
+            return_value={"lines": [{"offset": 0, "message": "hi"}], "next": 1}
+        )
+
+        result = await app_tools.read_log_stream("agent-1:logs-1", after=0)
+
+        assert result["success"] is True
+        assert "1 log lines" in result["message"]
+
+    @pytest.mark.asyncio
+    async def test_read_unknown_log_stream(self, app_tools, mock_services):
+        """Test reading an unknown log stream."""
+        mock_services["deployment_service"].read_log_stream = AsyncMock(
+            return_value=None
+        )
+
+        result = await app_tools.read_log_stream("missing")
+
+        assert result["error"] == "LOG_STREAM_NOT_FOUND"
+
+    @pytest.mark.asyncio
+    async def test_stop_log_stream(self, app_tools, mock_services):
+        """Test stopping a log stream."""
+        mock_services["deployment_service"].stop_log_stream = AsyncMock(
+            return_value=True
+        )
+
+        result = await app_tools.stop_log_stream("agent-1:logs-1")
+
+        assert result["success"] is True
+
+
 class TestCleanupFailedDeployment:
     """Tests for cleanup_failed_deployment method."""
 
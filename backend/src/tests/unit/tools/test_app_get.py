@@ -173,6 +173,49 @@ class TestGetApp:
         assert result["success"] is True
         assert result["data"]["total"] == 2
 
+    @pytest.mark.asyncio
+    async def test_get_installations_filtered_and_paginated(
+        self, app_tools, mock_services
+    ):
+        """Filters and pagination should reach the query; total counts all matches."""
+        deployment_service = mock_services["deployment_service"]
+        deployment_service.get_all_installations_with_details = AsyncMock(
+            return_value=[{"app_id": "nginx", "server_id": "server-1"}]
+        )
+        deployment_service.count_installations = AsyncMock(return_value=7)
+
+        result = await app_tools.get_app(
+            server_id="server-1",
+            filters={"status": "running", "search": "web"},
+            installed=True,
+            limit=1,
+            offset=2,
+        )
+
+        assert result["success"] is True
+        assert result["data"]["total"] == 7
+        assert len(result["data"]["installations"]) == 1
+        deployment_service.get_all_installations_with_details.assert_awaited_once_with(
+            server_id="server-1", status="running", search="web", limit=1, offset=2
+        )
+        deployment_service.count_installations.assert_awaited_once_with(
+            server_id="server-1", status="running", search="web"
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_all_installations_skips_count(self, app_tools, mock_services):
+        """An unpaginated listing should not run a separate count."""
+        deployment_service = mock_services["deployment_service"]
+        deployment_service.get_all_installations_with_details = AsyncMock(
+            return_value=[{"app_id": "nginx"}]
+        )
+        deployment_service.count_installations = AsyncMock()
+
+        result = await app_tools.get_app()
+
+        assert result["data"]["total"] == 1
+        deployment_service.count_installations.assert_not_awaited()
+
     @pytest.mark.asyncio
     async def test_get_app_from_marketplace_success(self, app_tools, mock_services):
         """Test getting single app from marketplace."""
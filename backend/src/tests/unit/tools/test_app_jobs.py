@@ -0,0 +1,211 @@
+"""
+App Tools Unit Tests - Deployment Job Queue
+
+Tests for queue_deployments, get_deployment_jobs, cancel_deployment_job,
+prepull_apps and get_server_images.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.deployment.jobs import DeploymentJob
+from tools.app.tools import AppTools
+
+
+def make_job(**overrides):
+    """Create a deployment job."""
+    values = {
+        "id": "job-1",
+        "kind": "install",
+        "server_id": "s1",
+        "app_id": "web",
+        "params": {},
+        "priority": 0,
+        "status": "queued",
+        "attempts": 0,
+        "cancel_requested": False,
+        "installation_id": None,
+        "error": None,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "started_at": None,
+        "finished_at": None,
+    }
+    return DeploymentJob(**{**values, **overrides})
+
+
+@pytest.fixture
+def queue():
+    """Mock deployment queue."""
+    return MagicMock()
+
+
+@pytest.fixture
+def deployment_service():
+    """Mock deployment service."""
+    return MagicMock()
+
+
+@pytest.fixture
+def app_tools(queue, deployment_service):
+    """AppTools with a deployment queue."""
+    with patch("tools.app.tools.logger"):
+        return AppTools(
+            MagicMock(), MagicMock(), deployment_service, deployment_queue=queue
+        )
+
+
+@pytest.fixture(autouse=True)
+def mock_log_event():
+    """Silence tool log events."""
+    with patch("tools.app.deployment_tools.log_event", new_callable=AsyncMock):
+        yield
+
+
+class TestQueueDeployments:
+    """Tests for queue_deployments."""
+
+    @pytest.mark.asyncio
+    async def test_queues_installs(self, app_tools, queue):
+        """Installs should be queued with their configuration."""
+        queue.enqueue_many = AsyncMock(return_value=[make_job(), make_job(id="j2")])
+
+        result = await app_tools.queue_deployments(
+            ["s1", "s2"], ["web"], config={"port": 80}, priority=3
+        )
+
+        assert result["success"] is True
+        assert result["data"]["total"] == 2
+        queue.enqueue_many.assert_awaited_once_with(
+            "install", ["s1", "s2"], ["web"], {"config": {"port": 80}}, 3
+        )
+
+    @pytest.mark.asyncio
+    async def test_queues_removals(self, app_tools, queue):
+        """Removals should carry the remove_data option."""
+        queue.enqueue_many = AsyncMock(return_value=[make_job(kind="uninstall")])
+
+        await app_tools.queue_deployments(
+            ["s1"], ["web"], action="uninstall", remove_data=True
+        )
+
+        queue.enqueue_many.assert_awaited_once_with(
+            "uninstall", ["s1"], ["web"], {"remove_data": True}, 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_requests(self, app_tools):
+        """Unknown actions, prepulls and empty targets should be rejected."""
+        bad_action = await app_tools.queue_deployments(["s1"], ["web"], "upgrade")
+        prepull = await app_tools.queue_deployments(["s1"], ["web"], "prepull")
+        no_targets = await app_tools.queue_deployments([], ["web"])
+
+        assert bad_action["error"] == "INVALID_ACTION"
+        assert prepull["error"] == "INVALID_ACTION"
+        assert no_targets["error"] == "MISSING_TARGETS"
+
+    @pytest.mark.asyncio
+    async def test_without_queue(self):
+        """Tools should report a missing queue."""
+        with patch("tools.app.tools.logger"):
+            tools = AppTools(MagicMock(), MagicMock(), MagicMock())
+
+        result = await tools.queue_deployments(["s1"], ["web"])
+
+        assert result["error"] == "QUEUE_UNAVAILABLE"
+
+
+class TestGetDeploymentJobs:
+    """Tests for get_deployment_jobs."""
+
+    @pytest.mark.asyncio
+    async def test_lists_jobs_with_counts(self, app_tools, queue):
+        """Listing should return jobs and counts by status."""
+        queue.list_jobs = AsyncMock(return_value=[make_job(status="running")])
+        queue.count_jobs = AsyncMock(return_value={"running": 1, "queued": 4})
+
+        result = await app_tools.get_deployment_jobs(status="running")
+
+        assert result["data"]["jobs"][0]["status"] == "running"
+        assert result["data"]["counts"] == {"running": 1, "queued": 4}
+        queue.list_jobs.assert_awaited_once_with("running", None, 100)
+
+    @pytest.mark.asyncio
+    async def test_job_not_found_and_bad_status(self, app_tools, queue):
+        """Missing jobs and unknown statuses should be errors."""
+        queue.get_job = AsyncMock(return_value=None)
+
+        missing = await app_tools.get_deployment_jobs(job_id="job-9")
+        bad_status = await app_tools.get_deployment_jobs(status="paused")
+
+        assert missing["error"] == "JOB_NOT_FOUND"
+        assert bad_status["error"] == "INVALID_STATUS"
+
+
+class TestCancelDeploymentJob:
+    """Tests for cancel_deployment_job."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_states(self, app_tools, queue):
+        """Queued jobs cancel, running ones are cancelling, finished ones fail."""
+        queue.cancel = AsyncMock(
+            side_effect=[
+                make_job(status="cancelled"),
+                make_job(status="running", cancel_requested=True),
+                make_job(status="succeeded"),
+                None,
+            ]
+        )
+
+        cancelled = await app_tools.cancel_deployment_job("job-1")
+        cancelling = await app_tools.cancel_deployment_job("job-1")
+        finished = await app_tools.cancel_deployment_job("job-1")
+        missing = await app_tools.cancel_deployment_job("job-1")
+
+        assert cancelled["message"] == "Deployment job cancelled"
+        assert cancelling["message"] == "Deployment job cancelling"
+        assert finished["error"] == "JOB_FINISHED"
+        assert missing["error"] == "JOB_NOT_FOUND"
+
+
+class TestPrepullApps:
+    """Tests for prepull_apps."""
+
+    @pytest.mark.asyncio
+    async def test_queues_prepulls(self, app_tools, queue):
+        """Pre-pulls should be queued at low priority by default."""
+        queue.enqueue_prepulls = AsyncMock(return_value=[make_job(kind="prepull")])
+
+        result = await app_tools.prepull_apps(["web"])
+
+        assert result["success"] is True
+        assert result["data"]["jobs"][0]["kind"] == "prepull"
+        app_ids, server_ids, priority = queue.enqueue_prepulls.await_args.args
+        assert (app_ids, server_ids) == (["web"], None)
+        assert priority < 0
+
+    @pytest.mark.asyncio
+    async def test_servers_need_apps(self, app_tools, queue):
+        """Servers without apps should be rejected before queueing."""
+        queue.enqueue_prepulls = AsyncMock()
+
+        result = await app_tools.prepull_apps(server_ids=["s1"])
+
+        assert result["error"] == "MISSING_APP_IDS"
+        queue.enqueue_prepulls.assert_not_awaited()
+
+
+class TestGetServerImages:
+    """Tests for get_server_images."""
+
+    @pytest.mark.asyncio
+    async def test_lists_images(self, app_tools, deployment_service):
+        """Recorded images should be returned with a total."""
+        deployment_service.get_server_images = AsyncMock(
+            return_value=[{"server_id": "s1", "image": "nginx:1.25"}]
+        )
+
+        result = await app_tools.get_server_images(server_id="s1")
+
+        assert result["data"]["total"] == 1
+        deployment_service.get_server_images.assert_awaited_once_with("s1", None)
@@ -1,7 +1,7 @@
 """
 Backup Tools Unit Tests
 
-Tests for backup tools: export_backup, import_backup.
+Tests for backup tools: export_backup, verify_backup, import_backup.
 """
 
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -16,6 +16,7 @@ def mock_backup_service():
     """Create mock backup service."""
     service = MagicMock()
     service.export_backup = AsyncMock()
+    service.verify_backup = AsyncMock()
     service.import_backup = AsyncMock()
     return service
 
@@ -143,6 +144,79 @@ class TestExportBackup:
         assert "Backup export failed" in result["message"]
 
 
+class TestVerifyBackup:
+    """Tests for the verify_backup tool."""
+
+    @pytest.mark.asyncio
+    async def test_verify_backup_success(self, mock_backup_service):
+        """Test successful backup verification."""
+        mock_backup_service.verify_backup = AsyncMock(
+            return_value={
+                "success": True,
+                "version": "2.0",
+                "timestamp": "2024-01-15T10:30:00Z",
+                "schema_version": 6,
+                "database_size": 409600,
+                "tables": {"users": 2, "servers": 4},
+            }
+        )
+
+        tools = BackupTools(mock_backup_service)
+
+        with patch("tools.backup.tools.log_event", new_callable=AsyncMock):
+            result = await tools.verify_backup(
+                input_path="/backups/backup.enc", password="pass123"
+            )
+
+        assert result["success"] is True
+        assert result["data"]["schema_version"] == 6
+        assert result["data"]["tables"] == {"users": 2, "servers": 4}
+        assert "Backup verified successfully" in result["message"]
+        mock_backup_service.verify_backup.assert_called_once_with(
+            "/backups/backup.enc", "pass123"
+        )
+
+    @pytest.mark.asyncio
+    async def test_verify_backup_failure(self, mock_backup_service):
+        """Test verification of a damaged backup."""
+        mock_backup_service.verify_backup = AsyncMock(
+            return_value={
+                "success": False,
+                "error": "Invalid password or corrupted backup",
+            }
+        )
+
+        tools = BackupTools(mock_backup_service)
+
+        with patch("tools.backup.tools.log_event", new_callable=AsyncMock) as mock_log:
+            result = await tools.verify_backup(
+                input_path="/backups/backup.enc", password="wrong"
+            )
+
+        assert result["success"] is False
+        assert result["error"] == "VERIFY_FAILED"
+        assert "corrupted" in result["message"]
+        assert mock_log.call_args[0][1] == "WARNING"
+
+    @pytest.mark.asyncio
+    async def test_verify_backup_exception(self, mock_backup_service):
+        """Test backup verification when exception occurs."""
+        mock_backup_service.verify_backup = AsyncMock(
+            side_effect=Exception("disk exploded")
+        )
+
+        tools = BackupTools(mock_backup_service)
+
+        with patch("tools.backup.tools.log_event", new_callable=AsyncMock):
+            result = await tools.verify_backup(
+                input_path="/backups/backup.enc", password="pass123"
+            )
+
+        assert result["success"] is False
+        assert result["error"] == "VERIFY_ERROR"
+        assert "disk exploded" not in result["message"]
+
+
 class TestImportBackup:
     """Tests for the import_backup tool."""
 
@@ -4,7 +4,7 @@ Unit tests for tools/health/tools.py - HealthTools class.
 Tests for health check functionality.
 """
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -97,6 +97,34 @@ class TestHealthCheck:
         assert config["ssh_timeout"] == 30
         assert config["max_connections"] == 10
 
+    @pytest.mark.asyncio
+    async def test_detailed_health_check_includes_backend_checks(self, config):
+        """Backend component checks should set the overall status."""
+        monitoring = MagicMock()
+        monitoring.check_health = AsyncMock(
+            return_value={
+                "status": "degraded",
+                "components": {"event_loop": {"status": "degraded", "lag_ms": 250}},
+            }
+        )
+        tools = HealthTools(config, monitoring_service=monitoring)
+
+        result = await tools.health_check(detailed=True)
+
+        assert result["data"]["status"] == "degraded"
+        assert result["data"]["checks"]["event_loop"]["lag_ms"] == 250
+        assert result["data"]["components"]["mcp_server"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_simple_health_check_skips_backend_checks(self, config):
+        """The ping response should not run component checks."""
+        monitoring = MagicMock(check_health=AsyncMock())
+        tools = HealthTools(config, monitoring_service=monitoring)
+
+        await tools.health_check()
+
+        monitoring.check_health.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_health_check_exception_handling(self, health_tools):
         """Test health check handles exceptions gracefully."""
@@ -2,14 +2,16 @@
 Monitoring Tools Unit Tests
 
 Tests for system monitoring tools: get_system_metrics, get_server_metrics,
-get_app_metrics, get_dashboard_metrics, get_marketplace_metrics.
+get_app_metrics, the metric series tools, get_dashboard_metrics,
+get_marketplace_metrics.
 """
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from tools.monitoring.tools import MonitoringTools
+from services.database.metrics_service import MetricSeries
+from tools.monitoring.tools import MAX_SERIES_POINTS, MonitoringTools
 
 
 class TestMonitoringToolsInit:
@@ -74,6 +76,21 @@ class TestGetSystemMetrics:
         assert result["data"]["cpu_percent"] == 45.2
         assert result["data"]["memory_percent"] == 62.8
         assert "System metrics retrieved successfully" in result["message"]
+        mock_services["monitoring"].get_current_metrics.assert_called_once_with(False)
+
+    @pytest.mark.asyncio
+    async def test_get_system_metrics_with_history(
+        self, monitoring_tools, mock_services
+    ):
+        """Test history is requested from the monitoring service."""
+        mock_services["monitoring"].get_current_metrics.return_value = {
+            "history": {"rss_bytes": [1, 2]}
+        }
+
+        result = await monitoring_tools.get_system_metrics(include_history=True)
+
+        assert result["data"]["history"]["rss_bytes"] == [1, 2]
+        mock_services["monitoring"].get_current_metrics.assert_called_once_with(True)
 
     @pytest.mark.asyncio
     async def test_get_system_metrics_exception(self, monitoring_tools, mock_services):
@@ -289,6 +306,121 @@ class TestGetAppMetrics:
         assert "Container not found" in result["message"]
 
 
+class TestGetMetricSeries:
+    """Tests for the get_server_metric_series and get_app_metric_series tools."""
+
+    @pytest.fixture
+    def mock_services(self):
+        """Create mock services."""
+        return {
+            "monitoring": MagicMock(),
+            "metrics": MagicMock(),
+            "dashboard": MagicMock(),
+            "marketplace": MagicMock(),
+        }
+
+    @pytest.fixture
+    def monitoring_tools(self, mock_services):
+        """Create MonitoringTools instance."""
+        with patch("tools.monitoring.tools.logger"):
+            return MonitoringTools(
+                mock_services["monitoring"],
+                mock_services["metrics"],
+                mock_services["dashboard"],
+                mock_services["marketplace"],
+            )
+
+    @pytest.fixture
+    def series(self):
+        """Create a two point series."""
+        return MetricSeries(
+            timestamps=[1000, 61000],
+            fields={"cpu_percent": [40.0, 42.0]},
+            bucket_ms=60000,
+        )
+
+    @pytest.mark.asyncio
+    async def test_server_series_success(self, monitoring_tools, mock_services, series):
+        """The series arrays should be returned without per-sample objects."""
+        mock_services["metrics"].get_server_metric_series = AsyncMock(
+            return_value=series
+        )
+
+        result = await monitoring_tools.get_server_metric_series(
+            "server-123", "7d", fields=["cpu_percent"], max_points=100, delta=True
+        )
+
+        assert result["success"] is True
+        assert result["data"] == {
+            "server_id": "server-123",
+            "period": "7d",
+            "timestamps": [1000, 61000],
+            "fields": {"cpu_percent": [40.0, 42.0]},
+            "count": 2,
+            "bucket_ms": 60000,
+            "delta": [],
+        }
+        mock_services["metrics"].get_server_metric_series.assert_called_once_with(
+            "server-123", "7d", ["cpu_percent"], 100, True
+        )
+
+    @pytest.mark.asyncio
+    async def test_app_series_success(self, monitoring_tools, mock_services, series):
+        """App series should be read by container name."""
+        mock_services["metrics"].get_container_metric_series = AsyncMock(
+            return_value=series
+        )
+
+        result = await monitoring_tools.get_app_metric_series("server-123", "nginx")
+
+        assert result["success"] is True
+        assert result["data"]["app_id"] == "nginx"
+        assert result["data"]["count"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_points", [0, MAX_SERIES_POINTS + 1])
+    async def test_rejects_point_counts(
+        self, monitoring_tools, mock_services, max_points
+    ):
+        """Point counts outside the allowed range should be rejected."""
+        mock_services["metrics"].get_server_metric_series = AsyncMock()
+
+        result = await monitoring_tools.get_server_metric_series(
+            "server-123", max_points=max_points
+        )
+
+        assert result["success"] is False
+        assert result["error"] == "INVALID_MAX_POINTS"
+        mock_services["metrics"].get_server_metric_series.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_fields(self, monitoring_tools, mock_services):
+        """Unknown fields should be reported as invalid input."""
+        mock_services["metrics"].get_container_metric_series = AsyncMock(
+            side_effect=ValueError("Unknown metric fields: bogus")
+        )
+
+        result = await monitoring_tools.get_app_metric_series(
+            "server-123", "nginx", fields=["bogus"]
+        )
+
+        assert result["success"] is False
+        assert result["error"] == "INVALID_FIELDS"
+        assert "bogus" in result["message"]
+
+    @pytest.mark.asyncio
+    async def test_series_exception(self, monitoring_tools, mock_services):
+        """Unexpected errors should be reported as metric errors."""
+        mock_services["metrics"].get_server_metric_series = AsyncMock(
+            side_effect=Exception("DB error")
+        )
+
+        result = await monitoring_tools.get_server_metric_series("server-123")
+
+        assert result["success"] is False
+        assert result["error"] == "GET_METRICS_ERROR"
+
+
 class TestGetDashboardMetrics:
     """Tests for the get_dashboard_metrics tool."""
 
@@ -401,107 +533,37 @@ class TestGetMarketplaceMetrics:
                 mock_services["marketplace"],
             )
 
-    @pytest.fixture
-    def sample_repos(self):
-        """Create sample repos."""
-        repo1 = MagicMock()
-        repo1.enabled = True
-        repo1.last_synced = "2024-01-15T10:00:00Z"
-
-        repo2 = MagicMock()
-        repo2.enabled = False
-        repo2.last_synced = None
-        return [repo1, repo2]
-
-    @pytest.fixture
-    def sample_apps(self):
-        """Create sample apps."""
-        app1 = MagicMock()
-        app1.rating_count = 10
-        app1.avg_rating = 4.5
-        app1.featured = True
-
-        app2 = MagicMock()
-        app2.rating_count = 5
-        app2.avg_rating = 4.0
-        app2.featured = False
-
-        app3 = MagicMock()
-        app3.rating_count = 0
-        app3.avg_rating = 0.0
-        app3.featured = False
-        return [app1, app2, app3]
-
     @pytest.mark.asyncio
     async def test_get_marketplace_metrics_success(
-        self, monitoring_tools, mock_services, sample_repos, sample_apps
-    ):
-        """Test successfully getting marketplace metrics."""
-        mock_services["marketplace"].get_repos = AsyncMock(return_value=sample_repos)
-        mock_services["marketplace"].search_apps = AsyncMock(return_value=sample_apps)
-        mock_services["marketplace"].get_categories = AsyncMock(
-            return_value=["database", "web", "monitoring"]
-        )
-
-        result = await monitoring_tools.get_marketplace_metrics()
-
-        assert result["success"] is True
-        assert result["data"]["total_repos"] == 2
-        assert result["data"]["enabled_repos"] == 1
-        assert result["data"]["synced_repos"] == 1
-        assert result["data"]["total_apps"] == 3
-        assert result["data"]["featured_apps"] == 1
-        assert result["data"]["category_count"] == 3
-        assert result["data"]["total_ratings"] == 15
-        assert result["data"]["rated_apps"] == 2
-        # Weighted average: (4.5*10 + 4.0*5) / 15 = 4.33
-        assert result["data"]["avg_rating"] == 4.33
-
-    @pytest.mark.asyncio
-    async def test_get_marketplace_metrics_no_ratings(
-        self, monitoring_tools, mock_services, sample_repos
-    ):
-        """Test marketplace metrics when no apps have ratings."""
-        app_no_ratings = MagicMock()
-        app_no_ratings.rating_count = 0
-        app_no_ratings.avg_rating = 0.0
-        app_no_ratings.featured = False
-
-        mock_services["marketplace"].get_repos = AsyncMock(return_value=sample_repos)
-        mock_services["marketplace"].search_apps = AsyncMock(
-            return_value=[app_no_ratings]
-        )
-        mock_services["marketplace"].get_categories = AsyncMock(return_value=[])
-
-        result = await monitoring_tools.get_marketplace_metrics()
-
-        assert result["success"] is True
-        assert result["data"]["total_ratings"] == 0
-        assert result["data"]["avg_rating"] == 0.0
-        assert result["data"]["rated_apps"] == 0
-
-    @pytest.mark.asyncio
-    async def test_get_marketplace_metrics_empty_marketplace(
         self, monitoring_tools, mock_services
     ):
-        """Test marketplace metrics when marketplace is empty."""
-        mock_services["marketplace"].get_repos = AsyncMock(return_value=[])
-        mock_services["marketplace"].search_apps = AsyncMock(return_value=[])
-        mock_services["marketplace"].get_categories = AsyncMock(return_value=[])
+        """Test marketplace metrics come from the service's aggregate stats."""
+        stats = {
+            "total_repos": 2,
+            "enabled_repos": 1,
+            "synced_repos": 1,
+            "total_apps": 3,
+            "featured_apps": 1,
+            "categories": [{"id": "web", "name": "Web", "count": 3}],
+            "category_count": 1,
+            "total_ratings": 15,
+            "avg_rating": 4.33,
+            "rated_apps": 2,
+        }
+        mock_services["marketplace"].get_stats = AsyncMock(return_value=stats)
 
         result = await monitoring_tools.get_marketplace_metrics()
 
         assert result["success"] is True
-        assert result["data"]["total_repos"] == 0
-        assert result["data"]["total_apps"] == 0
-        assert result["data"]["category_count"] == 0
+        assert result["data"] == stats
+        mock_services["marketplace"].search_apps.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_marketplace_metrics_exception(
         self, monitoring_tools, mock_services
     ):
         """Test get_marketplace_metrics handles exceptions."""
-        mock_services["marketplace"].get_repos = AsyncMock(
+        mock_services["marketplace"].get_stats = AsyncMock(
             side_effect=Exception("Marketplace offline")
         )
 
@@ -3,31 +3,40 @@ App Deployment Tools
 
 Provides MCP tools for deployment pipeline operations:
 start/stop, installation status, validation, preflight checks,
-container health, logs, and cleanup.
+container health, logs, cleanup, and the deployment job queue.
 """
 
 from typing import Any
 
 import structlog
 
-from services.deployment import DeploymentService
+from services.deployment import DeploymentQueue, DeploymentService
+from services.deployment.jobs import JOB_STATUSES, PREPULL_PRIORITY
 from tools.common import log_event
 
 logger = structlog.get_logger("app_deployment_tools")
 
 APP_TAGS = ["app", "deployment"]
+# Job kinds queue_deployments accepts; prepulls go through prepull_apps
+DEPLOYMENT_ACTIONS = ("install", "uninstall")
 
 
 class DeploymentTools:
     """Deployment-related tools for app management."""
 
-    def __init__(self, deployment_service: DeploymentService):
+    def __init__(
+        self,
+        deployment_service: DeploymentService,
+        deployment_queue: DeploymentQueue | None = None,
+    ):
         """Initialize deployment tools.
 
         Args:
             deployment_service: Service for deployment operations.
+            deployment_queue: Job queue for background deployments.
         """
         self.deployment_service = deployment_service
+        self.deployment_queue = deployment_queue
 
     # ─────────────────────────────────────────────────────────────
     # Start / Stop
@@ -310,7 +319,11 @@ class DeploymentTools:
             }
 
     async def get_container_logs(
-        self, server_id: str, container_name: str, tail: int = 100
+        self,
+        server_id: str,
+        container_name: str,
+        tail: int = 100,
+        since: str | None = None,
     ) -> dict[str, Any]:
         """Get recent logs from a container.
 
@@ -318,13 +331,17 @@ class DeploymentTools:
             server_id: Server where container is running
             container_name: Container name to get logs from
             tail: Number of lines to return (default: 100)
+            since: Cursor from a previous call; only newer lines are returned
 
         Returns:
-            Dict with log lines
+            Dict with log lines and the cursor of the last line
         """
         try:
             result = await self.deployment_service.get_container_logs(
-                server_id=server_id, container_name=container_name, tail=tail
+                server_id=server_id,
+                container_name=container_name,
+                tail=tail,
+                since=since,
             )
             return {
                 "success": True,
@@ -339,6 +356,85 @@ class DeploymentTools:
                 "error": "LOGS_ERROR",
             }
 
+    async def start_log_stream(
+        self,
+        server_id: str,
+        container_name: str,
+        since: str | None = None,
+        tail: int = 100,
+        follow: bool = True,
+    ) -> dict[str, Any]:
+        """Start streaming logs from a container.
+
+        Args:
+            server_id: Server where container is running
+            container_name: Container name to stream logs from
+            since: Cursor to resume after (from a previous read)
+            tail: Existing lines to include when not resuming
+            follow: Keep streaming new lines until stopped
+
+        Returns:
+            Dict with the stream_id to read from
+        """
+        result = await self.deployment_service.start_log_stream(
+            server_id, container_name, since=since, tail=tail, follow=follow
+        )
+        if "error" in result:
+            return {
+                "success": False,
+                "message": f"Failed to start log stream: {result['error']}",
+                "error": "LOG_STREAM_ERROR",
+            }
+        return {
+            "success": True,
+            "data": result,
+            "message": f"Streaming logs from {container_name}",
+        }
+
+    async def read_log_stream(
+        self, stream_id: str, after: int = 0, limit: int = 1000
+    ) -> dict[str, Any]:
+        """Read new lines from a log stream.
+
+        Args:
+            stream_id: Stream returned by start_log_stream
+            after: Offset to read from (``next`` from the previous read)
+            limit: Maximum lines to return
+
+        Returns:
+            Dict with lines, next offset, cursor and done flag
+        """
+        result = await self.deployment_service.read_log_stream(stream_id, after, limit)
+        if result is None:
+            return {
+                "success": False,
+                "message": f"Log stream '{stream_id}' not found",
+                "error": "LOG_STREAM_NOT_FOUND",
+            }
+        return {
+            "success": True,
+            "data": result,
+            "message": f"Read {len(result['lines'])} log lines",
+        }
+
+    async def stop_log_stream(self, stream_id: str) -> dict[str, Any]:
+        """Stop a log stream.
+
+        Args:
+            stream_id: Stream returned by start_log_stream
+
+        Returns:
+            Dict with stop result
+        """
+        stopped = await self.deployment_service.stop_log_stream(stream_id)
+        if not stopped:
+            return {
+                "success": False,
+                "message": f"Log stream '{stream_id}' not found",
+                "error": "LOG_STREAM_NOT_FOUND",
+            }
+        return {"success": True, "message": "Log stream stopped"}
+
     # ─────────────────────────────────────────────────────────────
     # Cleanup
     # ─────────────────────────────────────────────────────────────
@@ -391,3 +487,254 @@ class DeploymentTools:
                 "message": f"Cleanup failed: {str(e)}",
                 "error": "CLEANUP_ERROR",
             }
+
+    # ─────────────────────────────────────────────────────────────
+    # Deployment Job Queue
+    # ─────────────────────────────────────────────────────────────
+
+    def _queue_unavailable(self) -> dict[str, Any]:
+        return {
+            "success": False,
+            "message": "Deployment queue is not available",
+            "error": "QUEUE_UNAVAILABLE",
+        }
+
+    async def queue_deployments(
+        self,
+        server_ids: list[str],
+        app_ids: list[str],
+        action: str = "install",
+        config: dict[str, Any] | None = None,
+        remove_data: bool = False,
+        priority: int = 0,
+    ) -> dict[str, Any]:
+        """Queue installs or removals of apps across servers.
+
+        Args:
+            server_ids: Servers to deploy to or remove from
+            app_ids: Apps to install or remove on every server
+            action: "install" or "uninstall"
+            config: Deployment configuration for installs
+            remove_data: Whether removals also delete volumes
+            priority: Higher priorities start first
+
+        Returns:
+            Dict with the queued jobs
+        """
+        if self.deployment_queue is None:
+            return self._queue_unavailable()
+        if action not in DEPLOYMENT_ACTIONS:
+            return {
+                "success": False,
+                "message": f"action must be one of: {', '.join(DEPLOYMENT_ACTIONS)}",
+                "error": "INVALID_ACTION",
+            }
+        if not server_ids or not app_ids:
+            return {
+                "success": False,
+                "message": "server_ids and app_ids required",
+                "error": "MISSING_TARGETS",
+            }
+        params = (
+            {"config": config or {}}
+            if action == "install"
+            else {"remove_data": remove_data}
+        )
+        try:
+            jobs = await self.deployment_queue.enqueue_many(
+                action, server_ids, app_ids, params, priority
+            )
+        except Exception as e:
+            logger.error("Queue deployments error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to queue deployments: {str(e)}",
+                "error": "QUEUE_ERROR",
+            }
+        await log_event(
+            "application",
+            "INFO",
+            f"Queued {len(jobs)} {action} job(s)",
+            APP_TAGS,
+            {"server_ids": server_ids, "app_ids": app_ids, "priority": priority},
+        )
+        return {
+            "success": True,
+            "data": {"jobs": [job.to_dict() for job in jobs], "total": len(jobs)},
+            "message": f"Queued {len(jobs)} deployment job(s)",
+        }
+
+    async def prepull_apps(
+        self,
+        app_ids: list[str] | None = None,
+        server_ids: list[str] | None = None,
+        priority: int = PREPULL_PRIORITY,
+    ) -> dict[str, Any]:
+        """Queue pulls of app images onto servers ahead of their installs.
+
+        Args:
+            app_ids: Apps to warm (all installed apps if omitted)
+            server_ids: Servers to warm (where each app is installed if
+                omitted, e.g. after a catalog update)
+            priority: Higher priorities start first
+
+        Returns:
+            Dict with the queued pre-pull jobs
+        """
+        if self.deployment_queue is None:
+            return self._queue_unavailable()
+        if server_ids and not app_ids:
+            return {
+                "success": False,
+                "message": "app_ids required when server_ids are given",
+                "error": "MISSING_APP_IDS",
+            }
+        try:
+            jobs = await self.deployment_queue.enqueue_prepulls(
+                app_ids, server_ids, priority
+            )
+        except Exception as e:
+            logger.error("Queue prepulls error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to queue image pre-pulls: {str(e)}",
+                "error": "QUEUE_ERROR",
+            }
+        return {
+            "success": True,
+            "data": {"jobs": [job.to_dict() for job in jobs], "total": len(jobs)},
+            "message": f"Queued {len(jobs)} image pre-pull(s)",
+        }
+
+    async def get_server_images(
+        self, server_id: str | None = None, image: str | None = None
+    ) -> dict[str, Any]:
+        """Get images recorded as pulled onto servers.
+
+        Args:
+            server_id: Only images on this server
+            image: Only this image (name:tag)
+
+        Returns:
+            Dict with image IDs, digests and pull times per server
+        """
+        try:
+            images = await self.deployment_service.get_server_images(server_id, image)
+        except Exception as e:
+            logger.error("Get server images error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to get server images: {str(e)}",
+                "error": "SERVER_IMAGES_ERROR",
+            }
+        return {
+            "success": True,
+            "data": {"images": images, "total": len(images)},
+            "message": f"Found {len(images)} pulled images",
+        }
+
+    async def get_deployment_jobs(
+        self,
+        job_id: str | None = None,
+        status: str | None = None,
+        server_id: str | None = None,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """Get one deployment job or list jobs, newest first.
+
+        Args:
+            job_id: Job to get
+            status: Only jobs in this status (queued, running, succeeded,
+                failed, cancelled)
+            server_id: Only jobs for this server
+            limit: Maximum jobs to list
+
+        Returns:
+            Dict with the job, or the jobs and counts by status
+        """
+        if self.deployment_queue is None:
+            return self._queue_unavailable()
+        if status and status not in JOB_STATUSES:
+            return {
+                "success": False,
+                "message": f"status must be one of: {', '.join(JOB_STATUSES)}",
+                "error": "INVALID_STATUS",
+            }
+        try:
+            if job_id:
+                job = await self.deployment_queue.get_job(job_id)
+                if not job:
+                    return {
+                        "success": False,
+                        "message": f"Deployment job '{job_id}' not found",
+                        "error": "JOB_NOT_FOUND",
+                    }
+                return {
+                    "success": True,
+                    "data": job.to_dict(),
+                    "message": f"Deployment job {job.status}",
+                }
+            jobs = await self.deployment_queue.list_jobs(status, server_id, limit)
+            counts = await self.deployment_queue.count_jobs()
+        except Exception as e:
+            logger.error("Get deployment jobs error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to get deployment jobs: {str(e)}",
+                "error": "QUEUE_ERROR",
+            }
+        return {
+            "success": True,
+            "data": {"jobs": [job.to_dict() for job in jobs], "counts": counts},
+            "message": f"Found {len(jobs)} deployment jobs",
+        }
+
+    async def cancel_deployment_job(self, job_id: str) -> dict[str, Any]:
+        """Cancel a queued or running deployment job.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            Dict with the job after cancelling
+        """
+        if self.deployment_queue is None:
+            return self._queue_unavailable()
+        try:
+            job = await self.deployment_queue.cancel(job_id)
+        except Exception as e:
+            logger.error("Cancel deployment job error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to cancel job: {str(e)}",
+                "error": "QUEUE_ERROR",
+            }
+        if not job:
+            return {
+                "success": False,
+                "message": f"Deployment job '{job_id}' not found",
+                "error": "JOB_NOT_FOUND",
+            }
+        if job.status in ("succeeded", "failed"):
+            return {
+                "success": False,
+                "data": job.to_dict(),
+                "message": f"Deployment job already {job.status}",
+                "error": "JOB_FINISHED",
+            }
+        await log_event(
+            "application",
+            "INFO",
+            f"Deployment job cancelled: {job_id}",
+            APP_TAGS,
+            {"job_id": job_id, "server_id": job.server_id, "app_id": job.app_id},
+        )
+        return {
+            "success": True,
+            "data": job.to_dict(),
+            "message": (
+                "Deployment job cancelled"
+                if job.status == "cancelled"
+                else "Deployment job cancelling"
+            ),
+        }
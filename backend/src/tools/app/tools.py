@@ -10,7 +10,8 @@ import structlog
 
 from models.app import AppFilter
 from services.app_service import AppService
-from services.deployment import DeploymentError, DeploymentService
+from services.deployment import DeploymentError, DeploymentQueue, DeploymentService
+from services.deployment.jobs import PREPULL_PRIORITY
 from services.marketplace_service import MarketplaceService
 from tools.app.deployment_tools import DeploymentTools
 from tools.common import log_event
@@ -28,12 +29,13 @@ class AppTools:
         app_service: AppService,
         marketplace_service: MarketplaceService,
         deployment_service: DeploymentService,
+        deployment_queue: DeploymentQueue | None = None,
     ):
         """Initialize app tools."""
         self.app_service = app_service
         self.marketplace_service = marketplace_service
         self.deployment_service = deployment_service
-        self._deployment_tools = DeploymentTools(deployment_service)
+        self._deployment_tools = DeploymentTools(deployment_service, deployment_queue)
         logger.info("App tools initialized")
 
     async def _get_server_name(self, server_id: str) -> str:
@@ -46,6 +48,40 @@ class AppTools:
             pass
         return server_id  # Fallback to ID
 
+    async def _list_installations(
+        self,
+        server_id: str | None,
+        filters: dict[str, Any],
+        limit: int | None,
+        offset: int,
+    ) -> dict[str, Any]:
+        """List installations with details; total counts every match."""
+        status = filters.get("status")
+        search = filters.get("search")
+        offset = max(0, offset)
+        if limit is not None:
+            limit = max(0, limit)
+        installations = (
+            await self.deployment_service.get_all_installations_with_details(
+                server_id=server_id,
+                status=status,
+                search=search,
+                limit=limit,
+                offset=offset,
+            )
+        )
+        if limit is None and not offset:
+            total = len(installations)
+        else:
+            total = await self.deployment_service.count_installations(
+                server_id=server_id, status=status, search=search
+            )
+        return {
+            "success": True,
+            "data": {"installations": installations, "total": total},
+            "message": f"Found {total} installed apps",
+        }
+
     # ─────────────────────────────────────────────────────────────
     # Core CRUD Operations
     # ─────────────────────────────────────────────────────────────
@@ -56,6 +92,9 @@ class AppTools:
         app_ids: list[str] = None,
         server_id: str = None,
         filters: dict[str, Any] | None = None,
+        installed: bool = False,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> dict[str, Any]:
         """Get app details from catalog or installed apps.
 
@@ -66,13 +105,17 @@ class AppTools:
                        If None, get from catalog/marketplace.
             filters: Search filters (category, status, search, tags, etc.)
                      Used when no app_id/app_ids provided.
+            installed: List installations across servers, narrowed by
+                       server_id and the status/search filters
+            limit: Maximum installations to return (all when None)
+            offset: Installations to skip, for pagination
 
         Returns:
             Dict with app details or list of apps
         """
         try:
             # Get installed apps from server
-            if server_id:
+            if server_id and not installed:
                 if app_id:
                     # Single installed app
                     apps = await self.deployment_service.get_installed_apps(server_id)
@@ -99,19 +142,11 @@ class AppTools:
                         "message": f"Found {len(apps)} installed apps",
                     }
 
-            # Get all installed apps across all servers
-            if not app_id and not app_ids and not filters:
-                installations = (
-                    await self.deployment_service.get_all_installations_with_details()
+            # Get installed apps across all servers
+            if not app_id and not app_ids and (installed or not filters):
+                return await self._list_installations(
+                    server_id, filters or {}, limit, offset
                 )
-                return {
-                    "success": True,
-                    "data": {
-                        "installations": installations,
-                        "total": len(installations),
-                    },
-                    "message": f"Found {len(installations)} installed apps",
-                }
 
             # Get from catalog/marketplace
             if app_id:
@@ -151,6 +186,8 @@ class AppTools:
                     tags=filters.get("tags"),
                     sort_by=filters.get("sort_by"),
                     sort_order=filters.get("sort_order"),
+                    limit=filters.get("limit"),
+                    cursor=filters.get("cursor"),
                 )
 
             result = await self.app_service.search_apps(filter_obj)
@@ -159,6 +196,7 @@ class AppTools:
                 "data": {
                     "apps": [app.model_dump(by_alias=True) for app in result.apps],
                     "total": result.total,
+                    "nextCursor": result.next_cursor,
                 },
                 "message": f"Found {result.total} apps",
             }
@@ -575,19 +613,13 @@ class AppTools:
         """Stop a running app."""
         return await self._deployment_tools.stop_app(server_id, app_id)
 
-    async def get_installation_status(
-        self, installation_id: str
-    ) -> dict[str, Any]:
+    async def get_installation_status(self, installation_id: str) -> dict[str, Any]:
         """Get installation status by ID for polling during deployment."""
         return await self._deployment_tools.get_installation_status(installation_id)
 
-    async def refresh_installation_status(
-        self, installation_id: str
-    ) -> dict[str, Any]:
+    async def refresh_installation_status(self, installation_id: str) -> dict[str, Any]:
         """Refresh installation status from Docker and update database."""
-        return await self._deployment_tools.refresh_installation_status(
-            installation_id
-        )
+        return await self._deployment_tools.refresh_installation_status(installation_id)
 
     async def validate_deployment_config(
         self, app_id: str, config: dict[str, Any] = None
@@ -612,13 +644,40 @@ class AppTools:
         )
 
     async def get_container_logs(
-        self, server_id: str, container_name: str, tail: int = 100
+        self,
+        server_id: str,
+        container_name: str,
+        tail: int = 100,
+        since: str | None = None,
     ) -> dict[str, Any]:
-        """Get recent logs from a container."""
+        """Get recent logs from a container, or only lines after a cursor."""
         return await self._deployment_tools.get_container_logs(
-            server_id, container_name, tail
+            server_id, container_name, tail, since
+        )
+
+    async def start_log_stream(
+        self,
+        server_id: str,
+        container_name: str,
+        since: str | None = None,
+        tail: int = 100,
+        follow: bool = True,
+    ) -> dict[str, Any]:
+        """Start streaming logs from a container."""
+        return await self._deployment_tools.start_log_stream(
+            server_id, container_name, since, tail, follow
         )
 
+    async def read_log_stream(
+        self, stream_id: str, after: int = 0, limit: int = 1000
+    ) -> dict[str, Any]:
+        """Read new lines from a log stream."""
+        return await self._deployment_tools.read_log_stream(stream_id, after, limit)
+
+    async def stop_log_stream(self, stream_id: str) -> dict[str, Any]:
+        """Stop a log stream."""
+        return await self._deployment_tools.stop_log_stream(stream_id)
+
     async def cleanup_failed_deployment(
         self, server_id: str, installation_id: str
     ) -> dict[str, Any]:
@@ -626,3 +685,48 @@ class AppTools:
         return await self._deployment_tools.cleanup_failed_deployment(
             server_id, installation_id
         )
+
+    async def queue_deployments(
+        self,
+        server_ids: list[str],
+        app_ids: list[str],
+        action: str = "install",
+        config: dict[str, Any] = None,
+        remove_data: bool = False,
+        priority: int = 0,
+    ) -> dict[str, Any]:
+        """Queue background installs or removals of apps across servers."""
+        return await self._deployment_tools.queue_deployments(
+            server_ids, app_ids, action, config, remove_data, priority
+        )
+
+    async def prepull_apps(
+        self,
+        app_ids: list[str] = None,
+        server_ids: list[str] = None,
+        priority: int = PREPULL_PRIORITY,
+    ) -> dict[str, Any]:
+        """Warm app images on servers ahead of installs or updates."""
+        return await self._deployment_tools.prepull_apps(app_ids, server_ids, priority)
+
+    async def get_server_images(
+        self, server_id: str = None, image: str = None
+    ) -> dict[str, Any]:
+        """Get images recorded as pulled onto servers."""
+        return await self._deployment_tools.get_server_images(server_id, image)
+
+    async def get_deployment_jobs(
+        self,
+        job_id: str = None,
+        status: str = None,
+        server_id: str = None,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """Get a deployment job or list queued and finished jobs."""
+        return await self._deployment_tools.get_deployment_jobs(
+            job_id, status, server_id, limit
+        )
+
+    async def cancel_deployment_job(self, job_id: str) -> dict[str, Any]:
+        """Cancel a queued or running deployment job."""
+        return await self._deployment_tools.cancel_deployment_job(job_id)
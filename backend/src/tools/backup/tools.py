@@ -78,10 +78,54 @@ class BackupTools:
                 "error": "EXPORT_ERROR",
             }
 
+    async def verify_backup(self, input_path: str, password: str) -> dict[str, Any]:
+        """Verify that an encrypted backup is complete and restorable."""
+        try:
+            result = await self.backup_service.verify_backup(input_path, password)
+
+            if result["success"]:
+                return {
+                    "success": True,
+                    "data": {
+                        "version": result["version"],
+                        "timestamp": result["timestamp"],
+                        "schema_version": result["schema_version"],
+                        "database_size": result["database_size"],
+                        "tables": result["tables"],
+                    },
+                    "message": "Backup verified successfully",
+                }
+            else:
+                await log_event(
+                    "backup",
+                    "WARNING",
+                    "Backup verification failed",
+                    BACKUP_TAGS,
+                    {"error": result["error"]},
+                )
+                return {
+                    "success": False,
+                    "message": result["error"],
+                    "error": "VERIFY_FAILED",
+                }
+
+        except Exception as e:
+            logger.error("Verify backup error", error=str(e))
+            from tools.common import safe_error_message
+
+            return {
+                "success": False,
+                "message": safe_error_message(e, "Backup verification"),
+                "error": "VERIFY_ERROR",
+            }
+
     async def import_backup(
         self, input_path: str, password: str, overwrite: bool = False
     ) -> dict[str, Any]:
-        """Import backup from encrypted file."""
+        """Import backup from encrypted file.
+
+        Database backups replace all current data and need overwrite=True.
+        """
         try:
             result = await self.backup_service.import_backup(
                 input_path, password, overwrite
@@ -11,19 +11,27 @@ from typing import Any
 
 import structlog
 
+from services.monitoring_service import MonitoringService
+
 logger = structlog.get_logger("health_tools")
 
 
 class HealthTools:
     """Health check tools for the MCP server."""
 
-    def __init__(self, config: Mapping[str, Any]):
+    def __init__(
+        self,
+        config: Mapping[str, Any],
+        monitoring_service: MonitoringService | None = None,
+    ):
         """Initialize health tools.
 
         Args:
             config: Application configuration mapping.
+            monitoring_service: Source of backend component checks.
         """
         self.config = dict(config)
+        self.monitoring_service = monitoring_service
         logger.info("Health tools initialized")
 
     async def health_check(self, detailed: bool = False) -> dict[str, Any]:
@@ -31,8 +39,10 @@ class HealthTools:
         Check MCP server health status.
 
         Args:
-            detailed: If True, returns comprehensive status with components and config.
-                     If False (default), returns a simple ping response.
+            detailed: If True, returns comprehensive status with components, config
+                     and checks of the event loop, database, file descriptors
+                     and agents. If False (default), returns a simple ping
+                     response.
 
         Returns:
             dict: Health status information
@@ -59,8 +69,16 @@ class HealthTools:
                     ),
                 },
             }
+            if self.monitoring_service is not None:
+                report = await self.monitoring_service.check_health()
+                health_status["status"] = report["status"]
+                health_status["checks"] = report["components"]
 
-            logger.info("Health check completed", status="healthy", detailed=detailed)
+            logger.info(
+                "Health check completed",
+                status=health_status["status"],
+                detailed=detailed,
+            )
             return {
                 "success": True,
                 "data": health_status,
@@ -10,11 +10,14 @@ import structlog
 
 from services.dashboard_service import DashboardService
 from services.marketplace_service import MarketplaceService
-from services.metrics_service import MetricsService
+from services.metrics_service import DEFAULT_SERIES_POINTS, MetricsService
 from services.monitoring_service import MonitoringService
 
 logger = structlog.get_logger("monitoring_tools")
 
+# Largest point count a series request may ask for
+MAX_SERIES_POINTS = 10_000
+
 
 class MonitoringTools:
     """Monitoring tools for the MCP server."""
@@ -40,15 +43,19 @@ class MonitoringTools:
         self.marketplace_service = marketplace_service
         logger.info("Monitoring tools initialized")
 
-    async def get_system_metrics(self) -> dict[str, Any]:
+    async def get_system_metrics(self, include_history: bool = False) -> dict[str, Any]:
         """
-        Get current system metrics and performance data.
+        Get the backend's own metrics and performance data.
+
+        Args:
+            include_history: Also return the last hour of samples as arrays.
 
         Returns:
-            dict: System metrics including CPU, memory, disk, and network usage
+            dict: Event loop lag, tasks, RSS, CPU, open files, database and
+            WAL size, busy database errors and agent connections
         """
         try:
-            metrics = self.monitoring_service.get_current_metrics()
+            metrics = self.monitoring_service.get_current_metrics(include_history)
 
             logger.info("System metrics retrieved")
 
@@ -119,6 +126,99 @@ class MonitoringTools:
                 "error": "GET_APP_METRICS_ERROR",
             }
 
+    async def get_server_metric_series(
+        self,
+        server_id: str,
+        period: str = "24h",
+        fields: list[str] | None = None,
+        max_points: int = DEFAULT_SERIES_POINTS,
+        delta: bool = False,
+    ) -> dict[str, Any]:
+        """Get server metrics as chart arrays.
+
+        Returns one timestamp array (epoch milliseconds, oldest first) and
+        one array per field instead of an object per sample.
+
+        Args:
+            server_id: Server to read.
+            period: One of 1h, 24h, 7d or 30d.
+            fields: Metric fields to return; all of them when omitted.
+            max_points: Samples are averaged into at most this many points.
+            delta: Delta encode the timestamps and integer fields.
+        """
+        if not 1 <= max_points <= MAX_SERIES_POINTS:
+            return {
+                "success": False,
+                "message": f"max_points must be between 1 and {MAX_SERIES_POINTS}",
+                "error": "INVALID_MAX_POINTS",
+            }
+        try:
+            series = await self.metrics_service.get_server_metric_series(
+                server_id, period, fields, max_points, delta
+            )
+            return {
+                "success": True,
+                "data": {
+                    "server_id": server_id,
+                    "period": period,
+                    **series.to_dict(),
+                },
+                "message": f"Retrieved {len(series.timestamps)} metric points",
+            }
+        except ValueError as e:
+            return {"success": False, "message": str(e), "error": "INVALID_FIELDS"}
+        except Exception as e:
+            logger.error("Get server metric series error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to get metrics: {str(e)}",
+                "error": "GET_METRICS_ERROR",
+            }
+
+    async def get_app_metric_series(
+        self,
+        server_id: str,
+        app_id: str,
+        period: str = "24h",
+        fields: list[str] | None = None,
+        max_points: int = DEFAULT_SERIES_POINTS,
+        delta: bool = False,
+    ) -> dict[str, Any]:
+        """Get an app container's metrics as chart arrays.
+
+        Arguments are as for get_server_metric_series; app_id is the
+        container name.
+        """
+        if not 1 <= max_points <= MAX_SERIES_POINTS:
+            return {
+                "success": False,
+                "message": f"max_points must be between 1 and {MAX_SERIES_POINTS}",
+                "error": "INVALID_MAX_POINTS",
+            }
+        try:
+            series = await self.metrics_service.get_container_metric_series(
+                server_id, app_id, period, fields, max_points, delta
+            )
+            return {
+                "success": True,
+                "data": {
+                    "server_id": server_id,
+                    "app_id": app_id,
+                    "period": period,
+                    **series.to_dict(),
+                },
+                "message": f"Retrieved {len(series.timestamps)} container metric points",
+            }
+        except ValueError as e:
+            return {"success": False, "message": str(e), "error": "INVALID_FIELDS"}
+        except Exception as e:
+            logger.error("Get app metric series error", error=str(e))
+            return {
+                "success": False,
+                "message": f"Failed to get app metrics: {str(e)}",
+                "error": "GET_APP_METRICS_ERROR",
+            }
+
     async def get_dashboard_metrics(self) -> dict[str, Any]:
         """Get aggregated dashboard metrics."""
         try:
@@ -154,40 +254,10 @@ class MonitoringTools:
     async def get_marketplace_metrics(self) -> dict[str, Any]:
         """Get marketplace statistics and metrics."""
         try:
-            repos = await self.marketplace_service.get_repos()
-            apps = await self.marketplace_service.search_apps(limit=10000)
-            categories = await self.marketplace_service.get_categories()
-
-            # Calculate aggregate statistics
-            enabled_repos = [r for r in repos if r.enabled]
-            synced_repos = [r for r in repos if r.last_synced is not None]
-
-            # Apps with ratings
-            rated_apps = [a for a in apps if a.rating_count > 0]
-            total_ratings = sum(a.rating_count for a in apps)
-            avg_rating = (
-                sum(a.avg_rating * a.rating_count for a in rated_apps) / total_ratings
-                if total_ratings > 0
-                else 0.0
-            )
-
-            # Featured apps
-            featured_apps = [a for a in apps if a.featured]
-
+            stats = await self.marketplace_service.get_stats()
             return {
                 "success": True,
-                "data": {
-                    "total_repos": len(repos),
-                    "enabled_repos": len(enabled_repos),
-                    "synced_repos": len(synced_repos),
-                    "total_apps": len(apps),
-                    "featured_apps": len(featured_apps),
-                    "categories": categories,
-                    "category_count": len(categories),
-                    "total_ratings": total_ratings,
-                    "avg_rating": round(avg_rating, 2),
-                    "rated_apps": len(rated_apps),
-                },
+                "data": stats,
                 "message": "Marketplace metrics retrieved",
             }
         except Exception as e:
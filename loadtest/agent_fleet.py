@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Simulated agent fleet.
+
+Connects N fake agents to a running backend using the agent's own token
+authentication and JSON-RPC handler, with a fake Docker client behind the
+RPC methods. Each agent pushes heartbeats and metrics and answers whatever
+the backend sends it until stdin is closed, then a JSON report is printed
+on stdout.
+
+Usage:
+    python agent_fleet.py --url ws://127.0.0.1:8000/ws/agent \\
+        --tokens tokens.json < /dev/stdin
+
+Normally started by backend_harness.py, which writes the tokens file.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+AGENT_SRC = Path(__file__).resolve().parents[1] / "agent" / "src"
+sys.path.insert(0, str(AGENT_SRC))
+
+import websockets  # noqa: E402
+from auth import _authenticate_with_token  # noqa: E402
+from config import AgentConfig, AgentState  # noqa: E402
+from connection import run_message_loop  # noqa: E402
+from handler_setup import setup_all_handlers  # noqa: E402
+from rpc.handler import RPCHandler  # noqa: E402
+from rpc.methods import docker_client  # noqa: E402
+from stats import percentiles, rate  # noqa: E402
+
+logger = logging.getLogger("agent_fleet")
+
+
+class FakeContainer:
+    """Container object shaped like docker-py's Container."""
+
+    def __init__(self, index: int):
+        self.id = f"{index:064x}"
+        self.short_id = self.id[:12]
+        self.name = f"app-{index}"
+        self.status = "running" if index % 5 else "exited"
+        self.image = SimpleNamespace(tags=[f"app{index}:latest"], short_id="sha256:1")
+        self.attrs = {
+            "Id": self.id,
+            "Name": f"/{self.name}",
+            "RestartCount": 0,
+            "State": {
+                "Status": self.status,
+                "Running": self.status == "running",
+                "StartedAt": "2024-01-01T00:00:00Z",
+                "FinishedAt": "0001-01-01T00:00:00Z",
+            },
+            "NetworkSettings": {"Networks": {"bridge": {}}},
+            "Mounts": [],
+        }
+
+
+class FakeContainers:
+    """containers collection of the fake Docker client."""
+
+    def __init__(self, count: int):
+        self._items = [FakeContainer(i) for i in range(count)]
+        self._by_ref = {c.name: c for c in self._items}
+        self._by_ref.update({c.id: c for c in self._items})
+
+    def list(self, all: bool = False) -> list[FakeContainer]:
+        return [c for c in self._items if all or c.status == "running"]
+
+    def get(self, ref: str) -> FakeContainer:
+        if ref not in self._by_ref:
+            raise Exception(f"No such container: {ref}")
+        return self._by_ref[ref]
+
+
+class FakeImages:
+    """images collection of the fake Docker client."""
+
+    def __init__(self, count: int):
+        self._items = [
+            SimpleNamespace(
+                short_id=f"sha256:{i:08x}",
+                tags=[f"app{i}:latest"],
+                attrs={"Size": 50_000_000 + i},
+            )
+            for i in range(count)
+        ]
+
+    def list(self) -> list[SimpleNamespace]:
+        return self._items
+
+
+class FakeDockerClient:
+    """Minimal stand-in for docker.DockerClient used by the RPC methods."""
+
+    def __init__(self, containers: int):
+        self.containers = FakeContainers(containers)
+        self.images = FakeImages(max(1, containers // 2))
+
+
+class FleetStats:
+    """Counters collected across all simulated agents."""
+
+    def __init__(self) -> None:
+        self.connect_latencies: list[float] = []
+        self.connect_failures = 0
+        self.first_connect_started: float | None = None
+        self.last_connected: float | None = None
+        self.heartbeats = 0
+        self.metrics_pushes = 0
+        self.unexpected_disconnects = 0
+
+    def report(self, agents: int) -> dict[str, Any]:
+        """Build the fleet part of the load-test report."""
+        connected = len(self.connect_latencies)
+        window = 0.0
+        if self.first_connect_started and self.last_connected:
+            window = self.last_connected - self.first_connect_started
+        return {
+            "agents": agents,
+            "connected": connected,
+            "connect_failures": self.connect_failures,
+            "connect_window_s": round(window, 3),
+            "connects_per_s": rate(connected, window),
+            "connect_latency": percentiles(self.connect_latencies),
+            "heartbeats_sent": self.heartbeats,
+            "metrics_pushes_sent": self.metrics_pushes,
+            "unexpected_disconnects": self.unexpected_disconnects,
+        }
+
+
+class FakeAgent:
+    """One simulated agent connection."""
+
+    def __init__(self, state: AgentState, args: argparse.Namespace, stats: FleetStats):
+        self.state = state
+        self.args = args
+        self.stats = stats
+        self.agent_id: str | None = None
+        self.config = AgentConfig(server_url=args.url)
+        self.rpc_handler = RPCHandler()
+        setup_all_handlers(
+            self.rpc_handler,
+            get_config=lambda: self.config,
+            set_config=lambda c: setattr(self, "config", c),
+            get_agent_id=lambda: self.agent_id,
+            shutdown=self._shutdown,
+        )
+        self._started = time.monotonic()
+
+    async def _shutdown(self) -> None:
+        """Ignore agent.update-triggered shutdowns."""
+
+    async def run(self, gate: asyncio.Semaphore, stop: asyncio.Event) -> None:
+        """Connect, authenticate and serve until stop is set."""
+        async with gate:
+            started = time.perf_counter()
+            if self.stats.first_connect_started is None:
+                self.stats.first_connect_started = started
+            try:
+                websocket = await websockets.connect(self.args.url, max_size=None)
+                self.agent_id, _ = await _authenticate_with_token(websocket, self.state)
+            except Exception as e:
+                logger.warning("Connect failed: %s", e)
+                self.stats.connect_failures += 1
+                return
+            if not self.agent_id:
+                self.stats.connect_failures += 1
+                await websocket.close()
+                return
+            self.stats.last_connected = time.perf_counter()
+            self.stats.connect_latencies.append(self.stats.last_connected - started)
+
+        reporter = asyncio.create_task(self._report_loop(websocket))
+        loop_task = asyncio.create_task(run_message_loop(websocket, self.rpc_handler))
+        stop_task = asyncio.create_task(stop.wait())
+        await asyncio.wait([loop_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+        if loop_task.done() and not stop.is_set():
+            self.stats.unexpected_disconnects += 1
+
+        reporter.cancel()
+        stop_task.cancel()
+        await websocket.close()
+        await asyncio.gather(reporter, loop_task, return_exceptions=True)
+
+    async def _report_loop(self, websocket: Any) -> None:
+        """Push heartbeats and metrics on their configured intervals."""
+        interval = self.args.heartbeat_interval
+        metrics_every = max(1, round(self.args.metrics_interval / interval))
+        # Spread agents over the interval instead of pushing in lockstep
+        await asyncio.sleep(random.uniform(0, interval))
+        tick = 0
+        while True:
+            await websocket.send(json.dumps(self._heartbeat()))
+            self.stats.heartbeats += 1
+            if tick % metrics_every == 0:
+                await websocket.send(json.dumps(self._metrics()))
+                self.stats.metrics_pushes += 1
+            tick += 1
+            await asyncio.sleep(interval)
+
+    def _heartbeat(self) -> dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "method": "agent.heartbeat",
+            "params": {
+                "cpu_percent": round(random.uniform(1, 80), 1),
+                "memory_percent": round(random.uniform(10, 90), 1),
+                "uptime_seconds": int(time.monotonic() - self._started),
+            },
+        }
+
+    def _metrics(self) -> dict[str, Any]:
+        running = len(docker_client.get_client().containers.list())
+        total = len(docker_client.get_client().containers.list(all=True))
+        return {
+            "jsonrpc": "2.0",
+            "method": "metrics.update",
+            "params": {
+                "cpu": round(random.uniform(1, 80), 1),
+                "memory": {"used": 2 << 30, "total": 8 << 30, "percent": 25.0},
+                "disk": {"used": 20 << 30, "total": 100 << 30, "percent": 20.0},
+                "containers": {"running": running, "stopped": total - running},
+            },
+        }
+
+
+async def wait_for_stdin_eof() -> None:
+    """Block until the parent closes our stdin."""
+    await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+
+
+async def run_fleet(args: argparse.Namespace) -> dict[str, Any]:
+    """Run all agents until stdin is closed and return the report."""
+    tokens = json.loads(Path(args.tokens).read_text())
+    if args.agents:
+        tokens = tokens[: args.agents]
+
+    # All agents in this process share one fake Docker daemon
+    docker_client._client = FakeDockerClient(args.containers)
+
+    stats = FleetStats()
+    stop = asyncio.Event()
+    gate = asyncio.Semaphore(args.connect_concurrency)
+    agents = [
+        FakeAgent(
+            AgentState(
+                agent_id=entry["agent_id"],
+                token=entry["token"],
+                server_url=args.url,
+                registered_at=entry["registered_at"],
+            ),
+            args,
+            stats,
+        )
+        for entry in tokens
+    ]
+
+    tasks = [asyncio.create_task(agent.run(gate, stop)) for agent in agents]
+    await wait_for_stdin_eof()
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats.report(len(agents))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Simulated agent fleet")
+    parser.add_argument("--url", required=True, help="Backend /ws/agent URL")
+    parser.add_argument("--tokens", required=True, help="Tokens file to read")
+    parser.add_argument("--agents", type=int, default=0, help="Limit agents")
+    parser.add_argument("--containers", type=int, default=20)
+    parser.add_argument("--connect-concurrency", type=int, default=50)
+    parser.add_argument("--heartbeat-interval", type=float, default=5.0)
+    parser.add_argument("--metrics-interval", type=float, default=10.0)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    report = asyncio.run(run_fleet(args))
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Backend load-test harness.
+
+Starts the agent-facing part of the backend (AgentWebSocketHandler,
+AgentManager and AgentLifecycleManager wired as in services/factory.py) on a
+throwaway database, provisions N servers with registered agents, launches
+agent_fleet.py against it and drives randomized RPC traffic at the
+connected agents.
+
+Reports connect throughput, RPC round-trip percentiles per method, event
+loop lag and SQLite write rate as JSON.
+
+Usage:
+    cd backend && uv run python ../loadtest/backend_harness.py --agents 200
+    make loadtest AGENTS=200 DURATION=60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend" / "src"))
+os.environ.setdefault("MCP_LOG_LEVEL", "WARNING")
+
+import uvicorn  # noqa: E402
+from init_db.schema_agents import migrate_token_rotation_fields  # noqa: E402
+from lib.log_event import init_log_event  # noqa: E402
+from lib.logging_config import setup_logging  # noqa: E402
+from services.agent_lifecycle import AgentLifecycleManager  # noqa: E402
+from services.agent_manager import AgentManager  # noqa: E402
+from services.agent_service import AgentService  # noqa: E402
+from services.agent_websocket import AgentWebSocketHandler  # noqa: E402
+from services.database import (  # noqa: E402
+    AgentDatabaseService,
+    DatabaseConnection,
+    SchemaInitializer,
+)
+from services.database_service import DatabaseService  # noqa: E402
+from services.service_log import LogService  # noqa: E402
+from services.settings_service import SettingsService  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.routing import WebSocketRoute  # noqa: E402
+from stats import percentiles, rate  # noqa: E402
+
+SQL_DIR = ROOT / "backend" / "sql"
+
+# Backend -> agent calls issued by the RPC driver, with relative weights.
+# Read-only methods only: the fleet's Docker daemon is fake.
+RPC_MIX = {
+    "agent.ping": 4,
+    "docker.containers.list": 3,
+    "docker.containers.status": 2,
+    "docker.containers.inspect": 1,
+    "docker.images.list": 1,
+}
+
+
+class SQLiteWriteCounter:
+    """Counts rows changed through DatabaseConnection.get_connection.
+
+    Every backend service opens its SQLite connections through
+    DatabaseConnection, so wrapping that one method sees all writes.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.transactions = 0
+        self._original = DatabaseConnection.get_connection
+
+    def install(self) -> None:
+        counter = self
+        original = self._original
+
+        @asynccontextmanager
+        async def get_connection(db: DatabaseConnection) -> AsyncIterator[Any]:
+            async with original(db) as connection:
+                try:
+                    yield connection
+                finally:
+                    changes = connection.total_changes
+                    if changes:
+                        counter.rows += changes
+                        counter.transactions += 1
+
+        DatabaseConnection.get_connection = get_connection
+
+    def uninstall(self) -> None:
+        DatabaseConnection.get_connection = self._original
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from short sleeps."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - before - self.interval))
+
+
+class Backend:
+    """Agent-facing backend services on a temporary data directory."""
+
+    def __init__(self, data_directory: Path):
+        self.database_service = DatabaseService(data_directory=data_directory)
+        self.db_connection = DatabaseConnection(data_directory=data_directory)
+        self.log_service = LogService(connection=self.db_connection)
+        settings_service = SettingsService(db_service=self.database_service)
+        agent_db = AgentDatabaseService(self.db_connection)
+        self.agent_service = AgentService(
+            db_service=self.database_service,
+            settings_service=settings_service,
+            agent_db=agent_db,
+        )
+        self.agent_lifecycle = AgentLifecycleManager(agent_db=agent_db)
+        self.agent_manager = AgentManager(
+            agent_db=agent_db, lifecycle_manager=self.agent_lifecycle
+        )
+        handler = AgentWebSocketHandler(self.agent_service, self.agent_manager)
+        self.app = Starlette(
+            routes=[WebSocketRoute("/ws/agent", handler.handle_connection)]
+        )
+
+    async def initialize(self) -> None:
+        """Create the schema the way a packaged install does."""
+        schema = SchemaInitializer(self.db_connection)
+        await schema.initialize_all_tables()
+        await schema.run_all_migrations()
+        await migrate_token_rotation_fields(self.database_service)
+        # The settings schema turns trusted_schema off for its connection,
+        # so the seed (validated by json_valid CHECKs) needs a fresh one
+        for name in ("init_settings_schema.sql", "seed_default_settings.sql"):
+            async with self.db_connection.get_connection() as conn:
+                await conn.executescript((SQL_DIR / name).read_text())
+                await conn.commit()
+        init_log_event(self.log_service)
+
+    async def provision(self, count: int) -> list[dict[str, str]]:
+        """Create servers with registered agents and return their tokens."""
+        tokens = []
+        for index in range(count):
+            server_id = f"loadtest-{index}"
+            await self.database_service.create_server(
+                id=server_id,
+                name=f"loadtest-{index}",
+                host=f"10.0.{index // 250}.{index % 250 + 1}",
+                port=22,
+                username="loadtest",
+                auth_type="password",
+                encrypted_credentials="",
+            )
+            _, code = await self.agent_service.create_agent(server_id)
+            agent_id, token, _, _ = await self.agent_service.register_agent(
+                code.code, "loadtest"
+            )
+            tokens.append(
+                {
+                    "agent_id": agent_id,
+                    "token": token,
+                    "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+            )
+        return tokens
+
+
+async def drive_rpc(
+    agent_manager: AgentManager, duration: float, concurrency: int
+) -> dict[str, Any]:
+    """Send randomized commands to connected agents for a while."""
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    methods = list(RPC_MIX)
+    weights = list(RPC_MIX.values())
+    deadline = time.monotonic() + duration
+
+    async def worker() -> None:
+        while time.monotonic() < deadline:
+            agent_ids = agent_manager.get_connected_agent_ids()
+            if not agent_ids:
+                await asyncio.sleep(0.1)
+                continue
+            method = random.choices(methods, weights)[0]
+            params = None
+            if method in ("docker.containers.status", "docker.containers.inspect"):
+                params = {"container": "app-1"}
+            started = time.perf_counter()
+            try:
+                await agent_manager.send_command(
+                    random.choice(agent_ids), method, params, timeout=10
+                )
+                latencies[method].append(time.perf_counter() - started)
+            except Exception:
+                errors[method] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "calls": total,
+        "calls_per_s": rate(total, elapsed),
+        "errors": dict(errors),
+        "round_trip": percentiles([s for v in latencies.values() for s in v]),
+        "by_method": {m: percentiles(v) for m, v in sorted(latencies.items())},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one load test and return the combined report."""
+    with tempfile.TemporaryDirectory(prefix="tomo-loadtest-") as tmp:
+        data_directory = Path(tmp)
+        backend = Backend(data_directory)
+        await backend.initialize()
+
+        provision_started = time.monotonic()
+        tokens = await backend.provision(args.agents)
+        provision_seconds = time.monotonic() - provision_started
+        tokens_file = data_directory / "tokens.json"
+        tokens_file.write_text(json.dumps(tokens))
+
+        port = free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                backend.app,
+                host="127.0.0.1",
+                port=port,
+                log_level="warning",
+                ws_max_size=16 * 1024 * 1024,
+            )
+        )
+        serve_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        await backend.agent_lifecycle.start()
+
+        writes = SQLiteWriteCounter()
+        writes.install()
+        lag = LoopLagMonitor()
+        lag.start()
+
+        fleet = await asyncio.create_subprocess_exec(
+            args.fleet_python,
+            str(Path(__file__).with_name("agent_fleet.py")),
+            "--url",
+            f"ws://127.0.0.1:{port}/ws/agent",
+            "--tokens",
+            str(tokens_file),
+            "--containers",
+            str(args.containers),
+            "--connect-concurrency",
+            str(args.connect_concurrency),
+            "--heartbeat-interval",
+            str(args.heartbeat_interval),
+            "--metrics-interval",
+            str(args.metrics_interval),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+        # Connect phase: wait until every agent is registered with the manager
+        connect_started = time.monotonic()
+        connect_deadline = connect_started + args.connect_timeout
+        manager = backend.agent_manager
+        while (
+            len(manager.get_connected_agent_ids()) < args.agents
+            and time.monotonic() < connect_deadline
+            and fleet.returncode is None
+        ):
+            await asyncio.sleep(0.02)
+        connect_seconds = time.monotonic() - connect_started
+        connected = len(manager.get_connected_agent_ids())
+
+        # Steady state: fleet pushes heartbeats/metrics while we drive RPCs
+        writes_before = writes.rows
+        steady_started = time.monotonic()
+        rpc_report = await drive_rpc(manager, args.duration, args.rpc_concurrency)
+        steady_seconds = time.monotonic() - steady_started
+        steady_rows = writes.rows - writes_before
+
+        fleet.stdin.close()
+        stdout, _ = await fleet.communicate()
+        await lag.stop()
+        writes.uninstall()
+        await backend.agent_lifecycle.stop()
+        server.should_exit = True
+        await serve_task
+
+    fleet_report = json.loads(stdout.decode().strip().splitlines()[-1])
+    return {
+        "agents": args.agents,
+        "provision_s": round(provision_seconds, 3),
+        "connect": {
+            "connected": connected,
+            "seconds": round(connect_seconds, 3),
+            "agents_per_s": rate(connected, connect_seconds),
+        },
+        "rpc": rpc_report,
+        "event_loop_lag": percentiles(lag.samples),
+        "sqlite_writes": {
+            "rows": writes.rows,
+            "transactions": writes.transactions,
+            "steady_rows_per_s": rate(steady_rows, steady_seconds),
+        },
+        "fleet": fleet_report,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backend agent load test")
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Steady-state seconds"
+    )
+    parser.add_argument("--rpc-concurrency", type=int, default=20)
+    parser.add_argument("--connect-concurrency", type=int, default=50)
+    parser.add_argument("--connect-timeout", type=float, default=120.0)
+    parser.add_argument("--containers", type=int, default=20)
+    parser.add_argument("--heartbeat-interval", type=float, default=5.0)
+    parser.add_argument("--metrics-interval", type=float, default=10.0)
+    parser.add_argument(
+        "--fleet-python",
+        default=sys.executable,
+        help="Interpreter with the agent's dependencies installed",
+    )
+    parser.add_argument("--output", help="Also write the report to this file")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging()
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
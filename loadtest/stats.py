@@ -0,0 +1,34 @@
+"""Statistics helpers shared by the load-test processes."""
+
+import math
+from collections.abc import Sequence
+
+
+def percentiles(
+    samples: Sequence[float], points: Sequence[int] = (50, 95, 99)
+) -> dict[str, float | int]:
+    """Summarize latency samples given in seconds.
+
+    Args:
+        samples: Latency samples in seconds.
+        points: Percentiles to report.
+
+    Returns:
+        Dict with count and p<N>/max values in milliseconds.
+    """
+    if not samples:
+        return {"count": 0}
+
+    ordered = sorted(samples)
+    summary: dict[str, float | int] = {"count": len(ordered)}
+    for point in points:
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(point / 100 * len(ordered)))
+        summary[f"p{point}_ms"] = round(ordered[rank - 1] * 1000, 2)
+    summary["max_ms"] = round(ordered[-1] * 1000, 2)
+    return summary
+
+
+def rate(count: float, seconds: float) -> float:
+    """Return events per second, rounded for reporting."""
+    return round(count / seconds, 2) if seconds > 0 else 0.0
@@ -104,6 +104,12 @@ log_info "Copying backend..."
 cp -r "$PROJECT_ROOT/backend/src"/* "$BUILD_DIR/opt/tomo/backend/"
 cp -r "$PROJECT_ROOT/backend/sql" "$BUILD_DIR/opt/tomo/backend/"
 
+# Compile the password blocklist into a memory-mapped index (stdlib only)
+if [ -f "$BUILD_DIR/opt/tomo/backend/data/blocklist/common_passwords.txt.gz" ]; then
+    log_info "Compiling password blocklist..."
+    (cd "$BUILD_DIR/opt/tomo/backend" && python3 -m lib.password_blocklist)
+fi
+
 # Export requirements.txt from uv.lock (for pip install on target systems)
 log_info "Exporting requirements from uv.lock..."
 cd "$PROJECT_ROOT/backend"
@@ -51,6 +51,16 @@ echo "  Installing Python dependencies..."
 /opt/tomo/venv/bin/pip install --upgrade pip -q
 /opt/tomo/venv/bin/pip install -r /opt/tomo/requirements.txt -q
 
+# Record tool signatures so tool modules load on first use
+(cd /opt/tomo && /opt/tomo/venv/bin/python -m lib.tool_loader >/dev/null) || \
+    echo "  Tool manifest not generated; tools will load at startup"
+
+# Compile the password blocklist into a memory-mapped index
+if [ -f /opt/tomo/data/blocklist/common_passwords.txt.gz ]; then
+    (cd /opt/tomo && /opt/tomo/venv/bin/python -m lib.password_blocklist >/dev/null) || \
+        echo "  Password blocklist index not built; it will compile on first use"
+fi
+
 # Initialize database if not exists
 if [ ! -f /var/lib/tomo/tomo.db ]; then
     echo "  Initializing database..."